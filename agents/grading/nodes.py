@@ -5,6 +5,7 @@ from typing import Dict, Any
 from langchain_core.messages import HumanMessage, AIMessage
 
 from .state import GradingAgentState
+from utils.patterns.io_steps import LLMCall, Step
 from utils import (
     MAX_GRADING_ITERATIONS,
     GRADING_ERROR_INDICATORS,
@@ -101,7 +102,7 @@ Maximum 4 steps."""
         
         try:
             import json
-            response = self.llm.invoke([HumanMessage(content=planning_prompt)])
+            response = yield LLMCall(self.llm, [HumanMessage(content=planning_prompt)])
             plan_text = response.content.strip()
             
             if "```json" in plan_text:
@@ -147,7 +148,7 @@ Maximum 4 steps."""
         
         try:
             tool = self.tool_map.get(tool_name)
-            result = tool.invoke(context) if tool else f"Tool '{tool_name}' not found"
+            result = (yield Step(tool.invoke, context, afn=tool.ainvoke)) if tool else f"Tool '{tool_name}' not found"
             
             intermediate_results.append({
                 "step": current_step + 1,
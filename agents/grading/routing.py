@@ -5,6 +5,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from .state import GradingAgentState
 from utils import fast_grading_route, get_smart_context, MAX_CONTEXT_TOKENS
+from utils.patterns.io_steps import LLMCall
 
 
 GRADING_SYSTEM_PROMPT = """You are a professional academic grading assistant helping teachers streamline their work.
@@ -83,7 +84,7 @@ Respond with tool name only."""
         
         messages.append(HumanMessage(content=question))
         
-        response = self.llm.invoke(messages)
+        response = yield LLMCall(self.llm, messages)
         tool_choice = response.content.strip().lower()
         
         # Grading tools
@@ -6,6 +6,7 @@ from langchain_core.messages import AIMessage
 from .state import GradingAgentState
 from .nodes import GradingAgentNodes
 from .routing import GradingAgentRouter
+from utils.patterns.io_steps import ToolCall, dual_node
 
 
 def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
@@ -26,13 +27,13 @@ def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
     # Add nodes
     workflow.add_node("analyze_submission", nodes.analyze_submission)
     workflow.add_node("detect_complexity", nodes.detect_grading_complexity)
-    workflow.add_node("plan_complex", nodes.plan_complex_grading)
-    workflow.add_node("execute_plan", nodes.execute_grading_plan)
+    workflow.add_node("plan_complex", dual_node(nodes.plan_complex_grading))
+    workflow.add_node("execute_plan", dual_node(nodes.execute_grading_plan))
     workflow.add_node("check_consistency", nodes.check_consistency)
     workflow.add_node("self_reflect_grade", nodes.self_reflect_grade)
     workflow.add_node("flag_for_review", nodes.flag_for_review)
     workflow.add_node("improve_grade", nodes.improve_grade)
-    workflow.add_node("route_task", router.route_task)
+    workflow.add_node("route_task", dual_node(router.route_task))
     
     # Tool execution nodes
     def grade_essay(state: GradingAgentState) -> GradingAgentState:
@@ -41,7 +42,7 @@ def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
         # Use submission content if available, otherwise use the question
         content_to_grade = state.get("submission_content", state["question"])
         
-        result = tool.func(content_to_grade) if tool else "Essay grading unavailable"
+        result = (yield ToolCall(tool, content_to_grade)) if tool else "Essay grading unavailable"
         return {**state, "tool_result": result}
     
     def review_code(state: GradingAgentState) -> GradingAgentState:
@@ -50,87 +51,87 @@ def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
         # Use submission content if available, otherwise use the question
         content_to_grade = state.get("submission_content", state["question"])
         
-        result = tool.func(content_to_grade) if tool else "Code review unavailable"
+        result = (yield ToolCall(tool, content_to_grade)) if tool else "Code review unavailable"
         return {**state, "tool_result": result}
     
     def grade_mcq(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("grade_mcq")
-        result = tool.func(state["question"]) if tool else "MCQ grading unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "MCQ grading unavailable"
         return {**state, "tool_result": result}
     
     def evaluate_rubric(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("evaluate_with_rubric")
-        result = tool.func(state["question"]) if tool else "Rubric evaluation unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Rubric evaluation unavailable"
         return {**state, "tool_result": result}
     
     def generate_feedback(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("generate_feedback")
-        result = tool.func(state["question"]) if tool else "Feedback generation unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Feedback generation unavailable"
         return {**state, "tool_result": result}
     
     # Lesson Planning Tool Nodes (for teachers/professors)
     def generate_lesson_plan(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("generate_lesson_plan")
-        result = tool.func(state["question"]) if tool else "Lesson planning unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Lesson planning unavailable"
         return {**state, "tool_result": result}
     
     def design_curriculum(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("design_curriculum")
-        result = tool.func(state["question"]) if tool else "Curriculum design unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Curriculum design unavailable"
         return {**state, "tool_result": result}
     
     def create_learning_objectives(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("create_learning_objectives")
-        result = tool.func(state["question"]) if tool else "Learning objectives tool unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Learning objectives tool unavailable"
         return {**state, "tool_result": result}
     
     def design_assessment(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("design_assessment")
-        result = tool.func(state["question"]) if tool else "Assessment design unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Assessment design unavailable"
         return {**state, "tool_result": result}
     
     def generate_study_materials(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("generate_study_materials")
-        result = tool.func(state["question"]) if tool else "Study materials generation unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Study materials generation unavailable"
         return {**state, "tool_result": result}
     
-    workflow.add_node("grade_essay", grade_essay)
-    workflow.add_node("review_code", review_code)
-    workflow.add_node("grade_mcq", grade_mcq)
-    workflow.add_node("evaluate_rubric", evaluate_rubric)
-    workflow.add_node("generate_feedback", generate_feedback)
+    workflow.add_node("grade_essay", dual_node(grade_essay))
+    workflow.add_node("review_code", dual_node(review_code))
+    workflow.add_node("grade_mcq", dual_node(grade_mcq))
+    workflow.add_node("evaluate_rubric", dual_node(evaluate_rubric))
+    workflow.add_node("generate_feedback", dual_node(generate_feedback))
     
     # Add lesson planning nodes
-    workflow.add_node("generate_lesson_plan", generate_lesson_plan)
-    workflow.add_node("design_curriculum", design_curriculum)
-    workflow.add_node("create_learning_objectives", create_learning_objectives)
-    workflow.add_node("design_assessment", design_assessment)
-    workflow.add_node("generate_study_materials", generate_study_materials)
+    workflow.add_node("generate_lesson_plan", dual_node(generate_lesson_plan))
+    workflow.add_node("design_curriculum", dual_node(design_curriculum))
+    workflow.add_node("create_learning_objectives", dual_node(create_learning_objectives))
+    workflow.add_node("design_assessment", dual_node(design_assessment))
+    workflow.add_node("generate_study_materials", dual_node(generate_study_materials))
     
     # Google Classroom tool nodes
     def fetch_classroom_courses_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("fetch_classroom_courses")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         return {**state, "tool_result": result}
     
     def fetch_classroom_assignments_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("fetch_classroom_assignments")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         return {**state, "tool_result": result}
     
     def fetch_classroom_submissions_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("fetch_classroom_submissions")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         return {**state, "tool_result": result}
     
     def get_classroom_submission_details_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("get_classroom_submission_details")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         return {**state, "tool_result": result}
     
     def fetch_submission_content_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("fetch_submission_content")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         
         # If we successfully fetched content, store it for grading
         if "success" in result and "true" in result:
@@ -140,21 +141,21 @@ def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
     
     def post_grade_to_classroom_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("post_grade_to_classroom")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         return {**state, "tool_result": result}
     
     def fetch_classroom_rubrics_node(state: GradingAgentState) -> GradingAgentState:
         tool = tool_map.get("fetch_classroom_rubrics")
-        result = tool.func(state["question"]) if tool else "Google Classroom integration unavailable"
+        result = (yield ToolCall(tool, state["question"])) if tool else "Google Classroom integration unavailable"
         return {**state, "tool_result": result}
     
-    workflow.add_node("fetch_classroom_courses", fetch_classroom_courses_node)
-    workflow.add_node("fetch_classroom_assignments", fetch_classroom_assignments_node)
-    workflow.add_node("fetch_classroom_submissions", fetch_classroom_submissions_node)
-    workflow.add_node("get_classroom_submission_details", get_classroom_submission_details_node)
-    workflow.add_node("fetch_submission_content", fetch_submission_content_node)
-    workflow.add_node("post_grade_to_classroom", post_grade_to_classroom_node)
-    workflow.add_node("fetch_classroom_rubrics", fetch_classroom_rubrics_node)
+    workflow.add_node("fetch_classroom_courses", dual_node(fetch_classroom_courses_node))
+    workflow.add_node("fetch_classroom_assignments", dual_node(fetch_classroom_assignments_node))
+    workflow.add_node("fetch_classroom_submissions", dual_node(fetch_classroom_submissions_node))
+    workflow.add_node("get_classroom_submission_details", dual_node(get_classroom_submission_details_node))
+    workflow.add_node("fetch_submission_content", dual_node(fetch_submission_content_node))
+    workflow.add_node("post_grade_to_classroom", dual_node(post_grade_to_classroom_node))
+    workflow.add_node("fetch_classroom_rubrics", dual_node(fetch_classroom_rubrics_node))
     
     # Format result node
     def format_result(state: GradingAgentState) -> GradingAgentState:
@@ -219,12 +220,12 @@ def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
         
         # First fetch the content
         fetch_tool = tool_map.get("fetch_submission_content")
-        fetch_result = fetch_tool.func(submission_request) if fetch_tool else "Google Classroom integration unavailable"
+        fetch_result = (yield ToolCall(fetch_tool, submission_request)) if fetch_tool else "Google Classroom integration unavailable"
         
         if "success" in fetch_result and "true" in fetch_result:
             # Content fetched successfully, now grade it
             grade_tool = tool_map.get("grade_essay")
-            grade_result = grade_tool.func(fetch_result) if grade_tool else "Essay grading unavailable"
+            grade_result = (yield ToolCall(grade_tool, fetch_result)) if grade_tool else "Essay grading unavailable"
             
             return {
                 **state, 
@@ -235,7 +236,7 @@ def build_grading_workflow(llm, tool_map: dict) -> StateGraph:
         else:
             return {**state, "tool_result": fetch_result}
     
-    workflow.add_node("fetch_and_grade", fetch_and_grade_node)
+    workflow.add_node("fetch_and_grade", dual_node(fetch_and_grade_node))
     
     # Set entry point
     workflow.set_entry_point("analyze_submission")
@@ -7,22 +7,24 @@ while handling concurrent user queries.
 ARCHITECTURE:
 - Inherits from StreamingStudyNodes (DRY principle)
 - Only overrides _execute_manim_animation to add concurrent execution
+  (and _execute_document_qa to time it for the duration model)
 - Reuses all other tool execution methods from parent class
 """
 
 import asyncio
+import time
 from typing import Dict, Any
 
-from .streaming_nodes import StreamingStudyNodes
+from .streaming_nodes import StreamingStudyNodes, document_chunk_limit
 from utils.patterns.streaming import (
     StreamingState,
     StreamingIndicator
 )
 from utils.concurrent_execution import (
     get_task_manager,
-    TaskType,
-    TaskDurationEstimator
+    TaskType
 )
+from utils.core.constants import MANIM_RENDER_QUALITY
 from utils.monitoring import get_logger
 
 logger = get_logger(__name__)
@@ -53,7 +55,7 @@ class ConcurrentStreamingStudyNodes(StreamingStudyNodes):
         
         # Add concurrent execution specific attributes
         self.task_manager = get_task_manager()
-        self.duration_estimator = TaskDurationEstimator()
+        self.duration_estimator = self.task_manager.estimator
     
     async def _execute_manim_animation(self, state: StreamingState) -> StreamingState:
         """
@@ -76,20 +78,11 @@ class ConcurrentStreamingStudyNodes(StreamingStudyNodes):
         question = state.get("question", "")
         thread_id = state.get("thread_id", "default")
         
-        # Detect if this is a long-running task
-        task_type = TaskType.MANIM_ANIMATION
-        is_long_running = self.duration_estimator.is_long_running(task_type, question)
-        expected_duration = self.duration_estimator.estimate_duration(task_type, question)
-        
-        if not is_long_running:
-            # Execute directly using parent class implementation for short animations
-            logger.info("⚡ Manim task estimated as short, executing directly")
-            return await super()._execute_manim_animation(state)
-        
-        # Long-running task - execute in background with concurrency support
-        logger.info(f"🔄 Manim task is long-running ({expected_duration:.1f}s), enabling concurrent execution")
-        
-        # Signal that we're forking execution
+        # Every render goes through the task manager: it runs predicted-short
+        # renders inline and forks or queues the others, timing both
+        expected_duration = self.duration_estimator.estimate_duration(
+            TaskType.MANIM_ANIMATION, question, quality=MANIM_RENDER_QUALITY
+        )
         await state.add_indicator(
             StreamingIndicator.PROCESSING,
             f"🎬 Starting animation generation (estimated: {int(expected_duration)} seconds)..."
@@ -102,13 +95,14 @@ class ConcurrentStreamingStudyNodes(StreamingStudyNodes):
             '', question, flags=re.IGNORECASE
         )
         topic = topic.strip() or question
+        await state.update("animation_topic", topic, stream=True)
         
-        # Create the background task function
+        # Create the task function (run inline or in the background)
         async def manim_task_function(topic: str, tool_func: Any) -> str:
-            """Execute Manim animation in background."""
-            logger.info(f"🎥 Background Manim generation started for: {topic}")
+            """Render the Manim animation."""
+            logger.info(f"🎥 Manim generation started for: {topic}")
             result = await asyncio.to_thread(tool_func, topic)
-            logger.info(f"✅ Background Manim generation completed")
+            logger.info(f"✅ Manim generation completed")
             return result
         
         # Execute with concurrency support
@@ -117,7 +111,8 @@ class ConcurrentStreamingStudyNodes(StreamingStudyNodes):
             task_function=manim_task_function,
             task_args={"topic": topic, "tool_func": tool.func},
             question=question,
-            thread_id=thread_id
+            thread_id=thread_id,
+            quality=MANIM_RENDER_QUALITY
         ):
             update_type = update.get("type")
             
@@ -186,7 +181,33 @@ class ConcurrentStreamingStudyNodes(StreamingStudyNodes):
                     update["message"]
                 )
                 await state.update("tool_result", f"Error: {update['error']}", stream=True)
+            
+            elif update_type == "error":
+                # Inline render failed
+                await state.add_indicator(
+                    StreamingIndicator.ERROR,
+                    f"Animation failed: {update['error']}"
+                )
+                await state.update("tool_result", f"Error: {update['error']}", stream=True)
         
         return state
+    
+    async def _execute_document_qa(self, state: StreamingState) -> StreamingState:
+        """
+        Execute Document QA, recording how long it took.
+        
+        Document QA always runs inline; its timings (with the retrieval
+        chunk limit as a feature) keep the duration model's document_qa
+        estimates current.
+        """
+        question = state.get("question", "")
+        features = self.duration_estimator.features(question, chunk_count=document_chunk_limit(question))
+        started = time.perf_counter()
+        try:
+            return await super()._execute_document_qa(state)
+        finally:
+            self.duration_estimator.record_duration(
+                TaskType.DOCUMENT_QA, time.perf_counter() - started, features
+            )
 
 
@@ -27,6 +27,26 @@ from .streaming_nodes import StreamingStudyNodes
 logger = get_logger(__name__)
 
 
+def fast_study_route(question: str) -> str:
+    """
+    Pattern-based tool choice of the fast streaming path (no LLM).
+    
+    Args:
+        question: User question
+        
+    Returns:
+        "document_qa", "python_repl", "manim_animation" or "web_search"
+    """
+    question_lower = question.lower()
+    if any(word in question_lower for word in ['document', 'uploaded', 'notes', 'chapter', 'section', 'file', 'pdf']):
+        return "document_qa"
+    if any(word in question_lower for word in ['code', 'calculate', 'compute', 'python']) or any(op in question for op in ['+', '-', '*', '/']):
+        return "python_repl"
+    if any(phrase in question_lower for phrase in ['animate', 'animation', 'visualize', 'create video']):
+        return "manim_animation"
+    return "web_search"
+
+
 class FastStreamingStudyAgent(BaseAgent):
     """
     Blazing-fast streaming study agent with <100ms first response.
@@ -118,20 +138,20 @@ class FastStreamingStudyAgent(BaseAgent):
             })
             
             # FAST CLASSIFICATION - Pattern-based, no LLM (10-20ms)
-            question_lower = question.lower()
+            route = fast_study_route(question)
             
             # Route to appropriate tool (now with caching built-in)
-            if any(word in question_lower for word in ['document', 'uploaded', 'notes', 'chapter', 'section', 'file', 'pdf']):
+            if route == "document_qa":
                 logger.info("📚 Fast route → Document Q&A")
                 yield "Searching your documents...\n\n"
                 result_state = await self.nodes._execute_document_qa(state)
             
-            elif any(word in question_lower for word in ['code', 'calculate', 'compute', 'python']) or any(op in question for op in ['+', '-', '*', '/']):
+            elif route == "python_repl":
                 logger.info("🐍 Fast route → Python REPL")
                 yield "Executing code...\n\n"
                 result_state = await self.nodes._execute_python_repl(state)
             
-            elif any(phrase in question_lower for phrase in ['animate', 'animation', 'visualize', 'create video']):
+            elif route == "manim_animation":
                 logger.info("🎬 Fast route → Manim Animation")
                 yield "Generating animation (this may take 30-60 seconds)...\n\n"
                 # Note: Manim is inherently slow, but we give instant feedback
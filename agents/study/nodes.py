@@ -1,10 +1,38 @@
-"""LangGraph nodes for Study Agent."""
+"""LangGraph nodes for Study Agent.
+
+Nodes that do I/O are step generators (see utils.patterns.io_steps), so the
+same node runs blocking under ``invoke`` and non-blocking under ``ainvoke``.
+"""
 
 from typing import Dict, Any
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from .state import StudyAgentState
 from utils import MAX_AGENT_ITERATIONS
+from utils.patterns.io_steps import LLMCall, Step, ToolCall
+from utils.rag.retrieval import STATUS_NO_DOCUMENTS, run_document_retrieval
+
+
+COUNT_DOCUMENT_VECTORS_SQL = "SELECT COUNT(*) as count FROM document_vectors"
+
+
+def count_document_vectors() -> int:
+    """Number of indexed document chunks."""
+    from database.core import get_db
+    from sqlalchemy import text
+    
+    with get_db() as db:
+        return db.execute(text(COUNT_DOCUMENT_VECTORS_SQL)).fetchone().count
+
+
+async def acount_document_vectors() -> int:
+    """Async variant of ``count_document_vectors`` (async DB session)."""
+    from database.core.async_engine import async_db_engine
+    from sqlalchemy import text
+    
+    async with async_db_engine.get_session() as session:
+        result = await session.execute(text(COUNT_DOCUMENT_VECTORS_SQL))
+        return result.fetchone().count
 
 
 class StudyAgentNodes:
@@ -113,7 +141,7 @@ Keep it 2-4 steps maximum."""
         
         try:
             import json
-            response = self.llm.invoke([HumanMessage(content=planning_prompt)])
+            response = yield LLMCall(self.llm, [HumanMessage(content=planning_prompt)])
             content = response.content.strip()
             
             if "```json" in content:
@@ -155,7 +183,7 @@ Keep it 2-4 steps maximum."""
         }
         
         if tool_name in tool_executors:
-            result_state = tool_executors[tool_name](state)
+            result_state = yield from tool_executors[tool_name](state)
             
             intermediate = state.get("intermediate_answers", [])
             intermediate.append({
@@ -225,7 +253,7 @@ IMPORTANT:
 Your synthesized answer:"""
         
         try:
-            response = self.llm.invoke([HumanMessage(content=synthesis_prompt)])
+            response = yield LLMCall(self.llm, [HumanMessage(content=synthesis_prompt)])
             final_answer = response.content
             
             return {
@@ -282,43 +310,38 @@ Your synthesized answer:"""
         # IMPORTANT: Check if documents exist on disk but not in vector store yet
         # This prevents silent fallback to web search when indexing is in progress
         try:
-            from database.core import get_db
-            from sqlalchemy import text
             import os
             
-            with get_db() as db:
-                count_result = db.execute(text("SELECT COUNT(*) as count FROM document_vectors"))
-                total_docs = count_result.fetchone().count
+            total_docs = yield Step(count_document_vectors, afn=acount_document_vectors)
+            if total_docs == 0:
+                # Check for files on disk
+                documents_dir = os.getenv("DOCUMENTS_DIR", "documents")
+                files_on_disk = []
+                if os.path.exists(documents_dir):
+                    files_on_disk = [f for f in os.listdir(documents_dir) 
+                                   if f.endswith(('.pdf', '.docx', '.txt', '.md'))]
                 
-                if total_docs == 0:
-                    # Check for files on disk
-                    documents_dir = os.getenv("DOCUMENTS_DIR", "documents")
-                    files_on_disk = []
-                    if os.path.exists(documents_dir):
-                        files_on_disk = [f for f in os.listdir(documents_dir) 
-                                       if f.endswith(('.pdf', '.docx', '.txt', '.md'))]
-                    
-                    if files_on_disk:
-                        # Files exist but not indexed yet
-                        print(f"⚠️  [INDEXING IN PROGRESS] Found {len(files_on_disk)} file(s) on disk but not indexed yet")
-                        files_list = '\n'.join([f"  • {f}" for f in files_on_disk])
-                        return {
-                            **state,
-                            "tool_result": f"📄 **Document Indexing in Progress**\n\n"
-                                         f"I found the following document(s) that you've uploaded:\n\n{files_list}\n\n"
-                                         f"⏳ **Please wait a moment** - these documents are currently being processed and indexed. "
-                                         f"This usually takes 10-30 seconds depending on the document size.\n\n"
-                                         f"💡 **What's happening:** Your document is being:\n"
-                                         f"  1. Extracted (reading the PDF/document content)\n"
-                                         f"  2. Chunked (breaking into searchable sections)\n"
-                                         f"  3. Embedded (converting to semantic vectors)\n"
-                                         f"  4. Indexed (storing in the vector database)\n\n"
-                                         f"Please try your question again in a moment!",
-                            "tried_document_qa": True,
-                            "document_qa_failed": True,
-                            "needs_clarification": True,
-                            "awaiting_user_choice": False  # Don't ask for web search - they should wait
-                        }
+                if files_on_disk:
+                    # Files exist but not indexed yet
+                    print(f"⚠️  [INDEXING IN PROGRESS] Found {len(files_on_disk)} file(s) on disk but not indexed yet")
+                    files_list = '\n'.join([f"  • {f}" for f in files_on_disk])
+                    return {
+                        **state,
+                        "tool_result": f"📄 **Document Indexing in Progress**\n\n"
+                                     f"I found the following document(s) that you've uploaded:\n\n{files_list}\n\n"
+                                     f"⏳ **Please wait a moment** - these documents are currently being processed and indexed. "
+                                     f"This usually takes 10-30 seconds depending on the document size.\n\n"
+                                     f"💡 **What's happening:** Your document is being:\n"
+                                     f"  1. Extracted (reading the PDF/document content)\n"
+                                     f"  2. Chunked (breaking into searchable sections)\n"
+                                     f"  3. Embedded (converting to semantic vectors)\n"
+                                     f"  4. Indexed (storing in the vector database)\n\n"
+                                     f"Please try your question again in a moment!",
+                        "tried_document_qa": True,
+                        "document_qa_failed": True,
+                        "needs_clarification": True,
+                        "awaiting_user_choice": False  # Don't ask for web search - they should wait
+                    }
         except Exception as e:
             print(f"⚠️  Pre-check error: {e}")
         
@@ -355,24 +378,19 @@ Your synthesized answer:"""
                 print(f"📄 [STANDARD RETRIEVAL] Specific question - retrieving {chunk_limit} chunks")
             
             # Retrieve relevant document chunks with context awareness and appropriate limit
-            raw_results = tool.func(
+            retrieval = yield Step(
+                run_document_retrieval,
+                tool,
                 state["question"], 
                 limit=chunk_limit,
                 conversation_history=conversation_history
             )
-            print(f"📄 [TOOL EXECUTION] Document_QA returned {len(raw_results)} chars")
-            print(f"📄 [TOOL EXECUTION] First 200 chars: {raw_results[:200]}")
+            print(f"📄 [TOOL EXECUTION] Document_QA returned {len(retrieval.chunks)} chunks "
+                  f"({retrieval.total_tokens} tokens, status={retrieval.status})")
             
-            # Check if retrieval failed
-            failed = any(p in raw_results.lower() for p in [
-                "no relevant content", "no documents found", "not found", "❌",
-                "no documents", "please upload", "vector store"
-            ])
-            print(f"🔍 [TOOL EXECUTION] Failure check result: {failed}")
-            
-            if failed:
+            if not retrieval.ok:
                 # Check if this is a "no documents available" situation
-                if "no documents found" in raw_results.lower() or "please upload" in raw_results.lower():
+                if retrieval.status == STATUS_NO_DOCUMENTS:
                     print("💡 No documents available - informing user")
                     
                     # Check if user explicitly referenced a document they thought they uploaded
@@ -419,11 +437,13 @@ Your synthesized answer:"""
                 
                 return {
                     **state,
-                    "tool_result": raw_results,
+                    "tool_result": retrieval.to_prompt_text(),
                     "tried_document_qa": True,
                     "document_qa_failed": True
                 }
             
+            raw_results = retrieval.to_prompt_text()
+            
             # Detect request type
             question_lower = state["question"].lower()
             
@@ -585,7 +605,7 @@ Instructions:
 
 Answer:"""
             
-            response = self.llm.invoke([HumanMessage(content=synthesis_prompt)])
+            response = yield LLMCall(self.llm, [HumanMessage(content=synthesis_prompt)])
             print(f"🤖 [LLM SYNTHESIS] LLM response ({len(response.content)} chars):")
             print(f"   First 300 chars: {response.content[:300]}...")
             
@@ -831,7 +851,7 @@ Answer:"""
             
             print(f"{'='*70}\n")
             
-            raw_results = tool.func(search_query)
+            raw_results = yield ToolCall(tool, search_query)
             
             # Debug: Print raw search results to verify URLs are present
             print(f"\n{'='*70}")
@@ -935,7 +955,7 @@ Format:
 
 Answer:"""
             
-            response = self.llm.invoke([HumanMessage(content=synthesis_prompt)])
+            response = yield LLMCall(self.llm, [HumanMessage(content=synthesis_prompt)])
             
             return {**state, "tool_result": response.content}
         except Exception as e:
@@ -974,7 +994,7 @@ Answer:"""
                 code = code.replace('^', '**')
                 code = f"print({code})"
             
-            result = tool.func(code)
+            result = yield ToolCall(tool, code)
             return {**state, "tool_result": str(result)}
         except Exception as e:
             return {**state, "tool_result": f"Execution error: {str(e)}"}
@@ -997,7 +1017,7 @@ Answer:"""
                 topic = question
             
             print(f"🎬 Generating animation for topic: {topic}")
-            result = tool.func(topic)
+            result = yield ToolCall(tool, topic)
             
             # Parse JSON result from tool
             import json
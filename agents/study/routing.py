@@ -4,7 +4,9 @@ from typing import Literal
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from .state import StudyAgentState
+from .nodes import count_document_vectors, acount_document_vectors
 from utils import fast_study_route
+from utils.patterns.io_steps import LLMCall, Step
 
 
 class StudyAgentRouter:
@@ -34,36 +36,32 @@ class StudyAgentRouter:
             ])
             
             try:
-                from database.core import get_db
-                from sqlalchemy import text
                 import os
                 
-                with get_db() as db:
-                    count_result = db.execute(text("SELECT COUNT(*) as count FROM document_vectors"))
-                    total_docs = count_result.fetchone().count
-                    print(f"📊 [ROUTING DEBUG] Found {total_docs} document vectors in DB")
+                total_docs = yield Step(count_document_vectors, afn=acount_document_vectors)
+                print(f"📊 [ROUTING DEBUG] Found {total_docs} document vectors in DB")
+                
+                if total_docs == 0:
+                    # Check if documents exist on disk but not yet indexed
+                    documents_dir = os.getenv("DOCUMENTS_DIR", "documents")
+                    files_on_disk = []
+                    if os.path.exists(documents_dir):
+                        files_on_disk = [f for f in os.listdir(documents_dir) 
+                                       if f.endswith(('.pdf', '.docx', '.txt', '.md'))]
                     
-                    if total_docs == 0:
-                        # Check if documents exist on disk but not yet indexed
-                        documents_dir = os.getenv("DOCUMENTS_DIR", "documents")
-                        files_on_disk = []
-                        if os.path.exists(documents_dir):
-                            files_on_disk = [f for f in os.listdir(documents_dir) 
-                                           if f.endswith(('.pdf', '.docx', '.txt', '.md'))]
-                        
-                        if files_on_disk:
-                            print(f"⚠️  Found {len(files_on_disk)} file(s) on disk but not indexed yet")
-                            print(f"📄 Files: {', '.join(files_on_disk)}")
-                            # Don't change route - let Document_QA handle the "indexing in progress" message
-                        elif explicit_doc_reference:
-                            print("⚠️  User explicitly referenced a document but none found")
-                            # Don't change route - let Document_QA explain that no document was found
-                        else:
-                            print("⚠️  No documents in vector store and no explicit document reference")
-                            # Only in this case, route to Web Search
-                            quick_route = "Web_Search"
+                    if files_on_disk:
+                        print(f"⚠️  Found {len(files_on_disk)} file(s) on disk but not indexed yet")
+                        print(f"📄 Files: {', '.join(files_on_disk)}")
+                        # Don't change route - let Document_QA handle the "indexing in progress" message
+                    elif explicit_doc_reference:
+                        print("⚠️  User explicitly referenced a document but none found")
+                        # Don't change route - let Document_QA explain that no document was found
                     else:
-                        print(f"✅ [ROUTING DEBUG] Documents available - proceeding with Document_QA")
+                        print("⚠️  No documents in vector store and no explicit document reference")
+                        # Only in this case, route to Web Search
+                        quick_route = "Web_Search"
+                else:
+                    print(f"✅ [ROUTING DEBUG] Documents available - proceeding with Document_QA")
             except Exception as e:
                 print(f"⚠️  Database check error: {e} - continuing with Document_QA route (will fallback if needed)")
                 # Continue with original route - fallback mechanism will handle it
@@ -89,7 +87,7 @@ Respond with ONLY the tool name."""
             HumanMessage(content=question)
         ]
         
-        response = self.llm.invoke(messages)
+        response = yield LLMCall(self.llm, messages)
         tool_choice = response.content.strip()
         
         # Normalize tool name
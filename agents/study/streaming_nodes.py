@@ -25,10 +25,37 @@ from utils.patterns.streaming import (
     StreamingIndicator,
     StreamingCallbackHandler
 )
+from utils.core.constants import SPECULATIVE_WEB_SEARCH_ENABLED
 from utils.monitoring import get_logger
+from utils.monitoring.stage_timing import stage, STAGE_RETRIEVAL, STAGE_WEB_SEARCH
+from utils.rag.context_budget import pack_retrieved_text, count_tokens
+from utils.rag.retrieval import (
+    RetrievalResult,
+    STATUS_NO_DOCUMENTS,
+    pack_retrieval_result,
+    run_document_retrieval,
+)
+from utils.rag.query_enrichment import detect_time_sensitivity
+from utils.cache.search_cache import TTLLRUCache
+from utils.patterns.plan_dag import normalize_plan, run_plan
+from utils.patterns.speculation import Speculation, take_or_run
 
 logger = get_logger(__name__)
 
+# Routing flags a plan step may set on its forked state; execute_plan copies
+# them back to the parent state so the graph still sees them
+PLAN_STEP_FLAGS = ("needs_clarification", "awaiting_user_choice", "document_qa_failed")
+
+
+def document_chunk_limit(question: str) -> int:
+    """Chunks to retrieve: whole-unit requests need more than specific questions."""
+    if any(keyword in question.lower() for keyword in [
+        'chapter', 'section', 'structured notes', 'generate notes', 
+        'all about', 'overview', 'entire', 'whole', 'complete'
+    ]):
+        return 60
+    return 15
+
 
 class StreamingStudyNodes:
     """
@@ -55,9 +82,10 @@ class StreamingStudyNodes:
         self.tool_map = tool_map
         
         # Performance optimizations
-        self._query_cache = {}  # In-memory cache for frequent queries
         self._max_cache_size = 100
         self._cache_ttl = 300  # 5 minutes
+        # In-memory O(1) LRU for frequent queries (per-entry TTL)
+        self._query_cache = TTLLRUCache(max_size=self._max_cache_size, default_ttl=self._cache_ttl)
     
     def _fast_classify(self, question_lower: str) -> str:
         """
@@ -97,35 +125,124 @@ class StreamingStudyNodes:
     
     def _get_from_cache(self, key: str) -> Optional[str]:
         """Get result from cache if available and not expired."""
-        if key in self._query_cache:
-            cached_data = self._query_cache[key]
-            timestamp = cached_data.get("timestamp", 0)
-            
-            # Check if expired
-            if time.time() - timestamp < self._cache_ttl:
-                return cached_data.get("result")
-            else:
-                # Expired - remove
-                del self._query_cache[key]
-        
-        return None
+        return self._query_cache.get(key)
     
     def _add_to_cache(self, key: str, result: str):
-        """Add result to cache with TTL."""
-        # Simple cache size management
-        if len(self._query_cache) >= self._max_cache_size:
-            # Remove oldest entry
-            oldest_key = min(self._query_cache.keys(), 
-                           key=lambda k: self._query_cache[k].get("timestamp", 0))
-            del self._query_cache[oldest_key]
-        
-        self._query_cache[key] = {
-            "result": result,
-            "timestamp": time.time()
-        }
+        """Add result to cache with TTL (self._cache_ttl)."""
+        self._query_cache.set(key, result)
         
         logger.info(f"📦 Cached result for key: {key[:50]}...")
     
+    def _pack_prompt_context(self, raw_results: str, question: str, label: str) -> str:
+        """
+        Pack retrieved/search text into the synthesis token budget.
+        
+        Drops near-duplicate passages and the least relevant tail so the
+        prompt never overflows the context window.
+        
+        Args:
+            raw_results: Formatted tool output
+            question: User's question (reserved out of the budget)
+            label: Log label for the packing report
+            
+        Returns:
+            Packed context text
+        """
+        packed = pack_retrieved_text(raw_results, reserved_tokens=count_tokens(question))
+        if not packed.items:
+            return raw_results
+        return self._render_packed(packed, label)
+    
+    def _pack_retrieval(self, retrieval: RetrievalResult, question: str) -> str:
+        """
+        Pack retrieved chunk records into the synthesis token budget.
+        
+        Chunk scores are the relevance; passages are rendered only here.
+        
+        Args:
+            retrieval: Structured retrieval result
+            question: User's question (reserved out of the budget)
+            
+        Returns:
+            Packed context text
+        """
+        packed = pack_retrieval_result(retrieval, reserved_tokens=count_tokens(question))
+        if not packed.items:
+            return retrieval.to_prompt_text()
+        return self._render_packed(packed, "Document QA")
+    
+    @staticmethod
+    def _render_packed(packed, label: str) -> str:
+        """Log packing stats and render the packed context with sources."""
+        stats = packed.stats()
+        logger.info(
+            f"🧮 {label} context: {stats['tokens_used']}/{stats['budget']} tokens "
+            f"(saved {stats['tokens_saved']}, {stats['duplicates_removed']} duplicates, "
+            f"{stats['items_dropped']} dropped)"
+        )
+        return packed.render(with_sources=True)
+    
+    async def _retrieve_documents(self, tool, question: str, limit: int, conversation_history: str) -> RetrievalResult:
+        """Document retrieval (blocking I/O, runs in a worker thread)."""
+        return await asyncio.to_thread(
+            run_document_retrieval,
+            tool,
+            question,
+            limit=limit,
+            conversation_history=conversation_history
+        )
+    
+    async def _search_web(self, tool, query: str) -> str:
+        """Web search API call."""
+        if getattr(tool, "coroutine", None):
+            # Hedged async client: no worker thread needed
+            return await tool.coroutine(query)
+        return await asyncio.to_thread(tool.func, query)
+    
+    def speculate(self, speculation: Speculation, route: str, question: str) -> bool:
+        """
+        Start the read-only first step of a tool before routing has finished.
+        
+        Only lookups are speculated (document retrieval, and search-API calls
+        if SPECULATIVE_WEB_SEARCH_ENABLED), keyed by the inputs the tool will
+        use for a request without conversation history; the tool reuses the
+        result through take_or_run if its inputs match. Retrievals run
+        unrecorded: stats and prefetch learning are applied only when the
+        result is taken.
+        
+        Args:
+            speculation: Speculation of the request
+            route: Predicted tool ("document_qa", "web_search", ...)
+            question: User question
+            
+        Returns:
+            True if something was started
+        """
+        if route == "document_qa":
+            tool = self.tool_map.get("Document_QA")
+            metadata = getattr(tool, "metadata", None) or {}
+            retriever = metadata.get("structured_retriever")
+            recorder = metadata.get("retrieval_recorder")
+            if not retriever or not recorder or self._get_from_cache(f"doc_qa:{question}"):
+                return False
+            limit = document_chunk_limit(question)
+            return speculation.start(
+                "document_qa",
+                (question, limit, ""),
+                lambda: asyncio.to_thread(
+                    retriever, question, limit=limit, conversation_history="", record=False
+                ),
+                on_take=lambda result: asyncio.to_thread(recorder, question, result, limit=limit)
+            )
+        
+        if route == "web_search" and SPECULATIVE_WEB_SEARCH_ENABLED:
+            tool = self.tool_map.get("Web_Search")
+            if not tool or self._get_from_cache(f"web_search:{question}"):
+                return False
+            return speculation.start("web_search", question, lambda: self._search_web(tool, question))
+        
+        return False
+    
     async def _progressive_synthesis(
         self, 
         state: StreamingState, 
@@ -246,7 +363,11 @@ Available tools:
 - Manim_Animation: Create animations
 
 Return JSON array:
-[{{"step": 1, "description": "...", "tool": "..."}}, ...]
+[{{"step": 1, "description": "...", "tool": "...", "depends_on": []}}, ...]
+
+"depends_on" lists the step numbers whose results a step needs. Steps that
+do not need each other (e.g. looking up two things being compared) must not
+depend on each other, so they can run in parallel.
 
 Keep it 2-4 steps maximum."""
         
@@ -275,7 +396,7 @@ Keep it 2-4 steps maximum."""
                 content = content.split("```")[1].split("```")[0].strip()
             
             # Parse plan
-            plan = json.loads(content)
+            plan = normalize_plan(json.loads(content))
             
             # Update state
             await state.update("task_plan", plan, stream=False)
@@ -286,6 +407,7 @@ Keep it 2-4 steps maximum."""
             # Stream plan summary
             plan_summary = "\n".join([
                 f"Step {step['step']}: {step['description']} (using {step['tool']})"
+                + (f" after step {', '.join(map(str, step['depends_on']))}" if step["depends_on"] else "")
                 for step in plan
             ])
             
@@ -311,13 +433,18 @@ Keep it 2-4 steps maximum."""
     
     async def execute_plan(self, state: StreamingState) -> StreamingState:
         """
-        Execute one step from the task plan with streaming.
+        Execute the remaining task plan steps with streaming.
+        
+        Steps whose dependencies are done run concurrently (up to
+        PLAN_MAX_PARALLEL_STEPS), each on a forked state so their tool
+        results do not overwrite each other; their progress indicators
+        interleave in the stream, and synthesis starts after the last one.
         
         Args:
             state: Streaming state
             
         Returns:
-            Updated state after executing step
+            Updated state with all step results
         """
         plan = state.get("task_plan", [])
         current_step = state.get("current_step", 0)
@@ -325,13 +452,18 @@ Keep it 2-4 steps maximum."""
         if not plan or current_step >= len(plan):
             return state
         
-        step = plan[current_step]
-        tool_name = step.get("tool", "")
-        
-        # Signal step execution
-        await state.add_indicator(
-            StreamingIndicator.TOOL_START,
-            f"Executing step {current_step + 1}: {step.get('description', '')}"
+        plan = normalize_plan(plan)
+        completed = state.get("completed_steps", [])
+        pending = [
+            {**step, "depends_on": [d for d in step["depends_on"] if f"step_{d}" not in completed]}
+            for step in plan
+            if f"step_{step['step']}" not in completed
+        ]
+        # Token streams of concurrent steps would interleave: only a plain
+        # chain of steps streams its tokens
+        parallel = any(
+            previous["step"] not in step["depends_on"]
+            for previous, step in zip(pending, pending[1:])
         )
         
         # Map tool names to execution methods
@@ -346,50 +478,87 @@ Keep it 2-4 steps maximum."""
             "Manim_Animation": self._execute_manim_animation,
         }
         
-        if tool_name in tool_executors:
-            # Execute tool with streaming
-            await state.add_indicator(
+        async def run_step(step: Dict[str, Any]) -> Optional[StreamingState]:
+            number = step["step"]
+            tool_name = step.get("tool", "")
+            step_state = state.fork(label=f"Step {number}", stream_content=not parallel)
+            step_state["question"] = step.get("description") or state.get("question", "")
+            step_state["tool_result"] = None
+            step_state["partial_response"] = ""
+            
+            # Signal step execution
+            await step_state.add_indicator(
+                StreamingIndicator.EXECUTING,
+                f"Executing step {number}: {step.get('description', '')}"
+            )
+            
+            if tool_name not in tool_executors:
+                await step_state.add_indicator(
+                    StreamingIndicator.ERROR,
+                    f"Unknown tool: {tool_name}"
+                )
+                return None
+            
+            await step_state.add_indicator(
                 StreamingIndicator.PROCESSING,
                 f"Using {tool_name} tool..."
             )
+            result_state = await tool_executors[tool_name](step_state)
             
-            # Call tool executor
-            await tool_executors[tool_name](state)
+            await step_state.add_indicator(
+                StreamingIndicator.COMPLETE,
+                f"Completed step {number}"
+            )
+            return result_state
+        
+        if parallel:
+            await state.add_indicator(
+                StreamingIndicator.PROCESSING,
+                f"Running {len(pending)} steps, independent ones in parallel..."
+            )
+        
+        flags_before = {flag: state.get(flag) for flag in PLAN_STEP_FLAGS}
+        results = await run_plan(pending, run_step)
+        
+        # Record results in plan order (synthesis reads them in order)
+        intermediate = state.get("intermediate_answers", [])
+        tools_used = state.get("tools_used_history", [])
+        for step in pending:
+            number = step["step"]
+            outcome = results.get(number)
+            tool_name = step.get("tool", "")
+            completed.append(f"step_{number}")
+            
+            if isinstance(outcome, Exception):
+                await state.add_indicator(
+                    StreamingIndicator.ERROR,
+                    f"Step {number} failed: {outcome}"
+                )
+                result = f"Error: {outcome}"
+            elif outcome is None:
+                continue  # Unknown tool
+            else:
+                result = outcome.get("tool_result", "")
+                # Flags a step changed, the later step winning as if run in order
+                for flag, before in flags_before.items():
+                    if outcome.get(flag) != before:
+                        await state.update(flag, outcome.get(flag), stream=False)
             
-            # Update intermediate results
-            intermediate = state.get("intermediate_answers", [])
             intermediate.append({
-                "step": current_step + 1,
+                "step": number,
                 "description": step.get("description", ""),
                 "tool": tool_name,
-                "result": state.get("tool_result", "")
+                "result": result
             })
-            
-            # Update history
-            tools_used = state.get("tools_used_history", [])
             tools_used.append(tool_name)
-            
-            completed = state.get("completed_steps", [])
-            completed.append(f"step_{current_step + 1}")
-            
-            # Update state
-            await state.update("intermediate_answers", intermediate, stream=False)
-            await state.update("tools_used_history", tools_used, stream=False)
-            await state.update("completed_steps", completed, stream=False)
-            await state.update("current_step", current_step + 1, stream=False)
-            
-            # Signal step completion
-            await state.add_indicator(
-                StreamingIndicator.TOOL_END,
-                f"Completed step {current_step + 1}"
-            )
-        else:
-            # Unknown tool
-            await state.add_indicator(
-                StreamingIndicator.ERROR,
-                f"Unknown tool: {tool_name}"
-            )
-            await state.update("current_step", current_step + 1, stream=False)
+        
+        # Update state
+        await state.update("task_plan", plan, stream=False)
+        await state.update("intermediate_answers", intermediate, stream=False)
+        await state.update("tools_used_history", tools_used, stream=False)
+        await state.update("completed_steps", completed, stream=False)
+        await state.update("current_step", len(plan), stream=False)
+        await state.update("partial_response", "", stream=False)
         
         return state
     
@@ -601,14 +770,10 @@ Provide a complete answer."""
             
             async def determine_chunk_limit():
                 """Determine optimal chunk limit based on query type."""
-                if any(keyword in question_lower for keyword in [
-                    'chapter', 'section', 'structured notes', 'generate notes', 
-                    'all about', 'overview', 'entire', 'whole', 'complete'
-                ]):
-                    chunk_limit = 60
+                chunk_limit = document_chunk_limit(question_lower)
+                if chunk_limit > 15:
                     print(f"📚 [COMPREHENSIVE RETRIEVAL] Chapter/overview request - retrieving {chunk_limit} chunks")
                 else:
-                    chunk_limit = 15
                     print(f"📄 [STANDARD RETRIEVAL] Specific question - retrieving {chunk_limit} chunks")
                 return chunk_limit
             
@@ -622,26 +787,24 @@ Provide a complete answer."""
             logger.info(f"⚡ Parallel prep: {parallel_time:.1f}ms")
             
             # Retrieve relevant document chunks with context awareness and appropriate limit
-            # OPTIMIZATION: Use asyncio.to_thread for blocking I/O operation
+            # (reuses the lookup started speculatively during routing, if any)
             retrieval_start = time.time()
-            raw_results = await asyncio.to_thread(
-                tool.func,
-                state.get("question", ""),
-                limit=chunk_limit,
-                conversation_history=conversation_history
-            )
+            with stage(STAGE_RETRIEVAL):
+                retrieval = await take_or_run(
+                    state.get("speculation"),
+                    "document_qa",
+                    (question, chunk_limit, conversation_history),
+                    lambda: self._retrieve_documents(tool, question, chunk_limit, conversation_history)
+                )
             retrieval_time = (time.time() - retrieval_start) * 1000
-            logger.info(f"📊 Document retrieval: {retrieval_time:.1f}ms")
-            
-            # Check if retrieval failed
-            failed = any(p in raw_results.lower() for p in [
-                "no relevant content", "no documents found", "not found", "❌",
-                "no documents", "please upload", "vector store"
-            ])
+            logger.info(
+                f"📊 Document retrieval: {retrieval_time:.1f}ms "
+                f"({len(retrieval.chunks)} chunks, {retrieval.strategy}, status={retrieval.status})"
+            )
             
-            if failed:
+            if not retrieval.ok:
                 # Check if this is a "no documents available" situation
-                if "no documents found" in raw_results.lower() or "please upload" in raw_results.lower():
+                if retrieval.status == STATUS_NO_DOCUMENTS:
                     clarification_message = (
                         "📚 No documents found in your library.\n\n"
                         "Would you like me to:\n"
@@ -656,11 +819,14 @@ Provide a complete answer."""
                     await state.update("awaiting_user_choice", True, stream=False)
                     return state
                 
-                await state.update("tool_result", raw_results, stream=True)
+                await state.update("tool_result", retrieval.to_prompt_text(), stream=True)
                 await state.update("tried_document_qa", True, stream=False)
                 await state.update("document_qa_failed", True, stream=False)
                 return state
             
+            # Fit retrieved chunks into the synthesis token budget
+            raw_results = self._pack_retrieval(retrieval, question)
+            
             # Detect request type
             question_lower = state.get("question", "").lower()
             
@@ -1117,20 +1283,15 @@ Answer:"""
                 
                 return final_query
             
-            async def detect_time_sensitivity():
+            async def check_time_sensitivity():
                 """Detect if query is time-sensitive (parallel execution)."""
-                return any(phrase in question_lower for phrase in [
-                    'current time', 'what time', 'time now', 'time in',
-                    'current date', 'what date', 'date today', 'today date',
-                    'current weather', 'weather now', 'weather today',
-                    'latest', 'breaking news', 'just happened'
-                ])
+                return detect_time_sensitivity(search_query)
             
             # Execute analysis in parallel
             start_analysis = time.time()
             final_search_query, is_time_sensitive = await asyncio.gather(
                 analyze_and_reformulate(),
-                detect_time_sensitivity()
+                check_time_sensitivity()
             )
             analysis_time = (time.time() - start_analysis) * 1000
             logger.info(f"⚡ Query analysis (parallel): {analysis_time:.1f}ms")
@@ -1150,7 +1311,13 @@ Answer:"""
             )
             
             search_start = time.time()
-            raw_results = await asyncio.to_thread(tool.func, final_search_query)
+            with stage(STAGE_WEB_SEARCH):
+                raw_results = await take_or_run(
+                    state.get("speculation"),
+                    "web_search",
+                    final_search_query,
+                    lambda: self._search_web(tool, final_search_query)
+                )
             search_time = (time.time() - search_start) * 1000
             logger.info(f"🔍 Web search execution: {search_time:.1f}ms")
             
@@ -1161,6 +1328,9 @@ Answer:"""
             print(raw_results[:1000] if len(raw_results) > 1000 else raw_results)
             print(f"{'='*70}\n")
             
+            # Fit search results into the synthesis token budget
+            raw_results = self._pack_prompt_context(raw_results, question, "Web search")
+            
             # Use the is_time_sensitive flag from parallel analysis
             time_disclaimer = ""
             if is_time_sensitive:
@@ -1250,7 +1420,9 @@ Answer:"""
             # Update state with result and cache it
             await state.update("tool_result", response_content, stream=False)
             
-            # Cache the result for future queries
+            # Cache the answer briefly (self._cache_ttl); the freshness-based
+            # TTLs apply to the raw search results in SearchResultCache only,
+            # since the answer reflects this conversation's context
             self._add_to_cache(cache_key, response_content)
             
             return state
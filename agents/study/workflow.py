@@ -5,6 +5,7 @@ from langgraph.graph import StateGraph, END
 from .state import StudyAgentState
 from .nodes import StudyAgentNodes
 from .routing import StudyAgentRouter
+from utils.patterns.io_steps import dual_node
 
 
 def build_study_workflow(llm, tool_map: dict) -> StateGraph:
@@ -22,19 +23,19 @@ def build_study_workflow(llm, tool_map: dict) -> StateGraph:
     nodes = StudyAgentNodes(llm, tool_map)
     router = StudyAgentRouter(llm)
     
-    # Add nodes
+    # Add nodes (dual_node: blocking under invoke, non-blocking under ainvoke)
     workflow.add_node("detect_complexity", nodes.detect_complexity)
-    workflow.add_node("plan_complex_task", nodes.plan_complex_task)
-    workflow.add_node("execute_plan", nodes.execute_plan)
-    workflow.add_node("synthesize_results", nodes.synthesize_results)
+    workflow.add_node("plan_complex_task", dual_node(nodes.plan_complex_task))
+    workflow.add_node("execute_plan", dual_node(nodes.execute_plan))
+    workflow.add_node("synthesize_results", dual_node(nodes.synthesize_results))
     workflow.add_node("self_reflect", nodes.self_reflect)
-    workflow.add_node("route_question", router.route_question)
+    workflow.add_node("route_question", dual_node(router.route_question))
     
     # Tool execution nodes
-    workflow.add_node("document_qa", nodes._execute_document_qa)
-    workflow.add_node("web_search", nodes._execute_web_search)
-    workflow.add_node("python_repl", nodes._execute_python_repl)
-    workflow.add_node("manim_animation", nodes._execute_manim_animation)
+    workflow.add_node("document_qa", dual_node(nodes._execute_document_qa))
+    workflow.add_node("web_search", dual_node(nodes._execute_web_search))
+    workflow.add_node("python_repl", dual_node(nodes._execute_python_repl))
+    workflow.add_node("manim_animation", dual_node(nodes._execute_manim_animation))
     
     # Format answer node
     def format_answer(state: StudyAgentState) -> StudyAgentState:
@@ -10,9 +10,9 @@ from typing import Optional, Dict, Any, AsyncGenerator
 
 from utils.concurrent_execution import (
     get_task_manager,
-    TaskDurationEstimator,
     TaskType
 )
+from utils.core.constants import MANIM_RENDER_QUALITY
 from utils.monitoring import get_logger
 
 logger = get_logger(__name__)
@@ -33,7 +33,7 @@ class ConcurrentSupervisorMixin:
         """Initialize concurrent supervisor."""
         super().__init__(*args, **kwargs)
         self.task_manager = get_task_manager()
-        self.duration_estimator = TaskDurationEstimator()
+        self.duration_estimator = self.task_manager.estimator
         self._concurrent_mode_enabled = True
     
     async def aquery_stream_concurrent(
@@ -123,7 +123,13 @@ class ConcurrentSupervisorMixin:
             
             # Detect task type from question
             task_type = self.duration_estimator.detect_task_type(question)
-            is_long_running = self.duration_estimator.is_long_running(task_type, question)
+            context = {}
+            if task_type == TaskType.MANIM_ANIMATION:
+                context["quality"] = MANIM_RENDER_QUALITY
+            elif task_type == TaskType.DOCUMENT_QA:
+                from agents.study.streaming_nodes import document_chunk_limit
+                context["chunk_count"] = document_chunk_limit(question)
+            is_long_running = self.duration_estimator.is_long_running(task_type, question, **context)
             
             if is_long_running and self._concurrent_mode_enabled:
                 # Long-running task detected - enable concurrent execution
@@ -1,12 +1,17 @@
 """Supervisor Agent - Clean, modular implementation."""
 
 from typing import Optional, Dict, Any, List
+import asyncio
 import time
 
 from .state import SupervisorState
 from .workflow import build_supervisor_workflow
 from .concurrent_supervisor import ConcurrentSupervisorMixin
 from utils.patterns import StateManager
+from utils.patterns.io_steps import dual_node
+from utils.patterns.speculation import Speculation
+from utils.core.constants import SPECULATIVE_EXECUTION_ENABLED
+from utils.routing import fast_intent_classification
 from utils.config_integration import ConfigManager
 from langgraph.graph import StateGraph, END
 from typing import Literal, TypedDict, Annotated, Optional
@@ -63,9 +68,9 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
                 super().__init__(llm_provider=llm_provider, model_name=model_name)
             except TypeError:
                 # Mixin doesn't accept these params, initialize without them
-                from utils.concurrent_execution import get_task_manager, TaskDurationEstimator
+                from utils.concurrent_execution import get_task_manager
                 self.task_manager = get_task_manager()
-                self.duration_estimator = TaskDurationEstimator()
+                self.duration_estimator = self.task_manager.estimator
                 self._concurrent_mode_enabled = True
         
         # Build workflow
@@ -82,8 +87,8 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
         def grading_agent_node(state: SupervisorState) -> SupervisorState:
             return self.nodes.execute_grading_agent(state, self.grading_agent)
         
-        workflow.add_node("study_agent", study_agent_node)
-        workflow.add_node("grading_agent", grading_agent_node)
+        workflow.add_node("study_agent", dual_node(study_agent_node))
+        workflow.add_node("grading_agent", dual_node(grading_agent_node))
         
         # Add edges from agents to evaluator
         workflow.add_edge("study_agent", "evaluate_result")
@@ -126,7 +131,51 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
             )
         return self._grading_agent
     
-    def query(
+    def _build_initial_state(
+        self,
+        question: str,
+        user_role: str,
+        user_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        student_name: Optional[str] = None,
+        course_id: Optional[str] = None,
+        assignment_id: Optional[str] = None,
+        assignment_name: Optional[str] = None
+    ) -> SupervisorState:
+        """Build the initial graph state (role normalized)."""
+        normalized_role = user_role.upper()
+        if normalized_role in ["PROFESSOR", "INSTRUCTOR"]:
+            normalized_role = "TEACHER"
+        
+        return {
+            "question": question,
+            "user_role": normalized_role,
+            "user_id": user_id,
+            "student_id": student_id,
+            "student_name": student_name,
+            "course_id": course_id,
+            "assignment_id": assignment_id,
+            "assignment_name": assignment_name,
+            "intent": None,
+            "agent_choice": None,
+            "access_denied": False,
+            "routing_confidence": None,
+            "agent_result": None,
+            "agent_used": None,
+            "final_answer": None,
+            "routing_time": None,
+            "agent_execution_time": None,
+            "total_time": None,
+            "routing_success": None,
+            "routing_alternatives": [],
+            "learned_from_history": False,
+            "result_quality": None,
+            "user_satisfaction_predicted": None,
+            "context_used": None,
+            "similar_past_queries": []
+        }
+    
+    async def aquery(
         self,
         question: str,
         user_role: str = "student",
@@ -141,6 +190,10 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
         """
         Main entry point for supervisor routing.
         
+        Runs the supervisor graph and the chosen agent's graph with
+        ``ainvoke``: LLM calls and DB queries are awaited, so a request
+        waiting on them holds no worker thread.
+        
         Args:
             question: User's question
             user_role: User's role (student/teacher/admin)
@@ -156,42 +209,19 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
             Dictionary with answer and metadata
         """
         try:
-            # Normalize role
-            normalized_role = user_role.upper()
-            if normalized_role in ["PROFESSOR", "INSTRUCTOR"]:
-                normalized_role = "TEACHER"
-            
-            # Initial state
-            initial_state: SupervisorState = {
-                "question": question,
-                "user_role": normalized_role,
-                "user_id": user_id,
-                "student_id": student_id,
-                "student_name": student_name,
-                "course_id": course_id,
-                "assignment_id": assignment_id,
-                "assignment_name": assignment_name,
-                "intent": None,
-                "agent_choice": None,
-                "access_denied": False,
-                "routing_confidence": None,
-                "agent_result": None,
-                "agent_used": None,
-                "final_answer": None,
-                "routing_time": None,
-                "agent_execution_time": None,
-                "total_time": None,
-                "routing_success": None,
-                "routing_alternatives": [],
-                "learned_from_history": False,
-                "result_quality": None,
-                "user_satisfaction_predicted": None,
-                "context_used": None,
-                "similar_past_queries": []
-            }
+            initial_state = self._build_initial_state(
+                question,
+                user_role,
+                user_id=user_id,
+                student_id=student_id,
+                student_name=student_name,
+                course_id=course_id,
+                assignment_id=assignment_id,
+                assignment_name=assignment_name
+            )
             
             # Execute graph
-            result = self.graph.invoke(initial_state)
+            result = await self.graph.ainvoke(initial_state)
             
             # Return standardized response
             return {
@@ -215,6 +245,39 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
                 "error": str(e)
             }
     
+    def query(
+        self,
+        question: str,
+        user_role: str = "student",
+        thread_id: str = "default",
+        user_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        student_name: Optional[str] = None,
+        course_id: Optional[str] = None,
+        assignment_id: Optional[str] = None,
+        assignment_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Synchronous query wrapper (CLI and scripts).
+        
+        Args:
+            Same as aquery
+            
+        Returns:
+            Dictionary with answer and metadata
+        """
+        return asyncio.run(self.aquery(
+            question,
+            user_role=user_role,
+            thread_id=thread_id,
+            user_id=user_id,
+            student_id=student_id,
+            student_name=student_name,
+            course_id=course_id,
+            assignment_id=assignment_id,
+            assignment_name=assignment_name
+        ))
+    
     def get_conversation_history(
         self,
         thread_id: str = "default",
@@ -248,42 +311,25 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
         Yields:
             Chunks of the response as they become available
         """
+        speculation = None
         try:
-            # Normalize role
-            normalized_role = user_role.upper()
-            if normalized_role in ["PROFESSOR", "INSTRUCTOR"]:
-                normalized_role = "TEACHER"
-            
-            # Initial state
-            initial_state: SupervisorState = {
-                "question": question,
-                "user_role": normalized_role,
-                "user_id": user_id,
-                "student_id": student_id,
-                "student_name": student_name,
-                "course_id": course_id,
-                "assignment_id": assignment_id,
-                "assignment_name": assignment_name,
-                "intent": None,
-                "agent_choice": None,
-                "access_denied": False,
-                "routing_confidence": None,
-                "agent_result": None,
-                "agent_used": None,
-                "final_answer": None,
-                "routing_time": None,
-                "agent_execution_time": None,
-                "total_time": None,
-                "routing_success": None,
-                "routing_alternatives": [],
-                "learned_from_history": False,
-                "result_quality": None,
-                "user_satisfaction_predicted": None,
-                "context_used": None,
-                "similar_past_queries": [],
+            initial_state = {
+                **self._build_initial_state(
+                    question,
+                    user_role,
+                    user_id=user_id,
+                    student_id=student_id,
+                    student_name=student_name,
+                    course_id=course_id,
+                    assignment_id=assignment_id,
+                    assignment_name=assignment_name
+                ),
                 "streaming": True  # Flag to indicate streaming mode
             }
             
+            # ⚡ SPECULATIVE: Start the likely study tool's lookup while routing runs
+            speculation = self._start_speculation(question)
+            
             # ⚡ OPTIMIZED: Use async methods for non-blocking routing
             state = await self.nodes.aenrich_context(initial_state)
             state = await self.nodes.aclassify_intent(state)
@@ -291,6 +337,8 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
             
             # If access denied, return error
             if state["access_denied"]:
+                if speculation:
+                    speculation.cancel("access denied")
                 yield "⛔ Access Denied. Your role does not have permission to use this feature."
                 return
                 
@@ -299,11 +347,14 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
                 # Use dedicated streaming study agent
                 async for chunk in self.streaming_study_agent.aquery_stream(
                     question=question,
-                    thread_id=thread_id
+                    thread_id=thread_id,
+                    speculation=speculation
                 ):
                     yield chunk
             
             elif state["agent_choice"] == "grading_agent":
+                if speculation:
+                    speculation.cancel("routed to grading agent")
                 # Get streaming response from grading agent
                 if hasattr(self.grading_agent, "aquery_stream"):
                     async for chunk in self.grading_agent.aquery_stream(
@@ -326,6 +377,37 @@ class SupervisorAgent(ConcurrentSupervisorMixin):
             
         except Exception as e:
             yield f"[ERROR] {str(e)}"
+        finally:
+            if speculation:
+                speculation.finish()
+    
+    def _start_speculation(self, question: str) -> Optional[Speculation]:
+        """
+        Speculatively start the study tool the fast router would pick.
+        
+        Skipped when pattern routing already points to grading; otherwise
+        the study agent reuses the result if routing confirms the study
+        route and its inputs match.
+        
+        Args:
+            question: User question
+            
+        Returns:
+            Speculation to pass to the study agent, or None
+        """
+        if not SPECULATIVE_EXECUTION_ENABLED or fast_intent_classification(question) == "GRADE":
+            return None
+        
+        try:
+            from agents.study.fast_streaming_agent import fast_study_route
+            speculation = Speculation()
+            route = fast_study_route(question)
+            if self.streaming_study_agent.nodes.speculate(speculation, route, question):
+                logger.info(f"⚡ Speculatively started {route} while routing")
+            return speculation
+        except Exception as e:
+            logger.warning(f"⚠️ Speculation not started: {e}")
+            return None
     
     def get_capabilities(self, user_role: str) -> Dict[str, list]:
         """Get capabilities available to user role."""
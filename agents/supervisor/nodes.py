@@ -7,6 +7,9 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from .state import SupervisorState
 from utils import fast_intent_classification, calculate_text_similarity
+from utils.cache.llm_cache import completion_cache
+from utils.monitoring.stage_timing import timed_stage, STAGE_ROUTING
+from utils.patterns.io_steps import Step
 
 
 class SupervisorAgentNodes:
@@ -48,6 +51,7 @@ class SupervisorAgentNodes:
             "routing_alternatives": []
         }
     
+    @timed_stage(STAGE_ROUTING)
     def classify_intent(self, state: SupervisorState) -> SupervisorState:
         """Classify user intent (STUDY or GRADE)."""
         question = state["question"]
@@ -98,7 +102,8 @@ Respond with: STUDY or GRADE"""
             HumanMessage(content=f"Request: {question}")
         ]
         
-        response = self.llm.invoke(messages)
+        with completion_cache(call_site="supervisor.classify_intent"):
+            response = self.llm.invoke(messages)
         intent = response.content.strip().upper()
         
         if "GRADE" in intent or "GRADING" in intent:
@@ -141,10 +146,12 @@ Respond with: STUDY or GRADE"""
         }
     
     def execute_study_agent(self, state: SupervisorState, study_agent) -> SupervisorState:
-        """Execute Study Agent."""
+        """Execute Study Agent (step node: ``query`` or ``aquery``)."""
         agent_start_time = time.time()
         
-        answer = study_agent.query(
+        answer = yield Step(
+            study_agent.query,
+            afn=study_agent.aquery,
             question=state["question"],
             user_id=state.get("user_id")
         )
@@ -160,10 +167,12 @@ Respond with: STUDY or GRADE"""
         }
     
     def execute_grading_agent(self, state: SupervisorState, grading_agent) -> SupervisorState:
-        """Execute Grading Agent."""
+        """Execute Grading Agent (step node: ``query`` or ``aquery``)."""
         agent_start_time = time.time()
         
-        answer = grading_agent.query(
+        answer = yield Step(
+            grading_agent.query,
+            afn=grading_agent.aquery,
             question=state["question"],
             professor_id=state.get("user_id"),
             student_id=state.get("student_id"),
@@ -294,6 +303,7 @@ To access grading tools, use: python main.py --role professor"""
         # Run in thread pool since it's CPU-bound
         return await asyncio.to_thread(self.enrich_context, state)
     
+    @timed_stage(STAGE_ROUTING)
     async def aclassify_intent(self, state: SupervisorState) -> SupervisorState:
         """
         ASYNC version: Classify user intent (non-blocking).
@@ -352,7 +362,8 @@ Respond with: STUDY or GRADE"""
         ]
         
         # Use ainvoke for async LLM call
-        response = await self.llm.ainvoke(messages)
+        with completion_cache(call_site="supervisor.classify_intent"):
+            response = await self.llm.ainvoke(messages)
         intent = response.content.strip().upper()
         
         if "GRADE" in intent or "GRADING" in intent:
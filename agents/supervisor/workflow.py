@@ -5,6 +5,7 @@ from langgraph.graph import StateGraph, END
 from .state import SupervisorState
 from .nodes import SupervisorAgentNodes
 from .routing import SupervisorAgentRouter
+from utils.patterns.io_steps import dual_node
 
 
 def build_supervisor_workflow(llm, routing_history: list, routing_patterns: dict) -> StateGraph:
@@ -27,7 +28,7 @@ def build_supervisor_workflow(llm, routing_history: list, routing_patterns: dict
     
     # Add core nodes
     workflow.add_node("enrich_context", nodes.enrich_context)
-    workflow.add_node("classify_intent", nodes.classify_intent)
+    workflow.add_node("classify_intent", dual_node(nodes.classify_intent, afunc=nodes.aclassify_intent))
     workflow.add_node("check_access", nodes.check_access)
     workflow.add_node("deny_access", nodes.access_denied)
     workflow.add_node("evaluate_result", nodes.evaluate_result)
@@ -46,8 +46,8 @@ from api.routers import (
     legacy_auth_router,
     concurrent_query_router,
 )
-from utils.rate_limiting import RateLimitMiddleware
-from utils.monitoring import TracingMiddleware, get_logger, get_correlation_id
+from utils.rate_limiting import RateLimitMiddleware, AdmissionControlMiddleware
+from utils.monitoring import TracingMiddleware, StageTimingMiddleware, get_logger, get_correlation_id
 from utils.errors import BaseApplicationError, get_error_handler
 from utils.auth import get_current_user
 from api.dependencies import require_admin_role
@@ -147,6 +147,7 @@ CORS_EXPOSE_HEADERS = [
     "X-RateLimit-Reset",
     "X-Total-Count",
     "X-CSRF-Token",  # Allow client to read CSRF token
+    "Server-Timing",  # Stage timing breakdown (development)
 ]
 
 app.add_middleware(
@@ -187,8 +188,8 @@ app.add_middleware(
 app.add_middleware(
     AuthGatewayMiddleware,
     exempt_paths=[
-        # Health and docs
-        "/health", "/", "/docs", "/redoc", "/openapi.json",
+        # Health, probes and docs
+        "/health", "/ready", "/live", "/", "/docs", "/redoc", "/openapi.json",
         # Auth endpoints (both prefixes)
         "/auth/google/callback", "/auth/google/callback/", "/auth/health", "/auth/error",
         "/api/auth/google/callback", "/api/auth/google/callback/",
@@ -200,6 +201,22 @@ app.add_middleware(
     ]
 )
 
+# Admission Control (inside rate limiting, so throttled clients never take a slot;
+# outside auth, so shed requests cost no session lookup)
+def _db_pool_utilization() -> float:
+    """Database pool utilization for admission control."""
+    from database.monitoring import get_pool_monitor
+    return get_pool_monitor().get_current_utilization()
+
+
+if settings.admission_control_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        enabled=True,
+        utilization_provider=_db_pool_utilization,
+    )
+    logger.info("✅ Admission control enabled")
+
 # Rate Limiting
 if settings.rate_limit_enabled:
     app.add_middleware(
@@ -213,6 +230,12 @@ if settings.rate_limit_enabled:
         f"{settings.rate_limit_per_hour}/hour"
     )
 
+# Per-request stage timing (added before tracing so stage events land on the request span)
+app.add_middleware(
+    StageTimingMiddleware,
+    server_timing=settings.is_development,
+)
+
 # Distributed Tracing
 if settings.enable_tracing if hasattr(settings, 'enable_tracing') else False:
     app.add_middleware(TracingMiddleware)
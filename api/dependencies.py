@@ -346,3 +346,43 @@ async def pagination_params(
         "offset": (page - 1) * page_size
     }
 
+
+async def cursor_pagination_params(
+    cursor: Optional[str] = None,
+    page_size: int = 50,
+    include_total: bool = False,
+    max_page_size: int = 100
+) -> dict:
+    """
+    Get keyset (cursor) pagination parameters.
+    
+    Args:
+        cursor: Opaque cursor from a previous page's next_cursor
+        page_size: Items per page
+        include_total: Whether to return an (estimated) total count
+        max_page_size: Maximum allowed page size
+        
+    Returns:
+        Cursor pagination parameters dict
+        
+    Raises:
+        HTTPException: If parameters are invalid
+    """
+    if page_size < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Page size must be >= 1"
+        )
+    
+    if page_size > max_page_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Page size must be <= {max_page_size}"
+        )
+    
+    return {
+        "cursor": cursor or None,
+        "page_size": page_size,
+        "include_total": include_total
+    }
+
@@ -3,132 +3,125 @@ Application lifespan management with full agent initialization.
 
 This module handles the startup and shutdown of the FastAPI application,
 including database initialization, supervisor agent setup, and all ML components.
+Startup runs through the startup orchestrator: independent components
+initialize concurrently and readiness is reported by ``/ready``.
 """
-import logging
 import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from config.settings import settings
+from utils.core.startup import StartupOrchestrator, get_startup_orchestrator
 from utils.monitoring import get_logger
 
 logger = get_logger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Full application lifespan manager with complete AI/ML initialization.
+def _init_database():
+    """Create tables and verify the connection."""
+    from database import init_db, check_db_connection
+    init_db()
+    if not check_db_connection():
+        raise ConnectionError("database connection check failed")
+
+
+def _init_supervisor():
+    """Build the supervisor agent (sub-agents and tools load on first use)."""
+    # Workaround for LangChain tracing import issue
+    os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
     
-    This version initializes all system components including:
-    - Database connections
-    - Supervisor agent with study and grading capabilities
-    - Vector store for RAG
-    - Caching systems
-    - Performance monitoring
-    """
-    logger.info("🚀 Starting Multi-Agent Study & Grading System")
+    from agents.supervisor.core import SupervisorAgent
+    from api.dependencies import get_supervisor
     
-    # =========================================================================
-    # Database Initialization
-    # =========================================================================
-    try:
-        from database import init_db, check_db_connection
-        init_db()
-        if check_db_connection():
-            logger.info("✅ Database connection established")
-        else:
-            logger.warning("⚠️  Database connection check failed")
-    except ImportError:
-        logger.warning("⚠️  Database modules not available")
-    except Exception as e:
-        logger.warning(f"⚠️  Database initialization failed: {e}")
-    
-    # =========================================================================
-    # Vector Store Initialization (for RAG)
-    # =========================================================================
-    try:
-        from database.operations.document_processing import get_document_processor
-        doc_processor = get_document_processor()
-        logger.info("✅ Vector store initialized for document Q&A")
-    except Exception as e:
-        logger.warning(f"⚠️  Vector store initialization failed: {e}")
+    # Get LLM provider from environment
+    llm_provider = os.getenv("LLM_PROVIDER", "gemini")
+    logger.info(f"🤖 Initializing Supervisor Agent with {llm_provider.upper()}")
     
-    # =========================================================================
-    # Supervisor Agent Initialization
-    # =========================================================================
     try:
-        # Workaround for LangChain tracing import issue
-        import os
-        os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
-        
-        logger.info("🔄 Importing SupervisorAgent...")
-        from agents.supervisor.core import SupervisorAgent
-        from api.dependencies import get_supervisor
-        
-        # Get LLM provider from environment
-        llm_provider = os.getenv("LLM_PROVIDER", "gemini")
-        logger.info(f"🤖 Initializing Supervisor Agent with {llm_provider.upper()}")
-        
-        # Initialize supervisor
-        logger.info("🔄 Creating SupervisorAgent instance...")
         supervisor = SupervisorAgent(llm_provider=llm_provider)
-        
-        logger.info("🔄 Setting supervisor in dependency...")
-        # Set supervisor in dependency
-        get_supervisor.set_supervisor(supervisor)
-        
-        logger.info("✅ Supervisor Agent initialized successfully")
-        logger.info("   → Study Agent: Ready for research, Q&A, and animations")
-        logger.info("   → Grading Agent: Ready for essay grading, code review")
-        
     except ImportError as e:
-        import traceback
         if "tracing_enabled" in str(e):
             logger.error("❌ LangChain version incompatibility detected")
-            logger.error(f"   → Error: {e}")
-            logger.error(f"   → Traceback: {traceback.format_exc()}")
             logger.error("   → Try: pip install --upgrade langchain-core langgraph")
             logger.error("   → Or set: LANGCHAIN_TRACING_V2=false in .env")
-        else:
-            logger.error(f"❌ Supervisor Agent initialization failed: {e}")
-            logger.error(f"   → Traceback: {traceback.format_exc()}")
-        logger.error("   Application will start but AI features will be unavailable")
-    except Exception as e:
-        import traceback
-        logger.error(f"❌ Supervisor Agent initialization failed: {e}")
-        logger.error(f"   → Traceback: {traceback.format_exc()}")
-        logger.error("   Application will start but AI features will be unavailable")
+        # Required for readiness: a missing dependency is a failure, not an optional module
+        raise RuntimeError(f"SupervisorAgent import failed: {e}") from e
+    get_supervisor.set_supervisor(supervisor)
+
+
+def _init_cache():
+    if settings.cache_enabled:
+        from utils.cache import get_cache_optimizer
+        get_cache_optimizer()
+
+
+def _init_performance_monitor():
+    from utils.routing.performance import get_performance_monitor
+    get_performance_monitor()
+
+
+def _init_query_learner():
+    """Replay the query pattern log off the request path."""
+    from utils.ml import get_query_learner
+    get_query_learner()
+
+
+async def _init_task_store():
+    """Renew this instance's lease on its background tasks and fail orphaned ones."""
+    from utils.scaling import get_task_store
+    get_task_store().start()
+
+
+def register_startup_components(orchestrator: StartupOrchestrator):
+    """
+    Register the components initialized at startup.
     
-    # =========================================================================
-    # Cache Initialization
-    # =========================================================================
-    try:
-        if settings.cache_enabled:
-            from utils.cache import get_cache_optimizer
-            cache_optimizer = get_cache_optimizer()
-            logger.info("✅ Query caching enabled")
-    except Exception as e:
-        logger.warning(f"⚠️  Cache initialization failed: {e}")
+    The database and the supervisor gate readiness; the rest warm up in
+    parallel without holding it. Docling, the Manim installation check and
+    the rubric store are initialized on first use.
     
-    # =========================================================================
-    # Performance Monitoring
-    # =========================================================================
-    try:
-        from utils.routing.performance import get_performance_monitor
-        perf_monitor = get_performance_monitor()
-        logger.info("✅ Performance monitoring initialized")
-    except Exception as e:
-        logger.warning(f"⚠️  Performance monitoring initialization failed: {e}")
+    Args:
+        orchestrator: Orchestrator to register with
+    """
+    orchestrator.add("database", _init_database)
+    orchestrator.add("supervisor", _init_supervisor)
+    orchestrator.add("cache", _init_cache, required=False)
+    orchestrator.add("performance_monitor", _init_performance_monitor, required=False)
+    orchestrator.add("query_learner", _init_query_learner, required=False)
+    orchestrator.add("task_store", _init_task_store, required=False)
+    for name in ("document_processor", "docling", "manim", "rubric_store"):
+        orchestrator.add_lazy(name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan manager with parallel, readiness-gated startup.
+    
+    The API serves (``/live``) as soon as the lifespan yields, while the
+    components initialize concurrently in the background:
+    - Database connections (required for readiness)
+    - Supervisor agent with study and grading capabilities (required)
+    - Caching systems
+    - Performance monitoring
+    - Query pattern history
+    - Background task store lease (fails tasks orphaned by stopped instances)
+    """
+    logger.info("🚀 Starting Multi-Agent Study & Grading System")
+    
+    orchestrator = get_startup_orchestrator()
+    register_startup_components(orchestrator)
+    orchestrator.start()
     
-    logger.info("✅ Multi-Agent Study & Grading System ready")
     logger.info("📚 Document upload: POST /documents/upload")
     logger.info("💬 Query endpoint: POST /query/")
-    logger.info("📝 Grading endpoint: POST /grading/grade")
+    logger.info("🩺 Readiness: GET /ready (startup report: GET /health/startup)")
     
     yield
     
+    await orchestrator.stop()
+    
     # =========================================================================
     # Cleanup
     # =========================================================================
@@ -144,8 +137,48 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Database cleanup warning: {e}")
     
+    # Flush learned query patterns (background log writer)
+    try:
+        from utils.ml import close_query_learner
+        close_query_learner()
+        logger.info("✅ Query patterns flushed")
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning(f"Query learner flush warning: {e}")
+    
+    # Flush pending user profile writes (write-behind store)
+    try:
+        from utils.ml import close_profile_manager
+        close_profile_manager()
+        logger.info("✅ User profiles flushed")
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning(f"User profile flush warning: {e}")
+    
+    # Release background tasks (marked failed: they stop with this instance)
+    try:
+        from utils.scaling import get_task_store
+        await get_task_store().close()
+        logger.info("✅ Background task store released")
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning(f"Task store cleanup warning: {e}")
+    
+    # Close pooled web search connections
+    try:
+        from tools.study.search_client import close_search_client
+        close_search_client()
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning(f"Web search client cleanup warning: {e}")
+    
     # Agent cleanup
     try:
+        from api.dependencies import get_supervisor
         get_supervisor.supervisor = None
         logger.info("✅ Agents cleaned up")
     except Exception as e:
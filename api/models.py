@@ -161,7 +161,7 @@ class ConversationHistoryResponse(BaseModel):
 class GradingHistoryItem(BaseModel):
     """Single grading history item."""
     
-    id: int
+    id: str
     session_id: str
     student_id: str
     student_name: Optional[str]
@@ -178,7 +178,10 @@ class GradingHistoryResponse(BaseModel):
     
     professor_id: str
     history: List[GradingHistoryItem]
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = False
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class RubricTemplate(BaseModel):
@@ -210,6 +213,13 @@ class MLProfileResponse(BaseModel):
     learning_stats: Dict[str, Any]
 
 
+class MLProfileBatchResponse(BaseModel):
+    """Bulk ML user profile response."""
+    
+    profiles: List[MLProfileResponse]
+    missing: List[str] = Field(default_factory=list)
+
+
 class MLStatsResponse(BaseModel):
     """ML statistics response."""
     
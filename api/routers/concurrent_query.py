@@ -156,7 +156,7 @@ async def get_task_status(task_id: str):
     - Estimated completion time
     """
     task_manager = get_task_manager()
-    task_status = task_manager.get_task_status(task_id)
+    task_status = await task_manager.aget_task_status(task_id)
     
     if not task_status:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
@@ -203,7 +203,7 @@ async def wait_for_task(
     
     if result is None:
         # Check if task exists
-        task_status = task_manager.get_task_status(task_id)
+        task_status = await task_manager.aget_task_status(task_id)
         if not task_status:
             raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
         elif task_status["status"] == "failed":
@@ -231,6 +231,8 @@ async def get_task_statistics():
     - Total completed tasks
     - Average task duration by type
     - Success/failure rates
+    - Running and queued tasks per type
+    - Duration model p50/p90 per type
     """
     task_manager = get_task_manager()
     
@@ -268,6 +270,8 @@ async def get_task_statistics():
         "successful_tasks": successful,
         "failed_tasks": failed,
         "success_rate": success_rate,
-        "average_duration_by_type": avg_durations
+        "average_duration_by_type": avg_durations,
+        "scheduler": task_manager.scheduler.get_stats(),
+        "duration_model": task_manager.estimator.get_stats()
     }
 
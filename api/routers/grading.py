@@ -10,7 +10,8 @@ from api.models import (
     RubricListResponse,
     ProfessorFeedbackRequest
 )
-from api.dependencies import require_teacher_role, get_optional_db, pagination_params
+from api.dependencies import require_teacher_role, get_optional_db, cursor_pagination_params
+from database.operations.pagination import InvalidCursorError
 from utils.monitoring import get_logger
 from config import settings
 
@@ -23,10 +24,14 @@ async def get_grading_history(
     professor_id: str,
     _: str = Depends(require_teacher_role),
     db=Depends(get_optional_db),
-    pagination: dict = Depends(pagination_params)
+    pagination: dict = Depends(cursor_pagination_params)
 ):
     """
-    Get grading history for a professor.
+    Get grading history for a professor, newest first.
+    
+    Cursor-paginated: pass the returned `next_cursor` as `cursor` to fetch
+    the next page. `total` is only returned when `include_total=true` and
+    may be a planner estimate (`total_estimated`).
     
     **Requires:** Teacher or Admin role
     """
@@ -37,37 +42,47 @@ async def get_grading_history(
         )
     
     try:
-        from database.operations import get_grading_history
+        from database.operations import get_grading_history_page
         
-        history_items = get_grading_history(
+        page = get_grading_history_page(
             db,
             professor_id,
-            limit=pagination["page_size"],
-            offset=pagination["offset"]
+            page_size=pagination["page_size"],
+            cursor=pagination["cursor"],
+            include_total=pagination["include_total"]
         )
         
         history = [
             GradingHistoryItem(
-                id=item.id,
-                session_id=item.session_id,
+                id=str(item.id),
+                session_id=str(item.id),
                 student_id=item.student_id,
                 student_name=item.student_name,
                 assignment_id=item.assignment_id,
                 assignment_name=item.assignment_name,
-                rubric_id=item.rubric_id,
-                grade=item.grade,
-                feedback=item.feedback,
+                rubric_id=str(item.rubric_id) if item.rubric_id else None,
+                grade=(
+                    item.professor_adjusted_score
+                    if item.professor_adjusted_score is not None
+                    else item.score
+                ),
+                feedback=item.professor_feedback,
                 created_at=item.created_at
             )
-            for item in history_items
+            for item in page.items
         ]
         
         return GradingHistoryResponse(
             professor_id=professor_id,
             history=history,
-            total=len(history)
+            total=page.total,
+            total_estimated=page.total_estimated,
+            next_cursor=page.next_cursor,
+            has_more=page.has_more
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
     except Exception as e:
         logger.error(f"Failed to get grading history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
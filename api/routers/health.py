@@ -1,11 +1,13 @@
 """Health Check Router - System status endpoints."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
 import os
 
 from api.models import HealthResponse
 from api.dependencies import get_supervisor, get_optional_db
+from utils.core.startup import get_startup_orchestrator
 from utils.monitoring import get_metrics
 from config import settings
 
@@ -32,9 +34,7 @@ async def root():
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(
-    supervisor=Depends(get_supervisor)
-):
+async def health_check():
     """
     Health check endpoint.
     
@@ -62,7 +62,7 @@ async def health_check(
     
     return HealthResponse(
         status="healthy",
-        supervisor_ready=supervisor is not None,
+        supervisor_ready=get_supervisor.supervisor is not None,
         database_available=database_available,
         ml_features_available=ml_available,
         documents_loaded=documents_loaded,
@@ -136,18 +136,39 @@ async def get_prometheus_metrics():
 
 
 @router.get("/ready")
-async def readiness_check(supervisor=Depends(get_supervisor)):
+async def readiness_check():
     """
     Kubernetes readiness probe.
     
-    Returns 200 if service is ready to accept traffic.
+    Returns 200 once every required startup component (database, supervisor
+    agent) is initialized, 503 while startup is in progress or a failed
+    required component is being retried.
     """
-    if supervisor is None:
-        return {"ready": False}, 503
+    orchestrator = get_startup_orchestrator()
+    ready = orchestrator.ready and get_supervisor.supervisor is not None
+    if not ready:
+        report = orchestrator.get_report()
+        waiting = {
+            name: entry["status"]
+            for name, entry in report["components"].items()
+            if entry["required"] and entry["status"] != "ready"
+        }
+        return JSONResponse(status_code=503, content={"ready": False, "waiting_for": waiting})
     
     return {"ready": True}
 
 
+@router.get("/health/startup", tags=["Monitoring"])
+async def startup_report():
+    """
+    Startup timing report.
+    
+    Returns status and initialization time per component, including lazy
+    components (Docling, Manim, rubric store) once first used.
+    """
+    return get_startup_orchestrator().get_report()
+
+
 @router.get("/live")
 async def liveness_check():
     """
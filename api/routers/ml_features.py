@@ -1,9 +1,12 @@
 """ML Features Router - Machine learning and adaptive features endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from api.models import (
     FeedbackRequest,
+    MLProfileBatchResponse,
     MLProfileResponse,
     MLStatsResponse
 )
@@ -13,6 +16,9 @@ from utils.monitoring import get_logger
 logger = get_logger(__name__)
 router = APIRouter(prefix="/ml", tags=["ML Features"])
 
+# Maximum user IDs accepted by the bulk profile endpoint
+MAX_BULK_PROFILES = 200
+
 
 @router.post("/feedback")
 async def submit_feedback(feedback: FeedbackRequest):
@@ -96,6 +102,44 @@ async def get_user_profile(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/profiles", response_model=MLProfileBatchResponse)
+async def get_user_profiles(user_ids: List[str] = Query(..., min_length=1, description="User IDs to fetch")):
+    """
+    Get ML-based profiles for many users at once.
+    
+    Cached profiles are served from memory; the rest are loaded with a
+    single bulk query. Unknown users are listed in ``missing``.
+    """
+    if len(user_ids) > MAX_BULK_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_PROFILES} user_ids per request"
+        )
+    
+    try:
+        from utils.ml import get_user_profile_manager
+        
+        manager = get_user_profile_manager()
+        profiles = manager.get_profiles(user_ids)
+        
+        return MLProfileBatchResponse(
+            profiles=[
+                MLProfileResponse(user_id=user_id, **manager.profile_analytics(profile))
+                for user_id, profile in profiles.items()
+            ],
+            missing=[user_id for user_id in dict.fromkeys(user_ids) if user_id not in profiles]
+        )
+        
+    except ImportError:
+        raise HTTPException(
+            status_code=503,
+            detail="ML features not available"
+        )
+    except Exception as e:
+        logger.error(f"Failed to get profiles: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/stats", response_model=MLStatsResponse)
 async def get_ml_stats():
     """
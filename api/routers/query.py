@@ -3,14 +3,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import Optional
-import asyncio
 import json
+import time
 
 from api.models import QueryRequest, QueryResponse, ConversationHistoryResponse
 from api.dependencies import get_supervisor, get_or_create_correlation_id
 from utils.monitoring import get_logger, track_query, get_metrics
 from utils.errors import handle_errors
 from utils.api.streaming import format_supervisor_sse_stream, get_sse_headers
+from utils.routing.performance import get_performance_monitor
 from config import settings
 
 logger = get_logger(__name__)
@@ -43,9 +44,9 @@ async def query_supervisor(
     )
     
     # Query supervisor
+    started = time.perf_counter()
     try:
-        answer = await asyncio.to_thread(
-            supervisor.query,
+        answer = await supervisor.aquery(
             question=request.question,
             thread_id=request.thread_id,
             user_role=request.user_role,
@@ -57,18 +58,20 @@ async def query_supervisor(
             assignment_name=request.assignment_name
         )
         
+        # Extract answer from response dict
+        answer_text = answer.get("answer", str(answer)) if isinstance(answer, dict) else str(answer)
+        agent_used = answer.get("agent", None) if isinstance(answer, dict) else None
+        
         # Track metrics
+        duration = time.perf_counter() - started
         metrics = get_metrics()
         metrics.track_request(
             method="POST",
             endpoint="/query",
             status_code=200,
-            duration=0.0  # Would need to track actual duration
+            duration=duration
         )
-        
-        # Extract answer from response dict
-        answer_text = answer.get("answer", str(answer)) if isinstance(answer, dict) else str(answer)
-        agent_used = answer.get("agent", None) if isinstance(answer, dict) else None
+        get_performance_monitor().record_latency(duration, agent=agent_used, route="/query")
         
         return QueryResponse(
             answer=answer_text,
@@ -61,6 +61,10 @@ class Settings(BaseSettings):
     rate_limit_enabled: bool = Field(default=True, description="Enable rate limiting")
     rate_limit_per_minute: int = Field(default=60, ge=1, description="Requests per minute")
     rate_limit_per_hour: int = Field(default=1000, ge=1, description="Requests per hour")
+    admission_control_enabled: bool = Field(
+        default=True,
+        description="Shed query load with 503 + Retry-After when latency or the database pool saturate"
+    )
     
     # ==================== Performance Configuration ====================
     max_concurrent_requests: int = Field(default=100, ge=1, description="Max concurrent requests")
@@ -68,6 +72,10 @@ class Settings(BaseSettings):
     max_context_tokens: int = Field(default=500, ge=50, description="Max context tokens")
     max_agent_iterations: int = Field(default=5, ge=1, le=10, description="Max agent iterations")
     max_grading_iterations: int = Field(default=3, ge=1, le=5, description="Max grading iterations")
+    task_timings_dir: Optional[str] = Field(
+        default=None,
+        description="Directory recording background task timings for the duration model (unset: in memory only)"
+    )
     
     # ==================== Document Processing ====================
     documents_dir: str = Field(default="documents", description="Documents directory")
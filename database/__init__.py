@@ -44,6 +44,7 @@ from .operations import (
     get_or_create_user,
     save_grading_session,
     get_grading_history,
+    get_grading_history_page,
     update_grading_session,
     get_rubric_templates,
     save_rubric_template,
@@ -54,11 +55,13 @@ from .operations import (
     log_audit,
     log_audit_action,
     get_audit_logs,
+    get_audit_logs_page,
     get_grading_statistics,
     create_or_update_statistics,
     
     # RAG operations
     store_document_vectors,
+    get_structured_chunks,
     search_similar_documents,
     update_document_feedback,
     delete_document_vectors,
@@ -69,6 +72,7 @@ from .operations import (
     analyze_grade_exceptions,
     log_rag_query,
     get_rag_query_logs,
+    get_rag_query_logs_page,
     analyze_rag_performance,
 )
 
@@ -112,6 +116,7 @@ __all__ = [
     'get_or_create_user',
     'save_grading_session',
     'get_grading_history',
+    'get_grading_history_page',
     'update_grading_session',
     'get_rubric_templates',
     'save_rubric_template',
@@ -122,11 +127,13 @@ __all__ = [
     'log_audit',
     'log_audit_action',
     'get_audit_logs',
+    'get_audit_logs_page',
     'get_grading_statistics',
     'create_or_update_statistics',
     
     # RAG operations
     'store_document_vectors',
+    'get_structured_chunks',
     'search_similar_documents',
     'update_document_feedback',
     'delete_document_vectors',
@@ -137,6 +144,7 @@ __all__ = [
     'analyze_grade_exceptions',
     'log_rag_query',
     'get_rag_query_logs',
+    'get_rag_query_logs_page',
     'analyze_rag_performance',
     
     # Feature flags
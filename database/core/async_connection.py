@@ -10,6 +10,7 @@ from sqlalchemy.pool import AsyncAdaptedQueuePool
 import logging
 
 from config.settings import settings
+from database.core.async_engine import TimedAsyncSession
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ async_engine = create_async_engine(
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
-    class_=AsyncSession,
+    class_=TimedAsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
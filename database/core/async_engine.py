@@ -25,10 +25,39 @@ from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 from sqlalchemy import text, event
 
 from config import settings
+from utils.monitoring.stage_timing import stage, STAGE_DB
 
 logger = logging.getLogger(__name__)
 
 
+class TimedAsyncSession(AsyncSession):
+    """AsyncSession whose round trips are timed as the DB stage of profiled requests."""
+    
+    async def execute(self, *args, **kwargs):
+        with stage(STAGE_DB):
+            return await super().execute(*args, **kwargs)
+    
+    async def scalar(self, *args, **kwargs):
+        with stage(STAGE_DB):
+            return await super().scalar(*args, **kwargs)
+    
+    async def scalars(self, *args, **kwargs):
+        with stage(STAGE_DB):
+            return await super().scalars(*args, **kwargs)
+    
+    async def get(self, *args, **kwargs):
+        with stage(STAGE_DB):
+            return await super().get(*args, **kwargs)
+    
+    async def flush(self, *args, **kwargs):
+        with stage(STAGE_DB):
+            return await super().flush(*args, **kwargs)
+    
+    async def commit(self):
+        with stage(STAGE_DB):
+            return await super().commit()
+
+
 class AsyncDatabaseEngine:
     """Async database engine manager with connection pooling."""
     
@@ -103,7 +132,7 @@ class AsyncDatabaseEngine:
         if self._session_factory is None:
             self._session_factory = async_sessionmaker(
                 self.engine,
-                class_=AsyncSession,
+                class_=TimedAsyncSession,
                 expire_on_commit=False,
                 autoflush=False,
                 autocommit=False,
@@ -0,0 +1,175 @@
+"""
+Database Migration: Add Document Structure Columns
+
+Adds chapter/section/heading/page-range columns to document_vectors and
+indexes them so chapter-, section- and page-scoped questions are an exact
+index range lookup in reading order (see utils.rag.document_structure).
+
+Existing documents are backfilled by replaying the structure detector over
+their chunks in chunk_index order.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+from database.core.async_engine import async_db_engine
+from utils.monitoring import get_logger
+from utils.rag.document_structure import annotate_chunk_structure
+
+logger = get_logger(__name__)
+
+
+STRUCTURE_COLUMNS = [
+    ("chapter_number", "INTEGER"),
+    ("chapter_title", "VARCHAR(500)"),
+    ("section_number", "VARCHAR(50)"),
+    ("section_title", "VARCHAR(500)"),
+    ("heading", "VARCHAR(500)"),
+    ("page_start", "INTEGER"),
+    ("page_end", "INTEGER"),
+]
+
+STRUCTURE_INDEXES = [
+    ("idx_doc_chapter_order", "chapter_number, document_id, chunk_index"),
+    ("idx_doc_section_order", "section_number, document_id, chunk_index"),
+    ("idx_doc_page_range", "document_id, page_start, page_end"),
+]
+
+
+async def add_document_structure_columns() -> bool:
+    """
+    Add structure columns and indexes to document_vectors.
+
+    Returns:
+        True if successful
+    """
+    try:
+        async with async_db_engine.engine.begin() as conn:
+            logger.info("📋 Adding structure columns to document_vectors...")
+
+            for column, column_type in STRUCTURE_COLUMNS:
+                await conn.execute(text(
+                    f"ALTER TABLE document_vectors ADD COLUMN IF NOT EXISTS {column} {column_type}"
+                ))
+
+            for index_name, columns in STRUCTURE_INDEXES:
+                await conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON document_vectors ({columns})"
+                ))
+
+        logger.info("✅ Structure columns and indexes created")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        return False
+
+
+async def backfill_document_structure() -> int:
+    """
+    Detect structure for documents indexed before this migration.
+
+    Returns:
+        Number of chunks updated
+    """
+    updated = 0
+
+    async with async_db_engine.engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT DISTINCT document_id FROM document_vectors
+            WHERE chapter_number IS NULL AND section_number IS NULL
+              AND heading IS NULL AND page_start IS NULL
+        """))
+        document_ids = [row[0] for row in result.fetchall()]
+
+    logger.info(f"📋 Backfilling structure for {len(document_ids)} documents...")
+
+    for document_id in document_ids:
+        async with async_db_engine.engine.begin() as conn:
+            result = await conn.execute(
+                text("""
+                    SELECT id, content FROM document_vectors
+                    WHERE document_id = :document_id
+                    ORDER BY chunk_index
+                """),
+                {"document_id": document_id}
+            )
+            chunks = [{"id": row[0], "content": row[1]} for row in result.fetchall()]
+            if not chunks:
+                continue
+            annotate_chunk_structure(chunks)
+
+            await conn.execute(
+                text("""
+                    UPDATE document_vectors SET
+                        chapter_number = :chapter_number,
+                        chapter_title = :chapter_title,
+                        section_number = :section_number,
+                        section_title = :section_title,
+                        heading = :heading,
+                        page_start = :page_start,
+                        page_end = :page_end
+                    WHERE id = :id
+                """),
+                [{"id": chunk["id"], **chunk["structure"]} for chunk in chunks]
+            )
+            updated += len(chunks)
+
+    logger.info(f"✅ Backfilled structure for {updated} chunks")
+    return updated
+
+
+async def rollback_migration() -> bool:
+    """Rollback the migration (drop indexes and columns)."""
+    logger.warning("⚠️  Rolling back document structure columns...")
+
+    try:
+        async with async_db_engine.engine.begin() as conn:
+            for index_name, _ in STRUCTURE_INDEXES:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            for column, _ in STRUCTURE_COLUMNS:
+                await conn.execute(text(f"ALTER TABLE document_vectors DROP COLUMN IF EXISTS {column}"))
+
+        logger.info("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+async def run_migration(backfill: bool = True) -> bool:
+    """Add columns and indexes, then backfill existing documents."""
+    if not await add_document_structure_columns():
+        return False
+    if backfill:
+        await backfill_document_structure()
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Document Structure Columns Migration")
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Rollback the migration (drop columns and indexes)"
+    )
+    parser.add_argument(
+        "--skip-backfill",
+        action="store_true",
+        help="Only add columns and indexes"
+    )
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        asyncio.run(rollback_migration())
+    else:
+        asyncio.run(run_migration(backfill=not args.skip_backfill))
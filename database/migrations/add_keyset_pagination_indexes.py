@@ -0,0 +1,116 @@
+"""
+Database Migration: Add Keyset Pagination Indexes
+
+Creates the composite (filter, created_at, id) indexes that turn the
+grading history, audit log and RAG query log listings into index range
+scans for cursor-based pagination.
+
+Indexes are built CONCURRENTLY so existing tables stay writable.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+from database.core.async_engine import async_db_engine
+from utils.monitoring import get_logger
+
+logger = get_logger(__name__)
+
+
+# (index name, CREATE statement body)
+KEYSET_INDEXES = [
+    (
+        "idx_professor_created_id",
+        """ON grading_sessions (professor_id, created_at, id)
+           INCLUDE (student_id, student_name, assignment_id, assignment_name,
+                    grading_type, score, rubric_id)""",
+    ),
+    (
+        "idx_audit_user_created_id",
+        "ON audit_logs (user_id, created_at, id)",
+    ),
+    (
+        "idx_audit_created_id",
+        "ON audit_logs (created_at, id)",
+    ),
+    (
+        "idx_rag_log_user_created_id",
+        "ON rag_query_logs (user_id, created_at, id)",
+    ),
+    (
+        "idx_rag_log_created_id",
+        "ON rag_query_logs (created_at, id)",
+    ),
+]
+
+
+async def create_keyset_indexes() -> bool:
+    """
+    Create keyset pagination indexes.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so each
+    statement runs on an AUTOCOMMIT connection.
+
+    Returns:
+        True if successful
+    """
+    try:
+        async with async_db_engine.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            for name, body in KEYSET_INDEXES:
+                logger.info(f"📋 Creating index {name}...")
+                await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {body}"))
+
+            # Refresh planner statistics used for estimated totals
+            for table in ("grading_sessions", "audit_logs", "rag_query_logs"):
+                await conn.execute(text(f"ANALYZE {table}"))
+
+        logger.info("✅ All keyset pagination indexes created")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        return False
+
+
+async def rollback_migration() -> bool:
+    """Rollback the migration (drop indexes)."""
+    logger.warning("⚠️  Rolling back keyset pagination indexes...")
+
+    try:
+        async with async_db_engine.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            for name, _ in KEYSET_INDEXES:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+        logger.info("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Keyset Pagination Indexes Migration")
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Rollback the migration (drop indexes)"
+    )
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        asyncio.run(rollback_migration())
+    else:
+        asyncio.run(create_keyset_indexes())
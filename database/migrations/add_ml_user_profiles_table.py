@@ -0,0 +1,90 @@
+"""
+Database Migration: Add ML User Profiles Table
+
+Creates the ml_user_profiles table used by the write-behind user profile
+store (utils.ml.profile_store). Profiles are upserted in bulk, keyed by
+user_id, with the full learned profile in a JSONB column.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+from database.core.async_engine import async_db_engine
+from utils.monitoring import get_logger
+
+logger = get_logger(__name__)
+
+
+async def create_ml_user_profiles_table() -> bool:
+    """
+    Create ml_user_profiles table and indexes.
+
+    Returns:
+        True if successful
+    """
+    try:
+        async with async_db_engine.engine.begin() as conn:
+            logger.info("📋 Creating ml_user_profiles table...")
+
+            await conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS ml_user_profiles (
+                    user_id VARCHAR(255) PRIMARY KEY,
+                    role VARCHAR(50) NOT NULL DEFAULT 'student',
+                    profile_data JSONB NOT NULL,
+                    interactions_count INTEGER NOT NULL DEFAULT 0,
+                    satisfaction_score DOUBLE PRECISION NOT NULL DEFAULT 0.5,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_ml_profile_role_updated
+                ON ml_user_profiles (role, updated_at)
+            """))
+
+        logger.info("✅ ml_user_profiles table created")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        return False
+
+
+async def rollback_migration() -> bool:
+    """Rollback the migration (drop table)."""
+    logger.warning("⚠️  Rolling back ml_user_profiles table...")
+
+    try:
+        async with async_db_engine.engine.begin() as conn:
+            await conn.execute(text("DROP TABLE IF EXISTS ml_user_profiles CASCADE"))
+
+        logger.info("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Rollback failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ML User Profiles Table Migration")
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Rollback the migration (drop table)"
+    )
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        asyncio.run(rollback_migration())
+    else:
+        asyncio.run(create_ml_user_profiles_table())
@@ -12,7 +12,7 @@ Organized by purpose:
 from .base import Base
 
 # User models
-from .user import User, UserLearningProfile
+from .user import User, UserLearningProfile, MLUserProfile
 from .token import Token
 
 # Grading models
@@ -67,6 +67,7 @@ __all__ = [
     # User models
     'User',
     'UserLearningProfile',
+    'MLUserProfile',
     'Token',
     
     # Grading models
@@ -50,6 +50,9 @@ class AuditLog(Base):
     # Index for common audit queries
     __table_args__ = (
         Index("idx_user_action_time", "user_id", "action_type", "created_at"),
+        # Keyset pagination: per-user and global newest-first listings
+        Index("idx_audit_user_created_id", "user_id", "created_at", "id"),
+        Index("idx_audit_created_id", "created_at", "id"),
         Index("idx_resource", "resource_type", "resource_id"),
     )
     
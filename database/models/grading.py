@@ -74,6 +74,15 @@ class GradingSession(Base):
     # Indexes for common queries
     __table_args__ = (
         Index("idx_professor_created", "professor_id", "created_at"),
+        # Keyset pagination of grading history: (created_at, id) is the cursor,
+        # INCLUDE columns let history summaries be served by index-only scans
+        Index(
+            "idx_professor_created_id", "professor_id", "created_at", "id",
+            postgresql_include=[
+                "student_id", "student_name", "assignment_id", "assignment_name",
+                "grading_type", "score", "rubric_id",
+            ],
+        ),
         Index("idx_course_assignment", "course_id", "assignment_id"),
         Index("idx_student_course", "student_id", "course_id"),
     )
@@ -48,6 +48,16 @@ class DocumentVector(Base):
     # Metadata for context (renamed from 'metadata' to avoid SQLAlchemy conflict)
     doc_metadata = Column(JSONB)  # Additional metadata (page, section, etc.)
     
+    # Document structure detected at ingestion (utils.rag.document_structure)
+    # Lets chapter/section/page questions use an index range lookup in reading order
+    chapter_number = Column(Integer, nullable=True)
+    chapter_title = Column(String(500), nullable=True)
+    section_number = Column(String(50), nullable=True)  # e.g. "3.2.1"
+    section_title = Column(String(500), nullable=True)
+    heading = Column(String(500), nullable=True)  # Innermost heading
+    page_start = Column(Integer, nullable=True)
+    page_end = Column(Integer, nullable=True)
+    
     # Usage tracking
     retrieval_count = Column(Integer, default=0)  # How many times retrieved
     last_retrieved = Column(DateTime, nullable=True)
@@ -70,6 +80,9 @@ class DocumentVector(Base):
         Index("idx_document_chunk", "document_id", "chunk_index"),
         Index("idx_user_course", "user_id", "course_id"),
         Index("idx_retrieval_score", "retrieval_count", "relevance_score"),
+        Index("idx_doc_chapter_order", "chapter_number", "document_id", "chunk_index"),
+        Index("idx_doc_section_order", "section_number", "document_id", "chunk_index"),
+        Index("idx_doc_page_range", "document_id", "page_start", "page_end"),
     )
     
     def __repr__(self):
@@ -211,6 +224,9 @@ class RAGQueryLog(Base):
     # Indexes
     __table_args__ = (
         Index("idx_user_query_time", "user_id", "created_at"),
+        # Keyset pagination: per-user and global newest-first listings
+        Index("idx_rag_log_user_created_id", "user_id", "created_at", "id"),
+        Index("idx_rag_log_created_id", "created_at", "id"),
         Index("idx_retrieval_performance", "should_retrieve", "context_helpful"),
         Index("idx_quality_analysis", "context_quality_score", "user_satisfied"),
     )
@@ -1,6 +1,6 @@
 """User authentication models."""
 
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Enum, Text
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Enum, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from .base import Base
@@ -69,3 +69,28 @@ class UserLearningProfile(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class MLUserProfile(Base):
+    """
+    Learned personalization profile (utils.ml.user_profile.UserProfile).
+    
+    The full profile lives in ``profile_data``; the columns used for
+    analytics filtering are denormalized. Written in bulk by the
+    write-behind profile store.
+    """
+    
+    __tablename__ = "ml_user_profiles"
+    
+    user_id = Column(String(255), primary_key=True)
+    role = Column(String(50), nullable=False, default="student")
+    profile_data = Column(JSONB, nullable=False)
+    interactions_count = Column(Integer, nullable=False, default=0)
+    satisfaction_score = Column(Float, nullable=False, default=0.5)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_ml_profile_role_updated', 'role', 'updated_at'),
+    )
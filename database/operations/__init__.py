@@ -4,6 +4,7 @@ Database Operations Package
 High-level database operations organized by purpose:
 - grading: Grading sessions, rubrics, configurations
 - rag: RAG operations (L2/L3 memory stores)
+- pagination: Keyset (cursor) pagination helpers
 """
 
 # Grading operations
@@ -11,6 +12,7 @@ from .grading import (
     get_or_create_user,
     save_grading_session,
     get_grading_history,
+    get_grading_history_page,
     update_grading_session,
     get_rubric_templates,
     save_rubric_template,
@@ -20,6 +22,7 @@ from .grading import (
     update_professor_configuration,
     log_audit as log_audit_action,
     get_audit_logs,
+    get_audit_logs_page,
     get_grading_statistics,
     create_or_update_statistics,
 )
@@ -30,6 +33,7 @@ log_audit = log_audit_action
 # RAG operations (Phase 1 - Agentic RAG)
 from .rag import (
     store_document_vectors,
+    get_structured_chunks,
     search_similar_documents,
     update_document_feedback,
     delete_document_vectors,
@@ -40,14 +44,25 @@ from .rag import (
     analyze_grade_exceptions,
     log_rag_query,
     get_rag_query_logs,
+    get_rag_query_logs_page,
     analyze_rag_performance,
 )
 
+# Keyset pagination
+from .pagination import (
+    KeysetPage,
+    InvalidCursorError,
+    encode_cursor,
+    decode_cursor,
+    paginate_keyset,
+)
+
 __all__ = [
     # Grading operations
     'get_or_create_user',
     'save_grading_session',
     'get_grading_history',
+    'get_grading_history_page',
     'update_grading_session',
     'get_rubric_templates',
     'save_rubric_template',
@@ -58,11 +73,13 @@ __all__ = [
     'log_audit_action',
     'log_audit',  # Alias for backward compatibility
     'get_audit_logs',
+    'get_audit_logs_page',
     'get_grading_statistics',
     'create_or_update_statistics',
     
     # RAG operations
     'store_document_vectors',
+    'get_structured_chunks',
     'search_similar_documents',
     'update_document_feedback',
     'delete_document_vectors',
@@ -73,6 +90,14 @@ __all__ = [
     'analyze_grade_exceptions',
     'log_rag_query',
     'get_rag_query_logs',
+    'get_rag_query_logs_page',
     'analyze_rag_performance',
+    
+    # Keyset pagination
+    'KeysetPage',
+    'InvalidCursorError',
+    'encode_cursor',
+    'decode_cursor',
+    'paginate_keyset',
 ]
 
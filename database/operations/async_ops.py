@@ -13,6 +13,14 @@ from sqlalchemy.orm import selectinload
 
 from database.core.async_engine import async_db_engine, execute_with_timeout
 from database.models import GradingHistory, RubricModel
+from database.operations.pagination import (
+    KeysetPage,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    keyset_order,
+)
 from utils.cache import get_cache_optimizer
 from utils.monitoring import get_logger, track_query
 
@@ -70,7 +78,8 @@ class AsyncDatabaseOperations:
         return await self.cache_optimizer.get_optimized(
             cache_key,
             load_from_db,
-            prefetch=False
+            prefetch=False,
+            tags=[model_class.__name__]
         )
     
     async def list_with_cache(
@@ -111,7 +120,8 @@ class AsyncDatabaseOperations:
         return await self.cache_optimizer.get_optimized(
             cache_key,
             load_from_db,
-            prefetch=False
+            prefetch=False,
+            tags=[model_class.__name__]
         )
     
     @track_query
@@ -138,9 +148,11 @@ class AsyncDatabaseOperations:
             await session.flush()
             await session.refresh(entity)
             
-            # Invalidate related caches
-            if invalidate_pattern:
-                await self.cache_optimizer.invalidate(pattern=invalidate_pattern)
+            # Invalidate related caches (O(1) generation bump)
+            await self.cache_optimizer.invalidate(
+                pattern=invalidate_pattern,
+                tags=[model_class.__name__]
+            )
             
             self.operation_count += 1
             return entity
@@ -174,6 +186,9 @@ class AsyncDatabaseOperations:
                 await session.execute(stmt)
                 total_created += len(batch)
         
+        if total_created:
+            await self.cache_optimizer.invalidate(tags=[model_class.__name__])
+        
         logger.info(f"Bulk created {total_created} {model_class.__name__} entities")
         self.operation_count += total_created
         
@@ -211,9 +226,10 @@ class AsyncDatabaseOperations:
                 await session.flush()
                 await session.refresh(entity)
                 
-                # Invalidate caches
-                if invalidate_tags:
-                    await self.cache_optimizer.invalidate(tags=invalidate_tags)
+                # Invalidate caches (O(1) generation bump)
+                await self.cache_optimizer.invalidate(
+                    tags=[model_class.__name__, *(invalidate_tags or [])]
+                )
                 
                 self.operation_count += 1
                 return entity
@@ -244,8 +260,11 @@ class AsyncDatabaseOperations:
             
             deleted = result.rowcount > 0
             
-            if deleted and invalidate_pattern:
-                await self.cache_optimizer.invalidate(pattern=invalidate_pattern)
+            if deleted:
+                await self.cache_optimizer.invalidate(
+                    pattern=invalidate_pattern,
+                    tags=[model_class.__name__]
+                )
             
             if deleted:
                 self.operation_count += 1
@@ -322,17 +341,21 @@ class AsyncDatabaseOperations:
         page: int = 1,
         page_size: int = 50,
         filter_kwargs: Optional[Dict[str, Any]] = None,
-        order_by = None
+        order_by = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
         Paginated query with metadata.
         
+        OFFSET-based; use keyset_query for deep or large listings.
+        
         Args:
             model_class: SQLAlchemy model class
             page: Page number (1-indexed)
             page_size: Items per page
             filter_kwargs: Optional filter conditions
             order_by: Optional ordering
+            include_total: Run COUNT(*) for total/total_pages
             
         Returns:
             Dictionary with items, total, page info
@@ -341,32 +364,108 @@ class AsyncDatabaseOperations:
         offset = (page - 1) * page_size
         
         async with async_db_engine.get_session() as session:
-            # Count total
-            count_query = select(func.count()).select_from(model_class).filter_by(**filter_kwargs)
-            total_result = await session.execute(count_query)
-            total = total_result.scalar()
-            
-            # Get page items
+            # Get page items (one extra row tells us if there is a next page)
             query = select(model_class).filter_by(**filter_kwargs)
             
             if order_by is not None:
                 query = query.order_by(order_by)
             
-            query = query.limit(page_size).offset(offset)
+            query = query.limit(page_size + 1).offset(offset)
             
             result = await session.execute(query)
-            items = result.scalars().all()
+            rows = result.scalars().all()
+            items = rows[:page_size]
+            has_next = len(rows) > page_size
+            
+            total = None
+            total_pages = None
+            if include_total:
+                count_query = select(func.count()).select_from(model_class).filter_by(**filter_kwargs)
+                total_result = await session.execute(count_query)
+                total = total_result.scalar()
+                total_pages = (total + page_size - 1) // page_size
             
             return {
                 "items": items,
                 "total": total,
                 "page": page,
                 "page_size": page_size,
-                "total_pages": (total + page_size - 1) // page_size,
-                "has_next": page * page_size < total,
+                "total_pages": total_pages,
+                "has_next": has_next,
                 "has_prev": page > 1,
             }
     
+    async def keyset_query(
+        self,
+        model_class,
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+        filter_kwargs: Optional[Dict[str, Any]] = None,
+        sort_attr: str = "created_at",
+        id_attr: str = "id",
+        descending: bool = True,
+        include_total: bool = False
+    ) -> KeysetPage:
+        """
+        Keyset (cursor) paginated query.
+        
+        Each page is an index range scan on (filters..., sort_attr, id_attr)
+        no matter how deep the client pages; no COUNT(*) unless requested.
+        
+        Args:
+            model_class: SQLAlchemy model class
+            page_size: Items per page
+            cursor: next_cursor from the previous page (None for first page)
+            filter_kwargs: Optional equality filters
+            sort_attr: Sort column attribute name
+            id_attr: Unique tiebreaker attribute name
+            descending: Newest-first ordering
+            include_total: Also return an exact total count
+            
+        Returns:
+            KeysetPage with items and next cursor
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        filter_kwargs = filter_kwargs or {}
+        page_size = clamp_page_size(page_size)
+        sort_column = getattr(model_class, sort_attr)
+        id_column = getattr(model_class, id_attr)
+        
+        async with async_db_engine.get_session() as session:
+            query = select(model_class).filter_by(**filter_kwargs)
+            
+            if cursor:
+                query = query.where(
+                    keyset_condition(sort_column, id_column, decode_cursor(cursor), descending)
+                )
+            
+            query = query.order_by(*keyset_order(sort_column, id_column, descending)).limit(page_size + 1)
+            
+            result = await session.execute(query)
+            rows = result.scalars().all()
+            items = rows[:page_size]
+            has_more = len(rows) > page_size
+            
+            total = None
+            if include_total:
+                count_query = select(func.count()).select_from(model_class).filter_by(**filter_kwargs)
+                total = (await session.execute(count_query)).scalar()
+            
+            next_cursor = None
+            if has_more and items:
+                last = items[-1]
+                next_cursor = encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+            
+            return KeysetPage(
+                items=items,
+                next_cursor=next_cursor,
+                has_more=has_more,
+                total=total,
+                page_size=page_size,
+            )
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get operation statistics."""
         return {
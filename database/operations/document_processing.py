@@ -56,6 +56,8 @@ import google.generativeai as genai
 # Database operations
 from sqlalchemy.orm import Session
 from database.operations.rag import store_document_vectors, delete_document_vectors
+from utils.core.startup import startup_timer
+from utils.rag.document_structure import annotate_chunk_structure
 
 logger = logging.getLogger(__name__)
 
@@ -98,30 +100,10 @@ class DocumentProcessor:
         self.embedding_model = embedding_model
         self.use_docling = use_docling and DOCLING_AVAILABLE
         
-        # Initialize Docling converter if available
-        if self.use_docling:
-            try:
-                # Configure Docling for optimal performance
-                pipeline_options = PdfPipelineOptions()
-                pipeline_options.do_table_structure = True  # Enable table extraction
-                pipeline_options.do_ocr = False  # Disable OCR for speed (enable if needed)
-                
-                self.docling_converter = DocumentConverter(
-                    allowed_formats=[InputFormat.PDF],
-                    pipeline_options=pipeline_options
-                )
-                
-                # Initialize HybridChunker for intelligent document chunking
-                # This keeps tables intact, preserves headings with text, and respects paragraph boundaries
-                # Configured to create 40-70+ chunks for typical documents
-                self.hybrid_chunker = HybridChunker(
-                    tokenizer=None,  # Use default tokenizer
-                    max_tokens=self.chunk_size // 4,  # ~200 tokens per chunk (800/4)
-                )
-                logger.info("✅ Docling initialized with HybridChunker (chunk_size=800 for 40-70+ chunks)")
-            except Exception as e:
-                logger.warning(f"⚠️ Docling initialization failed: {e}, falling back to PyMuPDF")
-                self.use_docling = False
+        # Docling converter and HybridChunker are built on the first PDF
+        # (loading its models is the slowest part of startup otherwise)
+        self._docling_converter = None
+        self._hybrid_chunker = None
         
         # Initialize text splitter
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -139,23 +121,62 @@ class DocumentProcessor:
             
             genai.configure(api_key=api_key)
             
-            # Verify model access with test embedding
-            test_result = genai.embed_content(
-                model=self.embedding_model,
-                content="test",
-                task_type="retrieval_document"
-            )
-            embedding_dim = len(test_result['embedding'])
-            
-            logger.info(f"✅ Google Gemini embeddings initialized: {embedding_model} ({embedding_dim}D)")
-            
-            if embedding_dim != 768:
-                logger.warning(f"⚠️  Expected 768D, got {embedding_dim}D")
+            # No test embedding here: model access is verified by the first
+            # indexing call instead of a live request on every startup
+            logger.info(f"✅ Google Gemini embeddings configured: {embedding_model}")
                 
         except Exception as e:
             logger.error(f"❌ Failed to initialize Google Gemini embeddings: {e}")
             raise
     
+    def _ensure_docling(self) -> bool:
+        """
+        Build the Docling converter and HybridChunker on first use.
+        
+        Returns:
+            True if Docling is usable (False falls back to PyMuPDF)
+        """
+        if self._docling_converter is not None:
+            return True
+        try:
+            with startup_timer("docling"):
+                # Configure Docling for optimal performance
+                pipeline_options = PdfPipelineOptions()
+                pipeline_options.do_table_structure = True  # Enable table extraction
+                pipeline_options.do_ocr = False  # Disable OCR for speed (enable if needed)
+                
+                self._docling_converter = DocumentConverter(
+                    allowed_formats=[InputFormat.PDF],
+                    pipeline_options=pipeline_options
+                )
+                
+                # Initialize HybridChunker for intelligent document chunking
+                # This keeps tables intact, preserves headings with text, and respects paragraph boundaries
+                # Configured to create 40-70+ chunks for typical documents
+                self._hybrid_chunker = HybridChunker(
+                    tokenizer=None,  # Use default tokenizer
+                    max_tokens=self.chunk_size // 4,  # ~200 tokens per chunk (800/4)
+                )
+            logger.info("✅ Docling initialized with HybridChunker (chunk_size=800 for 40-70+ chunks)")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Docling initialization failed: {e}, falling back to PyMuPDF")
+            self._docling_converter = None
+            self.use_docling = False
+            return False
+    
+    @property
+    def docling_converter(self):
+        """Docling DocumentConverter (built on first access)."""
+        self._ensure_docling()
+        return self._docling_converter
+    
+    @property
+    def hybrid_chunker(self):
+        """Docling HybridChunker (built on first access)."""
+        self._ensure_docling()
+        return self._hybrid_chunker
+    
     def extract_text(self, file_path: str) -> tuple[str, Dict[str, Any]]:
         """
         Extract text from document based on file type.
@@ -213,7 +234,7 @@ class DocumentProcessor:
             Tuple of (extracted text, metadata about extraction)
         """
         # Try Docling first for advanced parsing
-        if self.use_docling:
+        if self.use_docling and self._ensure_docling():
             try:
                 return self._extract_pdf_with_docling(file_path)
             except Exception as e:
@@ -359,6 +380,9 @@ class DocumentProcessor:
         Uses HybridChunker for Docling documents (keeps tables intact, preserves structure).
         Falls back to RecursiveCharacterTextSplitter for other formats.
         
+        Each chunk is annotated with its chapter, section, heading and page range
+        ('structure'), stored as indexed columns for structure-scoped retrieval.
+        
         Args:
             text: Full text to chunk
             metadata: Optional metadata to attach to each chunk
@@ -398,13 +422,21 @@ class DocumentProcessor:
                             'total_chunks': len(chunks_list),
                             'char_count': len(chunk_text),
                             'chunking_method': 'hybrid_chunker'
-                        }
+                        },
+                        # Structure hints from Docling (heading path, page provenance)
+                        'headings': self._docling_chunk_headings(chunk),
+                        'pages': self._docling_chunk_pages(chunk)
                     }
                     result.append(chunk_dict)
                 
                 # Clean up cached document
                 delattr(self, '_current_docling_doc')
                 
+                annotate_chunk_structure(result)
+                for chunk_dict in result:
+                    chunk_dict.pop('headings', None)
+                    chunk_dict.pop('pages', None)
+                
                 chunk_count = len(result)
                 logger.info(f"✅ HybridChunker created {chunk_count} context-aware chunks")
                 
@@ -442,7 +474,25 @@ class DocumentProcessor:
             }
             result.append(chunk)
         
-        return result
+        return annotate_chunk_structure(result)
+    
+    @staticmethod
+    def _docling_chunk_headings(chunk) -> List[str]:
+        """Heading path of a Docling chunk (outermost first)."""
+        meta = getattr(chunk, 'meta', None)
+        return list(getattr(meta, 'headings', None) or [])
+    
+    @staticmethod
+    def _docling_chunk_pages(chunk) -> List[int]:
+        """Page numbers a Docling chunk was extracted from."""
+        meta = getattr(chunk, 'meta', None)
+        pages = set()
+        for item in getattr(meta, 'doc_items', None) or []:
+            for prov in getattr(item, 'prov', None) or []:
+                page_no = getattr(prov, 'page_no', None)
+                if page_no is not None:
+                    pages.add(page_no)
+        return sorted(pages)
     
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
@@ -719,7 +769,8 @@ def get_document_processor() -> DocumentProcessor:
     """Get or create global document processor instance."""
     global _processor
     if _processor is None:
-        _processor = DocumentProcessor()
+        with startup_timer("document_processor"):
+            _processor = DocumentProcessor()
     return _processor
 
 
@@ -9,6 +9,7 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, and_, func
 
+from database.operations.pagination import KeysetPage, keyset_order, paginate_keyset
 from database.models import (
     User,
     GradingSession,
@@ -168,6 +169,39 @@ def save_grading_session(
     return session
 
 
+def _grading_history_query(
+    db: Session,
+    professor_id: str,
+    course_id: Optional[str] = None,
+    assignment_id: Optional[str] = None,
+    grading_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """Build the filtered (unordered) grading history query, or None if the professor is unknown."""
+    # Get professor's database ID
+    professor = db.query(User).filter(User.user_id == professor_id).first()
+    if not professor:
+        return None
+    
+    # Build query
+    query = db.query(GradingSession).filter(GradingSession.professor_id == professor.id)
+    
+    # Apply filters
+    if course_id:
+        query = query.filter(GradingSession.course_id == course_id)
+    if assignment_id:
+        query = query.filter(GradingSession.assignment_id == assignment_id)
+    if grading_type:
+        query = query.filter(GradingSession.grading_type == grading_type)
+    if start_date:
+        query = query.filter(GradingSession.created_at >= start_date)
+    if end_date:
+        query = query.filter(GradingSession.created_at <= end_date)
+    
+    return query
+
+
 def get_grading_history(
     db: Session,
     professor_id: str,
@@ -182,6 +216,8 @@ def get_grading_history(
     """
     Get grading history for a professor.
     
+    Offset-based; prefer get_grading_history_page for deep listings.
+    
     Args:
         db: Database session
         professor_id: Professor's user ID
@@ -196,28 +232,14 @@ def get_grading_history(
     Returns:
         List of GradingSession objects
     """
-    # Get professor's database ID
-    professor = db.query(User).filter(User.user_id == professor_id).first()
-    if not professor:
+    query = _grading_history_query(
+        db, professor_id, course_id, assignment_id, grading_type, start_date, end_date
+    )
+    if query is None:
         return []
     
-    # Build query
-    query = db.query(GradingSession).filter(GradingSession.professor_id == professor.id)
-    
-    # Apply filters
-    if course_id:
-        query = query.filter(GradingSession.course_id == course_id)
-    if assignment_id:
-        query = query.filter(GradingSession.assignment_id == assignment_id)
-    if grading_type:
-        query = query.filter(GradingSession.grading_type == grading_type)
-    if start_date:
-        query = query.filter(GradingSession.created_at >= start_date)
-    if end_date:
-        query = query.filter(GradingSession.created_at <= end_date)
-    
-    # Order by most recent first
-    query = query.order_by(desc(GradingSession.created_at))
+    # Order by most recent first (id breaks ties deterministically)
+    query = query.order_by(*keyset_order(GradingSession.created_at, GradingSession.id))
     
     # Apply pagination
     query = query.limit(limit).offset(offset)
@@ -225,6 +247,58 @@ def get_grading_history(
     return query.all()
 
 
+def get_grading_history_page(
+    db: Session,
+    professor_id: str,
+    page_size: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    course_id: Optional[str] = None,
+    assignment_id: Optional[str] = None,
+    grading_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> KeysetPage:
+    """
+    Get one keyset page of a professor's grading history, newest first.
+    
+    Served by idx_professor_created_id as an index range scan at any depth.
+    
+    Args:
+        db: Database session
+        professor_id: Professor's user ID
+        page_size: Results per page
+        cursor: next_cursor from the previous page (None for first page)
+        include_total: Include an (estimated) total count
+        course_id: Filter by course (optional)
+        assignment_id: Filter by assignment (optional)
+        grading_type: Filter by grading type (optional)
+        start_date: Filter by start date (optional)
+        end_date: Filter by end date (optional)
+        
+    Returns:
+        KeysetPage of GradingSession objects
+        
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    query = _grading_history_query(
+        db, professor_id, course_id, assignment_id, grading_type, start_date, end_date
+    )
+    if query is None:
+        return KeysetPage(items=[], total=0 if include_total else None, page_size=page_size)
+    
+    return paginate_keyset(
+        db,
+        query,
+        GradingSession.created_at,
+        GradingSession.id,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total
+    )
+
+
 def save_rubric_template(
     db: Session,
     professor_id: str,
@@ -586,7 +660,46 @@ def get_audit_logs(db: Session, user_id: str = None, limit: int = 100):
     query = db.query(AuditLog)
     if user_id:
         query = query.filter(AuditLog.user_id == user_id)
-    return query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
+    return query.order_by(*keyset_order(AuditLog.created_at, AuditLog.id)).limit(limit).all()
+
+
+def get_audit_logs_page(
+    db: Session,
+    user_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    page_size: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> KeysetPage:
+    """
+    Get one keyset page of audit logs, newest first.
+    
+    Args:
+        db: Database session
+        user_id: Filter by user (optional)
+        action_type: Filter by action type (optional, requires user_id for index use)
+        page_size: Results per page
+        cursor: next_cursor from the previous page
+        include_total: Include an (estimated) total count
+        
+    Returns:
+        KeysetPage of AuditLog objects
+    """
+    query = db.query(AuditLog)
+    if user_id:
+        query = query.filter(AuditLog.user_id == user_id)
+    if action_type:
+        query = query.filter(AuditLog.action_type == action_type)
+    
+    return paginate_keyset(
+        db,
+        query,
+        AuditLog.created_at,
+        AuditLog.id,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total
+    )
 
 
 def get_grading_statistics(db: Session, professor_id: str = None):
@@ -0,0 +1,258 @@
+"""
+Keyset (cursor) pagination helpers.
+
+OFFSET pagination scans and discards every skipped row, and a separate
+COUNT(*) per page scans the whole filtered set. Keyset pagination instead
+resumes from the last row seen, using a composite (sort column, id) index
+so every page is a bounded index range scan regardless of depth.
+
+Cursors are opaque URL-safe tokens; clients pass back ``next_cursor``
+unchanged. Totals are optional and can be planner estimates.
+"""
+
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, text
+
+
+CURSOR_VERSION = 1
+
+# Upper bound for a single page, regardless of what the caller asks for
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class KeysetPage:
+    """One page of keyset-paginated results."""
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total: Optional[int] = None
+    total_estimated: bool = False
+    page_size: int = 0
+
+
+# =============================================================================
+# CURSOR ENCODING
+# =============================================================================
+
+def _encode_value(value: Any) -> Any:
+    """Encode a key value into a JSON-safe tagged form."""
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"t": "uuid", "v": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Decode a tagged key value."""
+    if isinstance(value, dict):
+        kind = value.get("t")
+        if kind == "dt":
+            return datetime.fromisoformat(value["v"])
+        if kind == "uuid":
+            return uuid.UUID(value["v"])
+        raise InvalidCursorError(f"Unknown cursor value type: {kind}")
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode keyset values into an opaque cursor.
+
+    Args:
+        *values: Key values of the last row (sort value, tiebreaker id)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {"v": CURSOR_VERSION, "k": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ...]:
+    """
+    Decode an opaque cursor back into keyset values.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+
+    Returns:
+        Tuple of key values
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or from another version
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload.get("v") != CURSOR_VERSION:
+            raise InvalidCursorError("Unsupported cursor version")
+        return tuple(_decode_value(v) for v in payload["k"])
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}") from e
+
+
+# =============================================================================
+# QUERY HELPERS
+# =============================================================================
+
+def keyset_condition(sort_column, id_column, cursor_values: Tuple[Any, ...], descending: bool = True):
+    """
+    Build the "after cursor" predicate for (sort_column, id_column) ordering.
+
+    Expanded form of the row comparison ``(sort, id) < (:sort, :id)`` so it
+    works on every dialect while still matching the composite index.
+
+    Args:
+        sort_column: Primary sort column (e.g. created_at)
+        id_column: Unique tiebreaker column (e.g. id)
+        cursor_values: Decoded (sort value, id) of the last row seen
+        descending: Whether the listing is newest-first
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    if len(cursor_values) != 2:
+        raise InvalidCursorError("Cursor does not match listing keys")
+
+    last_sort, last_id = cursor_values
+    if descending:
+        return or_(sort_column < last_sort, and_(sort_column == last_sort, id_column < last_id))
+    return or_(sort_column > last_sort, and_(sort_column == last_sort, id_column > last_id))
+
+
+def keyset_order(sort_column, id_column, descending: bool = True) -> tuple:
+    """ORDER BY clauses matching keyset_condition."""
+    if descending:
+        return (sort_column.desc(), id_column.desc())
+    return (sort_column.asc(), id_column.asc())
+
+
+def clamp_page_size(page_size: int) -> int:
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]."""
+    return max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+
+def estimate_query_count(db, query) -> Optional[int]:
+    """
+    Estimate a query's row count from the PostgreSQL planner.
+
+    Uses ``EXPLAIN (FORMAT JSON)`` so no rows are scanned. Returns None on
+    other dialects or if the plan cannot be read.
+
+    Args:
+        db: Synchronous SQLAlchemy session
+        query: ORM query whose result size to estimate
+
+    Returns:
+        Estimated row count or None
+    """
+    try:
+        bind = db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+
+        statement = query.statement if hasattr(query, "statement") else query
+        compiled = statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        return None
+
+
+def paginate_keyset(
+    db,
+    query,
+    sort_column,
+    id_column,
+    page_size: int = 50,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    include_total: bool = False,
+    estimate_total: bool = True
+) -> KeysetPage:
+    """
+    Run one page of a keyset-paginated ORM query.
+
+    Fetches ``page_size + 1`` rows to learn whether another page exists,
+    so no COUNT(*) is needed to drive navigation.
+
+    Args:
+        db: Synchronous SQLAlchemy session
+        query: Filtered ORM query (without ORDER BY / LIMIT)
+        sort_column: Primary sort column
+        id_column: Unique tiebreaker column
+        page_size: Rows per page
+        cursor: Cursor from the previous page (None for the first page)
+        descending: Newest-first ordering
+        include_total: Also return a total row count
+        estimate_total: Use the planner estimate instead of an exact COUNT(*)
+
+    Returns:
+        KeysetPage with items and the next cursor
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    page_size = clamp_page_size(page_size)
+
+    total = None
+    total_estimated = False
+    if include_total:
+        if estimate_total:
+            total = estimate_query_count(db, query)
+            total_estimated = total is not None
+        if total is None:
+            total = query.order_by(None).count()
+
+    if cursor:
+        query = query.filter(keyset_condition(sort_column, id_column, decode_cursor(cursor), descending))
+
+    rows = query.order_by(*keyset_order(sort_column, id_column, descending)).limit(page_size + 1).all()
+
+    has_more = len(rows) > page_size
+    items = rows[:page_size]
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    return KeysetPage(
+        items=items,
+        next_cursor=next_cursor,
+        has_more=has_more,
+        total=total,
+        total_estimated=total_estimated,
+        page_size=page_size,
+    )
+
+
+__all__ = [
+    'KeysetPage',
+    'InvalidCursorError',
+    'MAX_PAGE_SIZE',
+    'encode_cursor',
+    'decode_cursor',
+    'keyset_condition',
+    'keyset_order',
+    'clamp_page_size',
+    'estimate_query_count',
+    'paginate_keyset',
+]
@@ -16,6 +16,7 @@ from sqlalchemy import text, func, desc
 import uuid
 
 from database.models import DocumentVector, GradeException, RAGQueryLog
+from database.operations.pagination import KeysetPage, keyset_order, paginate_keyset
 
 
 # =============================================================================
@@ -37,7 +38,8 @@ def store_document_vectors(
         db: Database session
         document_id: Unique document identifier
         document_name: Document name
-        chunks: List of chunks with 'content', 'embedding', 'metadata'
+        chunks: List of chunks with 'content', 'embedding', 'metadata' and
+            optional 'structure' (chapter/section/page, see utils.rag.document_structure)
         user_id: Optional user ID for ownership
         course_id: Optional course ID
         
@@ -47,6 +49,7 @@ def store_document_vectors(
     vectors_stored = 0
     
     for idx, chunk in enumerate(chunks):
+        structure = chunk.get('structure') or {}
         vector = DocumentVector(
             document_id=document_id,
             document_name=document_name,
@@ -54,7 +57,14 @@ def store_document_vectors(
             content=chunk['content'],
             chunk_index=idx,
             embedding=chunk['embedding'],  # pgvector compatible
-            metadata=chunk.get('metadata', {}),
+            doc_metadata=chunk.get('metadata', {}),
+            chapter_number=structure.get('chapter_number'),
+            chapter_title=structure.get('chapter_title'),
+            section_number=structure.get('section_number'),
+            section_title=structure.get('section_title'),
+            heading=structure.get('heading'),
+            page_start=structure.get('page_start'),
+            page_end=structure.get('page_end'),
             user_id=user_id,
             course_id=course_id
         )
@@ -65,6 +75,67 @@ def store_document_vectors(
     return vectors_stored
 
 
+def get_structured_chunks(
+    db: Session,
+    chapter: Optional[int] = None,
+    section: Optional[str] = None,
+    page: Optional[int] = None,
+    document_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    course_id: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[DocumentVector]:
+    """
+    Fetch the chunks of a chapter, section or page in reading order.
+    
+    Exact lookup on the structure columns filled at ingestion time
+    (idx_doc_chapter_order / idx_doc_section_order / idx_doc_page_range),
+    replacing keyword scans over chunk content.
+    
+    Args:
+        db: Database session
+        chapter: Chapter number
+        section: Section number (also matches its subsections, "3.2" -> "3.2.1")
+        page: Page number
+        document_id: Restrict to one document
+        user_id: Filter by user (optional)
+        course_id: Filter by course (optional)
+        limit: Maximum chunks (None: whole unit)
+        
+    Returns:
+        Document vectors ordered by document and chunk position
+    """
+    if chapter is None and section is None and page is None:
+        return []
+    
+    query = db.query(DocumentVector)
+    
+    if chapter is not None:
+        query = query.filter(DocumentVector.chapter_number == chapter)
+    if section is not None:
+        query = query.filter(
+            (DocumentVector.section_number == section)
+            | DocumentVector.section_number.like(f"{section}.%")
+        )
+    if page is not None:
+        query = query.filter(
+            DocumentVector.page_start <= page,
+            DocumentVector.page_end >= page
+        )
+    if document_id:
+        query = query.filter(DocumentVector.document_id == document_id)
+    if user_id:
+        query = query.filter(DocumentVector.user_id == user_id)
+    if course_id:
+        query = query.filter(DocumentVector.course_id == course_id)
+    
+    query = query.order_by(DocumentVector.document_id, DocumentVector.chunk_index)
+    if limit:
+        query = query.limit(limit)
+    
+    return query.all()
+
+
 def similarity_search(
     db: Session,
     query_embedding: List[float],
@@ -344,6 +415,7 @@ def update_exception_status(
     exception = db.query(GradeException).filter(GradeException.id == exception_id).first()
     
     if exception:
+        previous_status = exception.status
         exception.status = status
         if learned_pattern:
             exception.learned_pattern = learned_pattern
@@ -353,6 +425,13 @@ def update_exception_status(
             exception.resolved_at = datetime.now(timezone.utc)
         
         db.commit()
+        
+        # Keep cached professor bias statistics current (incremental update)
+        try:
+            from utils.ml.bias_model import get_bias_model_service
+            get_bias_model_service().record_exception(exception, previous_status=previous_status)
+        except ImportError:
+            pass
 
 
 def get_learning_insights(db: Session, rubric_type: Optional[str] = None) -> Dict[str, Any]:
@@ -581,7 +660,42 @@ def get_rag_query_logs(db: Session, user_id: str = None, limit: int = 100):
     query = db.query(RAGQueryLog)
     if user_id:
         query = query.filter(RAGQueryLog.user_id == user_id)
-    return query.order_by(RAGQueryLog.timestamp.desc()).limit(limit).all()
+    return query.order_by(*keyset_order(RAGQueryLog.created_at, RAGQueryLog.id)).limit(limit).all()
+
+
+def get_rag_query_logs_page(
+    db: Session,
+    user_id: Optional[str] = None,
+    page_size: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> KeysetPage:
+    """
+    Get one keyset page of RAG query logs, newest first.
+    
+    Args:
+        db: Database session
+        user_id: Filter by user (optional)
+        page_size: Results per page
+        cursor: next_cursor from the previous page
+        include_total: Include an (estimated) total count
+        
+    Returns:
+        KeysetPage of RAGQueryLog objects
+    """
+    query = db.query(RAGQueryLog)
+    if user_id:
+        query = query.filter(RAGQueryLog.user_id == user_id)
+    
+    return paginate_keyset(
+        db,
+        query,
+        RAGQueryLog.created_at,
+        RAGQueryLog.id,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total
+    )
 
 
 def analyze_rag_performance(db: Session, time_period_days: int = 30):
@@ -24,6 +24,7 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 from utils.auth.jwt_handler import verify_access_token
+from utils.core.llm_gateway import llm_context
 
 logger = logging.getLogger(__name__)
 
@@ -273,4 +274,6 @@ class AuthGatewayMiddleware(BaseHTTPMiddleware):
         request.state.user_email = payload.get("email")
         request.state.user_role = payload.get("role")
         
-        return await call_next(request)
+        # Charge LLM calls made while handling the request to the tenant
+        with llm_context(tenant_id=tenant_id_header):
+            return await call_next(request)
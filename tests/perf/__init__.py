@@ -0,0 +1,64 @@
+"""
+Offline, deterministic benchmark harness.
+
+Fake providers (LLM, embeddings, web search, Google Classroom), seeded
+workloads and an in-process ASGI load generator. See
+tests/test_offline_benchmark.py for the suite.
+"""
+
+from .fakes import (
+    FakeChatModel,
+    FakeEmbeddings,
+    FakeClassroomService,
+    ProviderLatencies,
+    OfflineProviders,
+    fake_providers,
+    fake_text,
+)
+from .workloads import (
+    RequestSpec,
+    Workload,
+    WORKLOADS,
+    get_workload,
+    study_mix,
+    document_qa,
+    bulk_grading,
+    auth_storm,
+)
+from .loadgen import (
+    LoadGenerator,
+    BenchmarkReport,
+    compare_to_baseline,
+    format_report,
+    load_baseline,
+    save_baseline,
+    BASELINE_PATH,
+)
+
+__all__ = [
+    # Fakes
+    "FakeChatModel",
+    "FakeEmbeddings",
+    "FakeClassroomService",
+    "ProviderLatencies",
+    "OfflineProviders",
+    "fake_providers",
+    "fake_text",
+    # Workloads
+    "RequestSpec",
+    "Workload",
+    "WORKLOADS",
+    "get_workload",
+    "study_mix",
+    "document_qa",
+    "bulk_grading",
+    "auth_storm",
+    # Load generation
+    "LoadGenerator",
+    "BenchmarkReport",
+    "compare_to_baseline",
+    "format_report",
+    "load_baseline",
+    "save_baseline",
+    "BASELINE_PATH",
+]
@@ -0,0 +1,381 @@
+"""
+Offline fake providers for benchmarks.
+
+Every external dependency on the request path is replaced by a local fake
+with a configurable, seeded latency:
+
+- FakeChatModel: LangChain chat model with first-token and per-token
+  latency (streams through callbacks like Gemini does)
+- FakeEmbeddings: deterministic unit vectors (LangChain Embeddings methods
+  and the google.generativeai ``embed_content`` call)
+- Web search: the search client's FakeSearchProvider behind the real
+  HedgedSearchClient
+- FakeClassroomService: googleapiclient-style Classroom resource
+
+``fake_providers()`` installs them for the duration of a ``with`` block, so
+the real app, agents and routers run unchanged without network access.
+"""
+
+import asyncio
+import math
+import random
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    BaseChatModel = object
+    LANGCHAIN_AVAILABLE = False
+
+
+WORDS = ("photosynthesis converts light energy into chemical energy stored in glucose "
+         "the mitochondria release energy through cellular respiration while enzymes "
+         "lower activation energy a thesis should state a clear argument supported by "
+         "evidence and analysis in each paragraph of the essay").split()
+
+
+@dataclass(frozen=True)
+class ProviderLatencies:
+    """Latencies (seconds) of the fake providers."""
+    llm_first_token: float = 0.25
+    llm_per_token: float = 0.01
+    llm_tokens: int = 60
+    embedding: float = 0.03
+    search: float = 0.3
+    search_jitter: float = 0.1
+    search_slow_rate: float = 0.05
+    search_slow: float = 1.5
+    classroom: float = 0.05
+
+
+def fake_text(prompt: str, tokens: int, seed: int = 0) -> str:
+    """Deterministic pseudo-answer of ``tokens`` words for a prompt."""
+    rng = random.Random(f"{seed}:{prompt}")
+    return " ".join(rng.choice(WORDS) for _ in range(tokens))
+
+
+def _prompt_text(messages: List[Any]) -> str:
+    return "\n".join(str(getattr(message, "content", message)) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model with a fixed first-token latency and per-token latency.
+
+    Answers are pseudo-random words seeded by the prompt (or come from
+    ``responder(prompt)``), so runs are reproducible.
+    """
+
+    first_token_latency: float = 0.25
+    per_token_latency: float = 0.01
+    response_tokens: int = 60
+    seed: int = 0
+    streaming: bool = False
+    responder: Optional[Callable[[str], str]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _tokens(self, messages: List[Any]) -> List[str]:
+        prompt = _prompt_text(messages)
+        text = self.responder(prompt) if self.responder else fake_text(prompt, self.response_tokens, self.seed)
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def _duration(self, tokens: List[str]) -> float:
+        return self.first_token_latency + self.per_token_latency * max(len(tokens) - 1, 0)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._tokens(messages)
+        time.sleep(self._duration(tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self._duration(tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, token in enumerate(self._tokens(messages)):
+            time.sleep(self.first_token_latency if i == 0 else self.per_token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, token in enumerate(self._tokens(messages)):
+            await asyncio.sleep(self.first_token_latency if i == 0 else self.per_token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings:
+    """Deterministic unit-vector embeddings with a fixed latency per call."""
+
+    def __init__(self, dimension: int = 768, latency: float = 0.03, seed: int = 0):
+        self.dimension = dimension
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        rng = random.Random(f"{self.seed}:{text}")
+        vector = [rng.gauss(0, 1) for _ in range(self.dimension)]
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def embed_content(self, model: Optional[str] = None, content: Any = "", task_type: Optional[str] = None, **kwargs):
+        """google.generativeai.embed_content replacement."""
+        if isinstance(content, (list, tuple)):
+            return {"embedding": self.embed_documents(list(content))}
+        return {"embedding": self.embed_query(content)}
+
+
+class _FakeRequest:
+    def __init__(self, service: "FakeClassroomService", path: tuple, action: str, params: Dict[str, Any]):
+        self.service = service
+        self.path = path
+        self.action = action
+        self.params = params
+
+    def execute(self, num_retries: int = 0):
+        self.service.calls += 1
+        time.sleep(self.service.latency)
+        return self.service.respond(self.path, self.action, self.params)
+
+
+class _FakeResource:
+    """One level of a googleapiclient resource chain (courses().courseWork()...)."""
+
+    ACTIONS = {"list", "get", "patch", "create", "return_", "turnIn", "delete"}
+
+    def __init__(self, service: "FakeClassroomService", path: tuple):
+        self._service = service
+        self._path = path
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name in self.ACTIONS:
+            return lambda **params: _FakeRequest(self._service, self._path, name, params)
+        return lambda: _FakeResource(self._service, self._path + (name,))
+
+
+class FakeClassroomService:
+    """
+    Google Classroom API service with seeded courses, coursework and submissions.
+
+    Mirrors the ``build('classroom', 'v1')`` resource interface; every
+    ``execute()`` sleeps ``latency``.
+    """
+
+    def __init__(
+        self,
+        courses: int = 3,
+        assignments: int = 4,
+        submissions: int = 25,
+        latency: float = 0.05,
+        seed: int = 0
+    ):
+        self.courses_count = courses
+        self.assignments = assignments
+        self.submissions = submissions
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda: _FakeResource(self, (name,))
+
+    def _course(self, i: int) -> Dict[str, Any]:
+        return {"id": f"course-{i}", "name": f"Biology {100 + i}", "courseState": "ACTIVE"}
+
+    def _work(self, course_id: str, j: int) -> Dict[str, Any]:
+        return {"id": f"{course_id}-work-{j}", "courseId": course_id, "title": f"Essay {j + 1}",
+                "workType": "ASSIGNMENT", "maxPoints": 100}
+
+    def _submission(self, course_id: str, work_id: str, k: int) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:{work_id}:{k}")
+        return {
+            "id": f"{work_id}-sub-{k}", "courseId": course_id, "courseWorkId": work_id,
+            "userId": f"student-{k}", "state": "TURNED_IN",
+            "assignmentSubmission": {"attachments": []},
+            "shortAnswerSubmission": {"answer": fake_text(work_id, 40 + rng.randrange(80), self.seed + k)},
+        }
+
+    def respond(self, path: tuple, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Response for a resource path and action."""
+        leaf = path[-1]
+        course_id = params.get("courseId", params.get("id", "course-0"))
+        work_id = params.get("courseWorkId", params.get("id", f"{course_id}-work-0"))
+
+        if action in ("patch", "create", "return_", "turnIn", "delete"):
+            return dict(params.get("body") or {})
+        if leaf == "userProfiles":
+            return {"id": "me", "name": {"fullName": "Benchmark Teacher"}, "emailAddress": "teacher@bench.example"}
+        if leaf == "courses":
+            if action == "get":
+                return self._course(int(str(params["id"]).rsplit("-", 1)[-1]))
+            return {"courses": [self._course(i) for i in range(self.courses_count)]}
+        if leaf == "courseWork":
+            if action == "get":
+                return self._work(course_id, int(str(params["id"]).rsplit("-", 1)[-1]))
+            return {"courseWork": [self._work(course_id, j) for j in range(self.assignments)]}
+        if leaf == "studentSubmissions":
+            if action == "get":
+                return self._submission(course_id, work_id, int(str(params["id"]).rsplit("-", 1)[-1]))
+            return {"studentSubmissions": [self._submission(course_id, work_id, k) for k in range(self.submissions)]}
+        if leaf == "students":
+            return {"students": [{"userId": f"student-{k}", "profile": {"name": {"fullName": f"Student {k}"}}}
+                                 for k in range(self.submissions)]}
+        if leaf == "rubrics":
+            return {} if action == "get" else {"rubrics": []}
+        return {}
+
+
+class _Patcher:
+    """Replace objects on modules (including every ``from x import y`` alias) and undo."""
+
+    def __init__(self):
+        self._undo: List[tuple] = []
+
+    def setattr(self, target: Any, name: str, value: Any):
+        self._undo.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+    def replace_everywhere(self, original: Any, replacement: Any):
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if not namespace:
+                continue
+            for name, value in list(namespace.items()):
+                if value is original:
+                    self.setattr(module, name, replacement)
+
+    def undo(self):
+        while self._undo:
+            target, name, value = self._undo.pop()
+            setattr(target, name, value)
+
+
+@dataclass
+class OfflineProviders:
+    """Fakes installed by fake_providers() (for assertions and call counts)."""
+    llms: List[Any]
+    embeddings: FakeEmbeddings
+    search: Any
+    classroom: FakeClassroomService
+
+
+@contextmanager
+def fake_providers(latencies: ProviderLatencies = ProviderLatencies(), seed: int = 0) -> Iterator[OfflineProviders]:
+    """
+    Route LLM, embedding, web search and Classroom calls to local fakes.
+
+    Args:
+        latencies: Latency of each fake provider
+        seed: Seed for generated answers, vectors and search tail latency
+
+    Yields:
+        The installed fakes
+    """
+    patcher = _Patcher()
+    llms: List[Any] = []
+    embeddings = FakeEmbeddings(latency=latencies.embedding, seed=seed)
+    classroom = FakeClassroomService(latency=latencies.classroom, seed=seed)
+    search_provider = None
+    runner = None
+
+    def make_llm(*args, streaming: bool = False, **kwargs):
+        llm = FakeChatModel(
+            first_token_latency=latencies.llm_first_token,
+            per_token_latency=latencies.llm_per_token,
+            response_tokens=latencies.llm_tokens,
+            seed=seed + len(llms),
+            streaming=streaming,
+        )
+        llms.append(llm)
+        return llm
+
+    try:
+        if LANGCHAIN_AVAILABLE:
+            try:
+                import utils.core.llm as llm_module
+                patcher.replace_everywhere(llm_module.initialize_llm, make_llm)
+                patcher.replace_everywhere(llm_module.initialize_grading_llm, make_llm)
+            except ImportError:
+                pass
+
+        try:
+            import google.generativeai as genai
+            patcher.replace_everywhere(genai.embed_content, embeddings.embed_content)
+        except ImportError:
+            pass
+        try:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            patcher.replace_everywhere(GoogleGenerativeAIEmbeddings, lambda *args, **kwargs: embeddings)
+        except ImportError:
+            pass
+
+        try:
+            import tools.study.search_client as search_client
+            search_provider = search_client.FakeSearchProvider(
+                "fake",
+                latency=latencies.search,
+                jitter=latencies.search_jitter,
+                slow_rate=latencies.search_slow_rate,
+                slow_latency=latencies.search_slow,
+                seed=seed,
+            )
+            runner = search_client.SearchClientRunner(search_client.HedgedSearchClient([search_provider]))
+            patcher.setattr(search_client, "_search_runner", runner)
+        except ImportError:
+            pass
+
+        try:
+            import googleapiclient.discovery as discovery
+            original_build = discovery.build
+
+            def build(service_name, version=None, *args, **kwargs):
+                if service_name == "classroom":
+                    return classroom
+                return original_build(service_name, version, *args, **kwargs)
+
+            patcher.replace_everywhere(original_build, build)
+        except ImportError:
+            pass
+
+        yield OfflineProviders(llms=llms, embeddings=embeddings, search=search_provider, classroom=classroom)
+    finally:
+        patcher.undo()
+        if runner is not None:
+            runner.close()
@@ -0,0 +1,361 @@
+"""
+In-process load generator and baseline comparison.
+
+Requests are sent straight to the ASGI app (no sockets, no HTTP client), so
+the measured time is the app's own: middleware, routing, agents and the fake
+providers. For every endpoint the report gives throughput, error rate, time
+to first byte (first non-empty body chunk) and total latency percentiles.
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from utils.monitoring.streaming_stats import LatencyHistogram
+
+from .workloads import RequestSpec, Workload
+
+
+# Latency percentiles reported per endpoint
+REPORT_QUANTILES = (0.5, 0.95, 0.99)
+
+# Allowed slowdown against the baseline before a metric counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Differences below this many seconds are never regressions (timer noise)
+MIN_REGRESSION_SECONDS = 0.005
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+class EndpointStats:
+    """Latency, TTFB and status counts of one endpoint."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.bytes = 0
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "throughput_rps": self.count / wall_seconds if wall_seconds else 0.0,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+            "bytes": self.bytes,
+        }
+        for name, histogram in (("latency", self.latency), ("ttfb", self.ttfb)):
+            for q, value in histogram.quantiles(REPORT_QUANTILES).items():
+                result[f"{name}_p{q * 100:g}"] = value
+        return result
+
+
+class BenchmarkReport:
+    """Results of one workload run."""
+
+    def __init__(self, workload: str):
+        self.workload = workload
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.wall_seconds = 0.0
+
+    def endpoint(self, name: str) -> EndpointStats:
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointStats()
+        return self.endpoints[name]
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.count for stats in self.endpoints.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workload": self.workload,
+            "requests": self.requests,
+            "wall_seconds": self.wall_seconds,
+            "throughput_rps": self.requests / self.wall_seconds if self.wall_seconds else 0.0,
+            "endpoints": {name: stats.to_dict(self.wall_seconds) for name, stats in sorted(self.endpoints.items())},
+        }
+
+
+class _Response:
+    __slots__ = ("status", "ttfb", "bytes", "done")
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.ttfb: Optional[float] = None
+        self.bytes = 0
+        self.done = asyncio.Event()
+
+
+class LoadGenerator:
+    """
+    Drive an ASGI app in-process with a workload.
+
+    Requests run closed-loop: at most ``concurrency`` are in flight, and
+    the next one starts as soon as one finishes.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        headers_for: Optional[Callable[[RequestSpec], Mapping[str, str]]] = None
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            app: ASGI application
+            headers_for: Extra headers for a request (e.g. Authorization)
+        """
+        self.app = app
+        self.headers_for = headers_for
+        self._state: Dict[str, Any] = {}
+
+    @asynccontextmanager
+    async def lifespan(self, ready_path: Optional[str] = None, ready_timeout: float = 120.0):
+        """
+        Run the app's startup and shutdown (ASGI lifespan protocol).
+
+        Args:
+            ready_path: Readiness probe polled until it returns 200 (the app
+                serves before its components are initialized)
+            ready_timeout: Longest wait for readiness (seconds)
+        """
+        inbox: asyncio.Queue = asyncio.Queue()
+        outbox: asyncio.Queue = asyncio.Queue()
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": self._state}
+        task = asyncio.create_task(self.app(scope, inbox.get, outbox.put))
+
+        async def expect(kind: str):
+            getter = asyncio.ensure_future(outbox.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                task.result()  # Re-raise a startup exception
+                return  # App does not support lifespan
+            message = getter.result()
+            if message["type"] == f"lifespan.{kind}.failed":
+                raise RuntimeError(f"Lifespan {kind} failed: {message.get('message', '')}")
+
+        await inbox.put({"type": "lifespan.startup"})
+        await expect("startup")
+        if ready_path is not None:
+            await self._wait_ready(ready_path, ready_timeout)
+        try:
+            yield
+        finally:
+            if not task.done():
+                await inbox.put({"type": "lifespan.shutdown"})
+                await expect("shutdown")
+                await task
+
+    async def _wait_ready(self, path: str, timeout: float):
+        deadline = time.monotonic() + timeout
+        probe = RequestSpec(endpoint="ready", method="GET", path=path)
+        while True:
+            status = {}
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+
+            await self.app(self._scope(probe, b""), receive, send)
+            if status.get("code") == 200:
+                return
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"App not ready after {timeout:.0f}s ({path} returned {status.get('code')})")
+            await asyncio.sleep(0.05)
+
+    def _scope(self, spec: RequestSpec, body: bytes) -> Dict[str, Any]:
+        path, _, query = spec.path.partition("?")
+        headers = [
+            (b"host", b"benchmark.local"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if self.headers_for is not None:
+            headers.extend((name.lower().encode(), value.encode()) for name, value in self.headers_for(spec).items())
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": spec.method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": headers,
+            "client": (f"10.0.{spec.client // 250}.{spec.client % 250 + 1}", 40000),
+            "server": ("benchmark.local", 80),
+            "state": dict(self._state),
+        }
+
+    async def _send_request(self, spec: RequestSpec, report: BenchmarkReport):
+        body = json.dumps(spec.json).encode() if spec.json is not None else b""
+        response = _Response()
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await response.done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if chunk and response.ttfb is None:
+                    response.ttfb = time.perf_counter() - start
+                response.bytes += len(chunk)
+                if not message.get("more_body", False):
+                    response.done.set()
+
+        stats = report.endpoint(spec.endpoint)
+        start = time.perf_counter()
+        try:
+            await self.app(self._scope(spec, body), receive, send)
+        except Exception:
+            response.status = response.status or 500
+        finally:
+            response.done.set()
+        latency = time.perf_counter() - start
+
+        stats.latency.record(latency)
+        stats.ttfb.record(response.ttfb if response.ttfb is not None else latency)
+        stats.statuses[response.status or 0] += 1
+        stats.bytes += response.bytes
+        if response.status is None or response.status >= 500:
+            stats.errors += 1
+
+    async def run(self, workload: Workload, concurrency: Optional[int] = None) -> BenchmarkReport:
+        """
+        Send every request of a workload.
+
+        Args:
+            workload: Requests to send
+            concurrency: Requests in flight (default: the workload's)
+
+        Returns:
+            Per-endpoint report
+        """
+        report = BenchmarkReport(workload.name)
+        queue: asyncio.Queue = asyncio.Queue()
+        for spec in workload.requests:
+            queue.put_nowait(spec)
+
+        async def worker():
+            while True:
+                try:
+                    spec = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._send_request(spec, report)
+
+        start = time.perf_counter()
+        workers = min(concurrency or workload.concurrency, len(workload.requests)) or 1
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        report.wall_seconds = time.perf_counter() - start
+        return report
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    """Stored reports by workload name ({} if there is no baseline yet)."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(reports: List[Dict[str, Any]], path: Path = BASELINE_PATH):
+    """Store reports (dicts from BenchmarkReport.to_dict) as the baseline, merged by workload."""
+    baseline = load_baseline(path)
+    for report in reports:
+        baseline[report["workload"]] = report
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+    """
+    Regressions of a report against the baseline run of the same workload.
+
+    A latency or TTFB percentile regresses when it is more than
+    ``tolerance`` (and MIN_REGRESSION_SECONDS) slower; throughput when it
+    is more than ``tolerance`` lower; error rate when it rises by more than
+    one percentage point.
+
+    Args:
+        report: BenchmarkReport.to_dict() of the new run
+        baseline: Baseline report of the same workload
+        tolerance: Allowed relative slowdown
+
+    Returns:
+        Human-readable regressions (empty if none)
+    """
+    regressions = []
+    for endpoint, base in baseline.get("endpoints", {}).items():
+        current = report.get("endpoints", {}).get(endpoint)
+        if current is None:
+            continue
+        for metric, base_value in base.items():
+            if not metric.startswith(("latency_p", "ttfb_p")) or base_value is None:
+                continue
+            value = current.get(metric)
+            if value is not None and value > base_value * (1 + tolerance) and value - base_value > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f"{endpoint} {metric}: {value * 1000:.1f}ms vs baseline {base_value * 1000:.1f}ms"
+                )
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint} throughput: {current['throughput_rps']:.1f}/s vs baseline {base['throughput_rps']:.1f}/s"
+            )
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(
+                f"{endpoint} error rate: {current['error_rate']:.1%} vs baseline {base['error_rate']:.1%}"
+            )
+    return regressions
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:8.1f}" if value is not None else f"{'-':>8}"
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Table of per-endpoint throughput, TTFB and latency (with baseline p95 if given)."""
+    lines = [
+        f"📊 {report['workload']}: {report['requests']} requests in {report['wall_seconds']:.2f}s "
+        f"({report['throughput_rps']:.1f} req/s)",
+        f"   {'endpoint':<40} {'req/s':>7} {'err':>5}  {'ttfb p50':>8} {'p95':>8} {'p99':>8}  "
+        f"{'lat p50':>8} {'p95':>8} {'p99':>8}  {'base p95':>8}",
+    ]
+    for endpoint, stats in report["endpoints"].items():
+        base = (baseline or {}).get("endpoints", {}).get(endpoint, {})
+        lines.append(
+            f"   {endpoint:<40} {stats['throughput_rps']:7.1f} {stats['errors']:5d}  "
+            f"{_ms(stats['ttfb_p50'])} {_ms(stats['ttfb_p95'])} {_ms(stats['ttfb_p99'])}  "
+            f"{_ms(stats['latency_p50'])} {_ms(stats['latency_p95'])} {_ms(stats['latency_p99'])}  "
+            f"{_ms(base.get('latency_p95'))}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,188 @@
+"""
+Seeded request workloads for the offline benchmark.
+
+Each workload is a reproducible list of requests (same seed, same
+requests in the same order) labelled with the endpoint they exercise:
+
+- study_mix: general study questions, web-search questions and follow-ups,
+  streamed and non-streamed
+- document_qa: chapter summaries and questions about uploaded documents
+- bulk_grading: teachers grading batches of essays, plus rubric lookups
+- auth_storm: bursts of logins (some with wrong passwords) and session
+  checks from many clients
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .fakes import fake_text
+
+
+@dataclass
+class RequestSpec:
+    """One request of a workload."""
+    method: str
+    path: str
+    endpoint: str
+    json: Optional[Dict[str, Any]] = None
+    user_id: Optional[str] = None
+    role: str = "student"
+    client: int = 0
+
+
+@dataclass
+class Workload:
+    """A named, seeded list of requests and the concurrency to run them at."""
+    name: str
+    requests: List[RequestSpec]
+    concurrency: int = 16
+    seed: int = 0
+    description: str = ""
+    endpoints: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.endpoints:
+            self.endpoints = sorted({spec.endpoint for spec in self.requests})
+
+
+TOPICS = ["photosynthesis", "cellular respiration", "mitosis", "the French Revolution",
+          "supply and demand", "Newton's second law", "recursion", "the water cycle"]
+
+STUDY_TEMPLATES = [
+    "Explain {topic} in simple terms",
+    "What is {topic}?",
+    "Give me three practice questions about {topic}",
+    "Compare {topic} with a related concept",
+]
+
+WEB_TEMPLATES = [
+    "What are the latest research findings on {topic}?",
+    "Find recent news about {topic}",
+]
+
+FOLLOW_UPS = ["Can you give an example?", "Summarize that in one paragraph", "Why does that matter?"]
+
+DOCUMENT_TEMPLATES = [
+    "Summarize chapter {chapter} of {document}",
+    "What does {document} say about {topic}?",
+    "List the key terms in section {chapter}.{section} of {document}",
+]
+
+DOCUMENTS = ["Biology.pdf", "Economics_Notes.pdf", "Physics_Lectures.pdf"]
+
+
+def _query(question: str, user: int, role: str, stream: bool, thread: str) -> RequestSpec:
+    path = "/query/stream" if stream else "/query/"
+    return RequestSpec(
+        method="POST",
+        path=path,
+        endpoint=f"POST {path}",
+        json={"question": question, "thread_id": thread, "user_role": role, "user_id": f"user-{user}"},
+        user_id=f"user-{user}",
+        role=role,
+        client=user,
+    )
+
+
+def study_mix(count: int = 200, seed: int = 1, users: int = 40) -> Workload:
+    """General study, web-search and follow-up questions (70% streamed)."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        user = rng.randrange(users)
+        topic = rng.choice(TOPICS)
+        roll = rng.random()
+        if roll < 0.55:
+            question = rng.choice(STUDY_TEMPLATES).format(topic=topic)
+        elif roll < 0.8:
+            question = rng.choice(WEB_TEMPLATES).format(topic=topic)
+        else:
+            question = rng.choice(FOLLOW_UPS)
+        requests.append(_query(question, user, "student", rng.random() < 0.7, f"thread-{user}"))
+    return Workload("study_mix", requests, concurrency=16, seed=seed,
+                    description="Study questions, web search and follow-ups")
+
+
+def document_qa(count: int = 150, seed: int = 2, users: int = 30) -> Workload:
+    """Questions about uploaded documents (all streamed)."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        user = rng.randrange(users)
+        question = rng.choice(DOCUMENT_TEMPLATES).format(
+            chapter=rng.randint(1, 12), section=rng.randint(1, 5),
+            document=rng.choice(DOCUMENTS), topic=rng.choice(TOPICS)
+        )
+        requests.append(_query(question, user, "student", True, f"docs-{user}"))
+    return Workload("document_qa", requests, concurrency=12, seed=seed,
+                    description="Document Q&A over uploaded course material")
+
+
+def bulk_grading(count: int = 80, seed: int = 3, teachers: int = 4) -> Workload:
+    """Teachers grading essays in batches, with rubric lookups between batches."""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        teacher = rng.randrange(teachers)
+        if i % 10 == 0:
+            requests.append(RequestSpec(
+                method="GET",
+                path=f"/grading/rubrics/teacher-{teacher}",
+                endpoint="GET /grading/rubrics/{professor_id}",
+                user_id=f"teacher-{teacher}",
+                role="teacher",
+                client=1000 + teacher,
+            ))
+            continue
+        essay = fake_text(f"essay-{i}", rng.randint(150, 600), seed)
+        question = f"Grade this essay on {rng.choice(TOPICS)} using my rubric:\n\n{essay}"
+        spec = _query(question, 1000 + teacher, "teacher", False, f"grading-{teacher}")
+        spec.user_id = f"teacher-{teacher}"
+        spec.json["user_id"] = spec.user_id
+        spec.json["professor_id"] = spec.user_id
+        requests.append(spec)
+    return Workload("bulk_grading", requests, concurrency=8, seed=seed,
+                    description="Batch essay grading by teachers")
+
+
+def auth_storm(count: int = 300, seed: int = 4, clients: int = 60, bad_password_rate: float = 0.2) -> Workload:
+    """Login bursts from many clients (some with wrong passwords) and session checks."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        client = rng.randrange(clients)
+        if rng.random() < 0.6:
+            password = "WrongPassword1!" if rng.random() < bad_password_rate else "BenchmarkPass123!"
+            requests.append(RequestSpec(
+                method="POST",
+                path="/api/auth/login/",
+                endpoint="POST /api/auth/login/",
+                json={"username": f"bench{client}@example.com", "password": password},
+                client=client,
+            ))
+        else:
+            requests.append(RequestSpec(
+                method="GET",
+                path="/api/auth/me/",
+                endpoint="GET /api/auth/me/",
+                user_id=f"user-{client}",
+                client=client,
+            ))
+    return Workload("auth_storm", requests, concurrency=32, seed=seed,
+                    description="Login bursts and session validation")
+
+
+WORKLOADS: Dict[str, Callable[..., Workload]] = {
+    "study_mix": study_mix,
+    "document_qa": document_qa,
+    "bulk_grading": bulk_grading,
+    "auth_storm": auth_storm,
+}
+
+
+def get_workload(name: str, **kwargs) -> Workload:
+    """Build a workload by name."""
+    if name not in WORKLOADS:
+        raise ValueError(f"Unknown workload: {name} (available: {', '.join(WORKLOADS)})")
+    return WORKLOADS[name](**kwargs)
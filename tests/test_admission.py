@@ -0,0 +1,223 @@
+"""
+Tests for API admission control: adaptive limit, priorities, deadline
+queues and the database utilization signal.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from utils.rate_limiting.admission import (
+    PRIORITY_BATCH,
+    PRIORITY_CRITICAL,
+    PRIORITY_INTERACTIVE,
+    REJECT_OVERLOAD,
+    REJECT_QUEUE_FULL,
+    REJECT_TIMEOUT,
+    AdmissionController,
+    AdmissionRejected,
+    route_key,
+    route_priority,
+)
+
+FAST = {PRIORITY_INTERACTIVE: 0.05, PRIORITY_BATCH: 0.05}
+
+
+def complete(controller, latency, count, route="POST /query/stream"):
+    """Run ``count`` requests with the given latency while about half the limit is busy."""
+
+    async def scenario():
+        held = []
+        for _ in range(count):
+            busy = int(controller.limit / 2)
+            while len(held) > busy:
+                controller.release(held.pop())
+            while len(held) < busy:
+                held.append(await controller.acquire(PRIORITY_INTERACTIVE, route))
+            ticket = await controller.acquire(PRIORITY_INTERACTIVE, route)
+            controller.release(ticket, latency)
+        for ticket in held:
+            controller.release(ticket)
+
+    asyncio.run(scenario())
+
+
+class TestRoutePriority:
+    """Test endpoint classification."""
+
+    def test_auth_health_and_polling_are_critical(self):
+        for path in ("/", "/health", "/ready", "/api/auth/login/", "/auth/me/",
+                     "/query/tasks/abc/status", "/docs", "/downloads/video.mp4"):
+            assert route_priority(path) == PRIORITY_CRITICAL
+
+    def test_queries_are_interactive_and_background_work_is_batch(self):
+        assert route_priority("/query/") == PRIORITY_INTERACTIVE
+        assert route_priority("/query/stream") == PRIORITY_INTERACTIVE
+        assert route_priority("/query/stream/concurrent") == PRIORITY_BATCH
+        assert route_priority("/grading/rubrics") == PRIORITY_BATCH
+        assert route_priority("/documents/upload") == PRIORITY_BATCH
+        assert route_priority("/queryx") == PRIORITY_CRITICAL
+
+    def test_route_keys_collapse_ids(self):
+        assert route_key("GET", "/query/history/thread-42") == "GET /query/history/{id}"
+        assert route_key("POST", "/query/") == "POST /query"
+
+
+class TestAdaptiveLimit:
+    """Test AIMD adaptation of the concurrency limit."""
+
+    def test_limit_drops_when_latency_rises(self):
+        controller = AdmissionController(initial_limit=40)
+        complete(controller, 0.1, 100)
+        assert controller.limit >= 40
+
+        complete(controller, 1.0, 300)
+
+        assert controller.limit < 30
+        assert controller.decreases > 0
+
+    def test_limit_recovers_when_latency_returns_to_baseline(self):
+        controller = AdmissionController(initial_limit=40)
+        complete(controller, 0.1, 100)
+        complete(controller, 1.0, 300)
+        lowered = controller.limit
+
+        complete(controller, 0.1, 1000)
+
+        assert controller.limit > lowered + 5
+
+    def test_limit_stays_within_bounds(self):
+        controller = AdmissionController(initial_limit=8, min_limit=4, max_limit=10)
+        complete(controller, 0.1, 50)
+        complete(controller, 5.0, 100)
+        assert controller.limit == 4
+
+        complete(controller, 0.1, 5000)
+        assert controller.limit <= 10
+
+    @pytest.mark.parametrize("name", ["lognormal", "cache_hits", "fast_errors"])
+    def test_mixed_latencies_at_low_load_keep_the_limit(self, name):
+        rng = random.Random(7)
+        latency = {
+            "lognormal": lambda: rng.lognormvariate(0, 0.8),
+            "cache_hits": lambda: 0.01 if rng.random() < 0.3 else rng.lognormvariate(0, 0.5),
+            "fast_errors": lambda: 0.002 if rng.random() < 0.1 else rng.lognormvariate(0, 0.5),
+        }[name]
+        controller = AdmissionController(initial_limit=32)
+
+        async def scenario():
+            held = [await controller.acquire(PRIORITY_INTERACTIVE, "POST /query") for _ in range(2)]
+            for _ in range(3000):
+                ticket = await controller.acquire(PRIORITY_INTERACTIVE, "POST /query")
+                controller.release(ticket, latency())
+            for ticket in held:
+                controller.release(ticket)
+
+        asyncio.run(scenario())
+
+        assert controller.decreases == 0
+        assert controller.limit >= 32
+
+    def test_routes_have_their_own_baseline(self):
+        controller = AdmissionController(initial_limit=20)
+        for _ in range(20):
+            complete(controller, 0.05, 10, route="GET /query/history/{id}")
+            complete(controller, 2.0, 10, route="POST /query/stream")
+
+        assert controller.decreases == 0
+
+
+class TestShedding:
+    """Test priorities, bounded queues and deadlines."""
+
+    def test_batch_is_shed_while_interactive_is_admitted(self):
+        controller = AdmissionController(initial_limit=4, batch_share=0.5, queue_timeout=FAST)
+
+        async def scenario():
+            batch = [await controller.acquire(PRIORITY_BATCH) for _ in range(2)]
+            with pytest.raises(AdmissionRejected) as rejected:
+                await controller.acquire(PRIORITY_BATCH)
+            interactive = [await controller.acquire(PRIORITY_INTERACTIVE) for _ in range(2)]
+            return batch, rejected.value, interactive
+
+        batch, rejected, interactive = asyncio.run(scenario())
+
+        assert rejected.reason == REJECT_TIMEOUT
+        assert rejected.retry_after >= 1
+        assert controller.in_flight == 4
+
+    def test_interactive_waiters_are_admitted_before_batch(self):
+        controller = AdmissionController(initial_limit=2, min_limit=1, batch_share=1.0)
+
+        async def scenario():
+            held = [await controller.acquire(PRIORITY_INTERACTIVE) for _ in range(2)]
+            batch = asyncio.create_task(controller.acquire(PRIORITY_BATCH))
+            await asyncio.sleep(0)
+            interactive = asyncio.create_task(controller.acquire(PRIORITY_INTERACTIVE))
+            await asyncio.sleep(0)
+
+            controller.release(held[0], 0.1)
+            await asyncio.sleep(0.01)
+            first = (interactive.done(), batch.done())
+
+            controller.release(held[1], 0.1)
+            await asyncio.gather(batch, interactive)
+            return first
+
+        assert asyncio.run(scenario()) == (True, False)
+
+    def test_full_queue_rejects_immediately(self):
+        controller = AdmissionController(initial_limit=1, min_limit=1, max_queue=1)
+
+        async def scenario():
+            await controller.acquire(PRIORITY_INTERACTIVE)
+            waiting = asyncio.create_task(controller.acquire(PRIORITY_INTERACTIVE))
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected) as rejected:
+                await controller.acquire(PRIORITY_INTERACTIVE)
+            waiting.cancel()
+            return rejected.value
+
+        rejected = asyncio.run(scenario())
+
+        assert rejected.reason == REJECT_QUEUE_FULL
+        assert controller.queued == 0
+        assert controller.get_stats()["rejected"] == {"interactive:queue_full": 1}
+
+    def test_retry_after_grows_with_queue_and_is_capped(self):
+        controller = AdmissionController(initial_limit=4)
+        complete(controller, 2.0, 5)
+        short = controller.retry_after()
+
+        for _ in range(200):
+            controller._queues[PRIORITY_INTERACTIVE].append((None, None))
+
+        assert 1 <= short < controller.retry_after() == 30
+
+
+class TestDatabaseSignal:
+    """Test database pool utilization as an extra signal."""
+
+    def test_saturated_pool_shrinks_limit_and_sheds_batch(self):
+        utilization = {"value": 0.5}
+        controller = AdmissionController(initial_limit=40, utilization_provider=lambda: utilization["value"])
+        assert controller.effective_limit == 40
+
+        utilization["value"] = 0.95
+        controller._utilization_at = float("-inf")
+
+        assert controller.effective_limit < 20
+        with pytest.raises(AdmissionRejected) as rejected:
+            asyncio.run(controller.acquire(PRIORITY_BATCH))
+        assert rejected.value.reason == REJECT_OVERLOAD
+        asyncio.run(controller.acquire(PRIORITY_INTERACTIVE))
+
+    def test_failing_provider_is_ignored(self):
+        def broken():
+            raise RuntimeError("no engine")
+
+        controller = AdmissionController(initial_limit=10, utilization_provider=broken)
+
+        assert controller.effective_limit == 10
+        assert controller.utilization_provider is None
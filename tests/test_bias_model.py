@@ -0,0 +1,124 @@
+"""
+Tests for the professor override bias model.
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from utils.ml.bias_model import (
+    BiasModelService,
+    CriterionStats,
+    ProfessorBiasModel,
+    batch_criterion_stats,
+)
+
+
+def _naive_stats(values):
+    mean = sum(values) / len(values)
+    std = (sum((v - mean) ** 2 for v in values) / len(values)) ** 0.5
+    return mean, std
+
+
+class TestCriterionStats:
+    """Test Welford running statistics."""
+
+    def test_matches_naive_computation(self):
+        """Incremental mean/std-dev equal the two-pass result."""
+        values = [3.0, -1.5, 4.25, 2.0, 7.5, 3.0]
+        stats = CriterionStats()
+        for value in values:
+            stats.update(value)
+
+        mean, std = _naive_stats(values)
+        assert stats.count == len(values)
+        assert stats.mean == pytest.approx(mean)
+        assert stats.std_dev == pytest.approx(std)
+
+    def test_merge_equals_single_pass(self):
+        """Merging partial aggregates equals aggregating everything at once."""
+        left, right, combined = CriterionStats(), CriterionStats(), CriterionStats()
+        for value in [1.0, 2.0, 3.0]:
+            left.update(value)
+            combined.update(value)
+        for value in [10.0, 20.0]:
+            right.update(value)
+            combined.update(value)
+
+        left.merge(right)
+
+        assert left.count == combined.count
+        assert left.mean == pytest.approx(combined.mean)
+        assert left.m2 == pytest.approx(combined.m2)
+
+    def test_batch_matches_incremental(self):
+        """Vectorized batch recompute equals incremental updates."""
+        pairs = [
+            ({"thesis": 7, "grammar": 8}, {"thesis": 10, "grammar": 8}),
+            ({"thesis": 6}, {"thesis": 9}),
+            ({"thesis": 8, "grammar": 5}, {"thesis": 11, "grammar": 4}),
+        ]
+        model = ProfessorBiasModel()
+        for ai, prof in pairs:
+            model.observe(ai, prof)
+
+        batch = batch_criterion_stats(pairs)
+
+        for criterion, stats in model.criteria.items():
+            assert batch[criterion].count == stats.count
+            assert batch[criterion].mean == pytest.approx(stats.mean)
+            assert batch[criterion].m2 == pytest.approx(stats.m2)
+
+
+class TestBiasModelService:
+    """Test cached analysis and incremental updates."""
+
+    def _service_with_model(self, corrections):
+        service = BiasModelService()
+        model = ProfessorBiasModel()
+        for ai, prof in corrections:
+            model.observe(ai, prof)
+        service._models[("prof1", "essay")] = model
+        return service
+
+    def test_detects_systematic_bias(self):
+        """Consistent large adjustments are flagged."""
+        service = self._service_with_model([({"thesis": 6}, {"thesis": 9})] * 5)
+
+        result = service.analyze("prof1", "essay")
+
+        assert result["found"] is True
+        assert result["systematic_bias"]["thesis"]["average_adjustment"] == 3.0
+        assert result["recommendation"] == "Apply reconciliation"
+
+    def test_cached_reads_are_hits(self):
+        """Repeated analysis is served from cache."""
+        service = self._service_with_model([({"thesis": 6}, {"thesis": 9})])
+
+        for _ in range(200):
+            service.analyze("prof1", "essay")
+
+        assert service.get_stats()["hits"] == 200
+        assert service.get_stats()["misses"] == 0
+
+    def test_record_exception_counts_once(self):
+        """Status transitions into a counted status update the model exactly once."""
+        service = self._service_with_model([])
+        exception = SimpleNamespace(
+            exception_type="grading_correction",
+            status="analyzed",
+            user_id="prof1",
+            rubric_type="essay",
+            ai_decision={"criterion_scores": {"thesis": 5}},
+            correct_decision={"criterion_scores": {"thesis": 8}},
+            correction_reason="Too harsh",
+            created_at=None,
+            score_difference=3.0,
+        )
+
+        service.record_exception(exception, previous_status="pending")
+        exception.status = "learned"
+        service.record_exception(exception, previous_status="analyzed")
+
+        model = service._models[("prof1", "essay")]
+        assert model.corrections == 1
+        assert model.criteria["thesis"].mean == 3.0
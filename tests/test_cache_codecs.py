@@ -0,0 +1,229 @@
+"""
+Tests and benchmark for binary cache value codecs.
+
+The benchmark encodes typical L2 values (a long synthesized answer, a
+retrieval result, a chat history and a small status dict) with JSON (the
+previous format) and every available serializer/compressor pair, and
+reports stored bytes (Redis memory and network bytes per hit) and
+encode/decode time per value.
+
+Run benchmark with output: python -m pytest tests/test_cache_codecs.py -v -s -k benchmark
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+
+from utils.core.advanced_cache import MultiTierCache
+from utils.core.cache_codecs import (
+    CacheCodec,
+    CodecError,
+    decode_value,
+    describe_value,
+    available_serializers,
+    available_compressors,
+    CODEC_VERSION,
+)
+
+
+@dataclass
+class Message:
+    """Stand-in for a LangChain message object."""
+    role: str
+    content: str
+
+
+class FakeRedis:
+    """Async get/setex/mget over a dict of bytes."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+def make_cache(**kwargs):
+    cache = MultiTierCache(ttl=60, max_size=1000, **kwargs)
+    cache.l2_cache = FakeRedis()
+    cache.enable_redis = True
+    return cache
+
+
+def read_through_l2(cache, key, namespaces=()):
+    """Read a value back from Redis (bypassing L1)."""
+    async def scenario():
+        cache.l1_cache.clear()
+        return await cache.get(key, namespaces=namespaces)
+    return asyncio.run(scenario())
+
+
+WORDS = ("photosynthesis chlorophyll light reaction energy glucose carbon dioxide "
+         "oxygen stroma thylakoid membrane electron transport ATP NADPH cycle "
+         "the a of and in to is which during plant cell").split()
+
+
+def make_text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class TestCacheCodec:
+    """Test encoding, fallbacks and the versioned header."""
+
+    @pytest.mark.parametrize("serializer", available_serializers())
+    @pytest.mark.parametrize("compressor", available_compressors())
+    def test_round_trip(self, serializer, compressor):
+        codec = CacheCodec(serializer=serializer, compressor=compressor, compress_threshold=64)
+        value = {"answer": "mitosis " * 200, "sources": ["Biology.pdf"], "score": 0.93, "cached": True}
+
+        encoded = codec.encode(value)
+
+        assert decode_value(encoded) == value
+        assert describe_value(encoded)["version"] == CODEC_VERSION
+
+    def test_small_values_are_not_compressed(self):
+        codec = CacheCodec(compressor="zlib", compress_threshold=1024)
+
+        assert describe_value(codec.encode({"status": "ok"}))["compressor"] == "none"
+        assert describe_value(codec.encode("x" * 5000))["compressor"] == "zlib"
+
+    def test_objects_fall_back_to_pickle(self):
+        """Objects msgpack/JSON cannot represent exactly round-trip via pickle."""
+        codec = CacheCodec(serializer="json")
+        history = [Message("user", "What is ATP?"), Message("assistant", "Energy currency.")]
+
+        encoded = codec.encode(history)
+
+        assert describe_value(encoded)["serializer"] == "pickle"
+        assert decode_value(encoded) == history
+
+    def test_without_pickle_fallback_raises(self):
+        with pytest.raises(CodecError):
+            CacheCodec(serializer="json", pickle_fallback=False).encode(datetime(2026, 1, 1))
+
+    def test_langchain_messages_round_trip(self):
+        messages = pytest.importorskip("langchain_core.messages")
+        history = [messages.HumanMessage(content="hi"), messages.AIMessage(content="hello")]
+
+        assert decode_value(CacheCodec().encode(history)) == history
+
+    def test_legacy_json_values_still_decode(self):
+        assert decode_value('{"answer": "42"}') == {"answer": "42"}
+        assert decode_value(b'["a", 1]') == ["a", 1]
+        assert describe_value(b'{"a": 1}') is None
+
+    def test_unknown_version_and_corruption(self):
+        encoded = bytearray(CacheCodec(compressor="zlib", compress_threshold=1).encode("x" * 100))
+
+        with pytest.raises(CodecError):
+            decode_value(bytes(encoded[:2]) + bytes([CODEC_VERSION + 1]) + bytes(encoded[3:]))
+        with pytest.raises(CodecError):
+            decode_value(bytes(encoded[:-4]))
+
+    def test_unknown_names_rejected(self):
+        with pytest.raises(ValueError):
+            CacheCodec(serializer="yaml")
+
+
+class TestMultiTierCacheCodecs:
+    """Test codec use in the L2 tier."""
+
+    def test_l2_round_trip_and_stats(self):
+        cache = make_cache(codec=CacheCodec(compressor="zlib"))
+        answer = {"answer": make_text(random.Random(1), 2000), "sources": ["Biology.pdf"]}
+        asyncio.run(cache.set("q", answer))
+
+        assert read_through_l2(cache, "q") == answer
+        stats = cache.get_stats()
+        assert stats["l2_hits"] == 1
+        assert 0 < stats["l2_bytes_written"] < len(json.dumps(answer)) / 2
+
+    def test_per_namespace_codec(self):
+        cache = make_cache(codec=CacheCodec(serializer="json", compressor="none"))
+        cache.register_codec("conversation:", CacheCodec(serializer="pickle", compressor="zlib"))
+        history = [Message("user", "hi " * 1000)]
+
+        asyncio.run(cache.set("history", history, namespaces=["conversation:42"]))
+        asyncio.run(cache.set("status", {"ok": True}))
+        stored = {describe_value(v)["serializer"] for v in cache.l2_cache.data.values()}
+
+        assert stored == {"pickle", "json"}
+        assert read_through_l2(cache, "history", namespaces=["conversation:42"]) == history
+
+    def test_corrupt_value_is_a_miss(self):
+        cache = make_cache()
+        asyncio.run(cache.set("k", "v"))
+        key = next(iter(cache.l2_cache.data))
+        cache.l2_cache.data[key] = b"\x00\xc7\x01\x02\x09garbage"
+
+        assert read_through_l2(cache, "k") is None
+        assert cache.get_stats()["codec_errors"] == 1
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+ITERATIONS = 200
+
+
+def benchmark_values():
+    rng = random.Random(3)
+    chunks = [
+        {"id": f"chunk-{i}", "document_name": "Biology.pdf", "chapter_number": 3,
+         "page_number": 40 + i, "similarity": round(rng.random(), 4), "content": make_text(rng, 150)}
+        for i in range(15)
+    ]
+    return {
+        "synthesized answer": {"answer": make_text(rng, 1500), "sources": ["Biology.pdf", "Notes.pdf"]},
+        "retrieval result": {"query": "summarize chapter 3", "chunks": chunks},
+        "chat history (objects)": [Message("user" if i % 2 else "assistant", make_text(rng, 80)) for i in range(20)],
+        "status dict": {"status": "ok", "count": 3},
+    }
+
+
+def time_per_call(fn, arg):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        result = fn(arg)
+    return result, (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+@pytest.mark.slow
+def test_benchmark_codecs():
+    """Binary codecs shrink large values versus JSON and carry objects JSON cannot."""
+    codecs = [CacheCodec(serializer=s, compressor=c)
+              for s in available_serializers() for c in available_compressors()]
+    sizes = {}
+
+    for label, value in benchmark_values().items():
+        print(f"\n📦 {label}")
+        try:
+            legacy, encode_us = time_per_call(lambda v: json.dumps(v).encode(), value)
+            _, decode_us = time_per_call(json.loads, legacy)
+            print(f"   {'json (previous)':<18} {len(legacy):>8,} B  encode {encode_us:7.1f}µs  decode {decode_us:7.1f}µs")
+            sizes[(label, "legacy")] = len(legacy)
+        except TypeError:
+            print(f"   {'json (previous)':<18} not storable")
+
+        for codec in codecs:
+            encoded, encode_us = time_per_call(codec.encode, value)
+            decoded, decode_us = time_per_call(decode_value, encoded)
+            assert decoded == value
+            sizes[(label, codec.name)] = len(encoded)
+            print(f"   {codec.name:<18} {len(encoded):>8,} B  encode {encode_us:7.1f}µs  decode {decode_us:7.1f}µs")
+
+    best = min(sizes[("synthesized answer", codec.name)] for codec in codecs)
+    assert best * 2 < sizes[("synthesized answer", "legacy")]
+    assert ("chat history (objects)", "legacy") not in sizes
@@ -0,0 +1,262 @@
+"""
+Tests for namespace-generation cache invalidation and bulk cache access.
+
+A fake Redis records every command so tests can check that invalidation is
+a constant number of commands regardless of how many keys depend on a
+namespace, that nothing runs ``KEYS``, and that orphaned entries are
+reclaimed by SCAN in the background.
+"""
+
+import asyncio
+import fnmatch
+
+import pytest
+
+import utils.core.advanced_cache as advanced_cache
+from utils.core.advanced_cache import MultiTierCache, parse_key_generations
+from utils.cache.cache_strategies import CacheOptimizer
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.redis.commands.append("pipeline")
+        results = []
+        for name, args, kwargs in self.calls:
+            results.append(await getattr(self.redis, "_" + name)(*args, **kwargs))
+        return results
+
+
+class FakeRedis:
+    """In-memory async Redis subset (decode_responses=True)."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def __getattr__(self, name):
+        handler = getattr(self, "_" + name)
+
+        async def command(*args, **kwargs):
+            self.commands.append(name)
+            return await handler(*args, **kwargs)
+        return command
+
+    async def _get(self, key):
+        return self.data.get(key)
+
+    async def _mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def _setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def _incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def _delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def _unlink(self, *keys):
+        return await self._delete(*keys)
+
+    async def _keys(self, pattern):
+        raise AssertionError("KEYS blocks Redis and must not be used")
+
+    async def scan_iter(self, match="*", count=None):
+        self.commands.append("scan")
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+
+def make_cache(redis=None, **kwargs):
+    cache = MultiTierCache(ttl=60, max_size=10_000, **kwargs)
+    if redis is not None:
+        cache.l2_cache = redis
+        cache.enable_redis = True
+    return cache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestLocalNamespaces:
+    """Test generations without Redis."""
+
+    def test_invalidate_namespace(self):
+        async def scenario():
+            cache = make_cache()
+            await cache.set("summary", "old", namespaces=["document:1"])
+            await cache.set("other", "kept", namespaces=["document:2"])
+
+            await cache.invalidate_namespace("document:1")
+
+            return (await cache.get("summary", namespaces=["document:1"]),
+                    await cache.get("other", namespaces=["document:2"]))
+
+        assert run(scenario()) == (None, "kept")
+
+    def test_entry_needs_all_its_namespaces(self):
+        """An entry stored under several namespaces is dropped by any of them."""
+        async def scenario():
+            cache = make_cache()
+            await cache.set("k", "v", namespaces=["user:1", "document:1"])
+            before = await cache.get("k", namespaces=["document:1", "user:1"])
+            await cache.invalidate_namespace("user:1")
+            return before, await cache.get("k", namespaces=["user:1", "document:1"])
+
+        assert run(scenario()) == ("v", None)
+
+    def test_clear_orphans_everything(self):
+        async def scenario():
+            cache = make_cache()
+            await cache.set("a", 1)
+            await cache.set("b", 2, namespaces=["tag:x"])
+            await cache.clear()
+            return await cache.get("a"), await cache.get("b", namespaces=["tag:x"])
+
+        assert run(scenario()) == (None, None)
+
+    def test_forgotten_generation_does_not_resurrect(self, monkeypatch):
+        """Evicting a local counter moves the floor past its generation."""
+        monkeypatch.setattr(advanced_cache, "CACHE_GENERATION_MAX_TRACKED", 2)
+
+        async def scenario():
+            cache = make_cache()
+            await cache.set("k", "stale", namespaces=["document:1"])
+            await cache.invalidate_namespace("document:1")
+            await cache.set("k", "fresh", namespaces=["document:1"])
+            await cache.invalidate_namespace("document:1")
+            await cache.invalidate_namespace("document:2", "document:3")
+            return await cache.get("k", namespaces=["document:1"])
+
+        assert run(scenario()) is None
+
+    @pytest.mark.parametrize("namespace", ["", "a,b", "a|b", "doc:*", "a b"])
+    def test_invalid_namespace(self, namespace):
+        with pytest.raises(ValueError):
+            run(make_cache().set("k", "v", namespaces=[namespace]))
+
+    def test_parse_key_generations(self):
+        assert parse_key_generations("cache|all@3,user:a@b.c@7|key") == {"all": 3, "user:a@b.c": 7}
+        assert parse_key_generations("cache:legacy") is None
+
+
+class TestRedisNamespaces:
+    """Test shared generations, bulk access and background cleanup."""
+
+    def test_invalidation_is_constant_work(self):
+        """Bumping a namespace is one pipelined command however many keys depend on it."""
+        async def scenario(count):
+            redis = FakeRedis()
+            cache = make_cache(redis)
+            await cache.mset({f"chunk{i}": i for i in range(count)}, namespaces=["document:1"])
+            redis.commands.clear()
+            await cache.invalidate_namespace("document:1", cleanup=False)
+            return redis.commands
+
+        assert run(scenario(10)) == run(scenario(5_000)) == ["pipeline"]
+
+    def test_bump_is_shared_between_instances(self, monkeypatch):
+        monkeypatch.setattr(advanced_cache, "CACHE_GENERATION_REFRESH_SECONDS", 0)
+
+        async def scenario():
+            redis = FakeRedis()
+            writer, reader = make_cache(redis), make_cache(redis)
+            await writer.set("rubric", "v1", namespaces=["rubric:7"])
+            before = await reader.get("rubric", namespaces=["rubric:7"])
+            await writer.invalidate_namespace("rubric:7", cleanup=False)
+            return before, await reader.get("rubric", namespaces=["rubric:7"])
+
+        assert run(scenario()) == ("v1", None)
+
+    def test_mget_uses_one_round_trip(self):
+        async def scenario():
+            redis = FakeRedis()
+            writer, reader = make_cache(redis), make_cache(redis)
+            await writer.mset({"a": 1, "b": 2, "c": 3})
+            await reader.get("a")  # Promote one entry to the reader's L1
+            redis.commands.clear()
+
+            values = await reader.mget(["a", "b", "missing", "c"])
+            return values, redis.commands, reader.get_stats()
+
+        values, commands, stats = run(scenario())
+
+        assert values == [1, 2, None, 3]
+        assert commands == ["mget"]
+        assert stats["l1_hits"] == 1 and stats["l2_hits"] == 3 and stats["misses"] == 1
+
+    def test_background_cleanup_reclaims_orphans(self):
+        async def scenario():
+            redis = FakeRedis()
+            cache = make_cache(redis)
+            await cache.mset({f"k{i}": i for i in range(50)}, namespaces=["document:1"])
+            await cache.mset({f"k{i}": i for i in range(5)}, namespaces=["document:2"])
+            await cache.invalidate_namespace("document:1")
+            await cache.wait_for_cleanup()
+            return redis.data, cache.get_stats()
+
+        data, stats = run(scenario())
+        cached = [parse_key_generations(key) for key in data if key.startswith("cache|")]
+
+        assert stats["keys_reclaimed"] == 50
+        assert len(cached) == 5 and all("document:2" in gens for gens in cached)
+        assert data["cache:gen:document:1"] == "1"
+
+    def test_clear_removes_legacy_keys_without_keys_command(self):
+        async def scenario():
+            redis = FakeRedis()
+            redis.data["cache:legacy-entry"] = "1"
+            cache = make_cache(redis)
+            await cache.set("a", 1)
+            await cache.clear()
+            await cache.wait_for_cleanup()
+            return redis.data
+
+        assert run(scenario()) == {"cache:gen:all": "1"}
+
+
+class TestCacheOptimizerTags:
+    """Test tag and pattern invalidation through the optimizer."""
+
+    def test_tags_invalidate_loaded_entries(self):
+        async def scenario():
+            optimizer = CacheOptimizer(make_cache(), enable_warming=False, enable_prefetching=False)
+            loads = []
+
+            def loader(key):
+                loads.append(key)
+                return f"{key}@{len(loads)}"
+
+            first = await optimizer.get_optimized("rubrics:prof1", loader, tags=["RubricModel"])
+            cached = await optimizer.get_optimized("rubrics:prof1", loader, tags=["RubricModel"])
+            await optimizer.invalidate(tags=["RubricModel"])
+            reloaded = await optimizer.get_optimized("rubrics:prof1", loader, tags=["RubricModel"])
+            return first, cached, reloaded
+
+        assert run(scenario()) == ("rubrics:prof1@1", "rubrics:prof1@1", "rubrics:prof1@2")
+
+    def test_pattern_invalidation(self):
+        async def scenario():
+            optimizer = CacheOptimizer(make_cache(), enable_warming=False, enable_prefetching=False)
+            await optimizer.set_with_tags("doc:1:summary", "s", pattern="doc:1")
+            await optimizer.invalidate(pattern="doc:1")
+            return await optimizer.cache.get("doc:1:summary", namespaces=["pattern:doc:1"])
+
+        assert run(scenario()) is None
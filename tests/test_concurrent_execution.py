@@ -455,7 +455,35 @@ async def test_task_duration_learning():
             pass
     
     # Check that estimator has recorded the durations
-    assert len(manager.estimator.historical_durations[TaskType.WEB_SEARCH]) == 3
+    assert manager.estimator.models[TaskType.WEB_SEARCH].samples == 3
+
+
+@pytest.mark.asyncio
+async def test_inline_duration_is_recorded_with_caller_context(monkeypatch):
+    """Test that inline runs are timed with the quality/chunk count the caller passed."""
+    manager = get_task_manager()
+    recorded = []
+    monkeypatch.setattr(
+        manager.estimator, "record_duration",
+        lambda task_type, duration, features=None: recorded.append((task_type, features))
+    )
+    
+    async def retrieval():
+        return "answer"
+    
+    async for update in manager.execute_with_concurrency(
+        task_type=TaskType.DOCUMENT_QA,
+        task_function=retrieval,
+        task_args={},
+        question="summarize chapter 2",
+        thread_id="test-thread",
+        chunk_count=60
+    ):
+        pass
+    
+    assert recorded == [
+        (TaskType.DOCUMENT_QA, manager.estimator.features("summarize chapter 2", chunk_count=60))
+    ]
 
 
 @pytest.mark.integration
@@ -0,0 +1,123 @@
+"""
+Tests for tokenizer-based context budgeting.
+"""
+
+import pytest
+
+from utils.rag.context_budget import (
+    ContextPacker,
+    KIND_CHUNK,
+    KIND_HISTORY,
+    count_tokens,
+    truncate_text_to_tokens,
+    split_retrieved_text,
+    pack_retrieved_text,
+)
+
+
+class TestTokenCounting:
+    """Test token counting and truncation."""
+
+    def test_count_tokens_empty(self):
+        """Empty text has no tokens."""
+        assert count_tokens("") == 0
+
+    def test_count_tokens_grows_with_text(self):
+        """Longer text has more tokens."""
+        assert count_tokens("hello world " * 50) > count_tokens("hello world")
+
+    def test_truncate_respects_budget(self):
+        """Truncated text fits within the budget."""
+        text = "The quick brown fox jumps over the lazy dog. " * 100
+        truncated = truncate_text_to_tokens(text, 20)
+
+        assert truncated.endswith("...")
+        assert count_tokens(truncated) <= 22
+
+    def test_truncate_short_text_unchanged(self):
+        """Text under budget is returned as-is."""
+        assert truncate_text_to_tokens("short text", 100) == "short text"
+
+
+class TestContextPacker:
+    """Test priority/relevance packing and deduplication."""
+
+    def test_packs_within_budget(self):
+        """Packed tokens never exceed the budget."""
+        packer = ContextPacker(budget=50)
+        packer.add_chunks([f"Passage {i} about topic number {i} in detail." for i in range(20)])
+
+        packed = packer.pack()
+
+        assert packed.tokens_used <= 50
+        assert packed.items_dropped > 0
+        assert packed.tokens_saved > 0
+
+    def test_keeps_most_relevant_chunks(self):
+        """Higher-relevance chunks win when the budget is tight."""
+        packer = ContextPacker(budget=count_tokens("important passage kept") + 1)
+        packer.add_chunks(
+            ["filler passage dropped", "important passage kept"],
+            scores=[0.1, 0.9]
+        )
+
+        packed = packer.pack()
+
+        assert packed.render() == "important passage kept"
+
+    def test_preserves_reading_order(self):
+        """Packed items are emitted in insertion order, not score order."""
+        packer = ContextPacker(budget=1000)
+        packer.add_chunks(["first chunk", "second chunk", "third chunk"], scores=[0.1, 0.9, 0.5])
+
+        packed = packer.pack()
+
+        assert packed.render(separator="|") == "first chunk|second chunk|third chunk"
+
+    def test_removes_near_duplicates(self):
+        """Near-identical chunks are collapsed to one copy."""
+        base = "Gradient descent updates parameters in the direction of the negative gradient of the loss."
+        packer = ContextPacker(budget=1000)
+        packer.add_chunks([base, base + " ", base.upper(), "A different passage entirely about optimizers."])
+
+        packed = packer.pack()
+
+        assert packed.duplicates_removed == 2
+        assert len(packed.by_kind(KIND_CHUNK)) == 2
+
+    def test_history_prioritized_over_chunks(self):
+        """History outranks chunks by default priority."""
+        packer = ContextPacker(budget=count_tokens("What is chapter 3 about?") + 2)
+        packer.add_chunks(["Chapter 3 covers convolutional networks in depth."])
+        packer.add_history(["What is chapter 3 about?"])
+
+        packed = packer.pack()
+
+        assert len(packed.by_kind(KIND_HISTORY)) == 1
+        assert not packed.by_kind(KIND_CHUNK)
+
+
+class TestRetrievedTextPacking:
+    """Test packing of formatted tool output."""
+
+    def test_split_extracts_sources(self):
+        """'From:' lines become passage sources."""
+        raw = (
+            "Retrieved information from your documents:\n\n"
+            "From: notes.pdf\n" + "─" * 80 + "\n"
+            "First passage.\n\n"
+            "Second passage.\n\n" + "─" * 80 + "\n\n"
+        )
+
+        passages = split_retrieved_text(raw)
+
+        assert passages == [("notes.pdf", "First passage."), ("notes.pdf", "Second passage.")]
+
+    def test_pack_renders_sources_once(self):
+        """Rendering with sources emits each source header once per run."""
+        raw = "From: a.pdf\nOne.\n\nTwo.\n\nFrom: b.pdf\nThree."
+
+        rendered = pack_retrieved_text(raw).render(with_sources=True)
+
+        assert rendered.count("From: a.pdf") == 1
+        assert rendered.count("From: b.pdf") == 1
@@ -0,0 +1,274 @@
+"""
+Tests and benchmark for ingestion-time document structure indexing.
+
+The benchmark compares the old chapter lookup (``LIKE '%chapter N%'`` over
+chunk content) with the structured index lookup on a synthetic multi-chapter
+book, using an in-memory SQLite copy of the relevant document_vectors columns.
+
+Run benchmark with output: python -m pytest tests/test_document_structure.py -v -s -k benchmark
+"""
+
+import sqlite3
+import statistics
+import time
+
+import pytest
+
+from utils.rag.document_structure import (
+    DocumentStructureTracker,
+    annotate_chunk_structure,
+    parse_structure_reference,
+    select_reading_order,
+)
+
+
+# =============================================================================
+# SYNTHETIC BOOK
+# =============================================================================
+
+CHAPTERS = 20
+SECTIONS_PER_CHAPTER = 3
+PARAGRAPHS_PER_SECTION = 4
+PAGE_CHARS = 1800
+CHUNK_CHARS = 800
+
+
+def make_book():
+    """
+    Build a book as (line, chapter) pairs with [Page N] markers.
+
+    Body paragraphs cross-reference other chapters in running text, as
+    real textbooks do ("as discussed in chapter 11").
+    """
+    lines = []
+    page, page_chars = 1, 0
+    lines.append(("[Page 1]", None))
+
+    def emit(line, chapter):
+        nonlocal page, page_chars
+        if page_chars >= PAGE_CHARS:
+            page += 1
+            page_chars = 0
+            lines.append((f"[Page {page}]", None))
+        lines.append((line, chapter))
+        page_chars += len(line)
+
+    for chapter in range(1, CHAPTERS + 1):
+        emit(f"Chapter {chapter}: Topic {chapter}", chapter)
+        for section in range(1, SECTIONS_PER_CHAPTER + 1):
+            emit(f"{chapter}.{section} Subtopic {chapter}.{section}", chapter)
+            for paragraph in range(PARAGRAPHS_PER_SECTION):
+                other = (chapter + paragraph) % CHAPTERS + 1
+                emit(
+                    f"Paragraph {paragraph} of section {chapter}.{section} develops the argument further, "
+                    f"building on ideas that were introduced earlier; as discussed in chapter {other}, "
+                    f"the same principle applies to related problems and worked examples in this part. "
+                    f"Students should review the exercises before moving on to the next section.",
+                    chapter
+                )
+    return lines
+
+
+def chunk_book(lines):
+    """Greedy line packing with one line of overlap (like the recursive splitter)."""
+    chunks, current = [], []
+    for line in lines:
+        if current and sum(len(l) for l, _ in current) + len(line[0]) > CHUNK_CHARS:
+            chunks.append(current)
+            current = current[-1:]
+        current.append(line)
+    if current:
+        chunks.append(current)
+
+    result = []
+    for chunk_lines in chunks:
+        weights = {}
+        for text, chapter in chunk_lines:
+            if chapter is not None:
+                weights[chapter] = weights.get(chapter, 0) + len(text)
+        result.append({
+            "content": "\n".join(text for text, _ in chunk_lines),
+            "true_chapter": max(reversed(list(weights)), key=weights.get) if weights else None,
+        })
+    return result
+
+
+@pytest.fixture(scope="module")
+def book_chunks():
+    return annotate_chunk_structure(chunk_book(make_book()))
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+class TestStructureDetection:
+    """Test heading, chapter, section and page detection."""
+
+    def test_chapters_match_ground_truth(self, book_chunks):
+        """Every chunk is assigned the chapter covering most of its text."""
+        wrong = [c for c in book_chunks if c["structure"]["chapter_number"] != c["true_chapter"]]
+        assert wrong == []
+
+    def test_sections_and_titles(self):
+        """Chapter and numbered section headings are parsed with titles."""
+        tracker = DocumentStructureTracker()
+        structure = tracker.annotate("Chapter 12: Neural Networks\n12.3 Backpropagation\nBody text.")
+
+        assert structure.chapter_number == 12
+        assert structure.chapter_title == "Neural Networks"
+        assert structure.section_number == "12.3"
+        assert structure.section_title == "Backpropagation"
+
+    def test_markdown_and_roman_headings(self):
+        """Docling markdown headings and roman numerals are recognized."""
+        tracker = DocumentStructureTracker()
+
+        assert tracker.annotate("## **CHAPTER XII** The Return\nText").chapter_number == 12
+        assert tracker.annotate("### Worked Examples\nMore text").heading == "Worked Examples"
+
+    def test_running_text_is_not_a_heading(self):
+        """Cross-references in body text do not switch chapters."""
+        tracker = DocumentStructureTracker()
+        tracker.annotate("Chapter 3: Optics\nLight bends.")
+
+        structure = tracker.annotate("Chapter 7 discusses lenses in more depth.")
+
+        assert structure.chapter_number == 3
+
+    def test_page_ranges(self):
+        """Page ranges cover the pages a chunk has text on."""
+        tracker = DocumentStructureTracker()
+        first = tracker.annotate("[Page 4]\nText on four.\n[Page 5]\nText on five.")
+        second = tracker.annotate("More text on five.\n[Page 6]")
+
+        assert (first.page_start, first.page_end) == (4, 5)
+        assert (second.page_start, second.page_end) == (5, 5)
+
+    def test_parser_hints(self):
+        """Docling heading paths and page provenance are used when given."""
+        tracker = DocumentStructureTracker()
+        structure = tracker.annotate("Body only.", headings=["Chapter 2 Sorting", "2.1 Merge Sort"], pages=[9, 8])
+
+        assert structure.chapter_number == 2
+        assert structure.section_number == "2.1"
+        assert (structure.page_start, structure.page_end) == (8, 9)
+
+
+class TestStructureReference:
+    """Test query-side reference parsing."""
+
+    @pytest.mark.parametrize("query,chapter,section,page,whole", [
+        ("Summarize chapter 12", 12, None, None, True),
+        ("give me structured notes for ch. 3", 3, None, None, True),
+        ("what is chapter twelve about?", 12, None, None, True),
+        ("what does chapter 3 say about machine learning", 3, None, None, False),
+        ("explain section 4.2", None, "4.2", None, True),
+        ("what is on page 7", None, None, 7, True),
+    ])
+    def test_parse(self, query, chapter, section, page, whole):
+        ref = parse_structure_reference(query)
+        assert (ref.chapter, ref.section, ref.page, ref.is_whole_unit) == (chapter, section, page, whole)
+
+    def test_no_reference(self):
+        assert parse_structure_reference("what is a civil war") is None
+
+    def test_reading_order_selection(self):
+        """Selection is evenly spread, ordered and keeps the first chunk."""
+        rows = list(range(100))
+
+        selected = select_reading_order(rows, 5)
+
+        assert selected == sorted(selected)
+        assert selected[0] == 0 and selected[-1] == 99
+        assert select_reading_order(rows[:3], 5) == [0, 1, 2]
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+BENCHMARK_BOOKS = 40
+
+
+@pytest.fixture(scope="module")
+def database(book_chunks):
+    """In-memory copy of the document_vectors columns used by chapter lookups."""
+    db = sqlite3.connect(":memory:")
+    db.execute("""
+        CREATE TABLE document_vectors (
+            id INTEGER PRIMARY KEY, document_id TEXT, chunk_index INTEGER,
+            content TEXT, chapter_number INTEGER, page_start INTEGER, page_end INTEGER
+        )
+    """)
+    db.execute("CREATE INDEX idx_doc_chapter_order ON document_vectors (chapter_number, document_id, chunk_index)")
+    db.executemany(
+        "INSERT INTO document_vectors (document_id, chunk_index, content, chapter_number, page_start, page_end) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (f"book{b}", i, c["content"], c["structure"]["chapter_number"],
+             c["structure"]["page_start"], c["structure"]["page_end"])
+            for b in range(BENCHMARK_BOOKS)
+            for i, c in enumerate(book_chunks)
+        ]
+    )
+    return db
+
+
+class TestChapterLookupBenchmark:
+    """Compare keyword chapter lookup with the structure index."""
+
+    BOOKS = BENCHMARK_BOOKS
+    RUNS = 30
+
+    def _time(self, db, sql, params):
+        timings, rows = [], []
+        for _ in range(self.RUNS):
+            start = time.perf_counter()
+            rows = db.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), rows
+
+    def _accuracy(self, returned_indexes, truth):
+        hits = len(returned_indexes & truth)
+        precision = hits / len(returned_indexes) if returned_indexes else 0.0
+        return precision, hits / len(truth)
+
+    @pytest.mark.parametrize("chapter", [1, 12])
+    def test_benchmark_structured_lookup(self, database, book_chunks, chapter):
+        """Index lookup is faster and returns exactly the chapter, in order."""
+        truth = {i for i, c in enumerate(book_chunks) if c["true_chapter"] == chapter}
+
+        legacy_ms, legacy_rows = self._time(
+            database,
+            "SELECT chunk_index, content FROM document_vectors WHERE document_id = 'book0' "
+            "AND (LOWER(content) LIKE ? OR LOWER(content) LIKE ?)",
+            (f"%chapter {chapter}%", f"%chapter{chapter}%")
+        )
+        # Legacy lookup has no document filter in production; time it across all books
+        legacy_all_ms, _ = self._time(
+            database,
+            "SELECT chunk_index, content FROM document_vectors WHERE LOWER(content) LIKE ? OR LOWER(content) LIKE ?",
+            (f"%chapter {chapter}%", f"%chapter{chapter}%")
+        )
+        structured_ms, structured_rows = self._time(
+            database,
+            "SELECT chunk_index, content FROM document_vectors WHERE chapter_number = ? "
+            "ORDER BY document_id, chunk_index",
+            (chapter,)
+        )
+
+        legacy_precision, legacy_recall = self._accuracy({r[0] for r in legacy_rows}, truth)
+        book0 = [r[0] for r in structured_rows[:len(structured_rows) // self.BOOKS]]
+        structured_precision, structured_recall = self._accuracy(set(book0), truth)
+
+        print(f"\n📚 Chapter {chapter} ({len(truth)} chunks/book, {self.BOOKS} books, "
+              f"{len(book_chunks) * self.BOOKS} rows)")
+        print(f"   LIKE scan:        {legacy_all_ms:.2f}ms  precision {legacy_precision:.0%}  recall {legacy_recall:.0%}")
+        print(f"   Structure index:  {structured_ms:.2f}ms  precision {structured_precision:.0%}  "
+              f"recall {structured_recall:.0%}")
+
+        assert (structured_precision, structured_recall) == (1.0, 1.0)
+        assert book0 == sorted(book0)
+        assert legacy_precision < 1.0 or legacy_recall < 1.0
+        assert structured_ms < legacy_all_ms
@@ -0,0 +1,204 @@
+"""
+Tests for the online task duration model, admission decisions and the
+offline evaluation on recorded timings.
+
+Run evaluation with output: python -m pytest tests/test_duration_model.py -v -s -k evaluation
+"""
+
+import math
+import random
+
+from utils.concurrent_execution import (
+    ADMIT_FORK,
+    ADMIT_INLINE,
+    ADMIT_QUEUE,
+    TaskDurationEstimator,
+    TaskType,
+)
+from utils.ml.duration_model import (
+    OnlineDurationModel,
+    evaluate_timings,
+    load_timings,
+    task_features,
+)
+
+THRESHOLD = TaskDurationEstimator.LONG_RUNNING_THRESHOLD
+
+SIMPLE = "animate a circle"
+COMPLEX = "animate step by step the derivation and proof of each matrix transform in 3d, in high quality"
+
+
+def render_seconds(question, load=0, rng=None):
+    """Synthetic Manim render time: grows with complexity, quality and load."""
+    features = task_features(question, load=load)
+    base = 6.0 * math.exp(0.45 * features[2] + 0.3 * (features[1] - 1) + 0.4 * features[4])
+    noise = math.exp(rng.gauss(0, 0.15)) if rng else 1.0
+    return base * noise
+
+
+def recorded_timings(count=600, seed=7):
+    """Timings as the task manager records them (mixed simple and complex renders)."""
+    rng = random.Random(seed)
+    questions = [SIMPLE, "quick draft of a sine wave", "visualize a graph", COMPLEX,
+                 "animate sorting algorithm step by step, compare multiple sequences"]
+    timings = []
+    for _ in range(count):
+        question = rng.choice(questions)
+        load = rng.randint(0, 2)
+        timings.append({
+            "task_type": TaskType.MANIM_ANIMATION.value,
+            "features": task_features(question, load=load),
+            "duration": render_seconds(question, load, rng),
+        })
+    return timings
+
+
+def train(estimator, timings):
+    for timing in timings:
+        estimator.record_duration(TaskType(timing["task_type"]), timing["duration"], timing["features"])
+
+
+class TestTaskFeatures:
+    """Test feature extraction."""
+
+    def test_quality_from_question_or_argument(self):
+        assert task_features("animate a circle")[1] == 1
+        assert task_features("animate a circle in 4k")[1] == 3
+        assert task_features("quick preview of a circle")[1] == 0
+        assert task_features("animate a circle", quality="high_quality")[1] == 2
+
+    def test_complexity_chunks_and_load(self):
+        simple, complex_ = task_features(SIMPLE), task_features(COMPLEX)
+
+        assert complex_[2] > simple[2] == 0
+        assert task_features("q", chunk_count=60)[3] > task_features("q", chunk_count=15)[3]
+        assert task_features("q", load=3)[4] > task_features("q")[4] == 0
+        assert task_features("q", queued=3)[5] > task_features("q")[5] == 0
+
+
+class TestOnlineDurationModel:
+    """Test learning, spread and bounded memory."""
+
+    def test_learns_feature_effects(self):
+        estimator = TaskDurationEstimator()
+        train(estimator, recorded_timings(400))
+
+        simple = estimator.estimate(TaskType.MANIM_ANIMATION, SIMPLE)
+        complex_ = estimator.estimate(TaskType.MANIM_ANIMATION, COMPLEX)
+
+        assert simple.p50 < THRESHOLD < complex_.p50
+        assert abs(complex_.p50 - render_seconds(COMPLEX)) / render_seconds(COMPLEX) < 0.25
+        assert simple.p50 <= simple.p90
+
+    def test_p90_covers_about_ninety_percent(self):
+        model = OnlineDurationModel(prior_seconds=45.0)
+        timings = recorded_timings(800, seed=3)
+        for timing in timings[:400]:
+            model.update(timing["features"], timing["duration"])
+
+        covered = sum(model.predict(t["features"]).p90 >= t["duration"] for t in timings[400:])
+
+        assert 0.8 <= covered / 400 <= 0.98
+
+    def test_memory_is_bounded(self):
+        model = OnlineDurationModel(prior_seconds=3.0, window=50)
+        for timing in recorded_timings(500):
+            model.update(timing["features"], timing["duration"])
+
+        assert model.samples == 500
+        assert len(model.residuals) == 50
+        assert len(model.recent) == model.min_samples
+
+    def test_follows_drift(self):
+        model = OnlineDurationModel(prior_seconds=3.0, forgetting=0.98)
+        features = task_features("latest news")
+        for _ in range(200):
+            model.update(features, 2.0)
+        for _ in range(200):
+            model.update(features, 8.0)
+
+        assert 6.0 < model.predict(features).p50 < 10.0
+
+
+class TestAdmission:
+    """Test inline / fork / queue decisions."""
+
+    def test_short_tasks_run_inline(self):
+        decision = TaskDurationEstimator().decide(TaskType.WEB_SEARCH, "latest news")
+
+        assert decision.action == ADMIT_INLINE
+
+    def test_long_tasks_fork_while_slots_are_free(self):
+        estimator = TaskDurationEstimator()
+
+        assert estimator.decide(TaskType.MANIM_ANIMATION, SIMPLE, running=1, limit=2).action == ADMIT_FORK
+
+        queued = estimator.decide(TaskType.MANIM_ANIMATION, SIMPLE, running=2, limit=2, queued=2)
+        assert queued.action == ADMIT_QUEUE
+        assert queued.expected_wait > queued.estimate.p50
+
+    def test_decision_features_include_quality_chunks_and_queue(self):
+        decision = TaskDurationEstimator().decide(
+            TaskType.MANIM_ANIMATION, SIMPLE, running=2, limit=2, queued=3, quality="production_quality"
+        )
+
+        assert decision.features == task_features(SIMPLE, quality="production_quality", load=2, queued=3)
+
+    def test_learned_model_stops_forking_short_renders(self):
+        estimator = TaskDurationEstimator()
+        train(estimator, recorded_timings(400))
+
+        assert estimator.decide(TaskType.MANIM_ANIMATION, SIMPLE).action == ADMIT_INLINE
+        assert estimator.decide(TaskType.MANIM_ANIMATION, COMPLEX).action == ADMIT_FORK
+
+
+class TestRecordedTimings:
+    """Test timing persistence and the offline evaluation."""
+
+    def test_timings_are_recorded_and_restored(self, tmp_path):
+        timings = recorded_timings(50)
+        estimator = TaskDurationEstimator(storage_dir=str(tmp_path))
+        train(estimator, timings)
+        before = estimator.estimate(TaskType.MANIM_ANIMATION, COMPLEX)
+        estimator.close()
+
+        restored = TaskDurationEstimator(storage_dir=str(tmp_path))
+        after = restored.estimate(TaskType.MANIM_ANIMATION, COMPLEX)
+        restored.close()
+
+        assert after.samples == 50
+        assert math.isclose(after.p50, before.p50, rel_tol=1e-6)
+
+    def test_timings_of_an_older_feature_set_are_skipped(self, tmp_path):
+        estimator = TaskDurationEstimator(storage_dir=str(tmp_path))
+        train(estimator, recorded_timings(5))
+        estimator._log.append(99, "timing", [TaskType.MANIM_ANIMATION.value, [0.0] * 5, 30.0])
+        estimator._log.close(compact=False)
+
+        timings = load_timings(str(tmp_path))
+        restored = TaskDurationEstimator(storage_dir=str(tmp_path))
+        samples = restored.models[TaskType.MANIM_ANIMATION].samples
+        restored.close()
+
+        assert samples == len(timings) == 5
+
+    def test_log_keeps_timings_for_evaluation(self, tmp_path):
+        estimator = TaskDurationEstimator(storage_dir=str(tmp_path))
+        train(estimator, recorded_timings(20))
+        estimator._log.flush()
+
+        assert len(load_timings(str(tmp_path))) == 20
+        estimator.close()
+
+    def test_offline_evaluation_beats_running_average(self):
+        priors = {t.value: s for t, s in TaskDurationEstimator.DEFAULT_DURATIONS.items()}
+        report = evaluate_timings(recorded_timings(), priors, THRESHOLD)
+
+        print(f"\n📊 {report['timings']} recorded Manim timings")
+        for name in ("average", "model"):
+            m = report[name]
+            print(f"{name:<8} MAE {m['mae_seconds']:5.1f}s  p90 coverage {m['p90_coverage']:4.0%}  "
+                  f"misrouted {m['misrouted_rate']:5.1%}")
+
+        assert report["model"]["mae_seconds"] < 0.6 * report["average"]["mae_seconds"]
+        assert report["model"]["misrouted_rate"] < report["average"]["misrouted_rate"]
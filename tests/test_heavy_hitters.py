@@ -0,0 +1,184 @@
+"""
+Tests and benchmark for bounded heavy-hitter access tracking.
+
+The benchmark streams a million distinct keys (a Zipf-distributed hot set
+mixed with one-off cold keys) through the Space-Saving sketch and through
+the previous unbounded dict tracker, comparing memory and top-k accuracy.
+
+Run benchmark with output: python -m pytest tests/test_heavy_hitters.py -v -s -k benchmark
+"""
+
+import random
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import pytest
+
+from utils.cache.heavy_hitters import DecayingSpaceSaving
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestDecayingSpaceSaving:
+    """Test the bounded sketch."""
+
+    def test_exact_below_capacity(self):
+        """With fewer keys than counters, counts are exact."""
+        sketch = DecayingSpaceSaving(capacity=10, half_life=None)
+        for key, count in [("a", 5), ("b", 3), ("c", 1)]:
+            for _ in range(count):
+                sketch.add(key)
+
+        top = sketch.top()
+
+        assert [(h.key, h.count, h.error) for h in top] == [("a", 5, 0), ("b", 3, 0), ("c", 1, 0)]
+
+    def test_memory_is_bounded(self):
+        """Tracked keys never exceed capacity."""
+        sketch = DecayingSpaceSaving(capacity=100, half_life=None)
+        for i in range(10_000):
+            sketch.add(f"key{i}")
+
+        assert len(sketch) == 100
+        assert sketch.evictions == 9_900
+        assert len(sketch._heap) <= 4 * 100
+
+    def test_heavy_hitter_survives_churn(self):
+        """A frequent key is kept while one-off keys cycle through."""
+        sketch = DecayingSpaceSaving(capacity=20, half_life=None)
+        for i in range(5_000):
+            sketch.add(f"cold{i}")
+            if i % 10 == 0:
+                sketch.add("hot")
+
+        top = sketch.top(k=1)[0]
+
+        assert top.key == "hot"
+        assert top.guaranteed_count <= 500 <= top.count
+
+    def test_decay_prefers_recent_keys(self):
+        """Old popularity fades with the half-life."""
+        clock = FakeClock()
+        sketch = DecayingSpaceSaving(capacity=10, half_life=60, clock=clock)
+        for _ in range(100):
+            sketch.add("yesterday")
+        clock.now += 600  # Ten half-lives
+        for _ in range(10):
+            sketch.add("today")
+
+        assert [h.key for h in sketch.top()] == ["today", "yesterday"]
+        assert sketch.estimate("yesterday") == pytest.approx(100 / 1024)
+
+    def test_rescale_keeps_counts(self):
+        """Moving the decay landmark does not change decayed counts."""
+        clock = FakeClock()
+        sketch = DecayingSpaceSaving(capacity=10, half_life=1, clock=clock)
+        sketch.add("a", count=4)
+        clock.now += 3
+        sketch.add("b")
+        clock.now += 100  # Forces a rescale
+        sketch.add("c")
+
+        assert sketch.estimate("a") == pytest.approx(4 * 2 ** -103)
+        assert sketch.estimate("c") == pytest.approx(1)
+        assert [h.key for h in sketch.top()] == ["c", "b", "a"]
+
+    def test_since_filter(self):
+        clock = FakeClock()
+        sketch = DecayingSpaceSaving(capacity=10, half_life=None, clock=clock)
+        sketch.add("old")
+        clock.now += 100
+        sketch.add("new")
+
+        assert [h.key for h in sketch.top(since=clock.now - 10)] == ["new"]
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            DecayingSpaceSaving(capacity=0)
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+DISTINCT_KEYS = 1_000_000
+HOT_KEYS = 1_000
+TOP_K = 100
+CAPACITY = 10_000
+
+
+def make_stream():
+    """Zipf-distributed hot keys interleaved with one-off cold keys."""
+    hot = [f"query:hot:{i}" for i in range(HOT_KEYS) for _ in range(20_000 // (i + 1))]
+    cold = [f"query:cold:{i}" for i in range(DISTINCT_KEYS - HOT_KEYS)]
+    stream = hot + cold
+    random.Random(42).shuffle(stream)
+    return stream
+
+
+def track_unbounded(stream):
+    """The previous CacheWarmer tracker: two dicts with every key ever seen."""
+    access_counts = defaultdict(int)
+    last_access = {}
+    for key in stream:
+        access_counts[key] += 1
+        last_access[key] = datetime.utcnow()
+    return access_counts, last_access
+
+
+def track_sketch(stream):
+    sketch = DecayingSpaceSaving(capacity=CAPACITY)
+    for key in stream:
+        sketch.add(key)
+    return sketch
+
+
+def measure(fn, stream):
+    """Run fn and return (result, peak bytes allocated, seconds)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(stream)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+@pytest.mark.slow
+def test_benchmark_million_keys():
+    """Sketch memory is bounded and recovers the true top-k."""
+    stream = make_stream()
+    truth = [key for key, _ in Counter(stream).most_common(TOP_K)]
+
+    (counts, _), dict_bytes, dict_seconds = measure(track_unbounded, stream)
+    sketch, sketch_bytes, sketch_seconds = measure(track_sketch, stream)
+
+    start = time.perf_counter()
+    legacy_top = sorted(counts, key=counts.get, reverse=True)[:TOP_K]
+    legacy_query_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    sketch_top = [hitter.key for hitter in sketch.top(k=TOP_K)]
+    sketch_query_ms = (time.perf_counter() - start) * 1000
+
+    recall = len(set(sketch_top) & set(truth)) / TOP_K
+
+    print(f"\n🔥 {len(stream):,} accesses, {len(counts):,} distinct keys, top-{TOP_K}")
+    print(f"   Unbounded dicts: {dict_bytes / 2**20:7.1f} MiB  track {dict_seconds:.2f}s  "
+          f"top-k {legacy_query_ms:.1f}ms  recall {len(set(legacy_top) & set(truth)) / TOP_K:.0%}")
+    print(f"   Space-Saving:    {sketch_bytes / 2**20:7.1f} MiB  track {sketch_seconds:.2f}s  "
+          f"top-k {sketch_query_ms:.1f}ms  recall {recall:.0%}  ({len(sketch):,} counters)")
+
+    assert len(counts) == DISTINCT_KEYS
+    assert len(sketch) == CAPACITY
+    assert recall >= 0.95
+    assert sketch_bytes * 10 < dict_bytes
+    assert sketch_query_ms < legacy_query_ms
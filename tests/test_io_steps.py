@@ -0,0 +1,228 @@
+"""
+Tests for step nodes (one node body for graph.invoke and graph.ainvoke)
+and a load test of the async query path.
+
+Run load test with output: python -m pytest tests/test_io_steps.py -v -s -m slow
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.patterns.io_steps import LLMCall, Step, ToolCall, arun_steps, dual_node, run_steps
+
+
+class Reply:
+    """Shaped like a LangChain message."""
+
+    def __init__(self, content):
+        self.content = content
+
+
+class SlowLLM:
+    """Chat model with a fixed latency; counts concurrent calls."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self, kind):
+        with self._lock:
+            self.calls.append(kind)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def invoke(self, messages):
+        self._enter("invoke")
+        try:
+            time.sleep(self.latency)
+            return Reply(f"sync:{messages[-1]}")
+        finally:
+            self._exit()
+
+    async def ainvoke(self, messages):
+        self._enter("ainvoke")
+        try:
+            await asyncio.sleep(self.latency)
+            return Reply(f"async:{messages[-1]}")
+        finally:
+            self._exit()
+
+
+class Tool:
+    """Shaped like a LangChain Tool (func / coroutine)."""
+
+    def __init__(self, func, coroutine=None):
+        self.func = func
+        self.coroutine = coroutine
+
+
+def answer_node(llm):
+    def node(state):
+        response = yield LLMCall(llm, [state["question"]])
+        return {**state, "answer": response.content}
+    return node
+
+
+class TestRunSteps:
+    """Test driving step nodes with blocking and async calls."""
+
+    def test_sync_and_async_paths_give_the_same_shape(self):
+        llm = SlowLLM()
+        node = answer_node(llm)
+
+        assert run_steps(node({"question": "q"}))["answer"] == "sync:q"
+        assert asyncio.run(arun_steps(node({"question": "q"})))["answer"] == "async:q"
+        assert llm.calls == ["invoke", "ainvoke"]
+
+    def test_plain_results_pass_through(self):
+        state = {"question": "q"}
+
+        assert run_steps(state) is state
+        assert asyncio.run(arun_steps(state)) is state
+
+    def test_errors_are_thrown_back_into_the_node(self):
+        def fail():
+            raise ConnectionError("down")
+
+        def node(state):
+            try:
+                yield Step(fail)
+            except ConnectionError as e:
+                return {**state, "error": str(e)}
+
+        assert run_steps(node({}))["error"] == "down"
+        assert asyncio.run(arun_steps(node({})))["error"] == "down"
+
+    def test_uncaught_errors_propagate(self):
+        def node(state):
+            yield Step(int, "not a number")
+
+        with pytest.raises(ValueError):
+            run_steps(node({}))
+
+    def test_delegation_with_yield_from(self):
+        llm = SlowLLM()
+        tool_node = answer_node(llm)
+
+        def execute_plan(state):
+            result = yield from tool_node(state)
+            return {**result, "step": 1}
+
+        assert asyncio.run(arun_steps(execute_plan({"question": "q"}))) == {
+            "question": "q", "answer": "async:q", "step": 1
+        }
+
+    def test_async_variant_is_preferred(self):
+        async def arun(code):
+            return f"awaited {code}"
+
+        tool = Tool(func=lambda code: f"ran {code}", coroutine=arun)
+        sync_only = Tool(func=lambda code: f"ran {code} in {threading.current_thread().name}")
+
+        async def scenario():
+            return await ToolCall(tool, "x").arun(), await ToolCall(sync_only, "x").arun()
+
+        awaited, threaded = asyncio.run(scenario())
+
+        assert awaited == "awaited x"
+        assert threaded.startswith("ran x in ") and threading.current_thread().name not in threaded
+
+
+class TestDualNode:
+    """Test the runnable wrapper used with StateGraph.add_node."""
+
+    def test_invoke_and_ainvoke(self):
+        llm = SlowLLM()
+        runnable = dual_node(answer_node(llm))
+
+        assert runnable.invoke({"question": "q"})["answer"] == "sync:q"
+        assert asyncio.run(runnable.ainvoke({"question": "q"}))["answer"] == "async:q"
+
+    def test_existing_async_implementation(self):
+        async def classify(state):
+            return {**state, "intent": "GRADE"}
+
+        runnable = dual_node(lambda state: {**state, "intent": "STUDY"}, afunc=classify)
+
+        assert runnable.invoke({})["intent"] == "STUDY"
+        assert asyncio.run(runnable.ainvoke({}))["intent"] == "GRADE"
+
+
+@pytest.mark.slow
+class TestAsyncQueryPathLoad:
+    """Concurrent requests one worker serves: thread offloading vs native async."""
+
+    REQUESTS = 64
+    WORKER_THREADS = 8  # Default executor size of a small worker
+    LLM_LATENCY = 0.1
+
+    def build_graph(self, llm):
+        pytest.importorskip("langgraph")
+        from typing import TypedDict
+        from langgraph.graph import StateGraph, END
+
+        class State(TypedDict, total=False):
+            question: str
+            intent: str
+            answer: str
+
+        def classify(state):
+            response = yield LLMCall(llm, ["classify " + state["question"]])
+            return {**state, "intent": response.content}
+
+        workflow = StateGraph(State)
+        workflow.add_node("classify", dual_node(classify))
+        workflow.add_node("answer", dual_node(answer_node(llm)))
+        workflow.set_entry_point("classify")
+        workflow.add_edge("classify", "answer")
+        workflow.add_edge("answer", END)
+        return workflow.compile()
+
+    def run_load(self, use_threads):
+        llm = SlowLLM(latency=self.LLM_LATENCY)
+        graph = self.build_graph(llm)
+
+        async def one(i):
+            state = {"question": f"q{i}"}
+            if use_threads:
+                return await asyncio.to_thread(graph.invoke, state)
+            return await graph.ainvoke(state)
+
+        async def scenario():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(self.WORKER_THREADS))
+            started = time.perf_counter()
+            results = await asyncio.gather(*(one(i) for i in range(self.REQUESTS)))
+            return results, time.perf_counter() - started
+
+        results, elapsed = asyncio.run(scenario())
+        assert all(r["answer"] for r in results)
+        return {
+            "in_flight": llm.max_in_flight,
+            "throughput": self.REQUESTS / elapsed,
+            "elapsed": elapsed,
+        }
+
+    def test_async_path_serves_more_concurrent_requests(self):
+        before = self.run_load(use_threads=True)
+        after = self.run_load(use_threads=False)
+
+        print(f"\n📊 {self.REQUESTS} requests, {self.WORKER_THREADS} worker threads, "
+              f"{self.LLM_LATENCY * 1000:.0f}ms LLM latency")
+        print(f"{'':<22}{'in flight':>10}{'req/s':>10}{'total':>10}")
+        for label, stats in (("🐢 to_thread(invoke)", before), ("⚡ ainvoke", after)):
+            print(f"{label:<22}{stats['in_flight']:>10}{stats['throughput']:>10.1f}{stats['elapsed']:>9.2f}s")
+
+        assert before["in_flight"] <= self.WORKER_THREADS
+        assert after["in_flight"] > self.WORKER_THREADS
+        assert after["throughput"] > 2 * before["throughput"]
@@ -0,0 +1,167 @@
+"""
+Tests for the LLM completion cache.
+"""
+
+import asyncio
+
+import pytest
+
+import utils.cache.llm_cache as llm_cache
+from utils.cache.llm_cache import (
+    LLMCompletionCache,
+    cache_decision,
+    completion_cache,
+    completion_key,
+    normalize_messages,
+    DEFAULT_CALL_SITE,
+    LLM_CACHE_PREFIX,
+)
+
+
+class Message:
+    """Shaped like a LangChain message (type + content)."""
+
+    def __init__(self, type, content):
+        self.type = type
+        self.content = content
+
+
+ROUTING = [
+    Message("system", "Analyze this request and determine intent:\n\nRespond with: STUDY or GRADE"),
+    Message("human", "Request: grade this essay"),
+]
+
+
+class FakeRedis:
+    """Minimal sync Redis (get/setex) backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class FakeAsyncRedis(FakeRedis):
+    """Async variant of FakeRedis."""
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class TestKeys:
+    """Test request keys and message normalization."""
+
+    def test_whitespace_does_not_change_the_key(self):
+        spaced = [Message("system", ROUTING[0].content.replace("\n\n", "\n \n ")), ROUTING[1]]
+
+        assert completion_key("gemini", 0.0, ROUTING) == completion_key("gemini", 0.0, spaced)
+        assert completion_key("gemini", 0.0, ROUTING).startswith(LLM_CACHE_PREFIX)
+
+    @pytest.mark.parametrize("change", [
+        dict(model="gemini-pro"),
+        dict(temperature=0.3),
+        dict(stop=["\n"]),
+        dict(max_output_tokens=10),
+    ])
+    def test_parameters_change_the_key(self, change):
+        base = dict(model="gemini", temperature=0.0, messages=ROUTING)
+
+        assert completion_key(**base) != completion_key(**dict(base, **change))
+
+    def test_roles_are_part_of_the_key(self):
+        swapped = [Message("human", ROUTING[0].content), ROUTING[1]]
+
+        assert completion_key("gemini", 0.0, ROUTING) != completion_key("gemini", 0.0, swapped)
+
+    def test_multimodal_content_is_kept(self):
+        content = [{"type": "text", "text": "a  b"}]
+
+        assert normalize_messages([Message("human", content)]) == [["human", content]]
+
+
+class TestCacheDecision:
+    """Test automatic enabling, forcing and bypassing."""
+
+    def test_model_default(self):
+        assert cache_decision(True) == (True, DEFAULT_CALL_SITE)
+        assert cache_decision(False) == (False, DEFAULT_CALL_SITE)
+
+    def test_force_bypass_and_label(self):
+        with completion_cache(call_site="rag.should_retrieve", enabled=True):
+            assert cache_decision(False) == (True, "rag.should_retrieve")
+            with completion_cache(enabled=False):
+                assert cache_decision(True) == (False, "rag.should_retrieve")
+
+    def test_master_switch(self, monkeypatch):
+        monkeypatch.setattr(llm_cache, "LLM_CACHE_ENABLED", False)
+
+        with completion_cache(enabled=True):
+            assert cache_decision(True)[0] is False
+
+
+class TestLLMCompletionCache:
+    """Test the local and Redis tiers and per-call-site stats."""
+
+    def test_local_hit(self):
+        cache = LLMCompletionCache()
+        key = completion_key("gemini", 0.0, ROUTING)
+
+        assert cache.get(key, "supervisor") is None
+        cache.set(key, {"content": "GRADE"})
+
+        assert cache.get(key, "supervisor") == {"content": "GRADE"}
+        assert cache.get_stats()["call_sites"]["supervisor"] == {"local_hits": 1, "redis_hits": 0, "misses": 1}
+
+    def test_redis_tier_is_shared(self):
+        redis = FakeRedis()
+        writer = LLMCompletionCache(redis_client=redis)
+        reader = LLMCompletionCache(redis_client=redis)
+
+        writer.set("k", {"content": "STUDY"})
+
+        assert reader.get("k") == {"content": "STUDY"}
+        assert reader.get("k") == {"content": "STUDY"}  # Promoted to the local tier
+        assert reader.get_stats()["call_sites"][DEFAULT_CALL_SITE] == {"local_hits": 1, "redis_hits": 1, "misses": 0}
+
+    def test_async_tiers(self):
+        redis = FakeAsyncRedis()
+        writer = LLMCompletionCache(async_redis_client=redis)
+        reader = LLMCompletionCache(async_redis_client=redis)
+
+        async def scenario():
+            await writer.aset("k", {"content": "RETRIEVE"})
+            return await reader.aget("k", "rag.should_retrieve")
+
+        assert asyncio.run(scenario()) == {"content": "RETRIEVE"}
+        assert reader.get_stats()["hits"] == 1
+
+    def test_redis_errors_fall_back_to_provider(self):
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("down")
+
+            def setex(self, key, ttl, value):
+                raise ConnectionError("down")
+
+        cache = LLMCompletionCache(redis_client=BrokenRedis())
+        cache.set("k", {"content": "x"})
+        cache.clear()
+
+        assert cache.get("k") is None
+        assert cache.get_stats()["redis_errors"] == 2
+
+    def test_local_tier_is_bounded(self):
+        cache = LLMCompletionCache(max_entries=2)
+        for i in range(5):
+            cache.set(f"k{i}", {"content": str(i)})
+
+        assert len(cache.local) == 2
+        assert cache.get("k4") == {"content": "4"}
+        assert cache.get("k0") is None
@@ -0,0 +1,402 @@
+"""
+Tests and benchmark for the LLM gateway.
+
+The benchmark floods the gateway with batch calls while interactive calls
+arrive, and compares their queueing delay.
+
+Run benchmark with output: python -m pytest tests/test_llm_gateway.py -v -s -k benchmark
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import utils.core.llm_gateway as llm_gateway
+from utils.core.llm_gateway import (
+    ConcurrencyLimiter,
+    LLMGateway,
+    TokenBudget,
+    current_llm_context,
+    estimate_request_tokens,
+    is_rate_limit_error,
+    llm_context,
+    DEFAULT_TENANT,
+    LANE_BATCH,
+    LANE_INTERACTIVE,
+)
+from utils.errors.exceptions import LLMError
+
+
+class ResourceExhausted(Exception):
+    """Shaped like google.api_core.exceptions.ResourceExhausted."""
+    code = 429
+
+
+def flaky(failures, error=ResourceExhausted("429 Resource has been exhausted")):
+    calls = []
+
+    def fn(value):
+        calls.append(value)
+        if len(calls) <= failures:
+            raise error
+        return value
+
+    fn.calls = calls
+    return fn
+
+
+def fast_gateway(**kwargs):
+    kwargs.setdefault("retry_base_delay", 0.001)
+    kwargs.setdefault("retry_max_delay", 0.002)
+    return LLMGateway(**kwargs)
+
+
+class TestContext:
+    """Test tenant and lane attribution."""
+
+    def test_defaults(self):
+        assert current_llm_context() == (DEFAULT_TENANT, LANE_INTERACTIVE)
+
+    def test_nested_blocks_inherit(self):
+        with llm_context(tenant_id="t1"):
+            with llm_context(lane=LANE_BATCH):
+                assert current_llm_context() == ("t1", LANE_BATCH)
+            assert current_llm_context() == ("t1", LANE_INTERACTIVE)
+
+    def test_unknown_lane(self):
+        with pytest.raises(ValueError):
+            with llm_context(lane="urgent"):
+                pass
+
+    def test_estimate_request_tokens(self):
+        assert estimate_request_tokens("x" * 400, max_output_tokens=100) == 200
+
+
+class TestConcurrencyLimiter:
+    """Test limits and lane priority."""
+
+    def test_global_and_tenant_limits(self):
+        limiter = ConcurrencyLimiter(max_concurrency=3, tenant_concurrency=2)
+
+        assert limiter.acquire("a", timeout=0)
+        assert limiter.acquire("a", timeout=0)
+        assert not limiter.acquire("a", timeout=0)  # Tenant limit
+        assert limiter.acquire("b", timeout=0)
+        assert not limiter.acquire("c", timeout=0)  # Global limit
+
+        limiter.release("a")
+        assert limiter.acquire("c", timeout=0)
+
+    def test_batch_share_leaves_room_for_interactive(self):
+        limiter = ConcurrencyLimiter(max_concurrency=4, tenant_concurrency=4, batch_share=0.5)
+
+        assert limiter.acquire("t", LANE_BATCH, timeout=0)
+        assert limiter.acquire("t", LANE_BATCH, timeout=0)
+        assert not limiter.acquire("t", LANE_BATCH, timeout=0)
+        assert limiter.acquire("t", LANE_INTERACTIVE, timeout=0)
+
+    def test_queued_interactive_goes_first(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1, tenant_concurrency=10)
+        limiter.acquire("t")
+        order = []
+
+        def waiter(name, lane):
+            limiter.acquire("t", lane, timeout=5)
+            order.append(name)
+            limiter.release("t", lane)
+
+        threads = [threading.Thread(target=waiter, args=("batch", LANE_BATCH))]
+        threads[0].start()
+        while limiter.queued < 1:
+            time.sleep(0.001)
+        threads.append(threading.Thread(target=waiter, args=("interactive", LANE_INTERACTIVE)))
+        threads[1].start()
+        while limiter.queued < 2:
+            time.sleep(0.001)
+
+        limiter.release("t")
+        for thread in threads:
+            thread.join()
+
+        assert order == ["interactive", "batch"]
+
+    def test_blocked_tenant_does_not_hold_up_others(self):
+        limiter = ConcurrencyLimiter(max_concurrency=2, tenant_concurrency=1)
+
+        async def scenario():
+            await limiter.aacquire("a")
+            await limiter.aacquire("b")
+            blocked = asyncio.create_task(limiter.aacquire("a", timeout=1))
+            other = asyncio.create_task(limiter.aacquire("c", timeout=1))
+            await asyncio.sleep(0)
+            limiter.release("b")
+            assert await other
+            assert not blocked.done()
+            limiter.release("a")
+            return await blocked
+
+        assert asyncio.run(scenario())
+
+    def test_async_timeout_and_cancellation_free_the_queue(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        limiter.acquire("t")
+
+        async def scenario():
+            assert not await limiter.aacquire("t", timeout=0.01)
+            task = asyncio.create_task(limiter.aacquire("t"))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+
+        assert limiter.queued == 0
+        limiter.release("t")
+        assert limiter.in_flight == 0
+
+    def test_threads_and_event_loop_share_slots(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        limiter.acquire("t")
+        threading.Timer(0.02, limiter.release, args=("t",)).start()
+
+        assert asyncio.run(limiter.aacquire("t", timeout=2))
+        assert limiter.in_flight == 1
+
+
+class TestTokenBudget:
+    """Test token-rate budgets."""
+
+    def test_overdraft_means_waiting(self):
+        budget = TokenBudget(tokens_per_minute=600)  # 10 tokens/s
+
+        assert budget.reserve(500) == 0
+        assert budget.reserve(200) == pytest.approx(10.0, rel=0.01)
+
+    def test_adjust_refunds_overestimates(self):
+        budget = TokenBudget(tokens_per_minute=600)
+        budget.reserve(600)
+        budget.adjust(-300)
+
+        assert budget.available == pytest.approx(300, abs=1)
+
+    def test_gateway_waits_for_tenant_budget(self):
+        gateway = fast_gateway(tokens_per_minute=0, tenant_tokens_per_minute=6000)  # 100 tokens/s
+
+        with llm_context(tenant_id="heavy"):
+            gateway.call(lambda: None, tokens=6000)
+            start = time.perf_counter()
+            gateway.call(lambda: None, tokens=5)
+
+        assert time.perf_counter() - start >= 0.04
+        with llm_context(tenant_id="light"):
+            start = time.perf_counter()
+            gateway.call(lambda: None, tokens=5)
+        assert time.perf_counter() - start < 0.04
+
+    def test_usage_corrects_reservation(self):
+        gateway = fast_gateway(tokens_per_minute=6000, tenant_tokens_per_minute=0)
+
+        gateway.call(lambda: "ok", tokens=1000, usage=lambda result: 100)
+
+        assert gateway.get_stats()["tokens_available"] == pytest.approx(5900, abs=5)
+
+    def test_debt_is_capped_by_max_wait(self):
+        budget = TokenBudget(tokens_per_minute=600)
+        budget.reserve(600)
+
+        assert budget.reserve(200, max_wait=5) is None
+        assert budget.available == pytest.approx(0, abs=1)
+        assert budget.reserve(20, max_wait=5) == pytest.approx(2.0, rel=0.05)
+
+    def test_take_never_overdraws(self):
+        budget = TokenBudget(tokens_per_minute=600)
+
+        assert budget.take(500) == 0
+        assert budget.take(200) == pytest.approx(10.0, rel=0.05)
+        assert budget.available == pytest.approx(100, abs=1)
+
+    def test_budget_wait_is_bounded_by_queue_timeout(self):
+        gateway = fast_gateway(tokens_per_minute=600, tenant_tokens_per_minute=0, queue_timeout=0.5)
+        gateway.call(lambda: None, tokens=600)
+
+        start = time.perf_counter()
+        with pytest.raises(LLMError) as exc_info:
+            gateway.call(lambda: None, tokens=100)  # 10s of debt
+
+        assert exc_info.value.status_code == 503
+        assert time.perf_counter() - start < 0.1
+        assert gateway.get_stats()["tokens_available"] == pytest.approx(0, abs=5)
+
+    def test_batch_debt_does_not_delay_interactive(self):
+        gateway = fast_gateway(tokens_per_minute=6000, tenant_tokens_per_minute=0,
+                               batch_share=0.5, queue_timeout=1.0)  # 100 tokens/s
+
+        with llm_context(lane=LANE_BATCH):
+            gateway.call(lambda: None, tokens=3000)
+            with pytest.raises(LLMError):
+                gateway.call(lambda: None, tokens=3000)  # Over the batch share
+
+        start = time.perf_counter()
+        gateway.call(lambda: None, tokens=2500)
+
+        assert time.perf_counter() - start < 0.05
+        assert gateway.get_stats()["batch_tokens_available"] == pytest.approx(0, abs=5)
+
+
+class TestRetries:
+    """Test 429 handling."""
+
+    def test_rate_limit_detection(self):
+        assert is_rate_limit_error(ResourceExhausted("quota"))
+        assert is_rate_limit_error(Exception("Error code: 429 - Too Many Requests"))
+        assert not is_rate_limit_error(ValueError("bad request"))
+
+    def test_retries_until_success(self):
+        gateway = fast_gateway()
+        fn = flaky(2)
+
+        assert gateway.call(fn, "answer") == "answer"
+        assert len(fn.calls) == 3
+        assert gateway.retries == 2
+
+    def test_gives_up_after_max_retries(self):
+        gateway = fast_gateway(max_retries=1)
+
+        with pytest.raises(ResourceExhausted):
+            gateway.call(flaky(5), "answer")
+        assert gateway.limiter.in_flight == 0
+
+    def test_other_errors_are_not_retried(self):
+        gateway = fast_gateway()
+        fn = flaky(1, ValueError("bad"))
+
+        with pytest.raises(ValueError):
+            gateway.call(fn, "x")
+        assert len(fn.calls) == 1
+
+    def test_async_retry(self):
+        gateway = fast_gateway()
+        fn = flaky(1)
+
+        async def afn(value):
+            return fn(value)
+
+        assert asyncio.run(gateway.acall(afn, "answer")) == "answer"
+        assert gateway.retries == 1
+
+    def test_stream_retries_only_before_first_chunk(self):
+        gateway = fast_gateway()
+        attempts = []
+
+        def fails_first():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ResourceExhausted("429")
+            yield from "abc"
+
+        def fails_midway():
+            yield "a"
+            raise ResourceExhausted("429")
+
+        assert list(gateway.stream(fails_first)) == ["a", "b", "c"]
+        with pytest.raises(ResourceExhausted):
+            list(gateway.stream(fails_midway))
+        assert gateway.limiter.in_flight == 0
+
+    def test_async_stream_holds_slot_until_done(self):
+        gateway = fast_gateway(max_concurrency=1)
+
+        async def chunks():
+            for chunk in "ab":
+                assert gateway.limiter.in_flight == 1
+                yield chunk
+
+        async def scenario():
+            return [chunk async for chunk in gateway.astream(chunks)]
+
+        assert asyncio.run(scenario()) == ["a", "b"]
+        assert gateway.limiter.in_flight == 0
+
+
+class TestGateway:
+    """Test queue timeouts, stats and shared clients."""
+
+    def test_queue_timeout(self):
+        gateway = fast_gateway(max_concurrency=1, queue_timeout=0.01)
+        gateway.limiter.acquire(DEFAULT_TENANT)
+
+        with pytest.raises(LLMError) as exc_info:
+            gateway.call(lambda: None)
+
+        assert exc_info.value.status_code == 503
+        assert gateway.timeouts == 1
+
+    def test_queue_wait_is_recorded_per_lane(self):
+        gateway = fast_gateway()
+        gateway.call(lambda: None)
+        with llm_context(lane=LANE_BATCH):
+            gateway.call(lambda: None)
+
+        stats = gateway.get_stats()
+
+        assert stats["calls"] == 2
+        assert stats["queue_wait"][LANE_BATCH]["count"] == 1
+
+    def test_clients_are_shared_by_key(self):
+        gateway = fast_gateway()
+
+        first = gateway.get_client(("gemini", 0.7), object)
+
+        assert gateway.get_client(("gemini", 0.7), object) is first
+        assert gateway.get_client(("gemini", 0.3), object) is not first
+        assert gateway.get_client(None, object) is not gateway.get_client(None, object)
+
+    def test_singleton(self, monkeypatch):
+        monkeypatch.setattr(llm_gateway, "_llm_gateway", None)
+
+        assert llm_gateway.get_llm_gateway() is llm_gateway.get_llm_gateway()
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+@pytest.mark.slow
+def test_benchmark_interactive_lane_under_batch_flood():
+    """Interactive calls wait far less than batch calls when grading floods the gateway."""
+    gateway = LLMGateway(max_concurrency=4, tenant_concurrency=4, batch_share=0.75,
+                         tokens_per_minute=0, tenant_tokens_per_minute=0)
+    provider_latency = 0.02
+
+    async def provider():
+        await asyncio.sleep(provider_latency)
+
+    async def batch_call():
+        with llm_context(tenant_id="grading", lane=LANE_BATCH):
+            await gateway.acall(provider)
+
+    async def interactive_call(i):
+        await asyncio.sleep(0.01 * i)
+        with llm_context(tenant_id=f"student-{i % 3}"):
+            await gateway.acall(provider)
+
+    async def scenario():
+        await asyncio.gather(*[batch_call() for _ in range(80)], *[interactive_call(i) for i in range(20)])
+
+    start = time.perf_counter()
+    asyncio.run(scenario())
+    elapsed = time.perf_counter() - start
+
+    interactive = gateway.queue_wait[LANE_INTERACTIVE].get_stats()
+    batch = gateway.queue_wait[LANE_BATCH].get_stats()
+
+    print(f"\n⏱️  80 batch + 20 interactive calls, 4 slots, {provider_latency * 1000:.0f}ms provider ({elapsed:.2f}s)")
+    print(f"   Interactive queue wait p95: {interactive['p95'] * 1000:7.1f} ms")
+    print(f"   Batch queue wait p95:       {batch['p95'] * 1000:7.1f} ms")
+
+    assert interactive["count"] == 20 and batch["count"] == 80
+    assert interactive["p95"] <= provider_latency * 2
+    assert interactive["p95"] < batch["p95"] / 5
@@ -0,0 +1,305 @@
+"""
+Offline end-to-end benchmark.
+
+Runs the seeded workloads against the real FastAPI app in-process, with
+every external provider (LLM, embeddings, web search, Google Classroom)
+replaced by a fake with fixed latency, and compares per-endpoint
+throughput, TTFB and latency percentiles with tests/perf/baseline.json.
+
+Runs with UPDATE_PERF_BASELINE=1 record the baseline instead of
+comparing; without it, a missing baseline (or workload) fails the gate.
+
+Run benchmark with output: python -m pytest tests/test_offline_benchmark.py -v -s -m slow
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from tests.perf import (
+    BenchmarkReport,
+    FakeClassroomService,
+    FakeEmbeddings,
+    LoadGenerator,
+    ProviderLatencies,
+    RequestSpec,
+    Workload,
+    WORKLOADS,
+    compare_to_baseline,
+    format_report,
+    get_workload,
+    load_baseline,
+    save_baseline,
+    fake_text,
+)
+
+
+BENCHMARK_TENANT_ID = "01JBTEST000000000000000000"
+
+
+def make_app(delay=0.0, chunks=(b"data: a\n\n", b"data: b\n\n"), status=200, fail_path=None):
+    """Raw ASGI app: optional delay before the first chunk, then ``chunks``."""
+    state = {"in_flight": 0, "max_in_flight": 0, "started": False, "stopped": False}
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    scope["state"]["ready"] = True
+                    state["started"] = True
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    state["stopped"] = True
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            if scope["path"] == fail_path:
+                raise RuntimeError("boom")
+            await receive()
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await asyncio.sleep(delay)
+            for chunk in chunks:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await asyncio.sleep(delay)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            state["in_flight"] -= 1
+
+    return app, state
+
+
+def workload_of(count, path="/x"):
+    return Workload("synthetic", [RequestSpec("GET", path, f"GET {path}") for _ in range(count)], concurrency=4)
+
+
+class TestFakes:
+    """Test that fake providers are deterministic."""
+
+    def test_fake_text_is_seeded(self):
+        assert fake_text("q", 20, seed=1) == fake_text("q", 20, seed=1)
+        assert fake_text("q", 20, seed=1) != fake_text("q", 20, seed=2)
+        assert len(fake_text("q", 20).split()) == 20
+
+    def test_embeddings_are_deterministic_unit_vectors(self):
+        embeddings = FakeEmbeddings(dimension=32, latency=0)
+
+        first = embeddings.embed_query("mitosis")
+
+        assert first == FakeEmbeddings(dimension=32, latency=0).embed_query("mitosis")
+        assert sum(x * x for x in first) == pytest.approx(1.0)
+        assert embeddings.embed_content(content=["a", "b"])["embedding"][0] == embeddings.embed_query("a")
+
+    def test_classroom_service_mirrors_resource_api(self):
+        service = FakeClassroomService(courses=2, submissions=3, latency=0)
+
+        courses = service.courses().list(pageSize=10).execute()
+        submissions = service.courses().courseWork().studentSubmissions().list(
+            courseId="course-1", courseWorkId="course-1-work-0"
+        ).execute()
+
+        assert [c["id"] for c in courses["courses"]] == ["course-0", "course-1"]
+        assert len(submissions["studentSubmissions"]) == 3
+        assert submissions == service.courses().courseWork().studentSubmissions().list(
+            courseId="course-1", courseWorkId="course-1-work-0"
+        ).execute()
+
+    def test_chat_model_streams_with_latency(self):
+        pytest.importorskip("langchain_core")
+        from langchain_core.messages import HumanMessage
+        from tests.perf import FakeChatModel
+
+        llm = FakeChatModel(first_token_latency=0.02, per_token_latency=0, response_tokens=5, seed=3)
+
+        chunks = list(llm.stream([HumanMessage(content="What is ATP?")]))
+        answer = llm.invoke([HumanMessage(content="What is ATP?")])
+
+        assert len(chunks) == 5
+        assert "".join(chunk.content for chunk in chunks).strip() == answer.content.strip()
+
+
+class TestWorkloads:
+    """Test seeded workload generation."""
+
+    @pytest.mark.parametrize("name", sorted(WORKLOADS))
+    def test_same_seed_same_requests(self, name):
+        assert get_workload(name).requests == get_workload(name).requests
+
+    def test_different_seed_different_requests(self):
+        assert get_workload("study_mix", seed=1).requests != get_workload("study_mix", seed=2).requests
+
+    def test_endpoints_are_listed(self):
+        workload = get_workload("bulk_grading")
+
+        assert workload.endpoints == ["GET /grading/rubrics/{professor_id}", "POST /query/"]
+
+    def test_unknown_workload(self):
+        with pytest.raises(ValueError):
+            get_workload("nope")
+
+
+class TestLoadGenerator:
+    """Test driving a raw ASGI app."""
+
+    def test_latency_and_ttfb(self):
+        app, _ = make_app(delay=0.01)
+
+        report = asyncio.run(LoadGenerator(app).run(workload_of(8))).to_dict()
+        stats = report["endpoints"]["GET /x"]
+
+        assert stats["count"] == 8 and stats["errors"] == 0
+        assert stats["statuses"] == {"200": 8}
+        assert 0.01 <= stats["ttfb_p50"] < stats["latency_p50"]
+        assert stats["bytes"] == 8 * 18
+
+    def test_concurrency_is_bounded(self):
+        app, state = make_app(delay=0.005)
+
+        asyncio.run(LoadGenerator(app).run(workload_of(20), concurrency=3))
+
+        assert state["max_in_flight"] == 3
+
+    def test_errors_are_counted(self):
+        app, _ = make_app(fail_path="/boom")
+        workload = Workload("mixed", workload_of(3).requests + workload_of(2, "/boom").requests)
+
+        report = asyncio.run(LoadGenerator(app).run(workload)).to_dict()
+
+        assert report["endpoints"]["GET /x"]["errors"] == 0
+        assert report["endpoints"]["GET /boom"]["error_rate"] == 1.0
+
+    def test_headers_and_client_per_request(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append((dict(scope["headers"]), scope["client"][0]))
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        spec = RequestSpec("GET", "/me", "GET /me", user_id="u1", client=7)
+        generator = LoadGenerator(app, headers_for=lambda s: {"Authorization": f"Bearer {s.user_id}"})
+        asyncio.run(generator.run(Workload("w", [spec])))
+
+        assert seen[0][0][b"authorization"] == b"Bearer u1"
+        assert seen[0][1] == "10.0.0.8"
+
+    def test_lifespan_state_reaches_requests(self):
+        app, state = make_app()
+        generator = LoadGenerator(app)
+        states = []
+
+        async def scenario():
+            async with generator.lifespan():
+                states.append(generator._scope(workload_of(1).requests[0], b"")["state"])
+
+        asyncio.run(scenario())
+
+        assert state["started"] and state["stopped"]
+        assert states == [{"ready": True}]
+
+
+def report_with(p95=0.1, throughput=100.0, error_rate=0.0):
+    return {"workload": "w", "endpoints": {"POST /query/": {
+        "latency_p50": 0.05, "latency_p95": p95, "latency_p99": p95, "ttfb_p50": 0.01,
+        "ttfb_p95": 0.02, "ttfb_p99": 0.02, "throughput_rps": throughput, "error_rate": error_rate,
+    }}}
+
+
+class TestBaseline:
+    """Test regression detection against the stored baseline."""
+
+    def test_within_tolerance(self):
+        assert compare_to_baseline(report_with(p95=0.12), report_with(p95=0.1)) == []
+
+    def test_latency_regression(self):
+        regressions = compare_to_baseline(report_with(p95=0.2), report_with(p95=0.1))
+
+        assert any("latency_p95" in r for r in regressions)
+
+    def test_tiny_absolute_differences_are_noise(self):
+        assert compare_to_baseline(report_with(p95=0.002), report_with(p95=0.001)) == []
+
+    def test_throughput_and_error_regressions(self):
+        regressions = compare_to_baseline(report_with(throughput=50, error_rate=0.1), report_with())
+
+        assert len(regressions) == 2
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        save_baseline([report_with()], path)
+        save_baseline([dict(report_with(), workload="other")], path)
+
+        assert set(load_baseline(path)) == {"w", "other"}
+        assert load_baseline(tmp_path / "missing.json") == {}
+
+    def test_format_report(self):
+        report = BenchmarkReport("w")
+        report.endpoint("GET /x").latency.record(0.01)
+        report.endpoint("GET /x").ttfb.record(0.005)
+        report.wall_seconds = 1.0
+
+        table = format_report(report.to_dict())
+
+        assert "GET /x" in table and "1.0 req/s" in table
+
+
+# =============================================================================
+# END-TO-END BENCHMARK
+# =============================================================================
+
+@pytest.mark.slow
+def test_benchmark_offline_workloads():
+    """Seeded workloads against the in-process app stay within the baseline."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("langchain_core")
+    from tests.perf import fake_providers
+    from utils.auth.jwt_handler import create_access_token
+
+    def auth_headers(spec: RequestSpec):
+        headers = {"X-Tenant-ID": BENCHMARK_TENANT_ID}
+        if spec.user_id:
+            token = create_access_token({
+                "user_id": spec.user_id,
+                "email": f"{spec.user_id}@bench.example",
+                "role": spec.role,
+                "tenant_id": BENCHMARK_TENANT_ID,
+            })
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    baseline = load_baseline()
+    update = bool(os.getenv("UPDATE_PERF_BASELINE"))
+    if not baseline and not update:
+        pytest.fail("No tests/perf/baseline.json: record one with UPDATE_PERF_BASELINE=1")
+    reports = []
+
+    with fake_providers(ProviderLatencies()):
+        from api.app import app
+
+        async def run_all():
+            generator = LoadGenerator(app, headers_for=auth_headers)
+            async with generator.lifespan(ready_path="/ready"):
+                for name in sorted(WORKLOADS):
+                    reports.append((await generator.run(get_workload(name))).to_dict())
+
+        asyncio.run(run_all())
+
+    regressions = []
+    for report in reports:
+        print("\n" + format_report(report, baseline.get(report["workload"])))
+        if update:
+            continue
+        if report["workload"] not in baseline:
+            regressions.append(f"{report['workload']}: not in the baseline (record with UPDATE_PERF_BASELINE=1)")
+        else:
+            regressions.extend(compare_to_baseline(report, baseline[report["workload"]]))
+
+    if update:
+        save_baseline(reports)
+        pytest.skip("Recorded new offline benchmark baseline")
+
+    assert not regressions, "Performance regressions:\n" + "\n".join(regressions)
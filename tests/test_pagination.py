@@ -0,0 +1,106 @@
+"""
+Tests for keyset (cursor) pagination.
+"""
+
+import uuid
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, Column, Integer, String, DateTime
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from database.operations.pagination import (
+    InvalidCursorError,
+    encode_cursor,
+    decode_cursor,
+    paginate_keyset,
+)
+
+
+LocalBase = declarative_base()
+
+
+class LogRow(LocalBase):
+    """Minimal listing table for pagination tests."""
+    __tablename__ = "log_rows"
+
+    id = Column(Integer, primary_key=True)
+    owner = Column(String(50), index=True)
+    created_at = Column(DateTime, index=True)
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite session with rows sharing timestamps."""
+    engine = create_engine("sqlite:///:memory:")
+    LocalBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    base_time = datetime(2025, 1, 1)
+    for i in range(1, 26):
+        # Pairs of rows share a timestamp to exercise the id tiebreaker
+        session.add(LogRow(id=i, owner="prof", created_at=base_time + timedelta(minutes=i // 2)))
+    session.add(LogRow(id=100, owner="other", created_at=base_time))
+    session.commit()
+
+    yield session
+    session.close()
+
+
+class TestCursorEncoding:
+    """Test opaque cursor round-trips."""
+
+    def test_round_trip_datetime_and_uuid(self):
+        """Datetimes and UUIDs survive encoding."""
+        ts = datetime(2025, 3, 4, 5, 6, 7, 890)
+        row_id = uuid.uuid4()
+
+        assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+    def test_cursor_is_url_safe(self):
+        """Cursors contain no characters that need URL escaping."""
+        cursor = encode_cursor(datetime.utcnow(), uuid.uuid4())
+
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_malformed_cursor_rejected(self):
+        """Garbage cursors raise InvalidCursorError."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor!!")
+
+
+class TestPaginateKeyset:
+    """Test keyset pagination over a real query."""
+
+    def test_walks_all_rows_without_duplicates(self, db):
+        """Following next_cursor visits every row exactly once, newest first."""
+        query = db.query(LogRow).filter(LogRow.owner == "prof")
+        seen = []
+        cursor = None
+
+        while True:
+            page = paginate_keyset(db, query, LogRow.created_at, LogRow.id, page_size=7, cursor=cursor)
+            seen.extend(row.id for row in page.items)
+            if not page.has_more:
+                assert page.next_cursor is None
+                break
+            cursor = page.next_cursor
+
+        assert seen == sorted(range(1, 26), key=lambda i: (i // 2, i), reverse=True)
+
+    def test_total_is_optional(self, db):
+        """Totals are only computed on request."""
+        query = db.query(LogRow).filter(LogRow.owner == "prof")
+
+        assert paginate_keyset(db, query, LogRow.created_at, LogRow.id).total is None
+
+        page = paginate_keyset(db, query, LogRow.created_at, LogRow.id, include_total=True)
+        assert page.total == 25
+        assert page.total_estimated is False  # SQLite has no planner estimate
+
+    def test_invalid_cursor_raises(self, db):
+        """A bad cursor surfaces as InvalidCursorError."""
+        query = db.query(LogRow)
+
+        with pytest.raises(InvalidCursorError):
+            paginate_keyset(db, query, LogRow.created_at, LogRow.id, cursor="bogus")
@@ -0,0 +1,180 @@
+"""
+Tests for dependency-aware execution of multi-step study plans.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.patterns.plan_dag import normalize_plan, ready_steps, run_plan
+
+
+def plan_of(*depends_on):
+    return normalize_plan([
+        {"description": f"step {i + 1}", "tool": "Web_Search", "depends_on": list(deps)}
+        for i, deps in enumerate(depends_on)
+    ])
+
+
+class TestNormalizePlan:
+    """Test step numbering and dependency cleanup."""
+
+    def test_missing_dependencies_run_in_order(self):
+        plan = normalize_plan([{"step": 1}, {"step": 2}, {"step": 3}])
+
+        assert [step["depends_on"] for step in plan] == [[], [1], [2]]
+
+    def test_invalid_dependencies_are_dropped(self):
+        plan = normalize_plan([
+            {"depends_on": [1, 2]},
+            {"depends_on": ["1", "x", 7]},
+            {"depends_on": 2},
+        ])
+
+        assert [step["depends_on"] for step in plan] == [[], [1], [2]]
+        assert [step["step"] for step in plan] == [1, 2, 3]
+
+    def test_ready_steps(self):
+        plan = plan_of([], [], [1, 2])
+
+        assert [s["step"] for s in ready_steps(plan, done=set(), started=set())] == [1, 2]
+        assert [s["step"] for s in ready_steps(plan, done={1}, started={1, 2})] == []
+        assert [s["step"] for s in ready_steps(plan, done={1, 2}, started={1, 2})] == [3]
+
+
+class TestRunPlan:
+    """Test concurrent execution, ordering and bounded fan-out."""
+
+    def run(self, plan, delay=0.05, max_parallel=3, fail=()):
+        events = []
+        in_flight = {"now": 0, "max": 0}
+
+        async def run_step(step):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            events.append(("start", step["step"]))
+            try:
+                await asyncio.sleep(delay)
+                if step["step"] in fail:
+                    raise RuntimeError(f"step {step['step']} failed")
+                return f"result {step['step']}"
+            finally:
+                in_flight["now"] -= 1
+                events.append(("end", step["step"]))
+
+        started = time.perf_counter()
+        results = asyncio.run(run_plan(plan, run_step, max_parallel=max_parallel))
+        return results, events, in_flight["max"], time.perf_counter() - started
+
+    def test_independent_steps_take_the_max_not_the_sum(self):
+        results, _, max_in_flight, elapsed = self.run(plan_of([], []), delay=0.1)
+
+        assert results == {1: "result 1", 2: "result 2"}
+        assert max_in_flight == 2
+        assert elapsed < 0.18
+
+    def test_dependents_wait_for_their_dependencies(self):
+        _, events, _, _ = self.run(plan_of([], [], [1, 2]))
+
+        assert events.index(("start", 3)) > max(events.index(("end", 1)), events.index(("end", 2)))
+
+    def test_fan_out_is_bounded(self):
+        _, _, max_in_flight, _ = self.run(plan_of([], [], [], []), delay=0.01, max_parallel=2)
+
+        assert max_in_flight == 2
+
+    def test_failed_step_does_not_stop_its_dependents(self):
+        results, _, _, _ = self.run(plan_of([], [1]), delay=0.01, fail={1})
+
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] == "result 2"
+
+
+class TestStreamingPlanExecution:
+    """Test StreamingStudyNodes.execute_plan on a compare-style plan."""
+
+    def test_compare_plan_runs_lookups_in_parallel(self):
+        pytest.importorskip("langchain")
+        from agents.study.streaming_nodes import StreamingStudyNodes
+        from utils.patterns.streaming import StreamingIndicator, StreamingState
+
+        nodes = StreamingStudyNodes(llm=None, streaming_llm=None, tool_map={})
+
+        async def lookup(state):
+            await state.add_indicator(StreamingIndicator.SEARCHING, "looking up")
+            await asyncio.sleep(0.1)
+            await state.update("tool_result", f"answer to {state['question']}", stream=False)
+            return state
+
+        nodes._execute_web_search = lookup
+        nodes._execute_document_qa = lookup
+
+        state = StreamingState({
+            "question": "Compare X and Y",
+            "task_plan": [
+                {"step": 1, "description": "X", "tool": "Web_Search", "depends_on": []},
+                {"step": 2, "description": "Y", "tool": "Document_QA", "depends_on": []},
+            ],
+            "current_step": 0,
+            "completed_steps": [],
+            "intermediate_answers": [],
+        })
+
+        async def scenario():
+            started = time.perf_counter()
+            await nodes.execute_plan(state)
+            elapsed = time.perf_counter() - started
+            messages = []
+            while not state.stream_queue.empty():
+                chunk = state.stream_queue.get_nowait()
+                if chunk["type"] == "indicator":
+                    messages.append(chunk["indicator"]["message"])
+            return elapsed, messages
+
+        elapsed, messages = asyncio.run(scenario())
+
+        assert elapsed < 0.18
+        assert [a["result"] for a in state.get("intermediate_answers")] == ["answer to X", "answer to Y"]
+        assert state.get("current_step") == 2
+        assert state.get("question") == "Compare X and Y"
+        assert "[Step 1] looking up" in messages and "[Step 2] looking up" in messages
+
+    def test_routing_flags_of_steps_reach_the_parent_state(self):
+        pytest.importorskip("langchain")
+        from agents.study.streaming_nodes import StreamingStudyNodes
+        from utils.patterns.streaming import StreamingState
+
+        nodes = StreamingStudyNodes(llm=None, streaming_llm=None, tool_map={})
+
+        async def search(state):
+            await state.update("tool_result", "web answer", stream=False)
+            return state
+
+        async def document_qa(state):
+            await state.update("document_qa_failed", True, stream=False)
+            await state.update("needs_clarification", True, stream=False)
+            await state.update("awaiting_user_choice", True, stream=False)
+            await state.update("tool_result", "not in your documents", stream=False)
+            return state
+
+        nodes._execute_web_search = search
+        nodes._execute_document_qa = document_qa
+
+        state = StreamingState({
+            "question": "Compare X and Y",
+            "task_plan": [
+                {"step": 1, "description": "X", "tool": "Document_QA", "depends_on": []},
+                {"step": 2, "description": "Y", "tool": "Web_Search", "depends_on": []},
+            ],
+            "current_step": 0,
+            "completed_steps": [],
+            "intermediate_answers": [],
+            "document_qa_failed": False,
+        })
+
+        asyncio.run(nodes.execute_plan(state))
+
+        assert state.get("document_qa_failed") is True
+        assert state.get("needs_clarification") is True
+        assert state.get("awaiting_user_choice") is True
@@ -0,0 +1,296 @@
+"""
+Tests for sequence-based prefetching (cache keys and document retrieval).
+
+The simulation replays student sessions (question about a chapter ->
+"summarize it" -> "make flashcards", with detours) against a fake
+structured-retrieval loader and reports the measured prefetch hit rate.
+
+Run simulation with output: python -m pytest tests/test_prefetch.py -v -s -k simulation
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from utils.cache.prefetch_model import SequenceModel, PrefetchBudget
+from utils.cache.cache_strategies import SmartPrefetcher
+from utils.rag.document_structure import unit_request_topic
+from utils.rag.query_enrichment import classify_query_intent
+from utils.rag.retrieval import RetrievalResult, RetrievedChunk, STRATEGY_STRUCTURED
+from utils.rag.retrieval_prefetch import RetrievalPrefetcher, retrieval_scope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCache:
+    """Async get/set cache backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key, namespaces=()):
+        return self.data.get(key)
+
+    async def set(self, key, value, namespaces=()):
+        self.data[key] = value
+
+
+def chapter_chunks(chapter, count):
+    return [
+        RetrievedChunk(id=f"{chapter}-{i}", document_name="Biology.pdf",
+                       content=f"Chapter {chapter} passage {i}", chunk_index=i, chapter_number=chapter)
+        for i in range(count)
+    ]
+
+
+class FakeUnitLoader:
+    """Structured retrieval over a book with 60-chunk chapters."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, query, reference, limit, user_id, course_id):
+        self.calls.append((reference.chapter, limit))
+        return RetrievalResult(
+            query=query, chunks=chapter_chunks(reference.chapter, 80)[:limit],
+            strategy=STRATEGY_STRUCTURED, unit_label=f"Chapter {reference.chapter}"
+        )
+
+
+class TestSequenceModel:
+    """Test the bounded Markov model."""
+
+    def test_predicts_follow_up(self):
+        model = SequenceModel()
+        for session in range(10):
+            model.observe(f"s{session}", "question@chapter")
+            model.observe(f"s{session}", "summarize@chapter" if session < 8 else "explain@chapter")
+
+        predictions = model.predict("question@chapter")
+
+        assert predictions[0] == ("summarize@chapter", 0.8)
+        assert model.predict("question@chapter", min_probability=0.5) == [("summarize@chapter", 0.8)]
+
+    def test_sessions_are_separate(self):
+        """Interleaved sessions do not create cross-session transitions."""
+        model = SequenceModel()
+        model.observe("a", "x")
+        model.observe("b", "y")
+        model.observe("a", "z")
+
+        assert model.predict("x") == [("z", 1.0)]
+        assert model.predict("y") == []
+
+    def test_memory_is_bounded(self):
+        model = SequenceModel(max_states=10, max_successors=3, max_sessions=5)
+        for i in range(1000):
+            model.observe(f"s{i % 50}", f"k{i}")
+            model.observe("hub-session", "hub")
+            model.observe("hub-session", f"next{i}")
+
+        assert len(model) <= 10
+        assert all(len(successors) <= 3 for successors in model._transitions.values())
+        assert len(model._sessions) <= 5
+
+    def test_budget(self):
+        clock = FakeClock()
+        budget = PrefetchBudget(per_minute=2, clock=clock)
+
+        assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+        clock.now += 30  # One token refilled
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+
+class TestSmartPrefetcher:
+    """Test key-level prefetching."""
+
+    def test_prefetches_learned_successor(self):
+        """After learning a -> b, accessing a prefetches b, and using b is a hit."""
+        cache = FakeCache()
+        prefetcher = SmartPrefetcher(cache)
+        for session in range(3):
+            prefetcher.record_access("a", f"s{session}")
+            prefetcher.record_access("b", f"s{session}")
+
+        prefetched = asyncio.run(prefetcher.prefetch_related("a", lambda key: f"value:{key}"))
+        prefetcher.record_access("b", "s9")
+
+        assert prefetched == 1
+        assert cache.data["b"] == "value:b"
+        assert prefetcher.get_stats()["prefetch_hit_rate_percent"] == 100.0
+
+    def test_budget_caps_loads(self):
+        cache = FakeCache()
+        prefetcher = SmartPrefetcher(cache, budget_per_minute=1, min_probability=0.0)
+        for key in ("b", "c"):
+            prefetcher.record_access("a", key)
+            prefetcher.record_access(key, key)
+
+        assert asyncio.run(prefetcher.prefetch_related("a", lambda key: key)) == 1
+        assert prefetcher.budget_skips == 1
+
+
+class TestQueryIntent:
+    """Test intent classification used for sequence states."""
+
+    @pytest.mark.parametrize("query,intent", [
+        ("make flashcards", "flashcards"),
+        ("quiz me on chapter 3", "quiz"),
+        ("give me structured notes for ch. 3", "notes"),
+        ("summarize it", "summarize"),
+        ("explain photosynthesis", "explain"),
+        ("what does chapter 3 say about mitosis", "question"),
+    ])
+    def test_classify(self, query, intent):
+        assert classify_query_intent(query) == intent
+
+    def test_bare_requests(self):
+        assert unit_request_topic("now make some flashcards") == ""
+        assert unit_request_topic("make flashcards on mitosis") == "mitosis"
+
+
+class TestRetrievalPrefetcher:
+    """Test speculative whole-unit retrieval."""
+
+    def make(self, **kwargs):
+        loader = FakeUnitLoader()
+        kwargs.setdefault("budget_per_minute", 1000)
+        prefetcher = RetrievalPrefetcher(loader=loader, **kwargs)
+        # Teach the model that chapter questions lead to summaries
+        for session in range(3):
+            prefetcher.model.observe(f"teach{session}", "question@chapter")
+            prefetcher.model.observe(f"teach{session}", "summarize@chapter")
+        return prefetcher, loader
+
+    def question_result(self, chapter):
+        return RetrievalResult(query=f"what does chapter {chapter} say about mitosis",
+                               chunks=chapter_chunks(chapter, 5))
+
+    def test_scope_from_chunks(self):
+        result = RetrievalResult(query="what is mitosis", chunks=chapter_chunks(4, 5))
+
+        assert retrieval_scope(result) == ("chapter", "4")
+
+    def test_prefetch_then_hit(self):
+        """A chapter question prefetches the chapter; "summarize it" is served from it."""
+        prefetcher, loader = self.make()
+
+        scheduled = prefetcher.observe("what does chapter 3 say about mitosis", self.question_result(3), "u1")
+        prefetcher.wait(timeout=5)
+        served = prefetcher.lookup("summarize chapter 3", limit=15, user_id="u1")
+
+        assert scheduled == ("chapter", "3")
+        assert loader.calls == [(3, 60)]
+        assert served.strategy == STRATEGY_STRUCTURED
+        assert len(served.chunks) == 15
+        assert served.chunks[0].id == "3-0"
+        assert prefetcher.get_stats()["prefetch_hit_rate_percent"] == 100.0
+
+    def test_unrecorded_lookup_does_not_count_the_hit(self):
+        """Speculative lookups are served without counting the hit or recording it."""
+        hits = []
+        prefetcher, _ = self.make(on_hit=hits.append)
+        prefetcher.observe("what does chapter 3 say about mitosis", self.question_result(3), "u1")
+        prefetcher.wait(timeout=5)
+
+        assert prefetcher.lookup("summarize chapter 3", limit=15, user_id="u1", record=False) is not None
+        prefetcher.wait(timeout=5)
+
+        assert hits == []
+        assert prefetcher.get_stats()["prefetch_hit_rate_percent"] == 0.0
+
+    def test_bare_request_uses_session_unit(self):
+        """"make flashcards" is served from the unit the session is studying."""
+        prefetcher, _ = self.make()
+        prefetcher.observe("what does chapter 3 say about mitosis", self.question_result(3), "u1")
+        prefetcher.wait(timeout=5)
+
+        assert prefetcher.lookup("make flashcards", limit=60, user_id="u1") is not None
+        assert prefetcher.lookup("make flashcards", limit=60, user_id="u2") is None
+        assert prefetcher.lookup("make flashcards on meiosis", limit=60, user_id="u1") is None
+
+    def test_users_are_isolated(self):
+        prefetcher, _ = self.make()
+        prefetcher.observe("what does chapter 3 say about mitosis", self.question_result(3), "u1")
+        prefetcher.wait(timeout=5)
+
+        assert prefetcher.lookup("summarize chapter 3", limit=15, user_id="u2") is None
+
+    def test_budget_and_busy_worker_limit_loads(self):
+        prefetcher, loader = self.make(budget_per_minute=1)
+        prefetcher.observe("what does chapter 3 say about mitosis", self.question_result(3), "u1")
+        prefetcher.wait(timeout=5)
+        prefetcher.observe("what does chapter 4 say about mitosis", self.question_result(4), "u1")
+
+        assert len(loader.calls) == 1
+        assert prefetcher.budget_skips == 1
+
+    def test_unlikely_next_step_not_prefetched(self):
+        prefetcher, loader = self.make()
+
+        prefetcher.observe("explain chapter 3 mitosis", self.question_result(3), "u1")
+
+        assert loader.calls == []
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
+SESSIONS = 300
+
+
+def simulate_session(rng, chapter):
+    """
+    One student's queries as (asked, reformulated, limit).
+
+    Most students go question -> summary -> flashcards; some detour.
+    """
+    steps = [(f"what does chapter {chapter} say about mitosis", f"what does chapter {chapter} say about mitosis", 15)]
+    if rng.random() < 0.8:
+        steps.append(("summarize it", f"summarize chapter {chapter}", 60))
+        if rng.random() < 0.7:
+            steps.append(("make flashcards", "make flashcards", 60))
+    else:
+        steps.append(("explain the cell cycle", "explain the cell cycle", 15))
+    return steps
+
+
+def test_simulation_prefetch_hit_rate():
+    """Whole-unit follow-ups are mostly served without a database load."""
+    rng = random.Random(7)
+    loader = FakeUnitLoader()
+    prefetcher = RetrievalPrefetcher(loader=loader, budget_per_minute=10_000)
+    unit_requests = database_loads = 0
+
+    for session in range(SESSIONS):
+        user = f"student{session}"
+        for asked, reformulated, limit in simulate_session(rng, rng.randint(1, 20)):
+            result = prefetcher.lookup(reformulated, limit, user_id=user)
+            is_unit_request = classify_query_intent(asked) in ("summarize", "flashcards")
+            unit_requests += is_unit_request
+            if result is None:
+                if is_unit_request:
+                    database_loads += 1
+                chapter = int(reformulated.split("chapter ")[1].split()[0]) if "chapter " in reformulated else 1
+                result = RetrievalResult(query=reformulated, chunks=chapter_chunks(chapter, min(limit, 5)))
+            prefetcher.observe(asked, result, user_id=user, limit=limit)
+            prefetcher.wait(timeout=5)  # The LLM answers while the prefetch runs
+
+    stats = prefetcher.get_stats()
+    served = unit_requests - database_loads
+
+    print(f"\n⚡ {SESSIONS} sessions, {unit_requests} whole-unit follow-ups")
+    print(f"   Served from prefetch: {served} ({served / unit_requests:.0%})")
+    print(f"   Prefetch loads: {len(loader.calls)}, hit rate {stats['prefetch_hit_rate_percent']}%")
+
+    assert served / unit_requests >= 0.8
+    assert stats["prefetch_hit_rate_percent"] >= 70
@@ -0,0 +1,184 @@
+"""
+Tests for the write-behind user profile store.
+"""
+
+import pytest
+
+from utils.ml import profile_store, user_profile
+from utils.ml.profile_store import ProfileStore, FileProfileBackend
+from utils.ml.user_profile import UserProfile, UserProfileManager
+
+
+class RecordingBackend:
+    """In-memory backend that records every round trip."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.load_calls = []
+        self.save_calls = []
+        self.fail_saves = False
+
+    def load_many(self, user_ids):
+        user_ids = list(user_ids)
+        self.load_calls.append(user_ids)
+        return {uid: dict(self.rows[uid]) for uid in user_ids if uid in self.rows}
+
+    def save_many(self, records):
+        if self.fail_saves:
+            raise RuntimeError("database down")
+        self.save_calls.append([r["user_id"] for r in records])
+        for record in records:
+            self.rows[record["user_id"]] = record
+
+
+def make_manager(backend, **kwargs) -> UserProfileManager:
+    """Manager without a background flusher so tests control writes."""
+    kwargs.setdefault("flush_interval", 3600)
+    return UserProfileManager(backend=backend, **kwargs)
+
+
+class TestWriteBehind:
+    """Test batching of profile writes."""
+
+    def test_updates_are_not_written_synchronously(self):
+        """Interactions only mark profiles dirty until a flush."""
+        backend = RecordingBackend()
+        manager = make_manager(backend)
+
+        for i in range(50):
+            manager.update_from_interaction(f"user{i % 5}", "Explain calculus limits", "Web_Search", 1.0)
+
+        assert backend.save_calls == []
+        assert manager.flush() == 5
+        assert len(backend.save_calls) == 1
+        assert backend.rows["user0"]["interactions_count"] == 10
+
+    def test_flush_with_nothing_dirty_is_noop(self):
+        """Clean profiles are not rewritten."""
+        backend = RecordingBackend()
+        manager = make_manager(backend)
+        manager.update_from_interaction("alice", "python question", "Web_Search", 1.0)
+        manager.flush()
+
+        assert manager.flush() == 0
+        assert len(backend.save_calls) == 1
+
+    def test_failed_flush_is_retried(self):
+        """Profiles stay dirty when the backend write fails."""
+        backend = RecordingBackend()
+        manager = make_manager(backend)
+        manager.update_from_interaction("alice", "physics question", "Web_Search", 1.0)
+
+        backend.fail_saves = True
+        assert manager.flush() == 0
+
+        backend.fail_saves = False
+        assert manager.flush() == 1
+        assert "alice" in backend.rows
+
+    def test_evicted_dirty_profiles_are_flushed(self):
+        """LRU eviction never drops unsaved changes."""
+        backend = RecordingBackend()
+        manager = make_manager(backend, max_profiles=2)
+
+        for user_id in ("a", "b", "c", "d"):
+            manager.update_from_interaction(user_id, "biology question", "Web_Search", 1.0)
+
+        assert manager.store.get_stats()["cached_profiles"] == 2
+        assert manager.flush() == 4
+        assert set(backend.rows) == {"a", "b", "c", "d"}
+
+    def test_close_flushes_pending(self):
+        """close() writes everything still dirty."""
+        backend = RecordingBackend()
+        manager = make_manager(backend, flush_interval=0.01)
+        manager.update_from_interaction("alice", "history question", "Web_Search", 1.0)
+
+        manager.close()
+
+        assert backend.rows["alice"]["interactions_count"] == 1
+
+
+class TestBulkReads:
+    """Test LRU hits and bulk loading."""
+
+    def test_get_profiles_single_round_trip(self):
+        """Cache misses are loaded with one backend call."""
+        rows = {uid: UserProfile(user_id=uid, role="student").to_dict() for uid in ("a", "b", "c")}
+        backend = RecordingBackend(rows)
+        manager = make_manager(backend)
+        manager.get_profiles(["a"])
+
+        profiles = manager.get_profiles(["a", "b", "c", "missing"])
+
+        assert set(profiles) == {"a", "b", "c"}
+        assert backend.load_calls == [["a"], ["b", "c", "missing"]]
+
+    def test_get_profiles_does_not_create(self):
+        """Unknown users are not created by analytics reads."""
+        manager = make_manager(RecordingBackend())
+
+        assert manager.get_profiles(["ghost"]) == {}
+        assert manager.get_profile("ghost") is None
+
+    def test_profile_analytics_view(self):
+        """Analytics view summarizes feedback into a rating."""
+        manager = make_manager(RecordingBackend())
+        manager.update_from_interaction("alice", "q", "Web_Search", 1.0, feedback="positive")
+        manager.update_from_interaction("alice", "q", "Web_Search", 1.0, feedback="negative")
+
+        view = manager.get_profile("alice")
+
+        assert view["query_count"] == 2
+        assert view["successful_queries"] == 1
+        assert view["avg_rating"] == pytest.approx(3.0)
+
+
+class TestFileBackend:
+    """Test the file backend through the store."""
+
+    def test_round_trip(self, tmp_path):
+        """Flushed profiles are reloaded by a new manager."""
+        manager = make_manager(FileProfileBackend(str(tmp_path)))
+        manager.update_from_interaction("alice", "machine learning basics", "Document_QA", 1.0)
+        manager.close()
+
+        reloaded = make_manager(FileProfileBackend(str(tmp_path)))
+        profile = reloaded.get_profiles(["alice"])["alice"]
+
+        assert profile.interactions_count == 1
+        assert profile.typical_subject_areas == ["machine learning"]
+
+    def test_global_manager_keeps_file_profiles_by_default(self, tmp_path, monkeypatch):
+        """An available database does not switch the backend (file profiles would be orphaned)."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("USER_PROFILE_BACKEND", raising=False)
+        monkeypatch.setattr(profile_store, "DATABASE_AVAILABLE", True)
+        monkeypatch.setattr(user_profile, "DATABASE_AVAILABLE", True, raising=False)
+        monkeypatch.setattr(user_profile, "DatabaseProfileBackend", RecordingBackend)
+        monkeypatch.setattr(user_profile, "_profile_manager", None)
+
+        manager = user_profile.get_profile_manager()
+        try:
+            assert manager.storage_backend == "file"
+            assert isinstance(manager.store.backend, FileProfileBackend)
+        finally:
+            user_profile.close_profile_manager()
+
+
+class TestTopicExtraction:
+    """Test single-pass topic extraction."""
+
+    def test_extracts_topics(self):
+        """Known topics are found once each."""
+        manager = make_manager(RecordingBackend())
+
+        topics = manager._extract_topics("Deep learning vs machine learning in Python, more python")
+
+        assert sorted(topics) == ["deep learning", "machine learning", "python"]
+
+    def test_prefers_longest_topic(self):
+        """'javascript' is not double-counted as 'java'."""
+        manager = make_manager(RecordingBackend())
+
+        assert manager._extract_topics("JavaScript closures") == ["javascript"]
@@ -0,0 +1,305 @@
+"""
+Tests and benchmarks for query learner persistence.
+
+Covers the append-only record log (replay, compaction, torn writes,
+legacy migration) and benchmarks the three costs it was built to cut:
+startup load time, memory per 10k records and write latency.
+
+Run benchmarks with output: python -m pytest tests/test_query_learner_storage.py -v -s
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+import pytest
+
+from utils.ml.query_learner import QueryLearner, QueryRecord
+from utils.ml.record_log import RecordLog
+
+
+TOOLS = ["Web_Search", "Document_QA", "Python_REPL", "Manim_Animation"]
+FEEDBACK = [None, "positive", "neutral", "negative"]
+
+
+def make_learner(storage_dir, **kwargs) -> QueryLearner:
+    """Learner with a long flush interval so tests control flushing."""
+    kwargs.setdefault("flush_interval", 60.0)
+    return QueryLearner(storage_dir=str(storage_dir), **kwargs)
+
+
+def fill(learner: QueryLearner, count: int):
+    """Record ``count`` synthetic queries."""
+    for i in range(count):
+        learner.learn_from_query(
+            query=f"What is topic number {i} in machine learning?",
+            tool_used=TOOLS[i % len(TOOLS)],
+            success=i % 5 != 0,
+            response_time=0.5 + (i % 7) * 0.1,
+            user_feedback=FEEDBACK[i % len(FEEDBACK)]
+        )
+
+
+class TestQueryRecord:
+    """Test the slotted record representation."""
+
+    def test_has_no_instance_dict(self):
+        """Records use __slots__ rather than a per-instance __dict__."""
+        record = QueryRecord("q", "h", "Web_Search", True, 1.0, None, "2025-01-01T10:00:00")
+
+        assert not hasattr(record, "__dict__")
+
+    def test_dict_round_trip(self):
+        """to_dict/from_dict keep the original field names and values."""
+        record = QueryRecord("q", "h", "Web_Search", True, 1.5, "positive",
+                             "2025-01-01T10:00:00", query_type="web")
+
+        data = record.to_dict()
+
+        assert data["timestamp"] == "2025-01-01T10:00:00"
+        assert QueryRecord.from_dict(data) == record
+
+    def test_row_round_trip(self):
+        """Compact rows restore an equal record."""
+        record = QueryRecord("q", "h", "Document_QA", False, 0.25, None, time.time(), "document")
+
+        assert QueryRecord.from_row(json.loads(json.dumps(record.to_row()))) == record
+
+
+class TestRecordLogPersistence:
+    """Test replay, compaction and recovery of the record log."""
+
+    def test_reload_replays_log(self, tmp_path):
+        """Records written to the log are restored by a new learner."""
+        learner = make_learner(tmp_path)
+        fill(learner, 250)
+        learner.learn_fallback("Document_QA", "Web_Search", True)
+        learner.flush()
+
+        reloaded = make_learner(tmp_path)
+
+        assert len(reloaded.query_history) == 250
+        assert reloaded.fallback_success[("Document_QA", "Web_Search")] == 1
+        assert reloaded.get_tool_performance_stats() == learner.get_tool_performance_stats()
+
+    def test_learn_does_not_write_synchronously(self, tmp_path):
+        """learn_from_query only enqueues; the flusher writes."""
+        learner = make_learner(tmp_path)
+        fill(learner, 100)
+
+        assert learner._log.pending() == 100
+        assert not os.path.exists(learner._log.log_path)
+
+        learner.flush()
+        assert learner._log.pending() == 0
+
+    def test_compaction_truncates_log(self, tmp_path):
+        """Crossing compact_every writes a snapshot and empties the log."""
+        learner = make_learner(tmp_path, compact_every=100)
+        fill(learner, 150)
+        learner.flush()
+
+        assert os.path.exists(learner._log.snapshot_path)
+        assert os.path.getsize(learner._log.log_path) == 0
+
+        fill(learner, 10)
+        learner.flush()
+
+        reloaded = make_learner(tmp_path)
+        assert len(reloaded.query_history) == 160
+        assert reloaded.get_tool_performance_stats() == learner.get_tool_performance_stats()
+
+    def test_records_in_snapshot_not_replayed_twice(self, tmp_path):
+        """Log entries already covered by the snapshot are skipped."""
+        learner = make_learner(tmp_path)
+        fill(learner, 50)
+        learner.flush()
+
+        # Simulate a crash between writing the snapshot and truncating the log
+        with open(learner._log.log_path) as f:
+            stale_lines = f.read()
+        learner.flush(compact=True)
+        with open(learner._log.log_path, "w") as f:
+            f.write(stale_lines)
+
+        reloaded = make_learner(tmp_path)
+        perf = reloaded.get_tool_performance_stats()
+
+        assert len(reloaded.query_history) == 50
+        assert sum(stats["total_uses"] for stats in perf.values()) == 50
+
+    def test_torn_tail_is_repaired(self, tmp_path):
+        """A partial last line is dropped and later appends stay readable."""
+        learner = make_learner(tmp_path)
+        fill(learner, 20)
+        learner.flush()
+        with open(learner._log.log_path, "a") as f:
+            f.write('[999,"q",["half a rec')
+
+        reloaded = make_learner(tmp_path)
+        fill(reloaded, 5)
+        reloaded.flush()
+
+        assert len(make_learner(tmp_path).query_history) == 25
+
+    def test_close_leaves_nothing_to_replay(self, tmp_path):
+        """close() stops the flusher and snapshots everything."""
+        learner = make_learner(tmp_path, flush_interval=0.01)
+        fill(learner, 30)
+        learner.close()
+
+        assert learner._log.get_stats()["log_bytes"] == 0
+        assert len(make_learner(tmp_path).query_history) == 30
+
+    def test_history_bound_evicts_index(self, tmp_path):
+        """The query index does not outgrow the bounded history."""
+        learner = make_learner(tmp_path, max_history=50)
+        fill(learner, 200)
+
+        assert len(learner.query_history) == 50
+        assert len(learner.query_index) == 50
+
+    def test_migrates_legacy_json(self, tmp_path):
+        """The old pretty-printed JSON file is loaded and converted."""
+        legacy = {
+            "query_history": [
+                QueryRecord("old query", "h1", "Web_Search", True, 1.0, None,
+                            "2025-01-01T10:00:00", "web").to_dict()
+            ],
+            "tool_performance": {"web": {"Web_Search": {
+                "success_count": 1, "failure_count": 0, "total_time": 1.0, "use_count": 1
+            }}},
+            "fallback_success": {"Document_QA,Web_Search": 3},
+            "fallback_failure": {},
+        }
+        with open(tmp_path / "query_patterns.json", "w") as f:
+            json.dump(legacy, f, indent=2)
+
+        learner = make_learner(tmp_path)
+        learner.flush()
+
+        assert len(learner.query_history) == 1
+        assert os.path.exists(learner._log.snapshot_path)
+        assert make_learner(tmp_path).fallback_success[("Document_QA", "Web_Search")] == 3
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+@dataclass
+class LegacyQueryRecord:
+    """The previous dataclass record, kept here as the benchmark baseline."""
+    query: str
+    query_hash: str
+    tool_used: str
+    success: bool
+    response_time: float
+    user_feedback: Optional[str]
+    timestamp: str
+    query_type: Optional[str] = None
+    embedding: Optional[List[float]] = None
+
+
+def _records_memory(factory, count: int) -> int:
+    """Bytes allocated to build ``count`` records (excluding query text)."""
+    queries = [f"What is topic number {i} in machine learning?" for i in range(count)]
+    hashes = [f"{i:032x}" for i in range(count)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = [factory(i, queries[i], hashes[i]) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del records
+    return size
+
+
+class TestStorageBenchmarks:
+    """Startup load time, memory per 10k records and write latency."""
+
+    RECORDS = 10000
+
+    def test_benchmark_memory_per_10k_records(self):
+        """Slotted records use less memory than the dataclass baseline."""
+        def legacy(i, query, query_hash):
+            return LegacyQueryRecord(query, query_hash, TOOLS[i % 4], True, 0.5,
+                                     FEEDBACK[i % 4], f"2025-01-01T10:{i % 60:02d}:00.{i:06d}", "web")
+
+        def slotted(i, query, query_hash):
+            return QueryRecord(query, query_hash, TOOLS[i % 4], True, 0.5,
+                               FEEDBACK[i % 4], 1735725600.0 + i, "web")
+
+        legacy_bytes = _records_memory(legacy, self.RECORDS)
+        slotted_bytes = _records_memory(slotted, self.RECORDS)
+
+        print(f"\n📊 Memory per 10k records: dataclass {legacy_bytes / 1024:.0f} KiB, "
+              f"slotted {slotted_bytes / 1024:.0f} KiB")
+        assert slotted_bytes < legacy_bytes
+
+    def test_benchmark_startup_load(self, tmp_path):
+        """Loading a compact snapshot beats parsing the legacy JSON file."""
+        legacy_dir = tmp_path / "legacy"
+        legacy_dir.mkdir()
+        learner = make_learner(tmp_path / "log")
+        fill(learner, self.RECORDS)
+        learner.flush(compact=True)
+
+        legacy_data = {
+            "query_history": [asdict(LegacyQueryRecord(**r.to_dict())) for r in learner.query_history],
+            "tool_performance": learner._snapshot_state()[1]["tool_performance"],
+            "fallback_success": {},
+            "fallback_failure": {},
+        }
+        with open(legacy_dir / "query_patterns.json", "w") as f:
+            json.dump(legacy_data, f, indent=2)
+
+        start = time.perf_counter()
+        with open(legacy_dir / "query_patterns.json") as f:
+            data = json.load(f)
+        legacy_records = [LegacyQueryRecord(**r) for r in data["query_history"]]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reloaded = make_learner(tmp_path / "log")
+        new_time = time.perf_counter() - start
+
+        print(f"\n⏱️  Startup load of 10k records: legacy JSON {legacy_time * 1000:.1f}ms, "
+              f"snapshot {new_time * 1000:.1f}ms")
+        assert len(reloaded.query_history) == len(legacy_records) == self.RECORDS
+
+    def test_benchmark_write_latency(self, tmp_path):
+        """learn_from_query stays sub-millisecond; the old save rewrote everything."""
+        learner = make_learner(tmp_path)
+        fill(learner, self.RECORDS)
+        learner.flush(compact=True)
+
+        latencies = []
+        for i in range(1000):
+            start = time.perf_counter()
+            learner.learn_from_query(f"query {i}", "Web_Search", True, 0.5)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        # Cost of the previous synchronous save (paid every 100 queries)
+        start = time.perf_counter()
+        with open(tmp_path / "legacy.json", "w") as f:
+            json.dump({"query_history": [r.to_dict() for r in learner.query_history]}, f, indent=2)
+        legacy_save = time.perf_counter() - start
+
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"\n⏱️  learn_from_query: p50 {p50:.3f}ms, p99 {p99:.3f}ms "
+              f"(legacy full save: {legacy_save * 1000:.1f}ms)")
+        assert p50 < 1.0
+
+
+if __name__ == "__main__":
+    """Run benchmarks directly."""
+    import sys
+    sys.exit(pytest.main([__file__, "-v", "-s", "-k", "benchmark"]))
@@ -0,0 +1,195 @@
+"""
+Tests for typed document retrieval results.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils.rag.retrieval import (
+    RetrievedChunk,
+    RetrievalResult,
+    classify_retrieval_text,
+    pack_retrieval_result,
+    run_document_retrieval,
+    STATUS_OK,
+    STATUS_NO_DOCUMENTS,
+    STATUS_NO_RESULTS,
+    STATUS_UNAVAILABLE,
+    STATUS_ERROR,
+    STRATEGY_TEXT,
+)
+
+
+def make_row(id, content, distance=0.2, **fields):
+    """Row shaped like the semantic search SELECT."""
+    row = dict(
+        id=id, document_name="Deep Learning.pdf", content=content, distance=distance,
+        document_id="doc-1", chunk_index=id, chapter_number=None, chapter_title=None,
+        section_number=None, page_start=None, page_end=None,
+    )
+    row.update(fields)
+    return SimpleNamespace(**row)
+
+
+def make_result(count=3):
+    chunks = [
+        RetrievedChunk.from_row(make_row(i, f"Passage {i} about gradient descent. [Page {i + 1}]"), score=1.0 - i * 0.1)
+        for i in range(count)
+    ]
+    return RetrievalResult(query="gradient descent", chunks=chunks)
+
+
+class TestRetrievedChunk:
+    """Test chunk records."""
+
+    def test_from_row(self):
+        """Score defaults to 1 - distance and ids are strings."""
+        chunk = RetrievedChunk.from_row(make_row(7, "text", distance=0.25, chapter_number=3, page_start=12))
+
+        assert chunk.id == "7"
+        assert chunk.score == pytest.approx(0.75)
+        assert chunk.chapter_number == 3
+        assert chunk.page == 12
+
+    def test_page_from_marker(self):
+        """Without indexed pages, the first [Page N] marker is used."""
+        chunk = RetrievedChunk(id="1", document_name="a.pdf", content="Some text [Page 4] more")
+
+        assert chunk.page == 4
+        assert chunk.prompt_text == "Some text  more [Page 4]"
+
+    @pytest.mark.parametrize("fields,expected", [
+        ({"chapter_number": 12, "page_start": 7, "page_end": 7}, "Deep Learning.pdf, Chapter 12, p. 7"),
+        ({"section_number": "4.2", "page_start": 7, "page_end": 9}, "Deep Learning.pdf, Section 4.2, pp. 7-9"),
+        ({}, "Deep Learning.pdf"),
+    ])
+    def test_citation(self, fields, expected):
+        assert RetrievedChunk.from_row(make_row(1, "text", **fields)).citation() == expected
+
+    def test_token_count_cached(self):
+        chunk = RetrievedChunk(id="1", document_name="a.pdf", content="one two three")
+
+        assert chunk.tokens > 0
+        assert chunk._tokens == chunk.tokens
+
+
+class TestRetrievalResult:
+    """Test result status, rendering and selection."""
+
+    def test_failure_is_not_ok(self):
+        result = RetrievalResult.failure("q", STATUS_NO_DOCUMENTS, "📚 No documents found")
+
+        assert not result.ok
+        assert result.to_prompt_text() == "📚 No documents found"
+
+    def test_prompt_text_format(self):
+        """Rendering keeps the Document_QA output format."""
+        text = make_result(2).to_prompt_text()
+
+        assert text.startswith("Retrieved information from your documents:\n\nFrom: Deep Learning.pdf\n")
+        assert "Passage 0 about gradient descent. [Page 1]" in text
+        assert text.count("─" * 80) == 2
+
+    def test_unit_label(self):
+        result = make_result(1)
+        result.unit_label = "Chapter 3: Optics"
+
+        assert "From: Deep Learning.pdf (Chapter 3: Optics)" in result.to_prompt_text()
+
+    def test_top_chunks_respects_budget(self):
+        """The highest-scoring chunks are kept, in result order."""
+        result = make_result(5)
+        budget = result.chunks[0].tokens * 2
+
+        top = result.top_chunks(budget)
+
+        assert [chunk.id for chunk in top] == ["0", "1"]
+
+    def test_top_chunks_keeps_one_oversized_chunk(self):
+        assert len(make_result(3).top_chunks(1)) == 1
+
+    def test_round_trip(self):
+        result = make_result(2)
+        result.unit_label = "Chapter 1"
+
+        restored = RetrievalResult.from_dict(result.to_dict())
+
+        assert restored == result
+        assert restored.chunk_ids == ["0", "1"]
+
+    def test_citations_unique(self):
+        result = make_result(2)
+        result.chunks.append(result.chunks[0])
+
+        assert len(result.citations()) == 2
+
+
+class TestLegacyText:
+    """Test parsing of formatted Document_QA strings."""
+
+    @pytest.mark.parametrize("text,status", [
+        ("📚 No documents found in the vector store. Please upload documents first.", STATUS_NO_DOCUMENTS),
+        ("📚 No relevant documents found for query: 'x'", STATUS_NO_RESULTS),
+        ("❌ Vector store not available. Database not configured.", STATUS_UNAVAILABLE),
+        ("❌ Error retrieving from vector store: boom", STATUS_ERROR),
+        ("", STATUS_NO_RESULTS),
+    ])
+    def test_classify(self, text, status):
+        assert classify_retrieval_text(text) == status
+
+    def test_document_text_is_ok(self):
+        """Passages that mention 'not found' do not fail the retrieval."""
+        result = make_result(1)
+        result.chunks[0].content = "The file was not found by the parser."
+
+        assert classify_retrieval_text(result.to_prompt_text()) == STATUS_OK
+
+    def test_from_text(self):
+        """Formatted output parses back into one chunk per passage."""
+        original = make_result(3)
+
+        parsed = RetrievalResult.from_text("gradient descent", original.to_prompt_text())
+
+        assert parsed.ok
+        assert parsed.strategy == STRATEGY_TEXT
+        assert [chunk.page for chunk in parsed.chunks] == [1, 2, 3]
+        assert parsed.chunks[0].document_name == "Deep Learning.pdf"
+
+
+class TestConsumers:
+    """Test packing and tool dispatch."""
+
+    def test_pack_deduplicates(self):
+        result = make_result(2)
+        result.chunks.append(RetrievedChunk.from_row(make_row(9, result.chunks[0].content), score=0.1))
+
+        packed = pack_retrieval_result(result)
+
+        assert len(packed.items) == 2
+        assert packed.items[0].metadata["chunk_id"] == "0"
+        assert packed.items[0].metadata["citation"] == "Deep Learning.pdf, p. 1"
+
+    def test_structured_retriever_preferred(self):
+        """Tools with a structured retriever skip text formatting."""
+        expected = make_result(1)
+        calls = []
+
+        def retriever(query, **kwargs):
+            calls.append((query, kwargs))
+            return expected
+
+        def func(query, **kwargs):
+            raise AssertionError("formatted path should not run")
+
+        tool = SimpleNamespace(metadata={"structured_retriever": retriever}, func=func)
+
+        assert run_document_retrieval(tool, "q", limit=5) is expected
+        assert calls == [("q", {"limit": 5})]
+
+    def test_plain_tool_parsed(self):
+        tool = SimpleNamespace(metadata=None, func=lambda query, **kwargs: make_result(2).to_prompt_text())
+
+        result = run_document_retrieval(tool, "q", limit=5)
+
+        assert result.ok and len(result.chunks) == 2
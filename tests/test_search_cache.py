@@ -0,0 +1,202 @@
+"""
+Tests for the freshness-aware web search result cache.
+"""
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from utils.cache.search_cache import TTLLRUCache, SearchResultCache
+from utils.rag.query_enrichment import (
+    classify_query_freshness,
+    normalize_search_query,
+    search_cache_ttl,
+)
+from utils.core.constants import (
+    SEARCH_CACHE_TTL_REALTIME,
+    SEARCH_CACHE_TTL_RECENT,
+    SEARCH_CACHE_TTL_EVERGREEN,
+)
+from tools.study.search_client import FakeSearchProvider, HedgedSearchClient
+
+
+_prefixes = itertools.count()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeAsyncRedis:
+    """Minimal async Redis (mget/ttl/setex) backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.mget_calls = 0
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        now = time.time()
+        values = []
+        for key in keys:
+            entry = self.data.get(key)
+            values.append(entry[1] if entry and entry[0] > now else None)
+        return values
+
+    async def ttl(self, key):
+        entry = self.data.get(key)
+        return int(entry[0] - time.time()) if entry else -2
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = (time.time() + ttl, value)
+
+    async def close(self):
+        pass
+
+
+class TestTTLLRUCache:
+    """Test the O(1) LRU with per-entry TTL."""
+
+    def test_evicts_least_recently_used(self):
+        """Reading an entry protects it from eviction."""
+        cache = TTLLRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.evictions == 1
+
+    def test_per_entry_expiry(self):
+        """Entries expire on their own TTL."""
+        cache = TTLLRUCache(max_size=10, default_ttl=60)
+        cache.set("short", "x", ttl=0.01)
+        cache.set("long", "y")
+        time.sleep(0.02)
+
+        assert cache.get("short") is None
+        assert cache.get("long") == "y"
+        assert cache.expirations == 1
+
+    def test_large_cache_stays_fast(self):
+        """Inserts at capacity do not scan the whole cache."""
+        cache = TTLLRUCache(max_size=10_000)
+        start = time.perf_counter()
+        for i in range(50_000):
+            cache.set(f"k{i}", i)
+        elapsed = time.perf_counter() - start
+
+        assert len(cache) == 10_000
+        assert elapsed < 1.0
+
+
+class TestFreshness:
+    """Test query freshness classification and TTLs."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("what time is it in Tokyo", "realtime"),
+        ("latest AI news", "recent"),
+        ("election results 2024", "recent"),
+        ("what is photosynthesis", "evergreen"),
+        ("explain the pythagorean theorem", "evergreen"),
+        ("best python web frameworks", "default"),
+    ])
+    def test_classification(self, query, expected):
+        assert classify_query_freshness(query) == expected
+
+    def test_ttls_ordered_by_freshness(self):
+        """Real-time answers expire much sooner than encyclopedic ones."""
+        assert search_cache_ttl("current weather in Paris") == SEARCH_CACHE_TTL_REALTIME
+        assert search_cache_ttl("tech news this week") == SEARCH_CACHE_TTL_RECENT
+        assert search_cache_ttl("history of the roman empire") == SEARCH_CACHE_TTL_EVERGREEN
+
+    def test_normalization(self):
+        """Case, punctuation and spacing do not change the key."""
+        assert normalize_search_query("  What is RAG?? ") == normalize_search_query("what is  rag")
+        assert normalize_search_query("C++ vs C#") == "c++ vs c#"
+
+
+class TestSearchResultCache:
+    """Test the two-tier result cache."""
+
+    RESULTS = [{"title": "t", "link": "https://example.com", "snippet": "s"}]
+
+    def test_local_hit_after_set(self):
+        """Equivalent queries hit the same entry."""
+        cache = SearchResultCache()
+
+        async def scenario():
+            await cache.set("What is RAG?", "google", self.RESULTS)
+            return await cache.get("what is rag", ["google", "tavily"])
+
+        assert run(scenario()) == ("google", self.RESULTS)
+        assert cache.local_hits == 1
+
+    def test_provider_priority(self):
+        """The highest-priority provider with cached results wins."""
+        cache = SearchResultCache()
+
+        async def scenario():
+            await cache.set("q", "tavily", [{"title": "tavily"}])
+            await cache.set("q", "google", [{"title": "google"}])
+            return await cache.get("q", ["google", "tavily"])
+
+        assert run(scenario())[0] == "google"
+
+    def test_redis_tier_shared_between_instances(self):
+        """A second instance is served from Redis and promotes to L1."""
+        redis = FakeAsyncRedis()
+        writer = SearchResultCache(redis_client=redis)
+        reader = SearchResultCache(redis_client=redis)
+
+        async def scenario():
+            await writer.set("what is entropy", "google", self.RESULTS)
+            first = await reader.get("what is entropy", ["google"])
+            second = await reader.get("what is entropy", ["google"])
+            return first, second
+
+        first, second = run(scenario())
+
+        assert first == second == ("google", self.RESULTS)
+        assert reader.redis_hits == 1
+        assert reader.local_hits == 1
+        assert redis.mget_calls == 1
+
+    def test_empty_results_not_cached(self):
+        """Empty answers are never cached."""
+        cache = SearchResultCache()
+
+        async def scenario():
+            await cache.set("q", "google", [])
+            return await cache.get("q", ["google"])
+
+        assert run(scenario()) is None
+
+
+class TestClientIntegration:
+    """Test the cache in front of the hedged client."""
+
+    def test_cache_hit_skips_providers(self):
+        """A repeated query makes no provider call."""
+        provider = FakeSearchProvider("primary", latency=0.01)
+        client = HedgedSearchClient(
+            [provider], cache=SearchResultCache(),
+            breaker_prefix=f"test_search_cache_{next(_prefixes)}"
+        )
+
+        async def scenario():
+            first = await client.search("what is entropy")
+            second = await client.search("What is entropy?")
+            return first, second
+
+        first, second = run(scenario())
+
+        assert not first.cached
+        assert second.cached
+        assert second.results == first.results
+        assert provider.calls == 1
+        assert client.get_stats()["cache_hits"] == 1
@@ -0,0 +1,236 @@
+"""
+Tests and tail-latency benchmark for the hedged web search client.
+
+Uses FakeSearchProvider, so no network access or API keys are needed.
+
+Run benchmark with output: python -m pytest tests/test_search_client.py -v -s -k benchmark
+"""
+
+import asyncio
+import dataclasses
+import itertools
+
+import pytest
+
+from tools.study.search_client import (
+    FakeSearchProvider,
+    HedgedSearchClient,
+    SEARCH_BREAKER_CONFIG,
+    SearchClientRunner,
+)
+from utils.errors.circuit_breaker import CircuitBreakerConfig
+
+
+_prefixes = itertools.count()
+
+
+def make_client(providers, **kwargs) -> HedgedSearchClient:
+    """Client with breakers isolated from other tests."""
+    kwargs.setdefault("breaker_prefix", f"test_search_{next(_prefixes)}")
+    return HedgedSearchClient(providers, **kwargs)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestHedging:
+    """Test hedged requests and failover."""
+
+    def test_fast_primary_wins_without_hedge(self):
+        """A primary answering before the hedge delay is used alone."""
+        primary = FakeSearchProvider("primary", latency=0.01)
+        backup = FakeSearchProvider("backup", latency=0.01)
+        client = make_client([primary, backup], hedge_delay=0.2)
+
+        response = run(client.search("what is entropy"))
+
+        assert response.provider == "primary"
+        assert not response.hedged
+        assert backup.calls == 0
+
+    def test_slow_primary_is_hedged(self):
+        """The backup fires after the hedge delay and its answer wins."""
+        primary = FakeSearchProvider("primary", latency=1.0)
+        backup = FakeSearchProvider("backup", latency=0.01)
+        client = make_client([primary, backup], hedge_delay=0.05)
+
+        response = run(client.search("what is entropy"))
+
+        assert response.provider == "backup"
+        assert response.hedged
+        assert response.latency_ms < 500
+        assert primary.cancelled == 1
+
+    def test_failing_primary_fails_over_immediately(self):
+        """An erroring primary does not wait for the hedge delay."""
+        primary = FakeSearchProvider("primary", latency=0.0, failure_rate=1.0)
+        backup = FakeSearchProvider("backup", latency=0.01)
+        client = make_client([primary, backup], hedge_delay=5.0)
+
+        response = run(client.search("what is entropy"))
+
+        assert response.provider == "backup"
+        assert response.latency_ms < 1000
+        assert "primary" in response.errors
+
+    def test_empty_results_fail_over(self):
+        """Empty result sets are not accepted as answers."""
+        primary = FakeSearchProvider("primary", latency=0.0, empty_rate=1.0)
+        backup = FakeSearchProvider("backup", latency=0.0)
+        client = make_client([primary, backup])
+
+        assert run(client.search("q")).provider == "backup"
+
+    def test_all_providers_fail(self):
+        """A total failure returns an empty response with errors."""
+        client = make_client([
+            FakeSearchProvider("a", latency=0.0, failure_rate=1.0),
+            FakeSearchProvider("b", latency=0.0, failure_rate=1.0),
+        ])
+
+        response = run(client.search("q"))
+
+        assert not response.ok
+        assert set(response.errors) == {"a", "b"}
+        assert client.failures == 1
+
+    def test_overall_timeout(self):
+        """Searches give up at the deadline."""
+        client = make_client([FakeSearchProvider("slow", latency=5.0)], timeout=0.05)
+
+        response = run(client.search("q"))
+
+        assert not response.ok
+        assert "timeout" in response.errors
+
+
+class TestCircuitBreakers:
+    """Test per-provider circuit breaking."""
+
+    def test_open_breaker_skips_provider(self):
+        """After repeated failures the primary is no longer called."""
+        primary = FakeSearchProvider("primary", latency=0.0, failure_rate=1.0)
+        backup = FakeSearchProvider("backup", latency=0.0)
+        client = make_client(
+            [primary, backup],
+            breaker_config=CircuitBreakerConfig(failure_threshold=3, timeout=60)
+        )
+
+        async def many():
+            for _ in range(10):
+                await client.search("q")
+
+        run(many())
+
+        assert primary.calls == 3
+        assert client.get_stats()["breakers"]["primary"] == "open"
+        assert client.wins["backup"] == 10
+
+    def test_tripped_breaker_closes_after_recovery(self):
+        """A recovered provider gets enough half-open probes to close its breaker."""
+        primary = FakeSearchProvider("primary", latency=0.0, failure_rate=1.0)
+        backup = FakeSearchProvider("backup", latency=0.0)
+        client = make_client(
+            [primary, backup],
+            breaker_config=dataclasses.replace(SEARCH_BREAKER_CONFIG, timeout=0)
+        )
+
+        async def searches(count):
+            for _ in range(count):
+                await client.search("q")
+
+        run(searches(SEARCH_BREAKER_CONFIG.failure_threshold))
+        assert client.breakers["primary"].get_state() == "open"
+
+        primary.failure_rate = 0.0
+        run(searches(SEARCH_BREAKER_CONFIG.success_threshold))
+
+        assert client.breakers["primary"].get_state() == "closed"
+        assert client.wins["primary"] == SEARCH_BREAKER_CONFIG.success_threshold
+
+    def test_cancelled_hedge_loser_releases_half_open_probe(self):
+        """A half-open probe that loses a hedge does not use up the probe budget."""
+        primary = FakeSearchProvider("primary", latency=0.0, failure_rate=1.0)
+        backup = FakeSearchProvider("backup", latency=0.0)
+        client = make_client(
+            [primary, backup],
+            hedge_delay=0.02,
+            breaker_config=dataclasses.replace(SEARCH_BREAKER_CONFIG, timeout=0)
+        )
+        breaker = client.breakers["primary"]
+
+        async def searches(count):
+            for _ in range(count):
+                await client.search("q")
+
+        run(searches(SEARCH_BREAKER_CONFIG.failure_threshold))
+
+        # Slow probes lose to the backup and are cancelled
+        primary.failure_rate, primary.latency = 0.0, 1.0
+        response = run(client.search("q"))
+        assert response.provider == "backup" and primary.cancelled == 1
+        assert breaker.get_state() == "half_open"
+        assert breaker.half_open_calls == 0
+
+        primary.latency = 0.0
+        run(searches(SEARCH_BREAKER_CONFIG.success_threshold))
+
+        assert breaker.get_state() == "closed"
+
+    def test_config_rejects_fewer_probes_than_successes_needed(self):
+        with pytest.raises(ValueError):
+            CircuitBreakerConfig(success_threshold=2, half_open_max_calls=1)
+
+
+class TestRunner:
+    """Test the dedicated event loop runner."""
+
+    def test_sync_and_async_callers_share_client(self):
+        """Blocking and awaitable searches run on the same loop."""
+        runner = SearchClientRunner(make_client([FakeSearchProvider("p", latency=0.0)]))
+        try:
+            assert runner.search("sync").ok
+
+            async def from_other_loop():
+                return await runner.asearch("async")
+
+            assert run(from_other_loop()).ok
+            assert runner.client.searches == 2
+        finally:
+            runner.close()
+
+
+class TestTailLatencyBenchmark:
+    """Benchmark p99 latency with and without hedging."""
+
+    QUERIES = 200
+
+    def _run_load(self, hedge_delay):
+        # Primary: 20ms typically, but 10% of calls stall for 500ms
+        primary = FakeSearchProvider("primary", latency=0.02, jitter=0.005,
+                                     slow_rate=0.10, slow_latency=0.5, seed=7)
+        backup = FakeSearchProvider("backup", latency=0.04, jitter=0.01, seed=11)
+        client = make_client([primary, backup], hedge_delay=hedge_delay)
+
+        async def load():
+            await asyncio.gather(*(client.search(f"query {i}") for i in range(self.QUERIES)))
+
+        run(load())
+        return client
+
+    def test_benchmark_hedging_cuts_tail_latency(self):
+        """Hedging bounds p99 near hedge_delay + backup latency."""
+        sequential = self._run_load(hedge_delay=None)
+        hedged = self._run_load(hedge_delay=0.06)
+
+        seq_pct = sequential.latency_percentiles()
+        hedged_pct = hedged.latency_percentiles()
+        print(f"\n⏱️  Sequential failover: p50 {seq_pct['p50']:.0f}ms, "
+              f"p95 {seq_pct['p95']:.0f}ms, p99 {seq_pct['p99']:.0f}ms")
+        print(f"⏱️  Hedged (60ms):       p50 {hedged_pct['p50']:.0f}ms, "
+              f"p95 {hedged_pct['p95']:.0f}ms, p99 {hedged_pct['p99']:.0f}ms "
+              f"({hedged.hedges_fired} hedges fired)")
+
+        assert hedged_pct["p99"] < seq_pct["p99"] / 2
+        assert hedged.hedges_fired < self.QUERIES * 0.25
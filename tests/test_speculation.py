@@ -0,0 +1,136 @@
+"""
+Tests for speculative tool calls started while a request is being routed.
+"""
+
+import asyncio
+import time
+
+from utils.patterns.speculation import Speculation, SpeculationStats, take_or_run
+
+ROUTING = 0.1
+LOOKUP = 0.1
+
+
+class Lookup:
+    """Read-only lookup with a fixed latency; counts calls."""
+
+    def __init__(self, latency=LOOKUP, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+        self.cancelled = 0
+
+    async def __call__(self, query):
+        self.calls.append(query)
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ConnectionError("search API down")
+        return f"results for {query}"
+
+
+def request(lookup, speculate_on, needed, stats):
+    """Route (fixed latency), then run the tool needing ``needed``; returns result and latency."""
+
+    async def scenario():
+        started = time.perf_counter()
+        speculation = Speculation(stats)
+        if speculate_on is not None:
+            speculation.start("web_search", speculate_on, lambda: lookup(speculate_on))
+        try:
+            await asyncio.sleep(ROUTING)
+            if needed is None:
+                return None, time.perf_counter() - started
+            result = await take_or_run(speculation, "web_search", needed, lambda: lookup(needed))
+            return result, time.perf_counter() - started
+        finally:
+            speculation.finish()
+
+    return asyncio.run(scenario())
+
+
+class TestSpeculation:
+    """Test reuse, discarding and accounting of speculative calls."""
+
+    def test_confirmed_speculation_is_reused(self):
+        lookup, stats = Lookup(), SpeculationStats()
+
+        result, elapsed = request(lookup, "q", "q", stats)
+
+        assert result == "results for q"
+        assert lookup.calls == ["q"]
+        assert elapsed < ROUTING + LOOKUP * 0.8
+        web = stats.get_stats()["web_search"]
+        assert (web["started"], web["hits"], web["wasted"]) == (1, 1, 0)
+        assert web["saved_seconds"] > 0
+
+    def test_different_inputs_are_discarded_and_run_again(self):
+        lookup, stats = Lookup(), SpeculationStats()
+
+        result, _ = request(lookup, "q", "reformulated q", stats)
+
+        assert result == "results for reformulated q"
+        assert lookup.calls == ["q", "reformulated q"]
+        assert lookup.cancelled == 1
+        assert stats.get_stats()["web_search"]["wasted"] == 1
+
+    def test_unused_speculation_is_cancelled_at_the_end(self):
+        lookup, stats = Lookup(latency=1.0), SpeculationStats()
+
+        _, elapsed = request(lookup, "q", None, stats)
+
+        assert elapsed < 0.5
+        assert lookup.cancelled == 1
+        web = stats.get_stats()["web_search"]
+        assert web["wasted"] == 1 and web["hits"] == 0
+        assert 0 < web["wasted_seconds"] < 0.5
+
+    def test_failed_speculation_falls_back_to_running(self):
+        failing, stats = Lookup(fail=True), SpeculationStats()
+
+        async def scenario():
+            speculation = Speculation(stats)
+            speculation.start("web_search", "q", lambda: failing("q"))
+            await asyncio.sleep(0)
+            return await speculation.take_or_run("web_search", "q", lambda: Lookup(latency=0)("q"))
+
+        assert asyncio.run(scenario()) == "results for q"
+        assert stats.get_stats()["web_search"]["wasted"] == 1
+
+    def test_side_effects_apply_only_to_taken_results(self):
+        stats = SpeculationStats()
+
+        async def scenario(speculate_on, needed):
+            recorded = []
+
+            async def record(result):
+                recorded.append(result)
+
+            speculation = Speculation(stats)
+            speculation.start("document_qa", speculate_on, lambda: Lookup(latency=0)(speculate_on), on_take=record)
+            await asyncio.sleep(0.01)
+            try:
+                if needed is not None:
+                    await speculation.take_or_run("document_qa", needed, lambda: Lookup(latency=0)(needed))
+            finally:
+                speculation.finish()
+            return recorded
+
+        assert asyncio.run(scenario("q", "q")) == ["results for q"]
+        assert asyncio.run(scenario("q", "other")) == []
+        assert asyncio.run(scenario("q", None)) == []
+
+    def test_without_speculation_the_call_runs(self):
+        assert asyncio.run(take_or_run(None, "web_search", "q", lambda: Lookup(latency=0)("q"))) == "results for q"
+
+    def test_time_to_first_token_improves_on_hits(self):
+        _, baseline = request(Lookup(), None, "q", SpeculationStats())
+        _, speculative = request(Lookup(), "q", "q", SpeculationStats())
+
+        print(f"\n📊 routing {ROUTING * 1000:.0f}ms + lookup {LOOKUP * 1000:.0f}ms: "
+              f"{baseline * 1000:.0f}ms → {speculative * 1000:.0f}ms with speculation")
+
+        assert speculative < baseline - LOOKUP * 0.5
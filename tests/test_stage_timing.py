@@ -0,0 +1,294 @@
+"""
+Tests and benchmark for per-request stage timing.
+
+The benchmark measures what wrapping a stage costs on the hot path for
+unsampled requests (the common case) and for profiled ones.
+
+Run benchmark with output: python -m pytest tests/test_stage_timing.py -v -s -k benchmark
+"""
+
+import asyncio
+import sys
+import time
+import types
+from contextlib import nullcontext
+
+import pytest
+
+import utils.monitoring.stage_timing as stage_timing
+from utils.monitoring.streaming_stats import OTHER_SERIES
+from utils.monitoring.stage_timing import (
+    StageTimingMiddleware,
+    StageTimingStats,
+    RequestProfile,
+    current_profile,
+    profile_request,
+    record_stage,
+    stage,
+    timed_stage,
+    STAGE_DB,
+    STAGE_EMBEDDING,
+    STAGE_REQUEST,
+    STAGE_RETRIEVAL,
+    STAGE_ROUTING,
+    STAGE_SSE_FLUSH,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    stats = StageTimingStats()
+    monkeypatch.setattr(stage_timing, "_stage_stats", stats)
+    return stats
+
+
+class FakeTracer:
+    enabled = True
+
+    def __init__(self):
+        self.attributes = {}
+        self.events = []
+
+    def set_span_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, attributes=None):
+        self.events.append((name, attributes))
+
+
+class TestStages:
+    """Test recording stages into the current request's profile."""
+
+    def test_unprofiled_stage_is_a_shared_noop(self):
+        assert current_profile() is None
+        assert stage(STAGE_DB) is stage(STAGE_ROUTING)
+        with stage(STAGE_DB):
+            record_stage(STAGE_DB, 1.0)
+
+    def test_unsampled_request(self, fresh_stats):
+        with profile_request(sample_rate=0) as profile:
+            with stage(STAGE_DB):
+                pass
+
+        assert profile is None
+        assert fresh_stats.profiles == 0
+
+    def test_stages_accumulate(self):
+        with profile_request("GET /x", sample_rate=1) as profile:
+            for _ in range(3):
+                with stage(STAGE_DB):
+                    time.sleep(0.001)
+            record_stage(STAGE_EMBEDDING, 0.25)
+
+        assert profile.counts == {STAGE_DB: 3, STAGE_EMBEDDING: 1}
+        assert profile.totals[STAGE_DB] >= 0.003
+        assert profile.to_dict()[STAGE_EMBEDDING] == {"ms": 250.0, "count": 1}
+        assert current_profile() is None
+
+    def test_nested_same_stage_counts_once(self):
+        with profile_request(sample_rate=1) as profile:
+            with stage(STAGE_DB):
+                with stage(STAGE_DB):
+                    pass
+                with stage(STAGE_EMBEDDING):
+                    pass
+
+        assert profile.counts == {STAGE_DB: 1, STAGE_EMBEDDING: 1}
+
+    def test_tasks_and_threads_share_the_profile(self):
+        def blocking_query():
+            with stage(STAGE_DB):
+                time.sleep(0.002)
+
+        @timed_stage(STAGE_RETRIEVAL)
+        async def retrieve():
+            await asyncio.to_thread(blocking_query)
+
+        async def scenario():
+            with profile_request(sample_rate=1) as profile:
+                await asyncio.gather(retrieve(), retrieve())
+            return profile
+
+        profile = asyncio.run(scenario())
+
+        assert profile.counts == {STAGE_RETRIEVAL: 2, STAGE_DB: 2}
+
+    def test_timed_stage_sync(self):
+        @timed_stage(STAGE_ROUTING)
+        def classify(question):
+            return "STUDY"
+
+        with profile_request(sample_rate=1) as profile:
+            assert classify("what is ATP?") == "STUDY"
+
+        assert classify.__name__ == "classify"
+        assert profile.counts == {STAGE_ROUTING: 1}
+
+    def test_span_cap_keeps_totals(self, monkeypatch):
+        monkeypatch.setattr(stage_timing, "STAGE_TIMING_MAX_SPANS", 5)
+        profile = RequestProfile()
+        for _ in range(20):
+            profile.add(STAGE_SSE_FLUSH, 0.001)
+
+        assert len(profile.spans) == 5 and profile.dropped_spans == 15
+        assert profile.counts[STAGE_SSE_FLUSH] == 20
+
+    def test_server_timing_header(self):
+        profile = RequestProfile()
+        profile.add(STAGE_ROUTING, 0.0123)
+        profile.add(STAGE_DB, 0.002)
+        profile.add(STAGE_DB, 0.003)
+
+        header = profile.server_timing()
+
+        assert header.startswith('routing;dur=12.3, db;dur=5.0;desc="2x", total;dur=')
+
+
+class TestStageTimingStats:
+    """Test per-endpoint histograms and trace export."""
+
+    def test_finished_profiles_are_recorded(self, fresh_stats):
+        for _ in range(4):
+            with profile_request("POST /query", sample_rate=1):
+                record_stage(STAGE_RETRIEVAL, 0.2)
+
+        stats = fresh_stats.get_stats()["POST /query"]
+
+        assert stats[STAGE_RETRIEVAL]["count"] == 4
+        assert stats[STAGE_RETRIEVAL]["p50"] == pytest.approx(0.2, rel=0.01)
+        assert stats[STAGE_REQUEST]["count"] == 4
+
+    def test_series_are_capped(self):
+        stats = StageTimingStats(max_series=3)
+        for i in range(10):
+            profile = RequestProfile(f"GET /route{i}")
+            profile.add(STAGE_DB, 0.01)
+            stats.record_profile(profile)
+
+        endpoints = {endpoint for endpoint, _, _ in stats.items()}
+
+        assert OTHER_SERIES in endpoints
+        assert stats.get(OTHER_SERIES, STAGE_DB).count + stats.get(OTHER_SERIES, STAGE_REQUEST).count > 10
+
+    def test_exported_to_tracer(self, monkeypatch):
+        tracer = FakeTracer()
+        fake_module = types.ModuleType("utils.monitoring.tracing")
+        fake_module.get_tracer = lambda: tracer
+        monkeypatch.setitem(sys.modules, "utils.monitoring.tracing", fake_module)
+
+        with profile_request(sample_rate=1):
+            record_stage(STAGE_EMBEDDING, 0.05)
+
+        assert tracer.attributes["stage.embedding.ms"] == 50.0
+        assert tracer.events[0][0] == "stage.embedding"
+        assert tracer.events[0][1]["duration_ms"] == 50.0
+
+
+class FakeRoute:
+    path = "/query/stream"
+
+
+def make_app(chunks=(), content_type=b"application/json"):
+    async def app(scope, receive, send):
+        scope["route"] = FakeRoute()  # Set by the router on the shared scope
+        with stage(STAGE_ROUTING):
+            await asyncio.sleep(0)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type)]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+def call(middleware):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": "POST", "path": "/query/stream", "headers": []}
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+class TestStageTimingMiddleware:
+    """Test profiling whole ASGI requests."""
+
+    def test_server_timing_header(self, fresh_stats):
+        sent = call(StageTimingMiddleware(make_app(), sample_rate=1, server_timing=True))
+        headers = dict(sent[0]["headers"])
+
+        assert headers[b"server-timing"].startswith(b"routing;dur=")
+        assert fresh_stats.get_stats()["POST /query/stream"][STAGE_ROUTING]["count"] == 1
+
+    def test_header_is_optional(self):
+        sent = call(StageTimingMiddleware(make_app(), sample_rate=1))
+
+        assert b"server-timing" not in dict(sent[0]["headers"])
+
+    def test_event_stream_flushes_are_timed(self, fresh_stats):
+        app = make_app([b"data: a\n\n", b"data: b\n\n"], content_type=b"text/event-stream; charset=utf-8")
+        call(StageTimingMiddleware(app, sample_rate=1))
+
+        stats = fresh_stats.get_stats()["POST /query/stream"]
+
+        assert stats[STAGE_SSE_FLUSH]["count"] == 1  # One total per request
+
+    def test_plain_responses_have_no_flush_stage(self, fresh_stats):
+        call(StageTimingMiddleware(make_app([b"{}"]), sample_rate=1))
+
+        assert STAGE_SSE_FLUSH not in fresh_stats.get_stats()["POST /query/stream"]
+
+    def test_unsampled_requests_pass_through(self, fresh_stats):
+        sent = call(StageTimingMiddleware(make_app(), sample_rate=0, server_timing=True))
+
+        assert b"server-timing" not in dict(sent[0]["headers"])
+        assert fresh_stats.profiles == 0
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+CALLS = 200_000
+
+
+def nanoseconds_per_call(fn):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fn()
+    return (time.perf_counter() - start) / CALLS * 1e9
+
+
+_NULL = nullcontext()
+
+
+def bare():
+    with _NULL:
+        pass
+
+
+def staged():
+    with stage(STAGE_DB):
+        pass
+
+
+@pytest.mark.slow
+def test_benchmark_stage_overhead():
+    """Stages of unsampled requests cost about as much as an empty with block."""
+    bare_ns = nanoseconds_per_call(bare)
+    unsampled_ns = nanoseconds_per_call(staged)
+    with profile_request(sample_rate=1):
+        sampled_ns = nanoseconds_per_call(staged)
+
+    print(f"\n⏱️  {CALLS:,} stage() calls")
+    print(f"   with nullcontext():  {bare_ns:7.0f} ns")
+    print(f"   Stage (unsampled):   {unsampled_ns:7.0f} ns")
+    print(f"   Stage (profiled):    {sampled_ns:7.0f} ns")
+
+    assert unsampled_ns < sampled_ns
+    assert unsampled_ns < 2 * bare_ns
@@ -0,0 +1,191 @@
+"""
+Tests for the startup orchestrator: concurrent initialization, dependency
+order, readiness gating and the timing report.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.core.startup import StartupOrchestrator
+
+INIT = 0.1
+
+
+def slow(result=None, seconds=INIT):
+    """Blocking initializer (runs in a worker thread)."""
+
+    def init():
+        time.sleep(seconds)
+        return result
+
+    return init
+
+
+def failing(error):
+    def init():
+        raise error
+
+    return init
+
+
+class TestStartupOrchestrator:
+    """Test concurrent startup and readiness."""
+
+    def test_independent_components_initialize_concurrently(self):
+        orchestrator = StartupOrchestrator()
+        for name in ("database", "supervisor", "cache"):
+            orchestrator.add(name, slow())
+
+        started = time.perf_counter()
+        report = asyncio.run(orchestrator.run())
+        elapsed = time.perf_counter() - started
+
+        print(f"\n📊 3 components of {INIT * 1000:.0f}ms: serial {3 * INIT * 1000:.0f}ms, "
+              f"orchestrated {elapsed * 1000:.0f}ms")
+
+        assert elapsed < 2 * INIT
+        assert report["ready"]
+        assert all(entry["seconds"] >= INIT * 0.9 for entry in report["components"].values())
+
+    def test_dependencies_start_after_they_are_ready(self):
+        orchestrator = StartupOrchestrator()
+        orchestrator.add("database", slow())
+        orchestrator.add("migrations", slow(), depends_on=["database"])
+
+        async def init_async():
+            await asyncio.sleep(0)
+            return "coroutine"
+
+        orchestrator.add("supervisor", init_async)
+
+        report = asyncio.run(orchestrator.run())
+        components = report["components"]
+
+        assert components["migrations"]["start_offset"] >= components["database"]["seconds"]
+        assert orchestrator.components["supervisor"].result == "coroutine"
+
+    def test_failed_required_component_blocks_readiness(self):
+        orchestrator = StartupOrchestrator()
+        orchestrator.add("database", failing(ConnectionError("refused")))
+        orchestrator.add("migrations", slow(), depends_on=["database"])
+        orchestrator.add("supervisor", slow())
+
+        report = asyncio.run(orchestrator.run())
+        components = report["components"]
+
+        assert not report["ready"]
+        assert components["database"]["status"] == "failed"
+        assert components["database"]["error"] == "refused"
+        assert components["migrations"]["status"] == "skipped"
+        assert components["supervisor"]["status"] == "ready"
+
+    def test_failed_required_component_is_retried_until_ready(self):
+        orchestrator = StartupOrchestrator(retry_base_delay=0.01, retry_max_delay=0.02)
+        outage = {"failures": 2}
+
+        def database():
+            if outage["failures"]:
+                outage["failures"] -= 1
+                raise ConnectionError("refused")
+
+        orchestrator.add("database", database)
+        orchestrator.add("migrations", slow(seconds=0), depends_on=["database"])
+        orchestrator.add("cache", failing(RuntimeError("redis down")), required=False)
+
+        async def scenario():
+            report = await orchestrator.run()
+            for _ in range(100):
+                if orchestrator.ready:
+                    break
+                await asyncio.sleep(0.01)
+            return report
+
+        report = asyncio.run(scenario())
+        components = orchestrator.get_report()["components"]
+
+        assert not report["ready"]
+        assert orchestrator.ready
+        assert components["database"]["attempts"] == 3
+        assert components["migrations"]["status"] == "ready"
+        assert components["cache"]["attempts"] == 1
+
+    def test_stop_cancels_pending_retries(self):
+        orchestrator = StartupOrchestrator(retry_base_delay=10)
+        orchestrator.add("database", failing(ConnectionError("refused")))
+
+        async def scenario():
+            await orchestrator.start()
+            retry = asyncio.all_tasks() - {asyncio.current_task()}
+            await orchestrator.stop()
+            return retry
+
+        started = time.perf_counter()
+        retry = asyncio.run(scenario())
+
+        assert time.perf_counter() - started < 1
+        assert retry and all(task.cancelled() for task in retry)
+        assert orchestrator.components["database"].attempts == 1
+
+    def test_optional_and_unavailable_components_do_not_block_readiness(self):
+        orchestrator = StartupOrchestrator()
+        orchestrator.add("supervisor", slow(seconds=0))
+        orchestrator.add("cache", failing(RuntimeError("redis down")), required=False)
+        orchestrator.add("database", failing(ImportError("No module named 'sqlalchemy'")))
+
+        report = asyncio.run(orchestrator.run())
+
+        assert report["ready"]
+        assert report["components"]["cache"]["status"] == "failed"
+        assert report["components"]["database"]["status"] == "unavailable"
+
+    def test_not_ready_while_starting_in_background(self):
+        orchestrator = StartupOrchestrator()
+        orchestrator.add("supervisor", slow())
+
+        async def scenario():
+            task = orchestrator.start()
+            await asyncio.sleep(0)
+            during = orchestrator.ready
+            await task
+            return during
+
+        assert asyncio.run(scenario()) is False
+        assert orchestrator.ready
+
+    def test_unknown_dependency_is_rejected(self):
+        orchestrator = StartupOrchestrator()
+        orchestrator.add("supervisor", slow(), depends_on=["databse"])
+
+        with pytest.raises(ValueError):
+            asyncio.run(orchestrator.run())
+
+
+class TestLazyComponents:
+    """Test first-use timing of lazy components."""
+
+    def test_lazy_components_are_timed_on_first_use(self):
+        orchestrator = StartupOrchestrator()
+        orchestrator.add_lazy("docling")
+        assert orchestrator.get_report()["components"]["docling"]["status"] == "lazy"
+
+        with orchestrator.timer("docling"):
+            time.sleep(0.01)
+
+        entry = orchestrator.get_report()["components"]["docling"]
+        assert entry["status"] == "ready"
+        assert entry["seconds"] >= 0.01
+        assert not entry["required"]
+        assert orchestrator.ready
+
+    def test_failed_lazy_initialization_is_reported(self):
+        orchestrator = StartupOrchestrator()
+
+        with pytest.raises(RuntimeError):
+            with orchestrator.timer("rubric_store"):
+                raise RuntimeError("no API key")
+
+        entry = orchestrator.get_report()["components"]["rubric_store"]
+        assert (entry["status"], entry["error"]) == ("failed", "no API key")
+        assert orchestrator.ready
@@ -0,0 +1,301 @@
+"""
+Tests and benchmark for fixed-memory latency monitoring.
+
+The benchmark logs a million requests with a heavy-tailed latency
+distribution through PerformanceMonitor and compares its memory, stats
+time and p50/p95/p99 against the previous list-of-RequestMetrics approach
+with exact (sorted) percentiles.
+
+Run benchmark with output: python -m pytest tests/test_streaming_stats.py -v -s -k benchmark
+"""
+
+import json
+import math
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from utils.core.constants import PERFORMANCE_RECENT_REQUESTS
+from utils.monitoring.streaming_stats import (
+    EWMA,
+    LabeledHistograms,
+    LatencyHistogram,
+    WindowedCounter,
+    OTHER_SERIES,
+)
+from utils.routing.performance import (
+    PerformanceBasedRouter,
+    PerformanceMonitor,
+    RequestMetrics,
+    ToolPerformanceTracker,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def latencies(count, seed=5):
+    """Heavy-tailed latencies: mostly ~0.5s, a slow tail up to tens of seconds."""
+    rng = random.Random(seed)
+    return [rng.lognormvariate(math.log(0.5), 0.9) for _ in range(count)]
+
+
+def exact_quantile(sorted_values, q):
+    return sorted_values[int(q * (len(sorted_values) - 1))]
+
+
+class TestLatencyHistogram:
+    """Test quantile accuracy and fixed memory."""
+
+    def test_quantiles_within_relative_error(self):
+        values = latencies(100_000)
+        histogram = LatencyHistogram(relative_error=0.01)
+        for value in values:
+            histogram.record(value)
+        ordered = sorted(values)
+
+        for q in (0.01, 0.5, 0.9, 0.95, 0.99, 0.999):
+            exact = exact_quantile(ordered, q)
+            assert histogram.quantile(q) == pytest.approx(exact, rel=0.01)
+
+        assert histogram.quantiles([0.5, 0.99]) == {0.5: histogram.quantile(0.5), 0.99: histogram.quantile(0.99)}
+        assert histogram.count == len(values)
+        assert histogram.min == ordered[0] and histogram.max == ordered[-1]
+
+    def test_memory_is_fixed(self):
+        histogram = LatencyHistogram()
+        buckets = len(histogram)
+        for value in latencies(10_000):
+            histogram.record(value)
+
+        assert len(histogram) == buckets < 1000
+
+    def test_out_of_range_values_clamp(self):
+        histogram = LatencyHistogram(min_value=0.001, max_value=10)
+        histogram.record(0.00001)
+        histogram.record(500)
+
+        assert histogram.quantile(0) == 0.00001
+        assert histogram.quantile(1) == 500
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+
+        assert histogram.quantile(0.5) is None
+        assert histogram.get_stats()["p99"] is None
+
+    def test_cumulative_counts(self):
+        histogram = LatencyHistogram()
+        for value in (0.05, 0.2, 0.2, 3.0):
+            histogram.record(value)
+
+        assert histogram.cumulative_counts([0.1, 1.0, 10.0]) == [1, 3, 4]
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(1.0)
+        second.record(2.0)
+        first.merge(second)
+
+        assert first.count == 2 and first.max == 2.0
+        with pytest.raises(ValueError):
+            first.merge(LatencyHistogram(relative_error=0.05))
+
+
+class TestTrendsAndWindows:
+    """Test EWMA, windowed counters and labeled series."""
+
+    def test_ewma(self):
+        ewma = EWMA(alpha=0.5)
+        for value in (10, 20, 20):
+            ewma.update(value)
+
+        assert ewma.value == 17.5
+
+    def test_windowed_counter_expires_old_buckets(self):
+        clock = FakeClock()
+        counter = WindowedCounter(window_seconds=60, buckets=6, clock=clock)
+        counter.add(5)
+        clock.now += 30
+        counter.add(1)
+
+        assert counter.total() == 6
+        clock.now += 45  # First bucket is now outside the window
+        assert counter.total() == 1
+        assert counter.rate() == pytest.approx(1 / 60)
+
+    def test_labeled_series_are_capped(self):
+        series = LabeledHistograms(max_series=3)
+        for i in range(10):
+            series.record(f"route{i}", 0.1)
+
+        assert len(series) == 3
+        assert OTHER_SERIES in series
+        assert series.get("route9").count == 8
+
+
+class TestPerformanceMonitor:
+    """Test the monitor keeps bounded memory and reports percentiles."""
+
+    def test_bounded_history_and_percentiles(self):
+        monitor = PerformanceMonitor()
+        for i, latency in enumerate(latencies(5_000)):
+            monitor.log_request(f"q{i}", latency, llm_calls=1, tool_used="Web_Search" if i % 2 else "Document_QA",
+                                agent="study", route="/query")
+
+        stats = monitor.get_stats()
+        per_tool = monitor.get_latency_stats()["tools"]
+
+        assert len(monitor.metrics) == PERFORMANCE_RECENT_REQUESTS
+        assert stats["total_requests"] == 5_000
+        assert float(stats["p50_response_time"].rstrip("s")) < float(stats["p99_response_time"].rstrip("s"))
+        assert set(per_tool) == {"Web_Search", "Document_QA"}
+        assert per_tool["Web_Search"]["count"] == 2_500
+
+    def test_export(self, tmp_path):
+        monitor = PerformanceMonitor()
+        monitor.log_request("q", 0.4, llm_calls=1, route="/query")
+        path = tmp_path / "metrics.json"
+        monitor.export_metrics(str(path))
+
+        data = json.loads(path.read_text())
+
+        assert data["latency"]["routes"]["/query"]["count"] == 1
+        assert data["detailed_metrics"][0]["route"] == "/query"
+
+    def test_record_latency_only(self):
+        monitor = PerformanceMonitor()
+        monitor.record_latency(0.3, agent="grading")
+
+        assert monitor.get_stats()["latency"]["count"] == 1
+
+
+class TestToolPerformanceTracker:
+    """Test EWMA trends and bounded quality tracking."""
+
+    def test_trend_detects_degradation(self):
+        tracker = ToolPerformanceTracker("Web_Search")
+        for _ in range(50):
+            tracker.record_call(True, 0.5)
+        for _ in range(8):
+            tracker.record_call(False, 3.0)
+
+        assert tracker.performance_trend < -0.1
+        assert tracker.get_stats()["trend"] == "declining"
+
+    def test_trend_detects_improvement(self):
+        tracker = ToolPerformanceTracker("Web_Search")
+        for _ in range(50):
+            tracker.record_call(True, 4.0)
+        for _ in range(10):
+            tracker.record_call(True, 0.5)
+
+        assert tracker.get_stats()["trend"] == "improving"
+
+    def test_quality_is_a_running_average(self):
+        tracker = ToolPerformanceTracker("Document_QA")
+        for score in (0.5, 1.0, 0.9):
+            tracker.record_call(True, 1.0, quality_score=score)
+
+        assert tracker.avg_quality == pytest.approx(0.8)
+        assert not hasattr(tracker, "quality_scores")
+
+    def test_state_round_trip_and_old_format(self, tmp_path):
+        router = PerformanceBasedRouter()
+        for _ in range(20):
+            router.record_result("Web_Search", "q", True, 0.5, quality_score=0.7)
+        path = tmp_path / "router.json"
+        router.save_to_file(str(path))
+
+        restored = PerformanceBasedRouter.load_from_file(str(path)).tool_trackers["Web_Search"]
+        assert restored.quality_count == 20
+        assert restored.success_slow.value == pytest.approx(1.0)
+
+        data = json.loads(path.read_text())
+        tracker_data = data["tool_trackers"]["Web_Search"]
+        for key in ("quality_count", "quality_total", "trend_averages"):
+            del tracker_data[key]
+        tracker_data["quality_scores"] = [0.5, 1.0]
+        path.write_text(json.dumps(data))
+
+        legacy = PerformanceBasedRouter.load_from_file(str(path)).tool_trackers["Web_Search"]
+        assert (legacy.quality_count, legacy.quality_total) == (2, 1.5)
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+REQUESTS = 1_000_000
+
+
+def log_unbounded(values):
+    """The previous monitor: one RequestMetrics per request, exact stats by scanning."""
+    metrics = []
+    for i, value in enumerate(values):
+        metrics.append(RequestMetrics(
+            timestamp=datetime.now(), question=f"question {i % 1000}", response_time=value,
+            llm_calls=1, pattern_routed=False, cache_hit=False, tool_used="Document_QA"
+        ))
+    return metrics
+
+
+def log_streaming(values):
+    monitor = PerformanceMonitor()
+    for i, value in enumerate(values):
+        monitor.log_request(f"question {i % 1000}", value, llm_calls=1, tool_used="Document_QA")
+    return monitor
+
+
+def measure_memory(fn, arg):
+    """Run fn and return (result, peak bytes allocated)."""
+    tracemalloc.start()
+    result = fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def microseconds_per_request(fn, values):
+    start = time.perf_counter()
+    fn(values)
+    return (time.perf_counter() - start) / len(values) * 1e6
+
+
+@pytest.mark.slow
+def test_benchmark_million_requests():
+    """Fixed memory with p50/p95/p99 within 1% of exact."""
+    values = latencies(REQUESTS, seed=11)
+
+    metrics, list_bytes = measure_memory(log_unbounded, values)
+    start = time.perf_counter()
+    exact = sorted(m.response_time for m in metrics)
+    exact_ms = (time.perf_counter() - start) * 1000
+    del metrics
+
+    monitor, monitor_bytes = measure_memory(log_streaming, values)
+    start = time.perf_counter()
+    stats = monitor.latency.get_stats()
+    stats_ms = (time.perf_counter() - start) * 1000
+
+    list_us = microseconds_per_request(log_unbounded, values[:100_000])
+    monitor_us = microseconds_per_request(log_streaming, values[:100_000])
+
+    print(f"\n⏱️  {REQUESTS:,} requests")
+    print(f"   List of RequestMetrics: {list_bytes / 2**20:7.1f} MiB  log {list_us:.1f}µs/req  percentiles {exact_ms:.1f}ms")
+    print(f"   Streaming histograms:   {monitor_bytes / 2**20:7.1f} MiB  log {monitor_us:.1f}µs/req  percentiles {stats_ms:.2f}ms")
+    for q in (0.5, 0.95, 0.99):
+        reported = stats[f"p{q * 100:g}"]
+        print(f"   p{q * 100:g}: exact {exact_quantile(exact, q):.4f}s  reported {reported:.4f}s")
+        assert reported == pytest.approx(exact_quantile(exact, q), rel=0.01)
+
+    assert monitor_bytes * 20 < list_bytes
+    assert stats_ms < exact_ms
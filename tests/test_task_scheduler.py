@@ -0,0 +1,321 @@
+"""
+Tests for background task scheduling: per-type caps, fair tenant queues,
+pushed progress events and the shared task store.
+"""
+
+import asyncio
+import json
+
+from utils.concurrent_execution import BackgroundTask, ConcurrentTaskManager, TaskStatus, TaskType
+from utils.scaling.task_scheduler import ORPHANED_TASK_ERROR, InMemoryTaskStore, RedisTaskStore, TaskScheduler
+
+
+def make_task(task_function, task_type=TaskType.MANIM_ANIMATION, tenant_id="t1", **task_args):
+    return BackgroundTask(
+        task_id=f"{tenant_id}-{id(task_function)}-{len(task_args)}",
+        task_type=task_type,
+        task_function=task_function,
+        task_args=task_args,
+        thread_id="thread",
+        tenant_id=tenant_id,
+    )
+
+
+class FakePubSub:
+    """Subscribes to FakeAsyncRedis channels."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def unsubscribe(self, channel):
+        self.redis.subscribers[channel].remove(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncRedis:
+    """Minimal redis.asyncio client (strings, sets, publish/pubsub) backed by dicts."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.subscribers = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.data.get(key, set()).discard(member)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class TestTaskScheduler:
+    """Test caps and fair queuing."""
+
+    def test_caps_per_type(self):
+        scheduler = TaskScheduler(type_concurrency={"grading": 2})
+        started = []
+
+        for i in range(3):
+            scheduler.submit(f"g{i}", "grading", "t", lambda i=i: started.append(f"g{i}"))
+        scheduler.submit("s0", "web_search", "t", lambda: started.append("s0"))
+
+        assert started == ["g0", "g1", "s0"]
+        assert scheduler.queued("grading") == 1
+
+        scheduler.release("grading")
+        assert started[-1] == "g2"
+
+    def test_tenants_take_turns(self):
+        scheduler = TaskScheduler(type_concurrency={"grading": 1})
+        started = []
+
+        scheduler.submit("busy", "grading", "a", lambda: None)
+        for i in range(3):
+            scheduler.submit(f"a{i}", "grading", "a", lambda i=i: started.append(f"a{i}"))
+        scheduler.submit("b0", "grading", "b", lambda: started.append("b0"))
+        for _ in range(4):
+            scheduler.release("grading")
+
+        assert started == ["a0", "b0", "a1", "a2"]
+
+    def test_remove_queued_job(self):
+        scheduler = TaskScheduler(type_concurrency={"grading": 1})
+        started = []
+
+        scheduler.submit("busy", "grading", "a", lambda: None)
+        assert scheduler.submit("queued", "grading", "a", lambda: started.append("queued")) is False
+        assert scheduler.remove("queued")
+        scheduler.release("grading")
+
+        assert started == []
+        assert scheduler.get_stats()["grading"] == {"running": 0, "queued": 0, "limit": 1, "tenants_waiting": 0}
+
+
+class TestTaskStores:
+    """Test records, TTLs and waiting through pub/sub."""
+
+    def test_in_memory_wait_and_expiry(self):
+        store = InMemoryTaskStore()
+
+        async def scenario():
+            await store.save({"task_id": "t", "status": "running"})
+            waiter = asyncio.create_task(store.wait("t", timeout=1))
+            await asyncio.sleep(0)
+            await store.save({"task_id": "t", "status": "completed", "result": 42})
+            record = await waiter
+
+            await store.save({"task_id": "old", "status": "completed"}, ttl=0)
+            return record, await store.get("old")
+
+        record, expired = asyncio.run(scenario())
+
+        assert record["result"] == 42
+        assert expired is None
+
+    def test_in_memory_wait_times_out(self):
+        store = InMemoryTaskStore()
+
+        async def scenario():
+            await store.save({"task_id": "t", "status": "running"})
+            return await store.wait("t", timeout=0.01), await store.wait("unknown", timeout=0.01)
+
+        assert asyncio.run(scenario()) == (None, None)
+
+    def test_redis_store_shares_state_between_instances(self):
+        redis = FakeAsyncRedis()
+        owner, other = RedisTaskStore(redis), RedisTaskStore(redis)
+
+        async def scenario():
+            await owner.save({"task_id": "t", "status": "running"}, ttl=60)
+            waiter = asyncio.create_task(other.wait("t", timeout=1))
+            await asyncio.sleep(0)
+            await owner.save({"task_id": "t", "status": "completed", "result": "video.mp4"}, ttl=60)
+            return await waiter
+
+        assert asyncio.run(scenario())["result"] == "video.mp4"
+        assert set(redis.ttls.values()) == {60}
+        assert json.loads(redis.data["tasks:v1:task:t"])["status"] == "completed"
+
+    def test_tasks_of_a_stopped_instance_are_failed(self):
+        """A restarted or crashed instance's queued/running tasks do not stay open."""
+        redis = FakeAsyncRedis()
+        crashed, restarted = RedisTaskStore(redis, instance_id="a"), RedisTaskStore(redis, instance_id="b")
+
+        async def scenario():
+            await crashed.renew_lease()
+            for task_id, status in (("queued", "queued"), ("running", "running"), ("done", "completed")):
+                await crashed.save({"task_id": task_id, "status": status})
+            alive = await restarted.recover_orphans()
+            await redis.delete(crashed._lease_key("a"))  # Lease lapsed
+            return alive, await restarted.recover_orphans(), await restarted.recover_orphans()
+
+        assert asyncio.run(scenario()) == (0, 2, 0)
+        for task_id in ("queued", "running"):
+            record = json.loads(redis.data[f"tasks:v1:task:{task_id}"])
+            assert record["status"] == "failed"
+            assert record["error"] == ORPHANED_TASK_ERROR
+        assert json.loads(redis.data["tasks:v1:task:done"])["status"] == "completed"
+
+    def test_close_fails_unfinished_tasks(self):
+        redis = FakeAsyncRedis()
+        store = RedisTaskStore(redis, lease_ttl=60)
+
+        async def scenario():
+            store.start()
+            await asyncio.sleep(0)
+            await store.save({"task_id": "t", "status": "running"})
+            await store.close()
+
+        asyncio.run(scenario())
+
+        assert json.loads(redis.data["tasks:v1:task:t"])["status"] == "failed"
+        assert not redis.data["tasks:v1:instances"]
+
+
+class TestManagerScheduling:
+    """Test the task manager on top of the scheduler and store."""
+
+    def test_tasks_wait_for_a_slot(self):
+        manager = ConcurrentTaskManager(scheduler=TaskScheduler(type_concurrency={"manim_animation": 1}))
+
+        async def render(name):
+            await asyncio.sleep(0.01)
+            return name
+
+        async def scenario():
+            first, second = make_task(render, name="first"), make_task(render, tenant_id="t2", name="second")
+            manager.submit_task(first)
+            manager.submit_task(second)
+            assert (first.status, second.status) == (TaskStatus.RUNNING, TaskStatus.PENDING)
+            return await manager.wait_for_task(second.task_id, timeout=1)
+
+        assert asyncio.run(scenario()) == "second"
+        assert manager.active_tasks == {}
+        assert manager.scheduler.running["manim_animation"] == 0
+
+    def test_cancel_queued_task(self):
+        manager = ConcurrentTaskManager(scheduler=TaskScheduler(type_concurrency={"manim_animation": 1}))
+
+        async def render():
+            await asyncio.sleep(0.01)
+
+        async def scenario():
+            running, queued = make_task(render), make_task(render, tenant_id="t2")
+            manager.submit_task(running)
+            manager.submit_task(queued)
+            assert await manager.cancel_task(queued.task_id)
+            await manager.wait_for_task(running.task_id, timeout=1)
+            await asyncio.sleep(0)
+            return queued.task_id
+
+        task_id = asyncio.run(scenario())
+
+        assert manager.get_task_status(task_id)["status"] == "cancelled"
+        assert manager.scheduler.running["manim_animation"] == 0
+
+    def test_progress_is_pushed(self):
+        manager = ConcurrentTaskManager()
+        gate = None
+
+        async def render():
+            for step in (0.3, 0.6):
+                await gate.wait()
+                gate.clear()
+                manager.active_tasks[next(iter(manager.active_tasks))].update_progress(step, f"{step:.0%}")
+            return "video.mp4"
+
+        async def scenario():
+            nonlocal gate
+            gate = asyncio.Event()
+            updates = []
+            async for update in manager.execute_with_concurrency(
+                TaskType.MANIM_ANIMATION, render, {}, "animate", "thread", tenant_id="t1"
+            ):
+                updates.append(update)
+                if update["type"] in ("prompt", "progress"):
+                    gate.set()
+            return updates
+
+        updates = asyncio.run(scenario())
+
+        assert [u["type"] for u in updates] == ["fork", "prompt", "progress", "progress", "task_complete", "result"]
+        assert updates[3]["message"] == "60%"
+
+    def test_status_and_result_visible_to_other_instances(self):
+        store = InMemoryTaskStore()
+        owner, other = ConcurrentTaskManager(store=store), ConcurrentTaskManager(store=store)
+        rendered = None
+
+        async def render():
+            await rendered.wait()
+            return "video.mp4"
+
+        async def scenario():
+            nonlocal rendered
+            rendered = asyncio.Event()
+            task = make_task(render)
+            owner.submit_task(task)
+            await asyncio.sleep(0.01)
+            running = await other.aget_task_status(task.task_id)
+            asyncio.get_running_loop().call_later(0.01, rendered.set)
+            result = await other.wait_for_task(task.task_id, timeout=1)
+            return running, result
+
+        running, result = asyncio.run(scenario())
+
+        assert running["status"] == "running"
+        assert "result" not in running
+        assert result == "video.mp4"
+
+    def test_finished_tasks_expire(self):
+        manager = ConcurrentTaskManager(result_ttl=0)
+
+        async def render():
+            return "done"
+
+        async def scenario():
+            for tenant in ("a", "b"):
+                task = make_task(render, tenant_id=tenant)
+                manager.submit_task(task)
+                await manager.wait_for_task(task.task_id, timeout=1)
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+
+        assert len(manager.completed_tasks) <= 1
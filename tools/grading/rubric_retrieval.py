@@ -12,6 +12,8 @@ AI Fundamentals Applied:
 
 import os
 import json
+import hashlib
+import threading
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 
@@ -25,9 +27,24 @@ from langchain_community.vectorstores import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
 
+from utils.core.constants import CHROMA_PERSIST_DIR_RUBRICS
+from utils.core.startup import startup_timer
+
 # Global rubric store
 _rubric_vectorstore: Optional[Chroma] = None
 _rubric_embeddings: Optional[GoogleGenerativeAIEmbeddings] = None
+_rubric_store_lock = threading.Lock()
+
+# Fingerprint of the rubrics embedded in the persisted collection
+_FINGERPRINT_FILE = "rubrics.fingerprint"
+
+
+def _rubrics_fingerprint(documents: List[Document]) -> str:
+    """Hash of the rubric texts, to detect when the persisted embeddings are stale."""
+    digest = hashlib.sha256()
+    for text in sorted(doc.page_content for doc in documents):
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
 
 
 def initialize_rubric_store(rubrics_dir: str = "rubrics") -> bool:
@@ -35,6 +52,8 @@ def initialize_rubric_store(rubrics_dir: str = "rubrics") -> bool:
     Initialize the rubric vector store with ChromaDB.
     
     This loads rubric templates from JSON files and indexes them for semantic search.
+    Embeddings persisted by an earlier run are reused while the rubric files
+    are unchanged, so only the first start after an edit re-embeds them.
     
     Args:
         rubrics_dir: Directory containing rubric JSON files
@@ -42,6 +61,15 @@ def initialize_rubric_store(rubrics_dir: str = "rubrics") -> bool:
     Returns:
         bool: True if initialization successful
     """
+    with _rubric_store_lock:
+        if _rubric_vectorstore is not None:
+            return True
+        with startup_timer("rubric_store"):
+            return _build_rubric_store(rubrics_dir)
+
+
+def _build_rubric_store(rubrics_dir: str) -> bool:
+    """Load, and if needed embed, the rubric store (called with the lock held)."""
     global _rubric_vectorstore, _rubric_embeddings
     
     try:
@@ -111,14 +139,35 @@ Full Details: {json.dumps(rubric_data, indent=2)}
             google_api_key=google_api_key
         )
         
+        fingerprint = _rubrics_fingerprint(rubric_documents)
+        fingerprint_path = Path(CHROMA_PERSIST_DIR_RUBRICS) / _FINGERPRINT_FILE
+        if fingerprint_path.exists() and fingerprint_path.read_text().strip() == fingerprint:
+            # Same rubrics as last run: reuse the persisted embeddings
+            _rubric_vectorstore = Chroma(
+                persist_directory=CHROMA_PERSIST_DIR_RUBRICS,
+                embedding_function=_rubric_embeddings,
+                collection_name="grading_rubrics"
+            )
+            print(f"✅ Rubric store loaded with {len(rubric_documents)} templates (embeddings reused)")
+            return True
+        
+        # Drop stale embeddings so edited rubrics are not indexed twice
+        Chroma(
+            persist_directory=CHROMA_PERSIST_DIR_RUBRICS,
+            embedding_function=_rubric_embeddings,
+            collection_name="grading_rubrics"
+        ).delete_collection()
+        
         # Create vector store
         print("💾 Storing rubrics in ChromaDB...")
         _rubric_vectorstore = Chroma.from_documents(
             documents=rubric_documents,
             embedding=_rubric_embeddings,
-            persist_directory=".chroma_rubrics",
+            persist_directory=CHROMA_PERSIST_DIR_RUBRICS,
             collection_name="grading_rubrics"
         )
+        fingerprint_path.parent.mkdir(parents=True, exist_ok=True)
+        fingerprint_path.write_text(fingerprint)
         
         print(f"✅ Rubric store initialized with {len(rubric_documents)} templates")
         return True
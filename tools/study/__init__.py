@@ -3,12 +3,19 @@ Study Agent Tools
 
 Tools used by the StudySearchAgent:
 - web_search: Web search with Google Custom Search (primary) and Tavily (fallback)
+- search_client: Async hedged search client with pooled connections and circuit breakers
 - python_repl: Python code execution
 - manim_animation: Mathematical animation generation
 - rag_tools: RAG tools (adaptive retrieval, self-correction, vector store)
 """
 
 from .web_search import get_web_search_tool
+from .search_client import (
+    HedgedSearchClient,
+    FakeSearchProvider,
+    get_search_client,
+    close_search_client,
+)
 from .python_repl import get_python_repl_tool
 from .manim_animation import get_manim_tool
 
@@ -16,6 +23,7 @@ from .manim_animation import get_manim_tool
 try:
     from .rag_tools import (
         retrieve_from_vector_store,
+        retrieve_documents,
         query_learning_store,
         enhanced_web_search,
         should_retrieve_context,
@@ -31,8 +39,15 @@ __all__ = [
     'get_python_repl_tool',
     'get_manim_tool',
     
+    # Async web search client
+    'HedgedSearchClient',
+    'FakeSearchProvider',
+    'get_search_client',
+    'close_search_client',
+    
     # RAG tools (includes vector store retrieval)
     'retrieve_from_vector_store',
+    'retrieve_documents',
     'query_learning_store',
     'enhanced_web_search',
     'should_retrieve_context',
@@ -20,10 +20,13 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pathlib import Path
 from langchain.tools import Tool
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from utils.core.constants import MANIM_RENDER_QUALITY
+from utils.core.llm import initialize_llm
+from utils.core.startup import startup_timer
+
 
 # ============================================================================
 # STAGE 1: PLANNING AGENT - "Scene Designer" Persona
@@ -1423,20 +1426,15 @@ class ManimAnimationManager:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
-        # Initialize LLM for code generation
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if not google_api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=google_api_key,
+        # Initialize LLM for code generation (shared client, through the LLM gateway)
+        self.llm = initialize_llm(
+            model_name="gemini-2.5-flash",
             temperature=0.7,  # Slightly creative for diverse animations
-            convert_system_message_to_human=True
         )
         
-        # Check if Manim is installed
-        self._check_manim_installation()
+        # Check if Manim is installed (first use only: the manager is created lazily)
+        with startup_timer("manim"):
+            self.manim_available = self._check_manim_installation()
         
         # Document retrieval is now handled via RAG tools (L2 Vector Store)
         # Animations are generated without direct document context
@@ -2218,7 +2216,7 @@ def create_animation_from_topic(topic: str) -> str:
     
     try:
         # Use the manager's create_animation method which handles the full pipeline
-        result = _manim_manager.create_animation(topic, quality="high_quality")
+        result = _manim_manager.create_animation(topic, quality=MANIM_RENDER_QUALITY)
         
         if result["status"] == "success":
             return json.dumps({
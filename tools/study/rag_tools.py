@@ -11,10 +11,13 @@ with the Study Agent's LangGraph workflow.
 """
 
 import os
+import time
 from typing import Optional, List, Dict, Any
 from langchain.tools import tool
 from dotenv import load_dotenv
 
+from utils.monitoring.stage_timing import stage, STAGE_EMBEDDING, STAGE_DB
+
 load_dotenv()
 
 # Database imports (graceful fallback if not available)
@@ -22,6 +25,7 @@ try:
     from database import get_db
     from database.operations.rag import (
         similarity_search,
+        get_structured_chunks,
         hybrid_search,
         get_learning_insights,
         get_rag_performance_stats,
@@ -36,6 +40,18 @@ except ImportError as e:
     if '--help' not in sys.argv:
         print(f"⚠️  RAG Tools: Database not available - L2/L3 features disabled ({e})")
 
+from utils.rag.document_structure import parse_structure_reference, select_reading_order
+from utils.rag.retrieval import (
+    RetrievalResult,
+    RetrievedChunk,
+    STATUS_NO_DOCUMENTS,
+    STATUS_NO_RESULTS,
+    STATUS_UNAVAILABLE,
+    STATUS_ERROR,
+    STRATEGY_STRUCTURED,
+)
+from utils.rag.retrieval_prefetch import RetrievalPrefetcher
+
 # Web search imports
 try:
     from tools.study.web_search import get_web_search_tool
@@ -132,6 +148,180 @@ def _reformulate_document_query(query: str, extracted_topic: str) -> str:
     return query
 
 
+def _record_retrievals(db, results):
+    """Update retrieval stats for returned chunks."""
+    from sqlalchemy import text
+    for doc in results:
+        db.execute(
+            text("UPDATE document_vectors SET retrieval_count = retrieval_count + 1 WHERE id = :id"),
+            {'id': doc.id}
+        )
+    db.commit()
+
+
+def _structure_unit_label(structure_ref, first_row) -> str:
+    """Human-readable label for a chapter/section/page request."""
+    if structure_ref.chapter is not None:
+        title = getattr(first_row, 'chapter_title', None)
+        return f"Chapter {structure_ref.chapter}" + (f": {title}" if title else "")
+    if structure_ref.section is not None:
+        title = getattr(first_row, 'section_title', None)
+        return f"Section {structure_ref.section}" + (f": {title}" if title else "")
+    return f"Page {structure_ref.page}"
+
+
+def _retrieve_structured_unit(
+    query: str,
+    structure_ref,
+    limit: int,
+    user_id: Optional[str],
+    course_id: Optional[str],
+    record: bool = True
+) -> Optional[RetrievalResult]:
+    """
+    Answer "summarize chapter 12"-style queries with an exact index lookup.
+    
+    Args:
+        record: Update retrieval stats (False for speculative prefetch loads)
+    
+    Returns:
+        Chunks in reading order, or None when no structure-indexed chunks
+        match (documents ingested before structure indexing)
+    """
+    with get_db() as db:
+        rows = get_structured_chunks(
+            db,
+            chapter=structure_ref.chapter,
+            section=structure_ref.section,
+            page=structure_ref.page,
+            user_id=user_id,
+            course_id=course_id
+        )
+        if not rows:
+            return None
+        
+        selected = select_reading_order(rows, limit)
+        label = _structure_unit_label(structure_ref, rows[0])
+        print(f"📑 [STRUCTURED RETRIEVAL] {label}: {len(rows)} indexed chunks, returning {len(selected)} in reading order")
+        
+        result = RetrievalResult(
+            query=query,
+            chunks=[RetrievedChunk.from_row(row) for row in selected],
+            strategy=STRATEGY_STRUCTURED,
+            unit_label=label
+        )
+        if record:
+            _record_retrievals(db, selected)
+        return result
+
+
+def _record_prefetch_hit(result: RetrievalResult):
+    """Count retrievals served from prefetch (runs on the prefetch worker)."""
+    with get_db() as db:
+        _record_retrievals(db, result.chunks)
+
+
+def _observe_retrieval(
+    query: str,
+    result: RetrievalResult,
+    user_id: Optional[str],
+    course_id: Optional[str],
+    limit: int
+):
+    """Learn the query sequence and prefetch the likely next unit."""
+    if DATABASE_AVAILABLE:
+        try:
+            get_retrieval_prefetcher().observe(query, result, user_id, course_id, limit=limit)
+        except Exception as e:
+            print(f"⚠️  Retrieval prefetch skipped: {e}")
+
+
+# Global retrieval prefetcher
+_retrieval_prefetcher: Optional[RetrievalPrefetcher] = None
+
+
+def get_retrieval_prefetcher() -> RetrievalPrefetcher:
+    """Get or create the global retrieval prefetcher."""
+    global _retrieval_prefetcher
+    
+    if _retrieval_prefetcher is None:
+        _retrieval_prefetcher = RetrievalPrefetcher(
+            loader=lambda query, ref, limit, user_id, course_id: _retrieve_structured_unit(
+                query, ref, limit, user_id, course_id, record=False
+            ),
+            on_hit=_record_prefetch_hit
+        )
+    
+    return _retrieval_prefetcher
+
+
+def retrieve_documents(
+    query: str,
+    limit: int = 15,
+    user_id: Optional[str] = None,
+    course_id: Optional[str] = None,
+    conversation_history: Optional[str] = None,
+    record: bool = True
+) -> RetrievalResult:
+    """
+    Retrieve document chunks as typed records (see utils.rag.retrieval).
+    
+    Same retrieval as the Document_QA tool, without formatting: callers get
+    chunk ids, scores, chapter/page metadata and a status instead of text.
+    
+    Args:
+        query: The search query
+        limit: Maximum number of chunks
+        user_id: Filter by user ID
+        course_id: Filter by course ID
+        conversation_history: Recent conversation for context extraction
+        record: Update retrieval stats and train the prefetcher; False for
+            speculative lookups, recorded with record_document_retrieval
+            once the result is used
+    
+    Returns:
+        RetrievalResult
+    """
+    start_time = time.time()
+    result = _retrieve_documents(query, limit, user_id, course_id, conversation_history, record=record)
+    result.retrieval_time_ms = (time.time() - start_time) * 1000
+    
+    # Learn the query sequence and prefetch the likely next unit while the
+    # answer is being generated
+    if record:
+        _observe_retrieval(query, result, user_id, course_id, limit)
+    
+    return result
+
+
+def record_document_retrieval(
+    query: str,
+    result: RetrievalResult,
+    limit: int = 15,
+    user_id: Optional[str] = None,
+    course_id: Optional[str] = None
+):
+    """
+    Record a retrieval made with ``retrieve_documents(..., record=False)``.
+    
+    Updates the retrieval stats of the returned chunks and trains the
+    prefetcher, as retrieve_documents does for recorded retrievals.
+    
+    Args:
+        query: The search query
+        result: Result of the unrecorded retrieval
+        limit: Maximum number of chunks it asked for
+        user_id: User filter it used
+        course_id: Course filter it used
+    """
+    if not DATABASE_AVAILABLE:
+        return
+    if result.chunks:
+        with get_db() as db:
+            _record_retrievals(db, result.chunks)
+    _observe_retrieval(query, result, user_id, course_id, limit)
+
+
 @tool("Document_QA")
 def retrieve_from_vector_store(
     query: str,
@@ -172,8 +362,36 @@ def retrieve_from_vector_store(
         - "What companies does it mention?" → "companies mentioned in chapter 3"
         - "Summarize it" → "summarize chapter 3"
     """
+    return retrieve_documents(
+        query,
+        limit=limit,
+        user_id=user_id,
+        course_id=course_id,
+        conversation_history=conversation_history
+    ).to_prompt_text()
+
+
+# Structured access for agent nodes that want records instead of text
+retrieve_from_vector_store.metadata = {
+    "structured_retriever": retrieve_documents,
+    "retrieval_recorder": record_document_retrieval,
+}
+
+
+def _retrieve_documents(
+    query: str,
+    limit: int,
+    user_id: Optional[str],
+    course_id: Optional[str],
+    conversation_history: Optional[str],
+    record: bool = True
+) -> RetrievalResult:
+    """Retrieval pipeline behind retrieve_documents()."""
     if not DATABASE_AVAILABLE:
-        return "❌ Vector store not available. Database not configured. Please set DATABASE_URL in .env"
+        return RetrievalResult.failure(
+            query, STATUS_UNAVAILABLE,
+            "❌ Vector store not available. Database not configured. Please set DATABASE_URL in .env"
+        )
     
     # INTELLIGENT CONTEXT-AWARE QUERY REFORMULATION
     original_query = query
@@ -202,6 +420,11 @@ def retrieve_from_vector_store(
     
     print(f"{'='*70}\n")
     
+    # Whole-unit follow-ups ("summarize it", "make flashcards") may already be prefetched
+    prefetched = get_retrieval_prefetcher().lookup(query, limit, user_id, course_id, record=record)
+    if prefetched is not None:
+        return prefetched
+    
     try:
         # First, check if any documents exist in the vector store
         with get_db() as db:
@@ -210,12 +433,29 @@ def retrieve_from_vector_store(
             total_docs = count_result.fetchone().count
             
             if total_docs == 0:
-                return "📚 No documents found in the vector store. Please upload documents first, or I can search the web for this information instead."
+                return RetrievalResult.failure(
+                    query, STATUS_NO_DOCUMENTS,
+                    "📚 No documents found in the vector store. Please upload documents first, or I can search the web for this information instead."
+                )
         
     except Exception as e:
         print(f"⚠️  Error checking document availability: {e}")
         # Continue to try retrieval anyway
     
+    # STRUCTURED RETRIEVAL: whole chapter/section/page requests are an exact
+    # index range lookup in reading order (no embedding, no re-ranking)
+    structure_ref = parse_structure_reference(query)
+    if structure_ref is not None and structure_ref.is_whole_unit:
+        try:
+            structured_result = _retrieve_structured_unit(
+                query, structure_ref, limit, user_id, course_id, record=record
+            )
+            if structured_result is not None:
+                return structured_result
+            print("ℹ️  [STRUCTURED RETRIEVAL] No structure-indexed chunks - falling back to semantic search")
+        except Exception as e:
+            print(f"⚠️  Structured retrieval failed, falling back to semantic search: {e}")
+    
     try:
         # Preprocess query: Extract core question for better semantic matching
         # "What is AI based on my deep learning notes?" -> "what is artificial intelligence definition"
@@ -268,11 +508,12 @@ def retrieve_from_vector_store(
         import google.generativeai as genai
         genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
         
-        query_result = genai.embed_content(
-            model="models/embedding-001",
-            content=query_clean,  # Use cleaned query for better matching
-            task_type="retrieval_query"  # Query task type for search
-        )
+        with stage(STAGE_EMBEDDING):
+            query_result = genai.embed_content(
+                model="models/embedding-001",
+                content=query_clean,  # Use cleaned query for better matching
+                task_type="retrieval_query"  # Query task type for search
+            )
         query_embedding = query_result['embedding']
         
         with get_db() as db:
@@ -291,12 +532,21 @@ def retrieve_from_vector_store(
             if course_id:
                 filters.append(f"course_id = '{course_id}'")
             
-            # HYBRID SEARCH: Add chapter filter for chapter-specific queries
+            # HYBRID SEARCH: Add chapter filter for chapter-specific queries.
+            # Structure-indexed chunks match on chapter_number; chunks ingested
+            # before structure indexing fall back to the keyword filter.
             if chapter_match:
                 chapter_num = chapter_match.group(1)
-                # Filter for chunks that contain the chapter number
-                filters.append(f"(LOWER(content) LIKE '%chapter {chapter_num}%' OR LOWER(content) LIKE '%chapter{chapter_num}%')")
-                print(f"🔍 [HYBRID SEARCH] Added keyword filter for Chapter {chapter_num}")
+                filters.append(
+                    f"(chapter_number = {int(chapter_num)} OR (chapter_number IS NULL AND "
+                    f"(LOWER(content) LIKE '%chapter {chapter_num}%' OR LOWER(content) LIKE '%chapter{chapter_num}%')))"
+                )
+                print(f"🔍 [HYBRID SEARCH] Added structure/keyword filter for Chapter {chapter_num}")
+            if section_match:
+                section_num = section_match.group(1)
+                filters.append(
+                    f"(section_number IS NULL OR section_number = '{section_num}' OR section_number LIKE '{section_num}.%')"
+                )
             
             if filters:
                 filter_sql = " AND " + " AND ".join(filters)
@@ -312,15 +562,18 @@ def retrieve_from_vector_store(
             sql = f"""
                 SELECT 
                     id, document_name, content, relevance_score, retrieval_count,
-                    (embedding <=> '{embedding_str}'::vector) as distance
+                    (embedding <=> '{embedding_str}'::vector) as distance,
+                    document_id, chunk_index, chapter_number, chapter_title,
+                    section_number, page_start, page_end
                 FROM document_vectors
                 WHERE 1=1 {filter_sql}
                 ORDER BY embedding <=> '{embedding_str}'::vector
                 LIMIT {initial_limit}
             """
             
-            result = db.execute(text(sql))
-            results = result.fetchall()
+            with stage(STAGE_DB):
+                result = db.execute(text(sql))
+                results = result.fetchall()
             
             print(f"📊 [RETRIEVAL DEBUG] Retrieved {len(results)} chunks from vector search")
             if results and len(results) > 0:
@@ -347,20 +600,24 @@ def retrieve_from_vector_store(
                         print(f"   This means semantic search completely missed the target chapter.")
             
             if not results:
-                return f"📚 No relevant documents found for query: '{query}'\n\nTip: Make sure documents are uploaded and indexed in the vector store."
+                return RetrievalResult.failure(
+                    query, STATUS_NO_RESULTS,
+                    f"📚 No relevant documents found for query: '{query}'\n\nTip: Make sure documents are uploaded and indexed in the vector store."
+                )
             
             # Re-rank results: boost chunks with definition keywords
             # This solves the problem where concise definitions rank lower than verbose content
             definition_keywords = ['definition', 'defined as', 'can be described as', 'refers to', 
                                    'is the', 'means', 'is a', 'describes', 'characterized by']
             
-            def calculate_relevance_boost(content: str) -> float:
+            def calculate_relevance_boost(content: str, structured: bool = False) -> float:
                 """Calculate relevance boost based on content quality indicators."""
                 content_lower = content.lower()
                 boost = 0.0
                 
                 # PRIORITY: Boost chunks from requested chapter/section (CRITICAL signal)
-                if chapter_match:
+                # Structure-indexed chunks already matched the chapter exactly in SQL
+                if chapter_match and not structured:
                     chapter_num = chapter_match.group(1)
                     # Check if this chunk is from the requested chapter
                     if re.search(rf'\b(?:chapter|ch\.?)\s*{chapter_num}\b', content_lower):
@@ -417,7 +674,7 @@ def retrieve_from_vector_store(
             # Apply re-ranking
             results_with_boost = []
             for doc in results:
-                boost = calculate_relevance_boost(doc.content)
+                boost = calculate_relevance_boost(doc.content, structured=doc.chapter_number is not None)
                 adjusted_similarity = (1 - doc.distance) + boost
                 results_with_boost.append((doc, adjusted_similarity))
             
@@ -425,48 +682,24 @@ def retrieve_from_vector_store(
             results_with_boost.sort(key=lambda x: x[1], reverse=True)
             
             # Take top results after re-ranking
-            results = [doc for doc, _ in results_with_boost[:limit]]
-            
-            # Format results for LLM synthesis (clean, minimal format)
-            # Group by document for cleaner citations
-            from collections import defaultdict
-            docs_by_name = defaultdict(list)
-            for doc in results:
-                docs_by_name[doc.document_name].append(doc.content)
-            
-            formatted_results = "Retrieved information from your documents:\n\n"
-            
-            for doc_name, contents in docs_by_name.items():
-                formatted_results += f"From: {doc_name}\n"
-                formatted_results += f"{'─' * 80}\n"
-                for content in contents:
-                    # Extract page numbers from content if present
-                    import re
-                    page_match = re.search(r'\[Page (\d+)\]', content)
-                    
-                    # Clean content (remove page markers for cleaner display)
-                    clean_content = re.sub(r'\[Page \d+\]', '', content).strip()
-                    
-                    if page_match:
-                        formatted_results += f"{clean_content} [Page {page_match.group(1)}]\n\n"
-                    else:
-                        formatted_results += f"{clean_content}\n\n"
-                
-                formatted_results += f"{'─' * 80}\n\n"
+            top_results = results_with_boost[:limit]
+            results = [doc for doc, _ in top_results]
             
             # Update retrieval stats
-            for doc in results:
-                db.execute(
-                    text("UPDATE document_vectors SET retrieval_count = retrieval_count + 1 WHERE id = :id"),
-                    {'id': doc.id}
-                )
-            db.commit()
+            if record:
+                _record_retrievals(db, results)
             
-            return formatted_results
+            return RetrievalResult(
+                query=query,
+                chunks=[RetrievedChunk.from_row(doc, score=score) for doc, score in top_results]
+            )
             
     except Exception as e:
         import traceback
-        return f"❌ Error retrieving from vector store: {str(e)}\n{traceback.format_exc()}"
+        return RetrievalResult.failure(
+            query, STATUS_ERROR,
+            f"❌ Error retrieving from vector store: {str(e)}\n{traceback.format_exc()}"
+        )
 
 
 @tool
@@ -592,7 +825,7 @@ def enhanced_web_search(
             enriched_query = f"{query} {context}"
         
         # Perform web search
-        results = web_search_tool.search(enriched_query)
+        results = _web_search.func(enriched_query)
         
         if not results or "error" in results.lower():
             return f"🔍 Web search failed or returned no results for: '{query}'"
@@ -0,0 +1,543 @@
+"""
+Async Web Search Client with hedged provider requests.
+
+Replaces the per-query client construction in web_search.py:
+- Long-lived pooled HTTP clients per provider (one httpx.AsyncClient each)
+- Hedged requests: if the primary has not answered within ``hedge_delay``,
+  the next provider is fired too and the first good answer wins
+- Immediate failover when a provider errors or returns nothing
+- Per-provider circuit breakers (utils.errors.circuit_breaker), so a
+  failing provider is skipped instead of adding its timeout to every query
+- Optional shared result cache (utils.cache.search_cache) keyed by
+  normalized query and provider, with freshness-based TTLs
+- Fake local providers with configurable latency for tail-latency benchmarks
+
+All provider calls run on one dedicated event loop thread so connection
+pools are reused by both sync callers (LangChain Tool.func) and async callers.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.errors.circuit_breaker import CircuitBreakerConfig, get_circuit_breaker
+from utils.errors.exceptions import CircuitBreakerError
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Fire the fallback provider if the primary has not answered by then (seconds)
+DEFAULT_HEDGE_DELAY = float(os.getenv("WEB_SEARCH_HEDGE_DELAY", "1.5"))
+
+# Overall deadline for one search across all providers (seconds)
+DEFAULT_SEARCH_TIMEOUT = float(os.getenv("WEB_SEARCH_TIMEOUT", "10"))
+
+# Circuit breaker settings per provider (half-open admits as many probes as
+# successes are needed to close again)
+SEARCH_BREAKER_CONFIG = CircuitBreakerConfig(
+    failure_threshold=5,
+    success_threshold=2,
+    timeout=30,
+    half_open_max_calls=2,
+)
+
+
+@dataclass
+class SearchResponse:
+    """Outcome of one (possibly hedged) search."""
+    results: List[Dict[str, Any]]
+    provider: Optional[str] = None
+    latency_ms: float = 0.0
+    hedged: bool = False
+    errors: Dict[str, str] = field(default_factory=dict)
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.results)
+
+
+# =============================================================================
+# PROVIDERS
+# =============================================================================
+
+class SearchProvider:
+    """Base class for async search providers."""
+
+    name = "provider"
+
+    async def search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search and return normalized results (title, snippet, link).
+
+        Raises on transport/API errors so the circuit breaker sees them.
+        """
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Release pooled connections."""
+
+
+class _HTTPSearchProvider(SearchProvider):
+    """Provider backed by a long-lived, pooled httpx.AsyncClient."""
+
+    def __init__(self, timeout: float = 8.0, max_connections: int = 20):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx is required for HTTP search providers")
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """Lazily create the client on the loop that first uses it."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class GoogleSearchProvider(_HTTPSearchProvider):
+    """Google Custom Search JSON API (no discovery document rebuilds)."""
+
+    name = "google"
+
+    def __init__(self, api_key: str, search_engine_id: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.search_engine_id = search_engine_id
+
+    async def search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        response = await self.client.get(
+            GOOGLE_SEARCH_URL,
+            params={
+                "key": self.api_key,
+                "cx": self.search_engine_id,
+                "q": query,
+                "num": num_results,
+            },
+        )
+        response.raise_for_status()
+        return [
+            {
+                'title': item.get('title', ''),
+                'snippet': item.get('snippet', ''),
+                'link': item.get('link', '')
+            }
+            for item in response.json().get('items', [])
+        ]
+
+
+class TavilySearchProvider(_HTTPSearchProvider):
+    """Tavily search REST API."""
+
+    name = "tavily"
+
+    def __init__(self, api_key: str, search_depth: str = "advanced", **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.search_depth = search_depth
+
+    async def search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        response = await self.client.post(
+            TAVILY_SEARCH_URL,
+            json={
+                "api_key": self.api_key,
+                "query": query,
+                "max_results": num_results,
+                "search_depth": self.search_depth,
+            },
+        )
+        response.raise_for_status()
+        return [
+            {
+                'title': r.get('title', r.get('name', 'No title')),
+                'snippet': r.get('content', r.get('snippet', 'No description')),
+                'link': r.get('url', r.get('link', 'No URL'))
+            }
+            for r in response.json().get('results', [])
+        ]
+
+
+class FakeSearchProvider(SearchProvider):
+    """
+    Local provider with a configurable latency distribution.
+
+    Used by tests and benchmarks to reproduce tail latency without network
+    access: most calls take ``latency`` (+/- ``jitter``), a ``slow_rate``
+    fraction take ``slow_latency`` and a ``failure_rate`` fraction raise.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+        failure_rate: float = 0.0,
+        empty_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.failure_rate = failure_rate
+        self.empty_rate = empty_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+        self.calls += 1
+        roll = self._random.random()
+        delay = self.slow_latency if roll < self.slow_rate else self.latency
+        if self.jitter:
+            delay = max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name}: simulated failure")
+        if self._random.random() < self.empty_rate:
+            return []
+
+        return [
+            {
+                'title': f"{self.name} result {i + 1} for {query}",
+                'snippet': f"Snippet {i + 1} from {self.name} about {query}.",
+                'link': f"https://{self.name}.example/{i + 1}"
+            }
+            for i in range(num_results)
+        ]
+
+
+# =============================================================================
+# HEDGED CLIENT
+# =============================================================================
+
+class HedgedSearchClient:
+    """
+    Query providers in priority order with hedging and circuit breakers.
+
+    With ``hedge_delay=None`` the client only fails over (next provider after
+    the previous one errors), which is the old sequential behaviour.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[SearchProvider],
+        hedge_delay: Optional[float] = DEFAULT_HEDGE_DELAY,
+        timeout: float = DEFAULT_SEARCH_TIMEOUT,
+        breaker_config: Optional[CircuitBreakerConfig] = None,
+        breaker_prefix: str = "web_search",
+        cache=None
+    ):
+        """
+        Initialize hedged search client.
+
+        Args:
+            providers: Providers in priority order
+            hedge_delay: Seconds before firing the next provider (None: no hedging)
+            timeout: Overall deadline per search
+            breaker_config: Circuit breaker configuration per provider
+            breaker_prefix: Circuit breaker name prefix
+            cache: Optional SearchResultCache shared across callers
+        """
+        if not providers:
+            raise ValueError("At least one search provider is required")
+
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.cache = cache
+        self.breakers = {
+            p.name: get_circuit_breaker(f"{breaker_prefix}:{p.name}", breaker_config or SEARCH_BREAKER_CONFIG)
+            for p in self.providers
+        }
+
+        # Stats
+        self.searches = 0
+        self.cache_hits = 0
+        self.hedges_fired = 0
+        self.failures = 0
+        self.wins: Dict[str, int] = {p.name: 0 for p in self.providers}
+        self._latencies: deque = deque(maxlen=1000)
+
+    async def _call(self, provider: SearchProvider, query: str, num_results: int):
+        """Run one provider through its breaker; never raises (except cancel)."""
+        try:
+            results = await self.breakers[provider.name].call(provider.search, query, num_results)
+            return provider.name, results, None
+        except CircuitBreakerError as e:
+            return provider.name, None, f"circuit open: {e}"
+        except Exception as e:
+            return provider.name, None, str(e) or type(e).__name__
+
+    async def search(self, query: str, num_results: int = 5) -> SearchResponse:
+        """
+        Search with hedging; returns the first non-empty result set.
+
+        Args:
+            query: Search query
+            num_results: Results per provider
+
+        Returns:
+            SearchResponse (empty ``results`` if every provider failed)
+        """
+        self.searches += 1
+        start = time.perf_counter()
+        deadline = start + self.timeout
+
+        if self.cache is not None:
+            cached = await self.cache.get(query, [p.name for p in self.providers])
+            if cached is not None:
+                self.cache_hits += 1
+                provider_name, results = cached
+                latency_ms = (time.perf_counter() - start) * 1000
+                return SearchResponse(results[:num_results], provider_name, latency_ms, cached=True)
+
+        queue = list(self.providers)
+        pending: set = set()
+        errors: Dict[str, str] = {}
+        hedged = False
+
+        def launch():
+            provider = queue.pop(0)
+            pending.add(asyncio.ensure_future(self._call(provider, query, num_results)))
+
+        launch()
+
+        try:
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    errors["timeout"] = f"no provider answered within {self.timeout}s"
+                    break
+
+                wait_for = remaining
+                if queue and self.hedge_delay is not None:
+                    wait_for = min(remaining, self.hedge_delay)
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Hedge threshold passed with no answer: fire the next provider
+                    if queue and self.hedge_delay is not None:
+                        hedged = True
+                        self.hedges_fired += 1
+                        launch()
+                    continue
+
+                for task in done:
+                    name, results, error = task.result()
+                    if results:
+                        latency_ms = (time.perf_counter() - start) * 1000
+                        self.wins[name] += 1
+                        self._latencies.append(latency_ms)
+                        if self.cache is not None:
+                            await self.cache.set(query, name, results)
+                        return SearchResponse(results, name, latency_ms, hedged, errors)
+                    errors[name] = error or "no results"
+
+                # Every finished provider failed: fail over immediately
+                if not pending and queue:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.failures += 1
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._latencies.append(latency_ms)
+        return SearchResponse([], None, latency_ms, hedged, errors)
+
+    async def aclose(self):
+        """Close all provider connection pools."""
+        for provider in self.providers:
+            await provider.aclose()
+        if self.cache is not None:
+            await self.cache.aclose()
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        """p50/p95/p99 of recent search latencies (ms)."""
+        samples = sorted(self._latencies)
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+        def pct(p: float) -> float:
+            return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+        return {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client statistics."""
+        return {
+            "providers": [p.name for p in self.providers],
+            "hedge_delay": self.hedge_delay,
+            "searches": self.searches,
+            "cache_hits": self.cache_hits,
+            "hedges_fired": self.hedges_fired,
+            "failures": self.failures,
+            "wins": dict(self.wins),
+            "latency_ms": self.latency_percentiles(),
+            "breakers": {name: b.get_state() for name, b in self.breakers.items()},
+        }
+
+
+# =============================================================================
+# BACKGROUND LOOP RUNNER
+# =============================================================================
+
+class SearchClientRunner:
+    """
+    Own a HedgedSearchClient on a dedicated event loop thread.
+
+    httpx connection pools are bound to the loop that created them, so all
+    searches are funnelled through one long-lived loop regardless of which
+    thread or loop the caller runs on.
+    """
+
+    def __init__(self, client: HedgedSearchClient):
+        self.client = client
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="web-search-loop",
+            daemon=True
+        )
+        self._thread.start()
+
+    def search(self, query: str, num_results: int = 5) -> SearchResponse:
+        """Blocking search (for sync callers / worker threads)."""
+        future = asyncio.run_coroutine_threadsafe(self.client.search(query, num_results), self._loop)
+        return future.result()
+
+    async def asearch(self, query: str, num_results: int = 5) -> SearchResponse:
+        """Non-blocking search from any event loop."""
+        future = asyncio.run_coroutine_threadsafe(self.client.search(query, num_results), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def close(self):
+        """Close provider pools and stop the loop thread."""
+        if not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.aclose(), self._loop).result(timeout=5)
+        except Exception as e:
+            print(f"⚠️  Failed to close search providers: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+def build_search_providers_from_env() -> List[SearchProvider]:
+    """
+    Build providers in priority order from environment variables.
+
+    Google (GOOGLE_SEARCH_API_KEY + GOOGLE_SEARCH_ENGINE_ID) first, then
+    Tavily (TAVILY_API_KEY).
+    """
+    providers: List[SearchProvider] = []
+
+    google_api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
+    google_search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+
+    if not HTTPX_AVAILABLE:
+        if google_api_key or tavily_api_key:
+            print("⚠️  httpx not installed - async web search client unavailable")
+        return providers
+
+    if google_api_key and google_search_engine_id:
+        providers.append(GoogleSearchProvider(google_api_key, google_search_engine_id))
+    if tavily_api_key:
+        providers.append(TavilySearchProvider(tavily_api_key))
+
+    return providers
+
+
+def _build_search_cache():
+    """Shared result cache (Redis tier when REDIS_URL is configured)."""
+    try:
+        from utils.cache.search_cache import SearchResultCache
+    except ImportError:
+        return None
+
+    redis_url = None
+    try:
+        from config.settings import settings
+        redis_url = settings.redis_url
+    except Exception:
+        pass
+
+    return SearchResultCache(redis_url=redis_url)
+
+
+# Global search client runner
+_search_runner: Optional[SearchClientRunner] = None
+_search_runner_lock = threading.Lock()
+
+
+def get_search_client() -> Optional[SearchClientRunner]:
+    """Get or create the global search client (None if no provider is configured)."""
+    global _search_runner
+    if _search_runner is None:
+        with _search_runner_lock:
+            if _search_runner is None:
+                providers = build_search_providers_from_env()
+                if not providers:
+                    return None
+                _search_runner = SearchClientRunner(
+                    HedgedSearchClient(providers, cache=_build_search_cache())
+                )
+    return _search_runner
+
+
+def close_search_client():
+    """Close the global search client (called on shutdown)."""
+    global _search_runner
+    if _search_runner is not None:
+        _search_runner.close()
+        _search_runner = None
+
+
+__all__ = [
+    'SearchResponse',
+    'SearchProvider',
+    'GoogleSearchProvider',
+    'TavilySearchProvider',
+    'FakeSearchProvider',
+    'HedgedSearchClient',
+    'SearchClientRunner',
+    'build_search_providers_from_env',
+    'get_search_client',
+    'close_search_client',
+]
@@ -1,11 +1,14 @@
 """
-Web Search Tool using LangChain with fallback architecture.
+Web Search Tool with hedged provider requests.
 
 Search Strategy:
 1. Google Custom Search (Primary) - Comprehensive and reliable search results
 2. Tavily Search (Fallback) - AI-optimized search as backup
 
-Built on LangChain's RunnableWithFallbacks for clean, maintainable fallback logic.
+Searches go through the async client in search_client.py: pooled HTTP
+connections per provider, hedged requests (Tavily is fired if Google is slow,
+first good answer wins) and per-provider circuit breakers. Without httpx the
+tool falls back to a LangChain RunnableWithFallbacks chain built once.
 
 Enhanced Features:
 - HTML entity decoding (&amp; -> &)
@@ -15,6 +18,7 @@ Enhanced Features:
 """
 
 import os
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 from langchain.tools import Tool
 from langchain_core.runnables import RunnableLambda
@@ -96,6 +100,24 @@ def format_search_results(results: List[Dict[str, Any]], enable_spam_filter: boo
     return "\n\n".join(formatted)
 
 
+@lru_cache(maxsize=4)
+def _get_google_service(api_key: str):
+    """Build the Custom Search discovery client once per API key."""
+    from googleapiclient.discovery import build
+    return build("customsearch", "v1", developerKey=api_key, cache_discovery=False)
+
+
+@lru_cache(maxsize=8)
+def _get_tavily_tool(api_key: str, num_results: int):
+    """Create the Tavily LangChain tool once per key/result count."""
+    from langchain_community.tools.tavily_search import TavilySearchResults
+    return TavilySearchResults(
+        max_results=num_results,
+        api_key=api_key,
+        search_depth="advanced"  # Use advanced search for better quality
+    )
+
+
 def google_custom_search(query: str, api_key: str, search_engine_id: str, num_results: int = 5) -> Optional[List[Dict]]:
     """
     Perform Google Custom Search.
@@ -110,9 +132,7 @@ def google_custom_search(query: str, api_key: str, search_engine_id: str, num_re
         List of search results or None if error
     """
     try:
-        from googleapiclient.discovery import build
-        
-        service = build("customsearch", "v1", developerKey=api_key)
+        service = _get_google_service(api_key)
         result = service.cse().list(
             q=query,
             cx=search_engine_id,
@@ -150,13 +170,7 @@ def tavily_search(query: str, api_key: str, num_results: int = 5) -> Optional[Li
         List of search results or None if error
     """
     try:
-        from langchain_community.tools.tavily_search import TavilySearchResults
-        
-        tavily = TavilySearchResults(
-            max_results=num_results,
-            api_key=api_key,
-            search_depth="advanced"  # Use advanced search for better quality
-        )
+        tavily = _get_tavily_tool(api_key, num_results)
         
         # Use invoke() method for modern LangChain compatibility
         results = tavily.invoke({"query": query})
@@ -177,15 +191,59 @@ def tavily_search(query: str, api_key: str, num_results: int = 5) -> Optional[Li
         return None
 
 
+def _build_fallback_chain(
+    google_api_key: Optional[str],
+    google_search_engine_id: Optional[str],
+    tavily_api_key: Optional[str]
+):
+    """
+    Build the sequential LangChain fallback chain (used when httpx is missing).
+    
+    Built once at tool creation instead of per query.
+    """
+    search_chain = None
+    
+    if google_api_key and google_search_engine_id:
+        def google_runnable(q: str) -> str:
+            print("🔍 Searching with Google Custom Search (Primary)...")
+            results = google_custom_search(q, google_api_key, google_search_engine_id, num_results=5)
+            if not results:
+                raise ValueError("Google search returned no results")
+            print("✅ Google search successful")
+            return format_search_results(results)
+        
+        search_chain = RunnableLambda(google_runnable)
+    
+    if tavily_api_key:
+        def tavily_runnable(q: str) -> str:
+            print("🔍 Searching with Tavily Search...")
+            results = tavily_search(q, tavily_api_key, num_results=5)
+            if not results:
+                raise ValueError("Tavily search returned no results")
+            print("✅ Tavily search successful")
+            return format_search_results(results)
+        
+        if search_chain is None:
+            search_chain = RunnableLambda(tavily_runnable)
+        else:
+            search_chain = search_chain.with_fallbacks([RunnableLambda(tavily_runnable)])
+    
+    return search_chain
+
+
+NO_RESULTS_MESSAGE = "No search results found. Please try a different query or check your API keys."
+
+
 def get_web_search_tool() -> Optional[Tool]:
     """
-    Create web search tool using LangChain with fallback architecture.
+    Create web search tool with hedged, circuit-broken provider requests.
     
     Architecture:
     1. Primary: Google Custom Search (comprehensive, reliable results)
-    2. Fallback: Tavily Search (AI-optimized backup)
+    2. Fallback: Tavily Search (fired on error, or hedged when Google is slow)
     
-    Uses LangChain's RunnableWithFallbacks for clean fallback logic.
+    The tool exposes both a sync ``func`` and an async ``coroutine``; both
+    share the long-lived client from search_client.get_search_client().
     
     Note: Context-aware reformulation is handled at the node level before
     invoking this tool.
@@ -205,63 +263,44 @@ def get_web_search_tool() -> Optional[Tool]:
         print("⚠️  No search providers configured. Set GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_ENGINE_ID, or TAVILY_API_KEY")
         return None
     
-    def search_with_langchain(query: str) -> str:
-        """
-        LangChain-based search with fallback.
+    from .search_client import get_search_client
+    client = get_search_client()
+    
+    if client is not None:
+        def _format_response(response) -> str:
+            if not response.ok:
+                print(f"❌ All search providers failed: {response.errors}")
+                return NO_RESULTS_MESSAGE
+            hedge_note = " (cached)" if response.cached else (" (hedged)" if response.hedged else "")
+            print(f"✅ {response.provider} search successful in {response.latency_ms:.0f}ms{hedge_note}")
+            return format_search_results(response.results)
         
-        Uses LCEL (LangChain Expression Language) with RunnableWithFallbacks
-        for clean, maintainable fallback logic.
+        def search_web(query: str) -> str:
+            """Hedged search (blocking; safe from worker threads)."""
+            return _format_response(client.search(query))
         
-        Note: Context-aware reformulation is handled at the node level before
-        calling this function.
-        """
-        # Create LangChain runnables for each search provider
-        search_chain = None
+        async def asearch_web(query: str) -> str:
+            """Hedged search (non-blocking)."""
+            return _format_response(await client.asearch(query))
         
-        if has_google:
-            # Primary: Google Custom Search
-            def google_runnable(q: str) -> str:
-                print("🔍 Searching with Google Custom Search (Primary)...")
-                results = google_custom_search(q, google_api_key, google_search_engine_id, num_results=5)
-                if not results:
-                    raise ValueError("Google search returned no results")
-                print("✅ Google search successful")
-                return format_search_results(results)
-            
-            search_chain = RunnableLambda(google_runnable)
-            
-            # Add Tavily as fallback if available
-            if has_tavily:
-                def tavily_runnable(q: str) -> str:
-                    print("🔍 Falling back to Tavily Search...")
-                    results = tavily_search(q, tavily_api_key, num_results=5)
-                    if not results:
-                        raise ValueError("Tavily search returned no results")
-                    print("✅ Tavily search successful (fallback)")
-                    return format_search_results(results)
-                
-                # Add fallback using LangChain's with_fallbacks
-                search_chain = search_chain.with_fallbacks([RunnableLambda(tavily_runnable)])
+        engine_msg = "async client with hedged requests and circuit breakers"
+    else:
+        search_chain = _build_fallback_chain(
+            google_api_key if has_google else None,
+            google_search_engine_id if has_google else None,
+            tavily_api_key if has_tavily else None
+        )
         
-        elif has_tavily:
-            # Only Tavily available (no fallback needed)
-            def tavily_runnable(q: str) -> str:
-                print("🔍 Searching with Tavily Search...")
-                results = tavily_search(q, tavily_api_key, num_results=5)
-                if not results:
-                    raise ValueError("Tavily search returned no results")
-                print("✅ Tavily search successful")
-                return format_search_results(results)
-            
-            search_chain = RunnableLambda(tavily_runnable)
+        def search_web(query: str) -> str:
+            """Sequential LangChain fallback search."""
+            try:
+                return search_chain.invoke(query)
+            except Exception as e:
+                print(f"❌ All search providers failed: {e}")
+                return NO_RESULTS_MESSAGE
         
-        # Execute the search chain
-        try:
-            return search_chain.invoke(query)
-        except Exception as e:
-            error_msg = str(e)
-            print(f"❌ All search providers failed: {error_msg}")
-            return "No search results found. Please try a different query or check your API keys."
+        asearch_web = None
+        engine_msg = "LangChain RunnableWithFallbacks (sequential)"
     
     # Show which providers are configured
     if has_google and has_tavily:
@@ -272,20 +311,19 @@ def get_web_search_tool() -> Optional[Tool]:
         config_msg = "Tavily only"
     
     print(f"🌐 Web search configured: {config_msg}")
-    print(f"🔗 Built on LangChain's RunnableWithFallbacks for clean fallback logic")
+    print(f"🔗 Search engine: {engine_msg}")
     if TEXT_CLEANING_AVAILABLE:
         print(f"🧹 Enhanced text cleaning enabled (HTML entities, Unicode, whitespace)")
     
     return Tool(
         name="Web_Search",
-        func=search_with_langchain,
-        description="""Use this tool for real-time web searches using LangChain.
+        func=search_web,
+        coroutine=asearch_web,
+        description="""Use this tool for real-time web searches.
 
 Search Strategy:
 - Primary: Google Custom Search (comprehensive, reliable results)
-- Fallback: Tavily (AI-optimized backup)
-
-Built on LangChain's RunnableWithFallbacks for automatic failover.
+- Fallback: Tavily (AI-optimized backup, also fired if the primary is slow)
 
 Good for:
 - Current events, news, or recent happenings
@@ -32,6 +32,7 @@ from .core import (
     GRADING_UNCERTAINTY_INDICATORS,
 )
 from .core.llm import initialize_llm, initialize_grading_llm
+from .core.llm_gateway import LLMGateway, get_llm_gateway, llm_context, LANE_INTERACTIVE, LANE_BATCH
 from .core.advanced_cache import MultiTierCache, get_cache, async_cached
 
 # =============================================================================
@@ -184,6 +185,11 @@ __all__ = [
     'REALTIME_QUERY_PATTERNS',
     'GRADING_ERROR_INDICATORS',
     'GRADING_UNCERTAINTY_INDICATORS',
+    'LLMGateway',
+    'get_llm_gateway',
+    'llm_context',
+    'LANE_INTERACTIVE',
+    'LANE_BATCH',
     'fast_intent_classification',
     'calculate_text_similarity',
     'PerformanceMonitor',
@@ -6,9 +6,12 @@ Supports both async generators and Server-Sent Events (SSE).
 """
 
 import asyncio
+import time
 from typing import AsyncGenerator, Optional, Any, Dict
 from datetime import datetime
 
+from utils.monitoring.stage_timing import record_stage, STAGE_LLM_FIRST_TOKEN, STAGE_LLM_TOTAL
+
 
 class StreamingResponse:
     """
@@ -64,11 +67,21 @@ async def stream_llm_response(llm: Any, messages: list) -> AsyncGenerator[str, N
     Yields:
         Response chunks
     """
+    started = time.perf_counter()
+    first_token = True
+    
+    def mark_first_token():
+        nonlocal first_token
+        if first_token:
+            first_token = False
+            record_stage(STAGE_LLM_FIRST_TOKEN, time.perf_counter() - started, started)
+    
     try:
         # Check if LLM supports streaming
         if hasattr(llm, 'astream'):
             # Use async streaming if available
             async for chunk in llm.astream(messages):
+                mark_first_token()
                 if hasattr(chunk, 'content'):
                     yield chunk.content
                 else:
@@ -76,6 +89,7 @@ async def stream_llm_response(llm: Any, messages: list) -> AsyncGenerator[str, N
         elif hasattr(llm, 'stream'):
             # Use sync streaming with async wrapper
             for chunk in llm.stream(messages):
+                mark_first_token()
                 if hasattr(chunk, 'content'):
                     yield chunk.content
                 else:
@@ -85,6 +99,7 @@ async def stream_llm_response(llm: Any, messages: list) -> AsyncGenerator[str, N
         else:
             # Fallback: no streaming, return full response
             response = await asyncio.to_thread(llm.invoke, messages)
+            mark_first_token()
             if hasattr(response, 'content'):
                 yield response.content
             else:
@@ -92,6 +107,8 @@ async def stream_llm_response(llm: Any, messages: list) -> AsyncGenerator[str, N
     
     except Exception as e:
         yield f"\n\n[Streaming error: {str(e)}]"
+    finally:
+        record_stage(STAGE_LLM_TOTAL, time.perf_counter() - started, started)
 
 
 def format_sse_message(data: str, event: Optional[str] = None) -> str:
@@ -3,6 +3,7 @@
 try:
     from utils.core.advanced_cache import (
         MultiTierCache,
+        GLOBAL_NAMESPACE,
         get_cache,
         async_cached
     )
@@ -22,8 +23,22 @@ try:
 except ImportError:
     CACHE_STRATEGIES_AVAILABLE = False
 
+try:
+    from .search_cache import TTLLRUCache, SearchResultCache
+    SEARCH_CACHE_AVAILABLE = True
+except ImportError:
+    SEARCH_CACHE_AVAILABLE = False
+
+try:
+    from .llm_cache import LLMCompletionCache, get_llm_cache, completion_cache
+    LLM_CACHE_AVAILABLE = True
+except ImportError:
+    LLM_CACHE_AVAILABLE = False
+
 # Import basic cache that should always be available
 from utils.core.cache import ResultCache
+from .heavy_hitters import DecayingSpaceSaving, HeavyHitter
+from .prefetch_model import SequenceModel, PrefetchBudget
 
 # Import redis client for token storage
 try:
@@ -35,16 +50,23 @@ except ImportError:
 
 __all__ = [
     "ResultCache",
+    "DecayingSpaceSaving",
+    "HeavyHitter",
+    "SequenceModel",
+    "PrefetchBudget",
     "token_store",
     "ADVANCED_CACHE_AVAILABLE",
     "CACHE_STRATEGIES_AVAILABLE",
     "REDIS_AVAILABLE",
+    "SEARCH_CACHE_AVAILABLE",
+    "LLM_CACHE_AVAILABLE",
 ]
 
 # Add advanced cache exports if available
 if ADVANCED_CACHE_AVAILABLE:
     __all__.extend([
         "MultiTierCache",
+        "GLOBAL_NAMESPACE",
         "get_cache",
         "async_cached",
     ])
@@ -59,4 +81,17 @@ if CACHE_STRATEGIES_AVAILABLE:
         "get_cache_optimizer",
     ])
 
+# Add search cache exports if available
+if SEARCH_CACHE_AVAILABLE:
+    __all__.extend([
+        "TTLLRUCache",
+        "SearchResultCache",
+    ])
 
+# Add LLM completion cache exports if available
+if LLM_CACHE_AVAILABLE:
+    __all__.extend([
+        "LLMCompletionCache",
+        "get_llm_cache",
+        "completion_cache",
+    ])
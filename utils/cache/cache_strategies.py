@@ -5,13 +5,23 @@ Includes cache warming, invalidation patterns, and smart prefetching.
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional, Callable, Set
+import time
+from typing import Any, Dict, List, Optional, Callable, Sequence, Set
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import hashlib
 import json
 
 from utils.core.advanced_cache import MultiTierCache
+from utils.core.constants import (
+    CACHE_WARMER_MAX_TRACKED_KEYS,
+    CACHE_WARMER_DECAY_HALF_LIFE,
+    PREFETCH_MIN_PROBABILITY,
+    PREFETCH_BUDGET_PER_MINUTE,
+    PREFETCH_MAX_ENTRIES,
+)
+from utils.cache.heavy_hitters import DecayingSpaceSaving
+from utils.cache.prefetch_model import SequenceModel, PrefetchBudget
 from utils.monitoring import get_logger
 from config import settings
 
@@ -27,12 +37,17 @@ class CacheWarmer:
     - Background refresh before expiry
     - Batch warming from database
     - Statistics tracking
+    
+    Access patterns are tracked in a bounded, time-decayed heavy-hitter
+    sketch, so memory stays fixed however many distinct keys are seen.
     """
     
     def __init__(
         self,
         cache: MultiTierCache,
-        warm_interval: int = 300  # 5 minutes
+        warm_interval: int = 300,  # 5 minutes
+        max_tracked_keys: int = CACHE_WARMER_MAX_TRACKED_KEYS,
+        decay_half_life: Optional[float] = CACHE_WARMER_DECAY_HALF_LIFE
     ):
         """
         Initialize cache warmer.
@@ -40,14 +55,18 @@ class CacheWarmer:
         Args:
             cache: Cache instance to warm
             warm_interval: Interval between warming cycles (seconds)
+            max_tracked_keys: Keys tracked for popularity (bounds memory)
+            decay_half_life: Seconds for access counts to halve (None disables decay)
         """
         self.cache = cache
         self.warm_interval = warm_interval
         self.warming_task: Optional[asyncio.Task] = None
         
         # Track access patterns
-        self.access_counts: Dict[str, int] = defaultdict(int)
-        self.last_access: Dict[str, datetime] = {}
+        self.access_tracker = DecayingSpaceSaving(
+            capacity=max_tracked_keys,
+            half_life=decay_half_life
+        )
         
         # Warming stats
         self.total_warmed = 0
@@ -55,39 +74,31 @@ class CacheWarmer:
     
     def track_access(self, key: str):
         """Track cache access for warming decisions."""
-        self.access_counts[key] += 1
-        self.last_access[key] = datetime.utcnow()
+        self.access_tracker.add(key)
     
     def get_frequently_accessed(
         self,
         min_accesses: int = 5,
-        time_window: int = 3600  # 1 hour
+        time_window: int = 3600,  # 1 hour
+        limit: Optional[int] = None
     ) -> List[str]:
         """
         Get frequently accessed keys within time window.
         
         Args:
-            min_accesses: Minimum access count
-            time_window: Time window in seconds
+            min_accesses: Minimum (decayed) access count
+            time_window: Only keys accessed within this many seconds
+            limit: Maximum keys to return
             
         Returns:
-            List of frequently accessed keys
+            List of frequently accessed keys (most accessed first)
         """
-        cutoff_time = datetime.utcnow() - timedelta(seconds=time_window)
-        
-        frequent_keys = [
-            key for key, count in self.access_counts.items()
-            if count >= min_accesses
-            and self.last_access.get(key, datetime.min) > cutoff_time
-        ]
-        
-        # Sort by access count (descending)
-        frequent_keys.sort(
-            key=lambda k: self.access_counts[k],
-            reverse=True
+        hitters = self.access_tracker.top(
+            k=limit,
+            min_count=min_accesses,
+            since=time.time() - time_window
         )
-        
-        return frequent_keys
+        return [hitter.key for hitter in hitters]
     
     async def warm_keys(
         self,
@@ -109,7 +120,7 @@ class CacheWarmer:
         for key in keys:
             try:
                 # Check if already cached
-                cached = await self.cache.get(key)
+                cached = await self.cache.get(key, namespaces=namespaces)
                 if cached is not None:
                     continue
                 
@@ -146,7 +157,7 @@ class CacheWarmer:
         Returns:
             Number of keys warmed
         """
-        frequent_keys = self.get_frequently_accessed()[:max_keys]
+        frequent_keys = self.get_frequently_accessed(limit=max_keys)
         return await self.warm_keys(frequent_keys, data_loader)
     
     async def start_background_warming(
@@ -190,15 +201,13 @@ class CacheWarmer:
                 if self.last_warm_time 
                 else None
             ),
-            "tracked_keys": len(self.access_counts),
+            "tracked_keys": len(self.access_tracker),
+            "max_tracked_keys": self.access_tracker.capacity,
             "warming_interval_seconds": self.warm_interval,
-            "top_accessed_keys": dict(
-                sorted(
-                    self.access_counts.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:10]
-            ),
+            "top_accessed_keys": {
+                hitter.key: round(hitter.count, 2)
+                for hitter in self.access_tracker.top(k=10)
+            },
         }
 
 
@@ -206,6 +215,11 @@ class CacheInvalidator:
     """
     Smart cache invalidation patterns.
     
+    Tags and patterns are cache namespaces (``tag:<tag>``, ``pattern:<pattern>``):
+    entries are stored under them, and invalidating one bumps its generation,
+    which orphans every dependent entry in O(1) instead of deleting keys one
+    at a time. Orphaned Redis entries are reclaimed by a background SCAN.
+    
     Features:
     - Pattern-based invalidation
     - Tag-based invalidation
@@ -217,43 +231,48 @@ class CacheInvalidator:
         """Initialize cache invalidator."""
         self.cache = cache
         
-        # Track key patterns and tags
-        self.key_patterns: Dict[str, Set[str]] = defaultdict(set)
-        self.key_tags: Dict[str, Set[str]] = defaultdict(set)
-        
         # Invalidation stats
         self.invalidations = 0
-        self.keys_invalidated = 0
+        self.namespaces_invalidated = 0
     
-    def register_pattern(self, pattern: str, key: str):
-        """Register key with pattern for pattern-based invalidation."""
-        self.key_patterns[pattern].add(key)
+    @staticmethod
+    def namespaces_for(
+        tags: Sequence[str] = (),
+        pattern: Optional[str] = None
+    ) -> List[str]:
+        """
+        Cache namespaces for invalidation tags and pattern.
+        
+        Args:
+            tags: Tags the entry depends on
+            pattern: Pattern the entry belongs to
+            
+        Returns:
+            Namespaces to store (and invalidate) the entry under
+        """
+        namespaces = [f"tag:{tag}" for tag in tags]
+        if pattern:
+            namespaces.append(f"pattern:{pattern}")
+        return namespaces
     
-    def tag_key(self, key: str, *tags: str):
-        """Tag key for tag-based invalidation."""
-        for tag in tags:
-            self.key_tags[tag].add(key)
+    async def _invalidate(self, namespaces: List[str]) -> int:
+        await self.cache.invalidate_namespace(*namespaces)
+        self.invalidations += 1
+        self.namespaces_invalidated += len(namespaces)
+        return len(namespaces)
     
     async def invalidate_pattern(self, pattern: str) -> int:
         """
-        Invalidate all keys matching pattern.
+        Invalidate all keys stored under a pattern.
         
         Args:
-            pattern: Pattern to match
+            pattern: Pattern to invalidate
             
         Returns:
-            Number of keys invalidated
+            Number of namespaces invalidated
         """
-        keys_to_invalidate = self.key_patterns.get(pattern, set())
-        
-        for key in keys_to_invalidate:
-            await self.cache.delete(key)
-        
-        count = len(keys_to_invalidate)
-        self.invalidations += 1
-        self.keys_invalidated += count
-        
-        logger.info(f"Invalidated {count} keys for pattern: {pattern}")
+        count = await self._invalidate(self.namespaces_for(pattern=pattern))
+        logger.info(f"Invalidated pattern: {pattern}")
         return count
     
     async def invalidate_tags(self, *tags: str) -> int:
@@ -264,21 +283,10 @@ class CacheInvalidator:
             *tags: Tags to invalidate
             
         Returns:
-            Number of keys invalidated
+            Number of namespaces invalidated
         """
-        keys_to_invalidate = set()
-        
-        for tag in tags:
-            keys_to_invalidate.update(self.key_tags.get(tag, set()))
-        
-        for key in keys_to_invalidate:
-            await self.cache.delete(key)
-        
-        count = len(keys_to_invalidate)
-        self.invalidations += 1
-        self.keys_invalidated += count
-        
-        logger.info(f"Invalidated {count} keys for tags: {tags}")
+        count = await self._invalidate(self.namespaces_for(tags))
+        logger.info(f"Invalidated tags: {tags}")
         return count
     
     async def invalidate_old_entries(
@@ -305,9 +313,7 @@ class CacheInvalidator:
         """Get invalidation statistics."""
         return {
             "total_invalidations": self.invalidations,
-            "total_keys_invalidated": self.keys_invalidated,
-            "tracked_patterns": len(self.key_patterns),
-            "tracked_tags": len(self.key_tags),
+            "total_namespaces_invalidated": self.namespaces_invalidated,
         }
 
 
@@ -316,34 +322,76 @@ class SmartPrefetcher:
     Intelligent cache prefetching based on access patterns.
     
     Features:
-    - Predict next queries based on patterns
-    - Prefetch related data
-    - Batch prefetching
+    - Predict next keys from per-session access sequences (bounded Markov model)
+    - Prefetch likely next keys within a per-minute budget
+    - Measured prefetch hit rate
     """
     
-    def __init__(self, cache: MultiTierCache):
-        """Initialize smart prefetcher."""
+    def __init__(
+        self,
+        cache: MultiTierCache,
+        min_probability: float = PREFETCH_MIN_PROBABILITY,
+        budget_per_minute: float = PREFETCH_BUDGET_PER_MINUTE,
+        max_outstanding: int = PREFETCH_MAX_ENTRIES
+    ):
+        """
+        Initialize smart prefetcher.
+        
+        Args:
+            cache: Cache instance to prefetch into
+            min_probability: Only prefetch keys at least this likely to be next
+            budget_per_minute: Maximum prefetch loads per minute
+            max_outstanding: Prefetched-but-unused keys tracked for hit rate
+        """
         self.cache = cache
+        self.min_probability = min_probability
+        self.max_outstanding = max_outstanding
         
-        # Track access sequences
-        self.access_sequences: List[List[str]] = []
-        self.sequence_patterns: Dict[str, List[str]] = defaultdict(list)
+        # Learned access sequences
+        self.model = SequenceModel()
+        self.budget = PrefetchBudget(budget_per_minute)
+        
+        # Prefetched keys not yet accessed (oldest dropped as wasted)
+        self._outstanding: "OrderedDict[str, None]" = OrderedDict()
         
         # Prefetch stats
         self.prefetches = 0
         self.prefetch_hits = 0
+        self.wasted_prefetches = 0
+        self.budget_skips = 0
     
     def record_access(self, key: str, session_id: str = "default"):
         """Record access for pattern learning."""
-        # Find or create session sequence
-        # This is a simplified version
-        pass
+        if key in self._outstanding:
+            del self._outstanding[key]
+            self.track_prefetch_hit()
+        
+        self.model.observe(session_id, key)
+    
+    def predict_next(self, key: str, max_keys: int = 5) -> List[str]:
+        """
+        Keys likely to be accessed after ``key``.
+        
+        Args:
+            key: Current key
+            max_keys: Maximum predictions
+            
+        Returns:
+            Keys, most likely first
+        """
+        return [
+            next_key for next_key, _ in self.model.predict(
+                key, k=max_keys, min_probability=self.min_probability
+            )
+            if next_key != key
+        ]
     
     async def prefetch_related(
         self,
         key: str,
         data_loader: Callable[[str], Any],
-        max_prefetch: int = 5
+        max_prefetch: int = 5,
+        namespaces: Sequence[str] = ()
     ) -> int:
         """
         Prefetch related keys based on patterns.
@@ -352,20 +400,25 @@ class SmartPrefetcher:
             key: Current key
             data_loader: Function to load data
             max_prefetch: Maximum keys to prefetch
+            namespaces: Cache namespaces of the prefetched entries
             
         Returns:
             Number of keys prefetched
         """
         # Get predicted next keys
-        predicted_keys = self.sequence_patterns.get(key, [])[:max_prefetch]
+        predicted_keys = self.predict_next(key, max_prefetch)
         
         prefetched = 0
         for next_key in predicted_keys:
             # Check if already cached
-            cached = await self.cache.get(next_key)
+            cached = await self.cache.get(next_key, namespaces=namespaces)
             if cached is not None:
                 continue
             
+            if not self.budget.try_acquire():
+                self.budget_skips += 1
+                break
+            
             try:
                 # Load and cache data
                 if asyncio.iscoroutinefunction(data_loader):
@@ -373,19 +426,27 @@ class SmartPrefetcher:
                 else:
                     data = data_loader(next_key)
                 
-                await self.cache.set(next_key, data)
+                await self.cache.set(next_key, data, namespaces=namespaces)
+                self._mark_prefetched(next_key)
                 prefetched += 1
                 
             except Exception as e:
                 logger.error(f"Error prefetching {next_key}: {e}")
         
-        self.prefetches += 1
+        self.prefetches += prefetched
         
         if prefetched > 0:
             logger.debug(f"Prefetched {prefetched} related keys for {key}")
         
         return prefetched
     
+    def _mark_prefetched(self, key: str):
+        self._outstanding[key] = None
+        self._outstanding.move_to_end(key)
+        if len(self._outstanding) > self.max_outstanding:
+            self._outstanding.popitem(last=False)
+            self.wasted_prefetches += 1
+    
     def track_prefetch_hit(self):
         """Track when prefetched data is used."""
         self.prefetch_hits += 1
@@ -402,7 +463,10 @@ class SmartPrefetcher:
             "total_prefetches": self.prefetches,
             "prefetch_hits": self.prefetch_hits,
             "prefetch_hit_rate_percent": round(hit_rate, 2),
-            "learned_patterns": len(self.sequence_patterns),
+            "wasted_prefetches": self.wasted_prefetches,
+            "budget_skips": self.budget_skips,
+            "learned_patterns": len(self.model),
+            **self.model.get_stats(),
         }
 
 
@@ -443,7 +507,10 @@ class CacheOptimizer:
         self,
         key: str,
         data_loader: Callable[[str], Any],
-        prefetch: bool = True
+        prefetch: bool = True,
+        session_id: str = "default",
+        tags: Sequence[str] = (),
+        pattern: Optional[str] = None
     ) -> Any:
         """
         Get from cache with optimization strategies.
@@ -452,34 +519,43 @@ class CacheOptimizer:
             key: Cache key
             data_loader: Function to load data on miss
             prefetch: Enable prefetching
+            session_id: Session the access belongs to (for sequence learning)
+            tags: Tags whose invalidation drops the entry
+            pattern: Pattern whose invalidation drops the entry
             
         Returns:
             Cached or loaded data
         """
+        namespaces = self.invalidator.namespaces_for(tags, pattern)
+        
         # Track access for warming
         if self.warmer:
             self.warmer.track_access(key)
         
+        # Learn access sequences
+        if self.prefetcher:
+            self.prefetcher.record_access(key, session_id)
+        
         # Get from cache
-        cached = await self.cache.get(key)
-        
-        if cached is not None:
-            # Prefetch related if enabled
-            if prefetch and self.prefetcher:
-                asyncio.create_task(
-                    self.prefetcher.prefetch_related(key, data_loader)
-                )
+        cached = await self.cache.get(key, namespaces=namespaces)
+        
+        if cached is None:
+            # Load data on miss
+            if asyncio.iscoroutinefunction(data_loader):
+                data = await data_loader(key)
+            else:
+                data = data_loader(key)
             
-            return cached
-        
-        # Load data on miss
-        if asyncio.iscoroutinefunction(data_loader):
-            data = await data_loader(key)
+            # Cache the result
+            await self.cache.set(key, data, namespaces=namespaces)
         else:
-            data = data_loader(key)
+            data = cached
         
-        # Cache the result
-        await self.cache.set(key, data)
+        # Prefetch likely next keys in the background
+        if prefetch and self.prefetcher:
+            asyncio.create_task(
+                self.prefetcher.prefetch_related(key, data_loader, namespaces=namespaces)
+            )
         
         return data
     
@@ -499,16 +575,8 @@ class CacheOptimizer:
             *tags: Tags for invalidation
             pattern: Pattern for invalidation
         """
-        # Tag key
-        if tags:
-            self.invalidator.tag_key(key, *tags)
-        
-        # Register pattern
-        if pattern:
-            self.invalidator.register_pattern(pattern, key)
-        
-        # Cache value
-        await self.cache.set(key, value)
+        namespaces = self.invalidator.namespaces_for(tags, pattern)
+        await self.cache.set(key, value, namespaces=namespaces)
     
     async def invalidate(
         self,
@@ -523,7 +591,7 @@ class CacheOptimizer:
             tags: Tags to invalidate
             
         Returns:
-            Number of keys invalidated
+            Number of namespaces invalidated
         """
         total = 0
         
@@ -0,0 +1,214 @@
+"""
+Bounded heavy-hitter tracking for cache warming.
+
+Space-Saving keeps at most ``capacity`` counters. A key that is not tracked
+takes over the smallest counter and inherits its count as an error bound, so
+memory is fixed regardless of key cardinality and every key accessed more
+than ``total / capacity`` times is guaranteed to be tracked.
+
+Counts decay exponentially with a half-life using forward decay: an access
+at time t adds ``2 ** ((t - landmark) / half_life)``, so counters never need
+to be touched as time passes. When weights grow large the landmark moves
+forward and all counters are rescaled once.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.core.constants import (
+    CACHE_WARMER_MAX_TRACKED_KEYS,
+    CACHE_WARMER_DECAY_HALF_LIFE,
+)
+
+
+# Rescale once weights reach 2**64 (far below float overflow)
+_RESCALE_EXPONENT = 64
+
+# Rebuild the lazily-invalidated heap when it outgrows the counters by this factor
+_HEAP_SLACK = 4
+
+
+@dataclass
+class HeavyHitter:
+    """A tracked key with its decayed count."""
+    key: str
+    count: float  # Estimated decayed count (never underestimates)
+    error: float  # Maximum overestimate inherited from an evicted key
+    last_seen: float  # Unix timestamp of the latest access
+
+    @property
+    def guaranteed_count(self) -> float:
+        """Lower bound on the true decayed count."""
+        return self.count - self.error
+
+
+class DecayingSpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch with exponential time decay.
+
+    Updates are O(log capacity); memory is O(capacity).
+    """
+
+    def __init__(
+        self,
+        capacity: int = CACHE_WARMER_MAX_TRACKED_KEYS,
+        half_life: Optional[float] = CACHE_WARMER_DECAY_HALF_LIFE,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the sketch.
+
+        Args:
+            capacity: Maximum number of tracked keys
+            half_life: Seconds for a count to halve (None disables decay)
+            clock: Time source (seconds)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.half_life = half_life
+        self._clock = clock
+        self._landmark = clock()
+
+        # key -> [count, error, last_seen]; counts are scaled to the landmark
+        self._counters: Dict[str, List[float]] = {}
+        # (count, key) min-heap; entries whose count is stale are skipped
+        self._heap: List[Tuple[float, str]] = []
+
+        self.total = 0.0
+        self.updates = 0
+        self.evictions = 0
+
+    def _scale(self, now: float) -> float:
+        """Weight of an access at ``now`` relative to the landmark."""
+        if not self.half_life:
+            return 1.0
+        exponent = (now - self._landmark) / self.half_life
+        if exponent > _RESCALE_EXPONENT:
+            self._rescale(2.0 ** exponent)
+            self._landmark = now
+            return 1.0
+        return 2.0 ** exponent
+
+    def _rescale(self, factor: float):
+        for counter in self._counters.values():
+            counter[0] /= factor
+            counter[1] /= factor
+        self.total /= factor
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(counter[0], key) for key, counter in self._counters.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[float, str]:
+        """Pop the smallest live counter (stale heap entries are discarded)."""
+        while True:
+            count, key = heapq.heappop(self._heap)
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == count:
+                return count, key
+
+    def add(self, key: str, count: float = 1.0, now: Optional[float] = None):
+        """
+        Record accesses to a key.
+
+        Args:
+            key: Accessed key
+            count: Number of accesses
+            now: Access time (default: clock())
+        """
+        now = self._clock() if now is None else now
+        weight = count * self._scale(now)
+
+        counter = self._counters.get(key)
+        if counter is None:
+            if len(self._counters) < self.capacity:
+                counter = [0.0, 0.0, now]
+            else:
+                # Take over the smallest counter
+                min_count, min_key = self._pop_min()
+                del self._counters[min_key]
+                counter = [min_count, min_count, now]
+                self.evictions += 1
+            self._counters[key] = counter
+
+        counter[0] += weight
+        counter[2] = now
+        self.total += weight
+        self.updates += 1
+
+        heapq.heappush(self._heap, (counter[0], key))
+        if len(self._heap) > _HEAP_SLACK * self.capacity:
+            self._rebuild_heap()
+
+    def estimate(self, key: str, now: Optional[float] = None) -> float:
+        """Decayed count estimate for a key (0 if untracked)."""
+        counter = self._counters.get(key)
+        if counter is None:
+            return 0.0
+        now = self._clock() if now is None else now
+        return counter[0] / self._scale(now)
+
+    def top(
+        self,
+        k: Optional[int] = None,
+        min_count: float = 0.0,
+        since: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> List[HeavyHitter]:
+        """
+        Most frequently accessed keys.
+
+        Args:
+            k: Maximum keys to return (None for all)
+            min_count: Minimum decayed count
+            since: Only keys accessed at or after this timestamp
+            now: Reference time for decay (default: clock())
+
+        Returns:
+            HeavyHitters by descending count
+        """
+        now = self._clock() if now is None else now
+        inverse = 1.0 / self._scale(now)
+        hitters = [
+            HeavyHitter(key, counter[0] * inverse, counter[1] * inverse, counter[2])
+            for key, counter in self._counters.items()
+            if counter[0] * inverse >= min_count and (since is None or counter[2] >= since)
+        ]
+        if k is not None:
+            return heapq.nlargest(k, hitters, key=lambda hitter: hitter.count)
+        hitters.sort(key=lambda hitter: hitter.count, reverse=True)
+        return hitters
+
+    def clear(self):
+        self._counters.clear()
+        self._heap.clear()
+        self._landmark = self._clock()
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._counters
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get sketch statistics."""
+        return {
+            "capacity": self.capacity,
+            "tracked_keys": len(self._counters),
+            "half_life_seconds": self.half_life,
+            "updates": self.updates,
+            "evictions": self.evictions,
+            "decayed_total": self.total / self._scale(self._clock()),
+        }
+
+
+__all__ = [
+    'HeavyHitter',
+    'DecayingSpaceSaving',
+]
@@ -0,0 +1,318 @@
+"""
+LLM completion cache for deterministic calls.
+
+Routing and classification prompts at temperature 0 ("Respond with: STUDY
+or GRADE") return the same completion for the same input, so the gateway
+model answers repeats from this cache instead of the provider:
+
+- Keyed by model, temperature, stop sequences and a hash of the normalized
+  messages (role + whitespace-collapsed content)
+- L1: in-process O(1) LRU with TTL (TTLLRUCache)
+- L2: Redis shared across instances (optional); sync calls use the shared
+  sync client, async calls an async client
+- Hits and misses counted per call site
+
+Models enable it automatically for deterministic use cases (see
+``initialize_llm``). Call sites can label, force or bypass it:
+
+    with completion_cache(call_site="supervisor.classify_intent"):
+        llm.invoke(messages)
+
+    with completion_cache(enabled=False):   # always ask the provider
+        llm.invoke(messages)
+"""
+
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from utils.core.constants import LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL
+from .search_cache import TTLLRUCache
+
+
+LLM_CACHE_PREFIX = "llmcache:v1"
+
+# Call site of completions made without a completion_cache(call_site=...) label
+DEFAULT_CALL_SITE = "unlabeled"
+
+_WHITESPACE = re.compile(r"\s+")
+
+# (call site, enabled override) of the current block
+_cache_context: ContextVar[Tuple[Optional[str], Optional[bool]]] = ContextVar(
+    "llm_cache_context", default=(None, None)
+)
+
+
+@contextmanager
+def completion_cache(call_site: Optional[str] = None, enabled: Optional[bool] = None) -> Iterator[None]:
+    """
+    Label, force or bypass the completion cache for calls in the block.
+
+    Args:
+        call_site: Name reported in per-call-site hit metrics
+        enabled: True caches even non-deterministic models, False bypasses
+            the cache, None keeps the model's default
+    """
+    current_site, current_enabled = _cache_context.get()
+    token = _cache_context.set((call_site or current_site, current_enabled if enabled is None else enabled))
+    try:
+        yield
+    finally:
+        _cache_context.reset(token)
+
+
+def cache_decision(model_default: bool) -> Tuple[bool, str]:
+    """
+    Whether the current call uses the cache, and its call site.
+
+    Args:
+        model_default: Whether the model caches by default (deterministic)
+
+    Returns:
+        (use cache, call site)
+    """
+    call_site, enabled = _cache_context.get()
+    use = LLM_CACHE_ENABLED and (model_default if enabled is None else enabled)
+    return use, call_site or DEFAULT_CALL_SITE
+
+
+def normalize_messages(messages: Sequence[Any]) -> list:
+    """Role and whitespace-collapsed content of each message."""
+    normalized = []
+    for message in messages:
+        role = getattr(message, "type", None) or type(message).__name__
+        content = getattr(message, "content", message)
+        if isinstance(content, str):
+            content = _WHITESPACE.sub(" ", content).strip()
+        normalized.append([role, content])
+    return normalized
+
+
+def completion_key(
+    model: str,
+    temperature: Optional[float],
+    messages: Sequence[Any],
+    stop: Optional[Sequence[str]] = None,
+    **params
+) -> str:
+    """
+    Cache key of a completion request.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        messages: Prompt messages
+        stop: Stop sequences
+        **params: Other parameters that change the output (e.g. max tokens)
+
+    Returns:
+        Key under LLM_CACHE_PREFIX
+    """
+    payload = json.dumps(
+        [model, temperature, list(stop or ()), sorted(params.items()), normalize_messages(messages)],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return f"{LLM_CACHE_PREFIX}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class LLMCompletionCache:
+    """
+    Two-tier (local LRU + Redis) cache of completions.
+
+    Values are JSON-serializable payloads (the caller converts model results
+    to and from them).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl: int = LLM_CACHE_TTL,
+        redis_url: Optional[str] = None,
+        redis_client=None,
+        async_redis_client=None
+    ):
+        """
+        Initialize the completion cache.
+
+        Args:
+            max_entries: Local LRU capacity
+            ttl: Entry lifetime in seconds
+            redis_url: Redis URL for the shared tier (None: local only)
+            redis_client: Existing sync Redis client (overrides redis_url)
+            async_redis_client: Existing async Redis client (overrides redis_url)
+        """
+        self.local = TTLLRUCache(max_size=max_entries, default_ttl=ttl)
+        self.ttl = ttl
+        self._redis_url = redis_url
+        self._redis = redis_client
+        self._async_redis = async_redis_client
+        self._redis_failed = False
+        self._lock = threading.Lock()
+
+        # Stats: call site -> {"local_hits", "redis_hits", "misses"}
+        self.call_sites: Dict[str, Dict[str, int]] = {}
+        self.redis_errors = 0
+
+    def _count(self, call_site: str, outcome: str):
+        with self._lock:
+            counts = self.call_sites.get(call_site)
+            if counts is None:
+                counts = self.call_sites[call_site] = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+            counts[outcome] += 1
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self.local.get(key)
+
+    def _local_set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self.local.set(key, value, ttl=ttl)
+
+    def _get_redis(self):
+        if self._redis is not None or self._redis_failed or not self._redis_url:
+            return self._redis
+        try:
+            from .redis_client import RedisClient
+            self._redis = RedisClient.get_instance()
+        except Exception as e:
+            print(f"⚠️  LLM cache Redis tier unavailable: {e}")
+        self._redis_failed = self._redis is None
+        return self._redis
+
+    def _get_async_redis(self):
+        """Lazily connect to Redis on the calling event loop."""
+        if self._async_redis is not None or self._redis_failed or not self._redis_url:
+            return self._async_redis
+        try:
+            import redis.asyncio as aioredis
+            self._async_redis = aioredis.from_url(self._redis_url, encoding="utf-8", decode_responses=True)
+        except Exception as e:
+            print(f"⚠️  LLM cache Redis tier unavailable: {e}")
+            self._redis_failed = True
+        return self._async_redis
+
+    def _redis_error(self, action: str, error: Exception):
+        self.redis_errors += 1
+        print(f"⚠️  LLM cache Redis {action} failed: {error}")
+
+    def get(self, key: str, call_site: str = DEFAULT_CALL_SITE) -> Optional[Any]:
+        """
+        Look up a completion (blocking; for sync model calls).
+
+        Args:
+            key: Key from completion_key()
+            call_site: Call site for hit metrics
+
+        Returns:
+            Cached payload or None on a miss
+        """
+        value = self._local_get(key)
+        if value is not None:
+            self._count(call_site, "local_hits")
+            return value
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                raw = redis.get(key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_set(key, value)
+                    self._count(call_site, "redis_hits")
+                    return value
+            except Exception as e:
+                self._redis_error("get", e)
+
+        self._count(call_site, "misses")
+        return None
+
+    async def aget(self, key: str, call_site: str = DEFAULT_CALL_SITE) -> Optional[Any]:
+        """Async variant of ``get``."""
+        value = self._local_get(key)
+        if value is not None:
+            self._count(call_site, "local_hits")
+            return value
+
+        redis = self._get_async_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_set(key, value)
+                    self._count(call_site, "redis_hits")
+                    return value
+            except Exception as e:
+                self._redis_error("get", e)
+
+        self._count(call_site, "misses")
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store a completion payload in both tiers (blocking)."""
+        self._local_set(key, value)
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                redis.setex(key, self.ttl, json.dumps(value))
+            except Exception as e:
+                self._redis_error("set", e)
+
+    async def aset(self, key: str, value: Any):
+        """Async variant of ``set``."""
+        self._local_set(key, value)
+        redis = self._get_async_redis()
+        if redis is not None:
+            try:
+                await redis.setex(key, self.ttl, json.dumps(value))
+            except Exception as e:
+                self._redis_error("set", e)
+
+    def clear(self):
+        """Drop the local tier (Redis entries expire with their TTL)."""
+        with self._lock:
+            self.local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics, overall and per call site."""
+        with self._lock:
+            call_sites = {site: dict(counts) for site, counts in self.call_sites.items()}
+        hits = sum(c["local_hits"] + c["redis_hits"] for c in call_sites.values())
+        total = hits + sum(c["misses"] for c in call_sites.values())
+        return {
+            "local": self.local.get_stats(),
+            "redis_enabled": bool(self._redis_url or self._redis or self._async_redis) and not self._redis_failed,
+            "hits": hits,
+            "misses": total - hits,
+            "hit_rate": f"{(hits / total * 100):.1f}%" if total else "N/A",
+            "call_sites": call_sites,
+            "redis_errors": self.redis_errors,
+        }
+
+
+_llm_cache: Optional[LLMCompletionCache] = None
+
+
+def get_llm_cache() -> LLMCompletionCache:
+    """Get or create the process-wide completion cache."""
+    global _llm_cache
+    if _llm_cache is None:
+        from config import settings
+        _llm_cache = LLMCompletionCache(redis_url=settings.redis_url)
+    return _llm_cache
+
+
+__all__ = [
+    'LLMCompletionCache',
+    'get_llm_cache',
+    'completion_cache',
+    'cache_decision',
+    'completion_key',
+    'normalize_messages',
+    'LLM_CACHE_PREFIX',
+    'DEFAULT_CALL_SITE',
+]
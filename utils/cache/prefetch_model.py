@@ -0,0 +1,176 @@
+"""
+Sequence model and budget for speculative prefetching.
+
+SequenceModel is a bounded first-order Markov model learned from per-session
+access sequences: every session contributes its transitions (state -> next
+state) to one shared table, because students follow similar paths, and the
+table predicts a session's likely next step from its current state.
+States, successors per state and tracked sessions are all bounded.
+
+PrefetchBudget caps speculative loads per minute so prefetching never
+competes with real requests for database or API capacity.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.core.constants import (
+    SEQUENCE_MODEL_MAX_STATES,
+    SEQUENCE_MODEL_MAX_SUCCESSORS,
+    SEQUENCE_MODEL_MAX_SESSIONS,
+    PREFETCH_BUDGET_PER_MINUTE,
+)
+
+
+class SequenceModel:
+    """Bounded first-order Markov model over per-session state sequences."""
+
+    def __init__(
+        self,
+        max_states: int = SEQUENCE_MODEL_MAX_STATES,
+        max_successors: int = SEQUENCE_MODEL_MAX_SUCCESSORS,
+        max_sessions: int = SEQUENCE_MODEL_MAX_SESSIONS
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            max_states: Source states kept (least recently seen dropped)
+            max_successors: Successors kept per state (least frequent dropped)
+            max_sessions: Sessions whose last state is remembered
+        """
+        self.max_states = max_states
+        self.max_successors = max_successors
+        self.max_sessions = max_sessions
+
+        self._transitions: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._sessions: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.observations = 0
+        self.transitions_recorded = 0
+
+    def observe(self, session_id: str, state: str) -> Optional[str]:
+        """
+        Record the next state of a session.
+
+        Args:
+            session_id: Session the access belongs to
+            state: State reached
+
+        Returns:
+            The session's previous state (None for its first access)
+        """
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            self._sessions[session_id] = state
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            self.observations += 1
+            if previous is not None:
+                self._record(previous, state)
+            return previous
+
+    def _record(self, source: str, target: str):
+        successors = self._transitions.get(source)
+        if successors is None:
+            successors = {}
+            self._transitions[source] = successors
+            if len(self._transitions) > self.max_states:
+                self._transitions.popitem(last=False)
+        else:
+            self._transitions.move_to_end(source)
+
+        if target not in successors and len(successors) >= self.max_successors:
+            del successors[min(successors, key=successors.get)]
+        successors[target] = successors.get(target, 0) + 1
+        self.transitions_recorded += 1
+
+    def predict(
+        self,
+        state: str,
+        k: int = 3,
+        min_probability: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Most likely next states.
+
+        Args:
+            state: Current state
+            k: Maximum predictions
+            min_probability: Minimum transition probability
+
+        Returns:
+            (next_state, probability) pairs, most likely first
+        """
+        with self._lock:
+            successors = self._transitions.get(state)
+            if not successors:
+                return []
+            total = sum(successors.values())
+            ranked = sorted(successors.items(), key=lambda item: item[1], reverse=True)
+
+        return [
+            (target, count / total)
+            for target, count in ranked[:k]
+            if count / total >= min_probability
+        ]
+
+    def last_state(self, session_id: str) -> Optional[str]:
+        """Current state of a session."""
+        return self._sessions.get(session_id)
+
+    def __len__(self) -> int:
+        return len(self._transitions)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get model statistics."""
+        return {
+            "learned_states": len(self._transitions),
+            "tracked_sessions": len(self._sessions),
+            "observations": self.observations,
+            "transitions_recorded": self.transitions_recorded,
+        }
+
+
+class PrefetchBudget:
+    """Token bucket limiting speculative loads per minute."""
+
+    def __init__(
+        self,
+        per_minute: float = PREFETCH_BUDGET_PER_MINUTE,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            per_minute: Loads allowed per minute (also the burst size)
+            clock: Time source (seconds)
+        """
+        self.capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take one load from the budget. Returns False when exhausted."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+__all__ = [
+    'SequenceModel',
+    'PrefetchBudget',
+]
@@ -0,0 +1,252 @@
+"""
+Web search result cache.
+
+Shared, freshness-aware cache for raw search provider results:
+- Keyed by normalized (reformulated) query and provider, so identical
+  searches from different users, nodes and pods reuse one paid API call
+- Per-entry TTLs from the query's freshness class
+  (utils.rag.query_enrichment.search_cache_ttl): about a minute for
+  real-time queries, minutes for news, days for encyclopedic queries
+- L1: in-process O(1) LRU with per-entry expiry (TTLLRUCache)
+- L2: Redis shared across instances (optional; SETEX with the same TTL)
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.core.constants import SEARCH_CACHE_MAX_ENTRIES
+from utils.rag.query_enrichment import normalize_search_query, search_cache_ttl
+
+
+SEARCH_CACHE_PREFIX = "websearch:v1"
+
+
+class TTLLRUCache:
+    """
+    LRU cache with per-entry TTL; get/set/evict are all O(1).
+
+    Entries are kept in recency order in an OrderedDict; expired entries
+    are dropped lazily when read or when they reach the LRU end.
+    """
+
+    def __init__(self, max_size: int = 1000, default_ttl: float = 300):
+        """
+        Args:
+            max_size: Maximum entries
+            default_ttl: TTL (seconds) when set() is called without one
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry and mark it most recently used."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Insert or replace an entry, evicting the least recently used."""
+        self._data[key] = (time.time() + (ttl if ttl is not None else self.default_ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{(self.hits / total * 100):.1f}%" if total else "N/A",
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SearchResultCache:
+    """
+    Two-tier (local LRU + Redis) cache of search results per provider.
+
+    Async because the Redis tier is async; the local tier never blocks.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = None,
+        redis_client=None
+    ):
+        """
+        Initialize search result cache.
+
+        Args:
+            max_entries: Local LRU capacity
+            redis_url: Redis URL for the shared tier (None: local only)
+            redis_client: Existing async Redis client (overrides redis_url)
+        """
+        self.local = TTLLRUCache(max_size=max_entries)
+        self._redis_url = redis_url
+        self._redis = redis_client
+        self._redis_failed = False
+
+        # Stats
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def make_key(self, query: str, provider: str) -> str:
+        """Cache key for a provider's results for a normalized query."""
+        digest = hashlib.sha1(normalize_search_query(query).encode("utf-8")).hexdigest()
+        return f"{SEARCH_CACHE_PREFIX}:{provider}:{digest}"
+
+    def _get_redis(self):
+        """Lazily connect to Redis on the calling event loop."""
+        if self._redis is not None or self._redis_failed or not self._redis_url:
+            return self._redis
+
+        try:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self._redis_url, encoding="utf-8", decode_responses=True)
+        except Exception as e:
+            print(f"⚠️  Search cache Redis tier unavailable: {e}")
+            self._redis_failed = True
+        return self._redis
+
+    async def get(self, query: str, providers: Sequence[str]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Look up cached results, preferring providers in the given order.
+
+        Args:
+            query: Search query (reformulated)
+            providers: Provider names in priority order
+
+        Returns:
+            (provider, results) or None on a miss
+        """
+        keys = [self.make_key(query, provider) for provider in providers]
+
+        for provider, key in zip(providers, keys):
+            results = self.local.get(key)
+            if results is not None:
+                self.local_hits += 1
+                return provider, results
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                values = await redis.mget(keys)
+                for provider, key, value in zip(providers, keys, values):
+                    if value is None:
+                        continue
+                    results = json.loads(value)
+                    # Promote to L1 for the remaining Redis TTL
+                    ttl = await redis.ttl(key)
+                    self.local.set(key, results, ttl=ttl if ttl and ttl > 0 else search_cache_ttl(query))
+                    self.redis_hits += 1
+                    return provider, results
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"⚠️  Search cache Redis get failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self,
+        query: str,
+        provider: str,
+        results: List[Dict[str, Any]],
+        ttl: Optional[int] = None
+    ):
+        """
+        Cache a provider's results with a freshness-based TTL.
+
+        Args:
+            query: Search query (reformulated)
+            provider: Provider that produced the results
+            results: Normalized result dicts
+            ttl: Override TTL in seconds (default: from query freshness)
+        """
+        if not results:
+            return
+
+        ttl = ttl or search_cache_ttl(query)
+        key = self.make_key(query, provider)
+        self.local.set(key, results, ttl=ttl)
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.setex(key, ttl, json.dumps(results))
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"⚠️  Search cache Redis set failed: {e}")
+
+    async def aclose(self):
+        """Close the Redis connection."""
+        if self._redis is not None:
+            try:
+                await self._redis.close()
+            except Exception:
+                pass
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        total = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "local": self.local.get_stats(),
+            "redis_enabled": bool(self._redis_url) and not self._redis_failed,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": f"{(hits / total * 100):.1f}%" if total else "N/A",
+            "redis_errors": self.redis_errors,
+        }
+
+
+__all__ = [
+    'TTLLRUCache',
+    'SearchResultCache',
+    'SEARCH_CACHE_PREFIX',
+]
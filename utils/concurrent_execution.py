@@ -3,19 +3,38 @@ Concurrent Task Execution System
 
 Enables parallel execution of long-running tasks while handling
 concurrent user queries. Supports:
-- Background task execution
-- Task duration detection
-- Task completion notifications
+- Background task execution under per-type caps with fair per-tenant queues
+- Task duration prediction (online model) and inline/fork/queue admission
+- Task completion notifications (pushed, not polled)
+- Task status and results shared across instances for a TTL
 - Real-time concurrent query handling
 """
 
 import asyncio
+import threading
 import uuid
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, AsyncGenerator, Callable, List
 from datetime import datetime
 from enum import Enum
 import json
 
+from utils.core.constants import TASK_RESULT_TTL, TASK_TIMINGS_COMPACT_EVERY
+from utils.core.llm_gateway import current_llm_context, llm_context, LANE_BATCH
+from utils.scaling.task_scheduler import (
+    InMemoryTaskStore,
+    TaskScheduler,
+    TERMINAL_STATUSES,
+    get_task_store,
+)
+from utils.ml.duration_model import (
+    FEATURE_NAMES,
+    DurationEstimate,
+    OnlineDurationModel,
+    TIMING_RECORD,
+    task_features,
+)
+from utils.ml.record_log import RecordLog
 from utils.monitoring import get_logger
 
 logger = get_logger(__name__)
@@ -52,7 +71,9 @@ class BackgroundTask:
         task_function: Callable,
         task_args: Dict[str, Any],
         expected_duration: float = None,
-        thread_id: str = None
+        thread_id: str = None,
+        tenant_id: str = None,
+        features: Optional[List[float]] = None
     ):
         """
         Initialize background task.
@@ -64,6 +85,8 @@ class BackgroundTask:
             task_args: Arguments for the task function
             expected_duration: Expected duration in seconds
             thread_id: Conversation thread ID
+            tenant_id: Tenant the task is queued under
+            features: Duration model features the estimate was made from
         """
         self.task_id = task_id
         self.task_type = task_type
@@ -71,6 +94,8 @@ class BackgroundTask:
         self.task_args = task_args
         self.expected_duration = expected_duration
         self.thread_id = thread_id
+        self.tenant_id = tenant_id
+        self.features = features
         
         # Execution state
         self.status = TaskStatus.PENDING
@@ -83,17 +108,22 @@ class BackgroundTask:
         
         # Asyncio task
         self._task: Optional[asyncio.Task] = None
+        
+        # Called with the task on every status or progress change
+        self._on_update: Optional[Callable[["BackgroundTask"], None]] = None
     
     async def execute(self) -> Any:
         """Execute the task and track completion."""
         self.status = TaskStatus.RUNNING
-        self.started_at = datetime.now()
+        self.started_at = self.started_at or datetime.now()
+        self._notify()
         
         try:
             logger.info(f"🚀 Starting background task: {self.task_id} ({self.task_type.value})")
             
-            # Execute the task function
-            self.result = await self.task_function(**self.task_args)
+            # Execute the task function; its LLM calls yield to interactive queries
+            with llm_context(lane=LANE_BATCH):
+                self.result = await self.task_function(**self.task_args)
             
             self.status = TaskStatus.COMPLETED
             self.completed_at = datetime.now()
@@ -120,6 +150,12 @@ class BackgroundTask:
         """Update task progress."""
         self.progress = min(1.0, max(0.0, progress))
         self.progress_message = message
+        self._notify()
+    
+    def _notify(self):
+        """Push the current state to the task's listener."""
+        if self._on_update:
+            self._on_update(self)
     
     def get_elapsed_time(self) -> Optional[float]:
         """Get elapsed time in seconds."""
@@ -147,9 +183,28 @@ class BackgroundTask:
         }
 
 
+ADMIT_INLINE = "inline"
+ADMIT_FORK = "fork"
+ADMIT_QUEUE = "queue"
+
+
+@dataclass
+class AdmissionDecision:
+    """How a task should run, with the estimate behind the decision."""
+    action: str  # ADMIT_INLINE, ADMIT_FORK or ADMIT_QUEUE
+    estimate: DurationEstimate
+    features: List[float]
+    expected_wait: float = 0.0  # Seconds before a queued task gets a slot
+
+
 class TaskDurationEstimator:
     """
-    Estimates task duration based on task type and historical data.
+    Estimates task duration with an online model per task type.
+    
+    Predictions depend on the question (length, requested quality,
+    complexity), the retrieval chunk count and how many tasks of the type
+    are running or queued; see utils.ml.duration_model. With a storage directory,
+    timings are recorded (for restarts and offline evaluation).
     """
     
     # Default expected durations in seconds
@@ -165,58 +220,199 @@ class TaskDurationEstimator:
     # Threshold for considering a task "long-running"
     LONG_RUNNING_THRESHOLD = 15.0  # seconds
     
-    def __init__(self):
-        """Initialize estimator."""
-        self.historical_durations: Dict[TaskType, List[float]] = {
-            task_type: [] for task_type in TaskType
+    def __init__(self, storage_dir: Optional[str] = None):
+        """
+        Initialize estimator.
+        
+        Args:
+            storage_dir: Directory of the task timing log (None: in memory only)
+        """
+        self.models: Dict[TaskType, OnlineDurationModel] = {
+            task_type: OnlineDurationModel(self.DEFAULT_DURATIONS[task_type]) for task_type in TaskType
         }
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._log: Optional[RecordLog] = None
+        
+        if storage_dir:
+            self._log = RecordLog(
+                storage_dir,
+                "task_timings",
+                snapshot_fn=self._snapshot_state,
+                compact_every=TASK_TIMINGS_COMPACT_EVERY
+            )
+            self._load()
+            self._log.start()
+    
+    def _load(self):
+        """Restore models from the snapshot and replay timings logged after it."""
+        state, self._seq, records = self._log.load()
+        for task_type, model_state in (state or {}).get("models", {}).items():
+            try:
+                self.models[TaskType(task_type)].load_dict(model_state)
+            except ValueError:
+                continue
+        
+        replayed = 0
+        for seq, kind, payload in records:
+            self._seq = max(self._seq, seq)
+            if kind == TIMING_RECORD:
+                try:
+                    if len(payload[1]) != len(FEATURE_NAMES):
+                        continue  # Recorded with an older feature set
+                    self.models[TaskType(payload[0])].update(payload[1], payload[2])
+                    replayed += 1
+                except (ValueError, IndexError, TypeError):
+                    continue
+        if replayed:
+            logger.info(f"⏱️ Task duration model restored ({replayed} timings replayed)")
+    
+    def _snapshot_state(self):
+        """(last seq, state) for log compaction (called from the flusher thread)."""
+        with self._lock:
+            return self._seq, {
+                "models": {task_type.value: model.to_dict() for task_type, model in self.models.items()}
+            }
+    
+    def features(
+        self,
+        question: str = "",
+        quality: Optional[str] = None,
+        chunk_count: Optional[int] = None,
+        load: int = 0,
+        queued: int = 0
+    ) -> List[float]:
+        """Duration model features of a task (see utils.ml.duration_model.task_features)."""
+        return task_features(question, quality=quality, chunk_count=chunk_count, load=load, queued=queued)
+    
+    def estimate(self, task_type: TaskType, question: str = "", **context) -> DurationEstimate:
+        """
+        Estimate p50/p90 task duration.
+        
+        Args:
+            task_type: Type of task
+            question: User question
+            **context: quality, chunk_count, load, queued (see features)
+            
+        Returns:
+            Duration estimate
+        """
+        features = self.features(question, **context)
+        with self._lock:
+            return self.models[task_type].predict(features)
     
-    def is_long_running(self, task_type: TaskType, question: str = "") -> bool:
+    def is_long_running(self, task_type: TaskType, question: str = "", **context) -> bool:
         """
         Determine if a task is long-running.
         
+        A task is long-running when its p90 duration reaches the threshold,
+        i.e. it should not block the response stream.
+        
         Args:
             task_type: Type of task
             question: User question (for context)
+            **context: quality, chunk_count, load, queued (see features)
             
         Returns:
             True if task is expected to be long-running
         """
-        expected = self.estimate_duration(task_type, question)
-        return expected >= self.LONG_RUNNING_THRESHOLD
+        return self.estimate(task_type, question, **context).p90 >= self.LONG_RUNNING_THRESHOLD
     
-    def estimate_duration(self, task_type: TaskType, question: str = "") -> float:
+    def estimate_duration(self, task_type: TaskType, question: str = "", **context) -> float:
         """
         Estimate task duration in seconds.
         
         Args:
             task_type: Type of task
             question: User question (for context)
+            **context: quality, chunk_count, load, queued (see features)
             
         Returns:
-            Estimated duration in seconds
+            Estimated (median) duration in seconds
+        """
+        return self.estimate(task_type, question, **context).p50
+    
+    def decide(
+        self,
+        task_type: TaskType,
+        question: str = "",
+        running: int = 0,
+        limit: Optional[int] = None,
+        queued: int = 0,
+        quality: Optional[str] = None,
+        chunk_count: Optional[int] = None
+    ) -> AdmissionDecision:
         """
-        # Use historical average if available
-        if self.historical_durations[task_type]:
-            avg_duration = sum(self.historical_durations[task_type]) / len(self.historical_durations[task_type])
-            return avg_duration
+        Decide whether a task runs inline, is forked or has to queue.
+        
+        Short tasks (p90 below the threshold) run inline. Long tasks are
+        forked when their type has a free slot, otherwise they queue; the
+        expected wait assumes running tasks are halfway done and waiting
+        ones take their p50.
         
-        # Fall back to default
-        return self.DEFAULT_DURATIONS.get(task_type, self.DEFAULT_DURATIONS[TaskType.UNKNOWN])
+        Args:
+            task_type: Type of task
+            question: User question
+            running: Tasks of the type running now
+            limit: Tasks of the type allowed to run at once (None: no cap)
+            queued: Tasks of the type waiting for a slot
+            quality: Requested render quality
+            chunk_count: Document chunks the task retrieves
+            
+        Returns:
+            Admission decision
+        """
+        features = self.features(
+            question, quality=quality, chunk_count=chunk_count, load=running, queued=queued
+        )
+        with self._lock:
+            estimate = self.models[task_type].predict(features)
+        
+        if estimate.p90 < self.LONG_RUNNING_THRESHOLD:
+            return AdmissionDecision(ADMIT_INLINE, estimate, features)
+        if limit is None or running < limit:
+            return AdmissionDecision(ADMIT_FORK, estimate, features)
+        
+        expected_wait = estimate.p50 * (queued // max(1, limit) + 0.5)
+        return AdmissionDecision(ADMIT_QUEUE, estimate, features, expected_wait)
     
-    def record_duration(self, task_type: TaskType, duration: float):
+    def record_duration(self, task_type: TaskType, duration: float, features: Optional[List[float]] = None):
         """
         Record actual task duration for learning.
         
         Args:
             task_type: Type of task
             duration: Actual duration in seconds
+            features: Features the task was estimated from (default: no context)
         """
-        self.historical_durations[task_type].append(duration)
+        if duration is None:
+            return
+        features = list(features) if features is not None else self.features()
         
-        # Keep only last 100 entries per type
-        if len(self.historical_durations[task_type]) > 100:
-            self.historical_durations[task_type] = self.historical_durations[task_type][-100:]
+        with self._lock:
+            self.models[task_type].update(features, duration)
+            if self._log is not None:
+                self._seq += 1
+                self._log.append(self._seq, TIMING_RECORD, [task_type.value, features, round(duration, 3)])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Timings seen and context-free p50/p90 per task type."""
+        features = self.features()
+        with self._lock:
+            stats = {}
+            for task_type, model in self.models.items():
+                estimate = model.predict(features)
+                stats[task_type.value] = {
+                    "samples": model.samples,
+                    "p50": round(estimate.p50, 2),
+                    "p90": round(estimate.p90, 2),
+                }
+            return stats
+    
+    def close(self):
+        """Write recorded timings still queued."""
+        if self._log is not None:
+            self._log.close()
     
     @staticmethod
     def detect_task_type(question: str, tool_name: str = None) -> TaskType:
@@ -270,21 +466,43 @@ class ConcurrentTaskManager:
     Manages concurrent execution of tasks and queries.
     
     Handles:
-    - Background task execution
+    - Background task execution (through a TaskScheduler)
     - Concurrent query processing
     - Task completion notifications
-    - Task status tracking
+    - Task status tracking (mirrored to a task store for other instances)
     """
     
-    def __init__(self):
-        """Initialize task manager."""
+    def __init__(
+        self,
+        store=None,
+        scheduler: Optional[TaskScheduler] = None,
+        result_ttl: int = TASK_RESULT_TTL,
+        estimator: Optional[TaskDurationEstimator] = None
+    ):
+        """
+        Initialize task manager.
+        
+        Args:
+            store: Shared task store (default: in-process only)
+            scheduler: Task scheduler (default: caps from constants)
+            result_ttl: Seconds finished tasks and results are kept
+            estimator: Task duration estimator (default: in-memory)
+        """
         self.active_tasks: Dict[str, BackgroundTask] = {}
-        self.completed_tasks: Dict[str, BackgroundTask] = {}
+        self.completed_tasks: Dict[str, BackgroundTask] = {}  # Recently finished, pruned after result_ttl
         self.task_queues: Dict[str, asyncio.Queue] = {}  # Per-thread queues
-        self.estimator = TaskDurationEstimator()
+        self.estimator = estimator or TaskDurationEstimator()
+        self.store = store or InMemoryTaskStore()
+        self.scheduler = scheduler or TaskScheduler()
+        self.result_ttl = result_ttl
         
         # Notification subscribers
         self.notification_subscribers: Dict[str, List[Callable]] = {}
+        
+        # Per-task queues of local listeners, fed on every task update
+        self._listeners: Dict[str, List[asyncio.Queue]] = {}
+        # Last pending store write per task (writes are chained to stay ordered)
+        self._writes: Dict[str, asyncio.Task] = {}
     
     async def execute_with_concurrency(
         self,
@@ -293,13 +511,17 @@ class ConcurrentTaskManager:
         task_args: Dict[str, Any],
         question: str,
         thread_id: str,
-        stream_callback: Optional[Callable] = None
+        stream_callback: Optional[Callable] = None,
+        tenant_id: Optional[str] = None,
+        quality: Optional[str] = None,
+        chunk_count: Optional[int] = None
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Execute a task with concurrency support.
         
         If task is long-running, it will be executed in the background
-        and the user will be prompted for a concurrent query.
+        (queued if its task type has no free slot) and the user will be
+        prompted for a concurrent query.
         
         Args:
             task_type: Type of task
@@ -308,15 +530,26 @@ class ConcurrentTaskManager:
             question: Original user question
             thread_id: Conversation thread ID
             stream_callback: Optional callback for streaming updates
+            tenant_id: Tenant for fair queuing (default: current request's tenant)
+            quality: Requested render quality (duration model feature)
+            chunk_count: Document chunks the task retrieves (duration model feature)
             
         Yields:
             Streaming updates including prompts and results
         """
-        # Check if task is long-running
-        is_long = self.estimator.is_long_running(task_type, question)
-        expected_duration = self.estimator.estimate_duration(task_type, question)
+        # Decide from the predicted duration and the task type's current load
+        decision = self.estimator.decide(
+            task_type,
+            question,
+            running=self.scheduler.running.get(task_type.value, 0),
+            limit=self.scheduler.limit(task_type.value),
+            queued=self.scheduler.queued(task_type.value),
+            quality=quality,
+            chunk_count=chunk_count
+        )
+        expected_duration = decision.estimate.p50
         
-        if not is_long:
+        if decision.action == ADMIT_INLINE:
             # Execute normally without background processing
             logger.info(f"⚡ Task is short-running ({expected_duration:.1f}s), executing directly")
             
@@ -326,7 +559,7 @@ class ConcurrentTaskManager:
                 duration = (datetime.now() - start_time).total_seconds()
                 
                 # Record duration for learning
-                self.estimator.record_duration(task_type, duration)
+                self.estimator.record_duration(task_type, duration, decision.features)
                 
                 yield {
                     "type": "result",
@@ -344,7 +577,10 @@ class ConcurrentTaskManager:
         
         else:
             # Execute in background
-            logger.info(f"🔄 Task is long-running ({expected_duration:.1f}s), forking execution")
+            logger.info(
+                f"🔄 Task is long-running (p50 {expected_duration:.1f}s, p90 {decision.estimate.p90:.1f}s), "
+                f"{'forking' if decision.action == ADMIT_FORK else 'queueing'} execution"
+            )
             
             # Create background task
             task_id = str(uuid.uuid4())
@@ -354,21 +590,30 @@ class ConcurrentTaskManager:
                 task_function=task_function,
                 task_args=task_args,
                 expected_duration=expected_duration,
-                thread_id=thread_id
+                thread_id=thread_id,
+                tenant_id=tenant_id or current_llm_context()[0],
+                features=decision.features
             )
             
-            self.active_tasks[task_id] = background_task
-            
-            # Start task in background
-            background_task._task = asyncio.create_task(background_task.execute())
+            # Listen before submitting so no update is missed
+            updates = self._listen(task_id)
+            self.submit_task(background_task)
             
             # Yield immediate prompt to user
+            message = f"🎬 I'm generating the {task_type.value.replace('_', ' ')} in the background (this will take about {int(expected_duration)} seconds)."
+            if decision.action == ADMIT_QUEUE:
+                message = (
+                    f"⏳ The {task_type.value.replace('_', ' ')} is queued behind other requests and will start in about "
+                    f"{int(decision.expected_wait)} seconds (then take about {int(expected_duration)} seconds)."
+                )
             yield {
                 "type": "fork",
-                "message": f"🎬 I'm generating the {task_type.value.replace('_', ' ')} in the background (this will take about {int(expected_duration)} seconds).",
+                "message": message,
                 "task_id": task_id,
                 "task_type": task_type.value,
-                "expected_duration": expected_duration
+                "expected_duration": expected_duration,
+                "expected_wait": decision.expected_wait,
+                "admission": decision.action
             }
             
             yield {
@@ -377,25 +622,25 @@ class ConcurrentTaskManager:
                 "awaiting_input": True
             }
             
-            # Monitor task progress and yield updates
+            # Relay progress updates as the task pushes them
             last_progress_update = 0.0
-            while background_task.status == TaskStatus.RUNNING:
-                await asyncio.sleep(2.0)  # Check every 2 seconds
-                
-                # Yield progress updates
-                if background_task.progress > last_progress_update + 0.1:
-                    yield {
-                        "type": "progress",
-                        "task_id": task_id,
-                        "progress": background_task.progress,
-                        "message": background_task.progress_message or f"Progress: {int(background_task.progress * 100)}%"
-                    }
-                    last_progress_update = background_task.progress
+            try:
+                while background_task.status.value not in TERMINAL_STATUSES:
+                    update = await updates.get()
+                    if update["progress"] > last_progress_update + 0.1 and update["status"] == TaskStatus.RUNNING.value:
+                        yield {
+                            "type": "progress",
+                            "task_id": task_id,
+                            "progress": update["progress"],
+                            "message": update["progress_message"] or f"Progress: {int(update['progress'] * 100)}%"
+                        }
+                        last_progress_update = update["progress"]
+            finally:
+                self._unlisten(task_id, updates)
             
             # Task completed - yield result
             if background_task.status == TaskStatus.COMPLETED:
                 duration = background_task.get_elapsed_time()
-                self.estimator.record_duration(task_type, duration)
                 
                 yield {
                     "type": "task_complete",
@@ -411,10 +656,6 @@ class ConcurrentTaskManager:
                     "duration": duration
                 }
                 
-                # Move to completed tasks
-                self.completed_tasks[task_id] = background_task
-                del self.active_tasks[task_id]
-                
             elif background_task.status == TaskStatus.FAILED:
                 yield {
                     "type": "task_failed",
@@ -422,11 +663,105 @@ class ConcurrentTaskManager:
                     "error": background_task.error,
                     "message": f"❌ {task_type.value.replace('_', ' ').title()} failed: {background_task.error}"
                 }
-                
-                # Move to completed tasks
-                self.completed_tasks[task_id] = background_task
-                del self.active_tasks[task_id]
     
+    def submit_task(self, task: BackgroundTask):
+        """
+        Queue a background task with the scheduler.
+        
+        It starts as soon as its task type has a free slot; tenants waiting
+        for the same type take turns.
+        
+        Args:
+            task: Task to run
+        """
+        task._on_update = self._publish
+        self.active_tasks[task.task_id] = task
+        self._publish(task)
+        
+        started = self.scheduler.submit(
+            task.task_id, task.task_type.value, task.tenant_id or "default", lambda: self._start(task)
+        )
+        if not started:
+            logger.info(
+                f"⏳ Task {task.task_id} queued behind "
+                f"{self.scheduler.running.get(task.task_type.value, 0)} running {task.task_type.value} tasks"
+            )
+    
+    def _start(self, task: BackgroundTask):
+        """Run a task that got its scheduler slot."""
+        task.status = TaskStatus.RUNNING
+        task.started_at = datetime.now()
+        task._task = asyncio.create_task(task.execute())
+        task._task.add_done_callback(lambda done: self._on_done(task, done))
+    
+    def _on_done(self, task: BackgroundTask, done: asyncio.Task):
+        """Free the task's slot and record the outcome (also if cancelled before it ran)."""
+        if not done.cancelled():
+            done.exception()  # Errors are recorded on the task
+        self.scheduler.release(task.task_type.value)
+        self._finish(task)
+    
+    def _finish(self, task: BackgroundTask):
+        """Move a finished task out of the active set and announce it."""
+        task.completed_at = task.completed_at or datetime.now()
+        if task.status == TaskStatus.COMPLETED:
+            self.estimator.record_duration(task.task_type, task.get_elapsed_time(), task.features)
+        
+        self.active_tasks.pop(task.task_id, None)
+        self.completed_tasks[task.task_id] = task
+        self._prune_completed()
+        self._publish(task)
+        self._listeners.pop(task.task_id, None)
+    
+    def _prune_completed(self):
+        """Drop finished tasks older than the result TTL (kept in finish order)."""
+        now = datetime.now()
+        while self.completed_tasks:
+            task_id, task = next(iter(self.completed_tasks.items()))
+            if (now - task.completed_at).total_seconds() < self.result_ttl:
+                break
+            del self.completed_tasks[task_id]
+    
+    def _listen(self, task_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.setdefault(task_id, []).append(queue)
+        return queue
+    
+    def _unlisten(self, task_id: str, queue: asyncio.Queue):
+        listeners = self._listeners.get(task_id, [])
+        if queue in listeners:
+            listeners.remove(queue)
+        if not listeners:
+            self._listeners.pop(task_id, None)
+    
+    def _publish(self, task: BackgroundTask):
+        """Push a task update to local listeners and the shared store."""
+        record = task.to_dict()
+        for queue in self._listeners.get(task.task_id, ()):
+            queue.put_nowait(record)
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Not on the event loop (e.g. progress from a worker thread)
+        
+        record = dict(record, result=task.result, tenant_id=task.tenant_id)
+        previous = self._writes.get(task.task_id)
+        write = loop.create_task(self._write(previous, record))
+        self._writes[task.task_id] = write
+        write.add_done_callback(
+            lambda done: self._writes.pop(task.task_id, None) if self._writes.get(task.task_id) is done else None
+        )
+    
+    async def _write(self, previous: Optional[asyncio.Task], record: Dict[str, Any]):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await self.store.save(record, self.result_ttl)
+        except Exception as e:
+            logger.error(f"❌ Failed to store task {record['task_id']}: {e}")
+    
+
     async def handle_concurrent_query(
         self,
         question: str,
@@ -458,12 +793,21 @@ class ConcurrentTaskManager:
             yield str(result.get("answer", result))
     
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """Get status of a task."""
+        """Get status of a task run by this instance."""
         task = self.active_tasks.get(task_id) or self.completed_tasks.get(task_id)
         if task:
             return task.to_dict()
         return None
     
+    async def aget_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get status of a task run by any instance (falls back to the store)."""
+        status = self.get_task_status(task_id)
+        if status is None:
+            record = await self.store.get(task_id)
+            if record:
+                status = {key: value for key, value in record.items() if key not in ("result", "tenant_id")}
+        return status
+    
     def get_active_tasks(self, thread_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all active tasks, optionally filtered by thread."""
         tasks = self.active_tasks.values()
@@ -472,19 +816,29 @@ class ConcurrentTaskManager:
         return [t.to_dict() for t in tasks]
     
     async def cancel_task(self, task_id: str) -> bool:
-        """Cancel a background task."""
+        """Cancel a running or queued background task."""
         task = self.active_tasks.get(task_id)
-        if task and task._task:
+        if not task:
+            return False
+        
+        if task._task:
             task._task.cancel()
-            task.status = TaskStatus.CANCELLED
-            logger.info(f"🛑 Cancelled task: {task_id}")
-            return True
-        return False
+        elif not self.scheduler.remove(task_id):
+            return False
+        
+        task.status = TaskStatus.CANCELLED
+        if not task._task:
+            self._finish(task)  # Never started, so no done callback will
+        logger.info(f"🛑 Cancelled task: {task_id}")
+        return True
     
     async def wait_for_task(self, task_id: str, timeout: Optional[float] = None) -> Optional[Any]:
         """
         Wait for a background task to complete.
         
+        Tasks run by other instances are awaited through the store's
+        progress events.
+        
         Args:
             task_id: Task ID to wait for
             timeout: Optional timeout in seconds
@@ -492,23 +846,31 @@ class ConcurrentTaskManager:
         Returns:
             Task result if completed, None if timeout/not found
         """
+        completed = self.completed_tasks.get(task_id)
+        if completed:
+            return completed.result
+        
         task = self.active_tasks.get(task_id)
-        if not task or not task._task:
-            # Check if already completed
-            completed = self.completed_tasks.get(task_id)
-            if completed:
-                return completed.result
+        if not task:
+            record = await self.store.wait(task_id, timeout=timeout)
+            if record and record["status"] == TaskStatus.COMPLETED.value:
+                return record.get("result")
             return None
         
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        updates = self._listen(task_id)
         try:
-            await asyncio.wait_for(task._task, timeout=timeout)
-            return task.result
+            while task.status.value not in TERMINAL_STATUSES:
+                remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                await asyncio.wait_for(updates.get(), timeout=remaining)
         except asyncio.TimeoutError:
             logger.warning(f"⏱️ Timeout waiting for task: {task_id}")
             return None
-        except Exception as e:
-            logger.error(f"❌ Error waiting for task {task_id}: {e}")
-            return None
+        finally:
+            self._unlisten(task_id, updates)
+        
+        return task.result if task.status == TaskStatus.COMPLETED else None
 
 
 # Global task manager instance
@@ -519,12 +881,18 @@ def get_task_manager() -> ConcurrentTaskManager:
     """Get or create the global task manager instance."""
     global _task_manager
     if _task_manager is None:
-        _task_manager = ConcurrentTaskManager()
+        from config import settings
+        _task_manager = ConcurrentTaskManager(
+            store=get_task_store(),
+            estimator=TaskDurationEstimator(storage_dir=settings.task_timings_dir)
+        )
     return _task_manager
 
 
 def reset_task_manager():
     """Reset the task manager (for testing)."""
     global _task_manager
+    if _task_manager is not None:
+        _task_manager.estimator.close()
     _task_manager = None
 
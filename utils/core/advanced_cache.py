@@ -8,17 +8,86 @@ Features:
 - Automatic tier promotion/demotion
 - TTL support with custom expiration
 - Cache warming and preloading
+- O(1) invalidation via namespace generations
+- Bulk mget / pipelined mset
+- Binary L2 values: msgpack/pickle + zstd/lz4 with a versioned header,
+  selectable per namespace (see utils.core.cache_codecs)
+
+Namespaces:
+    Every entry belongs to the global namespace plus any namespaces given on
+    get/set (e.g. ``document:<id>``, ``user:<id>``, ``tag:rubrics``). Each
+    namespace has a generation counter (``cache:gen:<ns>`` in Redis) and the
+    generations are part of the physical key:
+
+        cache|all@3,document:42@7|<key>
+
+    Invalidating a namespace increments its counter, so every dependent key
+    becomes unreachable at once without touching it. The orphaned Redis
+    entries expire with their TTL and are reclaimed sooner by a background
+    SCAN/UNLINK pass; nothing ever runs ``KEYS`` or deletes on the request path.
 """
 
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Iterable, List, Sequence
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import lru_cache
 import hashlib
 import json
 import asyncio
+import time
 from cachetools import TTLCache, LRUCache
 
 from config import settings
+from utils.core.cache_codecs import CacheCodec, CodecError, decode_value, get_default_codec
+from utils.core.constants import (
+    CACHE_GENERATION_REFRESH_SECONDS,
+    CACHE_GENERATION_MAX_TRACKED,
+    CACHE_CLEANUP_BATCH_SIZE,
+)
+
+
+# Namespace every entry belongs to (bumped by clear())
+GLOBAL_NAMESPACE = "all"
+
+# Physical keys: "cache|<ns>@<gen>,...|<key>"; counters: "cache:gen:<ns>"
+_KEY_PREFIX = "cache"
+_GENERATION_PREFIX = "cache:gen:"
+
+# Characters that would break key parsing or SCAN patterns
+_NAMESPACE_FORBIDDEN = set(",|*?[]\\ ")
+
+
+def _check_namespace(namespace: str) -> str:
+    if not namespace or _NAMESPACE_FORBIDDEN.intersection(namespace):
+        raise ValueError(f"Invalid cache namespace: {namespace!r}")
+    return namespace
+
+
+def _key_text(key: Any) -> str:
+    return key.decode("utf-8", "replace") if isinstance(key, bytes) else key
+
+
+def parse_key_generations(physical_key: str) -> Optional[Dict[str, int]]:
+    """
+    Namespace generations encoded in a physical cache key.
+
+    Args:
+        physical_key: Key as stored in Redis
+
+    Returns:
+        {namespace: generation}, or None for keys not in the namespaced format
+    """
+    prefix, sep, rest = physical_key.partition("|")
+    stamp, sep2, _ = rest.partition("|")
+    if prefix != _KEY_PREFIX or not sep or not sep2:
+        return None
+    generations = {}
+    for part in stamp.split(","):
+        namespace, at, generation = part.rpartition("@")
+        if not at or not generation.isdigit():
+            return None
+        generations[namespace] = int(generation)
+    return generations
 
 
 class MultiTierCache:
@@ -29,6 +98,8 @@ class MultiTierCache:
         ttl: int = None,
         max_size: int = None,
         enable_redis: bool = False,
+        codec: Optional[CacheCodec] = None,
+        namespace_codecs: Optional[Dict[str, CacheCodec]] = None,
     ):
         """
         Initialize multi-tier cache.
@@ -37,6 +108,9 @@ class MultiTierCache:
             ttl: Time-to-live in seconds (default from settings)
             max_size: Max cache entries (default from settings)
             enable_redis: Enable Redis L2 cache
+            codec: Codec for L2 values (default from CACHE_CODEC_* constants)
+            namespace_codecs: Codec per namespace prefix, e.g.
+                {"conversation:": CacheCodec(serializer="pickle")}
         """
         self.ttl = ttl or settings.cache_ttl
         self.max_size = max_size or settings.cache_max_size
@@ -45,25 +119,42 @@ class MultiTierCache:
         # L1: In-memory cache with TTL and LRU eviction
         self.l1_cache = TTLCache(maxsize=self.max_size, ttl=self.ttl)
         
+        # L2 value encoding
+        self.codec = codec or get_default_codec()
+        self.namespace_codecs: Dict[str, CacheCodec] = dict(namespace_codecs or {})
+        
         # L2: Redis cache (optional)
         self.l2_cache = None
         if self.enable_redis:
             self._init_redis()
         
+        # Namespace generations: namespace -> (generation, fetched at).
+        # With Redis this is a short-lived copy of the shared counters;
+        # without Redis it is authoritative, and namespaces never bumped
+        # (or forgotten) are at ``_generation_floor``.
+        self._generations: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation_floor = 0
+        self._cleanup_tasks: set = set()
+        
         # Stats
         self.hits = 0
         self.misses = 0
         self.l1_hits = 0
         self.l2_hits = 0
+        self.namespace_bumps = 0
+        self.keys_reclaimed = 0
+        self.l2_bytes_written = 0
+        self.l2_bytes_read = 0
+        self.codec_errors = 0
     
     def _init_redis(self):
         """Initialize Redis connection (lazy loading)."""
         try:
             import redis.asyncio as aioredis
+            # Values are binary (see cache_codecs), so responses stay bytes
             self.l2_cache = aioredis.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                decode_responses=False,
             )
             print("✅ Redis L2 cache initialized")
         except ImportError:
@@ -73,25 +164,125 @@ class MultiTierCache:
             print(f"⚠️  Redis connection failed: {e}")
             self.enable_redis = False
     
-    def _make_key(self, key: str, prefix: str = "cache") -> str:
-        """Generate cache key with prefix and hash."""
+    @property
+    def _redis(self):
+        """Redis client, or None when L2 is disabled."""
+        return self.l2_cache if self.enable_redis and self.l2_cache else None
+    
+    def register_codec(self, namespace_prefix: str, codec: CacheCodec) -> None:
+        """
+        Encode entries stored under matching namespaces with ``codec``.
+        
+        Args:
+            namespace_prefix: Namespace prefix, e.g. "conversation:"
+            codec: Codec to use (decoding always follows the value header)
+        """
+        self.namespace_codecs[namespace_prefix] = codec
+    
+    def _codec_for(self, namespaces: Sequence[str]) -> CacheCodec:
+        """Codec of the longest registered prefix matching any namespace."""
+        best, best_length = self.codec, -1
+        for namespace in namespaces:
+            for prefix, codec in self.namespace_codecs.items():
+                if namespace.startswith(prefix) and len(prefix) > best_length:
+                    best, best_length = codec, len(prefix)
+        return best
+    
+    def _encode(self, value: Any, codec: CacheCodec) -> Optional[bytes]:
+        """Encode an L2 value (None if it cannot be encoded)."""
+        try:
+            data = codec.encode(value)
+        except CodecError as e:
+            self.codec_errors += 1
+            print(f"⚠️  Cache encode failed: {e}")
+            return None
+        self.l2_bytes_written += len(data)
+        return data
+    
+    def _decode(self, data: Any) -> tuple:
+        """Decode an L2 value; returns (found, value)."""
+        try:
+            value = decode_value(data)
+        except CodecError as e:
+            self.codec_errors += 1
+            print(f"⚠️  Cache decode failed: {e}")
+            return False, None
+        self.l2_bytes_read += len(data)
+        return True, value
+    
+    @staticmethod
+    def _physical_key(key: str, generations: Dict[str, int]) -> str:
+        """Generate cache key stamped with each namespace's generation."""
         # Hash long keys for efficiency
         if len(key) > 100:
-            key_hash = hashlib.md5(key.encode()).hexdigest()
-            return f"{prefix}:{key_hash}"
-        return f"{prefix}:{key}"
+            key = hashlib.md5(key.encode()).hexdigest()
+        stamp = ",".join(f"{ns}@{gen}" for ns, gen in sorted(generations.items()))
+        return f"{_KEY_PREFIX}|{stamp}|{key}"
+    
+    def _remember_generation(self, namespace: str, generation: int, fetched_at: float):
+        self._generations[namespace] = (generation, fetched_at)
+        self._generations.move_to_end(namespace)
+        if len(self._generations) > CACHE_GENERATION_MAX_TRACKED:
+            _, (evicted, _) = self._generations.popitem(last=False)
+            if self._redis is None:
+                # Forgetting a local counter must not resurrect its old keys
+                self._generation_floor = max(self._generation_floor, evicted + 1)
+    
+    async def _resolve_generations(
+        self,
+        namespaces: Iterable[str],
+        refresh: bool = False
+    ) -> Dict[str, int]:
+        """
+        Current generation of the global namespace and ``namespaces``.
+        
+        With Redis, counters older than CACHE_GENERATION_REFRESH_SECONDS are
+        re-read in one MGET; if Redis fails the last known values are used.
+        """
+        names = {GLOBAL_NAMESPACE}
+        names.update(_check_namespace(ns) for ns in namespaces)
+        
+        redis = self._redis
+        if redis is None:
+            return {
+                ns: self._generations[ns][0] if ns in self._generations else self._generation_floor
+                for ns in names
+            }
+        
+        now = time.monotonic()
+        stale = [
+            ns for ns in names
+            if refresh or ns not in self._generations
+            or now - self._generations[ns][1] > CACHE_GENERATION_REFRESH_SECONDS
+        ]
+        if stale:
+            try:
+                values = await redis.mget([_GENERATION_PREFIX + ns for ns in stale])
+                for ns, value in zip(stale, values):
+                    self._remember_generation(ns, int(value or 0), now)
+            except Exception as e:
+                print(f"⚠️  Redis generation read failed: {e}")
+        
+        return {
+            ns: self._generations[ns][0] if ns in self._generations else 0
+            for ns in names
+        }
+    
+    async def _cache_key(self, key: str, namespaces: Sequence[str] = ()) -> str:
+        return self._physical_key(key, await self._resolve_generations(namespaces))
     
-    async def get(self, key: str) -> Optional[Any]:
+    async def get(self, key: str, namespaces: Sequence[str] = ()) -> Optional[Any]:
         """
         Get value from cache (checks L1 → L2 → None).
         
         Args:
             key: Cache key
+            namespaces: Namespaces the entry was stored under
             
         Returns:
             Cached value or None if not found
         """
-        cache_key = self._make_key(key)
+        cache_key = await self._cache_key(key, namespaces)
         
         # L1: Check in-memory cache first (fastest)
         if cache_key in self.l1_cache:
@@ -103,9 +294,9 @@ class MultiTierCache:
         if self.enable_redis and self.l2_cache:
             try:
                 value = await self.l2_cache.get(cache_key)
-                if value is not None:
-                    # Deserialize and promote to L1
-                    deserialized = json.loads(value)
+                found, deserialized = (False, None) if value is None else self._decode(value)
+                if found:
+                    # Promote to L1
                     self.l1_cache[cache_key] = deserialized
                     self.hits += 1
                     self.l2_hits += 1
@@ -117,11 +308,56 @@ class MultiTierCache:
         self.misses += 1
         return None
     
+    async def mget(
+        self,
+        keys: Sequence[str],
+        namespaces: Sequence[str] = ()
+    ) -> List[Optional[Any]]:
+        """
+        Get many values with one Redis round trip for all L1 misses.
+        
+        Args:
+            keys: Cache keys
+            namespaces: Namespaces the entries were stored under
+            
+        Returns:
+            Values in key order (None for misses)
+        """
+        generations = await self._resolve_generations(namespaces)
+        cache_keys = [self._physical_key(key, generations) for key in keys]
+        results: List[Optional[Any]] = [None] * len(keys)
+        
+        missing = []
+        for i, cache_key in enumerate(cache_keys):
+            if cache_key in self.l1_cache:
+                results[i] = self.l1_cache[cache_key]
+                self.l1_hits += 1
+            else:
+                missing.append(i)
+        
+        if missing and self.enable_redis and self.l2_cache:
+            try:
+                values = await self.l2_cache.mget([cache_keys[i] for i in missing])
+                for i, value in zip(missing, values):
+                    found, deserialized = (False, None) if value is None else self._decode(value)
+                    if found:
+                        results[i] = deserialized
+                        self.l1_cache[cache_keys[i]] = deserialized
+                        self.l2_hits += 1
+            except Exception as e:
+                print(f"⚠️  Redis mget failed: {e}")
+        
+        found = len(keys) - len(missing) + sum(1 for i in missing if results[i] is not None)
+        self.hits += found
+        self.misses += len(keys) - found
+        return results
+    
     async def set(
         self,
         key: str,
         value: Any,
         ttl: Optional[int] = None,
+        namespaces: Sequence[str] = (),
     ) -> None:
         """
         Set value in cache (L1 and optionally L2).
@@ -130,8 +366,9 @@ class MultiTierCache:
             key: Cache key
             value: Value to cache
             ttl: Custom TTL (overrides default)
+            namespaces: Namespaces whose invalidation drops the entry
         """
-        cache_key = self._make_key(key)
+        cache_key = await self._cache_key(key, namespaces)
         expiry = ttl or self.ttl
         
         # L1: Always cache in memory
@@ -139,8 +376,10 @@ class MultiTierCache:
         
         # L2: Cache in Redis if enabled
         if self.enable_redis and self.l2_cache:
+            serialized = self._encode(value, self._codec_for(namespaces))
+            if serialized is None:
+                return
             try:
-                serialized = json.dumps(value)
                 await self.l2_cache.setex(
                     cache_key,
                     expiry,
@@ -149,9 +388,47 @@ class MultiTierCache:
             except Exception as e:
                 print(f"⚠️  Redis set failed: {e}")
     
-    async def delete(self, key: str) -> None:
+    async def mset(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        namespaces: Sequence[str] = (),
+    ) -> None:
+        """
+        Set many values with one pipelined Redis round trip.
+        
+        Args:
+            items: Key-value pairs to cache
+            ttl: Custom TTL (overrides default)
+            namespaces: Namespaces whose invalidation drops the entries
+        """
+        if not items:
+            return
+        generations = await self._resolve_generations(namespaces)
+        expiry = ttl or self.ttl
+        
+        physical = {self._physical_key(key, generations): value for key, value in items.items()}
+        for cache_key, value in physical.items():
+            self.l1_cache[cache_key] = value
+        
+        if self.enable_redis and self.l2_cache:
+            codec = self._codec_for(namespaces)
+            encoded = {
+                cache_key: self._encode(value, codec)
+                for cache_key, value in physical.items()
+            }
+            try:
+                pipe = self.l2_cache.pipeline(transaction=False)
+                for cache_key, serialized in encoded.items():
+                    if serialized is not None:
+                        pipe.setex(cache_key, expiry, serialized)
+                await pipe.execute()
+            except Exception as e:
+                print(f"⚠️  Redis mset failed: {e}")
+    
+    async def delete(self, key: str, namespaces: Sequence[str] = ()) -> None:
         """Delete key from all cache tiers."""
-        cache_key = self._make_key(key)
+        cache_key = await self._cache_key(key, namespaces)
         
         # L1: Delete from memory
         self.l1_cache.pop(cache_key, None)
@@ -163,19 +440,139 @@ class MultiTierCache:
             except Exception as e:
                 print(f"⚠️  Redis delete failed: {e}")
     
+    async def invalidate_namespace(
+        self,
+        *namespaces: str,
+        cleanup: bool = True
+    ) -> Dict[str, int]:
+        """
+        Make every entry stored under the namespaces unreachable (O(1)).
+        
+        Bumps the namespaces' generation counters; with Redis this is one
+        pipelined INCR per namespace shared by all instances (others notice
+        within CACHE_GENERATION_REFRESH_SECONDS).
+        
+        Args:
+            *namespaces: Namespaces to invalidate (e.g. "document:42")
+            cleanup: Reclaim the orphaned Redis entries in the background
+            
+        Returns:
+            New generation per namespace
+        """
+        for ns in namespaces:
+            _check_namespace(ns)
+        if not namespaces:
+            return {}
+        
+        now = time.monotonic()
+        bumped: Dict[str, int] = {}
+        redis = self._redis
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for ns in namespaces:
+                    pipe.incr(_GENERATION_PREFIX + ns)
+                values = await pipe.execute()
+                bumped = {ns: int(value) for ns, value in zip(namespaces, values)}
+            except Exception as e:
+                print(f"⚠️  Redis invalidation failed, invalidating locally: {e}")
+        
+        if not bumped:
+            current = await self._resolve_generations(namespaces)
+            bumped = {ns: current[ns] + 1 for ns in namespaces}
+        
+        for ns, generation in bumped.items():
+            self._remember_generation(ns, generation, now)
+        self.namespace_bumps += len(bumped)
+        
+        if cleanup and redis is not None:
+            task = asyncio.get_running_loop().create_task(self.cleanup_stale_keys(list(bumped)))
+            self._cleanup_tasks.add(task)
+            task.add_done_callback(self._cleanup_tasks.discard)
+        
+        return bumped
+    
+    async def cleanup_stale_keys(
+        self,
+        namespaces: Optional[Sequence[str]] = None,
+        batch_size: int = CACHE_CLEANUP_BATCH_SIZE
+    ) -> int:
+        """
+        Reclaim Redis entries orphaned by namespace invalidation.
+        
+        Walks matching keys with incremental SCAN and UNLINKs them in batches,
+        so Redis is never blocked. Cleaning the global namespace also removes
+        entries in the legacy ``cache:<key>`` format.
+        
+        Args:
+            namespaces: Namespaces to clean (default: global namespace)
+            batch_size: Keys per SCAN page and UNLINK call
+            
+        Returns:
+            Number of keys removed
+        """
+        redis = self._redis
+        if redis is None:
+            return 0
+        
+        names = list(namespaces or [GLOBAL_NAMESPACE])
+        current = await self._resolve_generations(names, refresh=True)
+        reclaimed = 0
+        
+        try:
+            for ns in names:
+                batch = []
+                pattern = f"{_KEY_PREFIX}|*{ns}@*"
+                async for key in redis.scan_iter(match=pattern, count=batch_size):
+                    generations = parse_key_generations(_key_text(key))
+                    if generations is not None and generations.get(ns, current[ns]) < current[ns]:
+                        batch.append(key)
+                    if len(batch) >= batch_size:
+                        reclaimed += await self._unlink(batch)
+                        batch = []
+                if batch:
+                    reclaimed += await self._unlink(batch)
+            
+            if GLOBAL_NAMESPACE in names:
+                batch = []
+                async for key in redis.scan_iter(match=f"{_KEY_PREFIX}:*", count=batch_size):
+                    if not _key_text(key).startswith(_GENERATION_PREFIX):
+                        batch.append(key)
+                    if len(batch) >= batch_size:
+                        reclaimed += await self._unlink(batch)
+                        batch = []
+                if batch:
+                    reclaimed += await self._unlink(batch)
+        except Exception as e:
+            print(f"⚠️  Redis cleanup failed: {e}")
+        
+        self.keys_reclaimed += reclaimed
+        return reclaimed
+    
+    async def _unlink(self, keys: List[str]) -> int:
+        """Delete keys without blocking Redis (UNLINK, DEL on old servers)."""
+        try:
+            return await self.l2_cache.unlink(*keys)
+        except Exception:
+            return await self.l2_cache.delete(*keys)
+    
+    async def wait_for_cleanup(self) -> None:
+        """Wait for background cleanup passes (tests, shutdown)."""
+        if self._cleanup_tasks:
+            await asyncio.gather(*list(self._cleanup_tasks), return_exceptions=True)
+    
     async def clear(self) -> None:
-        """Clear all cache tiers."""
+        """
+        Clear all cache tiers.
+        
+        O(1): bumps the global namespace; Redis space is reclaimed by a
+        background SCAN instead of a blocking ``KEYS cache:*``.
+        """
         # L1: Clear memory cache
         self.l1_cache.clear()
         
-        # L2: Clear Redis cache (all keys with prefix)
-        if self.enable_redis and self.l2_cache:
-            try:
-                keys = await self.l2_cache.keys("cache:*")
-                if keys:
-                    await self.l2_cache.delete(*keys)
-            except Exception as e:
-                print(f"⚠️  Redis clear failed: {e}")
+        # L2: Orphan every entry
+        await self.invalidate_namespace(GLOBAL_NAMESPACE)
         
         # Reset stats
         self.hits = 0
@@ -199,17 +596,25 @@ class MultiTierCache:
             "l1_max_size": self.max_size,
             "ttl_seconds": self.ttl,
             "redis_enabled": self.enable_redis,
+            "namespace_bumps": self.namespace_bumps,
+            "tracked_namespaces": len(self._generations),
+            "keys_reclaimed": self.keys_reclaimed,
+            "cleanups_running": len(self._cleanup_tasks),
+            "codec": self.codec.name,
+            "l2_bytes_written": self.l2_bytes_written,
+            "l2_bytes_read": self.l2_bytes_read,
+            "codec_errors": self.codec_errors,
         }
     
-    async def warm_cache(self, data: Dict[str, Any]) -> None:
+    async def warm_cache(self, data: Dict[str, Any], namespaces: Sequence[str] = ()) -> None:
         """
         Warm cache with pre-computed data.
         
         Args:
             data: Dictionary of key-value pairs to cache
+            namespaces: Namespaces the entries belong to
         """
-        for key, value in data.items():
-            await self.set(key, value)
+        await self.mset(data, namespaces=namespaces)
         print(f"🔥 Cache warmed with {len(data)} entries")
 
 
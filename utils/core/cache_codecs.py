@@ -0,0 +1,315 @@
+"""
+Binary codecs for cache values stored in Redis (L2).
+
+Every encoded value starts with a 5-byte header:
+
+    magic (2 bytes) | format version | serializer id | compressor id
+
+so a reader can decode any value regardless of how its own codec is
+configured, codecs can be chosen per namespace, and the format can change
+without flushing Redis. Values without the header are legacy JSON strings
+and are still decoded.
+
+Serializers:
+- msgpack: compact and fast; exact types only (tuples, dataclasses,
+  datetimes and other objects fall back to pickle so they round-trip intact)
+- pickle: protocol 5; carries any Python object, e.g. LangChain messages.
+  Only values written by this application are ever decoded.
+- json: stdlib, for environments without msgpack
+
+Compressors (applied only above a size threshold): zstd, lz4, zlib.
+"""
+
+import json
+import pickle
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from utils.core.constants import (
+    CACHE_CODEC_SERIALIZER,
+    CACHE_CODEC_COMPRESSOR,
+    CACHE_COMPRESSION_THRESHOLD,
+    CACHE_COMPRESSION_LEVEL,
+)
+
+try:
+    import ormsgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    ormsgpack = None
+    try:
+        import msgpack
+        MSGPACK_AVAILABLE = True
+    except ImportError:
+        msgpack = None
+        MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame as lz4_frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    lz4_frame = None
+    LZ4_AVAILABLE = False
+
+
+SERIALIZER_JSON = "json"
+SERIALIZER_MSGPACK = "msgpack"
+SERIALIZER_PICKLE = "pickle"
+
+COMPRESSOR_NONE = "none"
+COMPRESSOR_ZLIB = "zlib"
+COMPRESSOR_ZSTD = "zstd"
+COMPRESSOR_LZ4 = "lz4"
+
+CODEC_VERSION = 1
+
+# A NUL byte can never start a JSON document, so legacy values are unambiguous
+_MAGIC = b"\x00\xc7"
+_HEADER_SIZE = len(_MAGIC) + 3
+
+_SERIALIZER_IDS = {SERIALIZER_JSON: 1, SERIALIZER_MSGPACK: 2, SERIALIZER_PICKLE: 3}
+_COMPRESSOR_IDS = {COMPRESSOR_NONE: 0, COMPRESSOR_ZLIB: 1, COMPRESSOR_ZSTD: 2, COMPRESSOR_LZ4: 3}
+_SERIALIZER_NAMES = {v: k for k, v in _SERIALIZER_IDS.items()}
+_COMPRESSOR_NAMES = {v: k for k, v in _COMPRESSOR_IDS.items()}
+
+# Types msgpack must not coerce (they would come back as lists/dicts/strings)
+_ORMSGPACK_OPTIONS = 0
+if ormsgpack is not None:
+    for _option in ("DATACLASS", "DATETIME", "SUBCLASS", "TUPLE", "ENUM", "UUID"):
+        _ORMSGPACK_OPTIONS |= getattr(ormsgpack, f"OPT_PASSTHROUGH_{_option}", 0)
+
+
+class CodecError(ValueError):
+    """A cached value cannot be encoded or decoded."""
+
+
+def available_serializers() -> Tuple[str, ...]:
+    """Serializers usable in this environment."""
+    names = [SERIALIZER_JSON, SERIALIZER_PICKLE]
+    if MSGPACK_AVAILABLE:
+        names.insert(0, SERIALIZER_MSGPACK)
+    return tuple(names)
+
+
+def available_compressors() -> Tuple[str, ...]:
+    """Compressors usable in this environment."""
+    names = [COMPRESSOR_NONE, COMPRESSOR_ZLIB]
+    if LZ4_AVAILABLE:
+        names.insert(0, COMPRESSOR_LZ4)
+    if ZSTD_AVAILABLE:
+        names.insert(0, COMPRESSOR_ZSTD)
+    return tuple(names)
+
+
+def _serialize(serializer: str, value: Any) -> bytes:
+    if serializer == SERIALIZER_MSGPACK:
+        if ormsgpack is not None:
+            return ormsgpack.packb(value, option=_ORMSGPACK_OPTIONS)
+        return msgpack.packb(value, use_bin_type=True, strict_types=True)
+    if serializer == SERIALIZER_PICKLE:
+        return pickle.dumps(value, protocol=5)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _deserialize(serializer: str, data: bytes) -> Any:
+    if serializer == SERIALIZER_MSGPACK:
+        if ormsgpack is not None:
+            return ormsgpack.unpackb(data)
+        if msgpack is not None:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        raise CodecError("msgpack is not installed")
+    if serializer == SERIALIZER_PICKLE:
+        return pickle.loads(data)
+    return json.loads(data)
+
+
+def _compress(compressor: str, data: bytes, level: int) -> bytes:
+    if compressor == COMPRESSOR_ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if compressor == COMPRESSOR_LZ4:
+        return lz4_frame.compress(data)
+    return zlib.compress(data, level)
+
+
+def _decompress(compressor: str, data: bytes) -> bytes:
+    if compressor == COMPRESSOR_ZSTD:
+        if zstandard is None:
+            raise CodecError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compressor == COMPRESSOR_LZ4:
+        if lz4_frame is None:
+            raise CodecError("lz4 is not installed")
+        return lz4_frame.decompress(data)
+    return zlib.decompress(data)
+
+
+class CacheCodec:
+    """Serializer + optional compressor for L2 cache values."""
+
+    def __init__(
+        self,
+        serializer: str = CACHE_CODEC_SERIALIZER,
+        compressor: str = CACHE_CODEC_COMPRESSOR,
+        compress_threshold: int = CACHE_COMPRESSION_THRESHOLD,
+        level: int = CACHE_COMPRESSION_LEVEL,
+        pickle_fallback: bool = True
+    ):
+        """
+        Initialize the codec.
+
+        Args:
+            serializer: "msgpack", "pickle" or "json" (msgpack falls back to
+                json when not installed)
+            compressor: "zstd", "lz4", "zlib" or "none" (zstd/lz4 fall back
+                to zlib when not installed)
+            compress_threshold: Serialized size (bytes) from which to compress
+            level: Compression level
+            pickle_fallback: Pickle values the serializer cannot represent
+                exactly (otherwise encoding them raises CodecError)
+        """
+        if serializer not in _SERIALIZER_IDS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if compressor not in _COMPRESSOR_IDS:
+            raise ValueError(f"Unknown cache compressor: {compressor}")
+
+        if serializer not in available_serializers():
+            serializer = SERIALIZER_JSON
+        if compressor not in available_compressors():
+            compressor = COMPRESSOR_ZLIB
+
+        self.serializer = serializer
+        self.compressor = compressor
+        self.compress_threshold = compress_threshold
+        self.level = level
+        self.pickle_fallback = pickle_fallback
+
+    @property
+    def name(self) -> str:
+        return f"{self.serializer}+{self.compressor}"
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Encode a value with a versioned header.
+
+        Args:
+            value: Value to encode
+
+        Returns:
+            Encoded bytes
+
+        Raises:
+            CodecError: If the value cannot be serialized
+        """
+        serializer = self.serializer
+        try:
+            payload = _serialize(serializer, value)
+        except (TypeError, ValueError, OverflowError) as e:
+            if not self.pickle_fallback or serializer == SERIALIZER_PICKLE:
+                raise CodecError(f"Cannot serialize {type(value).__name__}: {e}") from e
+            serializer = SERIALIZER_PICKLE
+            try:
+                payload = _serialize(serializer, value)
+            except Exception as e2:
+                raise CodecError(f"Cannot serialize {type(value).__name__}: {e2}") from e2
+
+        compressor = COMPRESSOR_NONE
+        if self.compressor != COMPRESSOR_NONE and len(payload) >= self.compress_threshold:
+            compressed = _compress(self.compressor, payload, self.level)
+            if len(compressed) < len(payload):
+                payload, compressor = compressed, self.compressor
+
+        header = _MAGIC + bytes((CODEC_VERSION, _SERIALIZER_IDS[serializer], _COMPRESSOR_IDS[compressor]))
+        return header + payload
+
+    def decode(self, data: Any) -> Any:
+        """Decode a value written by any codec (see decode_value)."""
+        return decode_value(data)
+
+    def __repr__(self) -> str:
+        return f"CacheCodec({self.name}, threshold={self.compress_threshold})"
+
+
+def describe_value(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Header fields of an encoded value.
+
+    Returns:
+        {"version", "serializer", "compressor"}, or None for legacy JSON
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)) or bytes(data[:2]) != _MAGIC:
+        return None
+    version, serializer_id, compressor_id = bytes(data[2:_HEADER_SIZE])
+    return {
+        "version": version,
+        "serializer": _SERIALIZER_NAMES.get(serializer_id),
+        "compressor": _COMPRESSOR_NAMES.get(compressor_id),
+    }
+
+
+def decode_value(data: Any) -> Any:
+    """
+    Decode a cached value.
+
+    Args:
+        data: Bytes (or str) read from Redis
+
+    Returns:
+        Decoded value
+
+    Raises:
+        CodecError: If the value has an unknown format or is corrupt
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    header = describe_value(data)
+    try:
+        if header is None:
+            return json.loads(data)  # Legacy JSON value
+
+        if header["version"] != CODEC_VERSION:
+            raise CodecError(f"Unsupported cache format version: {header['version']}")
+        if header["serializer"] is None or header["compressor"] is None:
+            raise CodecError("Unknown cache serializer or compressor id")
+
+        payload = memoryview(data)[_HEADER_SIZE:]
+        if header["compressor"] != COMPRESSOR_NONE:
+            payload = _decompress(header["compressor"], bytes(payload))
+        return _deserialize(header["serializer"], bytes(payload))
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"Corrupt cache value: {e}") from e
+
+
+_default_codec: Optional[CacheCodec] = None
+
+
+def get_default_codec() -> CacheCodec:
+    """Get the codec configured by the CACHE_CODEC_* constants."""
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = CacheCodec()
+    return _default_codec
+
+
+__all__ = [
+    'CacheCodec',
+    'CodecError',
+    'decode_value',
+    'describe_value',
+    'get_default_codec',
+    'available_serializers',
+    'available_compressors',
+    'CODEC_VERSION',
+    'MSGPACK_AVAILABLE',
+    'ZSTD_AVAILABLE',
+    'LZ4_AVAILABLE',
+]
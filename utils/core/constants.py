@@ -15,6 +15,33 @@ DEFAULT_CACHE_TTL = 3600
 # Maximum cache history entries to keep
 MAX_CACHE_HISTORY = 100
 
+# Keys tracked by the cache warmer's heavy-hitter sketch (bounds its memory)
+CACHE_WARMER_MAX_TRACKED_KEYS = 10000
+
+# Half-life of cache warmer access counts in seconds (older accesses count less)
+CACHE_WARMER_DECAY_HALF_LIFE = 3600
+
+# How long a cache namespace generation read from Redis is trusted (seconds);
+# bounds how long other instances may serve entries from a bumped namespace
+CACHE_GENERATION_REFRESH_SECONDS = 1.0
+
+# Namespace generations remembered per process
+CACHE_GENERATION_MAX_TRACKED = 10000
+
+# Keys per SCAN/UNLINK batch when reclaiming invalidated Redis entries
+CACHE_CLEANUP_BATCH_SIZE = 500
+
+# L2 (Redis) value codec: serializer ("msgpack", "pickle", "json") and
+# compressor ("zstd", "lz4", "zlib", "none"); unavailable libraries fall back
+CACHE_CODEC_SERIALIZER = "msgpack"
+CACHE_CODEC_COMPRESSOR = "zstd"
+
+# Values smaller than this are stored uncompressed (bytes)
+CACHE_COMPRESSION_THRESHOLD = 1024
+
+# Compression level (zstd/zlib levels; lz4 uses its own scale)
+CACHE_COMPRESSION_LEVEL = 3
+
 # =============================================================================
 # CONTEXT MANAGEMENT
 # =============================================================================
@@ -26,8 +53,21 @@ MAX_CONTEXT_TOKENS = 500
 MAX_CONTEXT_MESSAGES = 2
 
 # Rough token estimation ratio (characters per token)
+# Only used when no tokenizer is available
 CHARS_PER_TOKEN = 4
 
+# Tokenizer encoding used for token counting (tiktoken)
+TOKENIZER_ENCODING = "cl100k_base"
+
+# Token budget for packed retrieval/search context in synthesis prompts
+CONTEXT_PACK_TOKEN_BUDGET = 12000
+
+# Shingle similarity above which two retrieved chunks are treated as duplicates
+CONTEXT_PACK_DUPLICATE_THRESHOLD = 0.85
+
+# Token budget for the top-scoring chunks shown to the RAG retrieval grader
+RAG_GRADING_TOKEN_BUDGET = 400
+
 # =============================================================================
 # ROUTING CONFIGURATION
 # =============================================================================
@@ -54,6 +94,9 @@ MAX_AGENT_ITERATIONS = 5
 # Maximum iterations for grading workflows
 MAX_GRADING_ITERATIONS = 3
 
+# Independent steps of a multi-step study plan run at once
+PLAN_MAX_PARALLEL_STEPS = 3
+
 # =============================================================================
 # WEB SEARCH PATTERNS
 # =============================================================================
@@ -67,6 +110,29 @@ REALTIME_QUERY_PATTERNS = [
     r'\b(today\'s (date|weather|temperature))\b',
 ]
 
+# Phrases marking a query as time-sensitive (news, "latest", live data)
+TIME_SENSITIVE_PHRASES = [
+    'current time', 'what time', 'time now', 'time in',
+    'current date', 'what date', 'date today', 'today date',
+    'current weather', 'weather now', 'weather today',
+    'latest', 'breaking news', 'just happened'
+]
+
+# Patterns for news / recent-events queries (short cache TTL)
+RECENT_QUERY_PATTERNS = [
+    r'\b(news|headlines?|announced|announcement|released?|launch(ed)?)\b',
+    r'\b(this|last) (week|month|year)\b',
+    r'\b(recent(ly)?|current(ly)?|now|today|upcoming|yesterday|tonight|score)\b',
+    r'\b20\d\d\b',
+]
+
+# Patterns for encyclopedic queries whose answers rarely change (long cache TTL)
+EVERGREEN_QUERY_PATTERNS = [
+    r'^(what|who) (is|was|are|were) (a |an |the )?[a-z]',
+    r'^(define|definition of|explain|meaning of|history of|how does|how do|why does|why do)\b',
+    r'\b(theorem|formula|equation|algorithm|definition|principle|law of)\b',
+]
+
 # Patterns for vague follow-up questions
 VAGUE_QUESTION_PATTERNS = [
     'how does it work', 'tell me more', 'what about', 'how about',
@@ -89,6 +155,53 @@ GENERIC_SUBJECTS = [
 # Maximum words in short question
 MAX_SHORT_QUESTION_WORDS = 6
 
+# =============================================================================
+# WEB SEARCH RESULT CACHE
+# =============================================================================
+
+# TTLs (seconds) by query freshness class
+SEARCH_CACHE_TTL_REALTIME = 60            # time, weather, stock prices
+SEARCH_CACHE_TTL_RECENT = 15 * 60         # "latest", news, recent events
+SEARCH_CACHE_TTL_DEFAULT = 6 * 60 * 60    # everything else
+SEARCH_CACHE_TTL_EVERGREEN = 7 * 24 * 60 * 60  # definitions, history, concepts
+
+# In-process LRU capacity (entries)
+SEARCH_CACHE_MAX_ENTRIES = 2000
+
+# =============================================================================
+# PREFETCHING
+# =============================================================================
+
+# Bounds of the query sequence (first-order Markov) model
+SEQUENCE_MODEL_MAX_STATES = 5000
+SEQUENCE_MODEL_MAX_SUCCESSORS = 8
+SEQUENCE_MODEL_MAX_SESSIONS = 10000
+
+# Only prefetch a next step at least this likely
+PREFETCH_MIN_PROBABILITY = 0.3
+
+# Speculative loads allowed per minute (per process)
+PREFETCH_BUDGET_PER_MINUTE = 30
+
+# Prefetched retrievals: lifetime (seconds) and capacity
+PREFETCH_TTL = 10 * 60
+PREFETCH_MAX_ENTRIES = 500
+
+# Chunks prefetched for a whole chapter/section (comprehensive retrieval size)
+PREFETCH_RETRIEVAL_LIMIT = 60
+
+# Query intents (first match wins; anything else is a "question")
+QUERY_INTENT_PATTERNS = [
+    ("flashcards", [r'\bflash\s*cards?\b']),
+    ("quiz", [r'\bquiz', r'\bpractice (?:questions|problems)\b', r'\btest me\b']),
+    ("notes", [r'\bnotes\b', r'\boutline\b']),
+    ("summarize", [r'\bsummar', r'\boverview\b', r'\b(?:main|key) (?:points|ideas|topics)\b', r'\btl;?dr\b']),
+    ("explain", [r'\bexplain\b', r'\bhow (?:does|do|is|are)\b', r'\bwhy\b']),
+]
+
+# Intents answered from a whole chapter/section/page (their retrieval can be prefetched)
+PREFETCHABLE_QUERY_INTENTS = ("summarize", "notes", "flashcards", "quiz")
+
 # =============================================================================
 # QUERY ENRICHMENT
 # =============================================================================
@@ -201,6 +314,40 @@ MAX_RESPONSE_TIME_WARNING = 10.0
 # Cache hit rate threshold for optimization alert
 MIN_CACHE_HIT_RATE = 0.3
 
+# Latency histograms: relative error of quantiles and tracked range (seconds);
+# values outside the range are clamped (min/max stay exact)
+LATENCY_HISTOGRAM_RELATIVE_ERROR = 0.01
+LATENCY_HISTOGRAM_MIN_SECONDS = 1e-4
+LATENCY_HISTOGRAM_MAX_SECONDS = 3600.0
+
+# Quantiles reported by stats and the Prometheus exporter
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+# Sliding window for request/error rates: total length and bucket count
+METRICS_WINDOW_SECONDS = 300
+METRICS_WINDOW_BUCKETS = 60
+
+# Smoothing factors of the fast/slow EWMAs behind tool performance trends
+PERFORMANCE_TREND_FAST_ALPHA = 0.2
+PERFORMANCE_TREND_SLOW_ALPHA = 0.05
+
+# Recent requests kept for detailed export
+PERFORMANCE_RECENT_REQUESTS = 500
+
+# Distinct tools/agents/routes with their own histogram (others share "other")
+PERFORMANCE_MAX_SERIES = 100
+
+# Fraction of requests profiled stage by stage (0 disables profiling; stages of
+# unsampled requests cost one context variable lookup)
+STAGE_TIMING_SAMPLE_RATE = 0.1
+
+# Timed spans kept per profiled request for trace events (stage totals are
+# always complete)
+STAGE_TIMING_MAX_SPANS = 200
+
+# Distinct endpoint/stage pairs with their own histogram
+STAGE_TIMING_MAX_SERIES = 500
+
 # =============================================================================
 # DISPLAY FORMATTING
 # =============================================================================
@@ -267,6 +414,145 @@ TEMPERATURE_ROUTING = 0.0    # Deterministic
 TEMPERATURE_CREATIVE = 0.9   # Maximum creativity
 TEMPERATURE_PRECISE = 0.0    # Exact answers
 
+# LLM gateway: provider requests in flight (whole process / per tenant)
+LLM_GATEWAY_MAX_CONCURRENCY = 32
+LLM_GATEWAY_TENANT_CONCURRENCY = 8
+
+# Share of the global slots (and of the global token budget) the batch lane
+# may hold, so interactive requests always find free slots and tokens
+LLM_GATEWAY_BATCH_SHARE = 0.75
+
+# Token-rate budgets (tokens per minute, 0 disables)
+LLM_GATEWAY_TOKENS_PER_MINUTE = 1_000_000
+LLM_GATEWAY_TENANT_TOKENS_PER_MINUTE = 200_000
+
+# Output tokens reserved per call when max_tokens is not set (corrected with
+# the reported usage afterwards)
+LLM_GATEWAY_DEFAULT_OUTPUT_TOKENS = 512
+
+# Longest wait for a slot before the call fails (seconds)
+LLM_GATEWAY_QUEUE_TIMEOUT = 60.0
+
+# Retries of rate-limited (429) calls: attempts and full-jitter backoff bounds (seconds)
+LLM_GATEWAY_MAX_RETRIES = 4
+LLM_GATEWAY_RETRY_BASE_DELAY = 0.5
+LLM_GATEWAY_RETRY_MAX_DELAY = 8.0
+
+# Completion cache for deterministic (temperature 0) calls: master switch,
+# in-process LRU capacity and TTL (seconds, also used for Redis)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MAX_ENTRIES = 2000
+LLM_CACHE_TTL = 24 * 60 * 60
+
+# =============================================================================
+# BACKGROUND TASKS
+# =============================================================================
+
+# Background tasks running at once per task type (the rest wait in per-tenant
+# fair queues); Manim rendering is CPU-bound, searches mostly wait on I/O
+TASK_SCHEDULER_TYPE_CONCURRENCY = {
+    "manim_animation": 2,
+    "grading": 4,
+    "web_search": 8,
+    "document_qa": 8,
+    "python_repl": 4,
+}
+TASK_SCHEDULER_DEFAULT_CONCURRENCY = 4
+
+# Manim quality animations are rendered at (also a task duration feature)
+MANIM_RENDER_QUALITY = "high_quality"
+
+# How long finished task records and results are kept (seconds)
+TASK_RESULT_TTL = 60 * 60
+
+# Key / channel prefix of task records and progress events in Redis
+TASK_STORE_PREFIX = "tasks:v1"
+
+# Lease of an instance on its queued/running task records in Redis (seconds,
+# renewed every third of it): once it lapses, another instance marks the
+# records failed, so tasks lost to a crash or restart do not stay "running"
+TASK_INSTANCE_LEASE_TTL = 60
+
+# Task duration model (per task type, trained online on log-durations):
+# samples before its predictions replace the plain average, forgetting
+# factor (~1 / (1 - f) recent tasks dominate) and residuals kept for p50/p90
+DURATION_MODEL_MIN_SAMPLES = 10
+DURATION_MODEL_FORGETTING = 0.995
+DURATION_MODEL_RESIDUAL_WINDOW = 200
+
+# Recorded task timings (settings.task_timings_dir, for restarts and offline
+# evaluation) are folded into a model snapshot after this many records
+TASK_TIMINGS_COMPACT_EVERY = 20000
+
+# =============================================================================
+# SPECULATIVE EXECUTION
+# =============================================================================
+
+# Start the predicted read-only tool call (document retrieval, search API)
+# while the supervisor is still routing a streaming request
+SPECULATIVE_EXECUTION_ENABLED = True
+
+# Also speculate web searches. Off by default: every wasted speculation is a
+# paid search-API call
+SPECULATIVE_WEB_SEARCH_ENABLED = False
+
+# =============================================================================
+# ADMISSION CONTROL
+# =============================================================================
+
+# Adaptive concurrency limit of controlled API requests (per worker process):
+# start, floor and ceiling
+ADMISSION_INITIAL_LIMIT = 32
+ADMISSION_MIN_LIMIT = 4
+ADMISSION_MAX_LIMIT = 256
+
+# Latency / route baseline ratio treated as congestion, and the factor the
+# limit is cut by when it is exceeded
+ADMISSION_LATENCY_TOLERANCE = 2.0
+ADMISSION_BACKOFF_RATIO = 0.9
+
+# Share of the limit batch requests may hold, so interactive queries keep headroom
+ADMISSION_BATCH_SHARE = 0.5
+
+# Waiting requests per priority, and how long each priority may wait (seconds)
+ADMISSION_MAX_QUEUE = 64
+ADMISSION_QUEUE_TIMEOUT = {
+    "interactive": 5.0,
+    "batch": 1.0,
+}
+
+# Upper bound of the Retry-After hint of shed requests (seconds)
+ADMISSION_MAX_RETRY_AFTER = 30
+
+# Database pool utilization above which the limit shrinks and batch requests
+# are shed, and how often it is sampled (seconds)
+ADMISSION_DB_UTILIZATION_THRESHOLD = 0.8
+ADMISSION_DB_SAMPLE_INTERVAL = 1.0
+
+# Priority by path prefix (first match wins); unlisted paths (auth, health,
+# docs, downloads, ...) are critical: never queued or shed
+ADMISSION_ROUTE_PRIORITIES = (
+    ("/query/tasks", "critical"),
+    ("/query/capabilities", "critical"),
+    ("/query/stream/concurrent", "batch"),
+    ("/query", "interactive"),
+    ("/grading", "batch"),
+    ("/documents/upload", "batch"),
+    ("/ml", "batch"),
+)
+
+# Distinct routes with their own latency baseline (others share one)
+ADMISSION_MAX_ROUTES = 256
+
+# =============================================================================
+# STARTUP
+# =============================================================================
+
+# Required startup components that fail (e.g. the database during a brief
+# outage) are retried with exponential backoff: first and largest delay (seconds)
+STARTUP_RETRY_BASE_DELAY = 1.0
+STARTUP_RETRY_MAX_DELAY = 30.0
+
 # =============================================================================
 # DATABASE CONFIGURATION
 # =============================================================================
@@ -15,12 +15,24 @@ Temperature-based configuration for different use cases:
 - Precise: 0.0 (math, code execution)
 
 Optimized for educational tasks with role-specific settings.
+
+Every model is a GatewayChatGoogleGenerativeAI: its calls go through the
+shared LLM gateway (concurrency limits, priority lanes, token budgets and
+429 retries, see utils/core/llm_gateway.py), and agents asking for the same
+configuration share one client. Deterministic use cases (temperature 0)
+also answer repeated prompts from the completion cache
+(utils/cache/llm_cache.py).
 """
 
 import os
 from typing import Optional, Literal
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from utils.cache.llm_cache import cache_decision, completion_key, get_llm_cache
+from utils.core.llm_gateway import get_llm_gateway, estimate_request_tokens
+
 
 # Default Gemini models (2.5 generation - stable)
 DEFAULT_MODEL = "gemini-2.5-flash"  # Fast, cost-effective
@@ -36,12 +48,137 @@ TEMPERATURE_SETTINGS = {
 }
 
 
+def _usage_tokens(result) -> Optional[int]:
+    """Total tokens reported for a ChatResult, if any."""
+    for generation in getattr(result, "generations", None) or []:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if usage:
+            return usage.get("total_tokens")
+    return None
+
+
+# Call parameters whose results are never cached (tool calls)
+_UNCACHEABLE_PARAMS = ("tools", "functions", "tool_config", "tool_choice")
+
+
+def _to_cache_payload(result: ChatResult) -> Optional[dict]:
+    """Cacheable form of a single plain-text completion (None otherwise)."""
+    if len(result.generations) != 1:
+        return None
+    message = result.generations[0].message
+    if getattr(message, "tool_calls", None) or message.additional_kwargs.get("function_call"):
+        return None
+    return {"content": message.content}
+
+
+def _from_cache_payload(payload: dict) -> ChatResult:
+    message = AIMessage(content=payload["content"], response_metadata={"cache_hit": True})
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class GatewayChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """
+    ChatGoogleGenerativeAI whose provider calls go through the LLM gateway.
+
+    Only the low-level generate/stream methods are wrapped, so invoke,
+    batch, bind_tools, with_structured_output and agents all pass through it.
+    Non-streamed completions are cached when ``cache_completions`` is set
+    (or forced with ``completion_cache(enabled=True)``).
+    """
+
+    cache_completions: bool = False
+
+    def _completion_key(self, messages, stop, kwargs) -> tuple:
+        """(cache key or None, call site) of a generate call."""
+        use_cache, call_site = cache_decision(self.cache_completions)
+        if not use_cache or any(kwargs.get(name) for name in _UNCACHEABLE_PARAMS):
+            return None, call_site
+        key = completion_key(
+            self.model, self.temperature, messages, stop,
+            max_output_tokens=self.max_output_tokens, **kwargs
+        )
+        return key, call_site
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key, call_site = self._completion_key(messages, stop, kwargs)
+        if key is not None:
+            payload = get_llm_cache().get(key, call_site)
+            if payload is not None:
+                return _from_cache_payload(payload)
+
+        result = get_llm_gateway().call(
+            super()._generate, messages, stop, run_manager,
+            tokens=estimate_request_tokens(messages, self.max_output_tokens),
+            usage=_usage_tokens,
+            **kwargs
+        )
+        payload = _to_cache_payload(result) if key is not None else None
+        if payload is not None:
+            get_llm_cache().set(key, payload)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        key, call_site = self._completion_key(messages, stop, kwargs)
+        if key is not None:
+            payload = await get_llm_cache().aget(key, call_site)
+            if payload is not None:
+                return _from_cache_payload(payload)
+
+        result = await get_llm_gateway().acall(
+            super()._agenerate, messages, stop, run_manager,
+            tokens=estimate_request_tokens(messages, self.max_output_tokens),
+            usage=_usage_tokens,
+            **kwargs
+        )
+        payload = _to_cache_payload(result) if key is not None else None
+        if payload is not None:
+            await get_llm_cache().aset(key, payload)
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from get_llm_gateway().stream(
+            super()._stream, messages, stop, run_manager,
+            tokens=estimate_request_tokens(messages, self.max_output_tokens),
+            **kwargs
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in get_llm_gateway().astream(
+            super()._astream, messages, stop, run_manager,
+            tokens=estimate_request_tokens(messages, self.max_output_tokens),
+            **kwargs
+        ):
+            yield chunk
+
+
+def _client_key(config: dict):
+    """Hashable key of a model configuration (None if it cannot be shared)."""
+    try:
+        key = tuple(sorted(config.items()))
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
+
+def _create_llm(config: dict) -> ChatGoogleGenerativeAI:
+    try:
+        return GatewayChatGoogleGenerativeAI(**config)
+    except Exception as e:
+        # If default model fails, try fallback
+        if config["model"] == DEFAULT_MODEL and "not found" in str(e).lower():
+            print(f"⚠️  {DEFAULT_MODEL} unavailable, falling back to {FALLBACK_MODEL}")
+            return GatewayChatGoogleGenerativeAI(**dict(config, model=FALLBACK_MODEL))
+        raise
+
+
 def initialize_llm(
     model_name: Optional[str] = None,
     temperature: Optional[float] = None,
     use_case: Optional[Literal["study", "grading", "routing", "creative", "precise"]] = None,
     max_tokens: Optional[int] = None,
     streaming: bool = False,
+    cache_completions: Optional[bool] = None,
     **kwargs
 ) -> ChatGoogleGenerativeAI:
     """
@@ -53,10 +190,13 @@ def initialize_llm(
         use_case: Auto-set temperature: study, grading, routing, creative, precise
         max_tokens: Maximum output tokens
         streaming: Enable streaming mode for token-by-token output
+        cache_completions: Cache completions (default: only for deterministic
+            use cases, i.e. temperature 0 from TEMPERATURE_SETTINGS)
         **kwargs: Additional Gemini parameters
         
     Returns:
-        Configured ChatGoogleGenerativeAI instance
+        Configured ChatGoogleGenerativeAI instance (shared between callers
+        with the same configuration)
         
     Examples:
         >>> llm = initialize_llm(use_case="grading")  # temp=0.3
@@ -93,17 +233,14 @@ def initialize_llm(
     if max_tokens:
         config["max_output_tokens"] = max_tokens
     
+    # Cache repeated prompts of deterministic use cases (routing, precise)
+    if cache_completions is None:
+        cache_completions = TEMPERATURE_SETTINGS.get(use_case) == 0.0 and temperature == 0.0
+    config["cache_completions"] = cache_completions
+    
     config.update(kwargs)
     
-    try:
-        return ChatGoogleGenerativeAI(**config)
-    except Exception as e:
-        # If default model fails, try fallback
-        if model == DEFAULT_MODEL and "not found" in str(e).lower():
-            print(f"⚠️  {DEFAULT_MODEL} unavailable, falling back to {FALLBACK_MODEL}")
-            config["model"] = FALLBACK_MODEL
-            return ChatGoogleGenerativeAI(**config)
-        raise
+    return get_llm_gateway().get_client(_client_key(config), lambda: _create_llm(config))
 
 
 # =============================================================================
@@ -0,0 +1,772 @@
+"""
+LLM gateway: one admission point for every provider call.
+
+Models returned by ``initialize_llm`` send each generate/stream call through
+the process-wide gateway, which:
+
+- shares model clients (and their connection pools) between agents that
+  ask for the same configuration
+- bounds provider requests in flight globally and per tenant
+- gives interactive traffic a priority lane: queued interactive calls are
+  admitted before batch calls, and batch calls may hold only part of the
+  slots, so a bulk-grading job cannot starve students
+- enforces token-rate budgets (tokens per minute, global and per tenant)
+- retries rate-limited (429) calls with full-jitter exponential backoff
+- records queueing delay per lane (and as the ``llm_queue`` stage of
+  profiled requests)
+
+The tenant and lane come from a context variable, set per request by the
+auth gateway (tenant) and by background task execution (batch lane):
+
+    with llm_context(lane=LANE_BATCH):
+        grade_all_submissions()
+"""
+
+import asyncio
+import bisect
+import itertools
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from utils.core.constants import (
+    CHARS_PER_TOKEN,
+    LLM_GATEWAY_MAX_CONCURRENCY,
+    LLM_GATEWAY_TENANT_CONCURRENCY,
+    LLM_GATEWAY_BATCH_SHARE,
+    LLM_GATEWAY_TOKENS_PER_MINUTE,
+    LLM_GATEWAY_TENANT_TOKENS_PER_MINUTE,
+    LLM_GATEWAY_DEFAULT_OUTPUT_TOKENS,
+    LLM_GATEWAY_QUEUE_TIMEOUT,
+    LLM_GATEWAY_MAX_RETRIES,
+    LLM_GATEWAY_RETRY_BASE_DELAY,
+    LLM_GATEWAY_RETRY_MAX_DELAY,
+)
+from utils.errors.exceptions import LLMError
+from utils.monitoring.stage_timing import record_stage, STAGE_LLM_QUEUE
+from utils.monitoring.streaming_stats import LatencyHistogram
+
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+
+# Lower value is admitted first
+LANE_PRIORITY = {LANE_INTERACTIVE: 0, LANE_BATCH: 1}
+
+# Tenant of calls made outside an authenticated request
+DEFAULT_TENANT = "default"
+
+_llm_context: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar(
+    "llm_gateway_context", default=(None, None)
+)
+
+
+@contextmanager
+def llm_context(tenant_id: Optional[str] = None, lane: Optional[str] = None) -> Iterator[None]:
+    """
+    Attribute LLM calls made inside the block to a tenant and/or lane.
+
+    Unset values are inherited from the enclosing context.
+
+    Args:
+        tenant_id: Tenant charged for the calls
+        lane: LANE_INTERACTIVE or LANE_BATCH
+    """
+    if lane is not None and lane not in LANE_PRIORITY:
+        raise ValueError(f"Unknown LLM lane: {lane}")
+    current_tenant, current_lane = _llm_context.get()
+    token = _llm_context.set((tenant_id or current_tenant, lane or current_lane))
+    try:
+        yield
+    finally:
+        _llm_context.reset(token)
+
+
+def current_llm_context() -> Tuple[str, str]:
+    """(tenant, lane) that LLM calls are currently attributed to."""
+    tenant, lane = _llm_context.get()
+    return tenant or DEFAULT_TENANT, lane or LANE_INTERACTIVE
+
+
+def estimate_request_tokens(messages: Any, max_output_tokens: Optional[int] = None) -> int:
+    """
+    Rough token cost of a call, reserved against the budgets up front.
+
+    Args:
+        messages: Prompt messages (or a string)
+        max_output_tokens: Output limit of the model, if set
+
+    Returns:
+        Estimated prompt tokens plus expected output tokens
+    """
+    if isinstance(messages, str):
+        chars = len(messages)
+    else:
+        chars = sum(len(str(getattr(message, "content", message))) for message in messages)
+    return chars // CHARS_PER_TOKEN + (max_output_tokens or LLM_GATEWAY_DEFAULT_OUTPUT_TOKENS)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether a provider error is a 429 / quota exhaustion."""
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if value == 429 or getattr(value, "value", None) == 429:
+            return True
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitError"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "resource exhausted" in message or "rate limit" in message
+
+
+def _retry_after(error: BaseException) -> float:
+    """Retry-After hint of an error in seconds (0 if none)."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        value = getattr(getattr(error, "details", None), "get", lambda _: None)("retry_after")
+    try:
+        return max(0.0, float(value)) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _Waiter:
+    __slots__ = ("tenant", "lane", "granted", "event", "loop", "future")
+
+    def __init__(self, tenant: str, lane: str):
+        self.tenant = tenant
+        self.lane = lane
+        self.granted = False
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
+class ConcurrencyLimiter:
+    """
+    Global and per-tenant in-flight limits with priority lanes.
+
+    Usable from threads (``acquire``) and event loops (``aacquire``) at
+    the same time, since agents call models both ways. Queued callers are
+    admitted by lane priority, then arrival order; a caller blocked only by
+    its own tenant's limit does not hold up other tenants.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_GATEWAY_MAX_CONCURRENCY,
+        tenant_concurrency: int = LLM_GATEWAY_TENANT_CONCURRENCY,
+        batch_share: float = LLM_GATEWAY_BATCH_SHARE
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Calls in flight across all tenants
+            tenant_concurrency: Calls in flight per tenant
+            batch_share: Fraction of max_concurrency the batch lane may hold
+        """
+        self.max_concurrency = max_concurrency
+        self.tenant_concurrency = tenant_concurrency
+        self.batch_limit = max(1, int(max_concurrency * batch_share))
+        self.in_flight = 0
+        self.batch_in_flight = 0
+        self._tenants: Dict[str, int] = {}
+        self._waiters: List[Tuple[int, int, _Waiter]] = []  # Sorted by (priority, arrival)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _fits(self, tenant: str, lane: str) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        if self._tenants.get(tenant, 0) >= self.tenant_concurrency:
+            return False
+        return lane != LANE_BATCH or self.batch_in_flight < self.batch_limit
+
+    def _take(self, tenant: str, lane: str):
+        self.in_flight += 1
+        self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+        if lane == LANE_BATCH:
+            self.batch_in_flight += 1
+
+    def _enqueue(self, waiter: _Waiter) -> Tuple[int, int, _Waiter]:
+        entry = (LANE_PRIORITY[waiter.lane], next(self._sequence), waiter)
+        bisect.insort(self._waiters, entry)
+        return entry
+
+    def _dispatch(self) -> List[_Waiter]:
+        """Admit queued callers that now fit (called with the lock held)."""
+        admitted = []
+        remaining = []
+        for entry in self._waiters:
+            waiter = entry[2]
+            if self.in_flight < self.max_concurrency and self._fits(waiter.tenant, waiter.lane):
+                self._take(waiter.tenant, waiter.lane)
+                waiter.granted = True
+                admitted.append(waiter)
+            else:
+                remaining.append(entry)
+        self._waiters = remaining
+        return admitted
+
+    def _wake(self, waiters: List[_Waiter]):
+        for waiter in waiters:
+            if waiter.event is not None:
+                waiter.event.set()
+                continue
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            except RuntimeError:
+                # Event loop closed while queued: hand the slot back
+                self.release(waiter.tenant, waiter.lane)
+
+    def acquire(self, tenant: str, lane: str = LANE_INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """
+        Take a slot, blocking the calling thread while the limits are full.
+
+        Returns:
+            False if the timeout expired first
+        """
+        waiter = _Waiter(tenant, lane)
+        with self._lock:
+            if self._fits(tenant, lane):
+                self._take(tenant, lane)
+                return True
+            waiter.event = threading.Event()
+            entry = self._enqueue(waiter)
+
+        if waiter.event.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.granted:  # Admitted right at the deadline
+                return True
+            self._waiters.remove(entry)
+        return False
+
+    async def aacquire(self, tenant: str, lane: str = LANE_INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """
+        Take a slot without blocking the event loop.
+
+        Returns:
+            False if the timeout expired first
+        """
+        waiter = _Waiter(tenant, lane)
+        with self._lock:
+            if self._fits(tenant, lane):
+                self._take(tenant, lane)
+                return True
+            waiter.loop = asyncio.get_running_loop()
+            waiter.future = waiter.loop.create_future()
+            entry = self._enqueue(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except BaseException as e:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(entry)
+            if not isinstance(e, asyncio.TimeoutError):
+                if granted:
+                    self.release(tenant, lane)
+                raise
+            return granted
+
+    def release(self, tenant: str, lane: str = LANE_INTERACTIVE):
+        """Return a slot and admit queued callers."""
+        with self._lock:
+            self.in_flight -= 1
+            remaining = self._tenants.get(tenant, 0) - 1
+            if remaining > 0:
+                self._tenants[tenant] = remaining
+            else:
+                self._tenants.pop(tenant, None)
+            if lane == LANE_BATCH:
+                self.batch_in_flight -= 1
+            admitted = self._dispatch()
+        self._wake(admitted)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = {lane: 0 for lane in LANE_PRIORITY}
+            for _, _, waiter in self._waiters:
+                queued[waiter.lane] += 1
+            return {
+                "in_flight": self.in_flight,
+                "batch_in_flight": self.batch_in_flight,
+                "tenants_in_flight": len(self._tenants),
+                "queued": queued,
+                "max_concurrency": self.max_concurrency,
+                "tenant_concurrency": self.tenant_concurrency,
+                "batch_limit": self.batch_limit,
+            }
+
+
+class TokenBudget:
+    """
+    Token bucket measured in tokens per minute.
+
+    A reservation may overdraw the bucket and the caller waits until the
+    debt is refilled, but only up to ``max_wait`` seconds of debt: beyond
+    that the reservation is refused and nothing is taken. Reservations are
+    estimates and are corrected with ``adjust`` once the actual usage is
+    known.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: int, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take tokens from the bucket, overdrawing it if needed.
+
+        Args:
+            tokens: Tokens to take
+            max_wait: Longest acceptable wait (None for unbounded)
+
+        Returns:
+            Seconds to wait before the call may start, or None if that would
+            exceed max_wait (no tokens are taken then)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            remaining = self._tokens - tokens
+            wait = -remaining / self.rate if remaining < 0 else 0.0
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens = remaining
+            return wait
+
+    def take(self, tokens: int) -> float:
+        """
+        Take tokens only if the bucket holds them, never overdrawing it.
+
+        Requests larger than the bucket are admitted once it is full.
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds until they are there
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            needed = min(float(tokens), self.capacity)
+            if self._tokens >= needed:
+                self._tokens -= tokens
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def adjust(self, tokens: int):
+        """Charge (positive) or refund (negative) tokens after the fact."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - tokens)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class _Admission:
+    """Limits applied to one call: tenant, lane and the budgets charged."""
+    __slots__ = ("tenant", "lane", "tokens", "budgets", "pending")
+
+    def __init__(self, tenant: str, lane: str, tokens: int):
+        self.tenant = tenant
+        self.lane = lane
+        self.tokens = tokens
+        self.budgets: List[TokenBudget] = []
+        self.pending: Optional[TokenBudget] = None  # Taken without overdraft in the slot
+
+
+class LLMGateway:
+    """
+    Shared admission control, token budgets and 429 retries for LLM calls.
+
+    ``call``/``acall`` wrap a single request and ``stream``/``astream`` a
+    streamed one; a streamed call holds its slot until the stream ends and
+    is retried only if it fails before the first chunk.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_GATEWAY_MAX_CONCURRENCY,
+        tenant_concurrency: int = LLM_GATEWAY_TENANT_CONCURRENCY,
+        batch_share: float = LLM_GATEWAY_BATCH_SHARE,
+        tokens_per_minute: int = LLM_GATEWAY_TOKENS_PER_MINUTE,
+        tenant_tokens_per_minute: int = LLM_GATEWAY_TENANT_TOKENS_PER_MINUTE,
+        queue_timeout: float = LLM_GATEWAY_QUEUE_TIMEOUT,
+        max_retries: int = LLM_GATEWAY_MAX_RETRIES,
+        retry_base_delay: float = LLM_GATEWAY_RETRY_BASE_DELAY,
+        retry_max_delay: float = LLM_GATEWAY_RETRY_MAX_DELAY
+    ):
+        """
+        Initialize the gateway.
+
+        Args:
+            max_concurrency: Provider calls in flight across all tenants
+            tenant_concurrency: Provider calls in flight per tenant
+            batch_share: Fraction of the slots the batch lane may hold
+            tokens_per_minute: Global token budget (0 disables); the batch
+                lane may use batch_share of it and never overdraws it
+            tenant_tokens_per_minute: Per-tenant token budget (0 disables)
+            queue_timeout: Longest wait for token budget and a slot together
+            max_retries: Retries of rate-limited calls
+            retry_base_delay: First backoff bound (seconds)
+            retry_max_delay: Largest backoff bound (seconds)
+        """
+        self.limiter = ConcurrencyLimiter(max_concurrency, tenant_concurrency, batch_share)
+        self.tokens_per_minute = tokens_per_minute
+        self.tenant_tokens_per_minute = tenant_tokens_per_minute
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self._global_budget = TokenBudget(tokens_per_minute) if tokens_per_minute else None
+        self._batch_budget = (
+            TokenBudget(max(1, int(tokens_per_minute * batch_share))) if tokens_per_minute else None
+        )
+        self._tenant_budgets: Dict[str, TokenBudget] = {}
+        self._clients: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+        self.queue_wait = {lane: LatencyHistogram() for lane in LANE_PRIORITY}
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+
+    # -------------------------------------------------------------------------
+    # Shared clients
+    # -------------------------------------------------------------------------
+
+    def get_client(self, key: Optional[Hashable], factory: Callable[[], Any]) -> Any:
+        """
+        Model client for a configuration, created once and shared.
+
+        Args:
+            key: Hashable configuration (None disables sharing)
+            factory: Creates the client
+
+        Returns:
+            Shared client
+        """
+        if key is None:
+            return factory()
+        with self._lock:
+            client = self._clients.get(key)
+        if client is None:
+            client = factory()
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    # -------------------------------------------------------------------------
+    # Admission
+    # -------------------------------------------------------------------------
+
+    def _tenant_budget(self, tenant: str) -> Optional[TokenBudget]:
+        if not self.tenant_tokens_per_minute:
+            return None
+        budget = self._tenant_budgets.get(tenant)
+        if budget is None:
+            with self._lock:
+                budget = self._tenant_budgets.setdefault(tenant, TokenBudget(self.tenant_tokens_per_minute))
+        return budget
+
+    def _reserve(self, tokens: int) -> Tuple[_Admission, float]:
+        """
+        Reserve tokens for the current tenant and lane.
+
+        Interactive calls overdraw the global budget; batch calls overdraw
+        their own share of it and take from the global budget only what is
+        there (in the slot), so batch debt never delays interactive calls.
+
+        Returns:
+            Admission and the budget wait (at most ``queue_timeout``)
+
+        Raises:
+            LLMError: 503 if the budgets would make the call wait longer
+                than ``queue_timeout``
+        """
+        tenant, lane = current_llm_context()
+        admission = _Admission(tenant, lane, tokens)
+        if not tokens:
+            return admission, 0.0
+        lane_budget = self._batch_budget if lane == LANE_BATCH else self._global_budget
+        delay = 0.0
+        for budget in (lane_budget, self._tenant_budget(tenant)):
+            if budget is None:
+                continue
+            wait = budget.reserve(tokens, max_wait=self.queue_timeout)
+            if wait is None:
+                self._refund(admission)
+                raise self._timeout_error(admission)
+            admission.budgets.append(budget)
+            delay = max(delay, wait)
+        if lane == LANE_BATCH and self._global_budget is not None:
+            admission.pending = self._global_budget
+        return admission, delay
+
+    def _refund(self, admission: _Admission):
+        for budget in admission.budgets:
+            budget.adjust(-admission.tokens)
+        admission.budgets.clear()
+
+    def _take_pending(self, admission: _Admission) -> float:
+        """Take a batch call's global tokens; returns the wait if they are not there yet."""
+        wait = admission.pending.take(admission.tokens)
+        if not wait:
+            admission.budgets.append(admission.pending)
+            admission.pending = None
+        return wait
+
+    def record_usage(self, admission: _Admission, actual_tokens: Optional[int]):
+        """Correct a reservation with the tokens the provider reported."""
+        if not actual_tokens or not admission.tokens:
+            return
+        difference = actual_tokens - admission.tokens
+        for budget in admission.budgets:
+            budget.adjust(difference)
+
+    def _record_wait(self, admission: _Admission, waited: float):
+        self.queue_wait[admission.lane].record(waited)
+        if waited > 0:
+            record_stage(STAGE_LLM_QUEUE, waited)
+
+    def _timeout_error(self, admission: _Admission) -> LLMError:
+        self.timeouts += 1
+        return LLMError(
+            f"LLM gateway queue timeout after {self.queue_timeout:.0f}s",
+            status_code=503,
+            details={"tenant_id": admission.tenant, "lane": admission.lane},
+        )
+
+    @contextmanager
+    def _slot(self, admission: _Admission, budget_wait: float = 0.0) -> Iterator[None]:
+        start = time.perf_counter()
+        deadline = start + self.queue_timeout
+        if budget_wait:
+            time.sleep(budget_wait)
+        while admission.pending is not None:
+            wait = self._take_pending(admission)
+            if time.perf_counter() + wait > deadline:
+                self._refund(admission)
+                raise self._timeout_error(admission)
+            time.sleep(wait)
+        if not self.limiter.acquire(admission.tenant, admission.lane, max(0.0, deadline - time.perf_counter())):
+            self._refund(admission)
+            raise self._timeout_error(admission)
+        self._record_wait(admission, time.perf_counter() - start)
+        self.calls += 1
+        try:
+            yield
+        finally:
+            self.limiter.release(admission.tenant, admission.lane)
+
+    @asynccontextmanager
+    async def _aslot(self, admission: _Admission, budget_wait: float = 0.0) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        deadline = start + self.queue_timeout
+        if budget_wait:
+            await asyncio.sleep(budget_wait)
+        while admission.pending is not None:
+            wait = self._take_pending(admission)
+            if time.perf_counter() + wait > deadline:
+                self._refund(admission)
+                raise self._timeout_error(admission)
+            await asyncio.sleep(wait)
+        if not await self.limiter.aacquire(
+            admission.tenant, admission.lane, max(0.0, deadline - time.perf_counter())
+        ):
+            self._refund(admission)
+            raise self._timeout_error(admission)
+        self._record_wait(admission, time.perf_counter() - start)
+        self.calls += 1
+        try:
+            yield
+        finally:
+            self.limiter.release(admission.tenant, admission.lane)
+
+    def _backoff(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Delay before retrying, or None if the error should propagate."""
+        if attempt >= self.max_retries or not is_rate_limit_error(error):
+            return None
+        self.rate_limited += 1
+        self.retries += 1
+        bound = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return max(random.uniform(0, bound), _retry_after(error))
+
+    # -------------------------------------------------------------------------
+    # Calls
+    # -------------------------------------------------------------------------
+
+    def call(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        tokens: int = 0,
+        usage: Optional[Callable[[Any], Optional[int]]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run a blocking provider call through the gateway.
+
+        Args:
+            fn: Provider call
+            *args: Positional arguments of fn
+            tokens: Estimated token cost (see estimate_request_tokens)
+            usage: Extracts the actual token usage from the result
+            **kwargs: Keyword arguments of fn
+
+        Returns:
+            Result of fn
+        """
+        admission, wait = self._reserve(tokens)
+        for attempt in itertools.count():
+            try:
+                with self._slot(admission, wait):
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                wait = 0.0
+                continue
+            if usage is not None:
+                self.record_usage(admission, usage(result))
+            return result
+
+    async def acall(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        tokens: int = 0,
+        usage: Optional[Callable[[Any], Optional[int]]] = None,
+        **kwargs
+    ) -> Any:
+        """Async variant of ``call`` (fn returns an awaitable)."""
+        admission, wait = self._reserve(tokens)
+        for attempt in itertools.count():
+            try:
+                async with self._aslot(admission, wait):
+                    result = await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                wait = 0.0
+                continue
+            if usage is not None:
+                self.record_usage(admission, usage(result))
+            return result
+
+    def stream(self, fn: Callable[..., Iterator[Any]], *args, tokens: int = 0, **kwargs) -> Iterator[Any]:
+        """
+        Run a streamed provider call through the gateway.
+
+        Args:
+            fn: Returns an iterator of chunks
+            *args: Positional arguments of fn
+            tokens: Estimated token cost
+            **kwargs: Keyword arguments of fn
+
+        Yields:
+            Chunks of fn
+        """
+        admission, wait = self._reserve(tokens)
+        for attempt in itertools.count():
+            started = False
+            try:
+                with self._slot(admission, wait):
+                    for chunk in fn(*args, **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                wait = 0.0
+
+    async def astream(self, fn: Callable[..., AsyncIterator[Any]], *args, tokens: int = 0, **kwargs) -> AsyncIterator[Any]:
+        """Async variant of ``stream`` (fn returns an async iterator)."""
+        admission, wait = self._reserve(tokens)
+        for attempt in itertools.count():
+            started = False
+            try:
+                async with self._aslot(admission, wait):
+                    async for chunk in fn(*args, **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                wait = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gateway counters, limiter state and queueing delay per lane."""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "shared_clients": len(self._clients),
+            "tokens_available": self._global_budget.available if self._global_budget else None,
+            "batch_tokens_available": self._batch_budget.available if self._batch_budget else None,
+            "limiter": self.limiter.get_stats(),
+            "queue_wait": {lane: histogram.get_stats() for lane, histogram in self.queue_wait.items()},
+        }
+
+
+_llm_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the process-wide LLM gateway."""
+    global _llm_gateway
+    if _llm_gateway is None:
+        _llm_gateway = LLMGateway()
+    return _llm_gateway
+
+
+__all__ = [
+    'LLMGateway',
+    'ConcurrencyLimiter',
+    'TokenBudget',
+    'get_llm_gateway',
+    'llm_context',
+    'current_llm_context',
+    'estimate_request_tokens',
+    'is_rate_limit_error',
+    'LANE_INTERACTIVE',
+    'LANE_BATCH',
+    'DEFAULT_TENANT',
+]
@@ -0,0 +1,309 @@
+"""
+Application startup orchestration with readiness gating.
+
+Components are registered with their dependencies and initialized
+concurrently: each one starts as soon as the components it depends on are
+ready, blocking initializers run in worker threads. The API starts serving
+right away; ``/ready`` reports ready once every required component is.
+A required component that fails is retried with backoff in the background,
+and the components skipped because of it start once it recovers.
+
+Expensive components that most requests never touch (Docling, the Manim
+installation check, the rubric store) are not initialized at startup at
+all. They time their first use with ``startup_timer`` so the startup report
+still shows what they cost:
+
+    orchestrator = get_startup_orchestrator()
+    orchestrator.add("database", init_database)
+    orchestrator.add("supervisor", init_supervisor)
+    orchestrator.add("cache", init_cache, required=False)
+    orchestrator.start()
+
+    with startup_timer("rubric_store"):
+        build_rubric_store()
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from utils.core.constants import STARTUP_RETRY_BASE_DELAY, STARTUP_RETRY_MAX_DELAY
+from utils.monitoring import get_logger
+
+logger = get_logger(__name__)
+
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"  # A dependency failed
+STATUS_UNAVAILABLE = "unavailable"  # Optional module not installed
+STATUS_LAZY = "lazy"  # Initialized on first use
+
+
+@dataclass
+class StartupComponent:
+    """A component initialized at startup (or lazily on first use)."""
+
+    name: str
+    init: Optional[Callable[[], Any]] = None
+    depends_on: Sequence[str] = ()
+    required: bool = True
+    status: str = STATUS_PENDING
+    started_at: Optional[float] = None
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    result: Any = field(default=None, repr=False)
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "depends_on": list(self.depends_on),
+            "start_offset": round(self.started_at - origin, 4) if self.started_at is not None else None,
+            "seconds": round(self.seconds, 4) if self.seconds is not None else None,
+            "error": self.error,
+            "attempts": self.attempts,
+        }
+
+
+class StartupOrchestrator:
+    """
+    Concurrent, dependency-ordered component initialization.
+    """
+
+    def __init__(
+        self,
+        retry_base_delay: float = STARTUP_RETRY_BASE_DELAY,
+        retry_max_delay: float = STARTUP_RETRY_MAX_DELAY
+    ):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            retry_base_delay: First delay before retrying a failed required component
+            retry_max_delay: Largest delay between retries
+        """
+        self.components: Dict[str, StartupComponent] = {}
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._origin = time.monotonic()
+        self._finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retries: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        init: Callable[[], Any],
+        depends_on: Sequence[str] = (),
+        required: bool = True
+    ):
+        """
+        Register a component initialized at startup.
+
+        Args:
+            name: Component name (shown in the startup report)
+            init: Initializer; blocking functions run in a worker thread,
+                coroutine functions on the event loop. Raising ImportError
+                marks the component unavailable instead of failed.
+            depends_on: Components that must be ready first
+            required: Whether ``/ready`` waits for this component (a
+                required component that fails is retried with backoff)
+        """
+        self.components[name] = StartupComponent(name, init, tuple(depends_on), required)
+
+    def add_lazy(self, name: str):
+        """Register a component initialized on first use (timed with ``startup_timer``)."""
+        with self._lock:
+            self.components.setdefault(name, StartupComponent(name, required=False, status=STATUS_LAZY))
+
+    async def _run_component(self, component: StartupComponent, tasks: Dict[str, asyncio.Task]):
+        for dependency in component.depends_on:
+            if dependency in tasks:
+                await tasks[dependency]
+            if self.components[dependency].status != STATUS_READY:
+                component.status = STATUS_SKIPPED
+                component.error = f"dependency {dependency} is {self.components[dependency].status}"
+                logger.warning(f"⚠️  Startup: {component.name} skipped ({component.error})")
+                return
+
+        component.status = STATUS_RUNNING
+        component.started_at = time.monotonic()
+        component.error = None
+        component.attempts += 1
+        try:
+            if inspect.iscoroutinefunction(component.init):
+                component.result = await component.init()
+            else:
+                component.result = await asyncio.to_thread(component.init)
+            component.status = STATUS_READY
+        except ImportError as e:
+            component.status = STATUS_UNAVAILABLE
+            component.error = str(e)
+            logger.warning(f"⚠️  Startup: {component.name} not available ({e})")
+        except Exception as e:
+            component.status = STATUS_FAILED
+            component.error = str(e)
+            logger.error(f"❌ Startup: {component.name} failed: {e}")
+        finally:
+            component.seconds = time.monotonic() - component.started_at
+        if component.status == STATUS_READY:
+            logger.info(f"✅ Startup: {component.name} ready in {component.seconds:.2f}s")
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Initialize all registered components, independent ones concurrently.
+
+        Returns:
+            Startup report (see ``get_report``)
+        """
+        self._origin = time.monotonic()
+        pending = [c for c in self.components.values() if c.init is not None and c.status == STATUS_PENDING]
+        for component in pending:
+            unknown = [d for d in component.depends_on if d not in self.components]
+            if unknown:
+                raise ValueError(f"Startup component {component.name} depends on unknown {unknown}")
+
+        await self._run_components(pending)
+        self._finished_at = time.monotonic()
+        for component in pending:
+            if component.required and component.status == STATUS_FAILED:
+                self._retries[component.name] = asyncio.create_task(
+                    self._retry(component), name=f"startup-retry:{component.name}"
+                )
+
+        report = self.get_report()
+        logger.info(
+            f"🚀 Startup finished in {report['total_seconds']:.2f}s "
+            f"({'ready' if report['ready'] else 'NOT ready'})"
+        )
+        for name, entry in sorted(report["components"].items(), key=lambda item: -(item[1]["seconds"] or 0)):
+            if entry["seconds"] is not None:
+                logger.info(f"   → {name:<20} {entry['status']:<12} {entry['seconds']:7.2f}s")
+        return report
+
+    async def _run_components(self, components: Sequence[StartupComponent]):
+        tasks: Dict[str, asyncio.Task] = {}
+        for component in components:
+            tasks[component.name] = asyncio.create_task(
+                self._run_component(component, tasks), name=f"startup:{component.name}"
+            )
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def _retry(self, component: StartupComponent):
+        """Retry a failed required component with backoff, then start what was skipped."""
+        delay = self.retry_base_delay
+        while component.status == STATUS_FAILED:
+            await asyncio.sleep(delay)
+            delay = min(self.retry_max_delay, delay * 2)
+            logger.info(f"🔄 Startup: retrying {component.name} (attempt {component.attempts + 1})")
+            await self._run_component(component, {})
+        if component.status != STATUS_READY:
+            return
+
+        # Components skipped for a dependency that is still failing are skipped again
+        skipped = [c for c in self.components.values() if c.status == STATUS_SKIPPED]
+        for dependent in skipped:
+            dependent.status = STATUS_PENDING
+            dependent.error = None
+        await self._run_components(skipped)
+        if self.ready:
+            logger.info(f"🚀 Startup ready after {component.name} recovered")
+
+    def start(self) -> asyncio.Task:
+        """Run ``run`` in the background of the current event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="startup")
+        return self._task
+
+    async def stop(self):
+        """Cancel a startup still in progress and pending retries (shutdown during startup)."""
+        for task in [self._task, *self._retries.values()]:
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._retries.clear()
+
+    @property
+    def ready(self) -> bool:
+        """Whether every required component initialized successfully."""
+        return all(
+            component.status in (STATUS_READY, STATUS_UNAVAILABLE)
+            for component in self.components.values()
+            if component.required
+        )
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the first initialization of a lazy component."""
+        self.add_lazy(name)
+        component = self.components[name]
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            component.status = STATUS_FAILED
+            component.error = str(e)
+            raise
+        else:
+            component.status = STATUS_READY
+            component.error = None
+        finally:
+            if component.started_at is None:
+                component.started_at = started
+            component.seconds = time.monotonic() - started
+
+    def get_report(self) -> Dict[str, Any]:
+        end = self._finished_at or time.monotonic()
+        return {
+            "ready": self.ready,
+            "finished": self._finished_at is not None,
+            "total_seconds": round(end - self._origin, 4),
+            "components": {
+                name: component.to_dict(self._origin) for name, component in self.components.items()
+            },
+        }
+
+
+_startup_orchestrator: Optional[StartupOrchestrator] = None
+
+
+def get_startup_orchestrator() -> StartupOrchestrator:
+    """Get or create the process-wide startup orchestrator."""
+    global _startup_orchestrator
+    if _startup_orchestrator is None:
+        _startup_orchestrator = StartupOrchestrator()
+    return _startup_orchestrator
+
+
+def startup_timer(name: str):
+    """
+    Time the first-use initialization of a lazy component for the startup report.
+
+    Args:
+        name: Component name
+    """
+    return get_startup_orchestrator().timer(name)
+
+
+__all__ = [
+    "StartupComponent",
+    "StartupOrchestrator",
+    "get_startup_orchestrator",
+    "startup_timer",
+]
@@ -31,6 +31,14 @@ class CircuitBreakerConfig:
     success_threshold: int = 2  # Successes to close from half-open
     timeout: int = 60  # Seconds before attempting recovery
     half_open_max_calls: int = 3  # Max calls in half-open state
+    
+    def __post_init__(self):
+        # Fewer probes than successes needed would leave the breaker half-open forever
+        if self.half_open_max_calls < self.success_threshold:
+            raise ValueError(
+                f"half_open_max_calls ({self.half_open_max_calls}) must be >= "
+                f"success_threshold ({self.success_threshold})"
+            )
 
 
 class CircuitBreaker:
@@ -64,6 +72,7 @@ class CircuitBreaker:
         self.success_count = 0
         self.last_failure_time: Optional[float] = None
         self.half_open_calls = 0
+        self._half_open_generation = 0  # Bumped on every OPEN -> HALF_OPEN
         
         # Metrics
         self.total_calls = 0
@@ -139,6 +148,7 @@ class CircuitBreaker:
             logger.info(f"Circuit breaker {self.name}: OPEN -> HALF_OPEN (timeout)")
             self.state = CircuitState.HALF_OPEN
             self.half_open_calls = 0
+            self._half_open_generation += 1
         
         # Check state
         if self.state == CircuitState.OPEN:
@@ -148,6 +158,7 @@ class CircuitBreaker:
             )
         
         # Limit calls in half-open state
+        probe_generation = None
         if self.state == CircuitState.HALF_OPEN:
             if self.half_open_calls >= self.config.half_open_max_calls:
                 self.total_rejected += 1
@@ -155,6 +166,7 @@ class CircuitBreaker:
                     f"Circuit breaker {self.name} is HALF_OPEN (max calls reached)"
                 )
             self.half_open_calls += 1
+            probe_generation = self._half_open_generation
         
         # Execute function
         try:
@@ -166,6 +178,18 @@ class CircuitBreaker:
             self._record_success()
             return result
             
+        except asyncio.CancelledError:
+            # Abandoned probe (e.g. the losing side of a hedged request):
+            # neither a success nor a failure, so hand its slot back
+            if (
+                probe_generation is not None
+                and self.state == CircuitState.HALF_OPEN
+                and probe_generation == self._half_open_generation
+                and self.half_open_calls > 0
+            ):
+                self.half_open_calls -= 1
+            raise
+            
         except Exception as e:
             self._record_failure()
             raise
@@ -2,10 +2,12 @@
 Machine Learning & Adaptive Features Package
 
 Provides intelligent learning and adaptation capabilities:
-- Query pattern learning and prediction
+- Query pattern learning and prediction (append-only record log persistence)
 - Adaptive rubrics that learn from feedback (numerical & LLM-based)
-- User profiling and personalization
+- User profiling and personalization (LRU + write-behind profile store)
 - Student/Professor profiling from L3 Learning Store (Phase 3)
+- Cached professor override bias statistics
+- Online task duration model (p50/p90 per task type)
 
 All features degrade gracefully if dependencies are unavailable.
 """
@@ -16,9 +18,11 @@ from .query_learner import (
     QueryRecord,
     get_query_learner,
     save_query_learner,
+    close_query_learner,
     learn_from_query,
     predict_best_tool,
 )
+from .record_log import RecordLog
 
 # Adaptive rubrics
 from .adaptive_rubric import (
@@ -33,7 +37,24 @@ from .user_profile import (
     UserProfileManager,
     get_user_profile_manager,
     get_user_preferences,
-    update_user_profile
+    update_user_profile,
+    close_profile_manager,
+)
+from .profile_store import ProfileStore
+
+# Professor override bias statistics (incremental, cached)
+from .bias_model import (
+    BiasModelService,
+    CriterionStats,
+    get_bias_model_service,
+)
+
+# Task duration model (background task admission)
+from .duration_model import (
+    DurationEstimate,
+    OnlineDurationModel,
+    task_features,
+    evaluate_timings,
 )
 
 # Phase 3: Student/Professor profiling (LLM-based, L3 Learning Store)
@@ -50,6 +71,8 @@ __all__ = [
     'QueryRecord',
     'get_query_learner',
     'save_query_learner',
+    'close_query_learner',
+    'RecordLog',
     'learn_from_query',
     'predict_best_tool',
     
@@ -64,6 +87,19 @@ __all__ = [
     'get_user_profile_manager',
     'get_user_preferences',
     'update_user_profile',
+    'close_profile_manager',
+    'ProfileStore',
+    
+    # Override bias model
+    'BiasModelService',
+    'CriterionStats',
+    'get_bias_model_service',
+    
+    # Task duration model
+    'DurationEstimate',
+    'OnlineDurationModel',
+    'task_features',
+    'evaluate_timings',
     
     # Phase 3: Profiling (L3-based)
     'check_past_overrides',
@@ -0,0 +1,464 @@
+"""
+Professor Override Bias Model
+
+Per-(professor, rubric_type) running statistics of how professors correct
+AI criterion scores, used to decide whether a new AI grade needs
+reconciliation.
+
+Instead of re-querying and re-aggregating recent GradeException rows for
+every submission, each criterion keeps (count, mean, M2) updated with
+Welford's algorithm when a correction is recorded. Reads are O(1) dict
+lookups, so grading a 200-student class analyses overrides once, not 200
+times. A vectorized batch recompute (numpy) rebuilds statistics from the
+L3 Learning Store for cold caches and backfills.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Database imports
+try:
+    from database.core.connection import get_session
+    from database.models import GradeException
+    from sqlalchemy import and_, desc
+    DATABASE_AVAILABLE = True
+except ImportError:
+    DATABASE_AVAILABLE = False
+
+
+# Exception statuses that count towards a professor's bias profile
+COUNTED_STATUSES = ('analyzed', 'learned')
+
+# Minimum |mean adjustment| (points) to flag a criterion as biased
+BIAS_MIN_ADJUSTMENT = 2.0
+
+# Maximum std-dev (points) for a bias to be considered systematic
+BIAS_MAX_STD_DEV = 5.0
+
+# Recent corrections kept per key for explanations/patterns
+RECENT_PATTERNS_LIMIT = 20
+
+# Seconds before a cached model is reloaded from the database, so
+# corrections recorded by other processes are eventually picked up
+MODEL_TTL_SECONDS = 600
+
+
+class CriterionStats:
+    """Running mean/variance of score adjustments for one criterion (Welford)."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'CriterionStats') -> None:
+        """Combine with another partial aggregate (Chan et al.)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance of adjustments."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation of adjustments."""
+        return self.variance ** 0.5
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "average_adjustment": round(self.mean, 2),
+            "std_dev": round(self.std_dev, 2),
+            "sample_size": self.count,
+        }
+
+
+class ProfessorBiasModel:
+    """Override statistics for one (professor, rubric_type) pair."""
+
+    __slots__ = ('criteria', 'corrections', 'recent', 'loaded_at')
+
+    def __init__(self):
+        self.criteria: Dict[str, CriterionStats] = {}
+        self.corrections = 0
+        self.recent = deque(maxlen=RECENT_PATTERNS_LIMIT)
+        self.loaded_at = time.time()
+
+    def observe(
+        self,
+        ai_scores: Dict[str, float],
+        professor_scores: Dict[str, float],
+        reason: Optional[str] = None,
+        date: Optional[str] = None,
+        score_difference: Optional[float] = None
+    ) -> None:
+        """Fold one professor correction into the running statistics."""
+        for criterion, prof_score in professor_scores.items():
+            if criterion in ai_scores:
+                try:
+                    diff = float(prof_score) - float(ai_scores[criterion])
+                except (TypeError, ValueError):
+                    continue
+                stats = self.criteria.get(criterion)
+                if stats is None:
+                    stats = self.criteria[criterion] = CriterionStats()
+                stats.update(diff)
+
+        self.corrections += 1
+        self.recent.appendleft({
+            "date": date,
+            "ai_scores": ai_scores,
+            "professor_scores": professor_scores,
+            "reason": reason,
+            "score_difference": score_difference,
+        })
+
+    def systematic_bias(
+        self,
+        min_adjustment: float = BIAS_MIN_ADJUSTMENT,
+        max_std_dev: Optional[float] = BIAS_MAX_STD_DEV
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Criteria with a significant (and, optionally, consistent) bias.
+
+        Args:
+            min_adjustment: Minimum |mean adjustment| to flag
+            max_std_dev: Maximum std-dev to flag (None disables the check)
+
+        Returns:
+            Mapping of criterion to its statistics
+        """
+        return {
+            criterion: stats.to_dict()
+            for criterion, stats in self.criteria.items()
+            if abs(stats.mean) > min_adjustment
+            and (max_std_dev is None or stats.std_dev < max_std_dev)
+        }
+
+
+def _extract_scores(exception) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Pull (ai, professor) criterion scores out of a GradeException."""
+    ai_decision = exception.ai_decision or {}
+    correct_decision = exception.correct_decision or {}
+    return (
+        ai_decision.get("criterion_scores", {}) or {},
+        correct_decision.get("criterion_scores", {}) or {},
+    )
+
+
+def batch_criterion_stats(pairs: Iterable[Tuple[Dict[str, float], Dict[str, float]]]) -> Dict[str, CriterionStats]:
+    """
+    Compute per-criterion adjustment statistics for many corrections at once.
+
+    Differences are gathered into one array per criterion and reduced with
+    numpy (mean and sum of squared deviations in a single pass each).
+    Falls back to incremental Welford updates without numpy.
+
+    Args:
+        pairs: Iterable of (ai_scores, professor_scores) dicts
+
+    Returns:
+        Mapping of criterion to CriterionStats
+    """
+    diffs: Dict[str, List[float]] = defaultdict(list)
+    for ai_scores, prof_scores in pairs:
+        for criterion, prof_score in prof_scores.items():
+            if criterion in ai_scores:
+                try:
+                    diffs[criterion].append(float(prof_score) - float(ai_scores[criterion]))
+                except (TypeError, ValueError):
+                    continue
+
+    result: Dict[str, CriterionStats] = {}
+    for criterion, values in diffs.items():
+        if NUMPY_AVAILABLE:
+            arr = np.asarray(values, dtype=np.float64)
+            mean = float(arr.mean())
+            result[criterion] = CriterionStats(
+                count=int(arr.size),
+                mean=mean,
+                m2=float(np.square(arr - mean).sum()),
+            )
+        else:
+            stats = CriterionStats()
+            for value in values:
+                stats.update(value)
+            result[criterion] = stats
+
+    return result
+
+
+class BiasModelService:
+    """
+    Cache of ProfessorBiasModel instances with incremental updates.
+
+    Features:
+    - O(1) reads per grading call after first load
+    - Welford updates when a correction is recorded
+    - Vectorized batch recompute for cold keys and backfills
+    - TTL refresh so other processes' corrections are picked up
+    """
+
+    def __init__(self, ttl_seconds: float = MODEL_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._models: Dict[Tuple[str, str], ProfessorBiasModel] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_model(self, professor_id: str, rubric_type: str) -> ProfessorBiasModel:
+        """
+        Get the bias model for a professor/rubric type, loading it if needed.
+
+        Args:
+            professor_id: Professor's user ID
+            rubric_type: Type of rubric (essay, code, etc.)
+
+        Returns:
+            ProfessorBiasModel (empty if no corrections or no database)
+        """
+        key = (professor_id, rubric_type)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None and time.time() - model.loaded_at < self.ttl_seconds:
+                self.hits += 1
+                return model
+            self.misses += 1
+
+        # Load outside the lock; concurrent loaders produce identical models
+        model = self.recompute(professor_id, rubric_type)
+        with self._lock:
+            self._models[key] = model
+        return model
+
+    def analyze(
+        self,
+        professor_id: str,
+        rubric_type: str,
+        max_std_dev: Optional[float] = BIAS_MAX_STD_DEV
+    ) -> Dict[str, Any]:
+        """
+        Override analysis in the check_past_overrides result format.
+
+        Args:
+            professor_id: Professor's user ID
+            rubric_type: Type of rubric
+            max_std_dev: Consistency threshold (None = mean-only check)
+
+        Returns:
+            Dictionary with found, count, patterns, systematic_bias, recommendation
+        """
+        model = self.get_model(professor_id, rubric_type)
+
+        if model.corrections == 0:
+            return {
+                "found": False,
+                "count": 0,
+                "patterns": [],
+                "systematic_bias": {},
+                "recommendation": "Use original AI grade"
+            }
+
+        systematic_bias = model.systematic_bias(max_std_dev=max_std_dev)
+
+        return {
+            "found": True,
+            "count": model.corrections,
+            "patterns": list(model.recent),
+            "systematic_bias": systematic_bias,
+            "recommendation": "Apply reconciliation" if systematic_bias else "Use original AI grade",
+            "analysis": f"Found {model.corrections} past corrections with {len(systematic_bias)} systematic biases detected"
+        }
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record_correction(
+        self,
+        professor_id: str,
+        rubric_type: str,
+        ai_scores: Dict[str, float],
+        professor_scores: Dict[str, float],
+        reason: Optional[str] = None,
+        date: Optional[str] = None,
+        score_difference: Optional[float] = None
+    ) -> None:
+        """
+        Incrementally apply a professor correction to a cached model.
+
+        Keys not yet cached are left alone; they are loaded in full
+        (including this correction) on first read.
+        """
+        key = (professor_id, rubric_type)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                model.observe(ai_scores, professor_scores, reason, date, score_difference)
+
+    def record_exception(self, exception, previous_status: Optional[str] = None) -> None:
+        """
+        Apply a GradeException once it enters a counted status.
+
+        Args:
+            exception: GradeException row
+            previous_status: Status before the change (to avoid double counting)
+        """
+        if exception.exception_type != 'grading_correction':
+            return
+        if exception.status not in COUNTED_STATUSES or previous_status in COUNTED_STATUSES:
+            return
+
+        ai_scores, prof_scores = _extract_scores(exception)
+        self.record_correction(
+            exception.user_id,
+            exception.rubric_type,
+            ai_scores,
+            prof_scores,
+            reason=exception.correction_reason,
+            date=exception.created_at.isoformat() if exception.created_at else None,
+            score_difference=exception.score_difference
+        )
+
+    def invalidate(self, professor_id: Optional[str] = None, rubric_type: Optional[str] = None) -> None:
+        """Drop cached models (all, per professor, or one key)."""
+        with self._lock:
+            if professor_id is None:
+                self._models.clear()
+            elif rubric_type is not None:
+                self._models.pop((professor_id, rubric_type), None)
+            else:
+                for key in [k for k in self._models if k[0] == professor_id]:
+                    del self._models[key]
+
+    # ------------------------------------------------------------------
+    # Batch recompute
+    # ------------------------------------------------------------------
+
+    def _query_corrections(self, db, professor_id: Optional[str] = None, rubric_type: Optional[str] = None):
+        """Query counted grading corrections, newest first."""
+        conditions = [
+            GradeException.exception_type == 'grading_correction',
+            GradeException.status.in_(COUNTED_STATUSES),
+        ]
+        if professor_id is not None:
+            conditions.append(GradeException.user_id == professor_id)
+        if rubric_type is not None:
+            conditions.append(GradeException.rubric_type == rubric_type)
+
+        return db.query(GradeException).filter(and_(*conditions)).order_by(desc(GradeException.created_at))
+
+    @staticmethod
+    def _build_model(exceptions: List[Any]) -> ProfessorBiasModel:
+        """Build a model from exceptions (newest first)."""
+        model = ProfessorBiasModel()
+        model.criteria = batch_criterion_stats(_extract_scores(exc) for exc in exceptions)
+        model.corrections = len(exceptions)
+
+        for exc in exceptions[:RECENT_PATTERNS_LIMIT]:
+            ai_scores, prof_scores = _extract_scores(exc)
+            model.recent.append({
+                "date": exc.created_at.isoformat() if exc.created_at else None,
+                "ai_scores": ai_scores,
+                "professor_scores": prof_scores,
+                "reason": exc.correction_reason,
+                "score_difference": exc.score_difference,
+            })
+        return model
+
+    def recompute(self, professor_id: str, rubric_type: str) -> ProfessorBiasModel:
+        """
+        Rebuild one model from the L3 Learning Store.
+
+        Returns:
+            ProfessorBiasModel (empty if the database is unavailable)
+        """
+        if not DATABASE_AVAILABLE:
+            return ProfessorBiasModel()
+
+        db = get_session()
+        try:
+            exceptions = self._query_corrections(db, professor_id, rubric_type).all()
+            return self._build_model(exceptions)
+        finally:
+            db.close()
+
+    def backfill(self) -> int:
+        """
+        Rebuild every (professor, rubric_type) model in one pass.
+
+        Returns:
+            Number of models loaded
+        """
+        if not DATABASE_AVAILABLE:
+            return 0
+
+        db = get_session()
+        try:
+            grouped: Dict[Tuple[str, str], List[Any]] = defaultdict(list)
+            for exc in self._query_corrections(db).yield_per(1000):
+                grouped[(exc.user_id, exc.rubric_type)].append(exc)
+
+            models = {key: self._build_model(excs) for key, excs in grouped.items()}
+        finally:
+            db.close()
+
+        with self._lock:
+            self._models.update(models)
+
+        return len(models)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cached_models": len(self._models),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Global instance
+_bias_model_service: Optional[BiasModelService] = None
+
+
+def get_bias_model_service() -> BiasModelService:
+    """Get or create global bias model service."""
+    global _bias_model_service
+    if _bias_model_service is None:
+        _bias_model_service = BiasModelService()
+    return _bias_model_service
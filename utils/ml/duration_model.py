@@ -0,0 +1,400 @@
+"""
+Task Duration Model
+
+Online per-task-type model of how long a task runs, used to decide whether
+a task runs inline, is forked to the background or has to queue.
+
+Each task type fits ``log(duration) ≈ w · [1, features]`` by recursive least
+squares with exponential forgetting, so the model follows drift (a slower
+model provider, a busier render host) with memory fixed at O(features²).
+The spread comes from the recent out-of-sample residuals: p50 and p90 are
+the prediction shifted by the residuals' median and 90th percentile. Until
+a task type has ``DURATION_MODEL_MIN_SAMPLES`` timings the plain average of
+what was seen is used (and the type's default before anything was seen).
+
+Features (see ``task_features``): question length, requested render
+quality, complexity keywords, retrieval chunk count and how many tasks of
+the same type are already running or waiting for a slot.
+
+Offline evaluation on recorded timings:
+
+    python -m utils.ml.duration_model --dir <TASK_TIMINGS_DIR>
+
+Timings are recorded when ``settings.task_timings_dir`` is set.
+"""
+
+import argparse
+import math
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.core.constants import (
+    DURATION_MODEL_FORGETTING,
+    DURATION_MODEL_MIN_SAMPLES,
+    DURATION_MODEL_RESIDUAL_WINDOW,
+)
+from .record_log import RecordLog
+
+
+FEATURE_NAMES = ["log_words", "quality", "complexity", "log_chunks", "log_load", "log_queued"]
+
+# Manim quality flags (-ql / -qm / -qh / -qp) as ordinal levels
+QUALITY_LEVELS = {
+    "low_quality": 0,
+    "medium_quality": 1,
+    "high_quality": 2,
+    "production_quality": 3,
+}
+_QUALITY_KEYWORDS = [
+    (3, ["4k", "production quality", "best quality"]),
+    (2, ["high quality", "hd", "1080p", "detailed"]),
+    (0, ["low quality", "quick", "draft", "preview", "simple"]),
+]
+
+# Requests that make animations and analyses longer
+_COMPLEXITY_KEYWORDS = [
+    "3d", "step by step", "step-by-step", "compare", "derivation", "proof",
+    "transform", "graph", "matrix", "sequence", "multiple", "each",
+    "neural network", "algorithm", "all ",
+]
+_MAX_COMPLEXITY = 5
+
+# Predictions are kept within these bounds (seconds)
+_MIN_DURATION = 0.05
+_MAX_DURATION = 3600.0
+
+# Timings are recorded with this kind in the task timing log
+TIMING_RECORD = "timing"
+
+
+def task_features(
+    question: str = "",
+    quality: Optional[str] = None,
+    chunk_count: Optional[int] = None,
+    load: int = 0,
+    queued: int = 0
+) -> List[float]:
+    """
+    Feature vector of a task (order of FEATURE_NAMES).
+
+    Args:
+        question: User question
+        quality: Requested render quality (QUALITY_LEVELS key); detected
+            from the question if not given
+        chunk_count: Document chunks the task retrieves, if known
+        load: Tasks of the same type already running
+        queued: Tasks of the same type waiting for a slot
+
+    Returns:
+        Features
+    """
+    question_lower = f" {question.lower()} "
+
+    level = QUALITY_LEVELS.get(quality) if quality else None
+    if level is None:
+        level = 1
+        for keyword_level, keywords in _QUALITY_KEYWORDS:
+            if any(re.search(rf"\b{re.escape(keyword)}\b", question_lower) for keyword in keywords):
+                level = keyword_level
+                break
+
+    complexity = sum(1 for keyword in _COMPLEXITY_KEYWORDS if keyword in question_lower)
+
+    return [
+        math.log1p(len(question.split())),
+        float(level),
+        float(min(complexity, _MAX_COMPLEXITY)),
+        math.log1p(max(0, chunk_count or 0)),
+        math.log1p(max(0, load)),
+        math.log1p(max(0, queued)),
+    ]
+
+
+@dataclass
+class DurationEstimate:
+    """Predicted task duration."""
+    p50: float  # Median duration (seconds)
+    p90: float  # 90th percentile duration (seconds)
+    samples: int  # Timings the prediction is based on
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank quantile of sorted values."""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class OnlineDurationModel:
+    """
+    Online log-linear duration model of one task type.
+
+    Not thread-safe; the owner serializes predict/update.
+    """
+
+    def __init__(
+        self,
+        prior_seconds: float,
+        min_samples: int = DURATION_MODEL_MIN_SAMPLES,
+        forgetting: float = DURATION_MODEL_FORGETTING,
+        window: int = DURATION_MODEL_RESIDUAL_WINDOW,
+        prior_variance: float = 1.0
+    ):
+        """
+        Initialize model.
+
+        Args:
+            prior_seconds: Duration assumed before any timing was seen
+            min_samples: Timings before the model replaces the average
+            forgetting: RLS forgetting factor (1.0 = never forget)
+            window: Recent residuals kept for the p50/p90 spread
+            prior_variance: Initial (and maximum) weight variance
+        """
+        self.prior_seconds = prior_seconds
+        self.min_samples = min_samples
+        self.forgetting = forgetting
+        self.prior_variance = prior_variance
+
+        size = len(FEATURE_NAMES) + 1
+        self.weights = [math.log(prior_seconds)] + [0.0] * (size - 1)
+        self.covariance = [[prior_variance if i == j else 0.0 for j in range(size)] for i in range(size)]
+        self.residuals: deque = deque(maxlen=window)
+        self.recent: deque = deque(maxlen=min_samples)
+        self.samples = 0
+
+    def _predict_log(self, x: List[float]) -> float:
+        y = sum(w * v for w, v in zip(self.weights, x))
+        return min(math.log(_MAX_DURATION), max(math.log(_MIN_DURATION), y))
+
+    def predict(self, features: List[float]) -> DurationEstimate:
+        """
+        Predict the duration of a task.
+
+        Args:
+            features: Task features (see task_features)
+
+        Returns:
+            p50/p90 estimate
+        """
+        if not self.recent:
+            return DurationEstimate(self.prior_seconds, self.prior_seconds, 0)
+
+        if self.samples < self.min_samples:
+            durations = sorted(self.recent)
+            return DurationEstimate(sum(durations) / len(durations), _quantile(durations, 0.9), self.samples)
+
+        y = self._predict_log([1.0] + list(features))
+        residuals = sorted(self.residuals)
+        return DurationEstimate(
+            math.exp(y + _quantile(residuals, 0.5)),
+            math.exp(y + _quantile(residuals, 0.9)),
+            self.samples
+        )
+
+    def update(self, features: List[float], duration: float):
+        """
+        Learn from the duration a task actually took.
+
+        Args:
+            features: Task features (see task_features)
+            duration: Duration in seconds
+        """
+        duration = min(_MAX_DURATION, max(_MIN_DURATION, duration))
+        x = [1.0] + list(features)
+        y = math.log(duration)
+
+        # Out-of-sample residual (predicted before learning from this task)
+        self.residuals.append(y - self._predict_log(x))
+        self.recent.append(duration)
+        self.samples += 1
+
+        # Recursive least squares update with forgetting
+        p, lam = self.covariance, self.forgetting
+        px = [sum(row[j] * x[j] for j in range(len(x))) for row in p]
+        gain_denominator = lam + sum(x[i] * px[i] for i in range(len(x)))
+        gain = [v / gain_denominator for v in px]
+        error = y - sum(w * v for w, v in zip(self.weights, x))
+        self.weights = [w + k * error for w, k in zip(self.weights, gain)]
+        self.covariance = [
+            [(p[i][j] - gain[i] * px[j]) / lam for j in range(len(x))]
+            for i in range(len(x))
+        ]
+
+        # Forgetting inflates directions the data does not vary in; bound
+        # each weight's variance by the prior (scaling only the inflated
+        # rows/columns, so well-excited directions keep adapting)
+        scale = [min(1.0, math.sqrt(self.prior_variance / self.covariance[i][i]))
+                 if self.covariance[i][i] > 0 else 1.0 for i in range(len(x))]
+        if any(v < 1.0 for v in scale):
+            self.covariance = [
+                [v * scale[i] * scale[j] for j, v in enumerate(row)]
+                for i, row in enumerate(self.covariance)
+            ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state."""
+        return {
+            "weights": self.weights,
+            "covariance": self.covariance,
+            "residuals": list(self.residuals),
+            "recent": list(self.recent),
+            "samples": self.samples,
+        }
+
+    def load_dict(self, state: Dict[str, Any]):
+        """Restore state saved with to_dict (ignored if the feature set changed)."""
+        if len(state.get("weights", [])) != len(self.weights):
+            return
+        self.weights = [float(w) for w in state["weights"]]
+        self.covariance = [[float(v) for v in row] for row in state["covariance"]]
+        self.residuals.extend(state.get("residuals", []))
+        self.recent.extend(state.get("recent", []))
+        self.samples = int(state.get("samples", 0))
+
+
+# =============================================================================
+# OFFLINE EVALUATION
+# =============================================================================
+
+def load_timings(storage_dir: str) -> List[Dict[str, Any]]:
+    """
+    Read recorded task timings (those logged since the last snapshot).
+
+    Timings recorded with a different feature set are skipped.
+
+    Args:
+        storage_dir: Task timing log directory
+
+    Returns:
+        Timings as {"task_type", "features", "duration"} in recorded order
+    """
+    _, _, records = RecordLog(storage_dir, "task_timings").load()
+    return [
+        {"task_type": payload[0], "features": payload[1], "duration": payload[2]}
+        for _, kind, payload in records
+        if kind == TIMING_RECORD and len(payload[1]) == len(FEATURE_NAMES)
+    ]
+
+
+def evaluate_timings(
+    timings: Iterable[Dict[str, Any]],
+    priors: Dict[str, float],
+    threshold: float,
+    history: int = 100
+) -> Dict[str, Any]:
+    """
+    Replay timings through fresh models and the previous estimator.
+
+    Evaluation is prequential: every timing is predicted before either
+    estimator learns from it. The previous estimator is the average of the
+    last ``history`` durations of the task type (its default before any).
+    A task counts as misrouted when the estimate puts it on the wrong side
+    of ``threshold`` (the model uses p90, as the admission decision does).
+
+    Args:
+        timings: Recorded timings (see load_timings)
+        priors: Default duration per task type
+        threshold: Long-running threshold (seconds)
+        history: Durations the previous estimator averaged
+
+    Returns:
+        Metrics of "model" and "average" over all timings
+    """
+    models: Dict[str, OnlineDurationModel] = {}
+    averages: Dict[str, deque] = {}
+    results = {
+        name: {"errors": [], "ratios": [], "forked_short": 0, "inline_long": 0, "covered": 0}
+        for name in ("model", "average")
+    }
+    count = 0
+
+    def score(name: str, p50: float, p90: float, actual: float):
+        result = results[name]
+        result["errors"].append(abs(p50 - actual))
+        result["ratios"].append(max(p50, actual) / max(min(p50, actual), _MIN_DURATION))
+        result["covered"] += actual <= p90
+        if p90 >= threshold and actual < threshold:
+            result["forked_short"] += 1
+        elif p90 < threshold and actual >= threshold:
+            result["inline_long"] += 1
+
+    for timing in timings:
+        task_type, features, actual = timing["task_type"], timing["features"], timing["duration"]
+        prior = priors.get(task_type, priors.get("unknown", 5.0))
+
+        model = models.setdefault(task_type, OnlineDurationModel(prior))
+        estimate = model.predict(features)
+        score("model", estimate.p50, estimate.p90, actual)
+
+        recent = averages.setdefault(task_type, deque(maxlen=history))
+        average = sum(recent) / len(recent) if recent else prior
+        score("average", average, average, actual)
+
+        model.update(features, actual)
+        recent.append(actual)
+        count += 1
+
+    report: Dict[str, Any] = {"timings": count}
+    for name, result in results.items():
+        misrouted = result["forked_short"] + result["inline_long"]
+        report[name] = {
+            "mae_seconds": sum(result["errors"]) / count if count else 0.0,
+            "median_ratio_error": _quantile(sorted(result["ratios"]), 0.5) if count else 0.0,
+            "p90_coverage": result["covered"] / count if count else 0.0,
+            "forked_short": result["forked_short"],
+            "inline_long": result["inline_long"],
+            "misrouted_rate": misrouted / count if count else 0.0,
+        }
+    return report
+
+
+def main():
+    """Evaluate the duration model on recorded timings."""
+    from config import settings
+    from utils.concurrent_execution import TaskDurationEstimator
+
+    parser = argparse.ArgumentParser(description="Offline evaluation of the task duration model")
+    parser.add_argument("--dir", default=settings.task_timings_dir, help="Task timing log directory")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=TaskDurationEstimator.LONG_RUNNING_THRESHOLD,
+        help="Long-running threshold (seconds)"
+    )
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir is required when TASK_TIMINGS_DIR is not set")
+
+    timings = load_timings(args.dir)
+    if not timings:
+        print(f"⚠️  No recorded timings in {args.dir}")
+        return
+
+    priors = {task_type.value: seconds for task_type, seconds in TaskDurationEstimator.DEFAULT_DURATIONS.items()}
+    report = evaluate_timings(timings, priors, args.threshold)
+
+    print(f"📊 {report['timings']} timings, long-running threshold {args.threshold:.0f}s")
+    print(f"{'':<12}{'MAE':>9}{'ratio':>8}{'p90 cov':>9}{'fork<th':>9}{'inline>th':>11}{'misrouted':>11}")
+    for name in ("average", "model"):
+        m = report[name]
+        print(
+            f"{name:<12}{m['mae_seconds']:>8.1f}s{m['median_ratio_error']:>8.2f}{m['p90_coverage']:>9.0%}"
+            f"{m['forked_short']:>9}{m['inline_long']:>11}{m['misrouted_rate']:>11.1%}"
+        )
+
+
+__all__ = [
+    'FEATURE_NAMES',
+    'QUALITY_LEVELS',
+    'TIMING_RECORD',
+    'DurationEstimate',
+    'OnlineDurationModel',
+    'task_features',
+    'load_timings',
+    'evaluate_timings',
+]
+
+
+if __name__ == "__main__":
+    main()
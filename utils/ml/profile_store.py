@@ -0,0 +1,426 @@
+"""
+User Profile Store
+
+Write-behind storage for learned user profiles.
+
+Profiles are mutated on every interaction, so writing each one through
+synchronously means thousands of tiny writes per minute. The store instead:
+- Keeps hot profiles in an in-memory LRU
+- Tracks which profiles changed (dirty set)
+- Flushes dirty profiles in batches from a background thread
+  (one bulk UPSERT per batch on PostgreSQL)
+- Loads cache misses in bulk for analytics (get_many)
+
+Backends implement ``load_many(user_ids)`` and ``save_many(records)`` where
+records are plain profile dicts (UserProfile.to_dict()).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Database imports
+try:
+    from database.core.connection import get_db
+    from database.models import MLUserProfile
+    from sqlalchemy import select
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    DATABASE_AVAILABLE = True
+except ImportError:
+    DATABASE_AVAILABLE = False
+    MLUserProfile = None
+
+
+# Hot profiles kept in memory
+DEFAULT_MAX_PROFILES = 5000
+
+# Seconds between background flushes
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Flush early once this many profiles are dirty
+DEFAULT_FLUSH_BATCH_SIZE = 500
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class FileProfileBackend:
+    """One JSON file per user (development / no database)."""
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        os.makedirs(storage_dir, exist_ok=True)
+
+    def _path(self, user_id: str) -> str:
+        safe_id = hashlib.md5(user_id.encode()).hexdigest()
+        return os.path.join(self.storage_dir, f"{safe_id}.json")
+
+    def load_many(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Load profiles that exist on disk."""
+        found = {}
+        for user_id in user_ids:
+            path = self._path(user_id)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r") as f:
+                    found[user_id] = json.load(f)
+            except Exception as e:
+                print(f"⚠️  Failed to load profile {user_id}: {e}")
+        return found
+
+    def save_many(self, records: List[Dict[str, Any]]):
+        """Write each profile to its file (atomic replace)."""
+        for record in records:
+            path = self._path(record["user_id"])
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(record, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+
+
+class DatabaseProfileBackend:
+    """PostgreSQL ``ml_user_profiles`` table with bulk UPSERT."""
+
+    def __init__(self, session_factory: Optional[Callable] = None):
+        """
+        Args:
+            session_factory: Context manager yielding a session (default: get_db)
+        """
+        if not DATABASE_AVAILABLE:
+            raise RuntimeError("Database not available for profile storage")
+        self.session_factory = session_factory or get_db
+
+    def load_many(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Load profiles with a single ``WHERE user_id IN (...)`` query."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(MLUserProfile.user_id, MLUserProfile.profile_data)
+                .where(MLUserProfile.user_id.in_(user_ids))
+            ).all()
+
+        return {user_id: data for user_id, data in rows}
+
+    def save_many(self, records: List[Dict[str, Any]]):
+        """Upsert all records in one statement."""
+        if not records:
+            return
+
+        now = datetime.utcnow()
+        values = [
+            {
+                "user_id": record["user_id"],
+                "role": record.get("role") or "student",
+                "profile_data": record,
+                "interactions_count": record.get("interactions_count", 0),
+                "satisfaction_score": record.get("satisfaction_score", 0.5),
+                "updated_at": now,
+            }
+            for record in records
+        ]
+
+        with self.session_factory() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                stmt = pg_insert(MLUserProfile).values(values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[MLUserProfile.user_id],
+                    set_={
+                        "role": stmt.excluded.role,
+                        "profile_data": stmt.excluded.profile_data,
+                        "interactions_count": stmt.excluded.interactions_count,
+                        "satisfaction_score": stmt.excluded.satisfaction_score,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+                db.execute(stmt)
+            else:
+                for value in values:
+                    db.merge(MLUserProfile(**value))
+            db.commit()
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class ProfileStore:
+    """
+    LRU cache of profiles with dirty tracking and write-behind flushing.
+
+    ``decode`` turns a stored dict into the in-memory profile object and
+    ``encode`` does the reverse; the store itself is type-agnostic.
+    """
+
+    def __init__(
+        self,
+        backend,
+        decode: Callable[[Dict[str, Any]], Any],
+        encode: Callable[[Any], Dict[str, Any]],
+        max_profiles: int = DEFAULT_MAX_PROFILES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_batch_size: int = DEFAULT_FLUSH_BATCH_SIZE,
+        background: bool = True
+    ):
+        """
+        Initialize profile store.
+
+        Args:
+            backend: Storage backend (load_many/save_many)
+            decode: dict -> profile
+            encode: profile -> dict
+            max_profiles: LRU capacity
+            flush_interval: Seconds between background flushes
+            flush_batch_size: Dirty count that triggers an early flush
+            background: Start the background flusher thread
+        """
+        self.backend = backend
+        self.decode = decode
+        self.encode = encode
+        self.max_profiles = max_profiles
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._dirty: set = set()
+        # Dirty profiles evicted from the LRU before they were flushed
+        self._evicted: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.profiles_written = 0
+        self.flush_errors = 0
+
+        if background:
+            self.start()
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Hold while mutating a cached profile so flushes see a consistent copy."""
+        return self._lock
+
+    # =========================================================================
+    # READS
+    # =========================================================================
+
+    def get(self, user_id: str) -> Optional[Any]:
+        """
+        Get a profile, loading it from the backend on a miss.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Profile or None if it does not exist
+        """
+        return self.get_many([user_id]).get(user_id)
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get many profiles with one backend round trip for all misses.
+
+        Args:
+            user_ids: User identifiers
+
+        Returns:
+            Dict of user_id -> profile for profiles that exist
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for user_id in dict.fromkeys(user_ids):
+                profile = self._lookup(user_id)
+                if profile is not None:
+                    found[user_id] = profile
+                    self.hits += 1
+                else:
+                    missing.append(user_id)
+                    self.misses += 1
+
+        if not missing:
+            return found
+
+        try:
+            loaded = self.backend.load_many(missing)
+        except Exception as e:
+            print(f"⚠️  Failed to load profiles: {e}")
+            loaded = {}
+
+        with self._lock:
+            for user_id, data in loaded.items():
+                # Another thread may have created/loaded it meanwhile
+                profile = self._lookup(user_id)
+                if profile is None:
+                    profile = self.decode(data)
+                    self._insert(user_id, profile)
+                found[user_id] = profile
+
+        return found
+
+    def _lookup(self, user_id: str) -> Optional[Any]:
+        """Cache lookup (caller holds lock); revives evicted dirty profiles."""
+        profile = self._cache.get(user_id)
+        if profile is not None:
+            self._cache.move_to_end(user_id)
+            return profile
+
+        profile = self._evicted.pop(user_id, None)
+        if profile is not None:
+            self._insert(user_id, profile)
+            self._dirty.add(user_id)
+        return profile
+
+    # =========================================================================
+    # WRITES
+    # =========================================================================
+
+    def put(self, user_id: str, profile: Any, dirty: bool = True):
+        """
+        Insert or replace a profile in the cache.
+
+        Args:
+            user_id: User identifier
+            profile: Profile object
+            dirty: Schedule it for the next flush
+        """
+        with self._lock:
+            self._insert(user_id, profile)
+            if dirty:
+                self._mark_dirty(user_id)
+
+    def mark_dirty(self, user_id: str):
+        """Schedule a cached profile for the next flush."""
+        with self._lock:
+            if user_id in self._cache:
+                self._mark_dirty(user_id)
+
+    def _mark_dirty(self, user_id: str):
+        self._dirty.add(user_id)
+        if len(self._dirty) >= self.flush_batch_size:
+            self._wake.set()
+
+    def _insert(self, user_id: str, profile: Any):
+        """Insert into the LRU, evicting the coldest entries (caller holds lock)."""
+        self._cache[user_id] = profile
+        self._cache.move_to_end(user_id)
+
+        # A newer copy supersedes an evicted, not-yet-flushed one
+        if self._evicted.pop(user_id, None) is not None:
+            self._dirty.add(user_id)
+
+        while len(self._cache) > self.max_profiles:
+            old_id, old_profile = self._cache.popitem(last=False)
+            if old_id in self._dirty:
+                self._dirty.discard(old_id)
+                self._evicted[old_id] = old_profile
+                self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write all dirty profiles to the backend in one batch.
+
+        Returns:
+            Number of profiles written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty and not self._evicted:
+                    return 0
+
+                batch = {uid: self._cache[uid] for uid in self._dirty if uid in self._cache}
+                batch.update(self._evicted)
+                evicted = self._evicted
+                self._dirty = set()
+                self._evicted = {}
+                # Encode under the lock so records are consistent snapshots
+                records = [self.encode(profile) for profile in batch.values()]
+
+            try:
+                self.backend.save_many(records)
+            except Exception as e:
+                self.flush_errors += 1
+                print(f"⚠️  Failed to flush {len(records)} profiles: {e}")
+                # Re-queue for the next flush
+                with self._lock:
+                    for user_id in batch:
+                        if user_id in self._cache:
+                            self._dirty.add(user_id)
+                        elif user_id in evicted:
+                            self._evicted.setdefault(user_id, evicted[user_id])
+                return 0
+
+            self.flushes += 1
+            self.profiles_written += len(records)
+            return len(records)
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    def start(self):
+        """Start the background flusher (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profile-store-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the flusher and write everything still dirty."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache and flush statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cached_profiles": len(self._cache),
+                "max_profiles": self.max_profiles,
+                "dirty": len(self._dirty) + len(self._evicted),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": f"{(self.hits / total * 100):.1f}%" if total else "N/A",
+                "flushes": self.flushes,
+                "profiles_written": self.profiles_written,
+                "flush_errors": self.flush_errors,
+            }
+
+
+__all__ = [
+    'ProfileStore',
+    'FileProfileBackend',
+    'DatabaseProfileBackend',
+    'DEFAULT_MAX_PROFILES',
+    'DEFAULT_FLUSH_INTERVAL',
+    'DEFAULT_FLUSH_BATCH_SIZE',
+]
@@ -8,9 +8,11 @@ to enable personalized, context-aware grading and feedback.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from .bias_model import get_bias_model_service
+
 # Database imports
 try:
-    from database.database import get_session
+    from database.core.connection import get_session
     from database.models import GradeException, GradingSession
     from sqlalchemy import and_, func, desc
     DATABASE_AVAILABLE = True
@@ -26,14 +28,14 @@ def check_past_overrides(
     """
     Tool: Check past professor overrides from L3.
     
-    Phase 3.2: Queries grade_exceptions table for patterns where this
-    professor has corrected AI grades. Returns systematic biases and
-    correction patterns.
+    Phase 3.2: Looks up patterns where this professor has corrected AI
+    grades. Per-criterion statistics are maintained incrementally by the
+    bias model service, so repeated calls during bulk grading are O(1).
     
     Args:
         professor_id: Professor's user ID
         rubric_type: Type of rubric (essay, code, etc.)
-        limit: Maximum number of exceptions to retrieve
+        limit: Maximum number of recent correction patterns to return
     
     Returns:
         Dictionary containing:
@@ -54,82 +56,11 @@ def check_past_overrides(
         }
     
     try:
-        db = get_session()
-        try:
-            # Query grade_exceptions
-            exceptions = db.query(GradeException).filter(
-                and_(
-                    GradeException.user_id == professor_id,
-                    GradeException.exception_type == 'grading_correction',
-                    GradeException.rubric_type == rubric_type,
-                    GradeException.status.in_(['analyzed', 'learned'])
-                )
-            ).order_by(desc(GradeException.created_at)).limit(limit).all()
-            
-            if not exceptions:
-                return {
-                    "found": False,
-                    "count": 0,
-                    "patterns": [],
-                    "systematic_bias": {},
-                    "recommendation": "Use original AI grade"
-                }
-            
-            # Analyze patterns
-            patterns = []
-            criterion_adjustments = {}
-            
-            for exc in exceptions:
-                ai_decision = exc.ai_decision or {}
-                correct_decision = exc.correct_decision or {}
-                
-                ai_scores = ai_decision.get("criterion_scores", {})
-                prof_scores = correct_decision.get("criterion_scores", {})
-                
-                # Calculate differences
-                for criterion, prof_score in prof_scores.items():
-                    if criterion in ai_scores:
-                        diff = prof_score - ai_scores[criterion]
-                        if criterion not in criterion_adjustments:
-                            criterion_adjustments[criterion] = []
-                        criterion_adjustments[criterion].append(diff)
-                
-                patterns.append({
-                    "date": exc.created_at.isoformat() if exc.created_at else None,
-                    "ai_scores": ai_scores,
-                    "professor_scores": prof_scores,
-                    "reason": exc.correction_reason,
-                    "score_difference": exc.score_difference
-                })
-            
-            # Calculate systematic bias
-            systematic_bias = {}
-            for criterion, adjustments in criterion_adjustments.items():
-                avg_adjustment = sum(adjustments) / len(adjustments)
-                std_dev = (sum((x - avg_adjustment) ** 2 for x in adjustments) / len(adjustments)) ** 0.5
-                
-                # Only flag as systematic if consistent (low std dev) and significant
-                if abs(avg_adjustment) > 2.0 and std_dev < 5.0:
-                    systematic_bias[criterion] = {
-                        "average_adjustment": round(avg_adjustment, 2),
-                        "std_dev": round(std_dev, 2),
-                        "sample_size": len(adjustments)
-                    }
-            
-            recommendation = "Apply reconciliation" if systematic_bias else "Use original AI grade"
-            
-            return {
-                "found": True,
-                "count": len(exceptions),
-                "patterns": patterns,
-                "systematic_bias": systematic_bias,
-                "recommendation": recommendation,
-                "analysis": f"Found {len(exceptions)} past corrections with {len(systematic_bias)} systematic biases detected"
-            }
-            
-        finally:
-            db.close()
-            
+        # Served from cached running statistics (Welford), not re-aggregated per call
+        result = get_bias_model_service().analyze(professor_id, rubric_type)
+        result["patterns"] = result["patterns"][:limit]
+        return result
+        
     except Exception as e:
         return {
             "found": False,
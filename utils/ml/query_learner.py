@@ -6,12 +6,17 @@ Uses embeddings and similarity matching for intelligent predictions.
 """
 
 import os
+import sys
 import json
+import time
+import atexit
 import hashlib
-from typing import List, Dict, Tuple, Optional, Any
+import threading
+from typing import List, Dict, Tuple, Optional, Any, Union
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
-from dataclasses import dataclass, asdict
+
+from .record_log import RecordLog, DEFAULT_FLUSH_INTERVAL, DEFAULT_COMPACT_EVERY
 
 # Try to import numpy, but work without it
 try:
@@ -34,27 +39,105 @@ except ImportError:
             return sorted(range(len(values)), key=lambda i: values[i])
 
 
-@dataclass
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern short repeated strings (tool names, types, feedback)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_epoch(timestamp: Union[str, float, datetime, None]) -> float:
+    """Normalize a timestamp to epoch seconds."""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp).timestamp()
+    return float(timestamp)
+
+
 class QueryRecord:
-    """Record of a query with metadata for learning."""
-    query: str
-    query_hash: str
-    tool_used: str
-    success: bool
-    response_time: float
-    user_feedback: Optional[str]  # positive, negative, neutral
-    timestamp: str
-    query_type: Optional[str] = None  # classification of query
-    embedding: Optional[List[float]] = None
+    """
+    Record of a query with metadata for learning.
+    
+    Uses __slots__ instead of a per-instance __dict__, stores the timestamp
+    as epoch seconds and interns low-cardinality strings, since the learner
+    keeps up to 10,000 of these in memory.
+    """
+    
+    __slots__ = (
+        'query', 'query_hash', 'tool_used', 'success', 'response_time',
+        'user_feedback', 'created_at', 'query_type', 'embedding'
+    )
+    
+    def __init__(
+        self,
+        query: str,
+        query_hash: str,
+        tool_used: str,
+        success: bool,
+        response_time: float,
+        user_feedback: Optional[str],  # positive, negative, neutral
+        timestamp: Union[str, float, datetime, None] = None,
+        query_type: Optional[str] = None,  # classification of query
+        embedding: Optional[List[float]] = None
+    ):
+        self.query = query
+        self.query_hash = query_hash
+        self.tool_used = _intern(tool_used)
+        self.success = bool(success)
+        self.response_time = float(response_time)
+        self.user_feedback = _intern(user_feedback)
+        self.created_at = _to_epoch(timestamp)
+        self.query_type = _intern(query_type)
+        self.embedding = embedding
+    
+    @property
+    def timestamp(self) -> str:
+        """ISO-8601 timestamp (local time)."""
+        return datetime.fromtimestamp(self.created_at).isoformat()
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, QueryRecord):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+    
+    def __repr__(self) -> str:
+        return (f"QueryRecord(query={self.query[:40]!r}, tool_used={self.tool_used!r}, "
+                f"success={self.success}, query_type={self.query_type!r})")
     
     def to_dict(self) -> Dict:
         """Convert to dictionary."""
-        return asdict(self)
+        return {
+            'query': self.query,
+            'query_hash': self.query_hash,
+            'tool_used': self.tool_used,
+            'success': self.success,
+            'response_time': self.response_time,
+            'user_feedback': self.user_feedback,
+            'timestamp': self.timestamp,
+            'query_type': self.query_type,
+            'embedding': self.embedding,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'QueryRecord':
         """Create from dictionary."""
         return cls(**data)
+    
+    def to_row(self) -> List[Any]:
+        """Convert to a compact positional row for the record log."""
+        row = [
+            self.query, self.query_hash, self.tool_used, int(self.success),
+            self.response_time, self.user_feedback, self.created_at, self.query_type
+        ]
+        if self.embedding is not None:
+            row.append(self.embedding)
+        return row
+    
+    @classmethod
+    def from_row(cls, row: List[Any]) -> 'QueryRecord':
+        """Create from a compact positional row."""
+        return cls(*row)
 
 
 class QueryLearner:
@@ -69,12 +152,21 @@ class QueryLearner:
     - Fallback learning
     """
     
-    def __init__(self, max_history: int = 10000):
+    def __init__(
+        self,
+        max_history: int = 10000,
+        storage_dir: Optional[str] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        compact_every: int = DEFAULT_COMPACT_EVERY
+    ):
         """
         Initialize query learner.
         
         Args:
             max_history: Maximum number of queries to store
+            storage_dir: Pattern storage directory (default: ./.query_patterns)
+            flush_interval: Seconds between background log flushes
+            compact_every: Logged records before the log is compacted
         """
         self.max_history = max_history
         self.query_history: deque = deque(maxlen=max_history)
@@ -98,12 +190,23 @@ class QueryLearner:
         self.pattern_cache: Dict[str, Tuple[str, float]] = {}
         self.cache_max_age = timedelta(hours=1)
         
-        # Storage
-        self.storage_dir = os.path.join(os.getcwd(), ".query_patterns")
-        os.makedirs(self.storage_dir, exist_ok=True)
+        # Guards learner state and sequence numbers against the flusher thread
+        self._lock = threading.RLock()
+        self._seq = 0
+        
+        # Storage: append-only record log + periodic snapshot
+        self.storage_dir = storage_dir or os.path.join(os.getcwd(), ".query_patterns")
+        self._log = RecordLog(
+            self.storage_dir,
+            "query_patterns",
+            snapshot_fn=self._snapshot_state,
+            flush_interval=flush_interval,
+            compact_every=compact_every
+        )
         
         # Load existing patterns
         self._load_patterns()
+        self._log.start()
         
         print(f"🧠 Query Learner initialized (history: {len(self.query_history)} queries)")
     
@@ -146,28 +249,37 @@ class QueryLearner:
             query_type=query_type
         )
         
-        # Add to history
+        with self._lock:
+            self._apply_record(record)
+            self._seq += 1
+            seq = self._seq
+        
+        # Invalidate cache for similar patterns
+        self._invalidate_cache_for_query(query)
+        
+        # Persisted by the background flusher; nothing touches disk here
+        self._log.append(seq, "q", record.to_row())
+    
+    def _apply_record(self, record: QueryRecord):
+        """Add a record to history and tool performance stats."""
+        # Drop the index entry of the record the bounded deque is about to evict
+        if len(self.query_history) == self.max_history:
+            evicted = self.query_history[0]
+            if self.query_index.get(evicted.query_hash) is evicted:
+                del self.query_index[evicted.query_hash]
+        
         self.query_history.append(record)
-        self.query_index[query_hash] = record
+        self.query_index[record.query_hash] = record
         
-        # Update tool performance stats
-        perf = self.tool_performance[query_type][tool_used]
+        perf = self.tool_performance[record.query_type][record.tool_used]
         
-        if success:
+        if record.success:
             perf['success_count'] += 1
         else:
             perf['failure_count'] += 1
         
-        perf['total_time'] += response_time
+        perf['total_time'] += record.response_time
         perf['use_count'] += 1
-        
-        # Invalidate cache for similar patterns
-        self._invalidate_cache_for_query(query)
-        
-        # Periodic save
-        if len(self.query_history) % 100 == 0:
-            self._save_patterns()
-            print(f"💾 Saved query patterns ({len(self.query_history)} total)")
     
     def predict_best_tool(
         self,
@@ -261,11 +373,22 @@ class QueryLearner:
             fallback_tool: Tool used as fallback
             success: Whether fallback succeeded
         """
+        with self._lock:
+            self._apply_fallback(primary_tool, fallback_tool, success)
+            self._seq += 1
+            seq = self._seq
+        
+        self._log.append(seq, "f", [primary_tool, fallback_tool, int(success)])
+        
+        if success:
+            print(f"✅ Learned: {fallback_tool} is good fallback for {primary_tool}")
+    
+    def _apply_fallback(self, primary_tool: str, fallback_tool: str, success: bool):
+        """Update fallback counters."""
         key = (primary_tool, fallback_tool)
         
         if success:
             self.fallback_success[key] += 1
-            print(f"✅ Learned: {fallback_tool} is good fallback for {primary_tool}")
         else:
             self.fallback_failure[key] += 1
     
@@ -463,63 +586,126 @@ class QueryLearner:
         if query_hash in self.pattern_cache:
             del self.pattern_cache[query_hash]
     
+    def _snapshot_state(self) -> Tuple[int, Dict[str, Any]]:
+        """
+        Capture the full learner state for log compaction.
+        
+        Returns:
+            (sequence number of the last applied record, state dict)
+        """
+        with self._lock:
+            return self._seq, {
+                'query_history': [record.to_row() for record in self.query_history],
+                'tool_performance': {
+                    qtype: {tool: dict(perf) for tool, perf in tools.items()}
+                    for qtype, tools in self.tool_performance.items()
+                },
+                'fallback_success': [[p, f, c] for (p, f), c in self.fallback_success.items()],
+                'fallback_failure': [[p, f, c] for (p, f), c in self.fallback_failure.items()],
+            }
+    
+    def flush(self, compact: bool = False):
+        """
+        Write pending records to disk now.
+        
+        Args:
+            compact: Also write a snapshot and truncate the log
+        """
+        self._log.flush(compact=compact)
+    
+    def close(self):
+        """Stop the background flusher and write a final snapshot."""
+        self._log.close(compact=True)
+    
     def _save_patterns(self):
-        """Save query patterns to disk."""
-        filepath = os.path.join(self.storage_dir, "query_patterns.json")
+        """Save query patterns to disk (flush and compact the record log)."""
+        self.flush(compact=True)
+    
+    def _load_patterns(self):
+        """
+        Load query patterns from disk.
         
+        Restores the latest snapshot, then replays records logged after it.
+        Falls back to the legacy pretty-printed JSON file when no snapshot
+        exists yet; it is converted on the first compaction.
+        """
         try:
-            # Convert history to serializable format
-            history_data = [record.to_dict() for record in self.query_history]
+            state, snapshot_seq, records = self._log.load()
             
-            data = {
-                'query_history': history_data,
-                'tool_performance': dict(self.tool_performance),
-                'fallback_success': {f"{k[0]},{k[1]}": v for k, v in self.fallback_success.items()},
-                'fallback_failure': {f"{k[0]},{k[1]}": v for k, v in self.fallback_failure.items()},
-                'last_saved': datetime.now().isoformat()
-            }
+            with self._lock:
+                if state is not None:
+                    self._restore_state(state)
+                else:
+                    self._load_legacy_patterns()
+                
+                self._seq = snapshot_seq
+                replayed = 0
+                for seq, kind, payload in records:
+                    if kind == "q":
+                        self._apply_record(QueryRecord.from_row(payload))
+                    elif kind == "f":
+                        self._apply_fallback(payload[0], payload[1], bool(payload[2]))
+                    self._seq = max(self._seq, seq)
+                    replayed += 1
             
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2)
+            if self.query_history or replayed:
+                print(f"📂 Loaded {len(self.query_history)} query patterns from disk "
+                      f"({replayed} replayed from log)")
             
         except Exception as e:
-            print(f"⚠️  Failed to save query patterns: {e}")
+            print(f"⚠️  Failed to load query patterns: {e}")
     
-    def _load_patterns(self):
-        """Load query patterns from disk."""
+    def _restore_state(self, state: Dict[str, Any]):
+        """Restore learner state from a snapshot."""
+        for row in state.get('query_history', []):
+            self._apply_record_history_only(QueryRecord.from_row(row))
+        
+        for qtype, tools in state.get('tool_performance', {}).items():
+            for tool, perf in tools.items():
+                self.tool_performance[qtype][tool] = perf
+        
+        for primary, fallback, count in state.get('fallback_success', []):
+            self.fallback_success[(primary, fallback)] = count
+        
+        for primary, fallback, count in state.get('fallback_failure', []):
+            self.fallback_failure[(primary, fallback)] = count
+    
+    def _apply_record_history_only(self, record: QueryRecord):
+        """Add a snapshot record to history (performance is restored separately)."""
+        self.query_history.append(record)
+        self.query_index[record.query_hash] = record
+    
+    def _load_legacy_patterns(self):
+        """Load the pre-record-log query_patterns.json format."""
         filepath = os.path.join(self.storage_dir, "query_patterns.json")
         
         if not os.path.exists(filepath):
             return
         
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            # Load history
-            for record_dict in data.get('query_history', []):
-                record = QueryRecord.from_dict(record_dict)
-                self.query_history.append(record)
-                self.query_index[record.query_hash] = record
-            
-            # Load tool performance
-            for qtype, tools in data.get('tool_performance', {}).items():
-                for tool, perf in tools.items():
-                    self.tool_performance[qtype][tool] = perf
-            
-            # Load fallback patterns
-            for key_str, count in data.get('fallback_success', {}).items():
-                primary, fallback = key_str.split(',')
-                self.fallback_success[(primary, fallback)] = count
-            
-            for key_str, count in data.get('fallback_failure', {}).items():
-                primary, fallback = key_str.split(',')
-                self.fallback_failure[(primary, fallback)] = count
-            
-            print(f"📂 Loaded {len(self.query_history)} query patterns from disk")
-            
-        except Exception as e:
-            print(f"⚠️  Failed to load query patterns: {e}")
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        
+        # Load history
+        for record_dict in data.get('query_history', []):
+            self._apply_record_history_only(QueryRecord.from_dict(record_dict))
+        
+        # Load tool performance
+        for qtype, tools in data.get('tool_performance', {}).items():
+            for tool, perf in tools.items():
+                self.tool_performance[qtype][tool] = perf
+        
+        # Load fallback patterns
+        for key_str, count in data.get('fallback_success', {}).items():
+            primary, fallback = key_str.split(',')
+            self.fallback_success[(primary, fallback)] = count
+        
+        for key_str, count in data.get('fallback_failure', {}).items():
+            primary, fallback = key_str.split(',')
+            self.fallback_failure[(primary, fallback)] = count
+        
+        # Convert to the snapshot format on the next flush
+        self._log.request_compaction()
+        print(f"📂 Migrating legacy query patterns file ({len(self.query_history)} queries)")
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -607,6 +793,7 @@ def get_query_learner() -> QueryLearner:
     global _query_learner
     if _query_learner is None:
         _query_learner = QueryLearner()
+        atexit.register(_query_learner.close)
     return _query_learner
 
 
@@ -640,3 +827,11 @@ def save_query_learner():
     learner._save_patterns()
     print(f"💾 Query learner patterns saved successfully")
 
+
+def close_query_learner():
+    """Flush and stop the global query learner (called on shutdown)."""
+    global _query_learner
+    if _query_learner is not None:
+        _query_learner.close()
+        _query_learner = None
+
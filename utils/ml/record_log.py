@@ -0,0 +1,316 @@
+"""
+Append-Only Record Log
+
+Compact, crash-tolerant persistence for learners that accumulate many small
+records (e.g. the query learner's history).
+
+Layout inside the storage directory:
+- ``<name>.snapshot.json``: compact JSON snapshot of the full state,
+  tagged with the sequence number of the last record it contains
+- ``<name>.log``: line-delimited JSON records appended since the snapshot
+
+Writers only enqueue records; a background flusher thread batches them to
+the log file, so the request path never touches the disk. When the log grows
+past ``compact_every`` records the flusher takes a fresh snapshot through a
+callback and truncates the log.
+
+Every record carries a monotonically increasing sequence number, so records
+that are both in a snapshot and still in the log (e.g. after a crash between
+writing the snapshot and truncating the log) are replayed exactly once.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+SNAPSHOT_VERSION = 1
+
+# Flush queued records at least this often (seconds)
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Write a new snapshot and truncate the log after this many logged records
+DEFAULT_COMPACT_EVERY = 5000
+
+_COMPACT_SEPARATORS = (",", ":")
+
+
+class RecordLog:
+    """
+    Append-only record log with periodic snapshots and a background flusher.
+
+    Records are ``(seq, kind, payload)`` where ``payload`` is any JSON value
+    (typically a flat list). The owner assigns sequence numbers and provides a
+    ``snapshot_fn`` returning ``(seq, state)`` for compaction; ``state`` must
+    reflect every record up to and including ``seq``.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str,
+        name: str,
+        snapshot_fn: Optional[Callable[[], Tuple[int, Dict[str, Any]]]] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        compact_every: int = DEFAULT_COMPACT_EVERY
+    ):
+        """
+        Initialize record log.
+
+        Args:
+            storage_dir: Directory holding the log and snapshot files
+            name: Base file name
+            snapshot_fn: Callback returning (last_seq, state) for compaction
+            flush_interval: Maximum seconds between background flushes
+            compact_every: Logged records before a snapshot is taken
+        """
+        self.storage_dir = storage_dir
+        self.log_path = os.path.join(storage_dir, f"{name}.log")
+        self.snapshot_path = os.path.join(storage_dir, f"{name}.snapshot.json")
+        self.snapshot_fn = snapshot_fn
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+
+        os.makedirs(storage_dir, exist_ok=True)
+
+        self._queue: "queue.SimpleQueue[Tuple[int, str, Any]]" = queue.SimpleQueue()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._records_since_snapshot = 0
+        self._compact_requested = False
+
+        # Stats
+        self.records_written = 0
+        self.flushes = 0
+        self.compactions = 0
+        self.write_errors = 0
+
+    # =========================================================================
+    # LOADING
+    # =========================================================================
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], int, Iterator[Tuple[int, str, Any]]]:
+        """
+        Load the latest snapshot and the records logged after it.
+
+        Returns:
+            (snapshot state or None, snapshot seq, iterator of newer records)
+        """
+        state = None
+        snapshot_seq = 0
+
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == SNAPSHOT_VERSION:
+                    state = data.get("state")
+                    snapshot_seq = int(data.get("seq", 0))
+            except Exception as e:
+                print(f"⚠️  Failed to read snapshot {self.snapshot_path}: {e}")
+
+        return state, snapshot_seq, self._iter_log(snapshot_seq)
+
+    def _repair_tail(self):
+        """Cut a partially written last line so new appends start cleanly."""
+        with open(self.log_path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            # Scan back to the last complete line
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                idx = f.read(step).rfind(b"\n")
+                if idx != -1:
+                    f.truncate(pos + idx + 1)
+                    return
+            f.truncate(0)
+
+    def _iter_log(self, after_seq: int) -> Iterator[Tuple[int, str, Any]]:
+        """Yield logged records newer than ``after_seq``, skipping torn lines."""
+        if not os.path.exists(self.log_path):
+            return
+
+        self._repair_tail()
+
+        count = 0
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                count += 1
+                try:
+                    seq, kind, payload = json.loads(line)
+                except (ValueError, TypeError):
+                    # Partially written tail after a crash
+                    continue
+                if seq > after_seq:
+                    yield seq, kind, payload
+
+        self._records_since_snapshot = count
+
+    # =========================================================================
+    # WRITING
+    # =========================================================================
+
+    def start(self):
+        """Start the background flusher thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"record-log-{os.path.basename(self.log_path)}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def append(self, seq: int, kind: str, payload: Any):
+        """
+        Queue a record for the background flusher.
+
+        Args:
+            seq: Sequence number assigned by the owner
+            kind: Short record type tag
+            payload: JSON-serializable payload
+        """
+        self._queue.put((seq, kind, payload))
+
+    def request_compaction(self):
+        """Take a snapshot on the next flush (e.g. after migrating old data)."""
+        self._compact_requested = True
+
+    def pending(self) -> int:
+        """Approximate number of queued, unwritten records."""
+        return self._queue.qsize()
+
+    def _run(self):
+        """Flusher loop: wake on interval or stop, write queued records."""
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+        self.flush()
+
+    def _drain(self) -> List[Tuple[int, str, Any]]:
+        """Pop every queued record."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def flush(self, compact: bool = False):
+        """
+        Write queued records to the log, compacting if due.
+
+        Safe to call from any thread; the background flusher calls it
+        periodically.
+
+        Args:
+            compact: Force a snapshot even if the log is still small
+        """
+        with self._io_lock:
+            batch = self._drain()
+
+            if batch:
+                lines = "".join(
+                    json.dumps(record, separators=_COMPACT_SEPARATORS) + "\n"
+                    for record in batch
+                )
+                try:
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write(lines)
+                    self.records_written += len(batch)
+                    self._records_since_snapshot += len(batch)
+                    self.flushes += 1
+                except Exception as e:
+                    self.write_errors += 1
+                    print(f"⚠️  Failed to append to {self.log_path}: {e}")
+                    # Re-queue so the records are retried on the next flush
+                    for record in batch:
+                        self._queue.put(record)
+                    return
+
+            if compact or self._compact_requested or self._records_since_snapshot >= self.compact_every:
+                self._compact()
+
+    def _compact(self):
+        """Write a snapshot and truncate the log. Caller holds ``_io_lock``."""
+        if self.snapshot_fn is None:
+            return
+
+        try:
+            seq, state = self.snapshot_fn()
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "seq": seq,
+                "saved_at": time.time(),
+                "state": state,
+            }
+
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=_COMPACT_SEPARATORS)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # Records still queued may have seq <= snapshot seq; they are
+            # skipped on replay, so truncating here is safe.
+            with open(self.log_path, "w", encoding="utf-8"):
+                pass
+
+            self._records_since_snapshot = 0
+            self._compact_requested = False
+            self.compactions += 1
+
+        except Exception as e:
+            self.write_errors += 1
+            print(f"⚠️  Failed to compact {self.log_path}: {e}")
+
+    def close(self, compact: bool = True):
+        """
+        Stop the flusher and write everything still queued.
+
+        Args:
+            compact: Take a final snapshot so the next start replays nothing
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+
+        self.flush(compact=compact)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get log statistics."""
+        return {
+            "records_written": self.records_written,
+            "records_since_snapshot": self._records_since_snapshot,
+            "pending": self.pending(),
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+            "write_errors": self.write_errors,
+            "log_bytes": os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0,
+        }
+
+
+__all__ = [
+    'RecordLog',
+    'DEFAULT_FLUSH_INTERVAL',
+    'DEFAULT_COMPACT_EVERY',
+]
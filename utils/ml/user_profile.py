@@ -5,22 +5,38 @@ Learns user preferences, patterns, and adapts agent behavior accordingly.
 """
 
 import os
-import json
-import hashlib
-from typing import Dict, List, Optional, Any
+import re
+from typing import Dict, Iterable, List, Optional, Any
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, fields
 
-# Try to import database modules
-try:
-    from database import get_db
-    from database.models import UserLearningProfile
-    from sqlalchemy.orm import Session
-    DATABASE_AVAILABLE = True
-except ImportError:
-    DATABASE_AVAILABLE = False
-    UserLearningProfile = None
+from .profile_store import (
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_MAX_PROFILES,
+    DatabaseProfileBackend,
+    FileProfileBackend,
+    ProfileStore,
+)
+
+
+# Common academic/technical topics
+TOPIC_KEYWORDS = (
+    "machine learning", "deep learning", "neural networks",
+    "calculus", "linear algebra", "statistics",
+    "physics", "chemistry", "biology",
+    "programming", "python", "javascript", "java",
+    "history", "literature", "philosophy",
+    "economics", "psychology", "sociology"
+)
+
+# Single pass over the query instead of one substring scan per topic.
+# Longest topics first, so "javascript" is not also counted as "java".
+_TOPIC_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(t) for t in sorted(TOPIC_KEYWORDS, key=len, reverse=True)) + "))"
+)
+
+_FEEDBACK_RATINGS = {"positive": 5, "neutral": 3, "negative": 1}
 
 
 @dataclass
@@ -88,7 +104,9 @@ class UserProfile:
         if 'routing_preferences' not in data:
             data['routing_preferences'] = {}
         
-        return cls(**data)
+        # Ignore fields written by newer/older versions
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
 
 
 class UserProfileManager:
@@ -102,25 +120,59 @@ class UserProfileManager:
     - Pattern recognition
     """
     
-    def __init__(self, storage_backend: str = "file"):
+    def __init__(
+        self,
+        storage_backend: str = "file",
+        max_profiles: int = DEFAULT_MAX_PROFILES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        storage_dir: Optional[str] = None,
+        backend=None
+    ):
         """
         Initialize profile manager.
         
+        Profiles are cached in an LRU and written behind in batches;
+        see utils.ml.profile_store.
+        
         Args:
             storage_backend: "file" or "database"
+            max_profiles: Hot profiles kept in memory
+            flush_interval: Seconds between batched writes
+            storage_dir: Directory for the file backend
+            backend: Explicit storage backend (overrides storage_backend)
         """
         self.storage_backend = storage_backend
-        self.profiles = {}  # In-memory cache
         
         # File-based storage
-        self.storage_dir = os.path.join(os.getcwd(), ".user_profiles")
-        os.makedirs(self.storage_dir, exist_ok=True)
+        self.storage_dir = storage_dir or os.path.join(os.getcwd(), ".user_profiles")
+        
+        if backend is None:
+            backend = self._create_backend(storage_backend)
+        
+        self.store = ProfileStore(
+            backend,
+            decode=UserProfile.from_dict,
+            encode=UserProfile.to_dict,
+            max_profiles=max_profiles,
+            flush_interval=flush_interval
+        )
         
         # Learning parameters
         self.learning_rate = 0.1  # For exponential moving average
         self.decay_factor = 0.95  # For topic relevance decay
         
-        print(f"📊 User Profile Manager initialized (backend: {storage_backend})")
+        print(f"📊 User Profile Manager initialized (backend: {self.storage_backend})")
+    
+    def _create_backend(self, storage_backend: str):
+        """Create the storage backend, falling back to files without a database."""
+        if storage_backend == "database":
+            try:
+                return DatabaseProfileBackend()
+            except Exception as e:
+                print(f"⚠️  Database not available, falling back to file storage: {e}")
+                self.storage_backend = "file"
+        
+        return FileProfileBackend(self.storage_dir)
     
     def get_or_create_profile(self, user_id: str, role: str = "student") -> UserProfile:
         """
@@ -133,25 +185,82 @@ class UserProfileManager:
         Returns:
             UserProfile object
         """
-        # Check cache
-        if user_id in self.profiles:
-            return self.profiles[user_id]
-        
-        # Try to load from storage
-        profile = self._load_profile(user_id)
+        profile = self.store.get(user_id)
         
         if profile is None:
             # Create new profile
             profile = UserProfile(user_id=user_id, role=role)
+            self.store.put(user_id, profile)
             print(f"✨ Created new profile for user: {user_id} (role: {role})")
-        else:
-            print(f"📂 Loaded existing profile for user: {user_id}")
-        
-        # Cache it
-        self.profiles[user_id] = profile
         
         return profile
     
+    def get_profiles(self, user_ids: Iterable[str]) -> Dict[str, UserProfile]:
+        """
+        Get existing profiles in bulk (no profiles are created).
+        
+        Cache misses are loaded with a single backend query.
+        
+        Args:
+            user_ids: User identifiers
+            
+        Returns:
+            Dict of user_id -> UserProfile for users that have a profile
+        """
+        return self.store.get_many(user_ids)
+    
+    def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the analytics view of an existing profile.
+        
+        Args:
+            user_id: User identifier
+            
+        Returns:
+            Analytics dict or None if the user has no profile
+        """
+        profile = self.store.get(user_id)
+        return self.profile_analytics(profile) if profile else None
+    
+    def profile_analytics(self, profile: UserProfile) -> Dict[str, Any]:
+        """
+        Build the analytics view of a profile (for API endpoints).
+        
+        Args:
+            profile: User profile
+            
+        Returns:
+            Dict with query_count, successful_queries, avg_rating,
+            preferences and learning_stats
+        """
+        ratings_total = 0
+        ratings_count = 0
+        for feedback, rating in _FEEDBACK_RATINGS.items():
+            count = getattr(profile, f"{feedback}_feedback_count")
+            ratings_total += rating * count
+            ratings_count += count
+        
+        return {
+            "query_count": profile.interactions_count,
+            "successful_queries": max(0, profile.interactions_count - profile.negative_feedback_count),
+            "avg_rating": ratings_total / ratings_count if ratings_count else None,
+            "preferences": {
+                "explanation_depth": profile.preferred_explanation_depth,
+                "citation_style": profile.preferred_citation_style,
+                "temperature": profile.temperature_preference,
+                "context_window_size": profile.context_window_preference,
+                "routing_preferences": dict(profile.routing_preferences),
+            },
+            "learning_stats": {
+                "role": profile.role,
+                "satisfaction_score": profile.satisfaction_score,
+                "common_tools_used": dict(profile.common_tools_used),
+                "typical_subject_areas": list(profile.typical_subject_areas),
+                "average_question_length": profile.average_question_length,
+                "last_updated": profile.last_updated,
+            },
+        }
+    
     def update_from_interaction(
         self,
         user_id: str,
@@ -175,6 +284,29 @@ class UserProfileManager:
             user_followup: User's follow-up question (optional)
         """
         profile = self.get_or_create_profile(user_id)
+        extracted_topics = self._extract_topics(query)
+        
+        # Mutate under the store lock so a concurrent flush sees a consistent copy
+        with self.store.lock:
+            self._apply_interaction(profile, query, tool_used, feedback, user_followup, extracted_topics)
+            # put() rather than mark_dirty(): the profile may have been evicted meanwhile
+            self.store.put(user_id, profile)
+        
+        print(f"📈 Updated profile for {user_id}: "
+              f"satisfaction={profile.satisfaction_score:.2f}, "
+              f"interactions={profile.interactions_count}")
+    
+    def _apply_interaction(
+        self,
+        profile: UserProfile,
+        query: str,
+        tool_used: str,
+        feedback: Optional[str],
+        user_followup: Optional[str],
+        extracted_topics: List[str]
+    ):
+        """Apply one interaction to a profile (online learning updates)."""
+        user_id = profile.user_id
         
         # Update interaction count
         profile.interactions_count += 1
@@ -236,20 +368,12 @@ class UserProfileManager:
                 profile.preferred_explanation_depth = "brief"
                 print(f"📝 Learned: User {user_id} prefers brief explanations")
         
-        # Extract and update subject areas
-        extracted_topics = self._extract_topics(query)
+        # Update subject areas
         if extracted_topics:
             self._update_subject_areas(profile, extracted_topics)
         
         # Update timestamp
         profile.last_updated = datetime.now().isoformat()
-        
-        # Save profile
-        self._save_profile(profile)
-        
-        print(f"📈 Updated profile for {user_id}: "
-              f"satisfaction={profile.satisfaction_score:.2f}, "
-              f"interactions={profile.interactions_count}")
     
     def _extract_topics(self, text: str) -> List[str]:
         """
@@ -257,24 +381,7 @@ class UserProfileManager:
         
         In production, would use NLP/embeddings.
         """
-        # Common academic/technical topics
-        topic_keywords = {
-            "machine learning", "deep learning", "neural networks",
-            "calculus", "linear algebra", "statistics",
-            "physics", "chemistry", "biology",
-            "programming", "python", "javascript", "java",
-            "history", "literature", "philosophy",
-            "economics", "psychology", "sociology"
-        }
-        
-        text_lower = text.lower()
-        found_topics = []
-        
-        for topic in topic_keywords:
-            if topic in text_lower:
-                found_topics.append(topic)
-        
-        return found_topics
+        return list(dict.fromkeys(_TOPIC_PATTERN.findall(text.lower())))
     
     def _update_subject_areas(self, profile: UserProfile, new_topics: List[str]):
         """
@@ -377,165 +484,22 @@ class UserProfileManager:
             "last_updated": profile.last_updated
         }
     
-    def _load_profile(self, user_id: str) -> Optional[UserProfile]:
-        """Load profile from storage."""
-        if self.storage_backend == "file":
-            return self._load_profile_from_file(user_id)
-        elif self.storage_backend == "database" and DATABASE_AVAILABLE:
-            return self._load_profile_from_database(user_id)
-        return None
-    
-    def _save_profile(self, profile: UserProfile):
-        """Save profile to storage."""
-        if self.storage_backend == "file":
-            self._save_profile_to_file(profile)
-        elif self.storage_backend == "database" and DATABASE_AVAILABLE:
-            self._save_profile_to_database(profile)
-    
-    def _load_profile_from_file(self, user_id: str) -> Optional[UserProfile]:
-        """Load profile from JSON file."""
-        # Create safe filename
-        safe_id = hashlib.md5(user_id.encode()).hexdigest()
-        filepath = os.path.join(self.storage_dir, f"{safe_id}.json")
-        
-        if not os.path.exists(filepath):
-            return None
-        
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            return UserProfile.from_dict(data)
-        except Exception as e:
-            print(f"⚠️  Failed to load profile: {e}")
-            return None
-    
-    def _save_profile_to_file(self, profile: UserProfile):
-        """Save profile to JSON file."""
-        safe_id = hashlib.md5(profile.user_id.encode()).hexdigest()
-        filepath = os.path.join(self.storage_dir, f"{safe_id}.json")
-        
-        try:
-            with open(filepath, 'w') as f:
-                json.dump(profile.to_dict(), f, indent=2)
-        except Exception as e:
-            print(f"⚠️  Failed to save profile: {e}")
+    def flush(self) -> int:
+        """
+        Write all pending profile changes now.
+        
+        Returns:
+            Number of profiles written
+        """
+        return self.store.flush()
     
-    def _load_profile_from_database(self, user_id: str) -> Optional[UserProfile]:
-        """Load profile from PostgreSQL database."""
-        if not DATABASE_AVAILABLE or UserLearningProfile is None:
-            print("⚠️  Database not available, falling back to file storage")
-            return None
-        
-        try:
-            with get_db() as db:
-                # Query for existing profile
-                db_profile = db.query(UserLearningProfile).filter(
-                    UserLearningProfile.user_id == user_id
-                ).first()
-                
-                if not db_profile:
-                    return None
-                
-                # Convert database model to UserProfile dataclass
-                profile = UserProfile(
-                    user_id=db_profile.user_id,
-                    role=db_profile.role,
-                    preferred_explanation_depth=db_profile.preferred_explanation_depth,
-                    preferred_citation_style=db_profile.preferred_citation_style,
-                    typical_subject_areas=db_profile.typical_subject_areas or [],
-                    education_level=db_profile.education_level,
-                    average_question_length=db_profile.average_question_length,
-                    common_tools_used=db_profile.common_tools_used or {},
-                    typical_session_duration=db_profile.typical_session_duration,
-                    queries_per_session=db_profile.queries_per_session,
-                    positive_feedback_count=db_profile.positive_feedback_count,
-                    negative_feedback_count=db_profile.negative_feedback_count,
-                    neutral_feedback_count=db_profile.neutral_feedback_count,
-                    correction_patterns=db_profile.correction_patterns or [],
-                    satisfaction_score=db_profile.satisfaction_score,
-                    response_relevance_score=db_profile.response_relevance_score,
-                    tool_selection_accuracy=db_profile.tool_selection_accuracy,
-                    routing_preferences=db_profile.routing_preferences or {},
-                    temperature_preference=db_profile.temperature_preference,
-                    context_window_preference=db_profile.context_window_preference,
-                    created_at=db_profile.created_at.isoformat(),
-                    last_updated=db_profile.last_updated.isoformat(),
-                    interactions_count=db_profile.interactions_count
-                )
-                
-                return profile
-                
-        except Exception as e:
-            print(f"⚠️  Failed to load profile from database: {e}")
-            return None
+    def close(self):
+        """Stop the background writer and flush pending changes."""
+        self.store.close()
     
-    def _save_profile_to_database(self, profile: UserProfile):
-        """Save profile to PostgreSQL database."""
-        if not DATABASE_AVAILABLE or UserLearningProfile is None:
-            print("⚠️  Database not available, profile saved to file only")
-            return
-        
-        try:
-            with get_db() as db:
-                # Check if profile exists
-                db_profile = db.query(UserLearningProfile).filter(
-                    UserLearningProfile.user_id == profile.user_id
-                ).first()
-                
-                if db_profile:
-                    # Update existing profile
-                    db_profile.role = profile.role
-                    db_profile.preferred_explanation_depth = profile.preferred_explanation_depth
-                    db_profile.preferred_citation_style = profile.preferred_citation_style
-                    db_profile.typical_subject_areas = profile.typical_subject_areas
-                    db_profile.education_level = profile.education_level
-                    db_profile.average_question_length = profile.average_question_length
-                    db_profile.common_tools_used = profile.common_tools_used
-                    db_profile.typical_session_duration = profile.typical_session_duration
-                    db_profile.queries_per_session = profile.queries_per_session
-                    db_profile.positive_feedback_count = profile.positive_feedback_count
-                    db_profile.negative_feedback_count = profile.negative_feedback_count
-                    db_profile.neutral_feedback_count = profile.neutral_feedback_count
-                    db_profile.correction_patterns = profile.correction_patterns
-                    db_profile.satisfaction_score = profile.satisfaction_score
-                    db_profile.response_relevance_score = profile.response_relevance_score
-                    db_profile.tool_selection_accuracy = profile.tool_selection_accuracy
-                    db_profile.routing_preferences = profile.routing_preferences
-                    db_profile.temperature_preference = profile.temperature_preference
-                    db_profile.context_window_preference = profile.context_window_preference
-                    db_profile.interactions_count = profile.interactions_count
-                    db_profile.last_updated = datetime.now()
-                else:
-                    # Create new profile
-                    db_profile = UserLearningProfile(
-                        user_id=profile.user_id,
-                        role=profile.role,
-                        preferred_explanation_depth=profile.preferred_explanation_depth,
-                        preferred_citation_style=profile.preferred_citation_style,
-                        typical_subject_areas=profile.typical_subject_areas,
-                        education_level=profile.education_level,
-                        average_question_length=profile.average_question_length,
-                        common_tools_used=profile.common_tools_used,
-                        typical_session_duration=profile.typical_session_duration,
-                        queries_per_session=profile.queries_per_session,
-                        positive_feedback_count=profile.positive_feedback_count,
-                        negative_feedback_count=profile.negative_feedback_count,
-                        neutral_feedback_count=profile.neutral_feedback_count,
-                        correction_patterns=profile.correction_patterns,
-                        satisfaction_score=profile.satisfaction_score,
-                        response_relevance_score=profile.response_relevance_score,
-                        tool_selection_accuracy=profile.tool_selection_accuracy,
-                        routing_preferences=profile.routing_preferences,
-                        temperature_preference=profile.temperature_preference,
-                        context_window_preference=profile.context_window_preference,
-                        interactions_count=profile.interactions_count
-                    )
-                    db.add(db_profile)
-                
-                db.commit()
-                
-        except Exception as e:
-            print(f"⚠️  Failed to save profile to database: {e}")
+    def get_stats(self) -> Dict[str, Any]:
+        """Get profile cache and write-behind statistics."""
+        return {"backend": self.storage_backend, **self.store.get_stats()}
 
 
 # Global profile manager instance
@@ -543,13 +507,28 @@ _profile_manager = None
 
 
 def get_profile_manager() -> UserProfileManager:
-    """Get or create global profile manager instance."""
+    """
+    Get or create global profile manager instance.
+    
+    Profiles are stored in files (.user_profiles) unless USER_PROFILE_BACKEND
+    is set to "database"; existing file profiles are not migrated.
+    """
     global _profile_manager
     if _profile_manager is None:
-        _profile_manager = UserProfileManager(storage_backend="file")
+        _profile_manager = UserProfileManager(
+            storage_backend=os.getenv("USER_PROFILE_BACKEND", "file")
+        )
     return _profile_manager
 
 
+def close_profile_manager():
+    """Flush and stop the global profile manager (called on shutdown)."""
+    global _profile_manager
+    if _profile_manager is not None:
+        _profile_manager.close()
+        _profile_manager = None
+
+
 def update_user_profile(
     user_id: str,
     query: str,
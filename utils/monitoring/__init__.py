@@ -18,6 +18,20 @@ from .errors import (
     DatabaseError,
     LLMError,
 )
+from .streaming_stats import (
+    LatencyHistogram,
+    EWMA,
+    WindowedCounter,
+    LabeledHistograms,
+)
+from .stage_timing import (
+    stage,
+    record_stage,
+    timed_stage,
+    profile_request,
+    get_stage_stats,
+    StageTimingMiddleware,
+)
 
 # Optional: Prometheus metrics (requires prometheus-client)
 try:
@@ -67,6 +81,18 @@ __all__ = [
     "AgentError",
     "DatabaseError",
     "LLMError",
+    # Streaming statistics
+    "LatencyHistogram",
+    "EWMA",
+    "WindowedCounter",
+    "LabeledHistograms",
+    # Stage timing
+    "stage",
+    "record_stage",
+    "timed_stage",
+    "profile_request",
+    "get_stage_stats",
+    "StageTimingMiddleware",
     # Prometheus (optional)
     "get_metrics",
     "track_time",
@@ -17,6 +17,7 @@ from prometheus_client import (
     generate_latest,
     REGISTRY,
 )
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
 
 from config import settings
 
@@ -132,10 +133,219 @@ active_sessions = Gauge(
 )
 
 
+# Bucket bounds for exported PerformanceMonitor latency histograms
+latency_export_buckets = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage bounds start lower: DB queries and SSE flushes take milliseconds
+stage_export_buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PerformanceLatencyCollector:
+    """
+    Exposes PerformanceMonitor latency histograms at scrape time.
+    
+    The monitor keeps fixed-memory log-bucketed histograms per tool, agent
+    and route; they are converted to Prometheus histograms (and quantile
+    gauges for p50/p95/p99) only when scraped.
+    """
+    
+    def describe(self):
+        # Series depend on traffic; skip describe-time collection
+        return []
+    
+    def collect(self):
+        from utils.routing.performance import get_performance_monitor
+        
+        histograms = HistogramMetricFamily(
+            'app_latency_seconds',
+            'Request latency by tool, agent and route',
+            labels=['scope', 'name']
+        )
+        quantiles = GaugeMetricFamily(
+            'app_latency_quantile_seconds',
+            'Request latency quantiles by tool, agent and route',
+            labels=['scope', 'name', 'quantile']
+        )
+        
+        for scope, name, histogram in get_performance_monitor().iter_latency_histograms():
+            if not histogram.count:
+                continue
+            counts = histogram.cumulative_counts(latency_export_buckets)
+            buckets = [(str(bound), count) for bound, count in zip(latency_export_buckets, counts)]
+            buckets.append(("+Inf", histogram.count))
+            histograms.add_metric([scope, name], buckets, histogram.sum)
+            for q, value in histogram.quantiles().items():
+                quantiles.add_metric([scope, name, str(q)], value)
+        
+        yield histograms
+        yield quantiles
+
+
+class StageTimingCollector:
+    """
+    Exposes per-endpoint stage timing histograms at scrape time.
+    
+    Profiled requests record the time spent in each stage (routing,
+    retrieval, embedding, DB, LLM first token/total, SSE flush) into
+    fixed-memory histograms, converted here like PerformanceLatencyCollector.
+    """
+    
+    def describe(self):
+        return []
+    
+    def collect(self):
+        from utils.monitoring.stage_timing import get_stage_stats
+        
+        histograms = HistogramMetricFamily(
+            'app_stage_duration_seconds',
+            'Time per request spent in each stage, by endpoint',
+            labels=['endpoint', 'stage']
+        )
+        
+        for endpoint, stage, histogram in get_stage_stats().items():
+            if not histogram.count:
+                continue
+            counts = histogram.cumulative_counts(stage_export_buckets)
+            buckets = [(str(bound), count) for bound, count in zip(stage_export_buckets, counts)]
+            buckets.append(("+Inf", histogram.count))
+            histograms.add_metric([endpoint, stage], buckets, histogram.sum)
+        
+        yield histograms
+
+
+class LLMGatewayCollector:
+    """
+    Exposes LLM gateway queueing delay, occupancy and retry counters, and
+    completion cache hits per call site.
+    
+    Queueing delay (budget wait plus wait for a slot) is kept per lane in
+    fixed-memory histograms and converted here like the stage histograms.
+    """
+    
+    def describe(self):
+        return []
+    
+    def collect(self):
+        from utils.core.llm_gateway import get_llm_gateway
+        
+        gateway = get_llm_gateway()
+        limiter = gateway.limiter.get_stats()
+        
+        queue_wait = HistogramMetricFamily(
+            'app_llm_queue_wait_seconds',
+            'Time LLM calls waited in the gateway before reaching the provider',
+            labels=['lane']
+        )
+        for lane, histogram in gateway.queue_wait.items():
+            counts = histogram.cumulative_counts(stage_export_buckets)
+            buckets = [(str(bound), count) for bound, count in zip(stage_export_buckets, counts)]
+            buckets.append(("+Inf", histogram.count))
+            queue_wait.add_metric([lane], buckets, histogram.sum)
+        yield queue_wait
+        
+        queued = GaugeMetricFamily('app_llm_queued', 'LLM calls waiting for a gateway slot', labels=['lane'])
+        for lane, count in limiter["queued"].items():
+            queued.add_metric([lane], count)
+        yield queued
+        
+        yield GaugeMetricFamily('app_llm_in_flight', 'LLM calls in flight', value=limiter["in_flight"])
+        yield CounterMetricFamily('app_llm_retries', 'Rate-limited LLM calls retried', value=gateway.retries)
+        yield CounterMetricFamily('app_llm_queue_timeouts', 'LLM calls that timed out waiting for a slot',
+                                  value=gateway.timeouts)
+        
+        from utils.cache.llm_cache import get_llm_cache
+        
+        cache_requests = CounterMetricFamily(
+            'app_llm_cache_requests',
+            'LLM completion cache lookups by call site and result',
+            labels=['call_site', 'result']
+        )
+        for call_site, counts in get_llm_cache().get_stats()["call_sites"].items():
+            for result, count in counts.items():
+                cache_requests.add_metric([call_site, result], count)
+        yield cache_requests
+
+
+class SpeculationCollector:
+    """Exposes speculative tool calls started during routing and their outcome."""
+    
+    def describe(self):
+        return []
+    
+    def collect(self):
+        from utils.patterns.speculation import get_speculation_stats
+        
+        stats = get_speculation_stats().get_stats()
+        
+        calls = CounterMetricFamily(
+            'app_speculation',
+            'Speculative tool calls by kind and result (started, hits, wasted)',
+            labels=['kind', 'result']
+        )
+        seconds = CounterMetricFamily(
+            'app_speculation_seconds',
+            'Head start given by used speculations (saved) and time run by discarded ones (wasted)',
+            labels=['kind', 'outcome']
+        )
+        for kind, counts in stats.items():
+            for result in ("started", "hits", "wasted"):
+                calls.add_metric([kind, result], counts[result])
+            seconds.add_metric([kind, "saved"], counts["saved_seconds"])
+            seconds.add_metric([kind, "wasted"], counts["wasted_seconds"])
+        yield calls
+        yield seconds
+
+
+class AdmissionCollector:
+    """Exposes the adaptive admission limit, queued requests and shed requests."""
+    
+    def describe(self):
+        return []
+    
+    def collect(self):
+        from utils.rate_limiting.admission import get_admission_controller
+        
+        stats = get_admission_controller().get_stats()
+        
+        yield GaugeMetricFamily('app_admission_limit', 'Adaptive concurrency limit of controlled requests',
+                                value=stats["limit"])
+        yield GaugeMetricFamily('app_admission_effective_limit',
+                                'Concurrency limit after database pool pressure', value=stats["effective_limit"])
+        yield GaugeMetricFamily('app_admission_in_flight', 'Controlled requests in flight', value=stats["in_flight"])
+        yield GaugeMetricFamily('app_admission_db_utilization', 'Database pool utilization seen by admission control',
+                                value=stats["db_utilization"])
+        
+        queued = GaugeMetricFamily('app_admission_queued', 'Requests waiting for admission', labels=['priority'])
+        for priority, count in stats["queued"].items():
+            queued.add_metric([priority], count)
+        yield queued
+        
+        admitted = CounterMetricFamily('app_admission_admitted', 'Admitted requests by priority', labels=['priority'])
+        for priority, count in stats["admitted"].items():
+            admitted.add_metric([priority], count)
+        yield admitted
+        
+        shed = CounterMetricFamily('app_admission_shed', 'Requests shed with 503 by priority and reason',
+                                   labels=['priority', 'reason'])
+        for key, count in stats["rejected"].items():
+            priority, reason = key.split(":", 1)
+            shed.add_metric([priority, reason], count)
+        yield shed
+
+
+_latency_collector: Optional[PerformanceLatencyCollector] = None
+_stage_collector: Optional[StageTimingCollector] = None
+_llm_gateway_collector: Optional[LLMGatewayCollector] = None
+_speculation_collector: Optional[SpeculationCollector] = None
+_admission_collector: Optional[AdmissionCollector] = None
+
+
 class PrometheusMetrics:
     """Centralized Prometheus metrics manager."""
     
     def __init__(self):
+        global _latency_collector, _stage_collector, _llm_gateway_collector, _speculation_collector
+        global _admission_collector
         self.enabled = settings.enable_metrics
         
         if self.enabled:
@@ -144,6 +354,23 @@ class PrometheusMetrics:
                 'version': '1.0.0',
                 'environment': 'production' if not settings.is_development else 'development',
             })
+            
+            # Streaming latency histograms from the performance monitor
+            if _latency_collector is None:
+                _latency_collector = PerformanceLatencyCollector()
+                REGISTRY.register(_latency_collector)
+            if _stage_collector is None:
+                _stage_collector = StageTimingCollector()
+                REGISTRY.register(_stage_collector)
+            if _llm_gateway_collector is None:
+                _llm_gateway_collector = LLMGatewayCollector()
+                REGISTRY.register(_llm_gateway_collector)
+            if _speculation_collector is None:
+                _speculation_collector = SpeculationCollector()
+                REGISTRY.register(_speculation_collector)
+            if _admission_collector is None:
+                _admission_collector = AdmissionCollector()
+                REGISTRY.register(_admission_collector)
     
     def track_request(
         self,
@@ -0,0 +1,423 @@
+"""
+Per-request stage timing (hot-path profiler).
+
+A sampled request carries a RequestProfile in a context variable. Code on
+the hot path wraps its stages in ``with stage(STAGE_RETRIEVAL):`` (or
+``@timed_stage(...)``), or reports a duration it already measured with
+``record_stage``. The context is copied into asyncio tasks and
+``asyncio.to_thread`` workers, so stages running in parallel are all
+attributed to the request that started them.
+
+For unsampled requests ``stage()`` is one context variable lookup returning
+a shared no-op context manager.
+
+When a profiled request ends:
+- each stage's total time is recorded into per-endpoint histograms
+  (exported to Prometheus as ``app_stage_duration_seconds``)
+- stage totals and one event per timed span are added to the current
+  DistributedTracer span
+- StageTimingMiddleware can return them in a ``Server-Timing`` header
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.core.constants import (
+    STAGE_TIMING_SAMPLE_RATE,
+    STAGE_TIMING_MAX_SPANS,
+    STAGE_TIMING_MAX_SERIES,
+)
+from .streaming_stats import LatencyHistogram, OTHER_SERIES
+
+
+STAGE_ROUTING = "routing"
+STAGE_RETRIEVAL = "retrieval"
+STAGE_EMBEDDING = "embedding"
+STAGE_DB = "db"
+STAGE_WEB_SEARCH = "web_search"
+STAGE_LLM_QUEUE = "llm_queue"
+STAGE_LLM_FIRST_TOKEN = "llm_first_token"
+STAGE_LLM_TOTAL = "llm_total"
+STAGE_SSE_FLUSH = "sse_flush"
+# Wall time of the whole request (recorded for every profiled request)
+STAGE_REQUEST = "request"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+# Innermost open stage, so nested calls of the same stage are not counted twice
+_active_stage: ContextVar[Optional[str]] = ContextVar("active_stage", default=None)
+
+
+class RequestProfile:
+    """Stage durations of one request."""
+
+    def __init__(self, endpoint: str = ""):
+        """
+        Initialize the profile.
+
+        Args:
+            endpoint: Endpoint label, e.g. "POST /query" (may be set later)
+        """
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.spans: List[Tuple[str, float, float]] = []
+        self.dropped_spans = 0
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration: float, start: Optional[float] = None):
+        """
+        Record a timed stage.
+
+        Args:
+            name: Stage name
+            duration: Seconds spent in the stage
+            start: perf_counter() value at which the stage started
+                (defaults to now - duration)
+        """
+        if start is None:
+            start = time.perf_counter() - duration
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + duration
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if len(self.spans) < STAGE_TIMING_MAX_SPANS:
+                self.spans.append((name, start - self.started, duration))
+            else:
+                self.dropped_spans += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Stage totals so far as a Server-Timing header value."""
+        parts = []
+        for name, total in list(self.totals.items()):
+            entry = f"{name};dur={total * 1000:.1f}"
+            count = self.counts.get(name, 1)
+            if count > 1:
+                entry += f';desc="{count}x"'
+            parts.append(entry)
+        parts.append(f"total;dur={self.elapsed * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Stage totals in milliseconds and call counts."""
+        return {
+            name: {"ms": round(total * 1000, 3), "count": self.counts.get(name, 0)}
+            for name, total in list(self.totals.items())
+        }
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "start", "_token")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self._token = _active_stage.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add(self.name, time.perf_counter() - self.start, self.start)
+        _active_stage.reset(self._token)
+        return False
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, or None if it is not sampled."""
+    return _current_profile.get()
+
+
+def stage(name: str):
+    """
+    Time a block as a stage of the current request.
+
+    Usage:
+        with stage(STAGE_RETRIEVAL):
+            retrieval = await asyncio.to_thread(run_document_retrieval, ...)
+
+    Args:
+        name: Stage name (a STAGE_* constant or any Server-Timing token)
+
+    Returns:
+        Context manager (a shared no-op when the request is not profiled)
+    """
+    profile = _current_profile.get()
+    if profile is None or _active_stage.get() == name:
+        return _NOOP_STAGE
+    return _Stage(profile, name)
+
+
+def record_stage(name: str, duration: float, start: Optional[float] = None):
+    """
+    Record an already measured stage of the current request.
+
+    Args:
+        name: Stage name
+        duration: Seconds spent in the stage
+        start: perf_counter() value at which the stage started
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add(name, duration, start)
+
+
+def timed_stage(name: str):
+    """
+    Decorator timing every call of a function as a stage.
+
+    Usage:
+        @timed_stage(STAGE_ROUTING)
+        async def aclassify_intent(self, state):
+            ...
+    """
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+class StageTimingStats:
+    """Stage latency histograms per endpoint, with a cap on distinct pairs."""
+
+    def __init__(self, max_series: int = STAGE_TIMING_MAX_SERIES):
+        self.max_series = max_series
+        self.profiles = 0
+        self._series: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str, stage_name: str) -> LatencyHistogram:
+        """Histogram for an endpoint/stage pair (shared "other" endpoint once full)."""
+        key = (endpoint, stage_name)
+        histogram = self._series.get(key)
+        if histogram is not None:
+            return histogram
+        with self._lock:
+            if key not in self._series and len(self._series) >= self.max_series:
+                key = (OTHER_SERIES, stage_name)
+            return self._series.setdefault(key, LatencyHistogram())
+
+    def record_profile(self, profile: RequestProfile):
+        """Record each stage's total and the request's wall time."""
+        endpoint = profile.endpoint or OTHER_SERIES
+        for name, total in list(profile.totals.items()):
+            self.get(endpoint, name).record(total)
+        self.get(endpoint, STAGE_REQUEST).record(profile.elapsed)
+        self.profiles += 1
+
+    def items(self) -> Iterator[Tuple[str, str, LatencyHistogram]]:
+        """(endpoint, stage, histogram) for every series."""
+        for (endpoint, stage_name), histogram in list(self._series.items()):
+            yield endpoint, stage_name, histogram
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+        """Histogram stats by endpoint, then stage."""
+        stats: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+        for endpoint, stage_name, histogram in self.items():
+            stats.setdefault(endpoint, {})[stage_name] = histogram.get_stats()
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self.profiles = 0
+
+
+_stage_stats: Optional[StageTimingStats] = None
+
+
+def get_stage_stats() -> StageTimingStats:
+    """Get or create the global stage histograms."""
+    global _stage_stats
+    if _stage_stats is None:
+        _stage_stats = StageTimingStats()
+    return _stage_stats
+
+
+def _export_to_tracer(profile: RequestProfile):
+    """Add stage totals and spans to the current trace span."""
+    try:
+        from .tracing import get_tracer
+        tracer = get_tracer()
+    except Exception:
+        return
+    if not tracer.enabled:
+        return
+
+    for name, total in list(profile.totals.items()):
+        tracer.set_span_attribute(f"stage.{name}.ms", round(total * 1000, 3))
+    for name, offset, duration in profile.spans:
+        tracer.add_event(f"stage.{name}", {
+            "offset_ms": round(offset * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+        })
+    if profile.dropped_spans:
+        tracer.set_span_attribute("stage.dropped_spans", profile.dropped_spans)
+
+
+def finish_profile(profile: RequestProfile):
+    """Feed a finished profile to the stage histograms and the tracer."""
+    get_stage_stats().record_profile(profile)
+    _export_to_tracer(profile)
+
+
+def _sampled(sample_rate: float) -> bool:
+    return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+
+@contextmanager
+def profile_request(endpoint: str = "", sample_rate: float = STAGE_TIMING_SAMPLE_RATE):
+    """
+    Profile the enclosed work as one request (if sampled).
+
+    Args:
+        endpoint: Endpoint label (can be set on the profile later)
+        sample_rate: Probability of profiling (0-1)
+
+    Yields:
+        The RequestProfile, or None if not sampled
+    """
+    if not _sampled(sample_rate):
+        yield None
+        return
+
+    profile = RequestProfile(endpoint)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        finish_profile(profile)
+
+
+def endpoint_name(scope: dict) -> str:
+    """Endpoint label of an ASGI request: method and route template."""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    return f"{scope.get('method', '')} {path}"
+
+
+class StageTimingMiddleware:
+    """
+    ASGI middleware profiling sampled requests stage by stage.
+
+    Sending each body chunk of an event stream is timed as the SSE flush
+    stage. With ``server_timing`` the response gets a Server-Timing header;
+    for streamed responses it covers the stages finished before the first
+    byte (the full breakdown still goes to histograms and the trace).
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = STAGE_TIMING_SAMPLE_RATE,
+        server_timing: bool = False
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            sample_rate: Fraction of requests to profile (0-1)
+            server_timing: Add a Server-Timing header to profiled responses
+        """
+        self.app = app
+        self.sample_rate = sample_rate
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        """Process request with stage timing."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_request(sample_rate=self.sample_rate) as profile:
+            if profile is None:
+                await self.app(scope, receive, send)
+                return
+
+            event_stream = False
+
+            async def send_wrapper(message):
+                nonlocal event_stream
+                if message["type"] == "http.response.start":
+                    profile.endpoint = endpoint_name(scope)
+                    headers = list(message.get("headers", []))
+                    event_stream = any(
+                        name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                        for name, value in headers
+                    )
+                    if self.server_timing:
+                        headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                        message = {**message, "headers": headers}
+                elif event_stream and message["type"] == "http.response.body":
+                    start = time.perf_counter()
+                    await send(message)
+                    profile.add(STAGE_SSE_FLUSH, time.perf_counter() - start, start)
+                    return
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if not profile.endpoint:
+                    profile.endpoint = endpoint_name(scope)
+
+
+__all__ = [
+    'RequestProfile',
+    'StageTimingStats',
+    'StageTimingMiddleware',
+    'current_profile',
+    'stage',
+    'record_stage',
+    'timed_stage',
+    'profile_request',
+    'finish_profile',
+    'get_stage_stats',
+    'endpoint_name',
+    'STAGE_ROUTING',
+    'STAGE_RETRIEVAL',
+    'STAGE_EMBEDDING',
+    'STAGE_DB',
+    'STAGE_WEB_SEARCH',
+    'STAGE_LLM_QUEUE',
+    'STAGE_LLM_FIRST_TOKEN',
+    'STAGE_LLM_TOTAL',
+    'STAGE_SSE_FLUSH',
+    'STAGE_REQUEST',
+]
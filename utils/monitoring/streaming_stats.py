@@ -0,0 +1,335 @@
+"""
+Fixed-memory streaming statistics for latency and rate monitoring.
+
+- LatencyHistogram: log-bucketed histogram (HDR/DDSketch style). Bucket
+  boundaries grow geometrically, so every quantile is reported within a
+  fixed relative error using a fixed array of counters, however many
+  values are recorded.
+- EWMA: exponentially weighted moving average (O(1) trend tracking).
+- WindowedCounter: ring of time buckets for counts/rates over a sliding
+  window.
+- LabeledHistograms: one histogram per tool/agent/route name, with a cap on
+  distinct names.
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.core.constants import (
+    LATENCY_HISTOGRAM_RELATIVE_ERROR,
+    LATENCY_HISTOGRAM_MIN_SECONDS,
+    LATENCY_HISTOGRAM_MAX_SECONDS,
+    LATENCY_QUANTILES,
+    METRICS_WINDOW_SECONDS,
+    METRICS_WINDOW_BUCKETS,
+    PERFORMANCE_MAX_SERIES,
+)
+
+
+# Name shared by series beyond PERFORMANCE_MAX_SERIES
+OTHER_SERIES = "other"
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with bounded relative error.
+
+    Bucket k holds values in (gamma**(k-1), gamma**k] with
+    gamma = (1 + e) / (1 - e); reporting the bucket's midpoint keeps every
+    quantile within relative error e. Memory is one counter per bucket
+    between min_value and max_value (~870 for 1% over 100µs..1h).
+    """
+
+    def __init__(
+        self,
+        relative_error: float = LATENCY_HISTOGRAM_RELATIVE_ERROR,
+        min_value: float = LATENCY_HISTOGRAM_MIN_SECONDS,
+        max_value: float = LATENCY_HISTOGRAM_MAX_SECONDS
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            relative_error: Maximum relative error of reported quantiles
+            min_value: Smallest distinguished value (smaller values clamp)
+            max_value: Largest distinguished value (larger values clamp)
+        """
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error must be between 0 and 1")
+        if not 0 < min_value < max_value:
+            raise ValueError("need 0 < min_value < max_value")
+
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self.max_value = max_value
+
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._min_key = self._key(min_value)
+        self._counts = array("q", bytes(8 * (self._key(max_value) - self._min_key + 1)))
+        self._lock = threading.Lock()
+
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        if value >= self.max_value:
+            return len(self._counts) - 1
+        return self._key(value) - self._min_key
+
+    def _bucket_value(self, index: int) -> float:
+        """Midpoint of a bucket (within relative_error of all its values)."""
+        return 2 * self._gamma ** (index + self._min_key) / (self._gamma + 1)
+
+    def record(self, value: float, count: int = 1):
+        """
+        Record a value.
+
+        Args:
+            value: Latency in seconds
+            count: Number of occurrences
+        """
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] += count
+            self.count += count
+            self.sum += value * count
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Value at quantile q (0-1), or None if empty.
+
+        Within relative_error of the exact quantile for values inside
+        [min_value, max_value]; the extremes are exact.
+        """
+        return self.quantiles((q,))[q]
+
+    def quantiles(self, qs: Sequence[float] = LATENCY_QUANTILES) -> Dict[float, Optional[float]]:
+        """Several quantiles in one pass."""
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("quantiles must be between 0 and 1")
+        if self.count == 0:
+            return {q: None for q in qs}
+
+        result: Dict[float, Optional[float]] = {}
+        pending = []
+        for q in sorted(qs):
+            if q == 0:
+                result[q] = self.min
+            elif q == 1:
+                result[q] = self.max
+            else:
+                pending.append(q)
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            while pending and seen > pending[0] * (self.count - 1):
+                result[pending.pop(0)] = min(max(self._bucket_value(index), self.min), self.max)
+            if not pending:
+                break
+        for q in pending:
+            result[q] = self.max
+        return {q: result[q] for q in qs}
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """
+        Counts of values at or below each bound (Prometheus buckets).
+
+        Args:
+            bounds: Ascending upper bounds in seconds
+
+        Returns:
+            Cumulative count per bound
+        """
+        result = []
+        seen = 0
+        position = 0
+        for bound in bounds:
+            end = self._index(bound) + 1
+            seen += sum(self._counts[position:end]) if end > position else 0
+            position = max(position, end)
+            result.append(seen)
+        return result
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's values (same parameters required)."""
+        if (other.relative_error, other.min_value, other.max_value) != (
+            self.relative_error, self.min_value, self.max_value
+        ):
+            raise ValueError("Cannot merge histograms with different parameters")
+        with self._lock:
+            for index, bucket_count in enumerate(other._counts):
+                if bucket_count:
+                    self._counts[index] += bucket_count
+            self.count += other.count
+            self.sum += other.sum
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def reset(self):
+        with self._lock:
+            self._counts = array("q", bytes(8 * len(self._counts)))
+            self.count = 0
+            self.sum = 0.0
+            self.min = math.inf
+            self.max = -math.inf
+
+    def __len__(self) -> int:
+        """Number of buckets (fixed)."""
+        return len(self._counts)
+
+    def get_stats(self, qs: Sequence[float] = LATENCY_QUANTILES) -> Dict[str, Optional[float]]:
+        """Count, mean, min, max and quantiles (p50, p95, ...)."""
+        stats: Dict[str, Optional[float]] = {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q, value in self.quantiles(qs).items():
+            stats[f"p{q * 100:g}"] = value
+        return stats
+
+
+class EWMA:
+    """Exponentially weighted moving average."""
+
+    def __init__(self, alpha: float):
+        """
+        Initialize the average.
+
+        Args:
+            alpha: Weight of each new value (0-1, higher = faster)
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        """Add a value and return the new average."""
+        if self.value is None:
+            self.value = float(value)
+        else:
+            self.value += self.alpha * (value - self.value)
+        self.count += 1
+        return self.value
+
+
+class WindowedCounter:
+    """Counts over a sliding time window, in fixed time buckets."""
+
+    def __init__(
+        self,
+        window_seconds: float = METRICS_WINDOW_SECONDS,
+        buckets: int = METRICS_WINDOW_BUCKETS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the counter.
+
+        Args:
+            window_seconds: Window length
+            buckets: Number of time buckets (window resolution)
+            clock: Time source (seconds)
+        """
+        self.window_seconds = window_seconds
+        self._width = window_seconds / buckets
+        self._clock = clock
+        self._counts = [0.0] * buckets
+        self._epochs = [-1] * buckets
+        self._lock = threading.Lock()
+
+    def add(self, amount: float = 1.0, now: Optional[float] = None):
+        """Count an event (or ``amount`` of them)."""
+        epoch = int((self._clock() if now is None else now) // self._width)
+        index = epoch % len(self._counts)
+        with self._lock:
+            if self._epochs[index] != epoch:
+                self._epochs[index] = epoch
+                self._counts[index] = 0.0
+            self._counts[index] += amount
+
+    def total(self, now: Optional[float] = None) -> float:
+        """Events in the window ending now."""
+        epoch = int((self._clock() if now is None else now) // self._width)
+        oldest = epoch - len(self._counts)
+        return sum(
+            count for count, bucket_epoch in zip(self._counts, self._epochs)
+            if oldest < bucket_epoch <= epoch
+        )
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Events per second over the window."""
+        return self.total(now) / self.window_seconds
+
+
+class LabeledHistograms:
+    """Latency histograms keyed by name, with a cap on distinct names."""
+
+    def __init__(
+        self,
+        max_series: int = PERFORMANCE_MAX_SERIES,
+        factory: Callable[[], LatencyHistogram] = LatencyHistogram
+    ):
+        self.max_series = max_series
+        self._factory = factory
+        self._series: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> LatencyHistogram:
+        """Histogram for a name (the shared "other" series once full)."""
+        histogram = self._series.get(name)
+        if histogram is not None:
+            return histogram
+        with self._lock:
+            # The last slot is reserved for the shared series
+            if name not in self._series and len(self._series) >= self.max_series - 1:
+                name = OTHER_SERIES
+            return self._series.setdefault(name, self._factory())
+
+    def record(self, name: str, value: float):
+        self.get(name).record(value)
+
+    def items(self) -> Iterator[Tuple[str, LatencyHistogram]]:
+        return iter(list(self._series.items()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def get_stats(self, qs: Iterable[float] = LATENCY_QUANTILES) -> Dict[str, Dict[str, Optional[float]]]:
+        qs = tuple(qs)
+        return {name: histogram.get_stats(qs) for name, histogram in self.items()}
+
+
+__all__ = [
+    'LatencyHistogram',
+    'EWMA',
+    'WindowedCounter',
+    'LabeledHistograms',
+    'OTHER_SERIES',
+]
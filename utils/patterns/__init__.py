@@ -2,11 +2,24 @@
 
 from .base_agent import BaseAgent
 from .graph_builder import GraphBuilder
+from .io_steps import Step, LLMCall, ToolCall, dual_node, run_steps, arun_steps
+from .plan_dag import normalize_plan, run_plan
+from .speculation import Speculation, get_speculation_stats
 from .state_manager import StateManager
 
 __all__ = [
     "BaseAgent",
     "GraphBuilder",
+    "Step",
+    "LLMCall",
+    "ToolCall",
+    "dual_node",
+    "run_steps",
+    "arun_steps",
+    "normalize_plan",
+    "run_plan",
+    "Speculation",
+    "get_speculation_stats",
     "StateManager",
 ]
 
@@ -92,7 +92,7 @@ class BaseAgent(ABC):
             existing_messages = []
             
             try:
-                state = self.app.get_state(config)
+                state = await self.app.aget_state(config)
                 if state and state.values:
                     existing_messages = state.values.get("messages", [])
             except Exception:
@@ -105,8 +105,8 @@ class BaseAgent(ABC):
                 **kwargs
             )
             
-            # Execute graph
-            result = self.app.invoke(initial_state, config)
+            # Execute graph (async nodes; no worker thread held while waiting on I/O)
+            result = await self.app.ainvoke(initial_state, config)
             answer = result.get("final_answer", "No answer generated")
             
             # Cache result
@@ -0,0 +1,145 @@
+"""
+Graph nodes that run on both ``graph.invoke`` and ``graph.ainvoke``.
+
+A node written as a generator yields its I/O instead of performing it:
+
+    def plan(self, state):
+        response = yield LLMCall(self.llm, [HumanMessage(content=prompt)])
+        return {**state, "plan": response.content}
+
+    workflow.add_node("plan", dual_node(nodes.plan))
+
+``graph.invoke`` runs each step with blocking calls. ``graph.ainvoke``
+awaits them (``llm.ainvoke``, async DB sessions), so a request waiting on
+the provider holds no thread; steps without an async form run in a worker
+thread for their own duration only. An exception raised by a step is thrown
+back into the node at its ``yield``, so try/except around it works as before.
+
+Nodes can delegate to other step nodes with ``yield from``.
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable, Optional
+
+from langchain_core.runnables import RunnableLambda
+
+
+class Step:
+    """A blocking call, with an optional async equivalent."""
+
+    def __init__(self, fn: Callable, *args, afn: Optional[Callable] = None, **kwargs):
+        """
+        Initialize step.
+
+        Args:
+            fn: Blocking function
+            *args: Positional arguments (for both functions)
+            afn: Async function with the same signature (None: run fn in a thread)
+            **kwargs: Keyword arguments (for both functions)
+        """
+        self.fn = fn
+        self.afn = afn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self) -> Any:
+        """Run the step, blocking."""
+        return self.fn(*self.args, **self.kwargs)
+
+    async def arun(self) -> Any:
+        """Run the step without blocking the event loop."""
+        if self.afn is not None:
+            return await self.afn(*self.args, **self.kwargs)
+        return await asyncio.to_thread(self.fn, *self.args, **self.kwargs)
+
+
+class LLMCall(Step):
+    """Chat model call (``invoke`` / ``ainvoke``)."""
+
+    def __init__(self, llm, messages, **kwargs):
+        super().__init__(llm.invoke, messages, afn=llm.ainvoke, **kwargs)
+
+
+class ToolCall(Step):
+    """Tool call with raw arguments (``tool.func`` / ``tool.coroutine``)."""
+
+    def __init__(self, tool, *args, **kwargs):
+        super().__init__(tool.func, *args, afn=getattr(tool, "coroutine", None), **kwargs)
+
+
+def run_steps(result: Any) -> Any:
+    """
+    Drive a step node with blocking calls.
+
+    Args:
+        result: What the node returned (a generator of steps, or its final value)
+
+    Returns:
+        The node's return value
+    """
+    if not inspect.isgenerator(result):
+        return result
+
+    value, error = None, None
+    while True:
+        try:
+            step = result.throw(error) if error is not None else result.send(value)
+        except StopIteration as done:
+            return done.value
+        value, error = None, None
+        try:
+            value = step.run()
+        except Exception as e:
+            error = e
+
+
+async def arun_steps(result: Any) -> Any:
+    """Async variant of ``run_steps`` (awaits each step)."""
+    if not inspect.isgenerator(result):
+        return result
+
+    value, error = None, None
+    while True:
+        try:
+            step = result.throw(error) if error is not None else result.send(value)
+        except StopIteration as done:
+            return done.value
+        value, error = None, None
+        try:
+            value = await step.arun()
+        except Exception as e:
+            error = e
+
+
+def dual_node(func: Callable, afunc: Optional[Callable] = None) -> RunnableLambda:
+    """
+    Wrap a step node for ``StateGraph.add_node``.
+
+    Args:
+        func: Node function (generator of steps, or plain function)
+        afunc: Existing async implementation to use under ``ainvoke``
+            (None: drive func's steps asynchronously)
+
+    Returns:
+        Runnable that blocks under ``invoke`` and awaits under ``ainvoke``
+    """
+    def invoke(state):
+        return run_steps(func(state))
+
+    async def ainvoke(state):
+        if afunc is not None:
+            return await afunc(state)
+        return await arun_steps(func(state))
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=getattr(func, "__name__", None))
+
+
+__all__ = [
+    'Step',
+    'LLMCall',
+    'ToolCall',
+    'run_steps',
+    'arun_steps',
+    'dual_node',
+]
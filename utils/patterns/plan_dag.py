@@ -0,0 +1,122 @@
+"""
+Dependency-aware execution of multi-step task plans.
+
+Planners emit steps with explicit dependencies:
+
+    [{"step": 1, "description": "...", "tool": "Web_Search", "depends_on": []},
+     {"step": 2, "description": "...", "tool": "Document_QA", "depends_on": []},
+     {"step": 3, "description": "...", "tool": "Python_REPL", "depends_on": [1, 2]}]
+
+``run_plan`` starts every step whose dependencies are done, up to a bounded
+fan-out, so independent lookups take the time of the slowest one instead of
+the sum of all of them.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from utils.core.constants import PLAN_MAX_PARALLEL_STEPS
+
+
+def normalize_plan(plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Number steps and clean up their dependencies.
+
+    Steps without ``depends_on`` depend on the previous step (plans from
+    planners that do not emit dependencies run in order, as before).
+    Dependencies on unknown, later or the same step are dropped, so the
+    plan is always acyclic.
+
+    Args:
+        plan: Steps as returned by the planner
+
+    Returns:
+        Steps with an int ``step`` and a sorted ``depends_on`` list
+    """
+    normalized = []
+    for index, step in enumerate(plan):
+        number = index + 1
+        if "depends_on" in step:
+            raw = step.get("depends_on") or []
+            if not isinstance(raw, (list, tuple)):
+                raw = [raw]
+        else:
+            raw = [number - 1] if number > 1 else []
+
+        depends_on = set()
+        for dependency in raw:
+            try:
+                dependency = int(dependency)
+            except (TypeError, ValueError):
+                continue
+            if 1 <= dependency < number:
+                depends_on.add(dependency)
+
+        normalized.append({**step, "step": number, "depends_on": sorted(depends_on)})
+    return normalized
+
+
+def ready_steps(plan: List[Dict[str, Any]], done: Set[int], started: Set[int]) -> List[Dict[str, Any]]:
+    """Steps not started yet whose dependencies are all done."""
+    return [
+        step for step in plan
+        if step["step"] not in started and all(d in done for d in step["depends_on"])
+    ]
+
+
+async def run_plan(
+    plan: List[Dict[str, Any]],
+    run_step: Callable[[Dict[str, Any]], Awaitable[Any]],
+    max_parallel: int = PLAN_MAX_PARALLEL_STEPS
+) -> Dict[int, Any]:
+    """
+    Run a normalized plan, independent steps concurrently.
+
+    A step that raises is recorded with its exception as result and still
+    counts as done, so its dependents run (with what is available) rather
+    than the whole plan stopping.
+
+    Args:
+        plan: Normalized steps (see normalize_plan)
+        run_step: Coroutine function running one step
+        max_parallel: Steps running at once
+
+    Returns:
+        Step number -> result (or exception)
+    """
+    results: Dict[int, Any] = {}
+    done: Set[int] = set()
+    started: Set[int] = set()
+    running: Dict[asyncio.Task, int] = {}
+
+    try:
+        while len(done) < len(plan):
+            for step in ready_steps(plan, done, started):
+                if len(running) >= max(1, max_parallel):
+                    break
+                started.add(step["step"])
+                running[asyncio.create_task(run_step(step))] = step["step"]
+
+            if not running:
+                break  # Unreachable for normalized plans
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                number = running.pop(task)
+                try:
+                    results[number] = task.result()
+                except Exception as e:
+                    results[number] = e
+                done.add(number)
+    finally:
+        for task in running:
+            task.cancel()
+
+    return results
+
+
+__all__ = [
+    'normalize_plan',
+    'ready_steps',
+    'run_plan',
+]
@@ -0,0 +1,234 @@
+"""
+Speculative execution of tool prefix work while a request is being routed.
+
+Routing (context enrichment, intent classification, access check) runs
+before the study agent starts its tool, but for most study queries the
+tool's first, read-only step does not depend on the routing outcome: the
+vector lookup for Document_QA or the search-API call for Web_Search. A
+Speculation starts that step early, keyed by its exact inputs:
+
+    speculation = Speculation()
+    speculation.start("web_search", query, lambda: tool.coroutine(query))
+    ...route...
+    results = await speculation.take_or_run("web_search", query, run_search)
+    speculation.finish()
+
+The tool reuses the result only if it asks for the same kind and key;
+anything not taken (other route, different query, cache hit) is cancelled
+by ``finish()`` and counted as wasted work. Only side-effect-free calls
+should be speculated: side effects of the real call (usage stats, model
+training) go in ``on_take``, which runs only when the result is taken.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from utils.monitoring import get_logger
+
+logger = get_logger(__name__)
+
+
+class SpeculationStats:
+    """Process-wide speculation outcomes (thread-safe)."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self._lock = threading.Lock()
+        self.started: Dict[str, int] = {}
+        self.hits: Dict[str, int] = {}
+        self.wasted: Dict[str, int] = {}
+        # Head start hits gave the tool (seconds)
+        self.saved_seconds: Dict[str, float] = {}
+        # Time wasted speculations ran before being dropped (seconds)
+        self.wasted_seconds: Dict[str, float] = {}
+
+    def record(self, counter: str, kind: str, seconds: Optional[float] = None):
+        """Count a speculation event ('started', 'hits' or 'wasted')."""
+        with self._lock:
+            counts = getattr(self, counter)
+            counts[kind] = counts.get(kind, 0) + 1
+            if seconds is not None:
+                totals = self.saved_seconds if counter == "hits" else self.wasted_seconds
+                totals[kind] = totals.get(kind, 0.0) + seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Outcomes per kind of speculated work."""
+        with self._lock:
+            kinds = sorted(set(self.started) | set(self.hits) | set(self.wasted))
+            return {
+                kind: {
+                    "started": self.started.get(kind, 0),
+                    "hits": self.hits.get(kind, 0),
+                    "wasted": self.wasted.get(kind, 0),
+                    "hit_rate": self.hits.get(kind, 0) / self.started[kind] if self.started.get(kind) else 0.0,
+                    "saved_seconds": round(self.saved_seconds.get(kind, 0.0), 3),
+                    "wasted_seconds": round(self.wasted_seconds.get(kind, 0.0), 3),
+                }
+                for kind in kinds
+            }
+
+
+_speculation_stats: Optional[SpeculationStats] = None
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Get the process-wide speculation stats."""
+    global _speculation_stats
+    if _speculation_stats is None:
+        _speculation_stats = SpeculationStats()
+    return _speculation_stats
+
+
+class _Pending:
+    """A speculative call in flight (or finished but not taken)."""
+
+    __slots__ = ("key", "task", "on_take", "started_at", "finished_at")
+
+    def __init__(
+        self,
+        key: Hashable,
+        task: asyncio.Task,
+        on_take: Optional[Callable[[Any], Awaitable[None]]] = None
+    ):
+        self.key = key
+        self.task = task
+        self.on_take = on_take
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self.finished_at = time.perf_counter()
+        # Failures surface (and are handled) when the result is taken
+        if not task.cancelled():
+            task.exception()
+
+    def elapsed(self) -> float:
+        """Time the call has run (until it finished, if it has)."""
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+
+class Speculation:
+    """
+    Speculative calls started for one request.
+
+    Used from the event loop of that request only.
+    """
+
+    def __init__(self, stats: Optional[SpeculationStats] = None):
+        """
+        Initialize speculation.
+
+        Args:
+            stats: Outcome counters (default: process-wide stats)
+        """
+        self.stats = stats or get_speculation_stats()
+        self._pending: Dict[str, _Pending] = {}
+
+    def start(
+        self,
+        kind: str,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        on_take: Optional[Callable[[Any], Awaitable[None]]] = None
+    ) -> bool:
+        """
+        Start a speculative call (at most one per kind).
+
+        Args:
+            kind: Kind of work (e.g. "document_qa", "web_search")
+            key: Inputs the result depends on
+            factory: Creates the coroutine doing the work (without side effects)
+            on_take: Applies the side effects of the work to a taken result
+                (not run for discarded speculations)
+
+        Returns:
+            True if started
+        """
+        if kind in self._pending:
+            return False
+        try:
+            task = asyncio.ensure_future(factory())
+        except Exception as e:
+            logger.warning(f"⚠️ Speculative {kind} not started: {e}")
+            return False
+        self._pending[kind] = _Pending(key, task, on_take)
+        self.stats.record("started", kind)
+        return True
+
+    def _drop(self, kind: str, reason: str):
+        pending = self._pending.pop(kind)
+        pending.task.cancel()
+        self.stats.record("wasted", kind, pending.elapsed())
+        logger.info(f"🗑️ Speculative {kind} discarded ({reason})")
+
+    async def take_or_run(self, kind: str, key: Hashable, run: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Use the speculative result for ``key`` if there is one, else run.
+
+        A speculation of the same kind with another key is discarded; a
+        failed speculation falls back to running the call.
+
+        Args:
+            kind: Kind of work
+            key: Inputs the caller needs the result for
+            run: Creates the coroutine doing the work (non-speculatively)
+
+        Returns:
+            Result
+        """
+        pending = self._pending.get(kind)
+        if pending is not None and pending.key != key:
+            self._drop(kind, "different inputs")
+            pending = None
+
+        if pending is not None:
+            del self._pending[kind]
+            head_start = pending.elapsed()
+            try:
+                result = await pending.task
+            except Exception as e:
+                self.stats.record("wasted", kind, head_start)
+                logger.warning(f"⚠️ Speculative {kind} failed, running it again: {e}")
+            else:
+                self.stats.record("hits", kind, head_start)
+                logger.info(f"⚡ Speculative {kind} reused ({head_start * 1000:.0f}ms head start)")
+                if pending.on_take is not None:
+                    try:
+                        await pending.on_take(result)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Side effects of speculative {kind} not applied: {e}")
+                return result
+
+        return await run()
+
+    def cancel(self, reason: str = "not needed"):
+        """Discard all pending speculative calls."""
+        for kind in list(self._pending):
+            self._drop(kind, reason)
+
+    def finish(self):
+        """End of request: discard speculative calls nobody took."""
+        self.cancel("not used")
+
+
+async def take_or_run(
+    speculation: Optional[Speculation],
+    kind: str,
+    key: Hashable,
+    run: Callable[[], Awaitable[Any]]
+) -> Any:
+    """``Speculation.take_or_run`` that also accepts no speculation."""
+    if speculation is None:
+        return await run()
+    return await speculation.take_or_run(kind, key, run)
+
+
+__all__ = [
+    'Speculation',
+    'SpeculationStats',
+    'get_speculation_stats',
+    'take_or_run',
+]
@@ -13,6 +13,7 @@ Key components:
 
 import asyncio
 import inspect
+import time
 from typing import Dict, Any, List, Optional, AsyncGenerator, Callable, Union, TypeVar, Generic
 from datetime import datetime
 from enum import Enum
@@ -20,6 +21,8 @@ from enum import Enum
 from langchain.callbacks.base import BaseCallbackHandler
 from langgraph.graph import StateGraph, END
 
+from utils.monitoring.stage_timing import record_stage, STAGE_LLM_FIRST_TOKEN, STAGE_LLM_TOTAL
+
 # Type variables for generic typing
 T = TypeVar('T')
 StateType = Dict[str, Any]
@@ -63,6 +66,31 @@ class StreamingState(Generic[T]):
         self.is_streaming = True
         self.history: List[Dict[str, Any]] = []
         self._start_time = datetime.now()
+        self._label: Optional[str] = None
+        self._stream_content = True
+    
+    def fork(self, label: Optional[str] = None, stream_content: bool = True) -> "StreamingState[T]":
+        """
+        Child state for work running concurrently with sibling work.
+        
+        The child updates a copy of the state and writes to the same stream,
+        so indicators of concurrent steps interleave in one response.
+        
+        Args:
+            label: Prefix of the child's indicator messages (e.g. "Step 2")
+            stream_content: Whether the child streams response tokens
+                (off when siblings would interleave their tokens)
+            
+        Returns:
+            Child streaming state
+        """
+        child = StreamingState(dict(self.state) if isinstance(self.state, dict) else self.state)
+        child.stream_queue = self.stream_queue
+        child.is_streaming = self.is_streaming
+        child._start_time = self._start_time
+        child._label = label
+        child._stream_content = stream_content
+        return child
     
     async def update(self, key: str, value: Any, stream: bool = True) -> None:
         """
@@ -90,6 +118,8 @@ class StreamingState(Generic[T]):
         # Stream if appropriate
         if stream and self.is_streaming:
             if key == "current_reasoning" or key == "partial_response":
+                if not self._stream_content:
+                    return
                 await self.stream_queue.put({"type": "content", "content": value})
             elif key == "ui_indicator":
                 await self.stream_queue.put({"type": "indicator", "indicator": value})
@@ -104,6 +134,8 @@ class StreamingState(Generic[T]):
             indicator_type: Type of indicator
             message: Optional message
         """
+        if self._label and message:
+            message = f"[{self._label}] {message}"
         await self.update("ui_indicator", {
             "type": indicator_type.value,
             "message": message,
@@ -190,6 +222,13 @@ class StreamingCallbackHandler(BaseCallbackHandler):
         self.start_time = datetime.now()
         self.token_count = 0
         self.is_streaming = True
+        self._llm_started = time.perf_counter()
+        self._first_token_seen = False
+    
+    async def on_llm_start(self, serialized, prompts, **kwargs) -> None:
+        """Mark the start of an LLM call (for first-token timing)."""
+        self._llm_started = time.perf_counter()
+        self._first_token_seen = False
     
     async def on_llm_new_token(self, token: str, **kwargs) -> None:
         """
@@ -202,6 +241,10 @@ class StreamingCallbackHandler(BaseCallbackHandler):
         if not self.is_streaming:
             return
             
+        if not self._first_token_seen:
+            self._first_token_seen = True
+            record_stage(STAGE_LLM_FIRST_TOKEN, time.perf_counter() - self._llm_started, self._llm_started)
+        
         self.tokens.append(token)
         self.token_count += 1
         
@@ -214,6 +257,8 @@ class StreamingCallbackHandler(BaseCallbackHandler):
     
     async def on_llm_end(self, response, **kwargs) -> None:
         """Handle LLM completion."""
+        record_stage(STAGE_LLM_TOTAL, time.perf_counter() - self._llm_started, self._llm_started)
+        
         # Calculate stats
         elapsed = (datetime.now() - self.start_time).total_seconds()
         tokens_per_second = self.token_count / elapsed if elapsed > 0 else 0
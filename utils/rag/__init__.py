@@ -3,7 +3,11 @@ RAG Utilities Package
 
 RAG-specific utilities for context management and query enrichment:
 - context: Conversation context management (token-aware)
+- context_budget: Tokenizer-based counting and prompt context packing
 - query_enrichment: Query expansion for vague/follow-up questions
+- document_structure: Chapter/section/page detection for structured retrieval
+- retrieval: Typed retrieval results (chunk records rendered at the prompt edge)
+- retrieval_prefetch: Speculative retrieval for predicted follow-up queries
 """
 
 from .context import (
@@ -14,13 +18,51 @@ from .context import (
     get_context_summary,
 )
 
+from .context_budget import (
+    count_tokens,
+    truncate_text_to_tokens,
+    ContextItem,
+    ContextPacker,
+    PackedContext,
+    pack_retrieved_text,
+)
+
 from .query_enrichment import (
     detect_realtime_query,
+    detect_time_sensitivity,
+    classify_query_freshness,
+    search_cache_ttl,
+    normalize_search_query,
+    classify_query_intent,
     needs_query_enrichment,
     enrich_query_with_context,
     format_realtime_warning,
 )
 
+from .document_structure import (
+    ChunkStructure,
+    DocumentStructureTracker,
+    annotate_chunk_structure,
+    StructureReference,
+    parse_structure_reference,
+    unit_request_topic,
+    select_reading_order,
+)
+
+from .retrieval import (
+    RetrievedChunk,
+    RetrievalResult,
+    classify_retrieval_text,
+    pack_retrieval_result,
+    run_document_retrieval,
+)
+
+from .retrieval_prefetch import (
+    RetrievalPrefetcher,
+    reference_scope,
+    retrieval_scope,
+)
+
 __all__ = [
     # Context management
     'get_smart_context',
@@ -29,11 +71,45 @@ __all__ = [
     'format_conversation_history',
     'get_context_summary',
     
+    # Context budgeting
+    'count_tokens',
+    'truncate_text_to_tokens',
+    'ContextItem',
+    'ContextPacker',
+    'PackedContext',
+    'pack_retrieved_text',
+    
     # Query enrichment
     'detect_realtime_query',
+    'detect_time_sensitivity',
+    'classify_query_freshness',
+    'search_cache_ttl',
+    'normalize_search_query',
+    'classify_query_intent',
     'needs_query_enrichment',
     'enrich_query_with_context',
     'format_realtime_warning',
+    
+    # Document structure
+    'ChunkStructure',
+    'DocumentStructureTracker',
+    'annotate_chunk_structure',
+    'StructureReference',
+    'parse_structure_reference',
+    'unit_request_topic',
+    'select_reading_order',
+    
+    # Typed retrieval results
+    'RetrievedChunk',
+    'RetrievalResult',
+    'classify_retrieval_text',
+    'pack_retrieval_result',
+    'run_document_retrieval',
+    
+    # Retrieval prefetching
+    'RetrievalPrefetcher',
+    'reference_scope',
+    'retrieval_scope',
 ]
 
 
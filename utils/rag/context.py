@@ -12,6 +12,8 @@ Optimizes LLM calls by reducing context overhead while maintaining quality.
 from typing import List, Any
 from langchain_core.messages import HumanMessage
 
+from .context_budget import count_tokens, truncate_text_to_tokens
+
 
 def get_smart_context(messages: List[Any], max_tokens: int = 500) -> List[Any]:
     """
@@ -36,8 +38,7 @@ def get_smart_context(messages: List[Any], max_tokens: int = 500) -> List[Any]:
     # Prioritize recent questions (skip AI responses for efficiency)
     for msg in reversed(messages):
         if isinstance(msg, HumanMessage):
-            # Rough token estimate (4 chars ≈ 1 token)
-            msg_tokens = len(msg.content) // 4
+            msg_tokens = count_tokens(msg.content)
             
             if token_count + msg_tokens <= max_tokens and len(context) < 2:
                 context.insert(0, msg)
@@ -52,15 +53,16 @@ def estimate_tokens(text: str) -> int:
     """
     Estimate token count for text.
     
-    Uses simple heuristic: 4 characters ≈ 1 token
+    Uses the cached tokenizer (falls back to 4 characters ≈ 1 token
+    when no tokenizer is available).
     
     Args:
         text: Text to estimate
         
     Returns:
-        Estimated token count
+        Token count
     """
-    return len(text) // 4
+    return count_tokens(text)
 
 
 def truncate_to_tokens(text: str, max_tokens: int) -> str:
@@ -74,19 +76,7 @@ def truncate_to_tokens(text: str, max_tokens: int) -> str:
     Returns:
         Truncated text
     """
-    estimated_tokens = estimate_tokens(text)
-    
-    if estimated_tokens <= max_tokens:
-        return text
-    
-    # Calculate characters to keep (4 chars per token)
-    max_chars = max_tokens * 4
-    
-    # Truncate with ellipsis
-    if len(text) > max_chars:
-        return text[:max_chars - 3] + "..."
-    
-    return text
+    return truncate_text_to_tokens(text, max_tokens)
 
 
 def format_conversation_history(messages: List[Any], max_messages: int = 10) -> str:
@@ -0,0 +1,500 @@
+"""
+Token-accurate context budgeting for LLM prompts.
+
+Replaces the ``len(text) // 4`` heuristic with a real tokenizer and packs
+prompt material into a fixed token budget:
+- Conversation history, retrieved chunks and few-shot examples
+- Priority- and relevance-ordered selection
+- Near-duplicate chunk elimination (shingle Jaccard)
+- Savings report (tokens offered vs. tokens sent)
+
+The tokenizer is loaded once and cached. When ``tiktoken`` is not installed
+the module degrades to the character heuristic so callers never break.
+"""
+
+import re
+import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.core.constants import (
+    CHARS_PER_TOKEN,
+    CONTEXT_PACK_TOKEN_BUDGET,
+    CONTEXT_PACK_DUPLICATE_THRESHOLD,
+    TOKENIZER_ENCODING,
+)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+
+# Item kinds, in default priority order (lower value = packed first)
+KIND_INSTRUCTION = "instruction"
+KIND_HISTORY = "history"
+KIND_CHUNK = "chunk"
+KIND_EXAMPLE = "example"
+
+DEFAULT_KIND_PRIORITY = {
+    KIND_INSTRUCTION: 0,
+    KIND_HISTORY: 1,
+    KIND_CHUNK: 2,
+    KIND_EXAMPLE: 3,
+}
+
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+@lru_cache(maxsize=4)
+def get_tokenizer(encoding_name: str = TOKENIZER_ENCODING):
+    """
+    Get a cached tokenizer instance.
+
+    Loading a BPE encoding costs tens of milliseconds, so it is done once
+    per process and per encoding.
+
+    Args:
+        encoding_name: tiktoken encoding name
+
+    Returns:
+        Tokenizer instance, or None if tiktoken is unavailable
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        # Unknown encoding or offline without cached BPE files
+        return None
+
+
+def count_tokens(text: str, encoding_name: str = TOKENIZER_ENCODING) -> int:
+    """
+    Count tokens in text using the cached tokenizer.
+
+    Args:
+        text: Text to count
+        encoding_name: tiktoken encoding name
+
+    Returns:
+        Token count (heuristic estimate if no tokenizer is available)
+    """
+    if not text:
+        return 0
+
+    tokenizer = get_tokenizer(encoding_name)
+    if tokenizer is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+def truncate_text_to_tokens(
+    text: str,
+    max_tokens: int,
+    encoding_name: str = TOKENIZER_ENCODING
+) -> str:
+    """
+    Truncate text to at most ``max_tokens`` tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum tokens allowed
+        encoding_name: tiktoken encoding name
+
+    Returns:
+        Truncated text (with ellipsis if shortened)
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+
+    tokenizer = get_tokenizer(encoding_name)
+    if tokenizer is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        return text[:max(0, max_chars - 3)] + "..."
+
+    tokens = tokenizer.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+
+    # Reserve one token for the ellipsis
+    return tokenizer.decode(tokens[:max(0, max_tokens - 1)]).rstrip() + "..."
+
+
+# =============================================================================
+# NEAR-DUPLICATE DETECTION
+# =============================================================================
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int = 3) -> frozenset:
+    """Build a set of hashed word n-gram shingles for similarity checks."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return frozenset(words)
+    return frozenset(
+        hash(" ".join(words[i:i + size])) for i in range(len(words) - size + 1)
+    )
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    smaller, larger = (a, b) if len(a) <= len(b) else (b, a)
+    intersection = sum(1 for s in smaller if s in larger)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+# =============================================================================
+# CONTEXT PACKING
+# =============================================================================
+
+@dataclass
+class ContextItem:
+    """A single piece of prompt material competing for the token budget."""
+    content: str
+    kind: str = KIND_CHUNK
+    priority: Optional[int] = None  # Defaults to DEFAULT_KIND_PRIORITY[kind]
+    relevance: float = 0.0  # Higher = more relevant within the same priority
+    source: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    tokens: int = 0
+    order: int = 0  # Insertion order, used to restore reading order
+
+
+@dataclass
+class PackedContext:
+    """Result of packing items into a token budget."""
+    items: List[ContextItem]
+    budget: int
+    tokens_used: int
+    tokens_offered: int
+    duplicates_removed: int = 0
+    items_dropped: int = 0
+    items_truncated: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens that would have been sent without packing."""
+        return max(0, self.tokens_offered - self.tokens_used)
+
+    def by_kind(self, kind: str) -> List[ContextItem]:
+        """Packed items of one kind, in original insertion order."""
+        return [item for item in self.items if item.kind == kind]
+
+    def render(
+        self,
+        kind: Optional[str] = None,
+        separator: str = "\n\n",
+        with_sources: bool = False
+    ) -> str:
+        """
+        Render packed items as prompt text.
+
+        Args:
+            kind: Only render items of this kind (all kinds if None)
+            separator: Separator between items
+            with_sources: Emit a "From: <source>" line whenever the source changes
+
+        Returns:
+            Concatenated item contents in insertion order
+        """
+        items = self.items if kind is None else self.by_kind(kind)
+        if not with_sources:
+            return separator.join(item.content for item in items)
+
+        parts = []
+        current_source = None
+        for item in items:
+            if item.source and item.source != current_source:
+                parts.append(f"From: {item.source}\n{item.content}")
+                current_source = item.source
+            else:
+                parts.append(item.content)
+        return separator.join(parts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Packing statistics for logging and metrics."""
+        return {
+            "budget": self.budget,
+            "tokens_used": self.tokens_used,
+            "tokens_offered": self.tokens_offered,
+            "tokens_saved": self.tokens_saved,
+            "items_packed": len(self.items),
+            "items_dropped": self.items_dropped,
+            "items_truncated": self.items_truncated,
+            "duplicates_removed": self.duplicates_removed,
+        }
+
+
+class ContextPacker:
+    """
+    Pack conversation history, retrieved chunks and few-shot examples
+    into a fixed token budget.
+
+    Items are selected by (priority, relevance) and emitted in their
+    original order so retrieved passages keep reading order. Near-identical
+    chunks are collapsed before selection, keeping the most relevant copy.
+
+    Example:
+        packer = ContextPacker(budget=3000)
+        packer.add_history(messages)
+        packer.add_chunks(chunks, scores)
+        packed = packer.pack()
+        prompt_context = packed.render(KIND_CHUNK)
+    """
+
+    def __init__(
+        self,
+        budget: int = CONTEXT_PACK_TOKEN_BUDGET,
+        reserved_tokens: int = 0,
+        duplicate_threshold: float = CONTEXT_PACK_DUPLICATE_THRESHOLD,
+        max_item_tokens: Optional[int] = None,
+        encoding_name: str = TOKENIZER_ENCODING
+    ):
+        """
+        Initialize context packer.
+
+        Args:
+            budget: Total token budget for packed material
+            reserved_tokens: Tokens held back (e.g. prompt template, question)
+            duplicate_threshold: Shingle Jaccard similarity above which
+                two items are considered duplicates
+            max_item_tokens: Truncate any single item to this many tokens
+            encoding_name: tiktoken encoding name
+        """
+        self.budget = max(0, budget - reserved_tokens)
+        self.duplicate_threshold = duplicate_threshold
+        self.max_item_tokens = max_item_tokens
+        self.encoding_name = encoding_name
+        self._items: List[ContextItem] = []
+
+    def add(
+        self,
+        content: str,
+        kind: str = KIND_CHUNK,
+        priority: Optional[int] = None,
+        relevance: float = 0.0,
+        source: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Add a single item."""
+        if not content or not content.strip():
+            return
+
+        self._items.append(ContextItem(
+            content=content,
+            kind=kind,
+            priority=DEFAULT_KIND_PRIORITY.get(kind, 99) if priority is None else priority,
+            relevance=relevance,
+            source=source,
+            metadata=metadata or {},
+            order=len(self._items),
+        ))
+
+    def add_chunks(
+        self,
+        chunks: Sequence[str],
+        scores: Optional[Sequence[float]] = None,
+        sources: Optional[Sequence[Optional[str]]] = None
+    ) -> None:
+        """
+        Add retrieved chunks.
+
+        Args:
+            chunks: Chunk texts, in retrieval order
+            scores: Relevance scores (defaults to retrieval rank)
+            sources: Optional source label per chunk
+        """
+        total = len(chunks)
+        for i, chunk in enumerate(chunks):
+            relevance = scores[i] if scores is not None else float(total - i)
+            source = sources[i] if sources is not None else None
+            self.add(chunk, kind=KIND_CHUNK, relevance=relevance, source=source)
+
+    def add_history(self, messages: Iterable[Any], max_messages: int = 6) -> None:
+        """
+        Add conversation history; more recent messages rank higher.
+
+        Args:
+            messages: LangChain messages or plain strings
+            max_messages: Only consider the most recent N messages
+        """
+        recent = list(messages)[-max_messages:]
+        for i, msg in enumerate(recent):
+            content = getattr(msg, "content", msg)
+            if not isinstance(content, str):
+                continue
+            role = getattr(msg, "type", None)
+            # User turns carry intent; favour them over long AI answers
+            relevance = float(i) + (0.5 if role == "human" else 0.0)
+            self.add(content, kind=KIND_HISTORY, relevance=relevance, source=role)
+
+    def add_examples(self, examples: Sequence[str]) -> None:
+        """Add few-shot examples; earlier examples rank higher."""
+        total = len(examples)
+        for i, example in enumerate(examples):
+            self.add(example, kind=KIND_EXAMPLE, relevance=float(total - i))
+
+    def _measure(self, item: ContextItem) -> None:
+        """Count an item's tokens with the cached tokenizer."""
+        item.tokens = count_tokens(item.content, self.encoding_name)
+
+    def _deduplicate(self, items: List[ContextItem]) -> Tuple[List[ContextItem], int]:
+        """Collapse exact and near-identical items, keeping the most relevant copy."""
+        ranked = sorted(items, key=lambda it: (it.priority, -it.relevance, it.order))
+
+        kept: List[ContextItem] = []
+        kept_shingles: List[frozenset] = []
+        seen_digests = set()
+        removed = 0
+
+        for item in ranked:
+            normalized = " ".join(item.content.lower().split())
+            digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+            if digest in seen_digests:
+                removed += 1
+                continue
+
+            shingles = _shingles(normalized)
+            if any(_jaccard(shingles, other) >= self.duplicate_threshold for other in kept_shingles):
+                removed += 1
+                continue
+
+            seen_digests.add(digest)
+            kept.append(item)
+            kept_shingles.append(shingles)
+
+        return kept, removed
+
+    def pack(self) -> PackedContext:
+        """
+        Select items into the budget.
+
+        Returns:
+            PackedContext with selected items in insertion order and savings stats
+        """
+        for item in self._items:
+            self._measure(item)
+        tokens_offered = sum(item.tokens for item in self._items)
+
+        candidates, duplicates_removed = self._deduplicate(self._items)
+
+        selected: List[ContextItem] = []
+        used = 0
+        dropped = 0
+        truncated = 0
+
+        for item in candidates:  # Already in (priority, relevance) order
+            if self.max_item_tokens and item.tokens > self.max_item_tokens:
+                item.content = truncate_text_to_tokens(item.content, self.max_item_tokens, self.encoding_name)
+                self._measure(item)
+                truncated += 1
+
+            remaining = self.budget - used
+            if item.tokens <= remaining:
+                selected.append(item)
+                used += item.tokens
+                continue
+
+            # Top-priority material is truncated rather than dropped
+            if item.priority == 0 and remaining > 0:
+                item.content = truncate_text_to_tokens(item.content, remaining, self.encoding_name)
+                self._measure(item)
+                selected.append(item)
+                used += item.tokens
+                truncated += 1
+                continue
+
+            dropped += 1
+
+        selected.sort(key=lambda it: it.order)
+
+        return PackedContext(
+            items=selected,
+            budget=self.budget,
+            tokens_used=used,
+            tokens_offered=tokens_offered,
+            duplicates_removed=duplicates_removed,
+            items_dropped=dropped,
+            items_truncated=truncated,
+        )
+
+
+_SOURCE_LINE_RE = re.compile(r"^\s*From:\s*(.+?)\s*$")
+_SEPARATOR_LINE_RE = re.compile(r"^[\s─\-=#*]*$")
+
+
+def split_retrieved_text(raw_results: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a formatted retrieval/search result string into passages.
+
+    Tool outputs separate passages with blank lines. ``From: <document>``
+    lines become the source label of the passages that follow, while
+    separator lines and short headers ("...:") are dropped.
+
+    Args:
+        raw_results: Formatted tool output
+
+    Returns:
+        List of (source, passage) tuples in original order
+    """
+    if not raw_results:
+        return []
+
+    passages: List[Tuple[Optional[str], str]] = []
+    source: Optional[str] = None
+
+    for block in re.split(r"\n\s*\n", raw_results):
+        body_lines = []
+        for line in block.splitlines():
+            source_match = _SOURCE_LINE_RE.match(line)
+            if source_match:
+                source = source_match.group(1)
+                continue
+            if _SEPARATOR_LINE_RE.match(line):
+                continue
+            body_lines.append(line)
+
+        body = "\n".join(body_lines).strip()
+        if not body or (len(body) < 80 and "\n" not in body and body.endswith(":")):
+            continue
+        passages.append((source, body))
+
+    return passages
+
+
+def pack_retrieved_text(
+    raw_results: str,
+    budget: int = CONTEXT_PACK_TOKEN_BUDGET,
+    reserved_tokens: int = 0
+) -> PackedContext:
+    """
+    Pack a formatted retrieval result string into a token budget.
+
+    Args:
+        raw_results: Formatted tool output (retrieval or web search)
+        budget: Token budget
+        reserved_tokens: Tokens held back for the rest of the prompt
+
+    Returns:
+        PackedContext of retrieved passages
+    """
+    passages = split_retrieved_text(raw_results)
+    packer = ContextPacker(budget=budget, reserved_tokens=reserved_tokens)
+    packer.add_chunks(
+        [passage for _, passage in passages],
+        sources=[source for source, _ in passages]
+    )
+    return packer.pack()
@@ -0,0 +1,345 @@
+"""
+Document structure detection for chapter/section/page-scoped retrieval.
+
+Chunks are annotated at ingestion time with the chapter, section, heading
+and page range they belong to, so "summarize chapter 12" becomes an exact
+index range lookup on document_vectors (in reading order) instead of a
+``LIKE '%chapter 12%'`` scan plus regex re-ranking at query time:
+- Chapter headings ("Chapter 12: Title", "CHAPTER XII", "# Chapter 12")
+- Section headings ("Section 3.2", "3.2 Gradient Descent", "## 3.2 ...")
+- Other markdown headings (Docling output)
+- Page markers ("[Page 7]", PyMuPDF extraction) or Docling page provenance
+
+A chunk that spans a boundary is assigned to the chapter/section covering
+most of its text, and its page range covers every page it touches.
+"""
+
+import re
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+# Headings are short lines; longer lines are body text that mentions a chapter
+MAX_HEADING_LENGTH = 120
+MAX_NUMBERED_HEADING_LENGTH = 80
+
+_ROMAN_VALUES = {'i': 1, 'v': 5, 'x': 10, 'l': 50, 'c': 100}
+
+_WORD_NUMBERS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
+    'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18,
+    'nineteen': 19, 'twenty': 20,
+}
+
+_ROMAN_RE = re.compile(r'^c{0,3}(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$')
+
+_WORDS = '|'.join(_WORD_NUMBERS)
+
+_MARKDOWN_HEADING_RE = re.compile(r'^#{1,6}\s+(.*)$')
+_CHAPTER_HEADING_RE = re.compile(
+    rf'^(?:chapter|ch\.)\s+(\d+|[ivxlc]+|{_WORDS})\b[\s:.\-–—]*(.*)$', re.IGNORECASE
+)
+_SECTION_HEADING_RE = re.compile(
+    r'^(?:section|sec\.|§)\s*(\d+(?:\.\d+)*)\b[\s:.\-–—]*(.*)$', re.IGNORECASE
+)
+# "3.2 Gradient Descent" - numbered heading followed by a capitalized title
+_NUMBERED_HEADING_RE = re.compile(r'^(\d+(?:\.\d+)+)\.?\s+([A-Z][^.!?]*)$')
+_PAGE_MARKER_RE = re.compile(r'\[Page\s+(\d+)\]', re.IGNORECASE)
+_EMPHASIS_RE = re.compile(r'^[*_]+|[*_]+$')
+
+# Query-side references ("chapter 12", "ch. 3", "section 4.1", "page 7")
+_CHAPTER_REF_RE = re.compile(
+    rf'\b(?:(?:chapter|ch\.?)\s*(\d+)|chapter\s+([ivxlc]+|{_WORDS}))\b', re.IGNORECASE
+)
+_SECTION_REF_RE = re.compile(r'\b(?:section|sec\.?|§)\s*(\d+(?:\.\d+)*)\b', re.IGNORECASE)
+_PAGE_REF_RE = re.compile(r'\b(?:page|p\.)\s*(\d+)\b', re.IGNORECASE)
+
+# Words that only describe *what to do* with a unit, not a topic within it
+_UNIT_REQUEST_WORDS = frozenset("""
+    a about all an and are as break can cards contain contains content contents
+    cover covered covers create describe detail details discuss discussed
+    discusses do does down entire everything explain flash flashcard flashcards
+    for from full generate give go guide in into is it key list main make me
+    now notes of on outline over overview please points practice questions quiz
+    review say says short some structured study summarise summarize summary tell
+    test the then this through to topics what whole with write
+""".split())
+
+
+def _parse_number(token: str) -> Optional[int]:
+    """Parse an arabic, roman or spelled-out chapter number."""
+    token = token.lower()
+    if token.isdigit():
+        return int(token)
+    if token in _WORD_NUMBERS:
+        return _WORD_NUMBERS[token]
+    if token and _ROMAN_RE.match(token):
+        total = 0
+        for current, following in zip(token, token[1:] + ' '):
+            value = _ROMAN_VALUES[current]
+            total += -value if _ROMAN_VALUES.get(following, 0) > value else value
+        return total or None
+    return None
+
+
+def _clean_title(title: str) -> Optional[str]:
+    title = _EMPHASIS_RE.sub('', title.strip()).strip(' :.-–—')
+    return title[:500] or None
+
+
+@dataclass
+class ChunkStructure:
+    """Structural position of a chunk within its document."""
+    chapter_number: Optional[int] = None
+    chapter_title: Optional[str] = None
+    section_number: Optional[str] = None
+    section_title: Optional[str] = None
+    heading: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class DocumentStructureTracker:
+    """
+    Walks a document's chunks in order, carrying the current chapter,
+    section, heading and page across chunk boundaries.
+    """
+
+    def __init__(self):
+        self.chapter_number: Optional[int] = None
+        self.chapter_title: Optional[str] = None
+        self.section_number: Optional[str] = None
+        self.section_title: Optional[str] = None
+        self.heading: Optional[str] = None
+        self.page: Optional[int] = None
+
+    def _observe_heading(self, line: str) -> bool:
+        """Update state from a heading line. Returns True if it was one."""
+        markdown = _MARKDOWN_HEADING_RE.match(line)
+        text = _clean_title(markdown.group(1)) if markdown else _clean_title(line)
+        if not text or len(text) > MAX_HEADING_LENGTH:
+            return False
+
+        match = _CHAPTER_HEADING_RE.match(text)
+        # "Chapter 12 discusses..." is body text, not a heading
+        if match and _parse_number(match.group(1)) is not None and not match.group(2)[:1].islower():
+            self.chapter_number = _parse_number(match.group(1))
+            self.chapter_title = _clean_title(match.group(2))
+            self.section_number = None
+            self.section_title = None
+            self.heading = text
+            return True
+
+        match = _SECTION_HEADING_RE.match(text)
+        if match and match.group(2)[:1].islower():
+            match = None
+        if match is None and len(text) <= MAX_NUMBERED_HEADING_LENGTH:
+            match = _NUMBERED_HEADING_RE.match(text)
+        if match:
+            self.section_number = match.group(1)
+            self.section_title = _clean_title(match.group(2))
+            self.heading = text
+            return True
+
+        if markdown:
+            self.heading = text
+            return True
+
+        return False
+
+    def annotate(
+        self,
+        text: str,
+        headings: Optional[Sequence[str]] = None,
+        pages: Optional[Iterable[int]] = None
+    ) -> ChunkStructure:
+        """
+        Annotate the next chunk of the document.
+
+        Args:
+            text: Chunk text
+            headings: Heading path known from the parser (e.g. Docling chunk.meta.headings)
+            pages: Page numbers known from the parser (e.g. Docling provenance)
+
+        Returns:
+            ChunkStructure for the chunk
+        """
+        for heading in headings or ():
+            self._observe_heading(heading)
+
+        page_numbers = sorted(set(pages or ()))
+        page_start = page_numbers[0] if page_numbers else None
+        page_end = page_numbers[-1] if page_numbers else None
+
+        # Characters of this chunk attributed to each chapter / section
+        chapter_weight: Dict[Any, int] = {}
+        section_weight: Dict[Any, int] = {}
+
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+
+            for page_match in _PAGE_MARKER_RE.finditer(stripped):
+                self.page = int(page_match.group(1))
+            body = _PAGE_MARKER_RE.sub('', stripped).strip()
+            if not body:
+                continue
+
+            # Pages count once the chunk has text on them
+            if not page_numbers and self.page is not None:
+                page_start = self.page if page_start is None else page_start
+                page_end = self.page if page_end is None else max(page_end, self.page)
+
+            self._observe_heading(body)
+
+            chapter_key = (self.chapter_number, self.chapter_title)
+            section_key = (self.chapter_number, self.section_number, self.section_title, self.heading)
+            chapter_weight[chapter_key] = chapter_weight.get(chapter_key, 0) + len(body)
+            section_weight[section_key] = section_weight.get(section_key, 0) + len(body)
+
+        if not chapter_weight:
+            return ChunkStructure(
+                self.chapter_number, self.chapter_title, self.section_number,
+                self.section_title, self.heading, page_start, page_end
+            )
+
+        # Ties go to the later unit (dicts keep insertion order)
+        chapter_number, chapter_title = max(reversed(list(chapter_weight)), key=chapter_weight.get)
+        section_candidates = [key for key in section_weight if key[0] == chapter_number]
+        _, section_number, section_title, heading = max(
+            reversed(section_candidates), key=section_weight.get
+        )
+
+        return ChunkStructure(
+            chapter_number, chapter_title, section_number, section_title,
+            heading, page_start, page_end
+        )
+
+
+def annotate_chunk_structure(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Annotate a document's chunks (in reading order) with their structure.
+
+    Sets ``chunk['structure']`` and mirrors it into ``chunk['metadata']['structure']``.
+    Parser hints are read from ``chunk['headings']`` and ``chunk['pages']`` when present.
+
+    Args:
+        chunks: Chunk dicts with 'content' (as produced by DocumentProcessor.chunk_text)
+
+    Returns:
+        The same chunk list
+    """
+    tracker = DocumentStructureTracker()
+    for chunk in chunks:
+        structure = tracker.annotate(
+            chunk.get('content', ''),
+            headings=chunk.get('headings'),
+            pages=chunk.get('pages'),
+        ).to_dict()
+        chunk['structure'] = structure
+        chunk.setdefault('metadata', {})['structure'] = structure
+    return chunks
+
+
+@dataclass
+class StructureReference:
+    """A chapter/section/page reference parsed from a query."""
+    chapter: Optional[int] = None
+    section: Optional[str] = None
+    page: Optional[int] = None
+    # Query text left after removing the reference and request words
+    topic: str = ""
+
+    @property
+    def is_whole_unit(self) -> bool:
+        """True when the query asks about the unit as a whole ("summarize chapter 12")."""
+        return not self.topic
+
+
+def parse_structure_reference(query: str) -> Optional[StructureReference]:
+    """
+    Parse a chapter/section/page reference from a query.
+
+    Args:
+        query: User query
+
+    Returns:
+        StructureReference, or None if the query has no structural reference
+    """
+    chapter_match = _CHAPTER_REF_RE.search(query)
+    section_match = _SECTION_REF_RE.search(query)
+    page_match = _PAGE_REF_RE.search(query)
+
+    chapter = _parse_number(chapter_match.group(1) or chapter_match.group(2)) if chapter_match else None
+    if chapter is None and not section_match and not page_match:
+        return None
+
+    remainder = query
+    for pattern in (_CHAPTER_REF_RE, _SECTION_REF_RE, _PAGE_REF_RE):
+        remainder = pattern.sub(' ', remainder)
+
+    return StructureReference(
+        chapter=chapter,
+        section=section_match.group(1) if section_match else None,
+        page=int(page_match.group(1)) if page_match else None,
+        topic=unit_request_topic(remainder),
+    )
+
+
+def unit_request_topic(text: str) -> str:
+    """
+    Topic words of a request, ignoring words that only say what to do.
+
+    "make flashcards" has no topic; "make flashcards on entropy" has "entropy".
+
+    Args:
+        text: Query text (without any chapter/section/page reference)
+
+    Returns:
+        Remaining topic words ("" for a bare request)
+    """
+    return " ".join(
+        word for word in re.findall(r"[a-z0-9']+", text.lower())
+        if word not in _UNIT_REQUEST_WORDS
+    )
+
+
+def select_reading_order(rows: Sequence[Any], limit: int) -> List[Any]:
+    """
+    Pick at most ``limit`` rows spread evenly across a unit, keeping reading order.
+
+    The first row (usually the chapter heading) is always kept.
+
+    Args:
+        rows: Rows already ordered by chunk position
+        limit: Maximum rows
+
+    Returns:
+        Selected rows in reading order
+    """
+    rows = list(rows)
+    if limit <= 0:
+        return []
+    if len(rows) <= limit:
+        return rows
+    if limit == 1:
+        return rows[:1]
+
+    step = (len(rows) - 1) / (limit - 1)
+    return [rows[round(i * step)] for i in range(limit)]
+
+
+__all__ = [
+    'ChunkStructure',
+    'DocumentStructureTracker',
+    'annotate_chunk_structure',
+    'StructureReference',
+    'parse_structure_reference',
+    'unit_request_topic',
+    'select_reading_order',
+]
@@ -15,9 +15,37 @@ from utils.core.constants import (
     GENERIC_SUBJECTS,
     MAX_SHORT_QUESTION_WORDS,
     REALTIME_QUERY_PATTERNS,
+    TIME_SENSITIVE_PHRASES,
+    RECENT_QUERY_PATTERNS,
+    EVERGREEN_QUERY_PATTERNS,
+    SEARCH_CACHE_TTL_REALTIME,
+    SEARCH_CACHE_TTL_RECENT,
+    SEARCH_CACHE_TTL_DEFAULT,
+    SEARCH_CACHE_TTL_EVERGREEN,
+    QUERY_INTENT_PATTERNS,
     QUERY_ENRICHMENT_SYSTEM_PROMPT
 )
 
+# Default query intent (see classify_query_intent)
+QUERY_INTENT_QUESTION = "question"
+
+# Query freshness classes (see classify_query_freshness)
+FRESHNESS_REALTIME = "realtime"
+FRESHNESS_RECENT = "recent"
+FRESHNESS_DEFAULT = "default"
+FRESHNESS_EVERGREEN = "evergreen"
+
+_FRESHNESS_TTLS = {
+    FRESHNESS_REALTIME: SEARCH_CACHE_TTL_REALTIME,
+    FRESHNESS_RECENT: SEARCH_CACHE_TTL_RECENT,
+    FRESHNESS_DEFAULT: SEARCH_CACHE_TTL_DEFAULT,
+    FRESHNESS_EVERGREEN: SEARCH_CACHE_TTL_EVERGREEN,
+}
+
+_RECENT_RE = re.compile("|".join(RECENT_QUERY_PATTERNS))
+_EVERGREEN_RE = re.compile("|".join(EVERGREEN_QUERY_PATTERNS))
+_NORMALIZE_RE = re.compile(r"[^\w\s'+#.-]")
+
 
 def detect_realtime_query(question: str) -> bool:
     """
@@ -35,6 +63,89 @@ def detect_realtime_query(question: str) -> bool:
     return any(re.search(pattern, question_lower) for pattern in REALTIME_QUERY_PATTERNS)
 
 
+def detect_time_sensitivity(question: str) -> bool:
+    """
+    Detect if query asks for time-sensitive information (news, "latest", live data).
+    
+    Broader than detect_realtime_query: also covers recency phrasing.
+    
+    Args:
+        question: User's question
+        
+    Returns:
+        True if answers may change within hours
+    """
+    question_lower = question.lower()
+    return any(phrase in question_lower for phrase in TIME_SENSITIVE_PHRASES)
+
+
+def classify_query_freshness(question: str) -> str:
+    """
+    Classify how quickly search results for a query go stale.
+    
+    Args:
+        question: Search query
+        
+    Returns:
+        One of "realtime", "recent", "default", "evergreen"
+    """
+    if detect_realtime_query(question):
+        return FRESHNESS_REALTIME
+    
+    question_lower = question.lower().strip()
+    if detect_time_sensitivity(question) or _RECENT_RE.search(question_lower):
+        return FRESHNESS_RECENT
+    if _EVERGREEN_RE.search(question_lower):
+        return FRESHNESS_EVERGREEN
+    return FRESHNESS_DEFAULT
+
+
+def search_cache_ttl(question: str) -> int:
+    """
+    Cache TTL (seconds) for search results of a query, by freshness class.
+    
+    Args:
+        question: Search query
+        
+    Returns:
+        TTL in seconds
+    """
+    return _FRESHNESS_TTLS[classify_query_freshness(question)]
+
+
+def normalize_search_query(query: str) -> str:
+    """
+    Normalize a search query for cache keys.
+    
+    Lowercases, drops punctuation that does not change search results and
+    collapses whitespace, so "What is RAG?" and "what is  rag" share a key.
+    
+    Args:
+        query: Search query (after reformulation)
+        
+    Returns:
+        Normalized query
+    """
+    return " ".join(_NORMALIZE_RE.sub(" ", query.lower()).split()).strip(" .")
+
+
+def classify_query_intent(query: str) -> str:
+    """
+    Classify what a study query asks for.
+    
+    Args:
+        query: User query
+        
+    Returns:
+        "flashcards", "quiz", "notes", "summarize", "explain" or "question"
+    """
+    query_lower = query.lower()
+    for intent, patterns in QUERY_INTENT_PATTERNS:
+        if any(re.search(pattern, query_lower) for pattern in patterns):
+            return intent
+    return QUERY_INTENT_QUESTION
+
+
 def needs_query_enrichment(
     question: str,
     context_messages: List
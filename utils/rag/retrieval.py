@@ -0,0 +1,349 @@
+"""
+Typed document retrieval results.
+
+Retrieval returns chunk records (ids, scores, chapter/page metadata, token
+counts) instead of one pre-formatted string. Consumers work on the records
+directly - failure checks read ``status``, grading and citations read chunk
+fields, deduplication and budgeting go through the ContextPacker - and text
+is rendered only at the prompt-building edge (``to_prompt_text`` /
+``pack_retrieval_result``).
+"""
+
+import re
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from utils.rag.context_budget import (
+    ContextPacker,
+    PackedContext,
+    count_tokens,
+    split_retrieved_text,
+)
+from utils.core.constants import CONTEXT_PACK_TOKEN_BUDGET
+
+
+# Retrieval statuses
+STATUS_OK = "ok"
+STATUS_NO_DOCUMENTS = "no_documents"  # Nothing indexed yet
+STATUS_NO_RESULTS = "no_results"  # Documents exist but nothing matched
+STATUS_UNAVAILABLE = "unavailable"  # Vector store / database not configured
+STATUS_ERROR = "error"
+
+# Retrieval strategies
+STRATEGY_SEMANTIC = "semantic"
+STRATEGY_STRUCTURED = "structured"  # Exact chapter/section/page lookup
+STRATEGY_TEXT = "text"  # Parsed from a legacy formatted string
+
+_PAGE_MARKER_RE = re.compile(r'\[Page (\d+)\]')
+
+# Phrases the formatted Document_QA output uses for each failure status
+_TEXT_STATUS_PHRASES = [
+    (STATUS_NO_DOCUMENTS, ("no documents found", "please upload", "upload documents first")),
+    (STATUS_UNAVAILABLE, ("not available", "not configured")),
+    (STATUS_NO_RESULTS, ("no relevant documents found", "no relevant content", "not found")),
+    (STATUS_ERROR, ("❌", "error retrieving")),
+]
+
+
+@dataclass
+class RetrievedChunk:
+    """A retrieved document chunk with its provenance."""
+    id: Optional[str]
+    document_name: str
+    content: str
+    document_id: Optional[str] = None
+    chunk_index: Optional[int] = None
+    score: Optional[float] = None  # Higher = more relevant
+    distance: Optional[float] = None  # Vector distance (lower = closer)
+    chapter_number: Optional[int] = None
+    chapter_title: Optional[str] = None
+    section_number: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    _tokens: Optional[int] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_row(cls, row: Any, score: Optional[float] = None) -> "RetrievedChunk":
+        """Build from a DocumentVector or a SQL result row."""
+        def get(name):
+            return getattr(row, name, None)
+
+        distance = get("distance")
+        document_id = get("document_id")
+        return cls(
+            id=str(get("id")) if get("id") is not None else None,
+            document_name=get("document_name") or "Unknown document",
+            content=get("content") or "",
+            document_id=str(document_id) if document_id is not None else None,
+            chunk_index=get("chunk_index"),
+            score=score if score is not None else (1 - distance if distance is not None else None),
+            distance=distance,
+            chapter_number=get("chapter_number"),
+            chapter_title=get("chapter_title"),
+            section_number=get("section_number"),
+            page_start=get("page_start"),
+            page_end=get("page_end"),
+        )
+
+    @property
+    def tokens(self) -> int:
+        """Token count (computed once with the cached tokenizer)."""
+        if self._tokens is None:
+            self._tokens = count_tokens(self.content)
+        return self._tokens
+
+    @property
+    def page(self) -> Optional[int]:
+        """First page of the chunk (indexed page, else first [Page N] marker)."""
+        if self.page_start is not None:
+            return self.page_start
+        match = _PAGE_MARKER_RE.search(self.content)
+        return int(match.group(1)) if match else None
+
+    @property
+    def clean_content(self) -> str:
+        """Content without [Page N] markers."""
+        return _PAGE_MARKER_RE.sub('', self.content).strip()
+
+    @property
+    def prompt_text(self) -> str:
+        """Content as shown to the LLM, with a trailing page reference."""
+        page = self.page
+        return f"{self.clean_content} [Page {page}]" if page is not None else self.clean_content
+
+    def citation(self) -> str:
+        """Readable citation, e.g. "Deep Learning.pdf, Chapter 12, p. 7"."""
+        parts = [self.document_name]
+        if self.chapter_number is not None:
+            parts.append(f"Chapter {self.chapter_number}")
+        if self.section_number:
+            parts.append(f"Section {self.section_number}")
+        if self.page is not None:
+            if self.page_end is not None and self.page_end != self.page:
+                parts.append(f"pp. {self.page}-{self.page_end}")
+            else:
+                parts.append(f"p. {self.page}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_tokens")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetrievedChunk":
+        return cls(**data)
+
+
+@dataclass
+class RetrievalResult:
+    """Outcome of a document retrieval."""
+    query: str
+    chunks: List[RetrievedChunk] = field(default_factory=list)
+    status: str = STATUS_OK
+    message: str = ""  # User-facing explanation for non-ok statuses
+    strategy: str = STRATEGY_SEMANTIC
+    unit_label: Optional[str] = None  # "Chapter 12: ..." for structured lookups
+    retrieval_time_ms: float = 0.0
+
+    @classmethod
+    def failure(cls, query: str, status: str, message: str) -> "RetrievalResult":
+        return cls(query=query, status=status, message=message)
+
+    @classmethod
+    def from_text(cls, query: str, text: str) -> "RetrievalResult":
+        """
+        Wrap a legacy formatted retrieval string (tools without a structured retriever).
+
+        Args:
+            query: Query that was retrieved for
+            text: Formatted Document_QA output
+
+        Returns:
+            RetrievalResult with one chunk per passage, or a failure status
+        """
+        status = classify_retrieval_text(text)
+        if status != STATUS_OK:
+            return cls.failure(query, status, text)
+
+        passages = split_retrieved_text(text)
+        total = len(passages)
+        chunks = [
+            RetrievedChunk(id=None, document_name=source or "Unknown document", content=passage,
+                           score=float(total - i))
+            for i, (source, passage) in enumerate(passages)
+        ]
+        return cls(query=query, chunks=chunks, strategy=STRATEGY_TEXT)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK and bool(self.chunks)
+
+    @property
+    def chunk_ids(self) -> List[str]:
+        return [chunk.id for chunk in self.chunks if chunk.id]
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(chunk.tokens for chunk in self.chunks)
+
+    def citations(self) -> List[str]:
+        """Unique citations in result order."""
+        return list(dict.fromkeys(chunk.citation() for chunk in self.chunks))
+
+    def top_chunks(self, max_tokens: int) -> List[RetrievedChunk]:
+        """
+        Highest-scoring chunks that fit in ``max_tokens`` (for grading).
+
+        Returns:
+            Chunks in result order
+        """
+        ranked = sorted(
+            range(len(self.chunks)),
+            key=lambda i: (-(self.chunks[i].score if self.chunks[i].score is not None else 0.0), i)
+        )
+        selected, used = [], 0
+        for i in ranked:
+            tokens = self.chunks[i].tokens
+            if used + tokens > max_tokens and selected:
+                continue
+            selected.append(i)
+            used += tokens
+        return [self.chunks[i] for i in sorted(selected)]
+
+    def to_prompt_text(self, chunks: Optional[List[RetrievedChunk]] = None) -> str:
+        """
+        Render chunks for an LLM prompt, grouped by document.
+
+        Args:
+            chunks: Subset to render (default: all chunks)
+
+        Returns:
+            Formatted text (the failure message for non-ok results)
+        """
+        if self.status != STATUS_OK:
+            return self.message
+        chunks = self.chunks if chunks is None else chunks
+        if not chunks:
+            return f"📚 No relevant documents found for query: '{self.query}'"
+
+        grouped: Dict[str, List[RetrievedChunk]] = {}
+        for chunk in chunks:
+            grouped.setdefault(chunk.document_name, []).append(chunk)
+
+        label = f" ({self.unit_label})" if self.unit_label else ""
+        parts = ["Retrieved information from your documents:\n\n"]
+        for document_name, doc_chunks in grouped.items():
+            parts.append(f"From: {document_name}{label}\n{'─' * 80}\n")
+            for chunk in doc_chunks:
+                parts.append(f"{chunk.prompt_text}\n\n")
+            parts.append(f"{'─' * 80}\n\n")
+        return "".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form (for caches and logs)."""
+        return {
+            "query": self.query,
+            "chunks": [chunk.to_dict() for chunk in self.chunks],
+            "status": self.status,
+            "message": self.message,
+            "strategy": self.strategy,
+            "unit_label": self.unit_label,
+            "retrieval_time_ms": self.retrieval_time_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetrievalResult":
+        data = dict(data)
+        data["chunks"] = [RetrievedChunk.from_dict(chunk) for chunk in data.get("chunks", [])]
+        return cls(**data)
+
+
+def classify_retrieval_text(text: str) -> str:
+    """
+    Classify a legacy formatted Document_QA string.
+
+    Args:
+        text: Formatted tool output
+
+    Returns:
+        Retrieval status
+    """
+    if not text or not text.strip():
+        return STATUS_NO_RESULTS
+    if text.startswith("Retrieved information from your documents"):
+        return STATUS_OK
+
+    lowered = text.lower()
+    for status, phrases in _TEXT_STATUS_PHRASES:
+        if any(phrase in lowered for phrase in phrases):
+            return status
+    return STATUS_OK
+
+
+def pack_retrieval_result(
+    result: RetrievalResult,
+    budget: int = CONTEXT_PACK_TOKEN_BUDGET,
+    reserved_tokens: int = 0
+) -> PackedContext:
+    """
+    Pack a retrieval result's chunks into a token budget.
+
+    Uses chunk scores as relevance; near-duplicate chunks are collapsed.
+
+    Args:
+        result: Retrieval result
+        budget: Token budget
+        reserved_tokens: Tokens held back for the rest of the prompt
+
+    Returns:
+        PackedContext of chunk passages (sources are citations)
+    """
+    packer = ContextPacker(budget=budget, reserved_tokens=reserved_tokens)
+    total = len(result.chunks)
+    for i, chunk in enumerate(result.chunks):
+        packer.add(
+            chunk.prompt_text,
+            relevance=chunk.score if chunk.score is not None else float(total - i),
+            source=chunk.document_name,
+            metadata={"chunk_id": chunk.id, "citation": chunk.citation(), "page": chunk.page},
+        )
+    return packer.pack()
+
+
+def run_document_retrieval(tool: Any, query: str, **kwargs) -> RetrievalResult:
+    """
+    Run a Document_QA tool and get a RetrievalResult.
+
+    Uses the tool's structured retriever (``tool.metadata["structured_retriever"]``)
+    when it has one; otherwise the formatted output is parsed once.
+
+    Args:
+        tool: Document_QA tool
+        query: Query
+        **kwargs: Retrieval arguments (limit, user_id, conversation_history, ...)
+
+    Returns:
+        RetrievalResult
+    """
+    retriever = (getattr(tool, "metadata", None) or {}).get("structured_retriever")
+    if retriever is not None:
+        return retriever(query, **kwargs)
+    return RetrievalResult.from_text(query, tool.func(query, **kwargs))
+
+
+__all__ = [
+    'RetrievedChunk',
+    'RetrievalResult',
+    'classify_retrieval_text',
+    'pack_retrieval_result',
+    'run_document_retrieval',
+    'STATUS_OK',
+    'STATUS_NO_DOCUMENTS',
+    'STATUS_NO_RESULTS',
+    'STATUS_UNAVAILABLE',
+    'STATUS_ERROR',
+    'STRATEGY_SEMANTIC',
+    'STRATEGY_STRUCTURED',
+    'STRATEGY_TEXT',
+]
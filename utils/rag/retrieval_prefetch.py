@@ -0,0 +1,353 @@
+"""
+Speculative prefetching of document retrieval for likely follow-up queries.
+
+Students move through material in predictable steps: a question about a
+chapter, then "summarize it", then "make flashcards". Each retrieval is
+reduced to a state ``<intent>@<scope>`` (e.g. ``summarize@chapter``) and fed
+to a SequenceModel keyed by session. When the predicted next step is a
+whole-unit request (summary, notes, flashcards, quiz), the chunks of the
+session's current chapter/section/page are loaded in the background while the
+LLM is still answering, so the follow-up skips the database.
+
+Only retrieval results are prefetched, never LLM answers. Loads run on one
+background worker (skipped while it is busy), are capped by a per-minute
+budget, and hit rate is measured per prefetched unit.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.cache.prefetch_model import SequenceModel, PrefetchBudget
+from utils.cache.search_cache import TTLLRUCache
+from utils.core.constants import (
+    PREFETCH_MIN_PROBABILITY,
+    PREFETCH_BUDGET_PER_MINUTE,
+    PREFETCH_TTL,
+    PREFETCH_MAX_ENTRIES,
+    PREFETCH_RETRIEVAL_LIMIT,
+    PREFETCHABLE_QUERY_INTENTS,
+    SEQUENCE_MODEL_MAX_SESSIONS,
+)
+from utils.monitoring import get_logger
+from utils.rag.document_structure import (
+    StructureReference,
+    parse_structure_reference,
+    select_reading_order,
+    unit_request_topic,
+)
+from utils.rag.query_enrichment import classify_query_intent
+from utils.rag.retrieval import RetrievalResult, STRATEGY_STRUCTURED
+
+logger = get_logger(__name__)
+
+# (scope type, value), e.g. ("chapter", "3")
+Scope = Tuple[str, str]
+
+# Loads a whole unit: (query, reference, limit, user_id, course_id) -> result or None
+UnitLoader = Callable[[str, StructureReference, int, Optional[str], Optional[str]], Optional[RetrievalResult]]
+
+# Chunks whose chapter decides the scope of a semantic retrieval
+_SCOPE_CHUNKS = 5
+
+
+def reference_scope(reference: Optional[StructureReference]) -> Optional[Scope]:
+    """Scope of a parsed chapter/section/page reference."""
+    if reference is None:
+        return None
+    if reference.chapter is not None:
+        return ("chapter", str(reference.chapter))
+    if reference.section is not None:
+        return ("section", reference.section)
+    if reference.page is not None:
+        return ("page", str(reference.page))
+    return None
+
+
+def retrieval_scope(result: RetrievalResult) -> Optional[Scope]:
+    """
+    Unit a retrieval was about.
+
+    Uses the query's explicit reference, else the chapter most of the top
+    chunks come from.
+
+    Args:
+        result: Retrieval result (query after reformulation)
+
+    Returns:
+        Scope, or None if the result is not tied to a unit
+    """
+    scope = reference_scope(parse_structure_reference(result.query))
+    if scope is not None:
+        return scope
+
+    chapters = Counter(
+        chunk.chapter_number for chunk in result.chunks[:_SCOPE_CHUNKS]
+        if chunk.chapter_number is not None
+    )
+    if chapters:
+        chapter, count = chapters.most_common(1)[0]
+        if count * 2 > min(len(result.chunks), _SCOPE_CHUNKS):
+            return ("chapter", str(chapter))
+    return None
+
+
+def _scope_reference(scope: Scope) -> StructureReference:
+    scope_type, value = scope
+    if scope_type == "chapter":
+        return StructureReference(chapter=int(value))
+    if scope_type == "section":
+        return StructureReference(section=value)
+    return StructureReference(page=int(value))
+
+
+class RetrievalPrefetcher:
+    """
+    Learns query sequences and prefetches whole-unit retrievals.
+
+    Thread-safe: observe() and lookup() are called from request threads,
+    loads run on a single background worker.
+    """
+
+    def __init__(
+        self,
+        loader: UnitLoader,
+        on_hit: Optional[Callable[[RetrievalResult], Any]] = None,
+        limit: int = PREFETCH_RETRIEVAL_LIMIT,
+        ttl: float = PREFETCH_TTL,
+        max_entries: int = PREFETCH_MAX_ENTRIES,
+        min_probability: float = PREFETCH_MIN_PROBABILITY,
+        budget_per_minute: float = PREFETCH_BUDGET_PER_MINUTE,
+        model: Optional[SequenceModel] = None
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            loader: Loads a whole unit (without recording retrieval stats)
+            on_hit: Called in the background with results served from prefetch
+            limit: Chunks prefetched per unit
+            ttl: Seconds a prefetched unit stays usable
+            max_entries: Prefetched units kept
+            min_probability: Only prefetch steps at least this likely
+            budget_per_minute: Maximum loads per minute
+            model: Sequence model (default: a new bounded model)
+        """
+        self._loader = loader
+        self._on_hit = on_hit
+        self.limit = limit
+        self.min_probability = min_probability
+
+        self.model = model or SequenceModel()
+        self.budget = PrefetchBudget(budget_per_minute)
+
+        # key -> [RetrievalResult, used]
+        self._results = TTLLRUCache(max_size=max_entries, default_ttl=ttl)
+        # session -> current scope
+        self._session_scopes: "OrderedDict[str, Scope]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval-prefetch")
+        self._inflight: Optional[Future] = None
+
+        # Stats
+        self.prefetched = 0  # Units loaded or reused speculatively
+        self.prefetch_hits = 0  # Prefetched units that were then requested
+        self.served = 0  # Requests answered from prefetch (incl. repeats)
+        self.budget_skips = 0
+        self.busy_skips = 0
+        self.errors = 0
+
+    @staticmethod
+    def _session(user_id: Optional[str], course_id: Optional[str]) -> str:
+        return f"{user_id or 'anonymous'}|{course_id or ''}"
+
+    @staticmethod
+    def _key(user_id: Optional[str], course_id: Optional[str], scope: Scope) -> str:
+        return f"{user_id or ''}|{course_id or ''}|{scope[0]}|{scope[1]}"
+
+    def _request_scope(self, query: str, session: str) -> Optional[Scope]:
+        """Unit a whole-unit request is for (its own reference or the session's unit)."""
+        reference = parse_structure_reference(query)
+        if reference is not None:
+            return reference_scope(reference) if reference.is_whole_unit else None
+
+        # "make flashcards" - a bare request about the unit being studied
+        if classify_query_intent(query) in PREFETCHABLE_QUERY_INTENTS and not unit_request_topic(query):
+            with self._lock:
+                return self._session_scopes.get(session)
+        return None
+
+    def lookup(
+        self,
+        query: str,
+        limit: int,
+        user_id: Optional[str] = None,
+        course_id: Optional[str] = None,
+        record: bool = True
+    ) -> Optional[RetrievalResult]:
+        """
+        Serve a whole-unit request from prefetched chunks.
+
+        Args:
+            query: Query (after reformulation)
+            limit: Maximum chunks requested
+            user_id: User filter
+            course_id: Course filter
+            record: Count the hit and record the served chunks (False for
+                speculative lookups)
+
+        Returns:
+            RetrievalResult, or None if the unit was not prefetched
+        """
+        scope = self._request_scope(query, self._session(user_id, course_id))
+        if scope is None:
+            return None
+
+        key = self._key(user_id, course_id, scope)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            cached, used = entry
+            if record:
+                if not used:
+                    entry[1] = True
+                    self.prefetch_hits += 1
+                self.served += 1
+
+        result = RetrievalResult(
+            query=query,
+            chunks=select_reading_order(cached.chunks, limit),
+            strategy=STRATEGY_STRUCTURED,
+            unit_label=cached.unit_label
+        )
+        logger.info(f"⚡ Prefetch hit: {cached.unit_label} ({len(result.chunks)} chunks)")
+
+        if record and self._on_hit is not None:
+            self._executor.submit(self._run_quietly, self._on_hit, result)
+        return result
+
+    def observe(
+        self,
+        query: str,
+        result: RetrievalResult,
+        user_id: Optional[str] = None,
+        course_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Optional[Scope]:
+        """
+        Learn from a completed retrieval and prefetch the likely next unit.
+
+        Args:
+            query: Query as the user asked it (for the intent)
+            result: Retrieval result (its query is the reformulated one)
+            user_id: User filter
+            course_id: Course filter
+            limit: Chunk limit the retrieval ran with
+
+        Returns:
+            Scope scheduled for prefetch, if any
+        """
+        session = self._session(user_id, course_id)
+        scope = retrieval_scope(result) if result.ok else None
+
+        with self._lock:
+            if scope is None:
+                scope = self._session_scopes.get(session)
+            if scope is not None:
+                self._session_scopes.pop(session, None)
+                self._session_scopes[session] = scope
+                if len(self._session_scopes) > SEQUENCE_MODEL_MAX_SESSIONS:
+                    self._session_scopes.popitem(last=False)
+
+        state = f"{classify_query_intent(query)}@{scope[0] if scope else 'none'}"
+        self.model.observe(session, state)
+        if scope is None:
+            return None
+
+        predictions = self.model.predict(state, k=3, min_probability=self.min_probability)
+        if not any(
+            next_state.partition("@")[0] in PREFETCHABLE_QUERY_INTENTS
+            and next_state.partition("@")[2] == scope[0]
+            for next_state, _ in predictions
+        ):
+            return None
+
+        key = self._key(user_id, course_id, scope)
+        with self._lock:
+            if key in self._results:
+                return None
+
+            # This retrieval already is the unit (e.g. summary -> flashcards)
+            covers_unit = limit is not None and (limit >= self.limit or len(result.chunks) < limit)
+            if result.strategy == STRATEGY_STRUCTURED and covers_unit:
+                self._results.set(key, [result, False])
+                self.prefetched += 1
+                return scope
+
+            if self._inflight is not None and not self._inflight.done():
+                self.busy_skips += 1
+                return None
+            if not self.budget.try_acquire():
+                self.budget_skips += 1
+                return None
+
+            self._inflight = self._executor.submit(self._load, key, scope, user_id, course_id)
+        return scope
+
+    def _load(self, key: str, scope: Scope, user_id: Optional[str], course_id: Optional[str]):
+        """Load a unit on the background worker."""
+        try:
+            result = self._loader(f"{scope[0]} {scope[1]}", _scope_reference(scope), self.limit, user_id, course_id)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Retrieval prefetch failed for {scope[0]} {scope[1]}: {e}")
+            return
+
+        if result is None or not result.ok:
+            return
+        with self._lock:
+            self._results.set(key, [result, False])
+            self.prefetched += 1
+        logger.debug(f"Prefetched {scope[0]} {scope[1]} ({len(result.chunks)} chunks)")
+
+    def _run_quietly(self, fn: Callable, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Prefetch hit callback failed: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for the in-flight prefetch (if any) to finish."""
+        inflight = self._inflight
+        if inflight is not None:
+            inflight.result(timeout=timeout)
+
+    def shutdown(self):
+        """Stop the background worker."""
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetch statistics."""
+        hit_rate = self.prefetch_hits / self.prefetched * 100 if self.prefetched else 0.0
+        return {
+            "prefetched_units": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_hit_rate_percent": round(hit_rate, 2),
+            "served_from_prefetch": self.served,
+            "budget_skips": self.budget_skips,
+            "busy_skips": self.busy_skips,
+            "errors": self.errors,
+            "cached_units": len(self._results),
+            **self.model.get_stats(),
+        }
+
+
+__all__ = [
+    'RetrievalPrefetcher',
+    'reference_scope',
+    'retrieval_scope',
+]
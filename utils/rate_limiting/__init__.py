@@ -6,7 +6,12 @@ from .rate_limiter import (
     SlidingWindowLimiter,
     get_rate_limiter,
 )
-from .middleware import RateLimitMiddleware
+from .admission import (
+    AdmissionController,
+    AdmissionRejected,
+    get_admission_controller,
+)
+from .middleware import RateLimitMiddleware, AdmissionControlMiddleware
 
 __all__ = [
     "RateLimiter",
@@ -14,5 +19,9 @@ __all__ = [
     "SlidingWindowLimiter",
     "get_rate_limiter",
     "RateLimitMiddleware",
+    "AdmissionController",
+    "AdmissionRejected",
+    "get_admission_controller",
+    "AdmissionControlMiddleware",
 ]
 
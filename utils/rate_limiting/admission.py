@@ -0,0 +1,448 @@
+"""
+Admission control and load shedding for the HTTP API.
+
+``RateLimitMiddleware`` caps how often each client may call; the admission
+controller caps how much work the whole process accepts at once. Every
+controlled request takes a slot before it runs:
+
+- the concurrency limit adapts to observed latency (AIMD): it grows by
+  about one slot per round of completions while requests finish close to
+  their route's baseline latency, and is cut multiplicatively when recent
+  requests take more than ADMISSION_LATENCY_TOLERANCE times as long. The
+  baseline is the long-run mean latency of the route and the recent
+  latency a short-run mean, so mixed fast and slow responses (cache hits,
+  long answers) average out instead of being compared with the fastest
+- requests are classed by endpoint: critical ones (auth, health, docs,
+  task polling) bypass the controller and are never shed; batch ones
+  (grading, uploads, background tasks) may hold only part of the slots
+  and are shed first
+- requests that do not fit wait in a bounded queue per priority
+  (interactive before batch) until a deadline; past it, or with the queue
+  full, they are rejected at once with a Retry-After hint
+- database pool utilization is an extra signal: above
+  ADMISSION_DB_UTILIZATION_THRESHOLD the effective limit shrinks and
+  batch requests are shed outright
+
+The controller lives on the event loop (one per worker process) and needs
+no locks.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from utils.core.constants import (
+    ADMISSION_INITIAL_LIMIT,
+    ADMISSION_MIN_LIMIT,
+    ADMISSION_MAX_LIMIT,
+    ADMISSION_LATENCY_TOLERANCE,
+    ADMISSION_BACKOFF_RATIO,
+    ADMISSION_BATCH_SHARE,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_MAX_RETRY_AFTER,
+    ADMISSION_DB_UTILIZATION_THRESHOLD,
+    ADMISSION_DB_SAMPLE_INTERVAL,
+    ADMISSION_ROUTE_PRIORITIES,
+    ADMISSION_MAX_ROUTES,
+)
+from utils.monitoring import get_logger
+
+logger = get_logger(__name__)
+
+
+PRIORITY_CRITICAL = "critical"
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+
+# Lower value is admitted first (critical requests never queue)
+PRIORITY_ORDER = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 1}
+
+REJECT_QUEUE_FULL = "queue_full"
+REJECT_TIMEOUT = "timeout"
+REJECT_OVERLOAD = "overload"
+
+# Smoothing of the recent latency / baseline ratio (about 40 completions)
+# and of the per-route mean latency baseline (about 1000 completions; a plain
+# running mean until then). While congested the baseline moves 10x slower,
+# so an overload is not absorbed into it but a lasting shift eventually is.
+# One outlier counts as at most _MAX_SAMPLE_RATIO x tolerance x baseline, and
+# a route's latencies count once _MIN_BASELINE_SAMPLES have set its baseline
+_RATIO_ALPHA = 0.025
+_MAX_SAMPLE_RATIO = 5.0
+_MIN_BASELINE_SAMPLES = 50
+_BASELINE_ALPHA = 0.001
+_CONGESTED_BASELINE_ALPHA = 0.0001
+_LATENCY_ALPHA = 0.1
+
+# Routes beyond ADMISSION_MAX_ROUTES share one baseline
+_OTHER_ROUTE = "other"
+
+
+def route_priority(path: str) -> str:
+    """
+    Priority class of a request path (first matching prefix wins).
+
+    Args:
+        path: Request URL path
+
+    Returns:
+        PRIORITY_CRITICAL, PRIORITY_INTERACTIVE or PRIORITY_BATCH;
+        unlisted paths are critical, i.e. not controlled
+    """
+    for prefix, priority in ADMISSION_ROUTE_PRIORITIES:
+        if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+            return priority
+    return PRIORITY_CRITICAL
+
+
+def route_key(method: str, path: str) -> str:
+    """
+    Latency baseline key of a request: method and path with id-like
+    segments (containing digits, or long tokens) collapsed.
+    """
+    segments = [
+        "{id}" if any(c.isdigit() for c in segment) or len(segment) >= 24 else segment
+        for segment in path.rstrip("/").split("/")
+    ]
+    return f"{method} {'/'.join(segments) or '/'}"
+
+
+class AdmissionRejected(Exception):
+    """A request was shed; the client should retry after ``retry_after`` seconds."""
+
+    def __init__(self, priority: str, reason: str, retry_after: int):
+        super().__init__(f"{priority} request shed ({reason}), retry after {retry_after}s")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionTicket:
+    """Slot held by an admitted request; hand it back with ``release``."""
+
+    priority: str
+    route: str
+    admitted_at: float = field(default_factory=time.monotonic)
+    queued_seconds: float = 0.0
+    released: bool = False
+
+
+class AdmissionController:
+    """
+    Adaptive concurrency limit with priority classes and deadline queues.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = ADMISSION_INITIAL_LIMIT,
+        min_limit: int = ADMISSION_MIN_LIMIT,
+        max_limit: int = ADMISSION_MAX_LIMIT,
+        tolerance: float = ADMISSION_LATENCY_TOLERANCE,
+        backoff: float = ADMISSION_BACKOFF_RATIO,
+        batch_share: float = ADMISSION_BATCH_SHARE,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: Optional[Dict[str, float]] = None,
+        utilization_provider: Optional[Callable[[], float]] = None
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: The limit never drops below this
+            max_limit: The limit never grows above this
+            tolerance: Latency / baseline ratio treated as congestion
+            backoff: Factor applied to the limit on congestion
+            batch_share: Fraction of the limit batch requests may hold
+            max_queue: Waiting requests per priority
+            queue_timeout: Longest wait per priority (seconds)
+            utilization_provider: Returns database pool utilization (0-1)
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.batch_share = batch_share
+        self.max_queue = max_queue
+        self.queue_timeout = dict(queue_timeout or ADMISSION_QUEUE_TIMEOUT)
+        self.utilization_provider = utilization_provider
+
+        self.in_flight = 0
+        self.batch_in_flight = 0
+        self._queues: Dict[str, Deque[Tuple[asyncio.Future, AdmissionTicket]]] = {
+            priority: deque() for priority in PRIORITY_ORDER
+        }
+        self._baselines: Dict[str, Tuple[float, int]] = {}  # Mean latency and samples per route
+        self._ratio = 1.0
+        self._recent_latency = 0.0
+        self._recent_baseline = 0.0
+        self._latency = 0.0
+        self._completions_since_decrease = 0
+
+        self._utilization = 0.0
+        self._utilization_at = float("-inf")
+
+        self.admitted = {priority: 0 for priority in PRIORITY_ORDER}
+        self.rejected: Dict[Tuple[str, str], int] = {}
+        self.decreases = 0
+
+    # ------------------------------------------------------------------
+    # Capacity
+    # ------------------------------------------------------------------
+
+    def db_utilization(self) -> float:
+        """Database pool utilization, sampled at most once per ADMISSION_DB_SAMPLE_INTERVAL."""
+        if self.utilization_provider is None:
+            return 0.0
+        now = time.monotonic()
+        if now - self._utilization_at >= ADMISSION_DB_SAMPLE_INTERVAL:
+            self._utilization_at = now
+            try:
+                self._utilization = float(self.utilization_provider())
+            except Exception as e:
+                logger.warning(f"⚠️  Admission control: database utilization unavailable, ignoring it ({e})")
+                self.utilization_provider = None
+                self._utilization = 0.0
+        return self._utilization
+
+    def _db_pressure(self) -> float:
+        """0 below the utilization threshold, 1 with the pool exhausted."""
+        threshold = ADMISSION_DB_UTILIZATION_THRESHOLD
+        return min(1.0, max(0.0, (self.db_utilization() - threshold) / (1.0 - threshold)))
+
+    @property
+    def effective_limit(self) -> int:
+        """Current limit, shrunk by up to 3/4 as the database pool fills up."""
+        scale = 1.0 - 0.75 * self._db_pressure()
+        return max(self.min_limit, int(self.limit * scale))
+
+    def _capacity(self, priority: str) -> int:
+        limit = self.effective_limit
+        if priority == PRIORITY_BATCH:
+            if self._db_pressure() > 0:
+                return 0
+            return max(1, int(limit * self.batch_share))
+        return limit
+
+    def _fits(self, priority: str) -> bool:
+        if self.in_flight >= self.effective_limit:
+            return False
+        if priority == PRIORITY_BATCH:
+            return self.batch_in_flight < self._capacity(priority)
+        return True
+
+    def _take(self, ticket: AdmissionTicket):
+        self.in_flight += 1
+        if ticket.priority == PRIORITY_BATCH:
+            self.batch_in_flight += 1
+        self.admitted[ticket.priority] += 1
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def retry_after(self) -> int:
+        """
+        Seconds after which a shed request is likely to be admitted: the
+        time to drain the queues at the current limit, at least 1.
+        """
+        rounds = (self.queued + 1) / max(1, self.effective_limit)
+        estimate = math.ceil(rounds * (self._latency or 1.0))
+        return int(min(ADMISSION_MAX_RETRY_AFTER, max(1, estimate)))
+
+    def _reject(self, priority: str, reason: str) -> AdmissionRejected:
+        key = (priority, reason)
+        self.rejected[key] = self.rejected.get(key, 0) + 1
+        return AdmissionRejected(priority, reason, self.retry_after())
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    async def acquire(self, priority: str, route: str = _OTHER_ROUTE) -> AdmissionTicket:
+        """
+        Take a slot, waiting in the priority's queue while the limit is full.
+
+        Args:
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BATCH
+            route: Latency baseline key (see ``route_key``)
+
+        Returns:
+            Ticket to pass to ``release``
+
+        Raises:
+            AdmissionRejected: Queue full, deadline passed, or batch work
+                shed under database pressure
+        """
+        if priority not in PRIORITY_ORDER:
+            raise ValueError(f"Unknown admission priority: {priority}")
+        ticket = AdmissionTicket(priority, route)
+
+        # Queued requests of the same or higher priority go first
+        ahead = any(self._queues[p] for p, order in PRIORITY_ORDER.items() if order <= PRIORITY_ORDER[priority])
+        if not ahead and self._fits(priority):
+            self._take(ticket)
+            return ticket
+
+        if self._capacity(priority) == 0:
+            raise self._reject(priority, REJECT_OVERLOAD)
+        queue = self._queues[priority]
+        if len(queue) >= self.max_queue:
+            raise self._reject(priority, REJECT_QUEUE_FULL)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, ticket)
+        queue.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout.get(priority))
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Admitted right at the deadline (or cancelled after admission)
+                if not isinstance(e, asyncio.TimeoutError):
+                    self.release(ticket)
+                    raise
+            else:
+                future.cancel()
+                queue.remove(entry)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject(priority, REJECT_TIMEOUT) from None
+                raise
+        ticket.queued_seconds = time.monotonic() - ticket.admitted_at
+        ticket.admitted_at = time.monotonic()
+        return ticket
+
+    def _dispatch(self):
+        """Admit queued requests that now fit, interactive first."""
+        for priority in sorted(PRIORITY_ORDER, key=PRIORITY_ORDER.get):
+            queue = self._queues[priority]
+            while queue and self._fits(priority):
+                future, ticket = queue.popleft()
+                if future.done():
+                    continue
+                self._take(ticket)
+                future.set_result(True)
+            if queue:
+                # Lower priorities wait until this queue has drained
+                return
+
+    def release(self, ticket: AdmissionTicket, latency: Optional[float] = None):
+        """
+        Return a slot, adapt the limit and admit queued requests.
+
+        Args:
+            ticket: Ticket returned by ``acquire`` (releasing twice is a no-op)
+            latency: Service time of a successful request in seconds;
+                None for failed or aborted requests (no sample)
+        """
+        if ticket.released:
+            return
+        ticket.released = True
+        self.in_flight -= 1
+        if ticket.priority == PRIORITY_BATCH:
+            self.batch_in_flight -= 1
+        if latency is not None:
+            self._observe(ticket.route, latency)
+        self._dispatch()
+
+    # ------------------------------------------------------------------
+    # Limit adaptation
+    # ------------------------------------------------------------------
+
+    def _observe(self, route: str, latency: float):
+        latency = max(latency, 1e-4)
+        if route not in self._baselines and len(self._baselines) >= ADMISSION_MAX_ROUTES:
+            route = _OTHER_ROUTE
+        baseline, samples = self._baselines.get(route, (latency, 0))
+        congested = self._ratio > self.tolerance
+        alpha = _CONGESTED_BASELINE_ALPHA if congested else max(_BASELINE_ALPHA, 1.0 / (samples + 1))
+        self._baselines[route] = (baseline + alpha * (latency - baseline), samples + 1)
+
+        # Ratio of recent means (recent latency over what the same requests
+        # usually take), so mixed fast and slow responses average out; a
+        # route's latency counts once its baseline has settled
+        if samples >= _MIN_BASELINE_SAMPLES:
+            sample = min(latency, _MAX_SAMPLE_RATIO * self.tolerance * baseline)
+            if not self._recent_baseline:
+                self._recent_latency = self._recent_baseline = baseline
+            self._recent_latency += _RATIO_ALPHA * (sample - self._recent_latency)
+            self._recent_baseline += _RATIO_ALPHA * (baseline - self._recent_baseline)
+            self._ratio = self._recent_latency / self._recent_baseline
+        self._latency = self._latency + _LATENCY_ALPHA * (latency - self._latency) if self._latency else latency
+        self._completions_since_decrease += 1
+
+        if self._ratio > self.tolerance:
+            # Cut at most once per half round of completions, so one slow
+            # burst does not collapse the limit
+            if self._completions_since_decrease >= self.limit / 2:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._completions_since_decrease = 0
+                self.decreases += 1
+                logger.warning(
+                    f"🚦 Admission limit lowered to {int(self.limit)} "
+                    f"(latency {self._ratio:.1f}x baseline)"
+                )
+        elif self.in_flight + 1 >= self.limit / 2 or self.queued:
+            # Only grow while the limit is actually being used
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "effective_limit": self.effective_limit,
+            "in_flight": self.in_flight,
+            "batch_in_flight": self.batch_in_flight,
+            "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+            "admitted": dict(self.admitted),
+            "rejected": {f"{p}:{r}": count for (p, r), count in self.rejected.items()},
+            "latency_ratio": round(self._ratio, 3),
+            "latency_seconds": round(self._latency, 4),
+            "db_utilization": round(self._utilization, 3),
+            "limit_decreases": self.decreases,
+        }
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller(
+    utilization_provider: Optional[Callable[[], float]] = None
+) -> AdmissionController:
+    """
+    Get the process-wide admission controller.
+
+    Args:
+        utilization_provider: Database pool utilization source, attached
+            on first use (or when none is set yet)
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(utilization_provider=utilization_provider)
+    elif utilization_provider is not None and _admission_controller.utilization_provider is None:
+        _admission_controller.utilization_provider = utilization_provider
+    return _admission_controller
+
+
+def reset_admission_controller():
+    """Drop the process-wide controller (tests)."""
+    global _admission_controller
+    _admission_controller = None
+
+
+__all__ = [
+    "PRIORITY_CRITICAL",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_BATCH",
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionTicket",
+    "route_priority",
+    "route_key",
+    "get_admission_controller",
+    "reset_admission_controller",
+]
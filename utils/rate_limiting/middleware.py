@@ -4,9 +4,18 @@ from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
-from typing import Optional
+import time
+from typing import Callable, Optional
 
 from config import settings
+from .admission import (
+    AdmissionController,
+    AdmissionRejected,
+    PRIORITY_CRITICAL,
+    get_admission_controller,
+    route_key,
+    route_priority,
+)
 from .rate_limiter import get_rate_limiter
 from utils.monitoring import get_logger
 
@@ -147,3 +156,85 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         return response
 
+
+class AdmissionControlMiddleware(BaseHTTPMiddleware):
+    """
+    FastAPI middleware shedding load before it reaches the agents.
+    
+    Features:
+    - Adaptive concurrency limit shared by all clients (see ``admission``)
+    - Endpoint priorities: critical paths pass through, batch is shed first
+    - Bounded waiting with deadlines, then a fast 503 with Retry-After
+    - Streaming responses hold their slot until the stream ends
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: bool = True,
+        controller: Optional[AdmissionController] = None,
+        utilization_provider: Optional[Callable[[], float]] = None
+    ):
+        """
+        Initialize admission control middleware.
+        
+        Args:
+            app: FastAPI application
+            enabled: Enable admission control
+            controller: Controller to use (default: the process-wide one)
+            utilization_provider: Database pool utilization source (0-1)
+        """
+        super().__init__(app)
+        self.enabled = enabled
+        self.controller = controller or get_admission_controller(utilization_provider)
+    
+    async def dispatch(self, request: Request, call_next):
+        """Process request once admitted, or shed it."""
+        priority = route_priority(request.url.path)
+        if not self.enabled or priority == PRIORITY_CRITICAL or request.method == "OPTIONS":
+            return await call_next(request)
+        
+        try:
+            ticket = await self.controller.acquire(
+                priority, route_key(request.method, request.url.path)
+            )
+        except AdmissionRejected as e:
+            logger.warning(f"🚦 Shed {priority} request {request.method} {request.url.path} ({e.reason})")
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={
+                    "error": "Service overloaded",
+                    "message": "The service is busy. Please try again shortly.",
+                    "retry_after": e.retry_after
+                },
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except BaseException:
+            self.controller.release(ticket)
+            raise
+        
+        # Latency is sampled at the first body chunk (time to first token for
+        # streams); the slot is held until the body has been sent. Only 2xx/3xx
+        # responses are sampled: cheap 4xx (auth, validation) would drag the
+        # baseline down and failures say nothing about service time
+        successful = response.status_code < 400
+        body_iterator = response.body_iterator
+        
+        async def admitted_body():
+            latency = None
+            try:
+                async for chunk in body_iterator:
+                    if latency is None:
+                        latency = time.perf_counter() - started
+                    yield chunk
+            finally:
+                if latency is None:
+                    latency = time.perf_counter() - started
+                self.controller.release(ticket, latency if successful else None)
+        
+        response.body_iterator = admitted_body()
+        return response
@@ -12,16 +12,31 @@ Features:
 - Health monitoring and automatic failover
 - Fallback chains for reliability
 - Persistent state across restarts
+- Fixed-memory latency histograms (p50/p95/p99), EWMA trends and windowed rates
 """
 
 import os
 import json
 import time
+from itertools import islice
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
 
+from utils.core.constants import (
+    LATENCY_QUANTILES,
+    PERFORMANCE_RECENT_REQUESTS,
+    PERFORMANCE_TREND_FAST_ALPHA,
+    PERFORMANCE_TREND_SLOW_ALPHA,
+)
+from utils.monitoring.streaming_stats import (
+    EWMA,
+    LabeledHistograms,
+    LatencyHistogram,
+    WindowedCounter,
+)
+
 
 # =============================================================================
 # PERFORMANCE MONITORING
@@ -38,22 +53,40 @@ class RequestMetrics:
     cache_hit: bool
     tool_used: Optional[str] = None
     tokens_used: Optional[int] = None
+    agent: Optional[str] = None
+    route: Optional[str] = None
     
 
 class PerformanceMonitor:
     """
     Monitor and track performance metrics across requests.
     
+    Memory is fixed: response times go into log-bucketed histograms (overall
+    and per tool/agent/route), rates into sliding-window counters, and only
+    the most recent requests are kept in detail.
+    
     Tracks:
-    - Response times (avg, min, max)
+    - Response times (avg, min, max, p50/p95/p99)
     - Cache hit rates
     - Pattern routing success rates
     - LLM call reduction
     - Cost savings
     """
     
-    def __init__(self):
-        self.metrics: List[RequestMetrics] = []
+    def __init__(self, recent_requests: int = PERFORMANCE_RECENT_REQUESTS):
+        # Most recent requests, for detailed export
+        self.metrics: deque = deque(maxlen=recent_requests)
+        
+        # Latency distributions
+        self.latency = LatencyHistogram()
+        self.tool_latency = LabeledHistograms()
+        self.agent_latency = LabeledHistograms()
+        self.route_latency = LabeledHistograms()
+        
+        # Sliding-window rates
+        self.recent_requests = WindowedCounter()
+        self.recent_cache_hits = WindowedCounter()
+        
         self.total_requests = 0
         self.cache_hits = 0
         self.pattern_routes = 0
@@ -69,7 +102,9 @@ class PerformanceMonitor:
         pattern_routed: bool = False,
         cache_hit: bool = False,
         tool_used: Optional[str] = None,
-        tokens_used: Optional[int] = None
+        tokens_used: Optional[int] = None,
+        agent: Optional[str] = None,
+        route: Optional[str] = None
     ):
         """
         Log metrics for a single request.
@@ -82,11 +117,15 @@ class PerformanceMonitor:
             cache_hit: Whether result was from cache
             tool_used: Which tool was used
             tokens_used: Total tokens used
+            agent: Which agent handled the request
+            route: API route or workflow path
         """
         self.total_requests += 1
+        self.record_latency(response_time, tool=tool_used, agent=agent, route=route)
         
         if cache_hit:
             self.cache_hits += 1
+            self.recent_cache_hits.add()
             self.total_saved_llm_calls += 2  # Typical request saves 2-3 LLM calls
         
         if pattern_routed:
@@ -106,23 +145,53 @@ class PerformanceMonitor:
             pattern_routed=pattern_routed,
             cache_hit=cache_hit,
             tool_used=tool_used,
-            tokens_used=tokens_used
+            tokens_used=tokens_used,
+            agent=agent,
+            route=route
         )
         self.metrics.append(metric)
         
+    def record_latency(
+        self,
+        response_time: float,
+        tool: Optional[str] = None,
+        agent: Optional[str] = None,
+        route: Optional[str] = None
+    ):
+        """
+        Record a response time without the per-request routing/cost details.
+        
+        Args:
+            response_time: Time taken in seconds
+            tool: Tool that handled the request
+            agent: Agent that handled the request
+            route: API route or workflow path
+        """
+        self.recent_requests.add()
+        self.latency.record(response_time)
+        if tool:
+            self.tool_latency.record(tool, response_time)
+        if agent:
+            self.agent_latency.record(agent, response_time)
+        if route:
+            self.route_latency.record(route, response_time)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive performance statistics."""
         if self.total_requests == 0:
-            return {
+            stats = {
                 'total_requests': 0,
                 'message': 'No requests logged yet'
             }
+            if self.latency.count:
+                stats['latency'] = self.latency.get_stats()
+            return stats
         
-        # Calculate response time stats
-        response_times = [m.response_time for m in self.metrics]
-        avg_response_time = sum(response_times) / len(response_times)
-        min_response_time = min(response_times)
-        max_response_time = max(response_times)
+        # Response time stats (from the histogram, O(1) memory)
+        latency = self.latency.get_stats()
+        avg_response_time = latency['mean']
+        min_response_time = latency['min']
+        max_response_time = latency['max']
         
         # Calculate rates
         cache_hit_rate = (self.cache_hits / self.total_requests) * 100
@@ -140,6 +209,10 @@ class PerformanceMonitor:
             'avg_response_time': f"{avg_response_time:.2f}s",
             'min_response_time': f"{min_response_time:.2f}s",
             'max_response_time': f"{max_response_time:.2f}s",
+            'p50_response_time': f"{latency['p50']:.2f}s",
+            'p95_response_time': f"{latency['p95']:.2f}s",
+            'p99_response_time': f"{latency['p99']:.2f}s",
+            'requests_per_minute': round(self.recent_requests.rate() * 60, 2),
             'cache_hit_rate': f"{cache_hit_rate:.1f}%",
             'pattern_route_rate': f"{pattern_route_rate:.1f}%",
             'llm_route_rate': f"{(100-pattern_route_rate):.1f}%",
@@ -151,6 +224,26 @@ class PerformanceMonitor:
             'savings_rate': f"{savings_rate:.1f}%"
         }
     
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Latency distributions (seconds) overall and per tool/agent/route."""
+        return {
+            'overall': self.latency.get_stats(),
+            'tools': self.tool_latency.get_stats(),
+            'agents': self.agent_latency.get_stats(),
+            'routes': self.route_latency.get_stats(),
+        }
+    
+    def iter_latency_histograms(self):
+        """Yield (scope, name, histogram) for every latency series."""
+        yield 'overall', 'all', self.latency
+        for scope, series in (
+            ('tool', self.tool_latency),
+            ('agent', self.agent_latency),
+            ('route', self.route_latency),
+        ):
+            for name, histogram in series.items():
+                yield scope, name, histogram
+    
     def print_report(self):
         """Print a formatted performance report."""
         stats = self.get_stats()
@@ -168,6 +261,8 @@ class PerformanceMonitor:
         print(f"  Avg Response Time:  {stats['avg_response_time']}")
         print(f"  Min Response Time:  {stats['min_response_time']}")
         print(f"  Max Response Time:  {stats['max_response_time']}")
+        print(f"  p50 / p95 / p99:    {stats['p50_response_time']} / "
+              f"{stats['p95_response_time']} / {stats['p99_response_time']}")
         
         print(f"\n⚡ Optimization Impact:")
         print(f"  Cache Hit Rate:     {stats['cache_hit_rate']}")
@@ -185,9 +280,10 @@ class PerformanceMonitor:
         print("\n" + "="*70 + "\n")
     
     def export_metrics(self, filepath: str = "performance_metrics.json"):
-        """Export metrics to JSON file for analysis."""
+        """Export metrics to JSON file for analysis (recent requests in detail)."""
         data = {
             'summary': self.get_stats(),
+            'latency': self.get_latency_stats(),
             'detailed_metrics': [
                 {
                     'timestamp': m.timestamp.isoformat(),
@@ -197,7 +293,9 @@ class PerformanceMonitor:
                     'pattern_routed': m.pattern_routed,
                     'cache_hit': m.cache_hit,
                     'tool_used': m.tool_used,
-                    'tokens_used': m.tokens_used
+                    'tokens_used': m.tokens_used,
+                    'agent': m.agent,
+                    'route': m.route
                 }
                 for m in self.metrics
             ]
@@ -218,10 +316,10 @@ class ToolPerformanceTracker:
     Track performance metrics for each tool.
     
     Metrics:
-    - Average response time
+    - Average response time and latency percentiles
     - Success rate
     - Quality score (from user feedback)
-    - Recent performance trend
+    - Recent performance trend (fast vs slow EWMA)
     """
     
     def __init__(self, tool_name: str):
@@ -236,13 +334,19 @@ class ToolPerformanceTracker:
         
         # Recent performance (last 20 calls)
         self.recent_calls = deque(maxlen=20)
+        self.latency = LatencyHistogram()
         
-        # Quality tracking
-        self.quality_scores = []  # From user feedback
+        # Quality tracking (from user feedback)
+        self.quality_count = 0
+        self.quality_total = 0.0
         self.avg_quality = 0.0
         
-        # Trend tracking
+        # Trend tracking: recent (fast) vs longer-term (slow) averages
         self.performance_trend = 0.0  # -1 to 1, positive = improving
+        self.success_fast = EWMA(PERFORMANCE_TREND_FAST_ALPHA)
+        self.success_slow = EWMA(PERFORMANCE_TREND_SLOW_ALPHA)
+        self.response_time_fast = EWMA(PERFORMANCE_TREND_FAST_ALPHA)
+        self.response_time_slow = EWMA(PERFORMANCE_TREND_SLOW_ALPHA)
         
         # Reliability
         self.consecutive_failures = 0
@@ -282,6 +386,7 @@ class ToolPerformanceTracker:
         # Update response time
         self.total_response_time += response_time
         self.avg_response_time = self.total_response_time / self.call_count
+        self.latency.record(response_time)
         
         # Record recent call
         call_record = {
@@ -295,38 +400,41 @@ class ToolPerformanceTracker:
         
         # Update quality
         if quality_score is not None:
-            self.quality_scores.append(quality_score)
-            self.avg_quality = sum(self.quality_scores) / len(self.quality_scores)
+            self.quality_count += 1
+            self.quality_total += quality_score
+            self.avg_quality = self.quality_total / self.quality_count
         
         # Calculate performance trend
-        self._update_trend()
+        self._update_trend(success, response_time)
         
         self.last_update = datetime.now()
     
-    def _update_trend(self):
-        """Calculate performance trend from recent calls."""
-        if len(self.recent_calls) < 10:
+    def _update_trend(self, success: bool, response_time: float):
+        """Update performance trend (recent averages vs longer-term averages)."""
+        self.success_fast.update(1.0 if success else 0.0)
+        self.success_slow.update(1.0 if success else 0.0)
+        self.response_time_fast.update(response_time)
+        self.response_time_slow.update(response_time)
+        
+        if self.success_fast.count < 10:
             self.performance_trend = 0.0
             return
         
-        # Compare first half vs second half
-        mid = len(self.recent_calls) // 2
-        first_half = list(self.recent_calls)[:mid]
-        second_half = list(self.recent_calls)[mid:]
-        
-        # Calculate success rates
-        first_success = sum(1 for c in first_half if c['success']) / len(first_half)
-        second_success = sum(1 for c in second_half if c['success']) / len(second_half)
-        
-        # Calculate average response times
-        first_rt = sum(c['response_time'] for c in first_half) / len(first_half)
-        second_rt = sum(c['response_time'] for c in second_half) / len(second_half)
-        
         # Trend combines success rate improvement and speed improvement
-        success_trend = second_success - first_success
-        speed_trend = (first_rt - second_rt) / max(first_rt, 0.1)  # Positive = getting faster
+        success_trend = self.success_fast.value - self.success_slow.value
+        slow_rt = self.response_time_slow.value
+        speed_trend = (slow_rt - self.response_time_fast.value) / max(slow_rt, 0.1)  # Positive = getting faster
         
-        self.performance_trend = (success_trend * 0.6 + speed_trend * 0.4)
+        self.performance_trend = max(-1.0, min(1.0, success_trend * 0.6 + speed_trend * 0.4))
+    
+    def trend_averages(self) -> Dict[str, EWMA]:
+        """Moving averages behind the trend (for persistence)."""
+        return {
+            'success_fast': self.success_fast,
+            'success_slow': self.success_slow,
+            'response_time_fast': self.response_time_fast,
+            'response_time_slow': self.response_time_slow,
+        }
     
     def get_success_rate(self) -> float:
         """Get overall success rate."""
@@ -336,7 +444,7 @@ class ToolPerformanceTracker:
     
     def get_recent_success_rate(self, lookback: int = 10) -> float:
         """Get recent success rate."""
-        recent = list(self.recent_calls)[-lookback:]
+        recent = list(islice(reversed(self.recent_calls), lookback))
         if not recent:
             return 0.0
         return sum(1 for c in recent if c['success']) / len(recent)
@@ -389,11 +497,16 @@ class ToolPerformanceTracker:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get performance statistics."""
+        percentiles = self.latency.quantiles(LATENCY_QUANTILES)
         return {
             'tool_name': self.tool_name,
             'call_count': self.call_count,
             'success_rate': f"{self.get_success_rate() * 100:.1f}%",
             'avg_response_time': f"{self.avg_response_time:.2f}s",
+            **{
+                f"p{q * 100:g}_response_time": f"{value:.2f}s" if value is not None else "N/A"
+                for q, value in percentiles.items()
+            },
             'performance_score': f"{self.get_performance_score():.1f}/100",
             'trend': 'improving' if self.performance_trend > 0.1 else 'declining' if self.performance_trend < -0.1 else 'stable',
             'is_healthy': self.is_healthy(),
@@ -680,9 +793,14 @@ class PerformanceBasedRouter:
                     'total_response_time': t.total_response_time,
                     'avg_response_time': t.avg_response_time,
                     'recent_calls': list(t.recent_calls),
-                    'quality_scores': t.quality_scores,
+                    'quality_count': t.quality_count,
+                    'quality_total': t.quality_total,
                     'avg_quality': t.avg_quality,
                     'performance_trend': t.performance_trend,
+                    'trend_averages': {
+                        name: [ewma.value, ewma.count]
+                        for name, ewma in t.trend_averages().items()
+                    },
                     'consecutive_failures': t.consecutive_failures,
                     'max_consecutive_failures': t.max_consecutive_failures
                 }
@@ -718,9 +836,18 @@ class PerformanceBasedRouter:
             tracker.total_response_time = tracker_data['total_response_time']
             tracker.avg_response_time = tracker_data['avg_response_time']
             tracker.recent_calls = deque(tracker_data['recent_calls'], maxlen=20)
-            tracker.quality_scores = tracker_data['quality_scores']
+            if 'quality_scores' in tracker_data:  # Older state files
+                scores = tracker_data['quality_scores']
+                tracker.quality_count, tracker.quality_total = len(scores), float(sum(scores))
+            else:
+                tracker.quality_count = tracker_data.get('quality_count', 0)
+                tracker.quality_total = tracker_data.get('quality_total', 0.0)
             tracker.avg_quality = tracker_data['avg_quality']
             tracker.performance_trend = tracker_data['performance_trend']
+            for name, (value, count) in tracker_data.get('trend_averages', {}).items():
+                ewma = tracker.trend_averages().get(name)
+                if ewma is not None:
+                    ewma.value, ewma.count = value, count
             tracker.consecutive_failures = tracker_data['consecutive_failures']
             tracker.max_consecutive_failures = tracker_data['max_consecutive_failures']
             
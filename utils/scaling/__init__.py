@@ -2,11 +2,16 @@
 
 from .distributed_state import DistributedStateManager, get_distributed_state
 from .load_balancer import LoadBalancerConfig, SessionAffinity
+from .task_scheduler import TaskScheduler, InMemoryTaskStore, RedisTaskStore, get_task_store
 
 __all__ = [
     "DistributedStateManager",
     "get_distributed_state",
     "LoadBalancerConfig",
     "SessionAffinity",
+    "TaskScheduler",
+    "InMemoryTaskStore",
+    "RedisTaskStore",
+    "get_task_store",
 ]
 
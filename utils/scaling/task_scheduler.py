@@ -0,0 +1,412 @@
+"""
+Background task scheduling and shared task state.
+
+- TaskScheduler: per-type concurrency caps with per-tenant fair queues, so a
+  burst of grading jobs from one tenant cannot starve everyone else's
+- Task stores: task records (status, progress, result) kept for a TTL and
+  progress events pushed to subscribers
+  - InMemoryTaskStore: single instance
+  - RedisTaskStore: shared across instances, so any pod behind the load
+    balancer can report status and wait for results
+
+Task functions are in-process callables, so tasks run on the instance that
+accepted them; the store shares their state, not their execution. Queued
+and running tasks die with their instance: the Redis store tracks which
+instance owns them under a lease, and once that lapses (crash, restart)
+another instance marks their records failed instead of leaving them
+"running" until they expire.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from utils.core.constants import (
+    TASK_INSTANCE_LEASE_TTL,
+    TASK_RESULT_TTL,
+    TASK_SCHEDULER_DEFAULT_CONCURRENCY,
+    TASK_SCHEDULER_TYPE_CONCURRENCY,
+    TASK_STORE_PREFIX,
+)
+from utils.monitoring import get_logger
+
+logger = get_logger(__name__)
+
+
+# Statuses after which a task record no longer changes
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+# Error of records whose instance stopped before they finished
+ORPHANED_TASK_ERROR = "Interrupted: the server running this task stopped before it finished"
+
+
+class TaskScheduler:
+    """
+    Admits background tasks under per-type concurrency caps.
+
+    Waiting tasks queue per task type and tenant; a free slot goes to the
+    next tenant in round-robin order. Used from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        type_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = TASK_SCHEDULER_DEFAULT_CONCURRENCY
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            type_concurrency: Running tasks allowed per task type
+            default_concurrency: Limit for task types not listed
+        """
+        self.type_concurrency = dict(
+            TASK_SCHEDULER_TYPE_CONCURRENCY if type_concurrency is None else type_concurrency
+        )
+        self.default_concurrency = default_concurrency
+
+        self.running: Dict[str, int] = {}
+        # Task type -> tenant -> waiting (job_id, start) in arrival order
+        self._queues: Dict[str, "OrderedDict[str, Deque[tuple]]"] = {}
+
+    def limit(self, task_type: str) -> int:
+        """Concurrency cap of a task type."""
+        return self.type_concurrency.get(task_type, self.default_concurrency)
+
+    def submit(self, job_id: str, task_type: str, tenant_id: str, start: Callable[[], None]) -> bool:
+        """
+        Start a job now if its type has a free slot, otherwise queue it.
+
+        Args:
+            job_id: Job identifier (for remove())
+            task_type: Task type whose cap applies
+            tenant_id: Tenant for fair queuing
+            start: Called (synchronously) when the job gets its slot
+
+        Returns:
+            True if started immediately, False if queued
+        """
+        queue = self._queues.setdefault(task_type, OrderedDict())
+        queue.setdefault(tenant_id, deque()).append((job_id, start))
+        self._dispatch(task_type)
+        return not self._is_queued(job_id, task_type)
+
+    def release(self, task_type: str):
+        """Free the slot of a finished job and start the next waiting one."""
+        self.running[task_type] = max(0, self.running.get(task_type, 0) - 1)
+        self._dispatch(task_type)
+
+    def remove(self, job_id: str) -> bool:
+        """
+        Drop a job that is still waiting.
+
+        Returns:
+            True if the job was queued and is now removed
+        """
+        for queue in self._queues.values():
+            for tenant_id, jobs in list(queue.items()):
+                for job in jobs:
+                    if job[0] == job_id:
+                        jobs.remove(job)
+                        if not jobs:
+                            del queue[tenant_id]
+                        return True
+        return False
+
+    def _is_queued(self, job_id: str, task_type: str) -> bool:
+        return any(job[0] == job_id for jobs in self._queues.get(task_type, {}).values() for job in jobs)
+
+    def _dispatch(self, task_type: str):
+        queue = self._queues.get(task_type)
+        while queue and self.running.get(task_type, 0) < self.limit(task_type):
+            tenant_id, jobs = next(iter(queue.items()))
+            job_id, start = jobs.popleft()
+            if jobs:
+                queue.move_to_end(tenant_id)  # Next tenant goes first
+            else:
+                del queue[tenant_id]
+
+            self.running[task_type] = self.running.get(task_type, 0) + 1
+            try:
+                start()
+            except Exception as e:
+                self.running[task_type] -= 1
+                logger.error(f"❌ Failed to start task {job_id}: {e}")
+
+    def queued(self, task_type: Optional[str] = None) -> int:
+        """Number of waiting jobs (of one type, or all)."""
+        queues = [self._queues.get(task_type, {})] if task_type else self._queues.values()
+        return sum(len(jobs) for queue in queues for jobs in queue.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Running and queued jobs per task type."""
+        task_types = set(self.running) | set(self._queues)
+        return {
+            task_type: {
+                "running": self.running.get(task_type, 0),
+                "queued": self.queued(task_type),
+                "limit": self.limit(task_type),
+                "tenants_waiting": len(self._queues.get(task_type, {})),
+            }
+            for task_type in sorted(task_types)
+        }
+
+
+class InMemoryTaskStore:
+    """Task records and progress events within one process."""
+
+    def __init__(self):
+        """Initialize store."""
+        self._records: Dict[str, tuple] = {}  # task_id -> (record, expires_at)
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [task_id for task_id, (_, expires_at) in self._records.items() if expires_at <= now]
+        for task_id in expired:
+            del self._records[task_id]
+
+    async def save(self, record: Dict[str, Any], ttl: int = TASK_RESULT_TTL):
+        """
+        Store a task record and notify its subscribers.
+
+        Args:
+            record: Task record (task_id, status, progress, result, ...)
+            ttl: Seconds to keep the record
+        """
+        self._prune()
+        self._records[record["task_id"]] = (record, time.monotonic() + ttl)
+        for queue in self._subscribers.get(record["task_id"], ()):
+            queue.put_nowait(record)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a task record, None if unknown or expired."""
+        entry = self._records.get(task_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    async def wait(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a task reaches a terminal status.
+
+        Args:
+            task_id: Task to wait for
+            timeout: Seconds to wait (None: no limit)
+
+        Returns:
+            Terminal record, or None if the task is unknown or the wait timed out
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(task_id, []).append(queue)
+        try:
+            record = await self.get(task_id)
+            if record is None or record["status"] in TERMINAL_STATUSES:
+                return record
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                record = await asyncio.wait_for(queue.get(), timeout=remaining)
+                if record["status"] in TERMINAL_STATUSES:
+                    return record
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            subscribers = self._subscribers.get(task_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(task_id, None)
+
+    def start(self):
+        """No-op: records live and die with this process."""
+
+    async def close(self):
+        """No-op (see start())."""
+
+
+class RedisTaskStore:
+    """
+    Task records in Redis (JSON with a TTL) and progress events over pub/sub.
+
+    Shared by all instances. Each instance keeps the ids of its unfinished
+    tasks in a set and, once started, renews a lease on them; start() also
+    sweeps the sets of instances whose lease lapsed and fails their records.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        prefix: str = TASK_STORE_PREFIX,
+        instance_id: Optional[str] = None,
+        lease_ttl: int = TASK_INSTANCE_LEASE_TTL
+    ):
+        """
+        Initialize store.
+
+        Args:
+            redis_client: Async Redis client (redis.asyncio, decode_responses=True)
+            prefix: Key and channel prefix
+            instance_id: Owner id of the tasks saved here (default: random per process)
+            lease_ttl: Seconds the instance's tasks are kept alive without a renewal
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.instance_id = instance_id or uuid.uuid4().hex
+        self.lease_ttl = lease_ttl
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.prefix}:task:{task_id}"
+
+    def _channel(self, task_id: str) -> str:
+        return f"{self.prefix}:events:{task_id}"
+
+    def _instances_key(self) -> str:
+        return f"{self.prefix}:instances"
+
+    def _lease_key(self, instance_id: str) -> str:
+        return f"{self.prefix}:instance:{instance_id}:lease"
+
+    def _owned_key(self, instance_id: str) -> str:
+        return f"{self.prefix}:instance:{instance_id}:tasks"
+
+    async def save(self, record: Dict[str, Any], ttl: int = TASK_RESULT_TTL):
+        """Store a task record and publish it to the task's channel."""
+        payload = json.dumps(record, default=str)
+        await self.redis.set(self._key(record["task_id"]), payload, ex=ttl)
+        if record["status"] in TERMINAL_STATUSES:
+            await self.redis.srem(self._owned_key(self.instance_id), record["task_id"])
+        else:
+            await self.redis.sadd(self._owned_key(self.instance_id), record["task_id"])
+        await self.redis.publish(self._channel(record["task_id"]), payload)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a task record, None if unknown or expired."""
+        try:
+            payload = await self.redis.get(self._key(task_id))
+        except Exception as e:
+            logger.error(f"❌ Failed to read task {task_id}: {e}")
+            return None
+        return json.loads(payload) if payload else None
+
+    async def wait(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a task reaches a terminal status (subscribes before
+        reading the record, so a completion in between is not missed).
+
+        Returns:
+            Terminal record, or None if the task is unknown or the wait timed out
+        """
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._channel(task_id))
+        try:
+            record = await self.get(task_id)
+            if record is None or record["status"] in TERMINAL_STATUSES:
+                return record
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while deadline is None or time.monotonic() < deadline:
+                remaining = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=max(0.0, remaining))
+                if message and message.get("type") == "message":
+                    record = json.loads(message["data"])
+                    if record["status"] in TERMINAL_STATUSES:
+                        return record
+            return None
+        finally:
+            await pubsub.unsubscribe(self._channel(task_id))
+            await pubsub.close()
+
+    async def renew_lease(self):
+        """Register this instance and extend the lease on its tasks."""
+        await self.redis.set(self._lease_key(self.instance_id), "1", ex=self.lease_ttl)
+        await self.redis.sadd(self._instances_key(), self.instance_id)
+
+    async def _fail_owned(self, instance_id: str) -> int:
+        """Mark the unfinished tasks of an instance failed and forget the instance."""
+        failed = 0
+        for task_id in await self.redis.smembers(self._owned_key(instance_id)):
+            record = await self.get(task_id)
+            if record is None or record["status"] in TERMINAL_STATUSES:
+                continue
+            record.update(status="failed", error=ORPHANED_TASK_ERROR, completed_at=datetime.now().isoformat())
+            await self.save(record)
+            failed += 1
+        await self.redis.delete(self._owned_key(instance_id))
+        await self.redis.srem(self._instances_key(), instance_id)
+        return failed
+
+    async def recover_orphans(self) -> int:
+        """
+        Fail the unfinished tasks of instances whose lease lapsed.
+
+        Returns:
+            Number of task records marked failed
+        """
+        failed = 0
+        for instance_id in await self.redis.smembers(self._instances_key()):
+            if instance_id == self.instance_id or await self.redis.exists(self._lease_key(instance_id)):
+                continue
+            failed += await self._fail_owned(instance_id)
+        if failed:
+            logger.warning(f"⚠️ Marked {failed} tasks of stopped instances as failed")
+        return failed
+
+    async def _renew_forever(self):
+        while True:
+            try:
+                await self.renew_lease()
+                await self.recover_orphans()
+            except Exception as e:
+                logger.warning(f"⚠️ Task lease renewal failed: {e}")
+            await asyncio.sleep(self.lease_ttl / 3)
+
+    def start(self):
+        """Keep this instance's lease alive and sweep orphaned tasks (on the event loop)."""
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.get_running_loop().create_task(self._renew_forever())
+
+    async def close(self):
+        """Stop renewing the lease and fail this instance's unfinished tasks."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        try:
+            await self._fail_owned(self.instance_id)
+            await self.redis.delete(self._lease_key(self.instance_id))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release task lease: {e}")
+
+
+_task_store = None
+
+
+def get_task_store():
+    """Get or create the task store (Redis when configured, else in-memory)."""
+    global _task_store
+    if _task_store is None:
+        from config import settings
+        _task_store = InMemoryTaskStore()
+        if settings.redis_url:
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+                _task_store = RedisTaskStore(client)
+                logger.info("✅ Background task store: Redis")
+            except ImportError:
+                logger.warning("Redis library not available - task state stays in-process")
+    return _task_store
+
+
+__all__ = [
+    'TaskScheduler',
+    'InMemoryTaskStore',
+    'RedisTaskStore',
+    'get_task_store',
+    'TERMINAL_STATUSES',
+    'ORPHANED_TASK_ERROR',
+]
@@ -28,6 +28,8 @@ except ImportError:
 
 from langgraph.graph import StateGraph, END
 
+from utils.ml.bias_model import get_bias_model_service
+
 
 class GradingState(TypedDict):
     """
@@ -227,93 +229,59 @@ class AdaptiveGradingWorkflow:
         
         print("\n🔍 Checking past professor overrides (L3 Learning Store)...")
         
-        if not DATABASE_AVAILABLE:
-            print("   ⚠️  Database not available - skipping override check")
-            return {
-                **state,
-                "past_overrides_found": False,
-                "override_patterns": [],
-                "systematic_bias": None,
-                "reconciliation_needed": False
-            }
-        
         try:
-            db = get_session()
-            try:
-                # Query L3 for grade_exceptions (corrections by this professor)
-                exceptions = db.query(GradeException).filter(
-                    and_(
-                        GradeException.user_id == professor_id,
-                        GradeException.exception_type == 'grading_correction',
-                        GradeException.rubric_type == assignment_type,
-                        GradeException.status.in_(['analyzed', 'learned'])
-                    )
-                ).limit(20).all()
-                
-                if not exceptions:
-                    print("   ℹ️  No past overrides found for this professor/assignment type")
-                    return {
-                        **state,
-                        "past_overrides_found": False,
-                        "override_patterns": [],
-                        "systematic_bias": None,
-                        "reconciliation_needed": False
-                    }
-                
-                print(f"   📊 Found {len(exceptions)} past corrections")
-                
-                # Analyze patterns in corrections
-                override_patterns = []
-                criterion_adjustments = {}
-                
-                for exc in exceptions:
-                    ai_decision = exc.ai_decision or {}
-                    correct_decision = exc.correct_decision or {}
-                    
-                    # Extract score differences per criterion
-                    ai_criterion_scores = ai_decision.get("criterion_scores", {})
-                    prof_criterion_scores = correct_decision.get("criterion_scores", {})
-                    
-                    for criterion, prof_score in prof_criterion_scores.items():
-                        if criterion in ai_criterion_scores:
-                            diff = prof_score - ai_criterion_scores[criterion]
-                            if criterion not in criterion_adjustments:
-                                criterion_adjustments[criterion] = []
-                            criterion_adjustments[criterion].append(diff)
-                    
-                    override_patterns.append({
-                        "ai_scores": ai_criterion_scores,
-                        "professor_scores": prof_criterion_scores,
-                        "correction_reason": exc.correction_reason
-                    })
-                
-                # Calculate systematic bias (average adjustment per criterion)
-                systematic_bias = {}
-                for criterion, adjustments in criterion_adjustments.items():
-                    avg_adjustment = sum(adjustments) / len(adjustments)
-                    if abs(avg_adjustment) > 2.0:  # Significant bias threshold
-                        systematic_bias[criterion] = avg_adjustment
-                
-                # Determine if reconciliation is needed
-                reconciliation_needed = len(systematic_bias) > 0
-                
-                if reconciliation_needed:
-                    print(f"   ⚠️  Systematic bias detected in criteria: {list(systematic_bias.keys())}")
-                    for criterion, bias in systematic_bias.items():
-                        print(f"      • {criterion}: {bias:+.1f} points (avg adjustment)")
-                else:
-                    print("   ✅ No significant systematic bias detected")
-                
+            # Cached per-(professor, rubric type) running statistics: the analysis
+            # is done once per class, not once per submission
+            analysis = get_bias_model_service().analyze(
+                professor_id,
+                assignment_type,
+                max_std_dev=None  # Significance-only threshold for reconciliation
+            )
+            
+            if not analysis["found"]:
+                print("   ℹ️  No past overrides found for this professor/assignment type")
                 return {
                     **state,
-                    "past_overrides_found": True,
-                    "override_patterns": override_patterns,
-                    "systematic_bias": systematic_bias,
-                    "reconciliation_needed": reconciliation_needed
+                    "past_overrides_found": False,
+                    "override_patterns": [],
+                    "systematic_bias": None,
+                    "reconciliation_needed": False
                 }
-                
-            finally:
-                db.close()
+            
+            print(f"   📊 Found {analysis['count']} past corrections")
+            
+            override_patterns = [
+                {
+                    "ai_scores": pattern["ai_scores"],
+                    "professor_scores": pattern["professor_scores"],
+                    "correction_reason": pattern["reason"]
+                }
+                for pattern in analysis["patterns"]
+            ]
+            
+            # Average adjustment per biased criterion
+            systematic_bias = {
+                criterion: stats["average_adjustment"]
+                for criterion, stats in analysis["systematic_bias"].items()
+            }
+            
+            # Determine if reconciliation is needed
+            reconciliation_needed = len(systematic_bias) > 0
+            
+            if reconciliation_needed:
+                print(f"   ⚠️  Systematic bias detected in criteria: {list(systematic_bias.keys())}")
+                for criterion, bias in systematic_bias.items():
+                    print(f"      • {criterion}: {bias:+.1f} points (avg adjustment)")
+            else:
+                print("   ✅ No significant systematic bias detected")
+            
+            return {
+                **state,
+                "past_overrides_found": True,
+                "override_patterns": override_patterns,
+                "systematic_bias": systematic_bias,
+                "reconciliation_needed": reconciliation_needed
+            }
                 
         except Exception as e:
             print(f"   ❌ Error checking overrides: {e}")
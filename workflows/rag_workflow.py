@@ -13,6 +13,10 @@ from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
+from utils.cache.llm_cache import completion_cache
+from utils.core.constants import RAG_GRADING_TOKEN_BUDGET
+from utils.rag.retrieval import RetrievalResult, run_document_retrieval
+
 # Database imports for logging
 try:
     from database.database import get_session
@@ -41,6 +45,7 @@ class RAGState(TypedDict):
     # Retrieved context (Step 2.1: retrieve_context)
     retrieved_context: Optional[str]
     retrieved_doc_ids: List[str]
+    retrieved_chunks: List[Dict[str, Any]]  # RetrievedChunk.to_dict() records
     retrieval_time_ms: float
     
     # Context grading (Step 2.2: grade_retrieval)
@@ -225,9 +230,10 @@ Respond with ONLY: RETRIEVE or SKIP
 Then on a new line, give a one-sentence reason."""
         
         try:
-            response = self.llm.invoke([
-                HumanMessage(content=decision_prompt.format(query=query))
-            ])
+            with completion_cache(call_site="rag.should_retrieve"):
+                response = self.llm.invoke([
+                    HumanMessage(content=decision_prompt.format(query=query))
+                ])
             
             decision_text = response.content.strip()
             lines = decision_text.split('\n', 1)
@@ -272,8 +278,9 @@ Then on a new line, give a one-sentence reason."""
         try:
             if self.vector_store_tool:
                 # Use the vector store tool
-                result = self.vector_store_tool.func(
-                    query=query,
+                retrieval = run_document_retrieval(
+                    self.vector_store_tool,
+                    query,
                     limit=5,
                     user_id=state.get("user_id")
                 )
@@ -281,22 +288,25 @@ Then on a new line, give a one-sentence reason."""
                 retrieval_time_ms = (time.time() - start_time) * 1000
                 
                 # Check if retrieval was successful
-                if "No relevant documents found" in result or "not available" in result:
-                    print("   ⚠️  No relevant documents found")
+                if not retrieval.ok:
+                    print(f"   ⚠️  No relevant documents found ({retrieval.status})")
                     return {
                         **state,
                         "retrieved_context": None,
                         "retrieved_doc_ids": [],
+                        "retrieved_chunks": [],
                         "retrieval_time_ms": retrieval_time_ms,
                         "errors": state.get("errors", []) + ["No documents found"]
                     }
                 
-                print(f"   ✅ Retrieved context ({len(result)} chars) in {retrieval_time_ms:.1f}ms")
+                print(f"   ✅ Retrieved {len(retrieval.chunks)} chunks "
+                      f"({retrieval.total_tokens} tokens) in {retrieval_time_ms:.1f}ms")
                 
                 return {
                     **state,
-                    "retrieved_context": result,
-                    "retrieved_doc_ids": [],  # Would extract IDs from result in production
+                    "retrieved_context": retrieval.to_prompt_text(),
+                    "retrieved_doc_ids": retrieval.chunk_ids,
+                    "retrieved_chunks": [chunk.to_dict() for chunk in retrieval.chunks],
                     "retrieval_time_ms": retrieval_time_ms
                 }
             else:
@@ -332,6 +342,7 @@ Then on a new line, give a one-sentence reason."""
         """
         retrieved_context = state.get("retrieved_context")
         query = state.get("refined_query") or state["query"]
+        retrieval = RetrievalResult.from_dict({"query": query, "chunks": state.get("retrieved_chunks") or []})
         
         print("\n🔍 Grading retrieved context quality...")
         
@@ -365,13 +376,21 @@ QUALITY: <score>
 ISSUES: <list any problems, or "none">
 VERDICT: <ACCEPT or REFINE>"""
         
+        # Grade the highest-scoring chunks (whole passages, not a character prefix)
+        graded_chunks = retrieval.top_chunks(RAG_GRADING_TOKEN_BUDGET) if retrieval.chunks else []
+        grading_context = (
+            retrieval.to_prompt_text(graded_chunks) if graded_chunks
+            else retrieved_context[:1000]
+        )
+        
         try:
-            response = self.llm.invoke([
-                HumanMessage(content=grading_prompt.format(
-                    query=query,
-                    context=retrieved_context[:1000]  # Limit context length for grading
-                ))
-            ])
+            with completion_cache(call_site="rag.grade_retrieval"):
+                response = self.llm.invoke([
+                    HumanMessage(content=grading_prompt.format(
+                        query=query,
+                        context=grading_context
+                    ))
+                ])
             
             grading_text = response.content.strip()
             
@@ -430,7 +449,11 @@ VERDICT: <ACCEPT or REFINE>"""
                             query=query,
                             ai_decision={"quality_score": overall_quality},
                             correct_decision={"refinement_needed": True},
-                            retrieved_context={"context": retrieved_context[:500]},
+                            retrieved_context={
+                                "chunk_ids": [chunk.id for chunk in graded_chunks if chunk.id],
+                                "citations": [chunk.citation() for chunk in graded_chunks],
+                                "context": grading_context[:500]
+                            },
                             context_quality_score=overall_quality,
                             error_category="low_quality_retrieval",
                             error_description=f"Retrieved context quality below threshold: {overall_quality:.2f}"
@@ -622,6 +645,7 @@ Respond with ONLY the refined query (no explanations)."""
             "retrieval_confidence": 0.0,
             "retrieved_context": None,
             "retrieved_doc_ids": [],
+            "retrieved_chunks": [],
             "retrieval_time_ms": 0.0,
             "context_quality_score": 0.0,
             "context_issues": [],